@@ -0,0 +1,140 @@
+package daemon
+
+import (
+	"bytes"
+	"compress/gzip"
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"sort"
+	"sync"
+)
+
+// Delta checkins — the daemon half of backend/checkin/delta.py
+// (migration 337).
+//
+// Every cycle used to ship the full connected-agent list and both
+// signing keys, and Central Command re-ran the go_agents/workstations
+// sync and key lookups for them even when nothing had changed. Now the
+// daemon hashes each section, and once CC has acknowledged a hash the
+// section is left out (listed in omitted_sections) until it changes. CC
+// skips the matching checkin steps and returns the hashes it holds in
+// checkin_delta.ack; resync=true means it lost them and wants a full
+// checkin.
+//
+// Negotiated: nothing changes until a response carries checkin_delta,
+// so old servers keep getting full, uncompressed checkins. The same
+// signal gates gzip request bodies — the server's gzip request
+// middleware ships in the same release as delta support.
+
+const (
+	checkinSectionAgents = "connected_agents"
+	checkinSectionKeys   = "signing_keys"
+
+	// Smaller bodies aren't worth the gzip framing.
+	checkinGzipMinBytes = 1024
+)
+
+// CheckinDelta is CC's delta acknowledgement on a checkin response.
+type CheckinDelta struct {
+	Version int               `json:"version"`
+	Ack     map[string]string `json:"ack"`
+	Resync  bool              `json:"resync"`
+}
+
+// checkinDeltaState is the per-client view of what CC has acknowledged.
+// In memory only: after a restart the first checkin is full.
+type checkinDeltaState struct {
+	mu      sync.Mutex
+	enabled bool
+	acked   map[string]string
+}
+
+// checkinSectionHashes hashes each delta section of req. Fields CC
+// doesn't use from the agent list (it stamps liveness with its own
+// clock and doesn't store drift_count) are excluded so a heartbeat
+// alone doesn't count as a change. Agents are sorted because the
+// registry is a map.
+func checkinSectionHashes(req *CheckinRequest) map[string]string {
+	agents := make([]ConnectedAgent, len(req.ConnectedAgents))
+	copy(agents, req.ConnectedAgents)
+	for i := range agents {
+		agents[i].LastHeartbeat = ""
+		agents[i].DriftCount = 0
+	}
+	sort.Slice(agents, func(i, j int) bool { return agents[i].AgentID < agents[j].AgentID })
+
+	return map[string]string{
+		checkinSectionAgents: hashCheckinSection(agents),
+		checkinSectionKeys:   hashCheckinSection([]string{req.AgentPublicKey, req.AgentIdentityPublicKey}),
+	}
+}
+
+func hashCheckinSection(v interface{}) string {
+	data, _ := json.Marshal(v)
+	sum := sha256.Sum256(data)
+	return hex.EncodeToString(sum[:])
+}
+
+// prepare stamps section hashes on req and strips the sections CC has
+// already acknowledged. Returns true when the body may be gzipped.
+func (s *checkinDeltaState) prepare(req *CheckinRequest) bool {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if !s.enabled {
+		return false
+	}
+
+	hashes := checkinSectionHashes(req)
+	req.SectionHashes = hashes
+	req.OmittedSections = nil
+	for _, name := range []string{checkinSectionAgents, checkinSectionKeys} {
+		if s.acked[name] == "" || s.acked[name] != hashes[name] {
+			continue
+		}
+		req.OmittedSections = append(req.OmittedSections, name)
+		switch name {
+		case checkinSectionAgents:
+			req.ConnectedAgents = nil
+		case checkinSectionKeys:
+			req.AgentPublicKey = ""
+			req.AgentIdentityPublicKey = ""
+		}
+	}
+	return true
+}
+
+// observe records CC's acknowledgement from a successful checkin. A
+// response without checkin_delta (older server) turns delta mode off.
+func (s *checkinDeltaState) observe(d *CheckinDelta) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if d == nil || d.Version < 1 {
+		s.enabled = false
+		s.acked = nil
+		return
+	}
+	s.enabled = true
+	if d.Resync {
+		s.acked = nil
+		return
+	}
+	s.acked = d.Ack
+}
+
+// gzipCheckinBody compresses body if it is large enough to benefit.
+// The second return is false when body is returned unchanged.
+func gzipCheckinBody(body []byte) ([]byte, bool) {
+	if len(body) < checkinGzipMinBytes {
+		return body, false
+	}
+	var buf bytes.Buffer
+	gz := gzip.NewWriter(&buf)
+	if _, err := gz.Write(body); err != nil {
+		return body, false
+	}
+	if err := gz.Close(); err != nil {
+		return body, false
+	}
+	return buf.Bytes(), true
+}
@@ -0,0 +1,160 @@
+package daemon
+
+import (
+	"compress/gzip"
+	"context"
+	"encoding/json"
+	"fmt"
+	"io"
+	"net/http"
+	"net/http/httptest"
+	"testing"
+)
+
+type deltaCheckinServer struct {
+	requests []map[string]interface{}
+	encoding []string
+	ack      map[string]string
+	noDelta  bool
+	resync   bool
+}
+
+func (s *deltaCheckinServer) handler(t *testing.T) http.HandlerFunc {
+	return func(w http.ResponseWriter, r *http.Request) {
+		var body io.Reader = r.Body
+		if r.Header.Get("Content-Encoding") == "gzip" {
+			gz, err := gzip.NewReader(r.Body)
+			if err != nil {
+				t.Fatalf("gzip reader: %v", err)
+			}
+			body = gz
+		}
+		var req map[string]interface{}
+		if err := json.NewDecoder(body).Decode(&req); err != nil {
+			t.Fatalf("decode checkin: %v", err)
+		}
+		s.requests = append(s.requests, req)
+		s.encoding = append(s.encoding, r.Header.Get("Content-Encoding"))
+
+		resp := map[string]interface{}{"status": "ok"}
+		if !s.noDelta {
+			// Acknowledge every declared hash, as the server does once
+			// the steps for the sent sections have run.
+			s.ack = map[string]string{}
+			if hashes, ok := req["section_hashes"].(map[string]interface{}); ok {
+				for k, v := range hashes {
+					s.ack[k] = v.(string)
+				}
+			}
+			resp["checkin_delta"] = map[string]interface{}{"version": 1, "ack": s.ack, "resync": s.resync}
+		}
+		json.NewEncoder(w).Encode(resp)
+	}
+}
+
+func deltaTestRequest(heartbeat string) *CheckinRequest {
+	req := &CheckinRequest{
+		SiteID:                 "test-site",
+		MACAddress:             "AA:BB:CC:DD:EE:FF",
+		AgentPublicKey:         "ab",
+		AgentIdentityPublicKey: "cd",
+	}
+	for i := 0; i < 20; i++ {
+		req.ConnectedAgents = append(req.ConnectedAgents, ConnectedAgent{
+			AgentID:       fmt.Sprintf("agent-%02d", i),
+			Hostname:      fmt.Sprintf("WS-%02d", i),
+			LastHeartbeat: heartbeat,
+			ChecksPassed:  10,
+			ChecksTotal:   12,
+		})
+	}
+	return req
+}
+
+func newDeltaTestClient(t *testing.T, srv *deltaCheckinServer) *PhoneHomeClient {
+	server := httptest.NewServer(srv.handler(t))
+	t.Cleanup(server.Close)
+	cfg := testConfig()
+	cfg.StateDir = t.TempDir()
+	cfg.APIEndpoint = server.URL
+	return NewPhoneHomeClient(cfg)
+}
+
+func TestCheckinDelta_OmitsAcknowledgedSections(t *testing.T) {
+	srv := &deltaCheckinServer{}
+	c := newDeltaTestClient(t, srv)
+	ctx := context.Background()
+
+	for i, hb := range []string{"t1", "t2", "t3"} {
+		if _, err := c.Checkin(ctx, deltaTestRequest(hb)); err != nil {
+			t.Fatalf("checkin %d: %v", i, err)
+		}
+	}
+
+	// 1st: server hasn't advertised delta support yet — full, plain JSON.
+	if _, ok := srv.requests[0]["section_hashes"]; ok || srv.encoding[0] != "" {
+		t.Fatalf("first checkin should be legacy: %v %q", srv.requests[0]["section_hashes"], srv.encoding[0])
+	}
+	// 2nd: hashes declared, everything still sent (nothing acked), gzipped.
+	if srv.requests[1]["connected_agents"] == nil || srv.requests[1]["omitted_sections"] != nil {
+		t.Fatalf("second checkin should be full: %v", srv.requests[1]["omitted_sections"])
+	}
+	if srv.encoding[1] != "gzip" {
+		t.Errorf("expected gzip body once negotiated, got %q", srv.encoding[1])
+	}
+	// 3rd: only the heartbeat moved — both sections omitted.
+	third := srv.requests[2]
+	if third["connected_agents"] != nil || third["agent_public_key"] != nil {
+		t.Errorf("acknowledged sections were re-sent: %v", third)
+	}
+	omitted, _ := third["omitted_sections"].([]interface{})
+	if len(omitted) != 2 {
+		t.Errorf("expected both sections omitted, got %v", omitted)
+	}
+}
+
+func TestCheckinDelta_ChangeAndResyncResend(t *testing.T) {
+	srv := &deltaCheckinServer{}
+	c := newDeltaTestClient(t, srv)
+	ctx := context.Background()
+
+	c.Checkin(ctx, deltaTestRequest("t1"))
+	c.Checkin(ctx, deltaTestRequest("t1"))
+
+	changed := deltaTestRequest("t1")
+	changed.ConnectedAgents[3].ChecksPassed = 12
+	srv.resync = true
+	c.Checkin(ctx, changed)
+	req := srv.requests[2]
+	if req["connected_agents"] == nil {
+		t.Fatal("changed agent section must be sent")
+	}
+	if req["agent_public_key"] != nil {
+		t.Error("unchanged key section should still be omitted")
+	}
+
+	// Server answered resync=true: next checkin is full again.
+	srv.resync = false
+	c.Checkin(ctx, deltaTestRequest("t1"))
+	if srv.requests[3]["agent_public_key"] == nil || srv.requests[3]["omitted_sections"] != nil {
+		t.Errorf("checkin after resync should be full: %v", srv.requests[3]["omitted_sections"])
+	}
+}
+
+func TestCheckinDelta_OldServerDisablesDelta(t *testing.T) {
+	srv := &deltaCheckinServer{}
+	c := newDeltaTestClient(t, srv)
+	ctx := context.Background()
+
+	c.Checkin(ctx, deltaTestRequest("t1"))
+	c.Checkin(ctx, deltaTestRequest("t1"))
+	srv.noDelta = true
+	c.Checkin(ctx, deltaTestRequest("t1"))
+	c.Checkin(ctx, deltaTestRequest("t1"))
+
+	last := srv.requests[3]
+	if last["section_hashes"] != nil || last["connected_agents"] == nil || srv.encoding[3] != "" {
+		t.Errorf("delta/gzip must stop once the server drops checkin_delta: %v %q",
+			last["section_hashes"], srv.encoding[3])
+	}
+}
@@ -43,6 +43,8 @@ type PhoneHomeClient struct {
 	// keypair. nil during the soak only when LoadOrCreateIdentity
 	// failed at startup (logged loudly; bearer auth still works).
 	identity *Identity
+	// Section hashes Central Command has acknowledged (checkin_delta.go).
+	delta checkinDeltaState
 }
 
 // NewPhoneHomeClient creates a new client for Central Command checkin.
@@ -276,6 +278,10 @@ type CheckinRequest struct {
 	GenerationUUID      string           `json:"generation_uuid,omitempty"`
 	ReconcileNeeded     bool             `json:"reconcile_needed,omitempty"`
 	ReconcileSignals    []string         `json:"reconcile_signals,omitempty"`
+	// Delta checkin (checkin_delta.go): a hash per section, plus the
+	// sections left out because CC acknowledged that hash last cycle.
+	SectionHashes       map[string]string `json:"section_hashes,omitempty"`
+	OmittedSections     []string          `json:"omitted_sections,omitempty"`
 }
 
 // BundleHashEntry is a recent evidence bundle hash for peer witnessing.
@@ -436,6 +442,9 @@ type CheckinResponse struct {
 	// split is enforced by the daemon's healing gate). Behavior wiring
 	// lands in a follow-up PR.
 	BillingHold bool `json:"billing_hold,omitempty"`
+	// Delta checkin acknowledgement (checkin_delta.go). Absent on
+	// servers without delta support.
+	CheckinDelta *CheckinDelta `json:"checkin_delta,omitempty"`
 }
 
 // ReconcilePlan is the server-authoritative recovery plan for an agent
@@ -501,6 +510,7 @@ type PeerBundleHash struct {
 
 // Checkin sends a phone-home checkin to Central Command.
 func (c *PhoneHomeClient) Checkin(ctx context.Context, req *CheckinRequest) (*CheckinResponse, error) {
+	mayCompress := c.delta.prepare(req)
 	body, err := json.Marshal(req)
 	if err != nil {
 		return nil, fmt.Errorf("marshal checkin: %w", err)
@@ -508,12 +518,19 @@ func (c *PhoneHomeClient) Checkin(ctx context.Context, req *CheckinRequest) (*Ch
 
 	url := strings.TrimRight(c.config.APIEndpoint, "/") + "/api/appliances/checkin"
 
-	httpReq, err := http.NewRequestWithContext(ctx, http.MethodPost, url, bytes.NewReader(body))
+	wire, gzipped := body, false
+	if mayCompress {
+		wire, gzipped = gzipCheckinBody(body)
+	}
+	httpReq, err := http.NewRequestWithContext(ctx, http.MethodPost, url, bytes.NewReader(wire))
 	if err != nil {
 		return nil, fmt.Errorf("create request: %w", err)
 	}
 
 	httpReq.Header.Set("Content-Type", "application/json")
+	if gzipped {
+		httpReq.Header.Set("Content-Encoding", "gzip")
+	}
 	httpReq.Header.Set("Authorization", "Bearer "+c.config.APIKey)
 	httpReq.Header.Set("User-Agent", "OsirisCare-Appliance/Go")
 
@@ -522,6 +539,8 @@ func (c *PhoneHomeClient) Checkin(ctx context.Context, req *CheckinRequest) (*Ch
 	// headers the server uses for observe-only verification. The
 	// canonical input format is FROZEN here and at signature_auth.py
 	// — same byte layout, same separators (no trailing newline).
+	// The signature covers the uncompressed JSON: the server inflates
+	// gzip bodies before the checkin handler hashes them.
 	if c.identity != nil {
 		signRequest(httpReq, body, c.identity)
 	}
@@ -556,6 +575,7 @@ func (c *PhoneHomeClient) Checkin(ctx context.Context, req *CheckinRequest) (*Ch
 	}
 
 	c.consecutiveFailures.Store(0)
+	c.delta.observe(result.CheckinDelta)
 	return &result, nil
 }
 
@@ -53,7 +53,6 @@ from fastapi import (
     UploadFile,
     status,
 )
-from minio.retention import COMPLIANCE, Retention
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -2692,6 +2691,8 @@ async def upload_evidence_worm(
         bundle_uri = f"s3://{MINIO_BUCKET}/{bundle_key}"
 
         try:
+            from minio.retention import COMPLIANCE, Retention
+
             retention = Retention(COMPLIANCE, retention_until)
             await loop.run_in_executor(None, lambda: minio_client.set_object_retention(MINIO_BUCKET, bundle_key, retention))
             logger.info("Set WORM retention on bundle",
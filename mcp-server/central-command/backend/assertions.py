@@ -1645,7 +1645,7 @@ async def _check_partition_maintainer_dry(conn: asyncpg.Connection) -> List[Viol
     `canonical_metric_samples_pruner_loop` makes next-month INSERTs
     fail outright).
 
-    `partition_maintainer_loop` is supposed to keep ≥3 months of
+    `partition_maintainer_tick` is supposed to keep ≥3 months of
     forward partitions. If it's wedged or dead, next-month INSERTs
     land in the `_default` partition (bloats it + degrades query
     plans) or fail outright if no default exists.
@@ -1705,8 +1705,8 @@ async def _check_partition_maintainer_dry(conn: asyncpg.Connection) -> List[Viol
                     f"`{parent}` has NO partition for {next_y}-"
                     f"{next_m:02d}. Next-month INSERTs will land in "
                     f"`{parent}_default` (bloat + degraded query plans). "
-                    f"Check `partition_maintainer_loop` + `heartbeat_"
-                    f"partition_maintainer_loop` heartbeats; expected "
+                    f"Check `partition_maintainer_tick` + `heartbeat_"
+                    f"partition_maintainer_tick` heartbeats; expected "
                     f"cadence 86400s (daily)."
                 ),
             },
@@ -3230,7 +3230,7 @@ ALL_ASSERTIONS: List[Assertion] = [
     Assertion(
         name="partition_maintainer_dry",
         severity="sev1",
-        description="A critical partitioned table (compliance_bundles, portal_access_log, appliance_heartbeats, promoted_rule_events, canonical_metric_samples) has NO partition for next month. INSERTs land in the _default partition (bloats it + degrades query plans) or fail if no default exists (canonical_metric_samples has NO default — wedge = INSERT failures). Indicates partition_maintainer_loop / heartbeat_partition_maintainer_loop / canonical_metric_samples_pruner_loop are wedged. Round-table 2026-05-01 Block 4 P1 closure; canonical_metric_samples added 2026-05-14 (Task #65a).",
+        description="A critical partitioned table (compliance_bundles, portal_access_log, appliance_heartbeats, promoted_rule_events, canonical_metric_samples) has NO partition for next month. INSERTs land in the _default partition (bloats it + degrades query plans) or fail if no default exists (canonical_metric_samples has NO default — wedge = INSERT failures). Indicates partition_maintainer_tick / heartbeat_partition_maintainer_tick / canonical_metric_samples_pruner_loop are wedged. Round-table 2026-05-01 Block 4 P1 closure; canonical_metric_samples added 2026-05-14 (Task #65a).",
         check=lambda c: _check_partition_maintainer_dry(c),
     ),
     Assertion(
@@ -3861,7 +3861,7 @@ _DISPLAY_METADATA: Dict[str, Dict[str, str]] = {
             "partitioned table (compliance_bundles / portal_access_log / "
             "appliance_heartbeats / promoted_rule_events / "
             "canonical_metric_samples). The "
-            "partition_maintainer_loop is supposed to keep ≥3 months of "
+            "partition_maintainer_tick is supposed to keep ≥3 months of "
             "forward partitions; if this fires, the loop is wedged or "
             "dead. Without next-month partitions, INSERTs land in the "
             "_default partition (bloats it; degrades query plans for "
@@ -9,6 +9,7 @@ import asyncio
 import json
 import os
 import re
+import time
 from datetime import datetime, timezone
 
 import structlog
@@ -1421,6 +1422,10 @@ async def recurrence_auto_promotion_loop():
         await asyncio.sleep(3600)  # Hourly
 
 
+CROSS_INCIDENT_CORRELATION_INTERVAL_SECONDS = 120
+CROSS_INCIDENT_CORRELATION_REBUILD_SECONDS = 86400  # daily full backfill
+
+
 async def cross_incident_correlation_loop():
     """Detect co-occurring incident types for predictive remediation.
 
@@ -1430,7 +1435,16 @@ async def cross_incident_correlation_loop():
 
     Round Table: "If defender_exclusions always precedes rogue_scheduled_tasks
     by 10 minutes, run the persistence cleanup alongside the exclusion fix."
+
+    Incremental (incident_correlator): each tick consumes only incidents
+    created/resolved since the last watermark and bulk-upserts the pairs
+    whose counters moved. Backfills from 7 days of history at startup and
+    once a day.
     """
+    from dashboard_api.incident_correlator import IncidentCorrelator
+
+    correlator = IncidentCorrelator()
+    last_backfill = 0.0
     await asyncio.sleep(1200)  # Wait for startup
     while True:
         _hb("cross_incident_correlation")
@@ -1440,81 +1454,27 @@ async def cross_incident_correlation_loop():
 
             pool = await get_pool()
             # admin_transaction (wave-20): cross_incident_correlation_loop
-            # issues 3 admin statements (A→B pair scan, registry filter,
-            # INSERT correlation).
+            # issues 4 admin statements (NOW() watermark, registry filter,
+            # incident range scan, bulk correlation UPSERT).
             async with admin_transaction(pool) as conn:
-                # Find A→B pairs: A resolved, B created within 10 min.
-                # Count DISTINCT A instances (each A may precede multiple B types
-                # — without DISTINCT, confidence can exceed 1.0).
-                # Exclude monitoring-only checks (from check_type_registry)
-                # since their correlations aren't actionable.
-                pairs = await conn.fetch("""
-                    SELECT
-                        a.site_id,
-                        a.incident_type as type_a,
-                        b.incident_type as type_b,
-                        COUNT(DISTINCT a.id) as co_occurrences,
-                        AVG(EXTRACT(EPOCH FROM (b.created_at - a.resolved_at))) as avg_gap_sec
-                    FROM incidents a
-                    JOIN incidents b ON b.site_id = a.site_id
-                        AND b.incident_type != a.incident_type
-                        AND b.created_at > a.resolved_at
-                        AND b.created_at < a.resolved_at + INTERVAL '10 minutes'
-                    WHERE a.status = 'resolved'
-                      AND a.resolved_at > NOW() - INTERVAL '7 days'
-                      -- Exclude monitoring-only types from both sides
-                      AND NOT EXISTS (
-                          SELECT 1 FROM check_type_registry r
-                          WHERE r.check_name IN (a.incident_type, b.incident_type)
-                            AND r.is_monitoring_only = true
-                      )
-                    GROUP BY a.site_id, a.incident_type, b.incident_type
-                    HAVING COUNT(DISTINCT a.id) >= 3
-                """)
-
-                for pair in pairs:
-                    # Compute confidence: distinct A instances with a B follow-up
-                    # divided by total A resolutions. Clamped to [0.0, 1.0].
-                    total_a = await conn.fetchval("""
-                        SELECT COUNT(*) FROM incidents
-                        WHERE site_id = $1 AND incident_type = $2
-                          AND status = 'resolved'
-                          AND resolved_at > NOW() - INTERVAL '7 days'
-                    """, pair["site_id"], pair["type_a"])
-
-                    confidence = min(pair["co_occurrences"] / max(total_a, 1), 1.0)
-
-                    await conn.execute("""
-                        INSERT INTO incident_correlation_pairs (
-                            site_id, incident_type_a, incident_type_b,
-                            co_occurrence_count, avg_gap_seconds, confidence,
-                            first_seen, last_seen
-                        ) VALUES ($1, $2, $3, $4, $5, $6, NOW(), NOW())
-                        ON CONFLICT (site_id, incident_type_a, incident_type_b) DO UPDATE SET
-                            co_occurrence_count = EXCLUDED.co_occurrence_count,
-                            avg_gap_seconds = EXCLUDED.avg_gap_seconds,
-                            confidence = EXCLUDED.confidence,
-                            last_seen = NOW()
-                    """,
-                        pair["site_id"], pair["type_a"], pair["type_b"],
-                        pair["co_occurrences"], pair["avg_gap_sec"],
-                        confidence,
-                    )
-
-                    if confidence >= 0.5:
-                        logger.info("Cross-incident correlation detected",
-                                    site_id=pair["site_id"],
-                                    type_a=pair["type_a"],
-                                    type_b=pair["type_b"],
-                                    co_occurrences=pair["co_occurrences"],
-                                    confidence=round(confidence, 2))
+                now = time.monotonic()
+                if (correlator.watermark is None
+                        or now - last_backfill >= CROSS_INCIDENT_CORRELATION_REBUILD_SECONDS):
+                    stats = await correlator.backfill(conn)
+                    last_backfill = now
+                else:
+                    stats = await correlator.tick(conn)
+            if stats["written"] or stats["backfill"]:
+                logger.info("Cross-incident correlation updated", **stats)
 
         except asyncio.CancelledError:
             break
         except Exception as e:
+            # State may be half-applied; rebuild from history next tick.
+            correlator.reset()
             logger.warning(f"Cross-incident correlation scan failed: {e}")
 
-        await asyncio.sleep(3600)  # Hourly
+        await asyncio.sleep(CROSS_INCIDENT_CORRELATION_INTERVAL_SECONDS)
 
 
 # ─── Session 206 Spine: Flywheel Orchestrator loop ─────────────────
@@ -1589,12 +1549,12 @@ PARTITION_MAINTAINER_INTERVAL_SECONDS = 86400  # daily
 PARTITION_MAINTAINER_LOOKAHEAD_MONTHS = 3
 
 
-async def partition_maintainer_loop():
+async def partition_maintainer_tick():
     """Keep the next N months of promoted_rule_events partitions alive.
 
     #78 closure 2026-05-02. The application role (mcp_app, via PgBouncer)
     lacks CREATE on schema public, so DDL must run as the migration
-    superuser. Same pattern as heartbeat_partition_maintainer_loop —
+    superuser. Same pattern as heartbeat_partition_maintainer_tick —
     open a direct asyncpg connection to MIGRATION_DATABASE_URL, run the
     DDL, close the connection. Single-shot per tick; never holds a
     long-lived superuser socket open.
@@ -1605,44 +1565,35 @@ async def partition_maintainer_loop():
     run as the `mcp` superuser. Substrate invariant
     `partition_maintainer_dry` (sev1) catches this at the outcome
     layer regardless.
+
+    Scheduler tick (maintenance_tick_jobs): failures propagate so the
+    scheduler logs bg_job_failed and counts them.
     """
     import asyncpg as _asyncpg
     from datetime import date
 
-    await asyncio.sleep(600)  # 10 min after startup
-    while True:
-        _hb("partition_maintainer")
-        try:
-            today = date.today()
-            conn = await _asyncpg.connect(_migration_db_url())
-            try:
-                for offset in range(1, PARTITION_MAINTAINER_LOOKAHEAD_MONTHS + 1):
-                    year = today.year + ((today.month - 1 + offset) // 12)
-                    month = ((today.month - 1 + offset) % 12) + 1
-                    start = date(year, month, 1)
-                    end_year = year + (1 if month == 12 else 0)
-                    end_month = 1 if month == 12 else month + 1
-                    end = date(end_year, end_month, 1)
-                    partition = f"promoted_rule_events_{year:04d}{month:02d}"
-                    await conn.execute(
-                        f"""
-                        CREATE TABLE IF NOT EXISTS {partition}
-                        PARTITION OF promoted_rule_events
-                        FOR VALUES FROM ('{start.isoformat()}')
-                                    TO ('{end.isoformat()}')
-                        """
-                    )
-            finally:
-                await conn.close()
-            logger.info("partition_maintainer_tick_complete")
-        except asyncio.CancelledError:
-            break
-        except Exception:
-            logger.error(
-                "partition_maintainer_loop_failed",
-                exc_info=True,
+    today = date.today()
+    conn = await _asyncpg.connect(_migration_db_url())
+    try:
+        for offset in range(1, PARTITION_MAINTAINER_LOOKAHEAD_MONTHS + 1):
+            year = today.year + ((today.month - 1 + offset) // 12)
+            month = ((today.month - 1 + offset) % 12) + 1
+            start = date(year, month, 1)
+            end_year = year + (1 if month == 12 else 0)
+            end_month = 1 if month == 12 else month + 1
+            end = date(end_year, end_month, 1)
+            partition = f"promoted_rule_events_{year:04d}{month:02d}"
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {partition}
+                PARTITION OF promoted_rule_events
+                FOR VALUES FROM ('{start.isoformat()}')
+                            TO ('{end.isoformat()}')
+                """
             )
-        await asyncio.sleep(PARTITION_MAINTAINER_INTERVAL_SECONDS)
+    finally:
+        await conn.close()
+    logger.info("partition_maintainer_tick_complete")
 
 
 CANONICAL_METRIC_SAMPLES_RETENTION_DAYS = 30
@@ -1660,9 +1611,9 @@ async def canonical_metric_samples_pruner_loop():
          supports CONCURRENTLY, avoids AccessExclusiveLock on the parent
          that would block the substrate invariant + sampler INSERTs).
       2. CREATEs the next N months of partitions ahead of the cliff
-         (3-month lookahead matching partition_maintainer_loop).
+         (3-month lookahead matching partition_maintainer_tick).
 
-    Sibling pattern: partition_maintainer_loop (background_tasks.py:1591).
+    Sibling pattern: partition_maintainer_tick.
     Same DDL-needs-superuser constraint — open a direct asyncpg conn to
     MIGRATION_DATABASE_URL per tick (the app role mcp_app via PgBouncer
     lacks CREATE/DROP/ALTER on schema public). Never holds the superuser
@@ -1921,7 +1872,7 @@ async def mark_stale_appliances_loop():
 WEEKLY_ROLLUP_REFRESH_SECONDS = 30 * 60  # every 30 min
 
 
-async def weekly_rollup_refresh_loop():
+async def weekly_rollup_refresh_tick():
     """Refresh the partner_site_weekly_rollup materialized view.
 
     REFRESH MATERIALIZED VIEW requires ownership of the view. The view
@@ -1929,38 +1880,27 @@ async def weekly_rollup_refresh_loop():
     REFRESH executed through the app pool (mcp_app via PgBouncer) fails
     with "must be owner of materialized view". Use a single-shot direct
     asyncpg connection as the migration superuser instead — same pattern
-    as heartbeat_partition_maintainer.
+    as heartbeat_partition_maintainer_tick.
 
     CONCURRENTLY lets readers keep querying during the refresh. If the
     view doesn't exist yet (migration 185 not applied), the pg_matviews
     check short-circuits and we try again next tick.
     """
     import asyncpg as _asyncpg
-    await asyncio.sleep(120)  # let migrations complete on cold starts
-    while True:
-        _hb("weekly_rollup_refresh")
-        try:
-            conn = await _asyncpg.connect(_migration_db_url())
-            try:
-                exists = await conn.fetchval(
-                    "SELECT 1 FROM pg_matviews WHERE matviewname = 'partner_site_weekly_rollup'"
-                )
-                if exists:
-                    # CONCURRENTLY requires the UNIQUE index set up in migration 185.
-                    await conn.execute(
-                        "REFRESH MATERIALIZED VIEW CONCURRENTLY partner_site_weekly_rollup"
-                    )
-                    logger.info("weekly_rollup_refresh_complete")
-            finally:
-                await conn.close()
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(
-                f"weekly_rollup_refresh_loop iteration failed: {e}",
-                exc_info=True,
+
+    conn = await _asyncpg.connect(_migration_db_url())
+    try:
+        exists = await conn.fetchval(
+            "SELECT 1 FROM pg_matviews WHERE matviewname = 'partner_site_weekly_rollup'"
+        )
+        if exists:
+            # CONCURRENTLY requires the UNIQUE index set up in migration 185.
+            await conn.execute(
+                "REFRESH MATERIALIZED VIEW CONCURRENTLY partner_site_weekly_rollup"
             )
-        await asyncio.sleep(WEEKLY_ROLLUP_REFRESH_SECONDS)
+            logger.info("weekly_rollup_refresh_complete")
+    finally:
+        await conn.close()
 
 
 # ─── Session 206 round-table P2: partner weekly digest loop ────────
@@ -2247,7 +2187,7 @@ async def partner_weekly_digest_loop():
 CONSENT_TOKEN_EXPIRY_CHECK_SECONDS = 60 * 60  # 1 hour — cheap enough to do hourly
 
 
-async def expire_consent_request_tokens_loop():
+async def expire_consent_request_tokens_tick():
     """Mark expired consent-request tokens so the UI can show them as
     such. Does NOT delete — the audit trail lives forever. We also
     write a ledger event `runbook.request_expired` so there's a
@@ -2256,37 +2196,25 @@ async def expire_consent_request_tokens_loop():
     Rate: 1 hour. Tokens expire at 72h so at most 1 hour of stale
     "pending" state before the UI catches up.
     """
-    await asyncio.sleep(300)  # let startup settle
-    while True:
-        _hb("expire_consent_request_tokens")
-        try:
-            from dashboard_api.fleet import get_pool
-            from dashboard_api.tenant_middleware import admin_connection
-            pool = await get_pool()
-            async with admin_connection(pool) as conn:
-                # No actual state mutation — expiry is computed on read
-                # (expires_at < NOW() AND consumed_at IS NULL). But we
-                # can emit ledger events for tokens that transitioned
-                # into expired-but-not-notified state. Keep it lean:
-                # just count them for telemetry.
-                n = await conn.fetchval(
-                    """
-                    SELECT COUNT(*) FROM consent_request_tokens
-                    WHERE consumed_at IS NULL
-                      AND expires_at < NOW()
-                      AND expires_at > NOW() - INTERVAL '1 hour 10 minutes'
-                    """
-                )
-                if n and int(n) > 0:
-                    logger.info(f"consent_request_tokens_expired_in_last_hour count={int(n)}")
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(
-                f"expire_consent_request_tokens_loop iteration failed: {e}",
-                exc_info=True,
-            )
-        await asyncio.sleep(CONSENT_TOKEN_EXPIRY_CHECK_SECONDS)
+    from dashboard_api.fleet import get_pool
+    from dashboard_api.tenant_middleware import admin_connection
+    pool = await get_pool()
+    async with admin_connection(pool) as conn:
+        # No actual state mutation — expiry is computed on read
+        # (expires_at < NOW() AND consumed_at IS NULL). But we
+        # can emit ledger events for tokens that transitioned
+        # into expired-but-not-notified state. Keep it lean:
+        # just count them for telemetry.
+        n = await conn.fetchval(
+            """
+            SELECT COUNT(*) FROM consent_request_tokens
+            WHERE consumed_at IS NULL
+              AND expires_at < NOW()
+              AND expires_at > NOW() - INTERVAL '1 hour 10 minutes'
+            """
+        )
+        if n and int(n) > 0:
+            logger.info(f"consent_request_tokens_expired_in_last_hour count={int(n)}")
 
 
 # =============================================================================
@@ -2297,21 +2225,121 @@ HEARTBEAT_ROLLUP_REFRESH_SECONDS = 60
 HEARTBEAT_PARTITION_CHECK_SECONDS = 3600  # hourly — partition creation is cheap
 HEARTBEAT_PARTITION_LOOKAHEAD_MONTHS = 2
 
+# Migration 333 downsampled rollups. Raw rows younger than the lag are
+# left for the next tick (a checkin transaction may still be open);
+# one tick never consumes more than MAX_STEP so catch-up stays bounded.
+HEARTBEAT_ROLLUP_LAG_SECONDS = 120
+HEARTBEAT_ROLLUP_MAX_STEP_SECONDS = 6 * 3600
+HEARTBEAT_ROLLUP_PRUNE_SECONDS = 3600
+HEARTBEAT_1M_RETENTION_HOURS = 48
+HEARTBEAT_1H_RETENTION_DAYS = 400
+
+# One range scan over (watermark, upper] — partition pruning keeps it on
+# the newest partition — feeding both granularities. Counts are added to
+# existing buckets, so each raw row must be consumed exactly once: the
+# watermark moves in the same transaction.
+_HEARTBEAT_ROLLUP_SQL = """
+    WITH raw AS (
+        SELECT appliance_id, site_id, observed_at, status
+          FROM appliance_heartbeats
+         WHERE observed_at > $1 AND observed_at <= $2
+    ), m AS (
+        INSERT INTO appliance_heartbeat_1m AS t
+            (appliance_id, bucket, site_id, checkin_count, online_count, last_observed_at)
+        SELECT appliance_id, date_trunc('minute', observed_at), MAX(site_id),
+               COUNT(*), COUNT(*) FILTER (WHERE status = 'online'), MAX(observed_at)
+          FROM raw
+         GROUP BY 1, 2
+        ON CONFLICT (appliance_id, bucket) DO UPDATE SET
+            checkin_count = t.checkin_count + EXCLUDED.checkin_count,
+            online_count = t.online_count + EXCLUDED.online_count,
+            last_observed_at = GREATEST(t.last_observed_at, EXCLUDED.last_observed_at)
+    ), h AS (
+        INSERT INTO appliance_heartbeat_1h AS t
+            (appliance_id, bucket, site_id, checkin_count, online_count, last_observed_at)
+        SELECT appliance_id, date_trunc('hour', observed_at), MAX(site_id),
+               COUNT(*), COUNT(*) FILTER (WHERE status = 'online'), MAX(observed_at)
+          FROM raw
+         GROUP BY 1, 2
+        ON CONFLICT (appliance_id, bucket) DO UPDATE SET
+            checkin_count = t.checkin_count + EXCLUDED.checkin_count,
+            online_count = t.online_count + EXCLUDED.online_count,
+            last_observed_at = GREATEST(t.last_observed_at, EXCLUDED.last_observed_at)
+    )
+    SELECT COUNT(*) FROM raw
+"""
+
+
+async def _advance_heartbeat_rollups(conn) -> int:
+    """Fold heartbeats newer than the watermark into the 1m/1h tables.
+    Must run inside a transaction. Returns raw rows consumed."""
+    row = await conn.fetchrow(
+        """
+        SELECT watermark,
+               LEAST(NOW() - make_interval(secs => $1),
+                     watermark + make_interval(secs => $2)) AS upper
+          FROM heartbeat_rollup_state
+         WHERE name = 'appliance_heartbeats'
+           FOR UPDATE
+        """,
+        HEARTBEAT_ROLLUP_LAG_SECONDS,
+        HEARTBEAT_ROLLUP_MAX_STEP_SECONDS,
+    )
+    if row is None or row["upper"] <= row["watermark"]:
+        return 0
+    consumed = await conn.fetchval(_HEARTBEAT_ROLLUP_SQL, row["watermark"], row["upper"])
+    await conn.execute(
+        "UPDATE heartbeat_rollup_state SET watermark = $1 WHERE name = 'appliance_heartbeats'",
+        row["upper"],
+    )
+    return consumed or 0
+
+
+async def _prune_heartbeat_rollups(conn) -> None:
+    await conn.execute(
+        "DELETE FROM appliance_heartbeat_1m WHERE bucket < NOW() - make_interval(hours => $1)",
+        HEARTBEAT_1M_RETENTION_HOURS,
+    )
+    await conn.execute(
+        "DELETE FROM appliance_heartbeat_1h WHERE bucket < NOW() - make_interval(days => $1)",
+        HEARTBEAT_1H_RETENTION_DAYS,
+    )
+
 
 async def heartbeat_rollup_loop():
-    """Refresh the appliance_status_rollup materialized view every 60s.
+    """Advance the heartbeat rollups, then refresh appliance_status_rollup,
+    every 60s.
+
+    Migration 333: the 1m/1h tables are advanced incrementally from a
+    watermark (only new raw rows are read). The MV reads those plus
+    appliance_last_seen, so its refresh no longer scans a day of raw
+    heartbeats per appliance.
 
     Using REFRESH MATERIALIZED VIEW CONCURRENTLY so dashboard readers
     never block on the refresh. Requires the unique index on
     appliance_id (created by Migration 191).
     """
     from dashboard_api.fleet import get_pool
-    from dashboard_api.tenant_middleware import admin_connection
+    from dashboard_api.tenant_middleware import admin_connection, admin_transaction
 
+    last_prune = 0.0
     # Seed the view shortly after startup so dashboards have data.
     await asyncio.sleep(30)
     while True:
         _hb("heartbeat_rollup")
+        try:
+            pool = await get_pool()
+            # admin_transaction: watermark lock, rollup CTE, watermark
+            # UPDATE (+ hourly prune) must commit together.
+            async with admin_transaction(pool) as conn:
+                await _advance_heartbeat_rollups(conn)
+                if time.monotonic() - last_prune >= HEARTBEAT_ROLLUP_PRUNE_SECONDS:
+                    await _prune_heartbeat_rollups(conn)
+                    last_prune = time.monotonic()
+        except asyncio.CancelledError:
+            break
+        except Exception:
+            logger.error("heartbeat_rollup advance failed", exc_info=True)
         try:
             pool = await get_pool()
             async with admin_connection(pool) as conn:
@@ -2344,7 +2372,7 @@ def _migration_db_url() -> str:
     return url
 
 
-async def heartbeat_partition_maintainer_loop():
+async def heartbeat_partition_maintainer_tick():
     """Ensure next N months of appliance_heartbeats partitions exist.
 
     Runs hourly. Idempotent — CREATE TABLE IF NOT EXISTS.
@@ -2357,42 +2385,30 @@ async def heartbeat_partition_maintainer_loop():
     """
     import asyncpg as _asyncpg
 
-    await asyncio.sleep(120)
-    while True:
-        _hb("heartbeat_partition_maintainer")
-        try:
-            conn = await _asyncpg.connect(_migration_db_url())
-            try:
-                await conn.execute(f"""
-                    DO $$
-                    DECLARE
-                        i INTEGER;
-                        cur_start DATE;
-                        next_start DATE;
-                        part_name TEXT;
-                    BEGIN
-                        FOR i IN 0..{HEARTBEAT_PARTITION_LOOKAHEAD_MONTHS} LOOP
-                            cur_start := (date_trunc('month', NOW()) + (i || ' month')::interval)::date;
-                            next_start := (date_trunc('month', NOW()) + ((i+1) || ' month')::interval)::date;
-                            part_name := 'appliance_heartbeats_y' || to_char(cur_start, 'YYYYmm');
-                            EXECUTE format(
-                                'CREATE TABLE IF NOT EXISTS %I PARTITION OF appliance_heartbeats FOR VALUES FROM (%L) TO (%L)',
-                                part_name, cur_start, next_start
-                            );
-                        END LOOP;
-                    END
-                    $$;
-                """)
-            finally:
-                await conn.close()
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(
-                f"heartbeat_partition_maintainer iteration failed: {e}",
-                exc_info=True,
-            )
-        await asyncio.sleep(HEARTBEAT_PARTITION_CHECK_SECONDS)
+    conn = await _asyncpg.connect(_migration_db_url())
+    try:
+        await conn.execute(f"""
+            DO $$
+            DECLARE
+                i INTEGER;
+                cur_start DATE;
+                next_start DATE;
+                part_name TEXT;
+            BEGIN
+                FOR i IN 0..{HEARTBEAT_PARTITION_LOOKAHEAD_MONTHS} LOOP
+                    cur_start := (date_trunc('month', NOW()) + (i || ' month')::interval)::date;
+                    next_start := (date_trunc('month', NOW()) + ((i+1) || ' month')::interval)::date;
+                    part_name := 'appliance_heartbeats_y' || to_char(cur_start, 'YYYYmm');
+                    EXECUTE format(
+                        'CREATE TABLE IF NOT EXISTS %I PARTITION OF appliance_heartbeats FOR VALUES FROM (%L) TO (%L)',
+                        part_name, cur_start, next_start
+                    );
+                END LOOP;
+            END
+            $$;
+        """)
+    finally:
+        await conn.close()
 
 
 # =============================================================================
@@ -2435,7 +2451,11 @@ async def phantom_detector_loop():
             async with admin_connection(pool) as conn:
                 # Appliances whose last_checkin is recent BUT heartbeats
                 # are stale (or missing entirely). These are lies by one
-                # of the two signals.
+                # of the two signals. Heartbeat side reads the mig 333
+                # appliance_last_seen summary: trigger-maintained from
+                # every heartbeat INSERT (never from last_checkin), so the
+                # check stays orthogonal without a MAX(observed_at) over
+                # every raw partition.
                 suspects = await conn.fetch("""
                     SELECT
                         sa.site_id,
@@ -2448,11 +2468,10 @@ async def phantom_detector_loop():
                         hb.max_observed_at,
                         EXTRACT(EPOCH FROM (NOW() - COALESCE(hb.max_observed_at, sa.last_checkin - INTERVAL '1 year')))::int AS heartbeat_stale_sec
                     FROM site_appliances sa
-                    LEFT JOIN LATERAL (
-                        SELECT MAX(observed_at) AS max_observed_at
-                        FROM appliance_heartbeats
-                        WHERE appliance_id = sa.appliance_id
-                    ) hb ON true
+                    LEFT JOIN (
+                        SELECT appliance_id, last_heartbeat_at AS max_observed_at
+                        FROM appliance_last_seen
+                    ) hb ON hb.appliance_id = sa.appliance_id
                     WHERE sa.deleted_at IS NULL
                       AND sa.last_checkin > NOW() - INTERVAL '5 minutes'
                       AND (
@@ -2615,45 +2634,32 @@ async def _raise_liveness_lie_if_not_suppressed(conn, row):
         )
 
 
-async def client_telemetry_retention_loop():
-    """Delete client_telemetry_events older than 30 days, every 24h.
+CLIENT_TELEMETRY_RETENTION_SECONDS = 86400  # 24h
+CLIENT_TELEMETRY_RETENTION_DAYS = 30
+
+
+async def client_telemetry_retention_tick():
+    """Delete client_telemetry_events older than 30 days.
 
     Session 210 round-table #5. The telemetry table's docstring claims
-    30-day retention; this loop actually enforces it. Calls Migration 243's
+    30-day retention; this tick actually enforces it. Calls Migration 243's
     prune_client_telemetry_events(30) function. Safe to run from any
-    replica — the function is idempotent.
-
-    Startup delay: 10 min. Avoids running during the post-boot migration
-    storm. Tolerates the pre-migration-243 window by logging + sleeping.
+    replica — the function is idempotent. Pre-migration-243 the function
+    doesn't exist; the tick fails and the next one retries.
     """
-    _hb("client_telemetry_retention")
-    await asyncio.sleep(600)
-    while True:
-        _hb("client_telemetry_retention")
-        try:
-            async with async_session() as db:
-                result = await db.execute(
-                    text("SELECT prune_client_telemetry_events(30) AS deleted")
-                )
-                deleted = result.scalar() or 0
-                await db.commit()
-                if deleted > 0:
-                    logger.info(
-                        "client_telemetry_retention pruned old events",
-                        deleted_count=int(deleted),
-                        retention_days=30,
-                    )
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            # Pre-migration-243 case: function doesn't exist. Log once,
-            # keep sleeping. Next container restart catches the migration.
-            logger.error(
-                "client_telemetry_retention_failed",
-                exc_info=True,
-                extra={"error_class": type(e).__name__},
+    async with async_session() as db:
+        result = await db.execute(
+            text("SELECT prune_client_telemetry_events(:days) AS deleted"),
+            {"days": CLIENT_TELEMETRY_RETENTION_DAYS},
+        )
+        deleted = result.scalar() or 0
+        await db.commit()
+        if deleted > 0:
+            logger.info(
+                "client_telemetry_retention pruned old events",
+                deleted_count=int(deleted),
+                retention_days=CLIENT_TELEMETRY_RETENTION_DAYS,
             )
-        await asyncio.sleep(86400)  # 24h
 
 
 async def data_hygiene_gc_loop():
@@ -2765,3 +2771,48 @@ async def relocation_finalize_loop():
             await asyncio.sleep(60)
         except asyncio.CancelledError:
             return
+
+
+# =============================================================================
+# Scheduler-driven maintenance ticks
+# =============================================================================
+# The periodic maintenance jobs above are single-run ticks rather than
+# self-timed loops: the scheduler owns their cadence, bounds each run by
+# timeout_s, counts failures and records the heartbeat with the run
+# duration. start_delay_s keeps each job's old startup grace period
+# (migrations settle first) instead of waiting a full interval after
+# every restart. conn_budget=0 for the DDL ticks — they open their own
+# direct superuser connection, not a pool connection.
+
+
+def maintenance_tick_jobs() -> list:
+    """JobSpecs for the periodic maintenance ticks (wired in main.py)."""
+    from .job_scheduler import JobSpec
+
+    return [
+        JobSpec(
+            name="partition_maintainer", fn=partition_maintainer_tick, kind="tick",
+            interval_s=PARTITION_MAINTAINER_INTERVAL_SECONDS, start_delay_s=600,
+            jitter_s=300, timeout_s=300, conn_budget=0,
+        ),
+        JobSpec(
+            name="weekly_rollup_refresh", fn=weekly_rollup_refresh_tick, kind="tick",
+            interval_s=WEEKLY_ROLLUP_REFRESH_SECONDS, start_delay_s=120,
+            jitter_s=60, timeout_s=20 * 60, conn_budget=0,
+        ),
+        JobSpec(
+            name="expire_consent_request_tokens", fn=expire_consent_request_tokens_tick,
+            kind="tick", interval_s=CONSENT_TOKEN_EXPIRY_CHECK_SECONDS, start_delay_s=300,
+            jitter_s=60, timeout_s=60,
+        ),
+        JobSpec(
+            name="heartbeat_partition_maintainer", fn=heartbeat_partition_maintainer_tick,
+            kind="tick", interval_s=HEARTBEAT_PARTITION_CHECK_SECONDS, start_delay_s=120,
+            jitter_s=60, timeout_s=300, conn_budget=0,
+        ),
+        JobSpec(
+            name="client_telemetry_retention", fn=client_telemetry_retention_tick,
+            kind="tick", interval_s=CLIENT_TELEMETRY_RETENTION_SECONDS, start_delay_s=600,
+            jitter_s=300, timeout_s=600,
+        ),
+    ]
@@ -30,9 +30,28 @@ from typing import Dict, Any
 
 _lock = threading.Lock()
 _heartbeats: Dict[str, Dict[str, Any]] = {}
-
-
-def record_heartbeat(loop_name: str, *, ok: bool = True) -> None:
+# Leader-elected jobs (job_scheduler.py) that another replica currently
+# owns. Their last heartbeat here goes stale by design, so staleness is
+# reported as 'standby' instead of 'stale'.
+_standby: set = set()
+
+
+def _entry(loop_name: str, now: float) -> Dict[str, Any]:
+    return _heartbeats.setdefault(loop_name, {
+        "loop_name": loop_name,
+        "first_seen": now,
+        "last_seen": now,
+        "iterations": 0,
+        "errors": 0,
+        "overlaps": 0,
+        "last_duration_s": None,
+        "max_duration_s": None,
+    })
+
+
+def record_heartbeat(
+    loop_name: str, *, ok: bool = True, duration_s: float | None = None,
+) -> None:
     """Mark a loop iteration as having just completed.
 
     Args:
@@ -40,20 +59,39 @@ def record_heartbeat(loop_name: str, *, ok: bool = True) -> None:
         ok: True if the iteration succeeded, False if it caught and
             handled an exception. Both update last_seen but the latter
             increments error_count for visibility.
+        duration_s: wall time of the iteration, when the caller knows
+            it (job_scheduler tick jobs always pass it).
     """
     now = time.time()
     with _lock:
-        entry = _heartbeats.setdefault(loop_name, {
-            "loop_name": loop_name,
-            "first_seen": now,
-            "last_seen": now,
-            "iterations": 0,
-            "errors": 0,
-        })
+        entry = _entry(loop_name, now)
         entry["last_seen"] = now
         entry["iterations"] += 1
         if not ok:
             entry["errors"] += 1
+        if duration_s is not None:
+            entry["last_duration_s"] = round(duration_s, 4)
+            entry["max_duration_s"] = round(
+                max(duration_s, entry["max_duration_s"] or 0.0), 4,
+            )
+
+
+def record_overlap(loop_name: str) -> None:
+    """Count a scheduled run skipped because the previous one was still
+    in flight. A steadily climbing count means the job's runtime has
+    outgrown its interval."""
+    with _lock:
+        _entry(loop_name, time.time())["overlaps"] += 1
+
+
+def set_standby(loop_name: str, standby: bool) -> None:
+    """Mark a leader-elected job as owned (False) or not owned (True)
+    by this process."""
+    with _lock:
+        if standby:
+            _standby.add(loop_name)
+        else:
+            _standby.discard(loop_name)
 
 
 def get_all_heartbeats() -> Dict[str, Dict[str, Any]]:
@@ -65,6 +103,7 @@ def get_all_heartbeats() -> Dict[str, Dict[str, Any]]:
             out[name] = {
                 **entry,
                 "age_s": round(now - entry["last_seen"], 2),
+                "standby": name in _standby,
             }
     return out
 
@@ -95,7 +134,7 @@ EXPECTED_INTERVAL_S: Dict[str, int] = {
     "healing_sla": 3600,  # healing_sla.py:35 sleeps 3600 (hourly)
     "recurrence_velocity": 300,
     "recurrence_auto_promotion": 3600,
-    "cross_incident_correlation": 3600,
+    "cross_incident_correlation": 120,  # background_tasks.py CROSS_INCIDENT_CORRELATION_INTERVAL_SECONDS
     "temporal_decay": 21600,  # background_tasks.py:566 sleeps 21600 (6h)
     "regime_change_detector": 1800,  # background_tasks.py:922 sleeps 1800 (30 min)
     "threshold_tuner": 86400,
@@ -126,7 +165,7 @@ EXPECTED_INTERVAL_S: Dict[str, int] = {
     "heartbeat_partition_maintainer": 3600,     # HEARTBEAT_PARTITION_CHECK_SECONDS
     "mesh_reassignment": 300,                   # MESH_REBALANCE_INTERVAL_SECONDS
     "sigauth_auto_promotion": 300,              # AUTO_PROMOTE_INTERVAL_SECONDS env default
-    "client_telemetry_retention": 86400,        # 24h
+    "client_telemetry_retention": 86400,        # CLIENT_TELEMETRY_RETENTION_SECONDS
     "data_hygiene_gc": 86400,                   # 24h
     "relocation_finalize": 60,                  # 60s post-startup tick
     # 2026-05-12 BUG 2 followup — 5 main.py-inline loops (lifespan nested
@@ -137,6 +176,8 @@ EXPECTED_INTERVAL_S: Dict[str, int] = {
     "unregistered_device_alerts": 3600,         # background_tasks.unregistered_device_alert_loop — hourly
     "partner_payout": 3600,                     # main.py:_partner_payout_loop — hourly catch-up
     "flywheel_federation_snapshot": 86400,      # main.py:_flywheel_federation_snapshot_loop — daily
+    "metrics_collector": 15,                    # prometheus_metrics.METRICS_COLLECTOR_TICK_SECONDS
+    "health_snapshot": 30,                      # fleet.HEALTH_SNAPSHOT_TICK_SECONDS
 }
 
 # Loops with dynamic/work-driven cadence that don't have a single static
@@ -155,12 +196,16 @@ DYNAMIC_LOOPS: set = {
 # treats them as 'fresh' as long as the loop is still registered.
 DRAIN_LOOPS: set = {
     "ots_resubmit",
+    "perf_cache_invalidation",  # perf_cache.py — blocks on Redis pub/sub
 }
 
 
 def assess_staleness(entry: Dict[str, Any]) -> str:
-    """Returns 'fresh' | 'stale' | 'unknown' for a heartbeat entry."""
+    """Returns 'fresh' | 'stale' | 'unknown' | 'standby' for a heartbeat entry."""
     name = entry["loop_name"]
+    if entry.get("standby"):
+        # Another replica holds this job's leader lock.
+        return "standby"
     if name in DRAIN_LOOPS:
         # Drain loops heartbeat when work shows up; idle is healthy.
         return "fresh"
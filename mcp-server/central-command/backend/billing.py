@@ -18,15 +18,13 @@ from .fleet import get_pool
 from .tenant_middleware import admin_connection, admin_transaction
 from .partners import require_partner
 from .db_utils import _uid
+from .lazy_imports import module_available, stripe
 
 logger = logging.getLogger(__name__)
 
-# Try to import stripe
-try:
-    import stripe
-    HAS_STRIPE = True
-except ImportError:
-    HAS_STRIPE = False
+# stripe is imported by the first billing call, not at startup
+HAS_STRIPE = module_available("stripe")
+if not HAS_STRIPE:
     logger.warning("stripe library not installed - billing endpoints will be disabled")
 
 
@@ -61,10 +59,6 @@ PARTNER_PLAN_CATALOG = {
     },
 }
 
-if HAS_STRIPE and STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
-
-
 router = APIRouter(prefix="/api/billing", tags=["billing"])
 
 
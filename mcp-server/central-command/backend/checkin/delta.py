@@ -0,0 +1,168 @@
+"""
+Delta checkins: skip checkin sections that have not changed.
+
+The Go daemon checks in every cycle with its full state. For a steady-
+state appliance most of it is identical to the previous checkin, yet
+appliance_checkin re-ran the steps that consume it: the per-agent
+go_agents upserts and workstation sync (STEP 3.7 / 3.7c) and the two
+signing-key lookups (STEP 3.6 / 3.6c).
+
+Protocol (version 1), negotiated by the server:
+  - every response carries `checkin_delta = {version, ack, resync}`,
+    where `ack` maps section name -> the hash the server last processed
+    for this appliance (site_appliances.checkin_section_hashes, mig 337)
+  - a daemon that has seen `checkin_delta` sends `section_hashes` for
+    every section below and lists in `omitted_sections` the ones whose
+    hash equals the acknowledged one, leaving their fields out
+  - an omitted section whose hash matches the stored one is skipped
+    (STEP 3.7 falls back to a cheap liveness touch); one whose hash
+    doesn't match (lost ack, restored DB) is also skipped, but the
+    response sets `resync` so the daemon sends everything next cycle
+
+The connected_agents ack also stores the agent_ids it covered, so the
+liveness touch restamps exactly this appliance's agents: a site-wide
+touch would keep other appliances' (possibly stale) agents alive.
+
+Hashes are computed by the daemon and taken as-is: they are cache keys
+over data the authenticated appliance sends anyway, and Go and Python
+JSON serialisation differ, so the server never recomputes them. A
+section whose step failed is not acknowledged, so it is sent again.
+
+Daemons that don't send `section_hashes` get the full-processing path
+unchanged.
+"""
+
+from dataclasses import dataclass, field
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DELTA_PROTOCOL_VERSION = 1
+
+# Section name -> ApplianceCheckin fields it covers. Only sections whose
+# steps are pure functions of their fields belong here; liveness fields
+# (ip_addresses, wg_*, daemon_health, uptime) and one-shot drains
+# (deploy/discovery results, bundle hashes) are always sent.
+SECTIONS: Dict[str, tuple] = {
+    "connected_agents": ("connected_agents",),
+    "signing_keys": ("agent_public_key", "agent_identity_public_key"),
+}
+
+# Key in checkin_section_hashes holding the agent_ids acknowledged with
+# the connected_agents hash. Not a section: plan_sections ignores it.
+AGENT_IDS_KEY = "connected_agent_ids"
+
+
+@dataclass
+class SectionPlan:
+    """What appliance_checkin should do with each delta section."""
+    unchanged: Set[str] = field(default_factory=set)
+    unknown: Set[str] = field(default_factory=set)
+    # Hashes to acknowledge once the steps have run
+    ack: Dict[str, str] = field(default_factory=dict)
+    stored: Dict[str, str] = field(default_factory=dict)
+    failed: Set[str] = field(default_factory=set)
+    # go_agents acknowledged with the connected_agents hash: the stored
+    # set while the section is unchanged, the checkin's set once processed
+    agent_ids: List[str] = field(default_factory=list)
+    stored_agent_ids: Optional[List[str]] = None
+
+    def skip(self, section: str) -> bool:
+        """True if the section was omitted and its step should not run."""
+        return section in self.unchanged or section in self.unknown
+
+    def mark_failed(self, section: str) -> None:
+        self.failed.add(section)
+
+    @property
+    def resync(self) -> bool:
+        return bool(self.unknown)
+
+    def final_ack(self) -> Dict[str, str]:
+        return {k: v for k, v in self.ack.items() if k not in self.failed}
+
+    def stored_state(self) -> Dict[str, Any]:
+        """The checkin_section_hashes value this checkin acknowledges."""
+        state: Dict[str, Any] = dict(self.final_ack())
+        if "connected_agents" in state:
+            state[AGENT_IDS_KEY] = sorted(set(self.agent_ids))
+        return state
+
+    def response(self) -> Dict[str, Any]:
+        return {
+            "version": DELTA_PROTOCOL_VERSION,
+            "ack": self.final_ack(),
+            "resync": self.resync,
+        }
+
+
+def plan_sections(
+    declared: Optional[Dict[str, str]],
+    omitted: Optional[Iterable[str]],
+    stored: Optional[Dict[str, str]],
+) -> SectionPlan:
+    """Classify the delta sections of one checkin.
+
+    declared: section -> hash from the request (None for legacy daemons)
+    omitted: sections the daemon left out as unchanged
+    stored: the hashes acknowledged on the previous checkin
+    """
+    raw = stored or {}
+    stored_ids = raw.get(AGENT_IDS_KEY)
+    plan = SectionPlan(
+        stored={k: v for k, v in raw.items() if k in SECTIONS},
+        stored_agent_ids=(
+            [str(a) for a in stored_ids] if isinstance(stored_ids, list) else None
+        ),
+    )
+    if not declared:
+        return plan
+
+    omitted_set = set(omitted or ())
+    for section, digest in declared.items():
+        if section not in SECTIONS or not isinstance(digest, str) or not digest:
+            continue
+        if section in omitted_set:
+            # An agents ack without its agent_ids (written before they
+            # were stored) can't scope the liveness touch: resync.
+            known = plan.stored.get(section) == digest and (
+                section != "connected_agents" or plan.stored_agent_ids is not None
+            )
+            if known:
+                plan.unchanged.add(section)
+                plan.ack[section] = digest
+                if section == "connected_agents":
+                    plan.agent_ids = list(plan.stored_agent_ids)
+            else:
+                plan.unknown.add(section)
+        else:
+            plan.ack[section] = digest
+    return plan
+
+
+async def load_section_hashes(conn, appliance_id: str) -> Dict[str, str]:
+    raw = await conn.fetchval(
+        "SELECT checkin_section_hashes FROM site_appliances "
+        "WHERE appliance_id = $1 AND deleted_at IS NULL",
+        appliance_id,
+    )
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    return raw if isinstance(raw, dict) else {}
+
+
+async def store_section_hashes(conn, appliance_id: str, plan: SectionPlan) -> None:
+    """Persist the acknowledged hashes; no write when nothing changed."""
+    state = plan.stored_state()
+    previous: Dict[str, Any] = dict(plan.stored)
+    if plan.stored_agent_ids is not None:
+        previous[AGENT_IDS_KEY] = sorted(set(plan.stored_agent_ids))
+    if state == previous:
+        return
+    await conn.execute(
+        "UPDATE site_appliances SET checkin_section_hashes = $1::jsonb "
+        "WHERE appliance_id = $2",
+        json.dumps(state, sort_keys=True), appliance_id,
+    )
@@ -22,21 +22,15 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from .client_portal import require_client_user
+from .lazy_imports import module_available, stripe
 
 logger = logging.getLogger("client_billing")
 
 router = APIRouter(prefix="/api/billing/client", tags=["billing-client"])
 
-try:
-    import stripe
-    HAS_STRIPE = True
-except ImportError:
-    HAS_STRIPE = False
-    stripe = None  # type: ignore
+HAS_STRIPE = module_available("stripe")
 
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
-if HAS_STRIPE and STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
 
 
 def _check_stripe() -> None:
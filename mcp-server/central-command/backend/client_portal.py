@@ -32,18 +32,12 @@ from fastapi.responses import RedirectResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
 import httpx
 
-# Stripe integration (optional - graceful fallback if not installed)
-try:
-    import stripe
-    STRIPE_AVAILABLE = True
-except ImportError:
-    stripe = None
-    STRIPE_AVAILABLE = False
-
 from .fleet import get_pool
 from .db_utils import _uid
 from .tenant_middleware import tenant_connection, admin_connection, admin_transaction, org_connection  # noqa: F401
 from .phi_boundary import sanitize_evidence_checks
+from .conditional_get import CLIENT_DASHBOARD, check_not_modified
+from .lazy_imports import module_available, stripe
 
 logger = logging.getLogger(__name__)
 
@@ -107,9 +101,12 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_PRICE_ID = os.getenv("STRIPE_PRICE_ID", "")  # Default subscription price
 
-# Initialize Stripe
+# Stripe integration (optional - graceful fallback if not installed).
+# The SDK is imported by the first billing call, not at startup.
+STRIPE_AVAILABLE = module_available("stripe")
+
+
 if STRIPE_AVAILABLE and STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
     logger.info("Stripe integration enabled")
 
 
@@ -724,12 +721,24 @@ async def get_current_user(user: dict = Depends(require_client_user)):
 # =============================================================================
 
 @auth_router.get("/dashboard")
-async def get_dashboard(user: dict = Depends(require_client_user)):
-    """Get dashboard overview for client org."""
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    user: dict = Depends(require_client_user),
+):
+    """Get dashboard overview for client org.
+
+    Conditional: answers 304 from change_versions before the score
+    computation. Unchanged polls skip the canonical-metrics sampler.
+    """
     pool = await get_pool()
     org_id = user["org_id"]
 
     async with org_connection(pool, org_id=org_id) as conn:
+        await check_not_modified(
+            request, response, conn, CLIENT_DASHBOARD, str(org_id),
+        )
+
         # Get org details
         org = await conn.fetchrow("""
             SELECT co.*, p.name as partner_name, p.brand_name as partner_brand
@@ -82,9 +82,11 @@ import asyncpg
 try:
     from .templates import render_template
     from .client_privacy_officer import get_current as get_current_po
+    from .compliance_analytics import get_period_analytics
 except ImportError:  # pytest path
     from templates import render_template  # type: ignore
     from client_privacy_officer import get_current as get_current_po  # type: ignore
+    from compliance_analytics import get_period_analytics  # type: ignore
 
 logger = logging.getLogger(__name__)
 
@@ -342,8 +344,10 @@ async def _compute_quarterly_facts(
 
     # Mean compliance score across the period — pass/fail/warn from
     # latest-result-per (site, check_type, hostname) bounded BY the
-    # period window. Inline because compute_compliance_score uses
-    # NOW()-window_days, which can't take a fixed past quarter.
+    # period window. Not compute_compliance_score: that uses
+    # NOW()-window_days, which can't take a fixed past quarter. The
+    # latest-result tally comes from compliance_analytics (one load per
+    # org and quarter, shared with any other report over the same period).
     mean_score: Optional[int] = None
     sites_in_org = await conn.fetch(
         """
@@ -355,42 +359,11 @@ async def _compute_quarterly_facts(
     )
     site_ids: List[str] = [r["site_id"] for r in sites_in_org]
     if site_ids:
-        score_rows = await conn.fetch(
-            """
-            WITH unnested AS (
-                SELECT
-                    cb.site_id,
-                    cb.checked_at,
-                    c->>'check'    AS check_type,
-                    c->>'status'   AS check_status,
-                    COALESCE(c->>'hostname', c->>'host', '') AS hostname
-                  FROM compliance_bundles cb,
-                       jsonb_array_elements(cb.checks) AS c
-                 WHERE cb.site_id = ANY($1)
-                   AND cb.checked_at >= $2 AND cb.checked_at < $3
-            ),
-            latest AS (
-                SELECT DISTINCT ON (site_id, check_type, hostname)
-                    site_id, check_type, check_status, hostname, checked_at
-                  FROM unnested
-                 ORDER BY site_id, check_type, hostname, checked_at DESC
-            )
-            SELECT check_status FROM latest
-            """,
-            site_ids, period_start, period_end,
-        )
-        passed = sum(
-            1 for r in score_rows
-            if (r["check_status"] or "").lower() in ("pass", "compliant", "ok")
-        )
-        failed = sum(
-            1 for r in score_rows
-            if (r["check_status"] or "").lower() in ("non_compliant", "fail")
-        )
-        warnings = sum(
-            1 for r in score_rows
-            if (r["check_status"] or "").lower() == "warning"
-        )
+        analytics = await get_period_analytics(conn, site_ids, period_start, period_end)
+        latest = analytics.latest_status_counts(site_ids)
+        passed = latest.get("pass", 0) + latest.get("compliant", 0) + latest.get("ok", 0)
+        failed = latest.get("non_compliant", 0) + latest.get("fail", 0)
+        warnings = latest.get("warning", 0)
         # Warnings count as half-pass per the canonical scoring posture.
         denom = passed + failed + warnings
         if denom > 0:
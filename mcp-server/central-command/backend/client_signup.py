@@ -37,6 +37,7 @@ from pydantic import BaseModel, EmailStr, Field, field_validator
 
 from .fleet import get_pool
 from .tenant_middleware import admin_connection, admin_transaction
+from .lazy_imports import module_available, stripe
 
 try:
     from .shared import check_rate_limit
@@ -60,16 +61,9 @@ router = APIRouter(prefix="/api/billing/signup", tags=["billing-signup"])
 
 # ─── Stripe guards ────────────────────────────────────────────────
 
-try:
-    import stripe
-    HAS_STRIPE = True
-except ImportError:
-    HAS_STRIPE = False
-    stripe = None  # type: ignore
+HAS_STRIPE = module_available("stripe")
 
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
-if HAS_STRIPE and STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
 
 
 def _check_stripe() -> None:
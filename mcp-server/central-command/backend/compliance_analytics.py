@@ -0,0 +1,525 @@
+"""Columnar compliance analytics shared by the period report generators.
+
+The monthly packet (compliance_packet.CompliancePacket), the portal
+monthly report (db_queries.get_monthly_compliance_report) and the F3
+quarterly summary (client_quarterly_summary) each walked
+compliance_bundles.checks for their own site and period — the monthly
+report row-by-row in Python over every bundle's JSONB, the packet with
+two more unnest scans per site. At month end the packet loop does that
+for every site in the fleet.
+
+PeriodAnalytics loads a set of sites (normally one client org) for one
+period ONCE, as three set-based reads, into NumPy columns:
+
+  check counts   (site, day, check_type, status) -> count, last checked_at
+  bundles        one row per bundle: site, checked_at, scored
+                 pass / warning / fail counts (lower-cased statuses)
+  latest         latest status per (site, check_type, hostname), with
+                 the bundle it came from
+
+Every aggregate the generators need — per-site/per-check status counts,
+per-category scores, per-day scores, the first-half/second-half trend,
+latest-result tallies — is derived from those columns with array ops
+over all sites at once. Each generator keeps its own scoring formula;
+this module only supplies the counts.
+
+All reads bound checked_at to the period and created_at from below by
+period start minus PARTITION_GRACE (compliance_bundles is partitioned on
+created_at; a bundle belongs to the month it was CHECKED). Only the
+lower bound is safe: a bundle is ingested after it is checked, so every
+partition before the period is pruned, but an appliance that was
+offline can upload weeks late and the HIPAA monthly and quarterly
+reports must still count it. Unlike compliance_packet's #70 window,
+created_at has no upper bound.
+
+get_period_analytics() keeps a small per-process LRU of CLOSED periods
+(period end plus grace in the past). Entries expire after
+CACHE_TTL_SECONDS: a late upload can still land in a closed period, and
+each worker holds its own copy, so a cached load is only trusted for a
+few minutes. A request for a single site is served from any cached org
+load that contains it, so the month-end packet loop loads each org once
+and the portal report for the same month reuses it.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PARTITION_GRACE = timedelta(days=7)
+CACHE_MAX_ENTRIES = 8
+CACHE_TTL_SECONDS = 300.0
+
+# Status classes used for scored tallies (case-insensitive, matching
+# the monthly report's `.lower()` and the bundles query's lower()).
+SCORE_PASS = ("pass", "compliant")
+SCORE_WARNING = ("warning",)
+SCORE_FAIL = ("fail", "non_compliant")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_BUNDLE_FILTER = """
+   cb.site_id = ANY(:site_ids)
+   AND cb.checked_at >= :start AND cb.checked_at < :end
+   AND cb.created_at >= :p_start
+"""
+
+_CHECK_COUNTS_SQL = f"""
+SELECT cb.site_id,
+       FLOOR(EXTRACT(EPOCH FROM (cb.checked_at - :start)) / 86400)::int AS day,
+       c->>'check' AS check_type,
+       c->>'status' AS check_status,
+       COUNT(*) AS n,
+       (EXTRACT(EPOCH FROM MAX(cb.checked_at)) * 1000000)::bigint AS last_checked_us
+  FROM compliance_bundles cb,
+       jsonb_array_elements(cb.checks) AS c
+ WHERE {_BUNDLE_FILTER}
+   AND jsonb_typeof(cb.checks) = 'array'
+ GROUP BY 1, 2, 3, 4
+"""
+
+_BUNDLES_SQL = f"""
+SELECT cb.site_id,
+       (EXTRACT(EPOCH FROM cb.checked_at) * 1000000)::bigint AS checked_at_us,
+       COALESCE(s.n_pass, 0) AS n_pass,
+       COALESCE(s.n_warn, 0) AS n_warn,
+       COALESCE(s.n_fail, 0) AS n_fail
+  FROM compliance_bundles cb
+  LEFT JOIN LATERAL (
+      SELECT COUNT(*) FILTER (WHERE lower(c->>'status') IN ('pass', 'compliant')) AS n_pass,
+             COUNT(*) FILTER (WHERE lower(c->>'status') = 'warning') AS n_warn,
+             COUNT(*) FILTER (WHERE lower(c->>'status') IN ('fail', 'non_compliant')) AS n_fail
+        FROM jsonb_array_elements(
+                 CASE WHEN jsonb_typeof(cb.checks) = 'array'
+                      THEN cb.checks ELSE '[]'::jsonb END
+             ) AS c
+  ) s ON true
+ WHERE {_BUNDLE_FILTER}
+ ORDER BY cb.site_id, cb.checked_at
+"""
+
+_LATEST_SQL = f"""
+SELECT DISTINCT ON (cb.site_id, c->>'check', COALESCE(c->>'hostname', c->>'host', ''))
+       cb.site_id,
+       c->>'check' AS check_type,
+       c->>'status' AS check_status,
+       (EXTRACT(EPOCH FROM cb.checked_at) * 1000000)::bigint AS checked_at_us,
+       cb.bundle_id
+  FROM compliance_bundles cb,
+       jsonb_array_elements(cb.checks) AS c
+ WHERE {_BUNDLE_FILTER}
+   AND jsonb_typeof(cb.checks) = 'array'
+ ORDER BY cb.site_id, c->>'check', COALESCE(c->>'hostname', c->>'host', ''),
+          cb.checked_at DESC
+"""
+
+_BIND_ORDER = ("site_ids", "start", "end", "p_start")
+_BIND_RE = re.compile(r"(?<!:):(" + "|".join(_BIND_ORDER) + r")\b")
+
+
+def _positional(sql: str) -> str:
+    """Named binds (SQLAlchemy text) -> $n binds (asyncpg)."""
+    return _BIND_RE.sub(lambda m: f"${_BIND_ORDER.index(m.group(1)) + 1}", sql)
+
+
+async def _fetch_all(conn, sql: str, params: Dict[str, Any]) -> List[Any]:
+    if isinstance(conn, AsyncSession):
+        result = await conn.execute(text(sql), params)
+        return result.fetchall()
+    return await conn.fetch(_positional(sql), *[params[n] for n in _BIND_ORDER])
+
+
+def _from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(us))
+
+
+def _columns(rows: Sequence[Any], width: int) -> List[Sequence[Any]]:
+    """Row-major result set -> one list per column."""
+    return [list(map(itemgetter(i), rows)) for i in range(width)]
+
+
+def _ints(col: Sequence[Any], dtype=np.int64) -> np.ndarray:
+    return np.array(col, dtype=dtype) if len(col) else np.zeros(0, dtype=dtype)
+
+
+class _Vocab:
+    """String -> dense int code. None is a legal value (NULL JSON keys)."""
+
+    def __init__(self, values: Iterable[Optional[str]] = ()):
+        self.values: List[Optional[str]] = []
+        self.index: Dict[Optional[str], int] = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value: Optional[str]) -> int:
+        c = self.index.get(value)
+        if c is None:
+            c = self.index[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def codes(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        for v in dict.fromkeys(values):
+            self.code(v)
+        return np.fromiter(map(self.index.__getitem__, values), dtype=np.int32, count=len(values))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class PeriodAnalytics:
+    """One period's check results for a set of sites, as columns."""
+
+    def __init__(
+        self,
+        site_ids: Sequence[str],
+        period_start: datetime,
+        period_end: datetime,
+        check_rows: Sequence[Any],
+        bundle_rows: Sequence[Any],
+        latest_rows: Sequence[Any],
+    ):
+        self.period_start = period_start
+        self.period_end = period_end
+        self.n_days = max(1, -(-(period_end - period_start) // timedelta(days=1)))
+        self.sites = _Vocab(sorted(set(site_ids)))
+        self.check_types = _Vocab()
+        self.statuses = _Vocab()
+
+        # check counts
+        site, day, check, status, n, last = _columns(check_rows, 6)
+        self.cc_site = self.sites.codes(site)
+        self.cc_day = _ints(day, np.int32)
+        self.cc_check = self.check_types.codes(check)
+        self.cc_status = self.statuses.codes(status)
+        self.cc_n = _ints(n)
+        self.cc_last = _ints(last)
+
+        # bundles
+        site, at, n_pass, n_warn, n_fail = _columns(bundle_rows, 5)
+        self.b_site = self.sites.codes(site)
+        self.b_at = _ints(at)
+        self.b_pass = _ints(n_pass)
+        self.b_warn = _ints(n_warn)
+        self.b_fail = _ints(n_fail)
+
+        # latest per (site, check_type, hostname)
+        site, check, status, at, bundle = _columns(latest_rows, 5)
+        self.l_site = self.sites.codes(site)
+        self.l_check = self.check_types.codes(check)
+        self.l_status = self.statuses.codes(status)
+        self.l_at = _ints(at)
+        self.l_bundle = list(bundle)
+
+        self._category_cache: Dict[Any, Dict[str, Dict[str, Optional[float]]]] = {}
+
+    # ── coverage ──
+
+    @property
+    def site_ids(self) -> List[str]:
+        return list(self.sites.values)
+
+    def covers(self, site_ids: Iterable[str], period_start: datetime, period_end: datetime) -> bool:
+        return (
+            period_start == self.period_start
+            and period_end == self.period_end
+            and all(s in self.sites.index for s in site_ids)
+        )
+
+    def _site(self, site_id: str) -> int:
+        return self.sites.index[site_id]
+
+    # ── status classes ──
+
+    def _status_mask(self, names: Iterable[str], case_insensitive: bool = True) -> np.ndarray:
+        wanted = set(names)
+        return np.array(
+            [
+                (s.lower() if case_insensitive and s is not None else s) in wanted
+                for s in self.statuses.values
+            ],
+            dtype=bool,
+        )
+
+    @cached_property
+    def _scored(self) -> np.ndarray:
+        """(n_statuses, 3) one-hot into pass / warning / fail."""
+        out = np.zeros((len(self.statuses), 3), dtype=np.int64)
+        out[self._status_mask(SCORE_PASS), 0] = 1
+        out[self._status_mask(SCORE_WARNING), 1] = 1
+        out[self._status_mask(SCORE_FAIL), 2] = 1
+        return out
+
+    # ── dense cubes ──
+
+    @cached_property
+    def status_counts(self) -> np.ndarray:
+        """(n_sites, n_check_types, n_statuses) check-result counts."""
+        shape = (len(self.sites), len(self.check_types), len(self.statuses))
+        flat = np.ravel_multi_index((self.cc_site, self.cc_check, self.cc_status), shape)
+        counts = np.bincount(flat, weights=self.cc_n, minlength=int(np.prod(shape)))
+        return counts.astype(np.int64).reshape(shape)
+
+    @cached_property
+    def last_checked(self) -> np.ndarray:
+        """(n_sites, n_check_types) latest checked_at in epoch µs, -1 if none."""
+        out = np.full((len(self.sites), len(self.check_types)), -1, dtype=np.int64)
+        np.maximum.at(out, (self.cc_site, self.cc_check), self.cc_last)
+        return out
+
+    @cached_property
+    def daily_scored(self) -> np.ndarray:
+        """(n_sites, n_days, 3) pass / warning / fail counts per day."""
+        shape = (len(self.sites), self.n_days, len(self.statuses))
+        day = np.clip(self.cc_day, 0, self.n_days - 1)
+        flat = np.ravel_multi_index((self.cc_site, day, self.cc_status), shape)
+        counts = np.bincount(flat, weights=self.cc_n, minlength=int(np.prod(shape)))
+        return counts.astype(np.int64).reshape(shape) @ self._scored
+
+    @cached_property
+    def _latest_evidence(self) -> Dict[Tuple[int, int], int]:
+        """(site, check_type) -> row in the latest columns with the newest checked_at."""
+        if not len(self.l_at):
+            return {}
+        order = np.lexsort((self.l_at, self.l_check, self.l_site))
+        site, check = self.l_site[order], self.l_check[order]
+        group_end = np.ones(len(order), dtype=bool)
+        group_end[:-1] = (site[1:] != site[:-1]) | (check[1:] != check[:-1])
+        rows = order[group_end]
+        return {
+            (int(s), int(c)): int(r)
+            for s, c, r in zip(self.l_site[rows], self.l_check[rows], rows)
+        }
+
+    # ── per-site views ──
+
+    def check_status_counts(self, site_id: str) -> Dict[str, Dict[Optional[str], int]]:
+        """check_type -> {raw status: count} for one site (NULL check_type dropped)."""
+        if site_id not in self.sites.index:
+            return {}
+        cube = self.status_counts[self._site(site_id)]
+        out: Dict[str, Dict[Optional[str], int]] = {}
+        for k, s in zip(*np.nonzero(cube)):
+            check_type = self.check_types.values[k]
+            if check_type is None:
+                continue
+            out.setdefault(check_type, {})[self.statuses.values[s]] = int(cube[k, s])
+        return out
+
+    def check_last_seen(self, site_id: str) -> Dict[str, Tuple[datetime, Optional[str]]]:
+        """check_type -> (latest checked_at, bundle_id of the latest result)."""
+        if site_id not in self.sites.index:
+            return {}
+        i = self._site(site_id)
+        row = self.last_checked[i]
+        evidence = self._latest_evidence
+        out = {}
+        for k in np.nonzero(row >= 0)[0]:
+            check_type = self.check_types.values[k]
+            if check_type is None:
+                continue
+            r = evidence.get((i, int(k)))
+            out[check_type] = (
+                _from_micros(row[k]),
+                self.l_bundle[r] if r is not None else None,
+            )
+        return out
+
+    def bundle_count(self, site_id: str) -> int:
+        if site_id not in self.sites.index:
+            return 0
+        return int(np.count_nonzero(self.b_site == self._site(site_id)))
+
+    def daily_scores(self, site_id: str) -> List[Tuple[date, Optional[float]]]:
+        """Per-day score (pass 100 / warning 50 / fail 0, averaged over
+        every scored check result that day). None for days without data."""
+        if site_id not in self.sites.index:
+            return []
+        tallies = self.daily_scored[self._site(site_id)]
+        n = tallies.sum(axis=1)
+        points = tallies @ np.array([100.0, 50.0, 0.0])
+        first = self.period_start.date()
+        return [
+            (first + timedelta(days=d), float(points[d] / n[d]) if n[d] else None)
+            for d in range(self.n_days)
+        ]
+
+    # ── all-site views ──
+
+    def category_scores(
+        self,
+        categories: Sequence[str],
+        check_to_category: Mapping[str, str],
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """site_id -> {category: mean score or None}. Score per check
+        result is pass 100 / warning 50 / fail 0; unmapped check types
+        and unscored statuses are ignored. Unrounded."""
+        key = (tuple(categories), frozenset(check_to_category.items()))
+        cached = self._category_cache.get(key)
+        if cached is not None:
+            return cached
+
+        cat_index = {c: j for j, c in enumerate(categories)}
+        onehot = np.zeros((len(self.check_types), len(categories)), dtype=np.int64)
+        for k, check_type in enumerate(self.check_types.values):
+            j = cat_index.get(check_to_category.get(check_type)) if check_type else None
+            if j is not None:
+                onehot[k, j] = 1
+
+        tallies = self.status_counts @ self._scored  # (sites, checks, 3)
+        points = tallies @ np.array([100, 50, 0], dtype=np.int64)  # (sites, checks)
+        n = tallies.sum(axis=2)
+        cat_points = points @ onehot  # (sites, categories)
+        cat_n = n @ onehot
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = cat_points / cat_n
+
+        out = {
+            site_id: {
+                c: (float(avg[i, j]) if cat_n[i, j] else None)
+                for j, c in enumerate(categories)
+            }
+            for i, site_id in enumerate(self.sites.values)
+        }
+        self._category_cache[key] = out
+        return out
+
+    @cached_property
+    def _bundle_trend(self) -> Dict[str, str]:
+        n_sites = len(self.sites)
+        n_bundles = np.bincount(self.b_site, minlength=n_sites)
+        mid = n_bundles // 2
+
+        order = np.lexsort((self.b_at, self.b_site))
+        site = self.b_site[order]
+        rank = np.arange(len(order)) - np.searchsorted(site, site, side="left")
+        p, w, f = self.b_pass[order], self.b_warn[order], self.b_fail[order]
+        scored = (p + w + f) > 0
+        avg = np.divide(100.0 * p + 50.0 * w, p + w + f, out=np.zeros(len(order)), where=scored)
+        first = scored & (rank < mid[site])
+        second = scored & ~(rank < mid[site])
+
+        def _mean(mask):
+            total = np.bincount(site[mask], weights=avg[mask], minlength=n_sites)
+            count = np.bincount(site[mask], minlength=n_sites)
+            return np.divide(total, count, out=np.zeros(n_sites), where=count > 0)
+
+        first_avg, second_avg = _mean(first), _mean(second)
+        out = {}
+        for i, site_id in enumerate(self.sites.values):
+            if mid[i] == 0:
+                out[site_id] = "insufficient_data"
+            elif second_avg[i] > first_avg[i] + 5:
+                out[site_id] = "improving"
+            elif second_avg[i] < first_avg[i] - 5:
+                out[site_id] = "declining"
+            else:
+                out[site_id] = "stable"
+        return out
+
+    def trend(self, site_id: str) -> str:
+        """Mean per-bundle score of the second half of the period's
+        bundles vs the first half: improving / declining (±5 points),
+        stable, or insufficient_data under two bundles."""
+        return self._bundle_trend.get(site_id, "insufficient_data")
+
+    def latest_status_counts(self, site_ids: Optional[Iterable[str]] = None) -> Dict[Optional[str], int]:
+        """Lower-cased status -> count over the latest result per
+        (site, check_type, hostname). All sites unless `site_ids`."""
+        mask = np.ones(len(self.l_site), dtype=bool)
+        if site_ids is not None:
+            codes = [self.sites.index[s] for s in site_ids if s in self.sites.index]
+            mask = np.isin(self.l_site, codes)
+        counts = np.bincount(self.l_status[mask], minlength=len(self.statuses))
+        out: Dict[Optional[str], int] = {}
+        for s, n in zip(self.statuses.values, counts):
+            if n:
+                key = s.lower() if s is not None else None
+                out[key] = out.get(key, 0) + int(n)
+        return out
+
+
+async def load_period_analytics(
+    conn,
+    site_ids: Sequence[str],
+    period_start: datetime,
+    period_end: datetime,
+) -> PeriodAnalytics:
+    """Run the three reads for `site_ids` over [period_start, period_end).
+
+    `conn` is an asyncpg connection or a SQLAlchemy AsyncSession; the
+    reads run in whatever transaction it holds (so a caller's SET LOCAL
+    statement_timeout applies)."""
+    site_ids = sorted(set(site_ids))
+    params = {
+        "site_ids": site_ids,
+        "start": period_start,
+        "end": period_end,
+        "p_start": period_start - PARTITION_GRACE,
+    }
+    if not site_ids:
+        return PeriodAnalytics([], period_start, period_end, [], [], [])
+    check_rows = await _fetch_all(conn, _CHECK_COUNTS_SQL, params)
+    bundle_rows = await _fetch_all(conn, _BUNDLES_SQL, params)
+    latest_rows = await _fetch_all(conn, _LATEST_SQL, params)
+    return PeriodAnalytics(
+        site_ids, period_start, period_end, check_rows, bundle_rows, latest_rows,
+    )
+
+
+# (sites, period_start, period_end) -> (monotonic expiry, analytics)
+_CACHE: "OrderedDict[Tuple[Tuple[str, ...], datetime, datetime], Tuple[float, PeriodAnalytics]]" = OrderedDict()
+
+
+def _is_closed(period_end: datetime) -> bool:
+    return period_end + PARTITION_GRACE <= datetime.now(timezone.utc)
+
+
+async def get_period_analytics(
+    conn,
+    site_ids: Sequence[str],
+    period_start: datetime,
+    period_end: datetime,
+) -> PeriodAnalytics:
+    """Cached load_period_analytics. Closed periods only — an open
+    period (current month, or inside the late-upload grace) always
+    re-reads — and for at most CACHE_TTL_SECONDS, so bundles ingested
+    late into a closed period show up. Any cached load covering every
+    requested site is reused."""
+    now = time.monotonic()
+    for key, (expires, _) in list(_CACHE.items()):
+        if expires <= now:
+            del _CACHE[key]
+    for key, (_, analytics) in _CACHE.items():
+        if analytics.covers(site_ids, period_start, period_end):
+            _CACHE.move_to_end(key)
+            return analytics
+
+    analytics = await load_period_analytics(conn, site_ids, period_start, period_end)
+    if _is_closed(period_end):
+        _CACHE[(tuple(analytics.site_ids), period_start, period_end)] = (
+            now + CACHE_TTL_SECONDS, analytics,
+        )
+        while len(_CACHE) > CACHE_MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    logger.info(
+        "compliance_analytics_loaded",
+        extra={
+            "sites": len(analytics.site_ids),
+            "check_count_rows": len(analytics.cc_n),
+            "bundles": len(analytics.b_at),
+            "period_start": period_start.isoformat(),
+        },
+    )
+    return analytics
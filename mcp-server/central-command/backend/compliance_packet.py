@@ -196,6 +196,7 @@ class CompliancePacket:
         baseline_version: str = "1.0",
         output_dir: Optional[Path] = None,
         framework: str = "hipaa",
+        analytics: Optional[Any] = None,
     ):
         self.site_id = site_id
         self.month = month
@@ -225,6 +226,10 @@ class CompliancePacket:
         self._partition_window_start = self._period_start - timedelta(days=7)
         self._partition_window_end = self._period_end + timedelta(days=7)
 
+        # Shared compliance_analytics.PeriodAnalytics — the month-end loop
+        # passes one load per org; otherwise loaded on first use.
+        self._analytics = analytics
+
     def _resolve_control(self, check_type: str) -> str:
         """Resolve a check_type to a control_id for the current framework."""
         from .framework_mapper import resolve_control_id
@@ -235,6 +240,18 @@ class CompliancePacket:
         from .framework_mapper import resolve_control_description
         return resolve_control_description(check_type, self.framework)
 
+    async def _period_analytics(self):
+        """Check-result columns for this site and month (one load shared
+        by the score and the control posture)."""
+        if self._analytics is None or not self._analytics.covers(
+            [self.site_id], self._period_start, self._period_end
+        ):
+            from .compliance_analytics import get_period_analytics
+            self._analytics = await get_period_analytics(
+                self.db, [self.site_id], self._period_start, self._period_end,
+            )
+        return self._analytics
+
     async def generate_packet(self) -> Dict[str, Any]:
         """Generate compliance packet from real evidence data.
 
@@ -448,47 +465,31 @@ class CompliancePacket:
     async def _calculate_compliance_score(self) -> float:
         """Compliance % = average of per-HIPAA-control pass rates.
 
-        Expands the JSONB checks array from each bundle so every individual
-        check_type is scored independently. This is critical because the Go
-        daemon sends 19+ checks per bundle but the check_type column only
-        stores the first one.
+        Uses every individual check in the JSONB checks array (via
+        compliance_analytics) so each check_type is scored independently.
+        This is critical because the Go daemon sends 19+ checks per bundle
+        but the check_type column only stores the first one.
 
         Each check_type gets its own pass rate, then check_types that map
         to the same HIPAA control are averaged together. The final score
         is the average across all distinct controls. This prevents a single
         high-frequency failing check from dominating the score.
         """
-        result = await self.db.execute(
-            text("""
-                WITH expanded AS (
-                    SELECT
-                        c->>'check' as check_type,
-                        c->>'status' as check_status
-                    FROM compliance_bundles cb,
-                         jsonb_array_elements(cb.checks) as c
-                    WHERE cb.site_id = :sid
-                      AND cb.checked_at >= :start AND cb.checked_at < :end
-                      AND cb.created_at >= :p_start AND cb.created_at < :p_end
-                      AND jsonb_array_length(cb.checks) > 0
-                )
-                SELECT check_type,
-                       COUNT(*) FILTER (WHERE check_status IN ('pass', 'compliant', 'fail', 'non_compliant', 'warning')) as total,
-                       COUNT(*) FILTER (WHERE check_status IN ('pass', 'compliant')) as pass_count
-                FROM expanded
-                WHERE check_type IS NOT NULL
-                GROUP BY check_type
-            """),
-            {"sid": self.site_id, "start": self._period_start, "end": self._period_end, "p_start": self._partition_window_start, "p_end": self._partition_window_end},
-        )
-        rows = result.fetchall()
-        if not rows:
+        analytics = await self._period_analytics()
+        counts = analytics.check_status_counts(self.site_id)
+        if not counts:
             return 0.0
 
         # Group pass rates by framework control
         control_rates: Dict[str, List[float]] = {}
-        for row in rows:
-            control_id = self._resolve_control(row.check_type)
-            rate = row.pass_count * 100.0 / row.total if row.total > 0 else 0.0
+        for check_type, by_status in sorted(counts.items()):
+            total = sum(
+                n for status, n in by_status.items()
+                if status in ("pass", "compliant", "fail", "non_compliant", "warning")
+            )
+            pass_count = by_status.get("pass", 0) + by_status.get("compliant", 0)
+            control_id = self._resolve_control(check_type)
+            rate = pass_count * 100.0 / total if total > 0 else 0.0
             control_rates.setdefault(control_id, []).append(rate)
 
         # Average rates within each control, then average across controls
@@ -608,56 +609,22 @@ class CompliancePacket:
     async def _get_control_posture(self) -> List[Dict]:
         """Build control posture from real check_type results.
 
-        Expands JSONB checks array so each individual check is scored.
+        Counts every individual check (compliance_analytics columns).
         Multiple check_types may map to the same HIPAA control (e.g.
         firewall_status, smb_signing all → 164.312(e)(1)).
         This method consolidates them so each control appears once.
         """
-        result = await self.db.execute(
-            text("""
-                WITH expanded AS (
-                    SELECT
-                        c->>'check' as check_type,
-                        c->>'status' as check_status,
-                        cb.checked_at,
-                        cb.bundle_id
-                    FROM compliance_bundles cb,
-                         jsonb_array_elements(cb.checks) as c
-                    WHERE cb.site_id = :sid
-                      AND cb.checked_at >= :start AND cb.checked_at < :end
-                      AND cb.created_at >= :p_start AND cb.created_at < :p_end
-                      AND jsonb_array_length(cb.checks) > 0
-                ),
-                stats AS (
-                    SELECT check_type,
-                           COUNT(*) as total,
-                           COUNT(*) FILTER (WHERE check_status = 'pass') as pass_count,
-                           COUNT(*) FILTER (WHERE check_status = 'fail') as fail_count,
-                           MAX(checked_at) as last_checked
-                    FROM expanded
-                    WHERE check_type IS NOT NULL
-                    GROUP BY check_type
-                ),
-                latest AS (
-                    SELECT DISTINCT ON (check_type)
-                           check_type, bundle_id as latest_bundle_id
-                    FROM expanded
-                    WHERE check_type IS NOT NULL
-                    ORDER BY check_type, checked_at DESC
-                )
-                SELECT s.*, l.latest_bundle_id
-                FROM stats s
-                LEFT JOIN latest l USING (check_type)
-                ORDER BY s.check_type
-            """),
-            {"sid": self.site_id, "start": self._period_start, "end": self._period_end, "p_start": self._partition_window_start, "p_end": self._partition_window_end},
-        )
+        analytics = await self._period_analytics()
+        counts = analytics.check_status_counts(self.site_id)
+        last_seen = analytics.check_last_seen(self.site_id)
 
         # Consolidate by framework control code
         control_agg: Dict[str, Dict] = {}
-        for row in result.fetchall():
-            key = self._resolve_control(row.check_type)
-            desc = self._resolve_description(row.check_type)
+        for check_type in sorted(counts):
+            by_status = counts[check_type]
+            last_checked, latest_bundle_id = last_seen.get(check_type, (None, None))
+            key = self._resolve_control(check_type)
+            desc = self._resolve_description(check_type)
 
             if key not in control_agg:
                 control_agg[key] = {
@@ -671,14 +638,14 @@ class CompliancePacket:
                 }
 
             entry = control_agg[key]
-            entry["total"] += row.total
-            entry["pass_count"] += row.pass_count
-            entry["check_types"].append(row.check_type)
+            entry["total"] += sum(by_status.values())
+            entry["pass_count"] += by_status.get("pass", 0)
+            entry["check_types"].append(check_type)
 
             # Keep the most recent timestamp and its bundle_id
-            if row.last_checked and (entry["last_checked"] is None or row.last_checked > entry["last_checked"]):
-                entry["last_checked"] = row.last_checked
-                entry["evidence_id"] = row.latest_bundle_id
+            if last_checked and (entry["last_checked"] is None or last_checked > entry["last_checked"]):
+                entry["last_checked"] = last_checked
+                entry["evidence_id"] = latest_bundle_id
 
         controls = []
         for entry in control_agg.values():
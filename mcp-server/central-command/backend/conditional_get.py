@@ -0,0 +1,241 @@
+"""
+Semantic conditional GET — version-vector ETags checked before the handler.
+
+`ETagMiddleware` can only answer 304 after the route has already run its
+queries and serialized the body; on an unchanged poll that is 100% wasted
+work. Dashboards and appliances poll the same handful of endpoints
+constantly, so this module moves the decision in front of the handler:
+
+  - A route declares what it reads as a `VersionedView`: the tables it
+    depends on and how its tenant scope resolves to a site set.
+  - Writes to those tables bump `change_versions(table_name, scope_key)`
+    via the `bump_change_version()` triggers (migration 330).
+  - `check_not_modified()` reads the relevant counter rows in ONE query,
+    hashes them with the principal into a weak ETag, and raises a 304
+    before the handler touches anything else. On a miss it stamps the
+    ETag on the response so the next poll can be conditional.
+
+Correctness notes:
+  - The ETag is computed BEFORE the handler reads its data. A write that
+    lands in between makes the stamped ETag older than the body, which
+    only costs one extra full response on the next poll — never a stale
+    304.
+  - Views whose output also depends on wall-clock time (rolling score
+    windows, "stale" flags) set `max_age_seconds`; the ETag then also
+    rotates every bucket.
+  - Anything that is not a watched-table write (code deploy, signing key
+    change) goes in `salt`.
+  - Fail-open: if the counter read fails (migration not applied yet,
+    transient error) the route runs normally without an ETag. The read
+    runs under a savepoint so it cannot poison the caller's transaction.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Tables with a bump_change_version() trigger and the column it scopes
+# by. Lockstep with migrations/330_change_versions.sql — enforced by
+# tests/test_conditional_get.py.
+WATCHED_TABLES: Dict[str, str] = {
+    "sites": "site_id",
+    "site_appliances": "site_id",
+    "site_go_agent_summaries": "site_id",
+    "compliance_bundles": "site_id",
+    "client_orgs": "id",
+    "client_notifications": "client_org_id",
+    "l1_rules": "*",
+    "app_profile_rules": "*",
+}
+
+# How each principal kind resolves to the set of site_ids whose
+# site-scoped counters feed the ETag. $1 is the principal.
+_SITE_SET_SQL = {
+    "partner": "SELECT site_id::text FROM sites WHERE partner_id = $1::uuid",
+    "org": "SELECT site_id::text FROM sites WHERE client_org_id = $1::uuid",
+    "site": "SELECT site_id::text FROM sites WHERE site_id = $1",
+}
+
+
+@dataclass(frozen=True)
+class VersionedView:
+    """Declared data dependencies of one conditional endpoint."""
+
+    name: str
+    scope: str  # "partner" | "org" | "site"
+    site_tables: Tuple[str, ...] = ()
+    org_tables: Tuple[str, ...] = ()
+    global_tables: Tuple[str, ...] = ()
+    max_age_seconds: int = 0
+
+    def __post_init__(self) -> None:
+        if self.scope not in _SITE_SET_SQL:
+            raise ValueError(f"{self.name}: unknown scope {self.scope!r}")
+        for group, expect_global in (
+            (self.site_tables, False),
+            (self.org_tables, False),
+            (self.global_tables, True),
+        ):
+            for table in group:
+                if table not in WATCHED_TABLES:
+                    raise ValueError(
+                        f"{self.name}: {table} has no change_versions trigger"
+                    )
+                if (WATCHED_TABLES[table] == "*") != expect_global:
+                    raise ValueError(
+                        f"{self.name}: {table} declared in the wrong scope group"
+                    )
+
+
+# ─── Migrated endpoints ──────────────────────────────────────────
+
+# partners.get_my_sites — sites + appliance rollup + Go-agent summary.
+# All three tables bump only on the columns rendered here (mig 330
+# update_columns), not per checkin; MAX(last_checkin) and
+# agent_last_event are kept fresh by rotating the ETag every minute
+# instead.
+PARTNER_MY_SITES = VersionedView(
+    name="partner_my_sites",
+    scope="partner",
+    site_tables=("sites", "site_appliances", "site_go_agent_summaries"),
+    max_age_seconds=60,
+)
+
+# client_portal.get_dashboard — the compliance score is a rolling 30-day
+# window cached for 60s in perf_cache, so the ETag rotates on the same
+# cadence even with no writes.
+CLIENT_DASHBOARD = VersionedView(
+    name="client_dashboard",
+    scope="org",
+    site_tables=("sites", "compliance_bundles", "site_go_agent_summaries"),
+    org_tables=("client_orgs", "client_notifications"),
+    max_age_seconds=60,
+)
+
+# main.agent_sync_rules — healing_tier from sites + promoted/profile
+# rules. Built-in rules live in code; callers salt with the build SHA.
+AGENT_SYNC_RULES = VersionedView(
+    name="agent_sync_rules",
+    scope="site",
+    site_tables=("sites",),
+    global_tables=("l1_rules", "app_profile_rules"),
+)
+
+
+_VERSIONS_SQL = """
+    WITH scope_sites AS ({site_set})
+    SELECT table_name, scope_key, version
+      FROM change_versions
+     WHERE (table_name = ANY($2::text[])
+            AND scope_key IN (SELECT site_id FROM scope_sites))
+        OR (table_name = ANY($3::text[]) AND scope_key = $1::text)
+        OR (table_name = ANY($4::text[]) AND scope_key = '*')
+    UNION ALL
+    SELECT '~members', site_id, 0 FROM scope_sites
+    ORDER BY 1, 2
+"""
+
+_METRICS: Dict[str, int] = {"not_modified": 0, "modified": 0, "errors": 0}
+
+
+def conditional_get_metrics() -> Dict[str, int]:
+    """Process-local outcome counters (Prometheus export)."""
+    return dict(_METRICS)
+
+
+async def compute_etag(
+    conn,
+    view: VersionedView,
+    principal: Optional[str],
+    *,
+    salt: str = "",
+) -> Optional[str]:
+    """Weak ETag for `view` as seen by `principal`, or None on failure.
+
+    `principal` is the partner id / org id / site id matching
+    `view.scope`; None means "no tenant scope" (only global tables
+    contribute).
+    """
+    rows = []
+    if principal is not None:
+        sql = _VERSIONS_SQL.format(site_set=_SITE_SET_SQL[view.scope])
+    else:
+        sql = _VERSIONS_SQL.format(
+            site_set="SELECT NULL::text AS site_id WHERE false"
+        )
+    try:
+        async with conn.transaction():
+            rows = await conn.fetch(
+                sql,
+                None if principal is None else str(principal),
+                list(view.site_tables),
+                list(view.org_tables),
+                list(view.global_tables),
+            )
+    except Exception as e:
+        _METRICS["errors"] += 1
+        logger.warning(
+            "conditional_get: version read failed for %s: %s", view.name, e,
+        )
+        return None
+
+    h = hashlib.sha256()
+    h.update(f"{view.name}|{principal}|{salt}|".encode())
+    if view.max_age_seconds:
+        h.update(f"t{int(time.time()) // view.max_age_seconds}|".encode())
+    for r in rows:
+        h.update(f"{r['table_name']}:{r['scope_key']}:{r['version']};".encode())
+    return f'W/"{h.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison of an If-None-Match header against `etag`."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+async def check_not_modified(
+    request: Request,
+    response: Response,
+    conn,
+    view: VersionedView,
+    principal: Optional[str],
+    *,
+    salt: str = "",
+) -> Optional[str]:
+    """Raise a 304 if the client already holds the current version.
+
+    Call at the top of the handler, before any data query. Otherwise
+    sets the ETag on `response` and returns it (None if versions could
+    not be read — the handler then runs unconditionally).
+    """
+    etag = await compute_etag(conn, view, principal, salt=salt)
+    if etag is None:
+        return None
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        _METRICS["not_modified"] += 1
+        raise HTTPException(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
+    _METRICS["modified"] += 1
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return etag
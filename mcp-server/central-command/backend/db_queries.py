@@ -1288,7 +1288,11 @@ async def get_monthly_compliance_report(
     """Generate monthly compliance report from historical data.
 
     Aggregates compliance_bundles for the month and returns board-ready summary.
+    Check-result aggregates come from compliance_analytics (shared with the
+    month's compliance packets; cached once the month has closed).
     """
+    from .compliance_analytics import get_period_analytics
+
     # Calculate date range
     start_date = datetime(year, month, 1, tzinfo=timezone.utc)
     if month == 12:
@@ -1296,23 +1300,10 @@ async def get_monthly_compliance_report(
     else:
         end_date = datetime(year, month + 1, 1, tzinfo=timezone.utc)
 
-    # Get all compliance bundles for the month
-    result = await db.execute(text("""
-        SELECT checks, summary, checked_at
-        FROM compliance_bundles
-        WHERE site_id = :site_id
-        AND checked_at >= :start_date
-        AND checked_at < :end_date
-        ORDER BY checked_at ASC
-    """), {
-        "site_id": site_id,
-        "start_date": start_date,
-        "end_date": end_date,
-    })
-
-    rows = result.fetchall()
+    analytics = await get_period_analytics(db, [site_id], start_date, end_date)
+    bundle_count = analytics.bundle_count(site_id)
 
-    if not rows:
+    if not bundle_count:
         return {
             "site_id": site_id,
             "year": year,
@@ -1324,36 +1315,18 @@ async def get_monthly_compliance_report(
             "trend": "unknown",
         }
 
-    # Aggregate scores by category
-    category_scores: Dict[str, List[int]] = {cat: [] for cat in CATEGORY_CHECKS}
-
-    for row in rows:
-        checks = row.checks or []
-        for check in checks:
-            check_type = check.get("check", "")
-            status = check.get("status", "").lower()
-
-            if status in ("compliant", "pass"):
-                score = 100
-            elif status == "warning":
-                score = 50
-            elif status in ("non_compliant", "fail"):
-                score = 0
-            else:
-                continue
-
-            category = _CHECK_TYPE_TO_CATEGORY.get(check_type)
-            if category:
-                category_scores[category].append(score)
+    # Mean score per category (pass 100 / warning 50 / fail 0)
+    category_avgs = analytics.category_scores(
+        list(CATEGORY_CHECKS), _CHECK_TYPE_TO_CATEGORY,
+    )[site_id]
 
     # Calculate monthly averages
     monthly_scores = {}
     total = 0
     count = 0
 
-    for category, scores in category_scores.items():
-        if scores:
-            avg = sum(scores) / len(scores)
+    for category, avg in category_avgs.items():
+        if avg is not None:
             monthly_scores[category] = round(avg, 1)
             total += avg
             count += 1
@@ -1381,56 +1354,22 @@ async def get_monthly_compliance_report(
 
     inc_row = incident_result.fetchone()
 
-    # Calculate trend (compare first half vs second half of month)
-    mid_point = len(rows) // 2
-    if mid_point > 0:
-        first_half_scores = []
-        second_half_scores = []
-
-        for i, row in enumerate(rows):
-            checks = row.checks or []
-            row_score = 0
-            row_count = 0
-
-            for check in checks:
-                status = check.get("status", "").lower()
-                if status in ("compliant", "pass"):
-                    row_score += 100
-                    row_count += 1
-                elif status == "warning":
-                    row_score += 50
-                    row_count += 1
-                elif status in ("non_compliant", "fail"):
-                    row_count += 1
-
-            if row_count > 0:
-                avg = row_score / row_count
-                if i < mid_point:
-                    first_half_scores.append(avg)
-                else:
-                    second_half_scores.append(avg)
-
-        first_avg = sum(first_half_scores) / len(first_half_scores) if first_half_scores else 0
-        second_avg = sum(second_half_scores) / len(second_half_scores) if second_half_scores else 0
-
-        if second_avg > first_avg + 5:
-            trend = "improving"
-        elif second_avg < first_avg - 5:
-            trend = "declining"
-        else:
-            trend = "stable"
-    else:
-        trend = "insufficient_data"
+    # Trend: second half of the month's bundles vs the first half
+    trend = analytics.trend(site_id)
 
     return {
         "site_id": site_id,
         "year": year,
         "month": month,
         "has_data": True,
-        "total_checks": len(rows),
+        "total_checks": bundle_count,
         "category_scores": monthly_scores,
         "overall_score": overall,
         "trend": trend,
+        "daily_scores": [
+            {"date": d.isoformat(), "score": round(sc, 1) if sc is not None else None}
+            for d, sc in analytics.daily_scores(site_id)
+        ],
         "incidents_total": inc_row.total if inc_row else 0,
         "incidents_resolved": inc_row.resolved if inc_row else 0,
         "incidents_auto_healed": inc_row.l1_resolved if inc_row else 0,
@@ -0,0 +1,196 @@
+"""
+Cached Ed25519 verification for appliance signatures.
+
+Every sigauth checkin, heartbeat signature and evidence bundle used to
+hex-decode the appliance's public key and build a fresh
+Ed25519PublicKey before verifying. Path-B heartbeat reconstruction
+(signature_auth.verify_heartbeat_signature) did so up to 121 times per
+heartbeat, once per candidate timestamp. The fleet has a few hundred
+distinct keys, so the parsed objects are cached here.
+
+  * VerifierCache — LRU of parsed keys keyed by fingerprint (first 16
+    hex of sha256(raw key), the same value signature_auth reports).
+    Each entry keeps the full key hex and is only returned on an exact
+    match, so a fingerprint collision or a rotated key can never verify
+    against the wrong object. forget_key() evicts on rotation (STEP
+    3.6 / 3.6c) so retired keys don't occupy the cache.
+  * verify_many() — verification for a batch of signatures: one parse
+    per distinct key and a single pass, for submit-batch and the
+    verify-batch auditor endpoint. Neither `cryptography` nor OpenSSL
+    exposes true Ed25519 batch verification, so each signature is still
+    checked individually; the savings are the key parsing and the DB
+    round trips the callers no longer make per bundle.
+  * NonceRing — bounded, TTL'd set of recently accepted sigauth nonces
+    in front of the `nonces` table. A hit is a replay answered without
+    a query; a miss still goes to the table (other workers, restarts).
+
+Pure in-process state: no DB, no network. Safe under asyncio (no
+awaits while mutating).
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+# Distinct keys held. Each entry is a few hundred bytes.
+VERIFIER_CACHE_SIZE = 4096
+
+# Nonces remembered per process. At one signed checkin per appliance per
+# minute, 2h of a 500-appliance fleet is 60k nonces.
+NONCE_RING_SIZE = 65536
+
+
+def key_fingerprint(pubkey_hex: str) -> str:
+    """First 16 hex chars of sha256(raw key); "" for a malformed key."""
+    if not pubkey_hex or len(pubkey_hex) != 64:
+        return ""
+    try:
+        raw = bytes.fromhex(pubkey_hex)
+    except ValueError:
+        return ""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class VerifierCache:
+    """LRU of parsed Ed25519 public keys keyed by fingerprint."""
+
+    def __init__(self, maxsize: int = VERIFIER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[str, Ed25519PublicKey]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pubkey_hex: str) -> Optional[Ed25519PublicKey]:
+        """Parsed key for pubkey_hex, or None if it isn't a valid key."""
+        pubkey_hex = (pubkey_hex or "").lower()
+        fp = key_fingerprint(pubkey_hex)
+        if not fp:
+            return None
+        with self._lock:
+            entry = self._entries.get(fp)
+            if entry is not None and entry[0] == pubkey_hex:
+                self._entries.move_to_end(fp)
+                self.hits += 1
+                return entry[1]
+        try:
+            key = Ed25519PublicKey.from_public_bytes(bytes.fromhex(pubkey_hex))
+        except ValueError:
+            return None
+        with self._lock:
+            self.misses += 1
+            self._entries[fp] = (pubkey_hex, key)
+            self._entries.move_to_end(fp)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def forget(self, pubkey_hex: str) -> None:
+        fp = key_fingerprint((pubkey_hex or "").lower())
+        with self._lock:
+            self._entries.pop(fp, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NonceRing:
+    """Bounded set of recently seen nonce keys with a per-entry TTL."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = NONCE_RING_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires = self._expiry.get(key)
+            if expires is None:
+                return False
+            if expires <= now:
+                del self._expiry[key]
+                return False
+            return True
+
+    def add(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expiry[key] = now + self.ttl_seconds
+            self._expiry.move_to_end(key)
+            # Oldest-first eviction: expired entries go first, then the
+            # ring's capacity bounds memory.
+            while self._expiry:
+                oldest_key, oldest_exp = next(iter(self._expiry.items()))
+                if oldest_exp > now and len(self._expiry) <= self.maxsize:
+                    break
+                del self._expiry[oldest_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+_verifiers = VerifierCache()
+
+
+def verifier_for(pubkey_hex: str) -> Optional[Ed25519PublicKey]:
+    return _verifiers.get(pubkey_hex)
+
+
+def forget_key(pubkey_hex: Optional[str]) -> None:
+    """Drop a rotated-out key from the cache."""
+    if pubkey_hex:
+        _verifiers.forget(pubkey_hex)
+
+
+def verify(pubkey_hex: str, signature: bytes, data: bytes) -> bool:
+    """Verify one signature. False for a bad key, signature or length."""
+    key = _verifiers.get(pubkey_hex)
+    if key is None or len(signature) != 64:
+        return False
+    try:
+        key.verify(signature, data)
+        return True
+    except InvalidSignature:
+        return False
+
+
+def verify_many(items: Iterable[Tuple[str, bytes, bytes]]) -> List[bool]:
+    """Verify (pubkey_hex, signature, data) triples; results in input order."""
+    results: List[bool] = []
+    parsed: dict = {}
+    for pubkey_hex, signature, data in items:
+        if pubkey_hex not in parsed:
+            parsed[pubkey_hex] = _verifiers.get(pubkey_hex)
+        key = parsed[pubkey_hex]
+        if key is None or len(signature) != 64:
+            results.append(False)
+            continue
+        try:
+            key.verify(signature, data)
+            results.append(True)
+        except InvalidSignature:
+            results.append(False)
+    return results
+
+
+def cache_stats() -> dict:
+    return {
+        "keys": len(_verifiers),
+        "hits": _verifiers.hits,
+        "misses": _verifiers.misses,
+    }
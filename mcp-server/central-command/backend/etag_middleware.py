@@ -4,6 +4,11 @@ ETag middleware for conditional HTTP responses.
 Generates ETags from response body hashes. Returns 304 Not Modified
 when client sends matching If-None-Match header, saving bandwidth
 on unchanged polling responses.
+
+This is the fallback for routes that have not declared their data
+dependencies. Routes using conditional_get.check_not_modified() answer
+304 before running and stamp their own version-vector ETag; their
+responses pass through here untouched.
 """
 
 import hashlib
@@ -24,6 +29,11 @@ class ETagMiddleware(BaseHTTPMiddleware):
         if "application/json" not in content_type:
             return response
 
+        # Route already made its own conditional decision
+        # (conditional_get) — don't buffer or re-hash the body.
+        if "etag" in response.headers:
+            return response
+
         # Read the response body
         body = b""
         async for chunk in response.body_iterator:
@@ -38,9 +48,12 @@ class ETagMiddleware(BaseHTTPMiddleware):
             return Response(status_code=304, headers={"ETag": etag})
 
         # Return response with ETag header
+        headers = dict(response.headers)
+        if response.status_code == 200:
+            headers["etag"] = etag
         return Response(
             content=body,
             status_code=response.status_code,
-            headers=dict(response.headers),
+            headers=headers,
             media_type=response.media_type,
         )
@@ -18,6 +18,7 @@ import json
 import hashlib
 import hmac
 import base64
+import time
 import binascii
 import logging
 from datetime import datetime, timezone, timedelta
@@ -29,7 +30,6 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request,
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-import aiohttp
 
 try:
     from .auth import require_auth
@@ -227,10 +227,14 @@ async def require_evidence_view_access(
     )
 
 # Ed25519 signature verification
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 
+try:
+    from .ed25519_verifier import verifier_for, verify_many
+except ImportError:
+    from ed25519_verifier import verifier_for, verify_many  # type: ignore[no-redef]
+
 # Rate-limit helper (Redis-backed; returns True,0 in test/dev without Redis).
 # Used to cap auditor-kit downloads per site. Source: dashboard_api/shared.py:153.
 # Try/except lets pytest (which loads this module outside the package context)
@@ -262,6 +266,22 @@ OTS_ENABLED = os.getenv("OTS_ENABLED", "true").lower() == "true"
 OTS_TIMEOUT = int(os.getenv("OTS_TIMEOUT", "30"))
 MERKLE_BATCHING_ENABLED = os.getenv("MERKLE_BATCHING_ENABLED", "true").lower() == "true"
 
+# Upper bound on bundles per /submit-batch request (offline-queue drain).
+EVIDENCE_BATCH_MAX = int(os.getenv("EVIDENCE_BATCH_MAX", "200"))
+
+# Skip operational monitoring bundles — port scans, host reachability, DNS checks
+# are NOT compliance attestation. Storing them as compliance_bundles produces 400+
+# "fail" entries/day that tank the score to 0%. Network findings still flow through
+# the healing pipeline via reportNetDrift().
+# This set matches the daemon's networkCheckTypes in evidence/submitter.go.
+OPERATIONAL_MONITORING_TYPES = {
+    "net_unexpected_ports", "net_expected_service",
+    "net_host_reachability", "net_dns_resolution",
+}
+
+# prev_hash of the first bundle in a site's chain
+GENESIS_HASH = "0" * 64
+
 # Bitcoin attestation tag in OTS proofs
 BTC_ATTESTATION_TAG = b'\x05\x88\x96\x0d\x73\xd7\x19\x01'
 
@@ -386,8 +406,11 @@ def verify_ed25519_signature(
             logger.warning(f"Invalid public key length: {len(public_key_bytes)} (expected 32)")
             return False
 
-        # Load public key
-        public_key = Ed25519PublicKey.from_public_bytes(public_key_bytes)
+        # Parsed keys are cached by fingerprint (ed25519_verifier)
+        public_key = verifier_for(public_key_hex)
+        if public_key is None:
+            logger.warning("Ed25519 signature verification failed: unparsable public key")
+            return False
 
         # Verify signature
         public_key.verify(signature_bytes, data)
@@ -404,6 +427,28 @@ def verify_ed25519_signature(
         return False
 
 
+def verify_ed25519_signatures(
+    items: List[Tuple[bytes, str, str]]
+) -> List[bool]:
+    """
+    Verify many Ed25519 signatures in one pass.
+
+    Args:
+        items: (data, signature_hex, public_key_hex) per signature
+
+    Returns:
+        One bool per item, in order. Malformed hex counts as invalid.
+    """
+    triples: List[Tuple[str, bytes, bytes]] = []
+    for data, signature_hex, public_key_hex in items:
+        try:
+            signature_bytes = bytes.fromhex(signature_hex or "")
+        except ValueError:
+            signature_bytes = b""
+        triples.append(((public_key_hex or "").lower(), signature_bytes, data))
+    return verify_many(triples)
+
+
 async def get_agent_public_key(db: AsyncSession, site_id: str) -> Optional[str]:
     """
     Get the registered public key for a site's agent.
@@ -476,6 +521,34 @@ class EvidenceSubmitResponse(BaseModel):
     ots_submitted: bool
 
 
+class EvidenceBatchSubmit(BaseModel):
+    """Batch of evidence bundles from one appliance (offline-queue drain)."""
+    bundles: List[EvidenceBundleSubmit] = Field(..., min_length=1, max_length=EVIDENCE_BATCH_MAX)
+
+
+class EvidenceBatchItemResult(BaseModel):
+    """Per-bundle outcome of a batch submission, in request order."""
+    index: int
+    bundle_id: Optional[str] = None
+    status: str  # accepted, deduplicated, skipped, rejected
+    chain_position: Optional[int] = None
+    prev_hash: Optional[str] = None
+    current_hash: Optional[str] = None
+    bundle_hash: Optional[str] = None
+    error: Optional[str] = None
+
+
+class EvidenceBatchSubmitResponse(BaseModel):
+    """Response after a batch evidence submission."""
+    site_id: str
+    accepted: int
+    deduplicated: int
+    skipped: int
+    rejected: int
+    ots_status: str
+    results: List[EvidenceBatchItemResult]
+
+
 class EvidenceVerifyResponse(BaseModel):
     """Evidence verification response."""
     bundle_id: str
@@ -652,6 +725,10 @@ async def submit_hash_to_ots(bundle_hash: str, bundle_id: str) -> Optional[Dict[
         logger.error(f"Invalid hex hash: {bundle_hash[:20]}...")
         return None
 
+    # Deferred like the opentimestamps imports below: only the OTS
+    # background paths need an aiohttp session.
+    import aiohttp
+
     timeout = aiohttp.ClientTimeout(total=OTS_TIMEOUT)
 
     async with aiohttp.ClientSession(timeout=timeout) as session:
@@ -852,6 +929,8 @@ async def upgrade_pending_proofs(db: AsyncSession, limit: int = 500):
 
     upgraded = 0
     fixed_format = 0
+    import aiohttp
+
     timeout = aiohttp.ClientTimeout(total=OTS_TIMEOUT)
 
     async with aiohttp.ClientSession(timeout=timeout) as session:
@@ -998,6 +1077,63 @@ async def upgrade_pending_proofs(db: AsyncSession, limit: int = 500):
 # Evidence Endpoints
 # =============================================================================
 
+def _evidence_signed_data(site_id: str, bundle: EvidenceBundleSubmit) -> bytes:
+    """Bytes the agent signed: its verbatim signed_data, else the canonical JSON."""
+    if bundle.signed_data:
+        return bundle.signed_data.encode('utf-8')
+    return json.dumps({
+        "site_id": site_id,
+        "checked_at": bundle.checked_at.isoformat(),
+        "checks": bundle.checks,
+        "summary": bundle.summary
+    }, sort_keys=True).encode('utf-8')
+
+
+def _fill_evidence_defaults(site_id: str, bundle: EvidenceBundleSubmit) -> None:
+    """Fill bundle_id, bundle_hash, check_type and check_result in place."""
+    import uuid
+    if not bundle.bundle_id:
+        bundle.bundle_id = f"CB-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}-{uuid.uuid4().hex[:8]}"
+
+    # Compute bundle_hash if not provided (server-side fallback).
+    # Daemon v0.3.85+ sends client-computed hashes. Fallback indicates legacy appliance.
+    if not bundle.bundle_hash:
+        logger.warning(f"Server-side hash fallback for site={site_id} — appliance should send bundle_hash (upgrade daemon)")
+        hash_content = json.dumps({
+            "site_id": site_id,
+            "checked_at": bundle.checked_at.isoformat(),
+            "checks": bundle.checks,
+            "summary": bundle.summary
+        }, sort_keys=True)
+        bundle.bundle_hash = hashlib.sha256(hash_content.encode()).hexdigest()
+
+    # Derive check_type from first check if not provided
+    if not bundle.check_type and bundle.checks:
+        bundle.check_type = bundle.checks[0].get("check", "drift")
+    elif not bundle.check_type:
+        bundle.check_type = "drift"
+
+    # Derive check_result from checks if not provided
+    if not bundle.check_result and bundle.checks:
+        statuses = [c.get("status", "unknown") for c in bundle.checks]
+        passing = {"pass", "compliant", "warning"}
+        failing = {"fail", "non_compliant"}
+        if all(s in passing for s in statuses):
+            bundle.check_result = "pass"
+        elif any(s in failing for s in statuses):
+            bundle.check_result = "fail"
+        else:
+            bundle.check_result = "warn"
+    elif not bundle.check_result:
+        bundle.check_result = "unknown"
+
+
+def _evidence_chain_hash(bundle_hash: str, prev_hash: str, chain_position: int) -> str:
+    """chain_hash = sha256("bundle_hash:prev_hash:chain_position")."""
+    chain_data = f"{bundle_hash}:{prev_hash}:{chain_position}"
+    return hashlib.sha256(chain_data.encode()).hexdigest()
+
+
 @router.post("/sites/{site_id}/submit", response_model=EvidenceSubmitResponse)
 async def submit_evidence(
     site_id: str,
@@ -1124,15 +1260,7 @@ async def submit_evidence(
         )
 
     # Verify the Ed25519 signature
-    if bundle.signed_data:
-        signed_data = bundle.signed_data.encode('utf-8')
-    else:
-        signed_data = json.dumps({
-            "site_id": site_id,
-            "checked_at": bundle.checked_at.isoformat(),
-            "checks": bundle.checks,
-            "summary": bundle.summary
-        }, sort_keys=True).encode('utf-8')
+    signed_data = _evidence_signed_data(site_id, bundle)
 
     # Verify signature
     signature_valid = False
@@ -1271,38 +1399,9 @@ async def submit_evidence(
     else:
         logger.warning(f"No agent signature for evidence from site={site_id}")
 
-    # Generate bundle_id if not provided
-    import uuid
-    if not bundle.bundle_id:
-        bundle.bundle_id = f"CB-{datetime.now(timezone.utc).strftime('%Y-%m-%d')}-{uuid.uuid4().hex[:8]}"
-
-    # Compute bundle_hash if not provided (server-side fallback).
-    # Daemon v0.3.85+ sends client-computed hashes. Fallback indicates legacy appliance.
-    if not bundle.bundle_hash:
-        logger.warning(f"Server-side hash fallback for site={site_id} — appliance should send bundle_hash (upgrade daemon)")
-        hash_content = json.dumps({
-            "site_id": site_id,
-            "checked_at": bundle.checked_at.isoformat(),
-            "checks": bundle.checks,
-            "summary": bundle.summary
-        }, sort_keys=True)
-        bundle.bundle_hash = hashlib.sha256(hash_content.encode()).hexdigest()
-
-    # Derive check_type from first check if not provided
-    if not bundle.check_type and bundle.checks:
-        bundle.check_type = bundle.checks[0].get("check", "drift")
-    elif not bundle.check_type:
-        bundle.check_type = "drift"
+    # Fill bundle_id / bundle_hash / check_type / check_result defaults
+    _fill_evidence_defaults(site_id, bundle)
 
-    # Skip operational monitoring bundles — port scans, host reachability, DNS checks
-    # are NOT compliance attestation. Storing them as compliance_bundles produces 400+
-    # "fail" entries/day that tank the score to 0%. Network findings still flow through
-    # the healing pipeline via reportNetDrift().
-    # This set matches the daemon's networkCheckTypes in evidence/submitter.go.
-    OPERATIONAL_MONITORING_TYPES = {
-        "net_unexpected_ports", "net_expected_service",
-        "net_host_reachability", "net_dns_resolution",
-    }
     if bundle.check_type in OPERATIONAL_MONITORING_TYPES:
         logger.info(f"Skipping operational monitoring bundle ({bundle.check_type}) for site={site_id} — not compliance")
         return {
@@ -1315,20 +1414,6 @@ async def submit_evidence(
             "ots_submitted": False,
         }
 
-    # Derive check_result from checks if not provided
-    if not bundle.check_result and bundle.checks:
-        statuses = [c.get("status", "unknown") for c in bundle.checks]
-        passing = {"pass", "compliant", "warning"}
-        failing = {"fail", "non_compliant"}
-        if all(s in passing for s in statuses):
-            bundle.check_result = "pass"
-        elif any(s in failing for s in statuses):
-            bundle.check_result = "fail"
-        else:
-            bundle.check_result = "warn"
-    elif not bundle.check_result:
-        bundle.check_result = "unknown"
-
     # Evidence dedup: skip duplicate bundle hashes within 15-min window.
     # Handles grace-period overlap where two appliances scan the same target.
     # Session 209 P1: write phase moved to tenant_connection(site_id) with
@@ -1431,12 +1516,10 @@ async def submit_evidence(
             site_id,
         )
 
-        GENESIS_HASH = "0" * 64
         prev_hash = prev_bundle["bundle_hash"] if prev_bundle else GENESIS_HASH
         chain_position = (prev_bundle["chain_position"] + 1) if prev_bundle else 1
 
-        chain_data = f"{bundle.bundle_hash}:{prev_hash}:{chain_position}"
-        chain_hash = hashlib.sha256(chain_data.encode()).hexdigest()
+        chain_hash = _evidence_chain_hash(bundle.bundle_hash, prev_hash, chain_position)
 
         await conn.execute(
             """
@@ -1604,6 +1687,16 @@ async def submit_evidence(
             bundle.checks,
         )
 
+    # user-026: the bundle is committed — drop every cached compliance
+    # score (all replicas, L1 + L2) whose tenant scope includes this
+    # site, so dashboards reflect new evidence without waiting out the
+    # 60s TTL. Best-effort; never raises.
+    try:
+        from .perf_cache import invalidate_sites
+    except ImportError:
+        from perf_cache import invalidate_sites  # type: ignore[no-redef]
+    background_tasks.add_task(invalidate_sites, [site_id])
+
     logger.info(f"Evidence submitted: site={site_id} bundle={bundle.bundle_id[:8]} chain={chain_position}")
 
     # Broadcast compliance event for real-time dashboard updates
@@ -1630,6 +1723,505 @@ async def submit_evidence(
     )
 
 
+@router.post("/sites/{site_id}/submit-batch", response_model=EvidenceBatchSubmitResponse)
+async def submit_evidence_batch(
+    site_id: str,
+    batch: EvidenceBatchSubmit,
+    background_tasks: BackgroundTasks,
+    auth_site_id: str = Depends(require_appliance_bearer),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Submit up to EVIDENCE_BATCH_MAX evidence bundles in one request.
+
+    Per-bundle rules are the same as submit_evidence: timestamp window,
+    Ed25519 signature against the per-appliance key, hash-window and
+    bundle_id dedup, the operational-monitoring skip and the chain_hash
+    formula. The expensive parts run once per batch instead of once per
+    bundle:
+
+    - one site lookup, and one key lookup covering every submitted key
+    - a single signature-verification pass before anything is written,
+      parsing each distinct key once (verify_ed25519_signatures)
+    - one pg_advisory_xact_lock and one prev-bundle read. Accepted
+      bundles get consecutive chain positions, each linked to the one
+      before it (group commit)
+    - one multi-row INSERT and one fail→pass auto-resolve UPDATE
+
+    A bad bundle does not fail the whole batch. It comes back with
+    status='rejected' and the others are still chained. Results are
+    returned in request order so the appliance can settle each queue
+    entry.
+    """
+    if site_id != auth_site_id:
+        logger.warning(f"SECURITY: site_id mismatch on evidence batch submit: token={auth_site_id} url={site_id}")
+        raise HTTPException(status_code=403, detail="Site ID mismatch: token does not authorize this site")
+
+    site_result = await db.execute(
+        text("SELECT site_id FROM sites WHERE site_id = :site_id"),
+        {"site_id": site_id}
+    )
+    if not site_result.fetchone():
+        raise HTTPException(status_code=404, detail=f"Site not found: {site_id}")
+
+    bundles = batch.bundles
+    results: List[Optional[EvidenceBatchItemResult]] = [None] * len(bundles)
+
+    def _settle(i: int, status: str, **fields) -> None:
+        results[i] = EvidenceBatchItemResult(
+            index=i, bundle_id=bundles[i].bundle_id, status=status, **fields
+        )
+
+    # ── 1. Admission: timestamp window, signature + key present ─────
+    now = datetime.now(timezone.utc)
+    admitted: List[int] = []
+    for i, bundle in enumerate(bundles):
+        skew = abs((bundle.checked_at - now).total_seconds())
+        if bundle.checked_at > now + timedelta(minutes=2):
+            logger.warning(f"SECURITY: future timestamp rejected for site={site_id}: checked_at={bundle.checked_at} server_now={now}")
+            _settle(i, "rejected", error="Evidence timestamp is in the future")
+            continue
+        if skew > 300:
+            logger.warning(f"SECURITY: timestamp skew {skew:.0f}s for site={site_id}: checked_at={bundle.checked_at} server_now={now}")
+            if skew > 3600:
+                _settle(i, "rejected", error=f"Evidence timestamp too far from server time ({skew:.0f}s skew)")
+                continue
+        if not bundle.agent_signature:
+            _settle(i, "rejected", error="Evidence submission requires agent_signature.")
+            continue
+        # Same key resolution as submit_evidence: a registered
+        # per-appliance key, else self-verify with a well-formed
+        # submitted key. No key → reject (F-P1-1).
+        if not (bundle.agent_public_key and len(bundle.agent_public_key) == 64):
+            _settle(i, "rejected", error="No per-appliance signing key registered for this site.")
+            continue
+        admitted.append(i)
+
+    # ── 2. One key lookup for every distinct submitted key ─────────
+    key_to_appliance: Dict[str, str] = {}
+    keys = sorted({bundles[i].agent_public_key for i in admitted})
+    if keys:
+        appliance_result = await db.execute(text("""
+            SELECT appliance_id, agent_public_key
+            FROM site_appliances  -- noqa: site-appliances-deleted-include — same as submit_evidence: soft-deleted appliances with old keys remain legitimate signers of historical bundles
+            WHERE site_id = :site_id AND agent_public_key = ANY(:keys)
+        """), {"site_id": site_id, "keys": keys})
+        for row in appliance_result.fetchall():
+            key_to_appliance.setdefault(row.agent_public_key, row.appliance_id)
+
+    # ── 3. Signature pass (before any write) ───────────────────────
+    verified: List[Tuple[int, bytes, Optional[str]]] = []
+    rejections: Dict[Optional[str], int] = {}
+    admitted_data = [_evidence_signed_data(site_id, bundles[i]) for i in admitted]
+    signature_ok = verify_ed25519_signatures([
+        (data, bundles[i].agent_signature, bundles[i].agent_public_key)
+        for i, data in zip(admitted, admitted_data)
+    ])
+    for i, signed_data, ok in zip(admitted, admitted_data, signature_ok):
+        bundle = bundles[i]
+        matched_appliance_id = key_to_appliance.get(bundle.agent_public_key)
+        if ok:
+            verified.append((i, signed_data, matched_appliance_id))
+            continue
+        rejections[matched_appliance_id] = rejections.get(matched_appliance_id, 0) + 1
+        detail = "Evidence signature verification failed."
+        if not bundle.signed_data:
+            detail += (
+                " No signed_data provided - serialization mismatch likely. "
+                "Upgrade the appliance agent to include signed_data in evidence."
+            )
+        _settle(i, "rejected", error=detail)
+
+    if rejections:
+        logger.warning(
+            f"Evidence batch: {sum(rejections.values())} signature(s) REJECTED for site={site_id}"
+        )
+        try:
+            for appliance_id, count in rejections.items():
+                if appliance_id:
+                    await db.execute(text("""
+                        UPDATE site_appliances SET
+                            evidence_rejection_count = COALESCE(evidence_rejection_count, 0) + :count,
+                            last_evidence_rejection = NOW()
+                        WHERE appliance_id = :appliance_id
+                    """), {"appliance_id": appliance_id, "count": count})
+                else:
+                    # Session 206 invariant: never charge an unattributed
+                    # rejection to every appliance at the site.
+                    logger.warning(
+                        f"Evidence signature rejection at site {site_id} "
+                        f"could not be attributed to any appliance. "
+                        f"Not incrementing per-appliance counter."
+                    )
+            await db.commit()
+        except Exception as e:
+            logger.error(
+                "evidence_rejection_tracking_failed",
+                extra={"site_id": site_id, "exception_class": type(e).__name__},
+                exc_info=True,
+            )
+
+    if verified:
+        # Auto-register per-appliance keys not yet stored
+        for key in sorted({bundles[i].agent_public_key for i, _, _ in verified}):
+            try:
+                await db.execute(text("""
+                    UPDATE site_appliances SET
+                        agent_public_key = :key
+                    WHERE site_id = :site_id
+                      AND agent_public_key IS NULL
+                      AND appliance_id = (
+                        SELECT appliance_id FROM site_appliances  -- noqa: site-appliances-deleted-include — same legacy fallback as submit_evidence
+                        WHERE site_id = :site_id
+                        ORDER BY last_checkin DESC NULLS LAST LIMIT 1
+                      )
+                """), {"site_id": site_id, "key": key})
+            except Exception as e:
+                logger.error(
+                    "agent_public_key_auto_register_failed",
+                    extra={"site_id": site_id, "exception_class": type(e).__name__},
+                    exc_info=True,
+                )
+
+        # Acceptance + heartbeat: per-appliance if matched, else site-wide
+        matched_ids = sorted({a for _, _, a in verified if a})
+        try:
+            if matched_ids:
+                await db.execute(text("""
+                    UPDATE site_appliances SET
+                        evidence_rejection_count = 0,
+                        last_evidence_accepted = NOW(),
+                        last_checkin = NOW(),
+                        status = 'online',
+                        offline_since = NULL,
+                        offline_notified = false
+                    WHERE appliance_id = ANY(:appliance_ids)
+                """), {"appliance_ids": matched_ids})
+            if any(a is None for _, _, a in verified):
+                await db.execute(text("""
+                    UPDATE site_appliances SET
+                        evidence_rejection_count = 0,
+                        last_evidence_accepted = NOW(),
+                        last_checkin = NOW(),
+                        status = 'online',
+                        offline_since = NULL,
+                        offline_notified = false
+                    WHERE site_id = :site_id
+                """), {"site_id": site_id})
+        except Exception as e:
+            logger.error(
+                "evidence_accept_heartbeat_update_failed",
+                extra={
+                    "site_id": site_id,
+                    "matched_appliance_ids": matched_ids,
+                    "exception_class": type(e).__name__,
+                },
+                exc_info=True,
+            )
+
+    # ── 4. Defaults, operational skip, in-batch dedup ──────────────
+    to_write: List[Tuple[int, bytes, Optional[str]]] = []
+    seen_hashes: set = set()
+    seen_ids: set = set()
+    for i, signed_data, matched_appliance_id in verified:
+        bundle = bundles[i]
+        _fill_evidence_defaults(site_id, bundle)
+        if bundle.check_type in OPERATIONAL_MONITORING_TYPES:
+            _settle(i, "skipped", chain_position=0, prev_hash="", current_hash="")
+            continue
+        if bundle.bundle_hash in seen_hashes or bundle.bundle_id in seen_ids:
+            _settle(i, "deduplicated", bundle_hash=bundle.bundle_hash, error="Duplicate within batch")
+            continue
+        seen_hashes.add(bundle.bundle_hash)
+        seen_ids.add(bundle.bundle_id)
+        to_write.append((i, signed_data, matched_appliance_id))
+
+    # ── 5. Group commit: one lock, consecutive positions, one INSERT ─
+    from .fleet import get_pool
+    from .tenant_middleware import tenant_connection
+
+    initial_ots_status = (
+        "batching" if (OTS_ENABLED and MERKLE_BATCHING_ENABLED) else "pending"
+    )
+    written: List[Tuple[int, Optional[str]]] = []
+
+    if to_write:
+        # The cross-appliance trigger needs a single actor; a batch
+        # mixing appliances (shouldn't happen) runs without one.
+        actors = {a for _, _, a in to_write}
+        actor_appliance_id = next(iter(actors)) if len(actors) == 1 else None
+
+        pool = await get_pool()
+        async with tenant_connection(
+            pool, site_id=site_id, actor_appliance_id=actor_appliance_id
+        ) as conn:
+            recent_rows = await conn.fetch(
+                """
+                SELECT DISTINCT bundle_hash FROM compliance_bundles
+                WHERE site_id = $1
+                  AND bundle_hash = ANY($2::text[])
+                  AND created_at > NOW() - INTERVAL '15 minutes'
+                """,
+                site_id,
+                [bundles[i].bundle_hash for i, _, _ in to_write],
+            )
+            recent_hashes = {r["bundle_hash"] for r in recent_rows}
+            if recent_hashes:
+                kept = []
+                for item in to_write:
+                    bundle = bundles[item[0]]
+                    if bundle.bundle_hash in recent_hashes:
+                        _settle(
+                            item[0], "deduplicated", bundle_hash=bundle.bundle_hash,
+                            error="Bundle already recorded within 15-minute window",
+                        )
+                    else:
+                        kept.append(item)
+                to_write = kept
+
+            if to_write:
+                try:
+                    from .chain_lock_metrics import chain_lock_timer
+                except ImportError:
+                    from chain_lock_metrics import chain_lock_timer  # type: ignore[no-redef]
+                async with chain_lock_timer(site_id):
+                    await conn.execute(
+                        "SELECT pg_advisory_xact_lock(hashtext($1))", site_id
+                    )
+
+                existing_rows = await conn.fetch(
+                    "SELECT bundle_id FROM compliance_bundles WHERE bundle_id = ANY($1::text[])",
+                    [bundles[i].bundle_id for i, _, _ in to_write],
+                )
+                existing_ids = {r["bundle_id"] for r in existing_rows}
+                if existing_ids:
+                    kept = []
+                    for item in to_write:
+                        bundle = bundles[item[0]]
+                        if bundle.bundle_id in existing_ids:
+                            _settle(
+                                item[0], "deduplicated", bundle_hash=bundle.bundle_hash,
+                                error="Bundle already recorded (duplicate bundle_id after hash dedup window)",
+                            )
+                        else:
+                            kept.append(item)
+                    to_write = kept
+
+            if to_write:
+                prev_bundle = await conn.fetchrow(
+                    """
+                    SELECT bundle_id, bundle_hash, chain_position
+                    FROM compliance_bundles
+                    WHERE site_id = $1
+                    ORDER BY chain_position DESC
+                    LIMIT 1
+                    """,
+                    site_id,
+                )
+                prev_id = prev_bundle["bundle_id"] if prev_bundle else None
+                prev_hash = prev_bundle["bundle_hash"] if prev_bundle else GENESIS_HASH
+                chain_position = prev_bundle["chain_position"] if prev_bundle else 0
+
+                cols: Dict[str, list] = {
+                    name: [] for name in (
+                        "bundle_id", "bundle_hash", "check_type", "check_result",
+                        "checked_at", "checks", "summary", "agent_signature",
+                        "signed_data", "ntp_verification", "prev_bundle_id",
+                        "prev_hash", "chain_position", "chain_hash",
+                    )
+                }
+                for i, signed_data, matched_appliance_id in to_write:
+                    bundle = bundles[i]
+                    chain_position += 1
+                    chain_hash = _evidence_chain_hash(bundle.bundle_hash, prev_hash, chain_position)
+                    cols["bundle_id"].append(bundle.bundle_id)
+                    cols["bundle_hash"].append(bundle.bundle_hash)
+                    cols["check_type"].append(bundle.check_type)
+                    cols["check_result"].append(bundle.check_result)
+                    cols["checked_at"].append(bundle.checked_at)
+                    cols["checks"].append(json.dumps(bundle.checks))
+                    cols["summary"].append(json.dumps(bundle.summary))
+                    cols["agent_signature"].append(bundle.agent_signature)
+                    cols["signed_data"].append(signed_data.decode("utf-8"))
+                    cols["ntp_verification"].append(
+                        json.dumps(bundle.ntp_verification) if bundle.ntp_verification else None
+                    )
+                    cols["prev_bundle_id"].append(prev_id)
+                    cols["prev_hash"].append(prev_hash)
+                    cols["chain_position"].append(chain_position)
+                    cols["chain_hash"].append(chain_hash)
+                    _settle(
+                        i, "accepted",
+                        chain_position=chain_position,
+                        prev_hash=prev_hash,
+                        current_hash=chain_hash,
+                        bundle_hash=bundle.bundle_hash,
+                    )
+                    written.append((i, matched_appliance_id))
+                    prev_id, prev_hash = bundle.bundle_id, bundle.bundle_hash
+
+                # Only verified bundles reach here → signature_valid = TRUE.
+                await conn.execute(
+                    """
+                    INSERT INTO compliance_bundles (
+                        site_id, bundle_id, bundle_hash, check_type, check_result, checked_at,
+                        checks, summary, agent_signature, signed_data, signature_valid, ntp_verification,
+                        prev_bundle_id, prev_hash, chain_position, chain_hash,
+                        ots_status
+                    )
+                    SELECT $1, b.bundle_id, b.bundle_hash, b.check_type, b.check_result, b.checked_at,
+                           b.checks::jsonb, b.summary::jsonb, b.agent_signature, b.signed_data, TRUE,
+                           b.ntp_verification::jsonb,
+                           b.prev_bundle_id, b.prev_hash, b.chain_position, b.chain_hash,
+                           $2
+                      FROM unnest(
+                           $3::text[], $4::text[], $5::text[], $6::text[], $7::timestamptz[],
+                           $8::text[], $9::text[], $10::text[], $11::text[], $12::text[],
+                           $13::text[], $14::text[], $15::int[], $16::text[]
+                      ) AS b(bundle_id, bundle_hash, check_type, check_result, checked_at,
+                             checks, summary, agent_signature, signed_data, ntp_verification,
+                             prev_bundle_id, prev_hash, chain_position, chain_hash)
+                     ORDER BY b.chain_position
+                    """,
+                    site_id,
+                    initial_ots_status,
+                    *cols.values(),
+                )
+
+                # fail→pass auto-resolve, one UPDATE for the whole batch.
+                # Same statement and failure posture as submit_evidence:
+                # raising aborts the INSERT too.
+                try:
+                    passing_pairs = [
+                        {"check_type": c.get("check"), "hostname": c.get("hostname")}
+                        for i, _ in written
+                        for c in (bundles[i].checks or [])
+                        if c.get("status") == "pass"
+                        and c.get("check")
+                        and c.get("hostname")
+                    ]
+                    if passing_pairs:
+                        resolved_rows = await conn.fetch(
+                            """
+                            WITH passing AS (
+                                SELECT DISTINCT (e->>'check_type') AS check_type,
+                                       (e->>'hostname') AS hostname
+                                  FROM jsonb_array_elements($2::jsonb) AS e
+                            ),
+                            matched AS (
+                                SELECT i.id
+                                  FROM incidents i
+                                  JOIN passing p
+                                    ON i.incident_type = p.check_type
+                                   AND i.details->>'hostname' = p.hostname
+                                 WHERE i.site_id = $1
+                                   AND i.status = 'open'
+                            )
+                            UPDATE incidents
+                               SET status = 'resolved',
+                                   resolved_at = NOW(),
+                                   resolution_tier = 'recovered'
+                              FROM matched
+                             WHERE incidents.id = matched.id
+                            RETURNING incidents.id
+                            """,
+                            site_id,
+                            json.dumps(passing_pairs),
+                        )
+                        if resolved_rows:
+                            logger.info(
+                                "evidence_auto_recovered_incidents",
+                                extra={
+                                    "site_id": site_id,
+                                    "batch_size": len(written),
+                                    "count": len(resolved_rows),
+                                },
+                            )
+                except Exception as e:
+                    logger.error(
+                        "evidence_auto_recover_failed",
+                        exc_info=True,
+                        extra={
+                            "site_id": site_id,
+                            "batch_size": len(written),
+                            "exception_class": type(e).__name__,
+                        },
+                    )
+                    raise
+
+    # ── 6. Post-commit fan-out (per bundle, as submit_evidence) ────
+    worm_enabled = os.getenv("WORM_ENABLED", "true").lower() == "true"
+    for i, matched_appliance_id in written:
+        bundle = bundles[i]
+        if OTS_ENABLED and not MERKLE_BATCHING_ENABLED:
+            background_tasks.add_task(
+                submit_ots_proof_background,
+                db,
+                bundle.bundle_id,
+                bundle.bundle_hash,
+                site_id,
+            )
+        if worm_enabled:
+            background_tasks.add_task(
+                upload_to_worm_background,
+                site_id,
+                bundle.bundle_id,
+                bundle.bundle_hash,
+                bundle.model_dump(),
+                bundle.agent_signature
+            )
+        if bundle.checks:
+            background_tasks.add_task(
+                map_evidence_to_frameworks,
+                site_id,
+                bundle.bundle_id,
+                bundle.checks,
+                matched_appliance_id,
+            )
+        if bundle.check_type == "workstation" and bundle.checks:
+            background_tasks.add_task(
+                populate_workstation_tables,
+                site_id,
+                bundle.checks,
+            )
+
+    if written:
+        try:
+            from .perf_cache import invalidate_sites
+        except ImportError:
+            from perf_cache import invalidate_sites  # type: ignore[no-redef]
+        background_tasks.add_task(invalidate_sites, [site_id])
+
+        last = bundles[written[-1][0]]
+        last_position = results[written[-1][0]].chain_position
+        logger.info(
+            f"Evidence batch submitted: site={site_id} bundles={len(written)} "
+            f"chain={last_position - len(written) + 1}..{last_position}"
+        )
+        try:
+            from .websocket_manager import broadcast_event
+            await broadcast_event("compliance_drift", {
+                "site_id": site_id,
+                "check_type": last.check_type,
+                "check_result": last.check_result,
+                "bundle_id": last.bundle_id,
+                "chain_position": last_position,
+                "batch_size": len(written),
+            })
+        except Exception as e:
+            logger.debug(f"Evidence broadcast failed: {e}")
+
+    counts = {"accepted": 0, "deduplicated": 0, "skipped": 0, "rejected": 0}
+    for r in results:
+        counts[r.status] += 1
+    return EvidenceBatchSubmitResponse(
+        site_id=site_id,
+        ots_status="pending" if OTS_ENABLED else "none",
+        results=results,
+        **counts,
+    )
+
+
 @router.get("/sites/{site_id}/signing-status")
 async def get_signing_status(
     site_id: str,
@@ -1755,6 +2347,119 @@ async def upload_to_worm_background(
         logger.error(f"WORM upload failed for {bundle_id}: {e}")
 
 
+# Framework mapping (map_evidence_to_frameworks). Unchanged controls are
+# not re-written for every bundle — only when the site's latest written
+# status differs, or the latest write is older than the re-assert
+# horizon (keeps every live control inside calculate_compliance_score's
+# 30-day window). Every evaluated control still gets its
+# control_last_evaluated row bumped (mig 338), which is where
+# v_control_status reads last_checked from. Score refreshes are
+# coalesced per appliance.
+CONTROL_MAPPING_REASSERT_SECONDS = int(os.getenv("CONTROL_MAPPING_REASSERT_SECONDS", "21600"))
+SCORE_REFRESH_DEBOUNCE_SECONDS = float(os.getenv("SCORE_REFRESH_DEBOUNCE_SECONDS", "5"))
+ENABLED_FRAMEWORKS_TTL_SECONDS = 60.0
+
+# site_id -> (monotonic expiry, enabled frameworks)
+_enabled_frameworks_cache: Dict[str, Tuple[float, List[str]]] = {}
+# appliance_id -> (site_id, frameworks) awaiting the debounced refresh
+_pending_score_refresh: Dict[str, Tuple[str, set]] = {}
+_score_refresh_tasks: Dict[str, "asyncio.Task"] = {}
+
+
+async def _enabled_frameworks(conn, site_id: str) -> List[str]:
+    cached = _enabled_frameworks_cache.get(site_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    row = await conn.fetchrow(
+        "SELECT enabled_frameworks FROM appliance_framework_configs WHERE site_id = $1",
+        site_id,
+    )
+    if not row:
+        # Try by appliance_id pattern (site_id is embedded in appliance_id)
+        row = await conn.fetchrow(
+            "SELECT enabled_frameworks FROM appliance_framework_configs WHERE appliance_id LIKE $1",
+            f"{site_id}%",
+        )
+    if not row or not row["enabled_frameworks"]:
+        # Default to hipaa if no config exists
+        enabled = ["hipaa"]
+    else:
+        enabled = list(row["enabled_frameworks"])
+    _enabled_frameworks_cache[site_id] = (
+        time.monotonic() + ENABLED_FRAMEWORKS_TTL_SECONDS, enabled,
+    )
+    return enabled
+
+
+def _schedule_score_refresh(appliance_id: str, site_id: str, frameworks) -> None:
+    """Queue a compliance-score refresh; a burst of bundles from one
+    appliance inside the debounce window costs ONE refresh per framework."""
+    entry = _pending_score_refresh.setdefault(appliance_id, (site_id, set()))
+    entry[1].update(frameworks)
+    if appliance_id not in _score_refresh_tasks:
+        _score_refresh_tasks[appliance_id] = asyncio.create_task(
+            _run_score_refresh(appliance_id)
+        )
+
+
+async def _run_score_refresh(appliance_id: str) -> None:
+    await asyncio.sleep(SCORE_REFRESH_DEBOUNCE_SECONDS)
+    # Detach before refreshing: bundles arriving mid-refresh schedule a
+    # fresh task rather than being folded into work already underway.
+    _score_refresh_tasks.pop(appliance_id, None)
+    site_id, frameworks = _pending_score_refresh.pop(appliance_id)
+    try:
+        from .fleet import get_pool
+        from .tenant_middleware import admin_transaction
+        pool = await get_pool()
+        # MUST pass appliance_id (NOT site_id) — refresh_compliance_score
+        # is per-appliance scoped. Pre-Block-3 we passed site_id,
+        # which silently failed the SQL function's site_id resolution
+        # (cast to UUID exception, fall through to NULL, INSERT
+        # CHECK violation). Result: compliance_scores empty
+        # fleet-wide. Migration 265 also adds a VARCHAR
+        # site_appliances.appliance_id fallback as defense-in-depth.
+        async with admin_transaction(pool) as conn:
+            for framework in sorted(frameworks):
+                try:
+                    async with conn.transaction():  # nested savepoint
+                        await conn.execute(
+                            "SELECT refresh_compliance_score($1, $2)",
+                            appliance_id,
+                            framework,
+                        )
+                except Exception as e:
+                    # Per CLAUDE.md "no silent write failures" —
+                    # but only ERROR for unexpected (the function's
+                    # own NOT-NULL guard is now a benign skip).
+                    logger.error(
+                        "compliance_score_refresh_failed",
+                        exc_info=True,
+                        extra={
+                            "site_id": site_id,
+                            "appliance_id": appliance_id,
+                            "framework": framework,
+                            "exception_class": type(e).__name__,
+                        },
+                    )
+    except Exception as e:
+        logger.error(
+            "compliance_score_refresh_failed",
+            exc_info=True,
+            extra={
+                "site_id": site_id,
+                "appliance_id": appliance_id,
+                "exception_class": type(e).__name__,
+            },
+        )
+        return
+    try:
+        from .perf_cache import invalidate_sites
+        await invalidate_sites([site_id])
+    except Exception:
+        logger.debug("score refresh: perf_cache invalidation skipped", exc_info=True)
+
+
 async def map_evidence_to_frameworks(
     site_id: str,
     bundle_id: str,
@@ -1766,13 +2471,24 @@ async def map_evidence_to_frameworks(
     Populates evidence_framework_mappings table and refreshes compliance_scores.
     Called as a background task after evidence submission.
 
+    Controls resolve through framework_mapper.control_index (precomputed
+    per enabled-framework set). Only controls whose aggregated status
+    differs from the site's latest written status — or whose latest
+    write is older than CONTROL_MAPPING_REASSERT_SECONDS — are written,
+    in one bulk statement. calculate_compliance_score reads the latest
+    row per control, so skipping an unchanged control leaves every
+    score identical. Every evaluated control's last-evaluated time is
+    upserted regardless (control_last_evaluated, mig 338) so
+    v_control_status.last_checked tracks the latest bundle.
+
     `appliance_id` is the matched per-appliance natural key resolved
     during signature verification. Required for `refresh_compliance_score`
     which is per-appliance scoped (NOT per-site). Optional for
     backwards-compat with older callers that didn't pass it; the score
-    refresh skips when appliance_id is None.
+    refresh skips when appliance_id is None. Refreshes are debounced
+    per appliance (_schedule_score_refresh).
     """
-    from .framework_mapper import get_controls_for_check_with_hipaa_map
+    from .framework_mapper import control_index
 
     try:
         pool = None
@@ -1803,22 +2519,8 @@ async def map_evidence_to_frameworks(
             return "unknown"
 
         async with admin_transaction(pool) as conn:
-            # Get enabled frameworks for this site
-            row = await conn.fetchrow(
-                "SELECT enabled_frameworks FROM appliance_framework_configs WHERE site_id = $1",
-                site_id,
-            )
-            if not row:
-                # Try by appliance_id pattern (site_id is embedded in appliance_id)
-                row = await conn.fetchrow(
-                    "SELECT enabled_frameworks FROM appliance_framework_configs WHERE appliance_id LIKE $1",
-                    f"{site_id}%",
-                )
-            if not row or not row["enabled_frameworks"]:
-                # Default to hipaa if no config exists
-                enabled = ["hipaa"]
-            else:
-                enabled = list(row["enabled_frameworks"])
+            enabled = await _enabled_frameworks(conn, site_id)
+            index = control_index(enabled)
 
             # Build per-control aggregation: (framework, control_id) → list[status]
             control_to_statuses: dict[tuple[str, str], list[str]] = {}
@@ -1827,82 +2529,81 @@ async def map_evidence_to_frameworks(
                 status = check.get("status")
                 if not check_type or not status:
                     continue
-                controls = get_controls_for_check_with_hipaa_map(check_type, enabled)
-                for ctrl in controls:
-                    key = (ctrl["framework"], ctrl["control_id"])
+                for key in index.get(check_type, ()):
                     control_to_statuses.setdefault(key, []).append(status)
 
-            # Per-control INSERT in a savepoint so a single failed row
-            # doesn't poison the outer admin_transaction (coach #2 +
-            # CLAUDE.md asyncpg savepoint invariant + Block 3 sweep).
+            # Brian delta (D1 round-table): defensive guard before _agg
+            # — empty statuses list shouldn't reach here (we skip
+            # check entries without a status), but belt-and-suspenders.
+            aggregated = {
+                key: _agg(statuses)
+                for key, statuses in control_to_statuses.items()
+                if statuses
+            }
+            if not aggregated:
+                return
+
+            # Site's latest written status per control inside the
+            # re-assert horizon (same DISTINCT ON ordering as
+            # calculate_compliance_score). Missing = never written or
+            # too old → write.
+            latest = await conn.fetch(
+                """
+                SELECT DISTINCT ON (efm.framework, efm.control_id)
+                       efm.framework, efm.control_id, efm.check_status
+                  FROM compliance_bundles cb
+                  JOIN evidence_framework_mappings efm
+                    ON efm.bundle_id = cb.bundle_id
+                 WHERE cb.site_id = $1
+                   AND cb.created_at >= NOW() - make_interval(secs => $2)
+                   AND efm.framework = ANY($3::text[])
+                   AND efm.check_status IS NOT NULL
+                   AND cb.bundle_id <> $4
+                 ORDER BY efm.framework, efm.control_id, cb.created_at DESC
+                """,
+                site_id, CONTROL_MAPPING_REASSERT_SECONDS, enabled, bundle_id,
+            )
+            last_status = {
+                (r["framework"], r["control_id"]): r["check_status"] for r in latest
+            }
+            changed = [
+                (framework, control_id, agg)
+                for (framework, control_id), agg in aggregated.items()
+                if last_status.get((framework, control_id)) != agg
+            ]
+
             mappings_inserted = 0
-            for (framework, control_id), statuses in control_to_statuses.items():
-                # Brian delta (D1 round-table): defensive guard before _agg
-                # — empty statuses list shouldn't reach here (we skip
-                # check entries without a status), but belt-and-suspenders.
-                if not statuses:
-                    continue
-                agg = _agg(statuses)
+            if changed:
                 try:
                     async with conn.transaction():  # nested savepoint
                         await conn.execute(
                             """
                             INSERT INTO evidence_framework_mappings
                                 (bundle_id, framework, control_id, check_status)
-                            VALUES ($1, $2, $3, $4)
+                            SELECT $1, u.framework, u.control_id, u.check_status
+                              FROM unnest($2::text[], $3::text[], $4::text[])
+                                   AS u(framework, control_id, check_status)
                             ON CONFLICT (bundle_id, framework, control_id)
                             DO UPDATE SET check_status = EXCLUDED.check_status
                             """,
-                            bundle_id, framework, control_id, agg,
+                            bundle_id,
+                            [c[0] for c in changed],
+                            [c[1] for c in changed],
+                            [c[2] for c in changed],
                         )
-                        mappings_inserted += 1
-                except Exception as e:
-                    # Per CLAUDE.md "no silent write failures" — coach #2
-                    # of D1 design. evidence_framework_mappings is the
-                    # writer-side projection that powers compliance scores;
-                    # silent failure here = the score regression class
-                    # this fix is closing in the first place.
-                    logger.error(
-                        "evidence_framework_mapping_insert_failed",
-                        exc_info=True,
-                        extra={
-                            "bundle_id": bundle_id,
-                            "framework": framework,
-                            "control_id": control_id,
-                            "exception_class": type(e).__name__,
-                        },
+                        mappings_inserted = len(changed)
+                except Exception:
+                    # Bulk write failed: fall back to per-control
+                    # savepoints so one bad row can't drop the rest.
+                    mappings_inserted = await _insert_mappings_per_row(
+                        conn, bundle_id, changed,
                     )
 
-            # Refresh compliance scores for each enabled framework.
-            # MUST pass appliance_id (NOT site_id) — refresh_compliance_score
-            # is per-appliance scoped. Pre-Block-3 we passed site_id,
-            # which silently failed the SQL function's site_id resolution
-            # (cast to UUID exception, fall through to NULL, INSERT
-            # CHECK violation). Result: compliance_scores empty
-            # fleet-wide. Migration 265 also adds a VARCHAR
-            # site_appliances.appliance_id fallback as defense-in-depth.
+            await _touch_control_last_evaluated(conn, site_id, list(aggregated))
+
             if appliance_id:
-                for framework in enabled:
-                    try:
-                        await conn.execute(
-                            "SELECT refresh_compliance_score($1, $2)",
-                            appliance_id,
-                            framework,
-                        )
-                    except Exception as e:
-                        # Per CLAUDE.md "no silent write failures" —
-                        # but only ERROR for unexpected (the function's
-                        # own NOT-NULL guard is now a benign skip).
-                        logger.error(
-                            "compliance_score_refresh_failed",
-                            exc_info=True,
-                            extra={
-                                "site_id": site_id,
-                                "appliance_id": appliance_id,
-                                "framework": framework,
-                                "exception_class": type(e).__name__,
-                            },
-                        )
+                if mappings_inserted:
+                    _schedule_score_refresh(appliance_id, site_id, enabled)
             else:
                 logger.warning(
                     "compliance_score_refresh_skipped_no_appliance_id",
@@ -1912,13 +2613,74 @@ async def map_evidence_to_frameworks(
             if mappings_inserted > 0:
                 logger.info(
                     f"Framework mapping: site={site_id} bundle={bundle_id[:8]} "
-                    f"mappings={mappings_inserted} frameworks={enabled}"
+                    f"mappings={mappings_inserted}/{len(aggregated)} frameworks={enabled}"
                 )
 
     except Exception as e:
         logger.warning(f"Framework mapping failed for {site_id}: {e}")
 
 
+async def _touch_control_last_evaluated(conn, site_id: str, keys) -> None:
+    """One upsert stamping every control this bundle evaluated, changed
+    or not. Savepointed: a failure (mig 338 not applied yet) must not
+    poison the mapping transaction."""
+    try:
+        async with conn.transaction():  # nested savepoint
+            await conn.execute(
+                """
+                INSERT INTO control_last_evaluated
+                    (site_id, framework, control_id, last_evaluated_at)
+                SELECT $1, u.framework, u.control_id, NOW()
+                  FROM unnest($2::text[], $3::text[]) AS u(framework, control_id)
+                ON CONFLICT (site_id, framework, control_id)
+                DO UPDATE SET last_evaluated_at = EXCLUDED.last_evaluated_at
+                """,
+                site_id,
+                [k[0] for k in keys],
+                [k[1] for k in keys],
+            )
+    except Exception as e:
+        logger.warning(f"control_last_evaluated upsert failed for {site_id}: {e}")
+
+
+async def _insert_mappings_per_row(conn, bundle_id: str, rows) -> int:
+    """Per-control INSERT in a savepoint so a single failed row
+    doesn't poison the outer admin_transaction (coach #2 +
+    CLAUDE.md asyncpg savepoint invariant + Block 3 sweep)."""
+    inserted = 0
+    for framework, control_id, agg in rows:
+        try:
+            async with conn.transaction():  # nested savepoint
+                await conn.execute(
+                    """
+                    INSERT INTO evidence_framework_mappings
+                        (bundle_id, framework, control_id, check_status)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (bundle_id, framework, control_id)
+                    DO UPDATE SET check_status = EXCLUDED.check_status
+                    """,
+                    bundle_id, framework, control_id, agg,
+                )
+                inserted += 1
+        except Exception as e:
+            # Per CLAUDE.md "no silent write failures" — coach #2
+            # of D1 design. evidence_framework_mappings is the
+            # writer-side projection that powers compliance scores;
+            # silent failure here = the score regression class
+            # this fix is closing in the first place.
+            logger.error(
+                "evidence_framework_mapping_insert_failed",
+                exc_info=True,
+                extra={
+                    "bundle_id": bundle_id,
+                    "framework": framework,
+                    "control_id": control_id,
+                    "exception_class": type(e).__name__,
+                },
+            )
+    return inserted
+
+
 async def populate_workstation_tables(site_id: str, checks: List[Dict[str, Any]]):
     """Populate workstations, workstation_checks, and site_workstation_summaries tables.
 
@@ -3783,17 +4545,22 @@ async def verify_batch(
 ):
     """Batch verify recent evidence bundles for a site.
 
-    Checks chain linkage and signature presence for all bundles
-    submitted in the last 24 hours. Returns a summary suitable
+    Checks chain linkage for all bundles submitted in the last 24 hours
+    and verifies their Ed25519 signatures against the signing
+    appliance's current (or previous) key. Returns a summary suitable
     for auditor review.
 
+    Predecessors are resolved from the fetched window plus one query for
+    those outside it, and signatures are checked in one pass
+    (verify_ed25519_signatures) — no per-bundle queries.
+
     Auth: admin (require_auth).
     """
     from .auth import require_auth
     await require_auth(request)
 
-    # admin_transaction (wave-40): verify_batch issues 2 admin reads
-    # (bundle batch + signature verification audit row).
+    # admin_transaction (wave-40): verify_batch issues its admin reads
+    # (bundle batch, predecessors, signing keys) in one transaction.
     from .fleet import get_pool
     from .tenant_middleware import admin_transaction
     pool = await get_pool()
@@ -3801,7 +4568,7 @@ async def verify_batch(
         bundles = await conn.fetch(
             """
             SELECT bundle_id, bundle_hash, prev_hash, chain_position,
-                   agent_signature, chain_hash
+                   agent_signature, chain_hash, appliance_id, signed_data
             FROM compliance_bundles
             WHERE site_id = $1 AND created_at > NOW() - INTERVAL '24 hours'
             ORDER BY chain_position DESC
@@ -3809,12 +4576,34 @@ async def verify_batch(
             site_id,
         )
 
+        hash_at: Dict[int, Optional[str]] = {
+            b["chain_position"]: b["bundle_hash"] for b in bundles
+        }
+        outside = sorted({
+            b["chain_position"] - 1 for b in bundles
+            if b["chain_position"] != 1 and b["chain_position"] - 1 not in hash_at
+        })
+        if outside:
+            for row in await conn.fetch(
+                """
+                SELECT chain_position, bundle_hash FROM compliance_bundles
+                WHERE site_id = $1 AND chain_position = ANY($2::int[])
+                """,
+                site_id,
+                outside,
+            ):
+                hash_at[row["chain_position"]] = row["bundle_hash"]
+
         results = {
             "site_id": site_id,
             "total": len(bundles),
             "passed": 0,
             "failed": 0,
             "failures": [],
+            "signatures": _verify_bundle_signatures(
+                bundles,
+                await _appliance_signing_keys(conn, site_id, bundles),
+            ),
         }
 
         GENESIS_HASH = "0" * 64
@@ -3827,19 +4616,10 @@ async def verify_batch(
                 # Genesis bundle: prev_hash should be all-zeros
                 if not hmac.compare_digest(b["prev_hash"] or "", GENESIS_HASH):
                     issues.append("genesis_prev_hash_mismatch")
-            else:
-                prev = await conn.fetchrow(
-                    """
-                    SELECT bundle_hash FROM compliance_bundles
-                    WHERE site_id = $1 AND chain_position = $2
-                    """,
-                    site_id,
-                    b["chain_position"] - 1,
-                )
-                if prev is None:
-                    issues.append("predecessor_missing")
-                elif not hmac.compare_digest(b["prev_hash"] or "", prev["bundle_hash"] or ""):
-                    issues.append("chain_break")
+            elif b["chain_position"] - 1 not in hash_at:
+                issues.append("predecessor_missing")
+            elif not hmac.compare_digest(b["prev_hash"] or "", hash_at[b["chain_position"] - 1] or ""):
+                issues.append("chain_break")
 
             # Verify chain_hash self-consistency
             chain_data = f"{b['bundle_hash']}:{b['prev_hash'] or 'genesis'}:{b['chain_position']}"
@@ -3859,12 +4639,72 @@ async def verify_batch(
 
         logger.info(
             f"Batch verify: site={site_id} total={results['total']} "
-            f"passed={results['passed']} failed={results['failed']}"
+            f"passed={results['passed']} failed={results['failed']} "
+            f"signatures_invalid={results['signatures']['invalid']}"
         )
 
         return results
 
 
+async def _appliance_signing_keys(conn, site_id: str, bundles) -> Dict[str, List[str]]:
+    """Current and previous evidence keys for the appliances that signed bundles."""
+    appliance_ids = sorted({
+        b["appliance_id"] for b in bundles if b["agent_signature"] and b["appliance_id"]
+    })
+    if not appliance_ids:
+        return {}
+    rows = await conn.fetch(
+        """
+        SELECT appliance_id, agent_public_key, previous_agent_public_key
+        FROM site_appliances  -- noqa: site-appliances-deleted-include — auditor verification: bundles signed by since-deleted appliances must still verify
+        WHERE site_id = $1 AND appliance_id = ANY($2::text[])
+        """,
+        site_id,
+        appliance_ids,
+    )
+    return {
+        r["appliance_id"]: [k for k in (r["agent_public_key"], r["previous_agent_public_key"]) if k]
+        for r in rows
+    }
+
+
+def _verify_bundle_signatures(bundles, keys_by_appliance: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Verify stored signatures, trying each appliance key in turn.
+
+    Bundles without a signature, stored signed_data or a known key are
+    counted as unverifiable rather than invalid: key history beyond the
+    previous key isn't kept.
+    """
+    summary: Dict[str, Any] = {"verified": 0, "invalid": 0, "unverifiable": 0, "invalid_bundle_ids": []}
+    pending = []
+    for b in bundles:
+        keys = keys_by_appliance.get(b["appliance_id"]) or []
+        if not (b["agent_signature"] and b["signed_data"] and keys):
+            summary["unverifiable"] += 1
+            continue
+        pending.append((b, keys))
+
+    attempt = 0
+    while pending:
+        batch = [(b, keys) for b, keys in pending if attempt < len(keys)]
+        exhausted = [b for b, keys in pending if attempt >= len(keys)]
+        for b in exhausted:
+            summary["invalid"] += 1
+            summary["invalid_bundle_ids"].append(b["bundle_id"])
+        ok = verify_ed25519_signatures([
+            (b["signed_data"].encode("utf-8"), b["agent_signature"], keys[attempt])
+            for b, keys in batch
+        ])
+        pending = []
+        for (b, keys), valid in zip(batch, ok):
+            if valid:
+                summary["verified"] += 1
+            else:
+                pending.append((b, keys))
+        attempt += 1
+    return summary
+
+
 @router.get("/sites/{site_id}/verify-merkle/{bundle_id}")
 async def verify_merkle_proof_endpoint(
     site_id: str,
@@ -4,6 +4,9 @@ Provides database queries for multi-tenant fleet aggregation,
 client overview, appliance details, and health metrics.
 """
 
+import asyncio
+import json
+import logging
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any
 import asyncpg
@@ -27,6 +30,8 @@ from .metrics import (
     aggregate_health_scores,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # =============================================================================
 # DATABASE CONNECTION — asyncpg pool for RLS-enforced queries
@@ -107,57 +112,28 @@ def _row_to_incident(row: asyncpg.Record, site_id: str, hostname: str) -> Incide
     )
 
 
-async def _get_appliance_health(
-    pool: asyncpg.Pool,
-    appliance_id: int,
-    last_checkin: Optional[datetime],
-) -> HealthMetrics:
-    """Calculate health metrics for a single appliance."""
-    # admin_transaction (wave-21): _get_appliance_health issues 3
-    # admin reads (incidents + drift + tickets).
-    async with admin_transaction(pool) as conn:
-        # Get incident stats
-        incident_stats = await conn.fetchrow("""
-            SELECT
-                COUNT(*) as total_incidents,
-                COUNT(*) FILTER (WHERE resolved_at IS NOT NULL) as resolved_incidents
-            FROM incidents
-            WHERE appliance_id = $1
-            AND created_at > NOW() - INTERVAL '30 days'
-        """, appliance_id)
-
-        # Get order stats
-        order_stats = await conn.fetchrow("""
-            SELECT
-                COUNT(*) as total_orders,
-                COUNT(*) FILTER (WHERE status = 'executed') as executed_orders
-            FROM orders
-            WHERE appliance_id = $1
-            AND created_at > NOW() - INTERVAL '30 days'
-        """, appliance_id)
-
-        # Get latest compliance data from drift_data
-        compliance_row = await conn.fetchrow("""
-            SELECT drift_data
-            FROM incidents
-            WHERE appliance_id = $1
-            ORDER BY created_at DESC
-            LIMIT 1
-        """, appliance_id)
-
-    # Calculate connectivity
+def _health_from_snapshot(row: asyncpg.Record) -> HealthMetrics:
+    """Health metrics for one appliance from a snapshot-joined row.
+
+    Same math as before Migration 334: 30-day incident and order rates,
+    checkin freshness from the live last_checkin, compliance from the
+    latest incident's drift_data. An appliance whose snapshot row hasn't
+    been filled yet scores as one with no incidents or orders.
+    """
     connectivity = calculate_connectivity_score(
-        last_checkin=last_checkin,
-        successful_heals=incident_stats["resolved_incidents"] if incident_stats else 0,
-        total_incidents=incident_stats["total_incidents"] if incident_stats else 0,
-        executed_orders=order_stats["executed_orders"] if order_stats else 0,
-        total_orders=order_stats["total_orders"] if order_stats else 0,
+        last_checkin=row["last_checkin"],
+        successful_heals=row["resolved_incidents_30d"] or 0,
+        total_incidents=row["total_incidents_30d"] or 0,
+        executed_orders=row["executed_orders_30d"] or 0,
+        total_orders=row["total_orders_30d"] or 0,
     )
 
     # Calculate compliance (parse from drift_data or default)
     compliance_data = {}
-    if compliance_row and compliance_row["drift_data"]:
-        drift = compliance_row["drift_data"]
+    drift = row["latest_drift_data"]
+    if isinstance(drift, str):
+        drift = json.loads(drift)
+    if drift:
         # Map drift data to compliance checks
         compliance_data = {
             "patching": drift.get("patching_compliant", False),
@@ -173,6 +149,152 @@ async def _get_appliance_health(
     return calculate_overall_health(connectivity, compliance)
 
 
+# =============================================================================
+# HEALTH SNAPSHOT MAINTENANCE (Migration 334)
+# =============================================================================
+
+HEALTH_SNAPSHOT_TICK_SECONDS = 30
+# Clean rows are still recomputed once this old so the 24h / 30d
+# windows keep sliding for appliances with no new activity.
+HEALTH_SNAPSHOT_MAX_AGE_SECONDS = 900
+HEALTH_SNAPSHOT_BATCH = 500
+
+# One statement per batch: pick dirty/stale/missing rows, aggregate
+# incidents and orders for just those appliances, upsert. refreshed_seq
+# is set to the change_seq read in `targets`, so a trigger that fires
+# while this runs keeps the row dirty.
+_REFRESH_HEALTH_SNAPSHOT_SQL = """
+    WITH targets AS (
+        SELECT sa.legacy_uuid, sa.legacy_uuid::text AS appliance_id, sa.site_id,
+               COALESCE(h.change_seq, 1) AS seq
+          FROM site_appliances sa
+          LEFT JOIN appliance_health_snapshot h
+                 ON h.appliance_id = sa.legacy_uuid::text
+         WHERE sa.deleted_at IS NULL
+           AND sa.legacy_uuid IS NOT NULL
+           AND (h.appliance_id IS NULL
+                OR h.change_seq > h.refreshed_seq
+                OR h.refreshed_at IS NULL
+                OR h.refreshed_at < NOW() - make_interval(secs => $1))
+         ORDER BY (h.appliance_id IS NULL OR h.change_seq > h.refreshed_seq) DESC,
+                  h.refreshed_at NULLS FIRST
+         LIMIT $2
+    ), inc AS (
+        SELECT i.appliance_id::text AS appliance_id,
+               COUNT(*) AS total_incidents,
+               COUNT(*) FILTER (WHERE i.resolved_at IS NOT NULL) AS resolved_incidents,
+               COUNT(*) FILTER (WHERE i.created_at > NOW() - INTERVAL '24 hours') AS incidents_24h
+          FROM incidents i
+          JOIN targets t ON i.appliance_id = t.legacy_uuid
+         WHERE i.created_at > NOW() - INTERVAL '30 days'
+           AND i.site_id NOT LIKE 'synthetic-%'
+         GROUP BY 1
+    ), ord AS (
+        SELECT o.appliance_id,
+               COUNT(*) AS total_orders,
+               COUNT(*) FILTER (WHERE o.status = 'executed') AS executed_orders
+          FROM orders o
+          JOIN targets t ON o.appliance_id = t.appliance_id
+         WHERE o.created_at > NOW() - INTERVAL '30 days'
+         GROUP BY 1
+    )
+    INSERT INTO appliance_health_snapshot AS h (
+        appliance_id, site_id,
+        total_incidents_30d, resolved_incidents_30d,
+        total_orders_30d, executed_orders_30d,
+        incidents_24h, last_incident_at, latest_drift_data,
+        change_seq, refreshed_seq, refreshed_at
+    )
+    SELECT t.appliance_id, t.site_id,
+           COALESCE(inc.total_incidents, 0), COALESCE(inc.resolved_incidents, 0),
+           COALESCE(ord.total_orders, 0), COALESCE(ord.executed_orders, 0),
+           COALESCE(inc.incidents_24h, 0), latest.created_at, latest.drift_data,
+           t.seq, t.seq, NOW()
+      FROM targets t
+      LEFT JOIN inc ON inc.appliance_id = t.appliance_id
+      LEFT JOIN ord ON ord.appliance_id = t.appliance_id
+      LEFT JOIN LATERAL (
+          SELECT i.created_at, i.drift_data
+            FROM incidents i
+           WHERE i.appliance_id = t.legacy_uuid
+             AND i.site_id NOT LIKE 'synthetic-%'
+           ORDER BY i.created_at DESC
+           LIMIT 1
+      ) latest ON true
+    ON CONFLICT (appliance_id) DO UPDATE SET
+        site_id = EXCLUDED.site_id,
+        total_incidents_30d = EXCLUDED.total_incidents_30d,
+        resolved_incidents_30d = EXCLUDED.resolved_incidents_30d,
+        total_orders_30d = EXCLUDED.total_orders_30d,
+        executed_orders_30d = EXCLUDED.executed_orders_30d,
+        incidents_24h = EXCLUDED.incidents_24h,
+        last_incident_at = EXCLUDED.last_incident_at,
+        latest_drift_data = EXCLUDED.latest_drift_data,
+        refreshed_seq = EXCLUDED.refreshed_seq,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+async def refresh_health_snapshots(
+    pool: asyncpg.Pool,
+    batch: int = HEALTH_SNAPSHOT_BATCH,
+    max_age_seconds: int = HEALTH_SNAPSHOT_MAX_AGE_SECONDS,
+) -> int:
+    """Recompute one batch of dirty, stale or missing snapshot rows.
+
+    Returns the number of rows written; a full batch means more work is
+    pending.
+    """
+    async with admin_transaction(pool) as conn:
+        status = await conn.execute(_REFRESH_HEALTH_SNAPSHOT_SQL, max_age_seconds, batch)
+    # "INSERT 0 <n>"
+    return int(status.split()[-1]) if status else 0
+
+
+async def drain_health_snapshots(pool: asyncpg.Pool) -> None:
+    """Refresh batches until one comes back short (nothing left pending)."""
+    while await refresh_health_snapshots(pool) >= HEALTH_SNAPSHOT_BATCH:
+        await asyncio.sleep(0)
+
+
+async def health_snapshot_loop():
+    """Keep appliance_health_snapshot current for the fleet dashboard.
+
+    Drains dirty rows in batches each tick, so a burst of incidents is
+    absorbed within a tick or two regardless of fleet size.
+    """
+    from .bg_heartbeat import record_heartbeat
+
+    while True:
+        try:
+            await drain_health_snapshots(await get_pool())
+            record_heartbeat("health_snapshot")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("health_snapshot_loop iteration failed")
+            record_heartbeat("health_snapshot", ok=False)
+        await asyncio.sleep(HEALTH_SNAPSHOT_TICK_SECONDS)
+
+
+# Shared projection for every health-bearing appliance read: live
+# site_appliances columns + the snapshot's precomputed inputs.
+_APPLIANCE_HEALTH_SELECT = """
+    SELECT sa.legacy_uuid AS id, sa.site_id, sa.hostname,
+           (sa.ip_addresses->>0)::inet AS ip_address,
+           sa.agent_version,
+           'standard'::text AS tier,
+           (sa.status = 'online') AS is_online,
+           sa.last_checkin, sa.first_checkin AS created_at,
+           h.total_incidents_30d, h.resolved_incidents_30d,
+           h.total_orders_30d, h.executed_orders_30d,
+           h.incidents_24h, h.last_incident_at, h.latest_drift_data
+      FROM site_appliances sa  -- noqa: site-appliances-deleted-include — projection prefix only; every caller appends its own WHERE sa.deleted_at IS NULL
+      LEFT JOIN appliance_health_snapshot h
+             ON h.appliance_id = sa.legacy_uuid::text
+"""
+
+
 # =============================================================================
 # FLEET OVERVIEW
 # =============================================================================
@@ -180,79 +302,50 @@ async def _get_appliance_health(
 async def get_fleet_overview() -> List[ClientOverview]:
     """Get all clients with aggregated health scores.
 
+    One set-based query over site_appliances + appliance_health_snapshot
+    (Migration 334); per-site rollup happens here, so the round-trip
+    count doesn't grow with the fleet.
+
     Returns:
         List of ClientOverview with health metrics for each site.
     """
     pool = await get_pool()
 
-    # wave-11: PgBouncer routing-pathology fix — pin SET LOCAL + 4 calls to one backend
     async with admin_transaction(pool) as conn:
-        # Get all unique sites with appliance counts (exclude decommissioned)
-        sites = await conn.fetch("""
-            SELECT
-                a.site_id,
-                COUNT(*) as appliance_count,
-                COUNT(*) FILTER (WHERE a.status = 'online') as online_count,
-                MAX(a.last_checkin) as last_checkin
-            FROM site_appliances a
-            JOIN sites s ON s.site_id = a.site_id
-            WHERE s.status != 'inactive' AND a.deleted_at IS NULL
-            GROUP BY a.site_id
-            ORDER BY a.site_id
+        rows = await conn.fetch(_APPLIANCE_HEALTH_SELECT + """
+              JOIN sites s ON s.site_id = sa.site_id
+             WHERE s.status != 'inactive' AND sa.deleted_at IS NULL
+             ORDER BY sa.site_id
         """)
 
-        if not sites:
-            return []
-
-        result = []
-        for site in sites:
-            site_id = site["site_id"]
-
-            # Get appliances for this site
-            appliances = await conn.fetch("""
-                SELECT legacy_uuid AS id, last_checkin
-                FROM site_appliances
-                WHERE site_id = $1 AND deleted_at IS NULL
-            """, site_id)
-
-            # Calculate health for each appliance
-            health_list = []
-            for app in appliances:
-                health = await _get_appliance_health(pool, app["id"], app["last_checkin"])
-                health_list.append(health)
-
-            # Aggregate health scores
-            aggregated_health = aggregate_health_scores(health_list)
-
-            # Get incident count for last 24 hours
-            incident_count = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM incidents i
-                JOIN v_appliances_current a ON i.appliance_id = a.id
-                WHERE a.site_id = $1
-                AND i.created_at > NOW() - INTERVAL '24 hours'
-            """, site_id)
-
-            # Get last incident time
-            last_incident = await conn.fetchval("""
-                SELECT MAX(i.created_at)
-                FROM incidents i
-                JOIN v_appliances_current a ON i.appliance_id = a.id
-                WHERE a.site_id = $1
-            """, site_id)
-
-            # Create human-readable name from site_id
-            name = site_id.replace("-", " ").title()
-
-            result.append(ClientOverview(
-                site_id=site_id,
-                name=name,
-                appliance_count=site["appliance_count"],
-                online_count=site["online_count"],
-                health=aggregated_health,
-                last_incident=last_incident,
-                incidents_24h=incident_count or 0,
-            ))
+    by_site: Dict[str, List[asyncpg.Record]] = {}
+    for row in rows:
+        by_site.setdefault(row["site_id"], []).append(row)
+
+    result = []
+    for site_id, appliances in by_site.items():
+        health_list = [_health_from_snapshot(app) for app in appliances]
+
+        # Aggregate health scores
+        aggregated_health = aggregate_health_scores(health_list)
+
+        last_incident = max(
+            (app["last_incident_at"] for app in appliances if app["last_incident_at"]),
+            default=None,
+        )
+
+        # Create human-readable name from site_id
+        name = site_id.replace("-", " ").title()
+
+        result.append(ClientOverview(
+            site_id=site_id,
+            name=name,
+            appliance_count=len(appliances),
+            online_count=sum(1 for app in appliances if app["is_online"]),
+            health=aggregated_health,
+            last_incident=last_incident,
+            incidents_24h=sum(app["incidents_24h"] or 0 for app in appliances),
+        ))
 
     return result
 
@@ -273,22 +366,15 @@ async def get_client_detail(site_id: str) -> Optional[ClientDetail]:
     pool = await get_pool()
 
     # admin_transaction (wave-21): get_client_detail issues 3 admin
-    # reads (appliances, health metrics, recent incidents).
+    # reads (appliances + snapshot health, site tier, recent incidents).
     async with admin_transaction(pool) as conn:
-        # Get all appliances for this site.
+        # Get all appliances for this site with their health snapshot.
         # ip_addresses is jsonb array; take first entry as the singular ip_address
         # the Appliance model expects. Tier is no longer an appliance attribute —
         # it lives on sites.tier. is_online derives from status='online'.
-        appliance_rows = await conn.fetch("""
-            SELECT legacy_uuid AS id, site_id, hostname,
-                   (ip_addresses->>0)::inet AS ip_address,
-                   agent_version,
-                   'standard'::text AS tier,
-                   (status = 'online') AS is_online,
-                   last_checkin, first_checkin AS created_at
-            FROM site_appliances
-            WHERE site_id = $1 AND deleted_at IS NULL
-            ORDER BY hostname
+        appliance_rows = await conn.fetch(_APPLIANCE_HEALTH_SELECT + """
+             WHERE sa.site_id = $1 AND sa.deleted_at IS NULL
+             ORDER BY sa.hostname
         """, site_id)
 
         if not appliance_rows:
@@ -299,7 +385,7 @@ async def get_client_detail(site_id: str) -> Optional[ClientDetail]:
         health_list = []
         for row in appliance_rows:
             appliance = _row_to_appliance(row)
-            health = await _get_appliance_health(pool, row["id"], row["last_checkin"])
+            health = _health_from_snapshot(row)
             appliance.health = health
             appliances.append(appliance)
             health_list.append(health)
@@ -358,26 +444,18 @@ async def get_client_appliances(site_id: str) -> List[Appliance]:
     pool = await get_pool()
 
     async with admin_connection(pool) as conn:
-        appliance_rows = await conn.fetch("""
-            SELECT legacy_uuid AS id, site_id, hostname,
-                   (ip_addresses->>0)::inet AS ip_address,
-                   agent_version,
-                   'standard'::text AS tier,
-                   (status = 'online') AS is_online,
-                   last_checkin, first_checkin AS created_at
-            FROM site_appliances
-            WHERE site_id = $1 AND deleted_at IS NULL
-            ORDER BY hostname
+        appliance_rows = await conn.fetch(_APPLIANCE_HEALTH_SELECT + """
+             WHERE sa.site_id = $1 AND sa.deleted_at IS NULL
+             ORDER BY sa.hostname
         """, site_id)
 
-        appliances = []
-        for row in appliance_rows:
-            appliance = _row_to_appliance(row)
-            health = await _get_appliance_health(pool, row["id"], row["last_checkin"])
-            appliance.health = health
-            appliances.append(appliance)
+    appliances = []
+    for row in appliance_rows:
+        appliance = _row_to_appliance(row)
+        appliance.health = _health_from_snapshot(row)
+        appliances.append(appliance)
 
-        return appliances
+    return appliances
 
 
 # =============================================================================
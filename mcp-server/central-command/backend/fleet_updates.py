@@ -15,9 +15,11 @@ from pydantic import BaseModel, Field
 from .fleet import get_pool
 from .tenant_middleware import admin_connection, admin_transaction  # noqa: F401
 from .auth import require_admin
+from .shared import require_appliance_bearer
 from .order_signing import sign_admin_order, sign_fleet_order
 # Vault P0 Gate A redo-2 P0 #6 — module-level import (no function-body try/except).
 from .signing_backend import current_signing_method
+from .update_manifest import generate_release_manifest, manifest_url
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +43,7 @@ async def _create_update_orders_for_appliances(conn, rollout_id: UUID, stage: in
     release = await conn.fetchrow(
         """
         SELECT rel.version, rel.iso_url, rel.sha256, rel.size_bytes,
+               rel.chunk_manifest IS NOT NULL AS has_manifest,
                r.maintenance_window
         FROM update_rollouts r
         JOIN update_releases rel ON r.release_id = rel.id
@@ -85,6 +88,10 @@ async def _create_update_orders_for_appliances(conn, rollout_id: UUID, stage: in
             "size_bytes": release["size_bytes"],
             "maintenance_window": maint_window,
         }
+        if release["has_manifest"]:
+            # Delta download: the agent fetches the signed chunk manifest
+            # and only Range-fetches chunks it doesn't already hold.
+            parameters["manifest_url"] = manifest_url(release["version"])
 
         try:
             now = datetime.now(timezone.utc)
@@ -269,8 +276,17 @@ async def list_releases(
 
 
 @router.post("/releases", response_model=ReleaseResponse)
-async def create_release(release: ReleaseCreate, user: dict = Depends(require_admin)):
-    """Create a new update release."""
+async def create_release(
+    release: ReleaseCreate,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_admin),
+):
+    """Create a new update release.
+
+    The chunk manifest for delta downloads is generated in the
+    background (streams the ISO once); rollouts created before it lands
+    fall back to full downloads.
+    """
     pool = await get_pool()
     # admin_transaction (wave-22): create_release issues 3 admin
     # statements (dup check, INSERT release, audit log).
@@ -308,6 +324,8 @@ async def create_release(release: ReleaseCreate, user: dict = Depends(require_ad
             json.dumps({"version": release.version}),
         )
 
+        background_tasks.add_task(generate_release_manifest, pool, release.version)
+
         return ReleaseResponse(
             id=str(row["id"]),
             version=row["version"],
@@ -352,6 +370,61 @@ async def get_release(version: str, user: dict = Depends(require_admin)):
         )
 
 
+@router.get("/releases/{version}/manifest")
+async def get_release_manifest(
+    version: str,
+    auth_site_id: str = Depends(require_appliance_bearer),
+):
+    """Signed chunk manifest for delta downloads (see update_manifest.py).
+
+    Appliance-facing: the agent fetches the manifest_url from its
+    update_iso order with its appliance bearer key. The manifest only
+    lists chunk hashes of a release image and is signed, so any
+    appliance may read any release's manifest.
+    """
+    pool = await get_pool()
+    async with admin_connection(pool) as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT chunk_manifest, chunk_manifest_signature
+            FROM update_releases WHERE version = $1
+            """,
+            version
+        )
+    if not row or row["chunk_manifest"] is None:
+        raise HTTPException(status_code=404, detail=f"No chunk manifest for release {version}")
+
+    manifest = row["chunk_manifest"]
+    if isinstance(manifest, str):
+        manifest = json.loads(manifest)
+
+    from main import get_all_public_keys_hex
+    return {
+        "manifest": manifest,
+        "signature": row["chunk_manifest_signature"],
+        "server_public_keys": get_all_public_keys_hex(),
+    }
+
+
+@router.post("/releases/{version}/manifest", status_code=202)
+async def regenerate_release_manifest(
+    version: str,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_admin),
+):
+    """(Re)build the chunk manifest, e.g. after the ISO was re-uploaded."""
+    pool = await get_pool()
+    async with admin_connection(pool) as conn:
+        exists = await conn.fetchval(
+            "SELECT 1 FROM update_releases WHERE version = $1", version
+        )
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"Release {version} not found")
+
+    background_tasks.add_task(generate_release_manifest, pool, version)
+    return {"status": "queued", "version": version}
+
+
 @router.put("/releases/{version}/latest")
 async def set_latest_release(version: str, user: dict = Depends(require_admin)):
     """Mark a release as the latest."""
@@ -797,6 +870,7 @@ async def get_pending_update(appliance_id: str, user: dict = Depends(require_adm
             """
             SELECT au.id, au.rollout_id, au.new_version, au.status,
                    rel.iso_url, rel.sha256, rel.size_bytes,
+                   rel.chunk_manifest IS NOT NULL AS has_manifest,
                    r.maintenance_window
             FROM appliance_updates au
             JOIN update_rollouts r ON au.rollout_id = r.id
@@ -828,6 +902,7 @@ async def get_pending_update(appliance_id: str, user: dict = Depends(require_adm
                 "size_bytes": row["size_bytes"],
                 "maintenance_window": maint,
                 "current_status": row["status"],
+                "manifest_url": manifest_url(row["new_version"]) if row["has_manifest"] else None,
             }
         }
 
@@ -11,28 +11,66 @@ Strategy:
 
 This enables "one check, many reports" without requiring the YAML to list every
 daemon check_type name.
+
+control_index() precomputes check_type → ((framework, control_id), ...) for
+a given enabled-framework set, so the evidence writer resolves a bundle's
+controls with dict lookups instead of re-walking the crosswalk per check.
+All caches are dropped when control_mappings.yaml changes on disk (mtime,
+checked at most every YAML_RELOAD_CHECK_SECONDS).
 """
 
 import logging
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import yaml
 
 logger = logging.getLogger(__name__)
 
+YAML_RELOAD_CHECK_SECONDS = 30.0
+_YAML_PATH = Path(__file__).parent / "control_mappings.yaml"
+
 # Singleton caches
 _YAML_DATA: Optional[Dict] = None
 _HIPAA_CROSSWALK: Optional[Dict[str, Dict[str, List[Dict]]]] = None
+# sorted framework tuple → check_type → ((framework, control_id), ...)
+_CONTROL_INDEX: Dict[Tuple[str, ...], Dict[str, Tuple[Tuple[str, str], ...]]] = {}
+_YAML_MTIME: Optional[float] = None
+_YAML_CHECKED_AT = 0.0
+
+
+def _yaml_mtime() -> Optional[float]:
+    try:
+        return _YAML_PATH.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _reload_if_changed() -> None:
+    """Drop every derived cache if control_mappings.yaml changed on disk."""
+    global _YAML_DATA, _HIPAA_CROSSWALK, _YAML_MTIME, _YAML_CHECKED_AT
+    now = time.monotonic()
+    if _YAML_DATA is not None and now - _YAML_CHECKED_AT < YAML_RELOAD_CHECK_SECONDS:
+        return
+    _YAML_CHECKED_AT = now
+    mtime = _yaml_mtime()
+    if _YAML_DATA is not None and mtime != _YAML_MTIME:
+        logger.info("control_mappings.yaml changed on disk — reloading control index")
+        _YAML_DATA = None
+        _HIPAA_CROSSWALK = None
+        _CONTROL_INDEX.clear()
 
 
 def _load_yaml() -> Dict:
-    """Load control_mappings.yaml once."""
-    global _YAML_DATA
+    """Load control_mappings.yaml (cached until it changes on disk)."""
+    global _YAML_DATA, _YAML_MTIME
+    _reload_if_changed()
     if _YAML_DATA is not None:
         return _YAML_DATA
 
-    yaml_path = Path(__file__).parent / "control_mappings.yaml"
+    yaml_path = _YAML_PATH
+    _YAML_MTIME = _yaml_mtime()
     if not yaml_path.exists():
         logger.error(f"control_mappings.yaml not found at {yaml_path}")
         _YAML_DATA = {}
@@ -53,10 +91,10 @@ def _build_crosswalk() -> Dict[str, Dict[str, List[Dict]]]:
     then map those HIPAA IDs to equivalent controls in other frameworks.
     """
     global _HIPAA_CROSSWALK
+    checks = _load_yaml()
     if _HIPAA_CROSSWALK is not None:
         return _HIPAA_CROSSWALK
 
-    checks = _load_yaml()
     crosswalk: Dict[str, Dict[str, List[Dict]]] = {}
 
     for check_name, check_data in checks.items():
@@ -175,6 +213,35 @@ def get_controls_for_check_with_hipaa_map(
     return controls
 
 
+def control_index(
+    enabled_frameworks: Iterable[str],
+) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    """check_type → ((framework, control_id), ...) for an enabled-framework set.
+
+    Built once per distinct set (over every CHECK_TYPE_HIPAA_MAP entry)
+    and cached until control_mappings.yaml changes. Entries equal
+    get_controls_for_check_with_hipaa_map(check_type, sorted(enabled));
+    unmapped check_types are absent.
+    """
+    key = tuple(sorted(set(enabled_frameworks)))
+    _load_yaml()  # reload check; clears _CONTROL_INDEX on change
+    index = _CONTROL_INDEX.get(key)
+    if index is not None:
+        return index
+
+    from .compliance_packet import CHECK_TYPE_HIPAA_MAP
+
+    frameworks = list(key)
+    index = {}
+    for check_type in CHECK_TYPE_HIPAA_MAP:
+        controls = get_controls_for_check_with_hipaa_map(check_type, frameworks)
+        if controls:
+            index[check_type] = tuple((c["framework"], c["control_id"]) for c in controls)
+    _CONTROL_INDEX[key] = index
+    logger.info(f"Built control index for {frameworks}: {len(index)} check types")
+    return index
+
+
 def resolve_control_id(check_type: str, framework: str) -> str:
     """
     Resolve a single check_type to a single control_id for a framework.
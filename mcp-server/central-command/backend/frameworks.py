@@ -50,17 +50,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# Import framework service (will be available after package install)
-try:
-    from compliance_agent.frameworks import (
-        ComplianceFramework,
-        FrameworkService,
-        get_recommended_frameworks,
-    )
-    FRAMEWORK_SERVICE_AVAILABLE = True
-except ImportError:
-    FRAMEWORK_SERVICE_AVAILABLE = False
-    logger.warning("Framework service not available - using stub implementation")
+# Framework service (available after package install). Imported on
+# first use: the compliance_agent package __init__ loads the whole agent
+# (escalation, aiohttp, ...) and only two endpoints need it.
+_framework_module = None
+
+
+def _framework_service():
+    """compliance_agent.frameworks, or None if the package isn't installed."""
+    global _framework_module
+    if _framework_module is None:
+        try:
+            import compliance_agent.frameworks as module
+        except ImportError:
+            logger.warning("Framework service not available - using stub implementation")
+            module = False
+        _framework_module = module
+    return _framework_module or None
 
 
 router = APIRouter(
@@ -527,11 +533,12 @@ async def get_appliance_control_status(
     controls = await get_control_status(db, appliance_id, framework)
 
     # Enhance with control names if framework service available
-    if FRAMEWORK_SERVICE_AVAILABLE:
-        service = FrameworkService()
+    fw = _framework_service()
+    if fw is not None:
+        service = fw.FrameworkService()
         for ctrl in controls:
             details = service.get_control_details(
-                ComplianceFramework(framework),
+                fw.ComplianceFramework(framework),
                 ctrl["control_id"]
             )
             if details:
@@ -728,8 +735,9 @@ async def get_infrastructure_checks() -> Dict[str, Any]:
 
     Shows which controls each check satisfies across all frameworks.
     """
-    if FRAMEWORK_SERVICE_AVAILABLE:
-        service = FrameworkService()
+    fw = _framework_service()
+    if fw is not None:
+        service = fw.FrameworkService()
         checks = []
 
         for check in service.get_all_checks():
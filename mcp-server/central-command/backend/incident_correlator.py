@@ -0,0 +1,308 @@
+"""Incremental cross-incident correlation.
+
+Pattern: incident type A is resolved at a site and type B is created
+there within CORRELATION_WINDOW afterwards. For each (site, A, B):
+
+    co_occurrence_count = distinct A incidents followed by >= 1 B
+    avg_gap_seconds     = mean(B.created_at - A.resolved_at) over all
+                          (A, B) follow-ups
+    confidence          = co_occurrence_count / A resolutions,
+                          clamped to 1.0
+
+all over the trailing CORRELATION_LOOKBACK, ignoring monitoring-only
+check types (check_type_registry.is_monitoring_only) on either side.
+Pairs with at least MIN_CO_OCCURRENCES are upserted into
+incident_correlation_pairs.
+
+The hourly loop used to recompute this with a 7-day self-join of
+incidents, then ran one COUNT and one UPSERT per pair. This module keeps
+the state in memory and moves it forward from a watermark:
+
+  - Each tick reads only incidents created or resolved in
+    (watermark, NOW() - INGEST_LAG]. The lag gives transactions that
+    committed late time to become visible before the watermark passes
+    them. One range scan, served by migrations 331/332.
+  - Events are replayed in time order against per-site state:
+    - a sliding window of resolutions still inside
+      CORRELATION_WINDOW, which new B creations are matched against;
+    - per-type resolution timestamps (the total-A counters);
+    - per-pair contributions keyed by A id (co-occurrence and gap sums).
+  - Contributions and resolutions older than the lookback expire from
+    a min-heap / deques, so the numbers stay a true 7-day window.
+  - Only pairs whose counters moved are written, in one
+    unnest()-array upsert (ON CONFLICT DO UPDATE).
+
+backfill() rebuilds everything from history with the same replay. The
+loop backfills at startup (state is process-local; the job is
+leader-elected so one process owns it) and once a day. The daily
+rebuild also picks up rare drift: an incident re-opened after it was
+counted, or a commit that landed later than INGEST_LAG.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_WINDOW = timedelta(minutes=10)
+CORRELATION_LOOKBACK = timedelta(days=7)
+MIN_CO_OCCURRENCES = 3
+INGEST_LAG = timedelta(seconds=60)
+CORRELATION_LOG_CONFIDENCE = 0.5
+
+PairKey = Tuple[str, str]  # (incident_type_a, incident_type_b)
+
+
+@dataclass
+class _PairState:
+    # A incident id -> [gap_seconds_sum, follow_up_count]
+    contributions: Dict[Any, List[float]] = field(default_factory=dict)
+    last_confidence: float = 0.0
+
+    @property
+    def co_occurrences(self) -> int:
+        return len(self.contributions)
+
+    @property
+    def avg_gap_seconds(self) -> float:
+        total = sum(c[0] for c in self.contributions.values())
+        n = sum(c[1] for c in self.contributions.values())
+        return total / n if n else 0.0
+
+
+@dataclass
+class _SiteState:
+    # (resolved_at, incident_id, incident_type), time-ordered, only
+    # resolutions still inside CORRELATION_WINDOW of the newest event.
+    recent: Deque[Tuple[datetime, Any, str]] = field(default_factory=deque)
+    # incident_type -> resolved_at timestamps inside the lookback
+    resolutions: Dict[str, Deque[datetime]] = field(
+        default_factory=lambda: defaultdict(deque)
+    )
+    pairs: Dict[PairKey, _PairState] = field(default_factory=dict)
+
+
+class IncidentCorrelator:
+    """Sliding-window A->B correlation state plus its DB plumbing."""
+
+    def __init__(self):
+        self.watermark: Optional[datetime] = None
+        self.sites: Dict[str, _SiteState] = {}
+        self._expiry: List[Tuple[datetime, int, str, PairKey, Any]] = []
+        self._seq = itertools.count()
+        self._dirty_pairs: Set[Tuple[str, PairKey]] = set()
+        self._dirty_types: Set[Tuple[str, str]] = set()
+
+    # ── pure state machine ──
+
+    def ingest(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        lower: datetime,
+        upper: datetime,
+        monitoring_only: Set[str],
+    ) -> int:
+        """Apply incidents created/resolved in (lower, upper]. Returns
+        the number of events consumed."""
+        events = []
+        for r in rows:
+            created = r["created_at"]
+            if created is not None and lower < created <= upper:
+                # 0 sorts creations before resolutions at the same
+                # instant — B must be created strictly AFTER A resolved.
+                events.append((created, 0, r))
+            resolved = r["resolved_at"]
+            if (
+                resolved is not None and r["status"] == "resolved"
+                and lower < resolved <= upper
+            ):
+                events.append((resolved, 1, r))
+        events.sort(key=lambda e: (e[0], e[1]))
+
+        for at, kind, r in events:
+            site = self.sites.setdefault(r["site_id"], _SiteState())
+            while site.recent and site.recent[0][0] + CORRELATION_WINDOW <= at:
+                site.recent.popleft()
+            if kind == 1:
+                site.recent.append((at, r["id"], r["incident_type"]))
+                site.resolutions[r["incident_type"]].append(at)
+                self._dirty_types.add((r["site_id"], r["incident_type"]))
+                continue
+
+            type_b = r["incident_type"]
+            if type_b in monitoring_only:
+                continue
+            for resolved_at, a_id, type_a in site.recent:
+                if resolved_at >= at or type_a == type_b or type_a in monitoring_only:
+                    continue
+                key = (type_a, type_b)
+                pair = site.pairs.setdefault(key, _PairState())
+                contrib = pair.contributions.get(a_id)
+                if contrib is None:
+                    contrib = pair.contributions[a_id] = [0.0, 0]
+                    heapq.heappush(
+                        self._expiry,
+                        (resolved_at, next(self._seq), r["site_id"], key, a_id),
+                    )
+                contrib[0] += (at - resolved_at).total_seconds()
+                contrib[1] += 1
+                self._dirty_pairs.add((r["site_id"], key))
+
+        self.expire(upper - CORRELATION_LOOKBACK)
+        self.watermark = upper
+        return len(events)
+
+    def expire(self, cutoff: datetime) -> None:
+        """Drop resolutions and contributions at or before `cutoff`."""
+        for site_id, site in self.sites.items():
+            for type_a, stamps in site.resolutions.items():
+                if stamps and stamps[0] <= cutoff:
+                    while stamps and stamps[0] <= cutoff:
+                        stamps.popleft()
+                    self._dirty_types.add((site_id, type_a))
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            _, _, site_id, key, a_id = heapq.heappop(self._expiry)
+            pair = self.sites[site_id].pairs.get(key)
+            if pair is not None and pair.contributions.pop(a_id, None) is not None:
+                self._dirty_pairs.add((site_id, key))
+
+    def total_a(self, site_id: str, type_a: str) -> int:
+        site = self.sites.get(site_id)
+        return len(site.resolutions.get(type_a, ())) if site else 0
+
+    def changed_pairs(self) -> List[Dict[str, Any]]:
+        """Pairs whose published numbers may have moved since the last
+        call and that meet MIN_CO_OCCURRENCES. Clears the dirty set."""
+        keys = set(self._dirty_pairs)
+        for site_id, type_a in self._dirty_types:
+            site = self.sites.get(site_id)
+            if site:
+                keys.update((site_id, k) for k in site.pairs if k[0] == type_a)
+        self._dirty_pairs.clear()
+        self._dirty_types.clear()
+
+        out = []
+        for site_id, key in sorted(keys):
+            site = self.sites[site_id]
+            pair = site.pairs.get(key)
+            if pair is None:
+                continue
+            if not pair.contributions:
+                del site.pairs[key]
+                continue
+            co = pair.co_occurrences
+            if co < MIN_CO_OCCURRENCES:
+                continue
+            confidence = min(co / max(self.total_a(site_id, key[0]), 1), 1.0)
+            out.append({
+                "site_id": site_id,
+                "type_a": key[0],
+                "type_b": key[1],
+                "co_occurrences": co,
+                "avg_gap_sec": pair.avg_gap_seconds,
+                "confidence": confidence,
+                "newly_confident": (
+                    confidence >= CORRELATION_LOG_CONFIDENCE
+                    > pair.last_confidence
+                ),
+            })
+            pair.last_confidence = confidence
+        return out
+
+    def reset(self) -> None:
+        self.__init__()
+
+    # ── DB ──
+
+    async def _read_window(self, conn, lower: datetime, upper: datetime):
+        monitoring = await conn.fetch(
+            "SELECT check_name FROM check_type_registry WHERE is_monitoring_only = true"
+        )
+        rows = await conn.fetch(
+            """
+            SELECT id, site_id, incident_type, status, created_at, resolved_at
+            FROM incidents
+            WHERE (created_at > $1 AND created_at <= $2)
+               OR (resolved_at > $1 AND resolved_at <= $2 AND status = 'resolved')
+            """,
+            lower, upper,
+        )
+        return rows, {r["check_name"] for r in monitoring}
+
+    async def _upper_bound(self, conn) -> datetime:
+        return await conn.fetchval(
+            "SELECT NOW() - make_interval(secs => $1)", INGEST_LAG.total_seconds(),
+        )
+
+    async def backfill(self, conn) -> Dict[str, int]:
+        """Rebuild all state from the trailing lookback of history and
+        rewrite every qualifying pair."""
+        self.reset()
+        upper = await self._upper_bound(conn)
+        lower = upper - CORRELATION_LOOKBACK
+        rows, monitoring = await self._read_window(conn, lower, upper)
+        events = self.ingest(rows, lower, upper, monitoring)
+        written = await self._flush(conn)
+        return {"events": events, "written": written, "backfill": 1}
+
+    async def tick(self, conn) -> Dict[str, int]:
+        """Consume everything since the watermark. Backfills first if
+        there is no state yet."""
+        if self.watermark is None:
+            return await self.backfill(conn)
+        lower = self.watermark
+        upper = await self._upper_bound(conn)
+        if upper <= lower:
+            return {"events": 0, "written": 0, "backfill": 0}
+        rows, monitoring = await self._read_window(conn, lower, upper)
+        events = self.ingest(rows, lower, upper, monitoring)
+        written = await self._flush(conn)
+        return {"events": events, "written": written, "backfill": 0}
+
+    async def _flush(self, conn) -> int:
+        changed = self.changed_pairs()
+        if not changed:
+            return 0
+        await conn.execute(
+            """
+            INSERT INTO incident_correlation_pairs (
+                site_id, incident_type_a, incident_type_b,
+                co_occurrence_count, avg_gap_seconds, confidence,
+                first_seen, last_seen
+            )
+            SELECT u.site_id, u.type_a, u.type_b, u.co, u.gap, u.conf, NOW(), NOW()
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::int[],
+                        $5::float8[], $6::float8[])
+                 AS u(site_id, type_a, type_b, co, gap, conf)
+            ON CONFLICT (site_id, incident_type_a, incident_type_b) DO UPDATE SET
+                co_occurrence_count = EXCLUDED.co_occurrence_count,
+                avg_gap_seconds = EXCLUDED.avg_gap_seconds,
+                confidence = EXCLUDED.confidence,
+                last_seen = NOW()
+            """,
+            [p["site_id"] for p in changed],
+            [p["type_a"] for p in changed],
+            [p["type_b"] for p in changed],
+            [p["co_occurrences"] for p in changed],
+            [p["avg_gap_sec"] for p in changed],
+            [p["confidence"] for p in changed],
+        )
+        for p in changed:
+            if p["newly_confident"]:
+                logger.info(
+                    "cross_incident_correlation_detected",
+                    extra={
+                        "site_id": p["site_id"],
+                        "type_a": p["type_a"],
+                        "type_b": p["type_b"],
+                        "co_occurrences": p["co_occurrences"],
+                        "confidence": round(p["confidence"], 2),
+                    },
+                )
+        return len(changed)
@@ -51,6 +51,31 @@ PKCE_CODE_VERIFIER_LENGTH = 64  # 64 bytes = 512 bits
 HTTP_TIMEOUT_SECONDS = 30
 MAX_RETRY_ATTEMPTS = 3
 RETRY_BACKOFF_SECONDS = [1, 2, 5]
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE = 20
+
+# One pooled client per event loop, shared by every connector. Token
+# exchange, token refresh and API calls all reuse keep-alive connections
+# to the provider instead of paying a TLS handshake per call; the sync
+# engine builds a fresh connector per sync, so a per-connector client
+# would not be reused either.
+_shared_client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop (created on first use)."""
+    global _shared_client
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client[0] is not loop or _shared_client[1].is_closed:
+        _shared_client = (loop, httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            ),
+        ))
+    return _shared_client[1]
 
 
 class OAuthError(Exception):
@@ -182,7 +207,6 @@ class BaseOAuthConnector(ABC):
         self.state_manager = state_manager
         self.audit_logger = audit_logger
         self._tokens = tokens
-        self._http_client: Optional[httpx.AsyncClient] = None
         self._pkce: Optional[PKCEChallenge] = None
 
     @classmethod
@@ -342,43 +366,43 @@ class BaseOAuthConnector(ABC):
             "code_verifier": code_verifier
         }
 
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
-            try:
-                response = await client.post(
-                    self.TOKEN_URL,
-                    data=token_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-
-                if response.status_code != 200:
-                    error_data = response.json() if response.content else {}
-                    error_msg = error_data.get("error_description", error_data.get("error", "Unknown error"))
-
-                    await self.audit_logger.log_oauth_failure(
-                        site_id=self.site_id,
-                        integration_id=self.integration_id,
-                        provider=self.PROVIDER,
-                        error=error_msg,
-                        error_code=error_data.get("error", "token_exchange_failed"),
-                        user_id=user_id,
-                        ip_address=ip_address
-                    )
-
-                    raise TokenExchangeError(f"Token exchange failed: {error_msg}")
+        client = await self._get_http_client()
+        try:
+            response = await client.post(
+                self.TOKEN_URL,
+                data=token_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
 
-                data = response.json()
+            if response.status_code != 200:
+                error_data = response.json() if response.content else {}
+                error_msg = error_data.get("error_description", error_data.get("error", "Unknown error"))
 
-            except httpx.RequestError as e:
                 await self.audit_logger.log_oauth_failure(
                     site_id=self.site_id,
                     integration_id=self.integration_id,
                     provider=self.PROVIDER,
-                    error=str(e),
-                    error_code="network_error",
+                    error=error_msg,
+                    error_code=error_data.get("error", "token_exchange_failed"),
                     user_id=user_id,
                     ip_address=ip_address
                 )
-                raise TokenExchangeError(f"Network error during token exchange: {e}")
+
+                raise TokenExchangeError(f"Token exchange failed: {error_msg}")
+
+            data = response.json()
+
+        except httpx.RequestError as e:
+            await self.audit_logger.log_oauth_failure(
+                site_id=self.site_id,
+                integration_id=self.integration_id,
+                provider=self.PROVIDER,
+                error=str(e),
+                error_code="network_error",
+                user_id=user_id,
+                ip_address=ip_address
+            )
+            raise TokenExchangeError(f"Network error during token exchange: {e}")
 
         # Create token response
         token_response = TokenResponse(
@@ -440,71 +464,71 @@ class BaseOAuthConnector(ABC):
             "refresh_token": refresh_token
         }
 
+        client = await self._get_http_client()
         last_error = None
 
         for attempt in range(MAX_RETRY_ATTEMPTS):
             try:
-                async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
-                    response = await client.post(
-                        self.TOKEN_URL,
-                        data=token_data,
-                        headers={"Content-Type": "application/x-www-form-urlencoded"}
-                    )
-
-                    if response.status_code == 200:
-                        data = response.json()
-
-                        token_response = TokenResponse(
-                            access_token=data["access_token"],
-                            token_type=data.get("token_type", "Bearer"),
-                            expires_in=data.get("expires_in", 3600),
-                            # Some providers return new refresh token
-                            refresh_token=data.get("refresh_token", refresh_token),
-                            scope=data.get("scope")
-                        )
+                response = await client.post(
+                    self.TOKEN_URL,
+                    data=token_data,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"}
+                )
 
-                        # Update stored tokens
-                        self._tokens = SecureCredentials(
-                            access_token=token_response.access_token,
-                            refresh_token=token_response.refresh_token,
-                            token_type=token_response.token_type,
-                            expires_at=token_response.expires_at.isoformat() if token_response.expires_at else None,
-                            scope=token_response.scope
-                        )
+                if response.status_code == 200:
+                    data = response.json()
 
-                        # Log refresh
-                        await self.audit_logger.log_token_refreshed(
-                            site_id=self.site_id,
-                            integration_id=self.integration_id
-                        )
+                    token_response = TokenResponse(
+                        access_token=data["access_token"],
+                        token_type=data.get("token_type", "Bearer"),
+                        expires_in=data.get("expires_in", 3600),
+                        # Some providers return new refresh token
+                        refresh_token=data.get("refresh_token", refresh_token),
+                        scope=data.get("scope")
+                    )
 
-                        logger.info(
-                            f"Token refresh successful: provider={self.PROVIDER} "
-                            f"integration={self.integration_id}"
-                        )
+                    # Update stored tokens
+                    self._tokens = SecureCredentials(
+                        access_token=token_response.access_token,
+                        refresh_token=token_response.refresh_token,
+                        token_type=token_response.token_type,
+                        expires_at=token_response.expires_at.isoformat() if token_response.expires_at else None,
+                        scope=token_response.scope
+                    )
 
-                        return token_response
+                    # Log refresh
+                    await self.audit_logger.log_token_refreshed(
+                        site_id=self.site_id,
+                        integration_id=self.integration_id
+                    )
 
-                    elif response.status_code == 400:
-                        error_data = response.json() if response.content else {}
-                        error_code = error_data.get("error", "")
+                    logger.info(
+                        f"Token refresh successful: provider={self.PROVIDER} "
+                        f"integration={self.integration_id}"
+                    )
 
-                        # Invalid grant means refresh token is expired/revoked
-                        if error_code == "invalid_grant":
-                            # Token refresh failed - logged elsewhere
-                            pass
-                            raise TokenExpiredError(
-                                "Refresh token is invalid or expired. Re-authentication required."
-                            )
+                    return token_response
 
-                        last_error = TokenRefreshError(
-                            f"Token refresh failed: {error_data.get('error_description', error_code)}"
-                        )
-                    else:
-                        last_error = TokenRefreshError(
-                            f"Token refresh failed with status {response.status_code}"
+                elif response.status_code == 400:
+                    error_data = response.json() if response.content else {}
+                    error_code = error_data.get("error", "")
+
+                    # Invalid grant means refresh token is expired/revoked
+                    if error_code == "invalid_grant":
+                        # Token refresh failed - logged elsewhere
+                        pass
+                        raise TokenExpiredError(
+                            "Refresh token is invalid or expired. Re-authentication required."
                         )
 
+                    last_error = TokenRefreshError(
+                        f"Token refresh failed: {error_data.get('error_description', error_code)}"
+                    )
+                else:
+                    last_error = TokenRefreshError(
+                        f"Token refresh failed with status {response.status_code}"
+                    )
+
             except httpx.RequestError as e:
                 last_error = TokenRefreshError(f"Network error during refresh: {e}")
 
@@ -545,13 +569,8 @@ class BaseOAuthConnector(ABC):
         return self._tokens.get("access_token")
 
     async def _get_http_client(self) -> httpx.AsyncClient:
-        """Get or create authenticated HTTP client."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                timeout=HTTP_TIMEOUT_SECONDS,
-                headers={"Accept": "application/json"}
-            )
-        return self._http_client
+        """HTTP client for provider calls (the shared pool, see shared_http_client)."""
+        return shared_http_client()
 
     async def api_request(
         self,
@@ -719,10 +738,8 @@ class BaseOAuthConnector(ABC):
         self._tokens = token_data
 
     async def close(self) -> None:
-        """Close HTTP client and cleanup."""
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
-            self._http_client = None
+        """Nothing to release: HTTP connections belong to the shared pool,
+        which stays open for other connectors."""
 
     async def __aenter__(self):
         """Async context manager entry."""
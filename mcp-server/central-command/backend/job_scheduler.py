@@ -0,0 +1,622 @@
+"""Leader-elected background job scheduler.
+
+main.py's lifespan used to start every `task_defs` loop in every API
+replica: each replica ran every job (two OTS upgraders, two partition
+maintainers, two digest senders ...) and all of them competed with
+request handling for the event loop and the 25-connection pool.
+
+This module puts a scheduler in front of those loops:
+
+  - Declarative `JobSpec`s. A job is either a self-timed `while True`
+    loop (kind="loop" — the task_defs entries; the loop keeps its own
+    sleep so the heartbeat calibration gates stay true) or a single-run
+    coroutine the scheduler fires on an interval or a cron expression
+    (kind="tick"), with a start delay, jitter, a per-run timeout, a cap
+    on concurrent runs and a connection budget. The periodic
+    maintenance jobs (background_tasks.maintenance_tick_jobs) are ticks.
+  - Leader election per job. Singleton jobs run only in the process
+    holding `pg_try_advisory_lock(JOB_LOCK_CLASS, hashtext(name))`, so
+    each runs once fleet-wide. All locks live on ONE dedicated session
+    (MIGRATION_DATABASE_URL — session advisory locks do not survive
+    PgBouncer transaction pooling, same reason migrate.py connects
+    directly). Every lease round trip is bounded by JOB_LEASE_TIMEOUT_S,
+    so a hung session reads as a lost lease instead of stalling the
+    election loop. If that session dies every led job is cancelled at once:
+    Postgres has already released the locks, so another replica may be
+    taking over, and two copies must never overlap.
+  - Process roles via BG_JOBS_MODE:
+        all    (default) local jobs + leader-elected singletons
+        api    local jobs only — pair with a worker (`python worker.py`)
+        worker singletons only — no per-process API helpers
+    "Local" jobs (singleton=False) serve the process they run in — the
+    perf_cache L1 invalidation listener, the /metrics snapshot — and so
+    run in every API process regardless of leadership.
+  - Metrics. Tick runs record duration via bg_heartbeat.record_heartbeat
+    and skipped-because-still-running ticks via record_overlap. Jobs led
+    by another replica are marked standby so bg_loop_silent doesn't fire
+    on a heartbeat that went quiet by design. `metrics()` feeds the
+    admin loops endpoint and Prometheus.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# First key of the two-int advisory lock. The two-key space is disjoint
+# from the single-bigint keys used by migrate.py and stripe_connect.py.
+JOB_LOCK_CLASS = 0x4A4F42  # "JOB"
+
+JOB_ELECTION_INTERVAL_S = int(os.getenv("JOB_ELECTION_INTERVAL_S", "15"))
+JOB_CONN_BUDGET = int(os.getenv("JOB_CONN_BUDGET", "8"))
+JOB_LEASE_TIMEOUT_S = float(os.getenv("JOB_LEASE_TIMEOUT_S", "5"))
+
+MODE_ALL = "all"
+MODE_API = "api"
+MODE_WORKER = "worker"
+_MODES = (MODE_ALL, MODE_API, MODE_WORKER)
+
+ROLE_LEADER = "leader"
+ROLE_STANDBY = "standby"
+ROLE_LOCAL = "local"
+
+
+def jobs_mode() -> str:
+    """BG_JOBS_MODE, validated. Unknown values fall back to 'all' so a
+    typo never silently disables every background job."""
+    mode = os.getenv("BG_JOBS_MODE", MODE_ALL).strip().lower()
+    if mode not in _MODES:
+        logger.error(
+            "bg_jobs_mode_invalid",
+            extra={"value": mode, "fallback": MODE_ALL},
+        )
+        return MODE_ALL
+    return mode
+
+
+# ─── Cron ──────────────────────────────────────────────────────────
+
+
+def _cron_field(expr: str, lo: int, hi: int) -> FrozenSet[int]:
+    values: set = set()
+    for part in expr.split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step < 1:
+                raise ValueError(f"cron step must be >= 1: {expr!r}")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = int(part)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"cron field {expr!r} out of range {lo}-{hi}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """Five-field cron (minute hour day-of-month month day-of-week), UTC.
+
+    Supports `*`, lists, ranges and steps. Day-of-week 0 and 7 are both
+    Sunday. As in Vixie cron, when both day fields are restricted a day
+    matches if EITHER does.
+    """
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    days_restricted: bool
+    weekdays_restricted: bool
+
+    @classmethod
+    def parse(cls, expr: str) -> "CronSchedule":
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        weekdays = _cron_field(fields[4], 0, 7)
+        if 7 in weekdays:
+            weekdays = (weekdays - {7}) | {0}
+        return cls(
+            minutes=_cron_field(fields[0], 0, 59),
+            hours=_cron_field(fields[1], 0, 23),
+            days=_cron_field(fields[2], 1, 31),
+            months=_cron_field(fields[3], 1, 12),
+            weekdays=weekdays,
+            days_restricted=fields[2] != "*",
+            weekdays_restricted=fields[4] != "*",
+        )
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return dom or dow
+        return dom and dow
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after `dt`."""
+        t = dt.astimezone(timezone.utc).replace(second=0, microsecond=0)
+        t += timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 4)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError("cron expression never matches")
+
+
+# ─── Job specs ─────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """One background job.
+
+    kind="loop": `fn` is a self-timed `while True` loop, run under the
+      supervisor for as long as this process owns the job. Scheduling
+      fields other than `singleton` don't apply.
+    kind="tick": `fn` does one unit of work. Fired every `interval_s`
+      seconds or on `cron`, plus up to `jitter_s` random delay; the
+      first run after taking the job waits `start_delay_s` instead when
+      set (a daily job must not wait a day after every restart). Each
+      run is bounded by `timeout_s`. If `max_concurrency` runs are
+      already in flight the tick is skipped and counted as an overlap.
+      Each run holds `conn_budget` units of the scheduler's
+      JOB_CONN_BUDGET.
+    """
+    name: str
+    fn: Callable[[], Awaitable[Any]]
+    kind: str = "loop"
+    interval_s: Optional[float] = None
+    cron: Optional[str] = None
+    jitter_s: float = 0.0
+    start_delay_s: Optional[float] = None
+    timeout_s: Optional[float] = None
+    max_concurrency: int = 1
+    conn_budget: int = 1
+    singleton: bool = True
+
+    def __post_init__(self):
+        if self.kind not in ("loop", "tick"):
+            raise ValueError(f"{self.name}: kind must be 'loop' or 'tick'")
+        if self.kind == "tick":
+            if (self.interval_s is None) == (self.cron is None):
+                raise ValueError(f"{self.name}: tick jobs need exactly one of interval_s / cron")
+            if self.interval_s is not None and self.interval_s <= 0:
+                raise ValueError(f"{self.name}: interval_s must be > 0")
+            if self.cron is not None:
+                CronSchedule.parse(self.cron)
+        if self.max_concurrency < 1:
+            raise ValueError(f"{self.name}: max_concurrency must be >= 1")
+        if self.conn_budget < 0 or self.jitter_s < 0:
+            raise ValueError(f"{self.name}: conn_budget / jitter_s must be >= 0")
+        if self.start_delay_s is not None and self.start_delay_s < 0:
+            raise ValueError(f"{self.name}: start_delay_s must be >= 0")
+
+    def next_delay(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next tick, jitter included."""
+        if self.cron is not None:
+            now = now or datetime.now(timezone.utc)
+            base = (CronSchedule.parse(self.cron).next_after(now) - now).total_seconds()
+        else:
+            base = float(self.interval_s)
+        return max(0.0, base) + (random.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+
+    def first_delay(self) -> float:
+        """Seconds until the first tick after this process takes the job."""
+        if self.start_delay_s is None:
+            return self.next_delay()
+        return self.start_delay_s + (random.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+
+
+def loop_jobs(
+    task_defs: List[tuple], *, local: FrozenSet[str] = frozenset(),
+) -> List[JobSpec]:
+    """Wrap main.py's (name, loop_fn) task_defs as loop-kind specs.
+    Names in `local` run in every API process instead of being elected."""
+    return [
+        JobSpec(name=name, fn=fn, kind="loop", singleton=name not in local)
+        for name, fn in task_defs
+    ]
+
+
+# ─── Scheduler ─────────────────────────────────────────────────────
+
+
+class _ConnectionBudget:
+    """Weighted semaphore over JOB_CONN_BUDGET pool connections."""
+
+    def __init__(self, total: int):
+        self.total = max(1, total)
+        self.used = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, units: int) -> int:
+        units = min(units, self.total)
+        if units <= 0:
+            return 0
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.used + units <= self.total)
+            self.used += units
+        return units
+
+    async def release(self, units: int) -> None:
+        if units <= 0:
+            return
+        async with self._cond:
+            self.used -= units
+            self._cond.notify_all()
+
+
+@dataclass
+class _JobState:
+    role: str = ROLE_STANDBY
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    overlaps: int = 0
+    in_flight: int = 0
+    last_duration_s: Optional[float] = None
+    max_duration_s: Optional[float] = None
+    leader_since: Optional[float] = None
+    leadership_changes: int = 0
+
+
+def _heartbeat_call(fn_name: str, *args, **kwargs) -> None:
+    """bg_heartbeat call that can never break the scheduler."""
+    try:
+        try:
+            from . import bg_heartbeat
+        except ImportError:
+            import bg_heartbeat  # type: ignore
+        getattr(bg_heartbeat, fn_name)(*args, **kwargs)
+    except Exception:
+        pass
+
+
+async def _run_forever(name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+    await fn()
+
+
+class JobScheduler:
+    """Runs JobSpecs according to BG_JOBS_MODE and per-job leadership."""
+
+    def __init__(
+        self,
+        specs: List[JobSpec],
+        *,
+        mode: Optional[str] = None,
+        supervise: Callable[[str, Callable[[], Awaitable[Any]]], Awaitable[None]] = _run_forever,
+        connect: Optional[Callable[[], Awaitable[Any]]] = None,
+        election_interval_s: float = JOB_ELECTION_INTERVAL_S,
+        conn_budget: int = JOB_CONN_BUDGET,
+        lease_timeout_s: float = JOB_LEASE_TIMEOUT_S,
+    ):
+        """
+        Args:
+            specs: jobs to manage (names must be unique)
+            mode: BG_JOBS_MODE override; defaults to the env value
+            supervise: async (name, fn) runner for loop jobs — main.py
+                passes its restart-with-backoff `_supervised`
+            connect: async factory for the dedicated lease connection.
+                None disables election: this process leads every
+                singleton (single-replica / dev deployments).
+        """
+        names = [s.name for s in specs]
+        if len(names) != len(set(names)):
+            raise ValueError("duplicate job names")
+        self.mode = mode or jobs_mode()
+        self.specs: Dict[str, JobSpec] = {
+            s.name: s for s in specs if self._selected(s)
+        }
+        self._supervise = supervise
+        self._connect = connect
+        self.election_interval_s = election_interval_s
+        self.lease_timeout_s = lease_timeout_s
+        self._budget = _ConnectionBudget(conn_budget)
+        self._state: Dict[str, _JobState] = {
+            name: _JobState(role=ROLE_STANDBY if s.singleton else ROLE_LOCAL)
+            for name, s in self.specs.items()
+        }
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lease = None
+        self._election_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _selected(self, spec: JobSpec) -> bool:
+        if self.mode == MODE_API:
+            return not spec.singleton
+        if self.mode == MODE_WORKER:
+            return spec.singleton
+        return True
+
+    # ── lifecycle ──
+
+    @property
+    def tasks(self) -> Dict[str, asyncio.Task]:
+        """Live job tasks, keyed by job name (app.state.bg_tasks)."""
+        return self._tasks
+
+    async def start(self) -> None:
+        singletons = [n for n, s in self.specs.items() if s.singleton]
+        for name, spec in self.specs.items():
+            if not spec.singleton:
+                self._launch(name)
+        if singletons:
+            if self._connect is None:
+                for name in singletons:
+                    self._promote(name)
+            else:
+                self._election_task = asyncio.create_task(
+                    self._election_loop(), name="job_scheduler_election",
+                )
+        logger.info(
+            "job_scheduler_started",
+            extra={
+                "mode": self.mode,
+                "local_jobs": len(self.specs) - len(singletons),
+                "singleton_jobs": len(singletons),
+                "elected": self._connect is not None,
+            },
+        )
+
+    async def stop(self, timeout_s: float = 10.0) -> None:
+        self._stopping = True
+        if self._election_task is not None:
+            self._election_task.cancel()
+            try:
+                await self._election_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=timeout_s)
+            except (asyncio.CancelledError, asyncio.TimeoutError, Exception):
+                pass
+        await self._close_lease()
+
+    # ── election ──
+
+    async def _election_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await self.elect_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "job_scheduler_election_failed",
+                    exc_info=True,
+                    extra={"exception_class": type(e).__name__},
+                )
+                self._demote_all()
+                await self._close_lease()
+            await asyncio.sleep(self.election_interval_s)
+
+    async def elect_once(self) -> None:
+        """One election pass: hand back jobs whose runner gave up, then
+        try to take every singleton this process doesn't lead. One round
+        trip for the whole set."""
+        timeout = self.lease_timeout_s
+        if self._lease is None or self._lease.is_closed():
+            self._lease = await asyncio.wait_for(self._connect(), timeout)
+
+        released = [
+            n for n, t in self._tasks.items()
+            if t.done() and self._state[n].role == ROLE_LEADER
+        ]
+        for name in released:
+            # The runner gave up (supervisor restart budget exhausted).
+            # Hand the job to another replica rather than sit on it.
+            await self._lease.execute(
+                "SELECT pg_advisory_unlock($1, hashtext($2))", JOB_LOCK_CLASS, name,
+                timeout=timeout,
+            )
+            self._demote(name)
+            logger.warning("job_leadership_released", extra={"job": name})
+
+        wanted = [
+            n for n, s in self.specs.items()
+            if s.singleton and self._state[n].role != ROLE_LEADER
+            and n not in released
+        ]
+        if not wanted:
+            await self._lease.fetchval("SELECT 1", timeout=timeout)
+            return
+        rows = await self._lease.fetch(
+            "SELECT name, pg_try_advisory_lock($1, hashtext(name)) AS got "
+            "FROM unnest($2::text[]) AS name",
+            JOB_LOCK_CLASS, wanted, timeout=timeout,
+        )
+        for row in rows:
+            if row["got"]:
+                self._promote(row["name"])
+            else:
+                _heartbeat_call("set_standby", row["name"], True)
+
+    async def _close_lease(self) -> None:
+        lease, self._lease = self._lease, None
+        if lease is not None:
+            try:
+                await lease.close()
+            except Exception:
+                pass
+
+    def _promote(self, name: str) -> None:
+        state = self._state[name]
+        state.role = ROLE_LEADER
+        state.leader_since = time.time()
+        state.leadership_changes += 1
+        _heartbeat_call("set_standby", name, False)
+        self._launch(name)
+        logger.info("job_leadership_acquired", extra={"job": name})
+
+    def _demote(self, name: str) -> None:
+        task = self._tasks.pop(name, None)
+        if task is not None and not task.done():
+            task.cancel()
+        state = self._state[name]
+        if state.role == ROLE_LEADER:
+            state.role = ROLE_STANDBY
+            state.leader_since = None
+            state.leadership_changes += 1
+        _heartbeat_call("set_standby", name, True)
+
+    def _demote_all(self) -> None:
+        for name, state in self._state.items():
+            if state.role == ROLE_LEADER:
+                self._demote(name)
+                logger.warning("job_leadership_lost", extra={"job": name})
+
+    # ── running ──
+
+    def _launch(self, name: str) -> None:
+        spec = self.specs[name]
+        coro = (
+            self._supervise(name, spec.fn) if spec.kind == "loop"
+            else self._tick_loop(spec)
+        )
+        self._tasks[name] = asyncio.create_task(coro, name=f"job:{name}")
+
+    async def _tick_loop(self, spec: JobSpec) -> None:
+        state = self._state[spec.name]
+        in_flight: set = set()
+        # Startup heartbeat, as _supervised records for loop jobs: the
+        # job shows up in bg_heartbeat before its first run completes.
+        _heartbeat_call("record_heartbeat", spec.name)
+        delay = spec.first_delay()
+        try:
+            while True:
+                await asyncio.sleep(delay)
+                delay = spec.next_delay()
+                if state.in_flight >= spec.max_concurrency:
+                    state.overlaps += 1
+                    _heartbeat_call("record_overlap", spec.name)
+                    logger.warning(
+                        "bg_job_overlap_skipped",
+                        extra={"job": spec.name, "in_flight": state.in_flight},
+                    )
+                    continue
+                state.in_flight += 1
+                task = asyncio.create_task(self._run_once(spec))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            for task in list(in_flight):
+                task.cancel()
+
+    async def _run_once(self, spec: JobSpec) -> bool:
+        state = self._state[spec.name]
+        ok = False
+        units = 0
+        started = time.monotonic()
+        try:
+            units = await self._budget.acquire(spec.conn_budget)
+            started = time.monotonic()
+            await asyncio.wait_for(spec.fn(), timeout=spec.timeout_s)
+            ok = True
+        except asyncio.TimeoutError:
+            state.timeouts += 1
+            logger.error(
+                "bg_job_timeout",
+                extra={"job": spec.name, "timeout_s": spec.timeout_s},
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(
+                "bg_job_failed",
+                exc_info=True,
+                extra={"job": spec.name, "exception_class": type(e).__name__},
+            )
+        finally:
+            await self._budget.release(units)
+            duration = time.monotonic() - started
+            state.in_flight -= 1
+            state.runs += 1
+            if not ok:
+                state.failures += 1
+            state.last_duration_s = round(duration, 4)
+            state.max_duration_s = round(max(duration, state.max_duration_s or 0.0), 4)
+            _heartbeat_call("record_heartbeat", spec.name, ok=ok, duration_s=duration)
+        return ok
+
+    async def run_now(self, name: str) -> bool:
+        """Run a tick job once, outside its schedule (ops / tests)."""
+        spec = self.specs[name]
+        if spec.kind != "tick":
+            raise ValueError(f"{name} is a loop job")
+        self._state[name].in_flight += 1
+        return await self._run_once(spec)
+
+    # ── metrics ──
+
+    def roles(self) -> Dict[str, str]:
+        return {name: state.role for name, state in self._state.items()}
+
+    def metrics(self) -> Dict[str, Any]:
+        jobs = {}
+        for name, spec in self.specs.items():
+            state = self._state[name]
+            jobs[name] = {
+                "kind": spec.kind,
+                "singleton": spec.singleton,
+                "role": state.role,
+                "leader_since": state.leader_since,
+                "leadership_changes": state.leadership_changes,
+                "runs": state.runs,
+                "failures": state.failures,
+                "timeouts": state.timeouts,
+                "overlaps": state.overlaps,
+                "in_flight": state.in_flight,
+                "last_duration_s": state.last_duration_s,
+                "max_duration_s": state.max_duration_s,
+            }
+        return {
+            "mode": self.mode,
+            "elected": self._connect is not None,
+            "lease_connected": self._lease is not None and not self._lease.is_closed(),
+            "conn_budget": {"total": self._budget.total, "used": self._budget.used},
+            "leading": sum(1 for s in self._state.values() if s.role == ROLE_LEADER),
+            "jobs": jobs,
+        }
+
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def set_scheduler(scheduler: Optional[JobScheduler]) -> None:
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler() -> Optional[JobScheduler]:
+    return _scheduler
@@ -0,0 +1,763 @@
+"""
+Precompiled, versioned L1 rule bundles for `/agent/sync`.
+
+Pre-fix `agent_sync_rules` rebuilt ~460 lines of built-in rule dict
+literals, ran one l1_rules query plus one app_profile_rules query per
+protection-profile rule, re-serialized and re-signed the whole set on
+EVERY appliance poll — and shipped the full list back even when the
+appliance already held it.
+
+Now:
+  - Built-in rules are module constants, built once at import.
+  - A `RuleBundle` is compiled per (healing_tier, DB-rule source
+    version) and cached in-process. The source version is the
+    l1_rules/app_profile_rules counters in `change_versions`
+    (migration 330), so every write path that promotes, disables or
+    re-enables a rule invalidates the bundle without having to call
+    anything here.
+  - `RuleBundle.version` is a content hash of the signed rule list, so
+    a rebuild that produces the same rules yields the same version and
+    appliances holding it still get a 304.
+  - Appliances send `have=<bundle_version>`; `sync_payload()` answers
+    304 (None), a delta against a recent bundle still in history, or
+    the full pre-rendered body.
+
+If the counters cannot be read the bundle is compiled fresh for the
+call and not cached — i.e. the pre-cache behavior.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Built-in L1 rules for NixOS appliances
+# Note: status values from SimpleDriftChecker are: "pass", "warning", "fail", "error"
+# Use "in" operator to match non-passing statuses
+
+# Standard rules (4 core rules) - always included
+STANDARD_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "L1-NTP-001",
+        "name": "NTP Drift Remediation",
+        "description": "Restart chronyd when NTP sync drifts",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "ntp_sync"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["restart_service:chronyd"],
+        "severity": "medium",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-SERVICE-001",
+        "name": "Critical Service Recovery",
+        "description": "Restart failed critical services",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "critical_services"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["restart_service:sshd", "restart_service:chronyd"],
+        "severity": "high",
+        "cooldown_seconds": 600,
+        "max_retries": 3,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-DISK-001",
+        "name": "Disk Space Alert",
+        "description": "Alert when disk usage exceeds threshold",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "disk_space"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["alert:disk_space_critical"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 1,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-FIREWALL-001",
+        "name": "Windows Firewall Recovery",
+        "description": "Re-enable Windows Firewall when disabled",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "firewall"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]},
+            {"field": "platform", "operator": "ne", "value": "nixos"}
+        ],
+        "actions": ["restore_firewall_baseline"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-FIREWALL-002",
+        "name": "Windows Firewall Status Recovery",
+        "description": "Re-enable Windows Firewall when status check fails",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "firewall_status"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]},
+            {"field": "platform", "operator": "ne", "value": "nixos"}
+        ],
+        "actions": ["restore_firewall_baseline"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-DEFENDER-001",
+        "name": "Windows Defender Recovery",
+        "description": "Re-enable Windows Defender when disabled",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "windows_defender"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["restore_defender"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-GENERATION-001",
+        "name": "NixOS Generation Drift",
+        "description": "Alert when NixOS generation is invalid or unknown",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "nixos_generation"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["alert:generation_drift"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 1,
+        "source": "builtin"
+    }
+]
+
+# Additional rules for full_coverage mode (14 more rules)
+FULL_COVERAGE_EXTRA_RULES: List[Dict[str, Any]] = [
+    {
+        "id": "L1-PASSWORD-001",
+        "name": "Password Policy Enforcement",
+        "description": "Enforce minimum password requirements",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "password_policy"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["set_password_policy"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-AUDIT-001",
+        "name": "Audit Policy Enforcement",
+        "description": "Enable required audit policies",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "audit_policy"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["set_audit_policy"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-BITLOCKER-001",
+        "name": "BitLocker Encryption",
+        "description": "Enable drive encryption",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "bitlocker_status"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-005"],
+        "severity": "critical",
+        "cooldown_seconds": 3600,
+        "max_retries": 1,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-SMB1-001",
+        "name": "SMBv1 Protocol Disabled",
+        "description": "Disable insecure SMBv1 protocol",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "smb1_protocol"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-020"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-AUTOPLAY-001",
+        "name": "AutoPlay Disabled",
+        "description": "Disable AutoPlay to prevent malware spread",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "autoplay_disabled"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["disable_autoplay"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-LOCKOUT-001",
+        "name": "Account Lockout Policy",
+        "description": "Configure account lockout after failed attempts",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "lockout_policy"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["set_lockout_policy"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-SCREENSAVER-001",
+        "name": "Screensaver Timeout",
+        "description": "Configure screensaver with password protection",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "screensaver_timeout"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["set_screensaver_policy"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-RDP-001",
+        "name": "RDP Security",
+        "description": "Secure RDP with NLA requirement",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "rdp_security"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["configure_rdp_security"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-UAC-001",
+        "name": "UAC Enabled",
+        "description": "Ensure User Account Control is enabled",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "uac_enabled"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["enable_uac"],
+        "severity": "high",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-EVENTLOG-001",
+        "name": "Event Log Size",
+        "description": "Configure adequate event log retention",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "event_log_size"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["set_event_log_size"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-DEFENDERUPDATES-001",
+        "name": "Windows Defender Definitions",
+        "description": "Update malware definitions",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "defender_definitions"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["update_defender_definitions"],
+        "severity": "high",
+        "cooldown_seconds": 14400,
+        "max_retries": 3,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-GUESTACCOUNT-001",
+        "name": "Guest Account Disabled",
+        "description": "Disable built-in Guest account",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "guest_account_disabled"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["disable_guest_account"],
+        "severity": "medium",
+        "cooldown_seconds": 3600,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-WUPDATES-001",
+        "name": "Windows Updates",
+        "description": "Check and trigger pending security updates",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "windows_updates"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["trigger_windows_update"],
+        "severity": "high",
+        "cooldown_seconds": 86400,
+        "max_retries": 1,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-BACKUP-001",
+        "name": "Backup Status",
+        "description": "Alert when backup fails or is stale",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "backup"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["alert:backup_failed"],
+        "severity": "high",
+        "cooldown_seconds": 7200,
+        "max_retries": 1,
+        "source": "builtin"
+    },
+    # Go Agent check_types (mapped from grpc_server.py)
+    {
+        "id": "L1-SCREENLOCK-001",
+        "name": "Screen Lock Policy",
+        "description": "Enforce screen lock timeout and password requirement",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "screen_lock_policy"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-016"],
+        "severity": "high",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-PATCHING-001",
+        "name": "Windows Update Service",
+        "description": "Ensure Windows Update service is running and updates are applied",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "patching"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["trigger_windows_update"],
+        "severity": "critical",
+        "cooldown_seconds": 86400,
+        "max_retries": 1,
+        "source": "builtin"
+    },
+    # --- Linux L1 Rules ---
+    {
+        "id": "L1-LIN-SSH-001",
+        "name": "SSH Configuration Drift",
+        "description": "Fix SSH config drift (PermitRootLogin, PasswordAuthentication, etc.)",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "ssh_config"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_linux_runbook"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-LIN-KERN-001",
+        "name": "Kernel Parameter Hardening",
+        "description": "Fix unsafe kernel parameters (ip_forward, ASLR, etc.)",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "kernel"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["run_linux_runbook:LIN-KERN-001"],
+        "severity": "high",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-LIN-CRON-001",
+        "name": "Cron Permission Hardening",
+        "description": "Fix insecure cron file permissions",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "cron"},
+            {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
+        ],
+        "actions": ["run_linux_runbook:LIN-CRON-001"],
+        "severity": "high",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-LIN-SUID-001",
+        "name": "SUID Binary Cleanup",
+        "description": "Remove unauthorized SUID binaries from temp directories",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "permissions"},
+            {"field": "drift_detected", "operator": "eq", "value": True},
+            {"field": "distro", "operator": "ne", "value": None}
+        ],
+        "actions": ["run_linux_runbook"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    # --- Windows Persistence Detection ---
+    {
+        "id": "L1-PERSIST-TASK-001",
+        "name": "Scheduled Task Persistence Detected",
+        "description": "Remove suspicious scheduled tasks from root namespace",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "scheduled_task_persistence"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-018"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-PERSIST-REG-001",
+        "name": "Registry Run Key Persistence Detected",
+        "description": "Remove suspicious registry Run key entries",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "registry_run_persistence"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-019"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-PERSIST-WMI-001",
+        "name": "WMI Event Subscription Persistence Detected",
+        "description": "Remove suspicious WMI event subscriptions used for persistence",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "wmi_event_persistence"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-021"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-SMB-SIGNING-001",
+        "name": "SMB Signing Not Required",
+        "description": "Enforce SMB signing to prevent relay attacks",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "smb_signing"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SEC-007"],
+        "severity": "high",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    },
+    {
+        "id": "L1-SVC-NETLOGON-001",
+        "name": "NetLogon Service Down",
+        "description": "Restore NetLogon service for domain authentication",
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": "service_netlogon"},
+            {"field": "drift_detected", "operator": "eq", "value": True}
+        ],
+        "actions": ["run_windows_runbook:RB-WIN-SVC-001"],
+        "severity": "critical",
+        "cooldown_seconds": 300,
+        "max_retries": 2,
+        "source": "builtin"
+    }
+]
+
+
+HEALING_TIERS = ("standard", "full_coverage")
+
+# (healing_tier, source_version) -> RuleBundle. Two tiers × a handful of
+# recent source versions; the cap only bounds churn during a promotion
+# burst.
+_MAX_BUNDLES = 16
+# bundle version -> RuleBundle, for computing deltas against whatever an
+# appliance currently holds. Appliances sync every few minutes, so a
+# short history covers everything but a long-offline box (which just
+# gets the full set).
+_MAX_HISTORY = 32
+
+_BUNDLES: "OrderedDict[Tuple[str, Tuple], RuleBundle]" = OrderedDict()
+_HISTORY: "OrderedDict[str, RuleBundle]" = OrderedDict()
+
+_SOURCE_TABLES = ["l1_rules", "app_profile_rules"]
+
+
+def _rule_hash(rule: Dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(rule, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+@dataclass(frozen=True)
+class RuleBundle:
+    """One compiled, signed rule set for a healing tier."""
+
+    version: str
+    healing_tier: str
+    rules: Tuple[Dict[str, Any], ...]
+    signature: str
+    # rule id -> content hash; None when ids are not unique (delta
+    # sync is disabled for such a bundle and clients get the full set).
+    rule_hashes: Optional[Dict[str, str]] = field(default=None, compare=False)
+
+    @property
+    def count(self) -> int:
+        return len(self.rules)
+
+    def delta_from(self, base: "RuleBundle") -> Optional[Dict[str, Any]]:
+        """Upserts/removals turning `base` into this bundle, or None."""
+        if self.rule_hashes is None or base.rule_hashes is None:
+            return None
+        upsert = [
+            r for r in self.rules
+            if base.rule_hashes.get(r["id"]) != self.rule_hashes[r["id"]]
+        ]
+        remove = [rid for rid in base.rule_hashes if rid not in self.rule_hashes]
+        return {
+            "upsert": upsert,
+            "remove": remove,
+            # Full id order: first-match among equal priorities depends on
+            # list order, so the client reorders after merging.
+            "order": [r["id"] for r in self.rules],
+        }
+
+
+def compile_bundle(
+    healing_tier: str,
+    db_rules: List[Dict[str, Any]],
+    sign: Callable[[str], str],
+) -> RuleBundle:
+    """Built-in rules for the tier + DB rules, signed and hashed."""
+    if healing_tier == "full_coverage":
+        builtin_rules = STANDARD_RULES + FULL_COVERAGE_EXTRA_RULES
+    else:
+        builtin_rules = STANDARD_RULES
+    all_rules = builtin_rules + db_rules
+
+    # Sign the rules bundle for appliance-side integrity verification
+    rules_json = json.dumps(all_rules, sort_keys=True)
+    signature = sign(rules_json)
+
+    hashes: Optional[Dict[str, str]] = {r["id"]: _rule_hash(r) for r in all_rules}
+    if len(hashes) != len(all_rules):
+        hashes = None
+
+    version = hashlib.sha256(
+        f"{healing_tier}|{rules_json}".encode()
+    ).hexdigest()[:16]
+    return RuleBundle(
+        version=version,
+        healing_tier=healing_tier,
+        rules=tuple(all_rules),
+        signature=signature,
+        rule_hashes=hashes,
+    )
+
+
+def _decode_json(value: Any) -> Any:
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
+
+
+def _db_row_to_rule(row) -> Optional[Dict[str, Any]]:
+    rule_source = row["source"]
+
+    # For protection_profile rules, prefer the full rule_json
+    if rule_source == "protection_profile" and row["rule_json"]:
+        try:
+            return _decode_json(row["rule_json"])
+        except Exception as e:
+            # Protection profile rule_json unreadable — fall through to generic format
+            logger.debug(
+                "Failed to load protection_profile rule_json for %s: %s",
+                row["rule_id"], e,
+            )
+
+    # Convert incident_pattern dict to conditions list
+    # Database stores: {"incident_type": "firewall"} or {"check_type": "screen_lock"}
+    # Conditions format: [{"field": "incident_type", "operator": "eq", "value": "firewall"}]
+    pattern = _decode_json(row["incident_pattern"])
+    if isinstance(pattern, list):
+        conditions = pattern
+    elif isinstance(pattern, dict):
+        conditions = []
+        for k, v in pattern.items():
+            # Map incident_type to check_type (auto_healer uses check_type)
+            field_name = "check_type" if k == "incident_type" else k
+            conditions.append({"field": field_name, "operator": "eq", "value": v})
+        # Add status condition for fail/warning/error
+        conditions.append({"field": "status", "operator": "in", "value": ["warning", "fail", "error"]})
+    else:
+        conditions = []
+
+    return {
+        "id": row["rule_id"],
+        "name": f"Promoted: {row['rule_id']}",
+        "description": f"Auto-promoted rule with {row['confidence']:.0%} confidence",
+        "conditions": conditions,
+        "actions": [f"run_runbook:{row['runbook_id']}"],
+        "severity": "critical" if rule_source == "protection_profile" else "medium",
+        "cooldown_seconds": 300,
+        "max_retries": 3 if rule_source == "protection_profile" else 2,
+        "source": rule_source,
+    }
+
+
+async def fetch_db_rules(conn) -> List[Dict[str, Any]]:
+    """Custom/promoted/protection_profile rules in sync format.
+
+    One query — the per-rule app_profile_rules lookup is a LATERAL
+    join instead of N follow-up round trips. Soft-fails to [] like the
+    inline version it replaces.
+    """
+    try:
+        rows = await conn.fetch("""
+            SELECT r.rule_id, r.incident_pattern, r.runbook_id, r.confidence,
+                   COALESCE(r.source, 'promoted') AS source,
+                   ppr.rule_json
+              FROM l1_rules r
+              LEFT JOIN LATERAL (
+                   SELECT rule_json FROM app_profile_rules
+                    WHERE l1_rule_id = r.rule_id
+                    LIMIT 1
+              ) ppr ON COALESCE(r.source, 'promoted') = 'protection_profile'
+             WHERE r.enabled = true AND COALESCE(r.source, 'promoted') != 'builtin'
+             ORDER BY r.confidence DESC
+        """)
+    except Exception as e:
+        logger.warning("Failed to fetch DB rules: %s", e)
+        return []
+
+    db_rules = []
+    for row in rows:
+        try:
+            rule = _db_row_to_rule(row)
+        except Exception as e:
+            logger.warning("Skipping malformed l1_rules row %s: %s", row["rule_id"], e)
+            continue
+        if rule:
+            db_rules.append(rule)
+    return db_rules
+
+
+async def _source_version(conn) -> Optional[Tuple]:
+    try:
+        rows = await conn.fetch(
+            """
+            SELECT table_name, version FROM change_versions
+             WHERE scope_key = '*' AND table_name = ANY($1::text[])
+             ORDER BY table_name
+            """,
+            _SOURCE_TABLES,
+        )
+    except Exception as e:
+        logger.warning("rule bundle source version unavailable: %s", e)
+        return None
+    return tuple((r["table_name"], r["version"]) for r in rows)
+
+
+def _remember(bundle: RuleBundle) -> None:
+    _HISTORY[bundle.version] = bundle
+    _HISTORY.move_to_end(bundle.version)
+    while len(_HISTORY) > _MAX_HISTORY:
+        _HISTORY.popitem(last=False)
+
+
+async def get_rule_bundle(
+    conn,
+    healing_tier: str,
+    sign: Callable[[str], str],
+) -> RuleBundle:
+    """Cached bundle for the tier at the current DB-rule version."""
+    if healing_tier not in HEALING_TIERS:
+        healing_tier = "standard"
+    source_version = await _source_version(conn)
+    key = (healing_tier, source_version)
+    if source_version is not None:
+        cached = _BUNDLES.get(key)
+        if cached is not None:
+            _BUNDLES.move_to_end(key)
+            return cached
+
+    bundle = compile_bundle(healing_tier, await fetch_db_rules(conn), sign)
+    # Same content as a bundle already in history (e.g. a counter bump
+    # that did not change the synced rules) — reuse it.
+    bundle = _HISTORY.get(bundle.version, bundle)
+    _remember(bundle)
+    if source_version is not None:
+        _BUNDLES[key] = bundle
+        while len(_BUNDLES) > _MAX_BUNDLES:
+            _BUNDLES.popitem(last=False)
+    return bundle
+
+
+def sync_payload(
+    bundle: RuleBundle,
+    have: Optional[str],
+    server_public_key: str,
+) -> Optional[Dict[str, Any]]:
+    """Response body for an appliance holding `have` (None = up to date)."""
+    if have and have == bundle.version:
+        return None
+    payload: Dict[str, Any] = {
+        "healing_tier": bundle.healing_tier,
+        "version": "1.0.0",
+        "bundle_version": bundle.version,
+        "count": bundle.count,
+        "signature": bundle.signature,
+        "server_public_key": server_public_key,
+    }
+    base = _HISTORY.get(have) if have else None
+    delta = bundle.delta_from(base) if base is not None else None
+    if delta is not None:
+        payload["base_version"] = have
+        payload["delta"] = delta
+    else:
+        payload["rules"] = list(bundle.rules)
+    return payload
+
+
+def bundle_cache_clear() -> None:
+    """Test-only: reset all bundle state."""
+    _BUNDLES.clear()
+    _HISTORY.clear()
@@ -0,0 +1,81 @@
+"""Deferred imports for heavy optional SDKs.
+
+Most optional dependencies in this package are imported inside the
+function that uses them (WeasyPrint, opentimestamps, the integration
+connectors). stripe is the exception: five modules use it from dozens
+of call sites and need `stripe.api_key` configured. They all import the
+one `stripe` LazyModule defined here, which keeps those call sites
+unchanged while the SDK is only imported by the first billing request
+rather than by every API worker at startup.
+
+startup_profile's import budget asserts these stay out of `import main`.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Callable, Optional
+
+
+def module_available(name: str) -> bool:
+    """True if `name` is importable, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # ValueError: already in sys.modules with no __spec__ (stubs).
+        return name in sys.modules
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access.
+
+    `on_load(module)` runs once, right after the import — the place for
+    what used to be import-time configuration (api keys). Attribute
+    writes are forwarded to the real module.
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[ModuleType], None]] = None):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_on_load"] = on_load
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                module = importlib.import_module(self.__dict__["_lazy_name"])
+                on_load = self.__dict__["_lazy_on_load"]
+                if on_load is not None:
+                    on_load(module)
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_lazy_name']!r} ({state})>"
+
+
+def _configure_stripe(module: ModuleType) -> None:
+    secret_key = os.getenv("STRIPE_SECRET_KEY")
+    if secret_key:
+        module.api_key = secret_key
+
+
+stripe = LazyModule("stripe", on_load=_configure_stripe)
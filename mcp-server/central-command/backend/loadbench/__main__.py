@@ -0,0 +1,110 @@
+"""CLI: python3 -m loadbench {seed,run} — see loadbench/__init__.py."""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Sequence
+
+from . import db, stats
+from .fleet import SIZES, FleetSpec, generate, seed
+from .traffic import APPLIANCE_OPS, DASHBOARD_OPS, run_benchmark
+
+
+def _spec(args) -> FleetSpec:
+    spec = SIZES[args.size]
+    overrides = {
+        name: getattr(args, name)
+        for name in ("sites", "appliances_per_site", "seed", "prefix")
+        if getattr(args, name) is not None
+    }
+    return replace(spec, **overrides)
+
+
+async def _connect(args):
+    import asyncpg
+
+    db.check_target(args.dsn, args.allow_remote)
+    return await asyncpg.connect(args.dsn)
+
+
+async def _seed(args) -> int:
+    spec = _spec(args)
+    fleet = generate(spec)
+    conn = await _connect(args)
+    try:
+        counts = await seed(conn, fleet, datetime.now(timezone.utc))
+    finally:
+        await conn.close()
+    for table, n in counts.items():
+        print(f"{table:<22}{n:>10}")
+    print(f"seeded {len(fleet.site_ids)} sites / {len(fleet.appliances)} appliances ({spec.prefix}*)")
+    return 0
+
+
+async def _run(args) -> int:
+    fleet = generate(_spec(args))
+    ops = args.ops.split(",") if args.ops else list(APPLIANCE_OPS) + (
+        [] if args.no_dashboard else list(DASHBOARD_OPS)
+    )
+    conn = await _connect(args)
+    try:
+        token = None
+        if any(op in DASHBOARD_OPS for op in ops):
+            token = await db.mint_admin_session(conn, fleet.admin_username)
+        report = await run_benchmark(
+            fleet, args.base_url, conn, ops,
+            requests=args.requests, concurrency=args.concurrency,
+            session_token=token, mixed=not args.no_mixed,
+        )
+    finally:
+        await conn.close()
+
+    print(stats.format_table(report))
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"report: {args.report}")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    violations = stats.check(report, stats.load_thresholds(args.thresholds), baseline)
+    for line in violations:
+        print(f"REGRESSION {line}")
+    return 1 if violations else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m loadbench")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dsn", required=True, help="scratch Postgres the API is using")
+    common.add_argument("--allow-remote", action="store_true",
+                        help="allow a non-local database host (still a scratch database!)")
+    common.add_argument("--size", choices=sorted(SIZES), default="small")
+    common.add_argument("--sites", type=int)
+    common.add_argument("--appliances-per-site", type=int)
+    common.add_argument("--seed", type=int)
+    common.add_argument("--prefix")
+
+    sub.add_parser("seed", parents=[common], help="write the synthetic fleet")
+
+    run = sub.add_parser("run", parents=[common], help="replay traffic and check thresholds")
+    run.add_argument("--base-url", default="http://localhost:8000")
+    run.add_argument("--requests", type=int, default=200, help="requests per operation per phase")
+    run.add_argument("--concurrency", type=int, default=16, help="workers per operation")
+    run.add_argument("--ops", help="comma-separated subset of: " + ", ".join(APPLIANCE_OPS + DASHBOARD_OPS))
+    run.add_argument("--no-dashboard", action="store_true")
+    run.add_argument("--no-mixed", action="store_true")
+    run.add_argument("--report", type=Path, help="write the JSON report here")
+    run.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    run.add_argument("--thresholds", type=Path, default=stats.THRESHOLDS_PATH)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(_seed(args) if args.command == "seed" else _run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
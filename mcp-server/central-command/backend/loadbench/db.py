@@ -0,0 +1,122 @@
+"""
+Database side of the load benchmark: target guard, round-trip counter,
+dashboard session.
+
+Round trips per operation come from server-wide statement counters, read
+before and after each operation's phase:
+
+  pg_stat_statements   sum(calls) for the current database — statements
+                       executed (preferred; needs the extension loaded
+                       via shared_preload_libraries)
+  pg_stat_database     xact_commit + xact_rollback — transactions, a
+                       coarser fallback
+
+The API's background loops hit the same database, so calibrate()
+measures the idle rate first and delta() subtracts it.
+"""
+
+import asyncio
+import hashlib
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+
+def check_target(dsn: str, allow_remote: bool = False) -> None:
+    """Refuse anything that could be a shared database.
+
+    The seeded fleet cannot be removed (compliance_bundles is append-
+    only), so the benchmark only ever talks to a local scratch database.
+    """
+    if os.getenv("ENVIRONMENT", "").lower() in ("production", "prod"):
+        raise SystemExit("loadbench: refusing to run with ENVIRONMENT=production")
+    host = urlparse(dsn).hostname or ""
+    if host not in LOCAL_HOSTS and not allow_remote:
+        raise SystemExit(
+            f"loadbench: {host!r} is not a local database host; pass "
+            f"--allow-remote if it really is a scratch database"
+        )
+
+
+@dataclass
+class RoundTripCounter:
+    source: Optional[str] = None        # "pg_stat_statements" | "pg_stat_database" | None
+    idle_per_second: float = 0.0
+
+    async def detect(self, conn) -> Optional[str]:
+        try:
+            await conn.fetchval("SELECT 1 FROM pg_stat_statements LIMIT 1")
+            self.source = "pg_stat_statements"
+        except Exception:
+            self.source = "pg_stat_database"
+        return self.source
+
+    async def read(self, conn) -> Tuple[float, float]:
+        """(counter value, monotonic time)."""
+        if self.source == "pg_stat_statements":
+            value = await conn.fetchval(
+                "SELECT coalesce(sum(calls), 0) FROM pg_stat_statements "
+                "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            )
+        elif self.source == "pg_stat_database":
+            value = await conn.fetchval(
+                "SELECT xact_commit + xact_rollback FROM pg_stat_database "
+                "WHERE datname = current_database()"
+            )
+        else:
+            value = 0
+        return float(value), time.monotonic()
+
+    async def calibrate(self, conn, seconds: float = 3.0) -> float:
+        """Background statements per second while no benchmark traffic runs."""
+        before = await self.read(conn)
+        await asyncio.sleep(seconds)
+        after = await self.read(conn)
+        # The two reads themselves are counted; don't charge them as idle load.
+        self.idle_per_second = max(0.0, (after[0] - before[0] - 1) / (after[1] - before[1]))
+        return self.idle_per_second
+
+    def delta(self, before: Tuple[float, float], after: Tuple[float, float]) -> Optional[float]:
+        """Statements (or transactions) caused by the traffic between two reads."""
+        if self.source is None:
+            return None
+        idle = self.idle_per_second * (after[1] - before[1])
+        return max(0.0, after[0] - before[0] - 1 - idle)
+
+
+def session_token_hash(token: str) -> str:
+    """auth.hash_token, without importing the API (same secret, same format)."""
+    secret = os.getenv("SESSION_TOKEN_SECRET")
+    if not secret:
+        raise SystemExit(
+            "loadbench: SESSION_TOKEN_SECRET must match the API's to mint a "
+            "dashboard session"
+        )
+    return hashlib.sha256(f"{secret}:{token}".encode()).hexdigest()
+
+
+async def mint_admin_session(conn, username: str, hours: int = 4) -> str:
+    """Session token for the fleet's admin user (cookie `session_token`)."""
+    token = secrets.token_urlsafe(32)
+    inserted = await conn.fetchval(
+        """
+        WITH s AS (
+            INSERT INTO admin_sessions (user_id, token_hash, user_agent, expires_at)
+            SELECT id, $2, 'loadbench', $3 FROM admin_users WHERE username = $1
+            RETURNING 1
+        )
+        SELECT count(*) FROM s
+        """,
+        username,
+        session_token_hash(token),
+        datetime.now(timezone.utc) + timedelta(hours=hours),
+    )
+    if not inserted:
+        raise SystemExit(f"loadbench: admin user {username!r} not found; run `seed` first")
+    return token
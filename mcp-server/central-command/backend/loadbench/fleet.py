@@ -0,0 +1,426 @@
+"""
+Synthetic fleet for the load benchmark.
+
+generate(spec) is pure: the same FleetSpec (seed included) always yields
+the same site ids, appliance identities, bearer keys, Ed25519 keys and
+row contents, so two runs seeded from one spec are comparable. rows()
+lays timestamps out backwards from the `now` it is given; that anchor is
+the only thing that differs between seedings.
+
+Sites use the spec prefix ("bench-" by default) with synthetic=FALSE:
+the no_synthetic_bundles CHECK rejects bundles for 'synthetic-' site ids
+and the dashboards hide synthetic sites, and either would defeat the
+benchmark. seed() therefore only runs against a scratch database
+(db.check_target).
+"""
+
+import hashlib
+import ipaddress
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+GENESIS_HASH = "0" * 64
+
+CHECK_TYPES = (
+    "firewall", "antivirus", "backup", "patching",
+    "encryption", "audit_logging", "password_policy", "screen_lock",
+)
+LOG_UNITS = (
+    "osiris-daemon.service", "sshd.service", "systemd-networkd.service",
+    "nix-daemon.service", "wireguard-wg0.service",
+)
+SEVERITIES = ("low", "medium", "high", "critical")
+
+_NAMESPACE = uuid.UUID("6f1c1d4e-5b0a-4c44-9d0e-1f3b2a7c9e10")
+
+
+@dataclass(frozen=True)
+class FleetSpec:
+    sites: int = 20
+    appliances_per_site: int = 2
+    bundles_per_appliance: int = 50
+    checks_per_bundle: int = 8
+    incidents_per_site: int = 20
+    heartbeats_per_appliance: int = 288   # one day at the 5-minute cadence
+    logs_per_appliance: int = 500
+    orders_per_appliance: int = 25        # pending admin_orders for order_ack
+    history_hours: int = 24
+    seed: int = 1
+    prefix: str = "bench-"
+
+
+SIZES: Dict[str, FleetSpec] = {
+    "small": FleetSpec(),
+    "medium": FleetSpec(
+        sites=250, bundles_per_appliance=200, incidents_per_site=50,
+        logs_per_appliance=2000,
+    ),
+    "large": FleetSpec(
+        sites=1000, appliances_per_site=3, bundles_per_appliance=500,
+        incidents_per_site=100, heartbeats_per_appliance=2016,
+        logs_per_appliance=2000, orders_per_appliance=50, history_hours=168,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Appliance:
+    site_id: str
+    appliance_id: str
+    legacy_uuid: str
+    hostname: str
+    mac_address: str
+    ip_address: str      # sent as X-Forwarded-For: one rate-limit bucket per appliance
+    api_key: str
+    private_key: bytes
+    public_key: str
+    order_ids: Tuple[str, ...]
+
+    def sign(self, data: bytes) -> str:
+        return Ed25519PrivateKey.from_private_bytes(self.private_key).sign(data).hex()
+
+
+@dataclass(frozen=True)
+class Fleet:
+    spec: FleetSpec
+    client_org_id: str
+    admin_username: str
+    site_ids: Tuple[str, ...]
+    appliances: Tuple[Appliance, ...]
+
+    def site_appliances(self, site_id: str) -> List[Appliance]:
+        return [a for a in self.appliances if a.site_id == site_id]
+
+
+def generate(spec: FleetSpec) -> Fleet:
+    """Identities for every site and appliance in `spec`."""
+    rng = random.Random(spec.seed)
+    p = spec.prefix
+    site_ids = tuple(f"{p}site-{i:04d}" for i in range(spec.sites))
+    appliances = []
+    for site_idx, site_id in enumerate(site_ids):
+        for j in range(spec.appliances_per_site):
+            # Locally administered unicast MAC, formatted like normalize_mac.
+            mac = ":".join(f"{b:02X}" for b in (0x02, *rng.randbytes(5)))
+            private_key = rng.randbytes(32)
+            public_key = (
+                Ed25519PrivateKey.from_private_bytes(private_key)
+                .public_key().public_bytes(Encoding.Raw, PublicFormat.Raw).hex()
+            )
+            n = len(appliances) + 1
+            appliances.append(Appliance(
+                site_id=site_id,
+                appliance_id=f"{site_id}-{mac}",  # as appliance_checkin derives it
+                legacy_uuid=str(uuid.UUID(bytes=rng.randbytes(16), version=4)),
+                hostname=f"{p}host-{site_idx:04d}-{j}",
+                mac_address=mac,
+                ip_address=str(ipaddress.IPv4Address(0x0A000000 + n)),
+                api_key=rng.randbytes(24).hex(),
+                private_key=private_key,
+                public_key=public_key,
+                order_ids=tuple(
+                    f"{p}ord-{site_idx:04d}-{j}-{k:05d}"
+                    for k in range(spec.orders_per_appliance)
+                ),
+            ))
+    return Fleet(
+        spec=spec,
+        client_org_id=str(uuid.uuid5(_NAMESPACE, f"{p}client-org")),
+        admin_username=f"{p}admin",
+        site_ids=site_ids,
+        appliances=tuple(appliances),
+    )
+
+
+def random_checks(rng: random.Random, hostname: str, count: int) -> List[Dict[str, Any]]:
+    """Check results in the daemon's shape; ~85% pass."""
+    kinds = rng.sample(CHECK_TYPES, min(count, len(CHECK_TYPES)))
+    return [
+        {
+            "check": kind,
+            "hostname": hostname,
+            "status": rng.choices(("pass", "fail", "warning"), (85, 10, 5))[0],
+        }
+        for kind in kinds
+    ]
+
+
+def evidence_bundle(
+    appliance: Appliance, checked_at: datetime, checks: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """A signed evidence submission, as the daemon builds it.
+
+    signed_data is the canonical JSON evidence_chain verifies against,
+    and bundle_hash is its sha256.
+    """
+    statuses = [c["status"] for c in checks]
+    summary = {
+        "total": len(checks),
+        "passed": sum(s == "pass" for s in statuses),
+        "failed": sum(s == "fail" for s in statuses),
+    }
+    signed_data = json.dumps({
+        "site_id": appliance.site_id,
+        "checked_at": checked_at.isoformat(),
+        "checks": checks,
+        "summary": summary,
+    }, sort_keys=True)
+    if "fail" in statuses:
+        check_result = "fail"
+    elif all(s in ("pass", "warning") for s in statuses):
+        check_result = "pass"
+    else:
+        check_result = "warn"
+    return {
+        "site_id": appliance.site_id,
+        "bundle_hash": hashlib.sha256(signed_data.encode()).hexdigest(),
+        "check_type": checks[0]["check"] if checks else "drift",
+        "check_result": check_result,
+        "checked_at": checked_at.isoformat(),
+        "checks": checks,
+        "summary": summary,
+        "agent_signature": appliance.sign(signed_data.encode()),
+        "agent_public_key": appliance.public_key,
+        "signed_data": signed_data,
+    }
+
+
+def _spread(now: datetime, hours: int, count: int) -> List[datetime]:
+    """`count` timestamps evenly spaced over the last `hours`, oldest first."""
+    if count <= 0:
+        return []
+    step = timedelta(hours=hours) / count
+    return [now - step * (count - i) for i in range(count)]
+
+
+def iter_rows(fleet: Fleet, now: datetime) -> Iterator[Tuple[str, List[Tuple]]]:
+    """(table, row tuples) in _INSERT_SQL column order, one site at a time.
+
+    Within a site, tables come in _INSERT_SQL (foreign-key) order.
+    """
+    spec = fleet.spec
+    rng = random.Random(f"{spec.seed}:rows")
+    born = now - timedelta(hours=spec.history_hours)
+
+    yield "client_orgs", [(
+        fleet.client_org_id,
+        f"LOADBENCH {spec.prefix} (synthetic benchmark fleet, NOT a real customer)",
+        f"loadbench-{spec.prefix.strip('-') or 'fleet'}@example.invalid",
+        "active", now, now,
+    )]
+    yield "admin_users", [(
+        fleet.admin_username, f"{fleet.admin_username}@example.invalid",
+        "Load benchmark", "admin", "active",
+    )]
+
+    for site_idx, site_id in enumerate(fleet.site_ids):
+        site_apps = fleet.site_appliances(site_id)
+        yield "sites", [(
+            site_id, f"Bench Clinic {site_idx:04d}", "small", "healthcare",
+            "online", fleet.client_org_id, False, born, now,
+        )]
+        yield "site_appliances", [
+            (app.appliance_id, app.site_id, app.hostname, app.mac_address, "online",
+             app.public_key, app.legacy_uuid, "bench", born, now, born)
+            for app in site_apps
+        ]
+        yield "api_keys", [
+            (app.site_id, app.appliance_id, hashlib.sha256(app.api_key.encode()).hexdigest(),
+             app.api_key[:8], True, "loadbench appliance bearer", born)
+            for app in site_apps
+        ]
+
+        # One evidence chain per site, appliances interleaved. No
+        # appliance_id column (deprecated, mig 268): bundles bind to an
+        # appliance through the agent_public_key that signed them.
+        bundles = []
+        prev_id, prev_hash = None, GENESIS_HASH
+        times = _spread(now, spec.history_hours, spec.bundles_per_appliance * len(site_apps))
+        for pos, checked_at in enumerate(times, start=1):
+            app = site_apps[(pos - 1) % len(site_apps)]
+            b = evidence_bundle(app, checked_at, random_checks(rng, app.hostname, spec.checks_per_bundle))
+            bundle_id = f"CB-{site_id}-{pos:07d}"
+            chain_hash = hashlib.sha256(f"{b['bundle_hash']}:{prev_hash}:{pos}".encode()).hexdigest()
+            bundles.append((
+                site_id, bundle_id, b["bundle_hash"], b["check_type"], b["check_result"],
+                checked_at, json.dumps(b["checks"]), json.dumps(b["summary"]),
+                b["agent_signature"], b["signed_data"], True,
+                prev_id, prev_hash, pos, chain_hash,
+            ))
+            prev_id, prev_hash = bundle_id, b["bundle_hash"]
+        yield "compliance_bundles", bundles
+
+        incidents = []
+        for k, reported_at in enumerate(_spread(now, spec.history_hours, spec.incidents_per_site)):
+            app = rng.choice(site_apps)
+            check_type = rng.choice(CHECK_TYPES)
+            resolved = rng.random() < 0.8
+            incidents.append((
+                site_id, app.legacy_uuid, f"{check_type}_drift", rng.choice(SEVERITIES),
+                "resolved" if resolved else "open", check_type,
+                json.dumps({"hostname": app.hostname, "check": check_type}),
+                f"{site_id}:{k:06d}", reported_at, reported_at,
+                reported_at + timedelta(minutes=rng.randint(1, 30)) if resolved else None,
+            ))
+        yield "incidents", incidents
+
+        yield "appliance_heartbeats", [
+            (app.site_id, app.appliance_id, observed_at, "online", "bench")
+            for app in site_apps
+            for observed_at in _spread(now, spec.history_hours, spec.heartbeats_per_appliance)
+        ]
+
+        logs = []
+        for app in site_apps:
+            for ts in _spread(now, spec.history_hours, spec.logs_per_appliance):
+                unit = rng.choice(LOG_UNITS)
+                logs.append((
+                    app.site_id, app.hostname, unit, rng.choice((6, 6, 6, 5, 4, 3)), ts,
+                    f"{unit.split('.')[0]}: cycle complete in {rng.randint(40, 900)}ms",
+                ))
+        yield "log_entries", logs
+
+        yield "admin_orders", [
+            (order_id, app.appliance_id, app.site_id, "force_checkin", "{}",
+             0, "pending", now, now + timedelta(days=7))
+            for app in site_apps
+            for order_id in app.order_ids
+        ]
+
+
+def rows(fleet: Fleet, now: datetime) -> Dict[str, List[Tuple]]:
+    """All of iter_rows() collected per table (small fleets and tests)."""
+    out: Dict[str, List[Tuple]] = {table: [] for table in _INSERT_SQL}
+    for table, batch in iter_rows(fleet, now):
+        out[table].extend(batch)
+    return out
+
+
+# One statement per table: INSERT ... SELECT FROM unnest(<column arrays>).
+# Types follow tests/fixtures/schema/prod_column_types.json.
+_INSERT_SQL: Dict[str, str] = {
+    "client_orgs": """
+        INSERT INTO client_orgs (id, name, primary_email, status, created_at, updated_at)
+        SELECT * FROM unnest($1::uuid[], $2::text[], $3::text[], $4::text[],
+                             $5::timestamptz[], $6::timestamptz[])
+        ON CONFLICT (id) DO NOTHING
+    """,
+    "admin_users": """
+        INSERT INTO admin_users (username, email, display_name, role, status)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[])
+        ON CONFLICT (username) DO NOTHING
+    """,
+    "sites": """
+        INSERT INTO sites (site_id, clinic_name, tier, industry, status,
+                           client_org_id, synthetic, created_at, updated_at)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+                             $6::uuid[], $7::boolean[], $8::timestamptz[], $9::timestamptz[])
+    """,
+    "site_appliances": """
+        INSERT INTO site_appliances (appliance_id, site_id, hostname, mac_address, status,
+                                     agent_public_key, legacy_uuid, agent_version,
+                                     first_checkin, last_checkin, created_at)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+                             $6::text[], $7::uuid[], $8::text[],
+                             $9::timestamptz[], $10::timestamptz[], $11::timestamptz[])
+    """,
+    "api_keys": """
+        INSERT INTO api_keys (site_id, appliance_id, key_hash, key_prefix, active,
+                              description, created_at)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::boolean[],
+                             $6::text[], $7::timestamptz[])
+    """,
+    "compliance_bundles": """
+        INSERT INTO compliance_bundles (site_id, bundle_id, bundle_hash, check_type, check_result,
+                                        checked_at, checks, summary, agent_signature, signed_data,
+                                        signature_valid, prev_bundle_id, prev_hash,
+                                        chain_position, chain_hash)
+        SELECT s, b, h, ct, cr, ca, ck::jsonb, sm::jsonb, sig, sd, sv, pb, ph, pos, ch
+          FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+                      $6::timestamptz[], $7::text[], $8::text[], $9::text[], $10::text[],
+                      $11::boolean[], $12::text[], $13::text[],
+                      $14::int[], $15::text[])
+            AS t(s, b, h, ct, cr, ca, ck, sm, sig, sd, sv, pb, ph, pos, ch)
+    """,
+    "incidents": """
+        INSERT INTO incidents (site_id, appliance_id, incident_type, severity, status,
+                               check_type, details, dedup_key, reported_at, created_at,
+                               resolved_at)
+        SELECT s, a, it, sev, st, ct, d::jsonb, dk, ra, ca, rs
+          FROM unnest($1::text[], $2::uuid[], $3::text[], $4::text[], $5::text[],
+                      $6::text[], $7::text[], $8::text[], $9::timestamptz[],
+                      $10::timestamptz[], $11::timestamptz[])
+            AS t(s, a, it, sev, st, ct, d, dk, ra, ca, rs)
+    """,
+    "appliance_heartbeats": """
+        INSERT INTO appliance_heartbeats (site_id, appliance_id, observed_at, status, agent_version)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::timestamptz[], $4::text[], $5::text[])
+    """,
+    "log_entries": """
+        INSERT INTO log_entries (site_id, hostname, unit, priority, timestamp, message)
+        SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::smallint[],
+                             $5::timestamptz[], $6::text[])
+    """,
+    "admin_orders": """
+        INSERT INTO admin_orders (order_id, appliance_id, site_id, order_type, parameters,
+                                  priority, status, created_at, expires_at)
+        SELECT o, a, s, ot, p::jsonb, pr, st, ca, ea
+          FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+                      $6::int[], $7::text[], $8::timestamptz[], $9::timestamptz[])
+            AS t(o, a, s, ot, p, pr, st, ca, ea)
+    """,
+}
+
+SEED_BATCH_ROWS = 20000
+
+
+def _columns(batch: Sequence[Tuple]) -> List[list]:
+    return [list(col) for col in zip(*batch)]
+
+
+async def seed(conn, fleet: Fleet, now: datetime) -> Dict[str, int]:
+    """Insert the fleet in one transaction; returns rows written per table.
+
+    Refuses a database that already holds any of the fleet's sites —
+    bundles cannot be deleted, so re-seeding means a fresh database (or a
+    different prefix).
+    """
+    existing = await conn.fetchval(
+        "SELECT count(*) FROM sites WHERE site_id = ANY($1::text[])",
+        list(fleet.site_ids),
+    )
+    if existing:
+        raise RuntimeError(
+            f"{existing} of the fleet's sites already exist; seed a fresh "
+            f"database or use another --prefix"
+        )
+    counts = {table: 0 for table in _INSERT_SQL}
+    pending: Dict[str, List[Tuple]] = {table: [] for table in _INSERT_SQL}
+
+    async def flush():
+        # Whole buffer in table order, so parents land before children.
+        for table, sql in _INSERT_SQL.items():
+            if pending[table]:
+                await conn.execute(sql, *_columns(pending[table]))
+                counts[table] += len(pending[table])
+                pending[table] = []
+
+    async with conn.transaction():
+        # Transaction-local admin context for the RLS-protected tables.
+        await conn.execute("SELECT set_config('app.is_admin', 'true', true)")
+        buffered = 0
+        for table, batch in iter_rows(fleet, now):
+            pending[table].extend(batch)
+            buffered += len(batch)
+            if buffered >= SEED_BATCH_ROWS:
+                await flush()
+                buffered = 0
+        await flush()
+    return counts
@@ -0,0 +1,148 @@
+"""
+Summaries and the regression check for the load benchmark.
+
+A report holds, per phase and operation: request counts, p50/p95/p99,
+throughput and DB round trips per request. check() compares it with the
+absolute budgets in thresholds.json and, given a baseline report from an
+earlier run, flags anything that got worse by more than the tolerance.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+THRESHOLDS_PATH = Path(__file__).with_name("thresholds.json")
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Linear-interpolation percentile. p in [0, 1]. Returns 0.0 on empty."""
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    if len(s) == 1:
+        return s[0]
+    rank = p * (len(s) - 1)
+    lo = int(rank)
+    hi = min(lo + 1, len(s) - 1)
+    frac = rank - lo
+    return s[lo] * (1 - frac) + s[hi] * frac
+
+
+@dataclass
+class OpResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    throttled: int = 0          # 429s: rate limiter, not the code under test
+    wall_seconds: float = 0.0
+    round_trips: Optional[float] = None
+    first_error: Optional[str] = None
+
+
+def summarize(result: OpResult) -> Dict[str, Any]:
+    ok = len(result.latencies_ms)
+    total = ok + result.errors + result.throttled
+    lat = result.latencies_ms
+    return {
+        "requests": total,
+        "ok": ok,
+        "errors": result.errors,
+        "throttled": result.throttled,
+        "error_rate": round(result.errors / total, 4) if total else 0.0,
+        "p50_ms": round(percentile(lat, 0.50), 2),
+        "p95_ms": round(percentile(lat, 0.95), 2),
+        "p99_ms": round(percentile(lat, 0.99), 2),
+        "mean_ms": round(sum(lat) / ok, 2) if ok else 0.0,
+        "max_ms": round(max(lat), 2) if lat else 0.0,
+        "throughput_rps": round(ok / result.wall_seconds, 2) if result.wall_seconds else 0.0,
+        "db_round_trips_per_op": (
+            round(result.round_trips / total, 2)
+            if result.round_trips is not None and total else None
+        ),
+        "first_error": result.first_error,
+    }
+
+
+def load_thresholds(path: Path = THRESHOLDS_PATH) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def check(
+    report: Dict[str, Any],
+    thresholds: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Budget and baseline violations, one line each; empty means pass."""
+    violations = []
+    defaults = thresholds.get("defaults", {})
+    tolerance = thresholds.get("baseline_tolerance", 0.2)
+    min_delta_ms = thresholds.get("baseline_min_delta_ms", 5.0)
+    min_delta_rt = thresholds.get("baseline_min_delta_round_trips", 0.5)
+
+    for phase, ops in report.get("phases", {}).items():
+        for op, s in ops.items():
+            where = f"{phase}/{op}"
+            if not s["requests"]:
+                continue
+            budget = {**defaults, **thresholds.get("operations", {}).get(op, {})}
+            for metric in ("p95_ms", "p99_ms"):
+                if metric in budget and s[metric] > budget[metric]:
+                    violations.append(
+                        f"{where}: {metric} {s[metric]:.1f} > budget {budget[metric]}"
+                    )
+            if s["error_rate"] > budget.get("max_error_rate", 0.0):
+                violations.append(
+                    f"{where}: error rate {s['error_rate']:.2%} "
+                    f"({s['errors']} errors; first: {s.get('first_error')})"
+                )
+            rts = s.get("db_round_trips_per_op")
+            if rts is not None and "max_db_round_trips_per_op" in budget \
+                    and rts > budget["max_db_round_trips_per_op"]:
+                violations.append(
+                    f"{where}: {rts:.1f} DB round trips/op > budget "
+                    f"{budget['max_db_round_trips_per_op']}"
+                )
+
+            base = (baseline or {}).get("phases", {}).get(phase, {}).get(op)
+            if not base or not base.get("ok"):
+                continue
+            for metric in ("p95_ms", "p99_ms"):
+                if s[metric] > base[metric] * (1 + tolerance) and s[metric] - base[metric] > min_delta_ms:
+                    violations.append(
+                        f"{where}: {metric} {s[metric]:.1f} vs baseline {base[metric]:.1f} "
+                        f"(+{s[metric] / base[metric] - 1:.0%})"
+                    )
+            base_rts = base.get("db_round_trips_per_op")
+            if rts is not None and base_rts is not None \
+                    and rts > base_rts * (1 + tolerance) and rts - base_rts > min_delta_rt:
+                violations.append(
+                    f"{where}: {rts:.1f} DB round trips/op vs baseline {base_rts:.1f}"
+                )
+            if s["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                violations.append(
+                    f"{where}: {s['throughput_rps']:.1f} req/s vs baseline "
+                    f"{base['throughput_rps']:.1f}"
+                )
+    return violations
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    lines = []
+    header = (
+        f"{'operation':<22}{'reqs':>6}{'err':>5}{'429':>5}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}{'db/op':>7}"
+    )
+    for phase, ops in report.get("phases", {}).items():
+        lines.append(f"[{phase}]")
+        lines.append(header)
+        for op, s in ops.items():
+            rts = s.get("db_round_trips_per_op")
+            lines.append(
+                f"{op:<22}{s['requests']:>6}{s['errors']:>5}{s['throttled']:>5}"
+                f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}"
+                f"{s['throughput_rps']:>8.1f}{'-' if rts is None else f'{rts:.1f}':>7}"
+            )
+        lines.append("")
+    return "\n".join(lines)
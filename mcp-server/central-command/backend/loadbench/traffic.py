@@ -0,0 +1,233 @@
+"""
+Traffic for the load benchmark, over real HTTP against a running API.
+
+Appliance operations send what the daemon sends each cycle, with the
+fleet's bearer keys and Ed25519 keys (evidence is signed, so the full
+verification path runs). Each appliance gets its own X-Forwarded-For
+address, as behind the production proxy, so RateLimitMiddleware buckets
+per appliance rather than throttling the whole benchmark; 429s are still
+counted separately from errors.
+
+Request i of an operation goes to appliance i mod N (site i mod N for
+dashboard reads), so a run's request mix depends only on the fleet spec.
+
+Phases:
+  isolated   one operation at a time — latency without contention, and
+             the only phase where DB round trips can be attributed to
+             a single operation
+  mixed      every operation at once: appliance writes and dashboard
+             reads contending for the pool and the evidence chain locks
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from .db import RoundTripCounter
+from .fleet import CHECK_TYPES, LOG_UNITS, SEVERITIES, Appliance, Fleet, evidence_bundle, random_checks
+from .stats import OpResult, summarize
+
+Send = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+APPLIANCE_OPS = ("checkin", "evidence_submit", "log_ingest", "incident_report", "order_ack")
+DASHBOARD_OPS = (
+    "dashboard_fleet", "dashboard_stats", "dashboard_incidents",
+    "sites_list", "site_detail", "evidence_bundles",
+)
+LOG_BATCH = 50
+
+
+class Traffic:
+    def __init__(self, fleet: Fleet, session_token: Optional[str] = None):
+        self.fleet = fleet
+        self.rng = random.Random(f"{fleet.spec.seed}:traffic")
+        self.cookies = {"session_token": session_token} if session_token else None
+        self._acks: Dict[str, int] = {}
+
+    def _appliance(self, i: int) -> Appliance:
+        return self.fleet.appliances[i % len(self.fleet.appliances)]
+
+    def _site(self, i: int) -> str:
+        return self.fleet.site_ids[i % len(self.fleet.site_ids)]
+
+    @staticmethod
+    def _headers(app: Appliance) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {app.api_key}", "X-Forwarded-For": app.ip_address}
+
+    # ----------------------------------------------------------------- appliance
+
+    async def checkin(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        app = self._appliance(i)
+        return await client.post("/api/appliances/checkin", headers=self._headers(app), json={
+            "site_id": app.site_id,
+            "hostname": app.hostname,
+            "mac_address": app.mac_address,
+            "ip_addresses": [app.ip_address],
+            "uptime_seconds": 86400 + i * 60,
+            "agent_version": "bench",
+            "agent_public_key": app.public_key,
+            "has_local_credentials": True,
+        })
+
+    async def evidence_submit(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        app = self._appliance(i)
+        bundle = evidence_bundle(
+            app, datetime.now(timezone.utc),
+            random_checks(self.rng, app.hostname, self.fleet.spec.checks_per_bundle),
+        )
+        return await client.post(
+            f"/api/evidence/sites/{app.site_id}/submit", headers=self._headers(app), json=bundle,
+        )
+
+    async def log_ingest(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        app = self._appliance(i)
+        ts = datetime.now(timezone.utc).isoformat()
+        batch = []
+        for _ in range(LOG_BATCH):
+            unit = self.rng.choice(LOG_UNITS)
+            batch.append({
+                "ts": ts, "unit": unit, "pri": self.rng.choice((6, 6, 6, 5, 4, 3)),
+                "msg": f"{unit.split('.')[0]}: cycle complete in {self.rng.randint(40, 900)}ms",
+            })
+        return await client.post("/api/logs/ingest", headers=self._headers(app), json={
+            "site_id": app.site_id, "hostname": app.hostname, "batch": batch,
+        })
+
+    async def incident_report(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        app = self._appliance(i)
+        check_type = self.rng.choice(CHECK_TYPES)
+        return await client.post("/incidents", headers=self._headers(app), json={
+            "site_id": app.site_id,
+            "host_id": app.hostname,
+            "incident_type": f"{check_type}_drift",
+            "severity": self.rng.choice(SEVERITIES),
+            "check_type": check_type,
+            "details": {"hostname": app.hostname, "check": check_type, "bench_seq": i},
+        })
+
+    async def order_ack(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        # Walks each appliance's seeded pending orders; past the end it
+        # re-acks (the already_acknowledged path) rather than failing.
+        app = self._appliance(i)
+        k = self._acks.get(app.appliance_id, 0)
+        self._acks[app.appliance_id] = k + 1
+        order_id = app.order_ids[k % len(app.order_ids)]
+        return await client.post(f"/api/orders/{order_id}/acknowledge", headers=self._headers(app))
+
+    # ----------------------------------------------------------------- dashboard
+
+    async def _read(self, client: httpx.AsyncClient, path: str) -> httpx.Response:
+        return await client.get(path, cookies=self.cookies)
+
+    async def dashboard_fleet(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, "/api/dashboard/fleet")
+
+    async def dashboard_stats(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, "/api/dashboard/stats")
+
+    async def dashboard_incidents(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, f"/api/dashboard/incidents?site_id={self._site(i)}")
+
+    async def sites_list(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, "/api/sites")
+
+    async def site_detail(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, f"/api/sites/{self._site(i)}")
+
+    async def evidence_bundles(self, client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await self._read(client, f"/api/evidence/sites/{self._site(i)}/bundles?limit=50")
+
+    def operations(self, names: Sequence[str]) -> Dict[str, Send]:
+        unknown = [n for n in names if n not in APPLIANCE_OPS + DASHBOARD_OPS]
+        if unknown:
+            raise ValueError(f"unknown operations: {', '.join(unknown)}")
+        return {name: getattr(self, name) for name in names}
+
+
+async def drive(
+    name: str, send: Send, client: httpx.AsyncClient, requests: int, concurrency: int,
+) -> OpResult:
+    """`requests` calls of `send` from `concurrency` workers."""
+    result = OpResult(name)
+    next_i = 0
+
+    async def worker():
+        nonlocal next_i
+        while next_i < requests:
+            i = next_i
+            next_i += 1
+            t0 = time.perf_counter()
+            try:
+                resp = await send(client, i)
+            except httpx.HTTPError as e:
+                result.errors += 1
+                result.first_error = result.first_error or f"{type(e).__name__}: {e}"
+                continue
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if resp.status_code == 429:
+                result.throttled += 1
+            elif resp.status_code >= 400:
+                result.errors += 1
+                result.first_error = result.first_error or f"{resp.status_code}: {resp.text[:200]}"
+            else:
+                result.latencies_ms.append(elapsed_ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+async def run_benchmark(
+    fleet: Fleet,
+    base_url: str,
+    conn,
+    ops: Sequence[str],
+    requests: int = 200,
+    concurrency: int = 16,
+    session_token: Optional[str] = None,
+    mixed: bool = True,
+) -> Dict[str, Any]:
+    """Run the isolated (and mixed) phases; returns the report."""
+    traffic = Traffic(fleet, session_token)
+    sends = traffic.operations(ops)
+    counter = RoundTripCounter()
+    await counter.detect(conn)
+    await counter.calibrate(conn)
+
+    phases: Dict[str, Dict[str, Any]] = {}
+    mixed_round_trips = None
+    limits = httpx.Limits(max_connections=concurrency * (len(sends) if mixed else 1))
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        phases["isolated"] = {}
+        for name, send in sends.items():
+            before = await counter.read(conn)
+            result = await drive(name, send, client, requests, concurrency)
+            result.round_trips = counter.delta(before, await counter.read(conn))
+            phases["isolated"][name] = summarize(result)
+
+        if mixed and len(sends) > 1:
+            before = await counter.read(conn)
+            results: List[OpResult] = await asyncio.gather(*(
+                drive(name, send, client, requests, concurrency)
+                for name, send in sends.items()
+            ))
+            mixed_round_trips = counter.delta(before, await counter.read(conn))
+            phases["mixed"] = {r.name: summarize(r) for r in results}
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "fleet": {**asdict(fleet.spec), "appliances": len(fleet.appliances)},
+        "requests_per_op": requests,
+        "concurrency": concurrency,
+        "db_counter": counter.source,
+        "db_idle_per_second": round(counter.idle_per_second, 2),
+        "mixed_db_round_trips": mixed_round_trips,
+        "phases": phases,
+    }
@@ -0,0 +1,185 @@
+"""
+Minimal-movement target assignment for mesh rebalancing (#M3).
+
+mesh_targets._consistent_hash used to pick `sorted(live)[sha256(target)
+% len(live)]`. That is modulo hashing, not consistent hashing: when one
+appliance joined or left, the modulus changed and roughly (n-1)/n of a
+site's expiring targets changed owner, even though their owners were
+still alive.
+
+This module assigns with weighted rendezvous hashing (highest random
+weight) under a bounded load:
+
+  - A target whose current owner is still live stays put. Only targets
+    whose owner departed (or that have none) are placed, so a rebalance
+    moves exactly the departed appliances' targets and nothing else.
+  - Each orphan ranks the live appliances by
+    score = -weight / ln(u), where u = hash(appliance, target) in (0, 1).
+    This is the standard weighted-HRW construction: an appliance with
+    weight w wins a share of targets proportional to w, and adding or
+    removing an appliance only re-ranks the targets it wins or loses.
+  - Capacity is derived from load. Appliance i may hold at most
+    ceil(total * w_i / sum(w) * (1 + slack)) targets, counting the ones
+    it already owns. An orphan goes to its highest-ranked appliance that
+    still has room, so the departed appliance's load spreads out instead
+    of all landing on its HRW neighbour.
+
+A joining appliance takes no existing targets; it fills up as orphans
+and newly assigned targets arrive, because its load is the lowest.
+
+Weights are capacity: capacity_weights() turns each appliance's
+reported CPU count (daemon_health.num_cpu, sent every checkin) into a
+weight, so a 4-core box is offered about twice the targets of a 2-core
+one. Current load enters through `loads`, which the capacity ceiling
+already counts.
+
+Pure functions, no DB — mesh_targets.rebalance_expired_assignments
+feeds them, and scripts/bench_mesh_assignment.py benchmarks them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import struct
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Headroom above the weighted fair share before an appliance counts as
+# full. 0.25 keeps max/mean load under ~1.25 while still letting most
+# orphans land on their first-choice appliance.
+MESH_LOAD_SLACK = 0.25
+
+# Upper bound on a capacity weight, so one oversized appliance can't
+# claim most of a site's targets.
+MESH_WEIGHT_MAX = 8.0
+
+_U64 = float(2 ** 64)
+
+
+def _unit_hash(appliance_id: str, target_key: str) -> float:
+    """Deterministic uniform value in (0, 1) for an (appliance, target) pair."""
+    digest = hashlib.sha256(f"{appliance_id}\x00{target_key}".encode()).digest()
+    (n,) = struct.unpack(">Q", digest[:8])
+    return (n + 0.5) / _U64
+
+
+def hrw_score(appliance_id: str, target_key: str, weight: float = 1.0) -> float:
+    """Weighted rendezvous score. Higher wins."""
+    return -weight / math.log(_unit_hash(appliance_id, target_key))
+
+
+def rank_appliances(
+    target_key: str, weights: Mapping[str, float],
+) -> List[str]:
+    """Live appliances in preference order for `target_key`."""
+    return sorted(
+        weights,
+        key=lambda a: (hrw_score(a, target_key, weights[a]), a),
+        reverse=True,
+    )
+
+
+def hrw_owner(target_key: str, weights: Mapping[str, float]) -> Optional[str]:
+    """Unbounded rendezvous owner (ignores load). None if no appliances."""
+    if not weights:
+        return None
+    return max(weights, key=lambda a: (hrw_score(a, target_key, weights[a]), a))
+
+
+def capacity_weights(num_cpus: Mapping[str, Any]) -> Dict[str, float]:
+    """Capacity weight per appliance from its reported CPU count.
+
+    Clamped to [1, MESH_WEIGHT_MAX]. Appliances that don't report a
+    usable count (older daemons, provisioning rows) get the mean of the
+    ones that do, or 1.0 when none do, so a missing value neither
+    starves nor favours them.
+    """
+    reported: Dict[str, float] = {}
+    for appliance_id, raw in num_cpus.items():
+        try:
+            cpus = float(raw)
+        except (TypeError, ValueError):
+            continue
+        if cpus > 0:
+            reported[appliance_id] = min(max(cpus, 1.0), MESH_WEIGHT_MAX)
+    fallback = sum(reported.values()) / len(reported) if reported else 1.0
+    return {a: reported.get(a, fallback) for a in num_cpus}
+
+
+def capacities(
+    loads: Mapping[str, int],
+    incoming: int,
+    weights: Optional[Mapping[str, float]] = None,
+    slack: float = MESH_LOAD_SLACK,
+) -> Dict[str, int]:
+    """Per-appliance ceiling once `incoming` more targets are placed."""
+    weights = weights or {a: 1.0 for a in loads}
+    total_weight = sum(weights[a] for a in loads) or 1.0
+    total = sum(loads.values()) + incoming
+    return {
+        a: max(1, math.ceil(total * weights[a] / total_weight * (1 + slack)))
+        for a in loads
+    }
+
+
+def assign_targets(
+    current_owners: Mapping[str, Optional[str]],
+    loads: Mapping[str, int],
+    weights: Optional[Mapping[str, float]] = None,
+    slack: float = MESH_LOAD_SLACK,
+) -> Dict[str, Optional[str]]:
+    """Decide owners for a batch of targets.
+
+    Args:
+        current_owners: {target_key: current owner or None} for the
+            targets being (re)placed
+        loads: {live appliance_id: targets it already holds OUTSIDE
+            this batch}. The keys define the live set.
+        weights: optional capacity weights per live appliance (default 1)
+        slack: headroom over the weighted fair share
+
+    Returns:
+        {target_key: new owner}. Targets with a live owner keep it;
+        everything is None when no appliance is live.
+    """
+    if not loads:
+        return {t: None for t in current_owners}
+    weights = {a: float((weights or {}).get(a, 1.0)) for a in loads}
+
+    result: Dict[str, Optional[str]] = {}
+    held = dict(loads)
+    orphans: List[str] = []
+    for target_key, owner in current_owners.items():
+        if owner in held:
+            result[target_key] = owner
+            held[owner] += 1
+        else:
+            orphans.append(target_key)
+
+    caps = capacities(held, len(orphans), weights, slack)
+    # Sorted so the outcome doesn't depend on input order.
+    for target_key in sorted(orphans):
+        ranked = rank_appliances(target_key, weights)
+        choice = next((a for a in ranked if held[a] < caps[a]), ranked[0])
+        result[target_key] = choice
+        held[choice] += 1
+    return result
+
+
+def move_count(
+    before: Mapping[str, Optional[str]], after: Mapping[str, Optional[str]],
+) -> int:
+    """Targets whose owner changed between two assignments."""
+    return sum(1 for t, owner in after.items() if before.get(t) != owner)
+
+
+def load_spread(assignment: Mapping[str, Optional[str]], nodes: Iterable[str]) -> float:
+    """max/mean targets per node (1.0 = perfectly even)."""
+    counts = {n: 0 for n in nodes}
+    for owner in assignment.values():
+        if owner in counts:
+            counts[owner] += 1
+    if not counts or not sum(counts.values()):
+        return 1.0
+    mean = sum(counts.values()) / len(counts)
+    return max(counts.values()) / mean
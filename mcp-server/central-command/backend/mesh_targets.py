@@ -11,13 +11,12 @@ This module makes assignments first-class rows in mesh_target_assignments
 (Migration 195) with TTL + appliance ACK. Appliances re-ACK every checkin.
 Unacked assignments expire and get reassigned on the next rebalance pass.
 
-The reassignment loop uses the same hash ring logic as hash_ring.py but
-only considers appliances that are currently ACKing targets (i.e., alive
-per our newest signal).
+The reassignment loop only considers appliances with a fresh heartbeat
+(alive per our newest signal) and places targets with the minimal-
+movement rendezvous assignment in mesh_assignment.py.
 """
 
 from __future__ import annotations
-import hashlib
 import logging
 import uuid
 from datetime import datetime, timezone
@@ -27,6 +26,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
 from .fleet import get_pool
+from .mesh_assignment import assign_targets, capacity_weights
 from .tenant_middleware import admin_connection, admin_transaction
 from .shared import require_appliance_bearer
 
@@ -158,41 +158,43 @@ async def get_my_assignments(
 # Server-side rebalancing: reassign expired targets to live appliances
 # =============================================================================
 
-def _consistent_hash(target_key: str, appliance_ids: List[str]) -> str:
-    """Stable assignment: hash(target) % len(appliances). Same semantics
-    as hash_ring.py but scoped to the live set."""
-    h = hashlib.sha256(target_key.encode()).hexdigest()
-    idx = int(h[:16], 16) % len(appliance_ids)
-    return sorted(appliance_ids)[idx]
-
-
 async def rebalance_expired_assignments(site_id: str) -> Dict[str, int]:
     """Find expired assignments at a site and reassign them to a live
     appliance. "Live" means the appliance has a fresh heartbeat in the
     last 5 minutes — orthogonal to last_checkin (Session 206 invariant).
 
+    Placement is mesh_assignment.assign_targets: an expired assignment
+    whose owner is still live is renewed in place; only targets of
+    departed appliances move, by weighted rendezvous under a load cap
+    computed from what each live appliance already holds. Weights are
+    each appliance's capacity (reported CPU count, capacity_weights).
+    All renewals and moves go out as ONE set-based UPDATE.
+
     Returns counts {expired, reassigned, orphaned}.
     """
     pool = await get_pool()
     stats = {"expired": 0, "reassigned": 0, "orphaned": 0}
     # admin_transaction (wave-16): rebalance_expired_assignments issues
-    # 4 admin statements (live lookup, expired select, UPDATE reassign,
-    # UPDATE orphan). Pin SET LOCAL to one backend.
+    # 4 admin statements (live lookup, expired select, load count, set
+    # UPDATE). Pin SET LOCAL to one backend.
     async with admin_transaction(pool) as conn:
-        # Live appliances = those with heartbeats in the last 5 min.
+        # Live appliances = those with heartbeats in the last 5 min
+        # (appliance_last_seen, mig 333 — one row per appliance instead
+        # of every raw heartbeat in the window).
         live_rows = await conn.fetch(
             """
-            SELECT DISTINCT sa.appliance_id
+            SELECT sa.appliance_id, sa.daemon_health->>'num_cpu' AS num_cpu
             FROM site_appliances sa
-            JOIN appliance_heartbeats hb
-              ON hb.appliance_id = sa.appliance_id
-             AND hb.observed_at > NOW() - INTERVAL '5 minutes'
+            JOIN appliance_last_seen ls
+              ON ls.appliance_id = sa.appliance_id
+             AND ls.last_heartbeat_at > NOW() - INTERVAL '5 minutes'
             WHERE sa.site_id = $1
               AND sa.deleted_at IS NULL
             """,
             site_id,
         )
         live_ids = [r["appliance_id"] for r in live_rows]
+        weights = capacity_weights({r["appliance_id"]: r["num_cpu"] for r in live_rows})
 
         # Expired assignments at this site
         expired = await conn.fetch(
@@ -206,42 +208,65 @@ async def rebalance_expired_assignments(site_id: str) -> Dict[str, int]:
         )
         stats["expired"] = len(expired)
 
+        if not expired:
+            return stats
         if not live_ids:
             # No live appliance — everything orphaned. DON'T delete; audit
             # trail matters. Mark them for investigation.
             stats["orphaned"] = len(expired)
             return stats
 
-        for row in expired:
-            new_owner = _consistent_hash(row["target_key"], live_ids)
-            if new_owner == row["appliance_id"]:
-                # Same appliance won the hash — renew the assignment.
-                await conn.execute(
-                    """
-                    UPDATE mesh_target_assignments
-                    SET assigned_at = NOW(),
-                        last_ack_at = NULL,
-                        ack_count = 0
-                    WHERE assignment_id = $1
-                    """,
-                    row["assignment_id"],
-                )
-            else:
-                await conn.execute(
-                    """
-                    UPDATE mesh_target_assignments
-                    SET appliance_id = $1,
-                        reassigned_from = $2,
-                        reassigned_at = NOW(),
-                        assigned_at = NOW(),
-                        last_ack_at = NULL,
-                        ack_count = 0
-                    WHERE assignment_id = $3
-                    """,
-                    new_owner,
-                    row["appliance_id"],
-                    row["assignment_id"],
-                )
-                stats["reassigned"] += 1
+        # Current load = unexpired assignments each live appliance holds.
+        load_rows = await conn.fetch(
+            """
+            SELECT appliance_id, COUNT(*)::int AS n
+            FROM mesh_target_assignments
+            WHERE site_id = $1
+              AND expires_at >= NOW()
+              AND appliance_id = ANY($2::text[])
+            GROUP BY appliance_id
+            """,
+            site_id,
+            live_ids,
+        )
+        loads = {a: 0 for a in live_ids}
+        loads.update({r["appliance_id"]: r["n"] for r in load_rows})
+
+        # (target_key, target_type) is the identity; the same key can
+        # exist under two types, so hash on both.
+        by_key = {
+            f"{r['target_type']}:{r['target_key']}": r for r in expired
+        }
+        owners = assign_targets(
+            {k: r["appliance_id"] for k, r in by_key.items()}, loads, weights,
+        )
+
+        assignment_ids = [by_key[k]["assignment_id"] for k in by_key]
+        new_owners = [owners[k] for k in by_key]
+        stats["reassigned"] = sum(
+            1 for k in by_key if owners[k] != by_key[k]["appliance_id"]
+        )
+
+        # One statement for renewals and moves. SET expressions see the
+        # pre-update row, so m.appliance_id is the previous owner.
+        await conn.execute(
+            """
+            UPDATE mesh_target_assignments m
+            SET appliance_id = u.new_owner,
+                reassigned_from = CASE WHEN u.new_owner <> m.appliance_id
+                                       THEN m.appliance_id
+                                       ELSE m.reassigned_from END,
+                reassigned_at = CASE WHEN u.new_owner <> m.appliance_id
+                                     THEN NOW()
+                                     ELSE m.reassigned_at END,
+                assigned_at = NOW(),
+                last_ack_at = NULL,
+                ack_count = 0
+            FROM unnest($1::uuid[], $2::text[]) AS u(assignment_id, new_owner)
+            WHERE m.assignment_id = u.assignment_id
+            """,
+            assignment_ids,
+            new_owners,
+        )
 
     return stats
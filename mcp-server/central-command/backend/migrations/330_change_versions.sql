@@ -0,0 +1,148 @@
+-- Migration 330: change_versions — per-(table, scope) write counters
+--
+-- Backs conditional_get.py. Polling endpoints (partner /me/sites,
+-- client /dashboard, appliance /agent/sync) used to run their full
+-- query + serialization on every poll and only then let
+-- ETagMiddleware hash the body and throw it away on a match. With
+-- these counters a route derives its ETag from a handful of integer
+-- rows BEFORE doing any of that work and short-circuits to 304.
+--
+-- Shape: one row per (logical table, scope key). scope_key is the
+-- site_id for site-scoped tables, the client_org id for org-scoped
+-- tables and '*' for fleet-global tables (l1_rules, app_profile_rules).
+-- bump_change_version() is a generic AFTER ROW trigger parameterized
+-- by TG_ARGV: (table_name, scope_column) — scope_column '*' means
+-- global. An UPDATE that moves a row between scopes (site re-parented
+-- to another org) bumps BOTH the old and the new scope.
+--
+-- Cost: one upsert of a tiny hot row per write to a watched table.
+-- Tables written on every checkin list the columns their readers render
+-- in update_columns, and UPDATEs bump only when one of those actually
+-- changes:
+--   site_appliances          last_checkin / ip_addresses per checkin
+--   sites                    wg_connected_at / wg_ip (sites.py STEP 3.6b)
+--   site_go_agent_summaries  recomputed by the mig 019 trigger on the
+--                            STEP 3.7 go_agents upsert
+-- so a steady-state checkin leaves the ETags of the views below alone
+-- (the trigger functions still run; their WHEN clauses skip the bump).
+-- Per-checkin fields the views do render (MAX(last_checkin),
+-- agent_last_event) are covered by the view's max_age_seconds in
+-- conditional_get.py instead.
+--
+-- No RLS: rows carry counters and scope keys only — no tenant data.
+-- Readers always constrain scope_key to the caller's own site/org set
+-- (resolved under the caller's RLS context) before hashing.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS change_versions (
+    table_name  TEXT        NOT NULL,
+    scope_key   TEXT        NOT NULL,
+    version     BIGINT      NOT NULL DEFAULT 1,
+    changed_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_name, scope_key)
+);
+
+COMMENT ON TABLE change_versions IS
+    'Per-(table, scope) write counters for conditional GET ETags. '
+    'Bumped by bump_change_version() triggers; read by conditional_get.py.';
+
+CREATE OR REPLACE FUNCTION bump_change_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_table  TEXT := TG_ARGV[0];
+    v_column TEXT := TG_ARGV[1];
+    v_old    TEXT;
+    v_new    TEXT;
+BEGIN
+    IF v_column = '*' THEN
+        v_new := '*';
+    ELSE
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            v_new := to_jsonb(NEW) ->> v_column;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            v_old := to_jsonb(OLD) ->> v_column;
+        END IF;
+    END IF;
+
+    IF v_new IS NOT NULL THEN
+        INSERT INTO change_versions (table_name, scope_key)
+        VALUES (v_table, v_new)
+        ON CONFLICT (table_name, scope_key) DO UPDATE
+            SET version = change_versions.version + 1,
+                changed_at = NOW();
+    END IF;
+
+    IF v_old IS NOT NULL AND v_old IS DISTINCT FROM v_new THEN
+        INSERT INTO change_versions (table_name, scope_key)
+        VALUES (v_table, v_old)
+        ON CONFLICT (table_name, scope_key) DO UPDATE
+            SET version = change_versions.version + 1,
+                changed_at = NOW();
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- (trigger_name, table, scope column). Keep in lockstep with the
+-- dependency declarations in conditional_get.py. A table with
+-- update_columns gets two triggers: INSERT/DELETE, and <name>_upd on
+-- UPDATE OF those columns WHEN one IS DISTINCT FROM its old value (a
+-- WHEN on OLD is not allowed on INSERT triggers). The scope column is
+-- always among them so re-parenting still bumps both scopes.
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('trg_change_version_sites',                   'sites',                   'site_id',       ARRAY['site_id', 'partner_id', 'client_org_id', 'clinic_name', 'status', 'tier', 'onboarding_stage', 'healing_tier', 'created_at']),
+            ('trg_change_version_site_appliances',         'site_appliances',         'site_id',       ARRAY['site_id', 'deleted_at']),
+            ('trg_change_version_site_go_agent_summaries', 'site_go_agent_summaries', 'site_id',       ARRAY['site_id', 'total_agents', 'active_agents', 'overall_compliance_rate']),
+            ('trg_change_version_compliance_bundles',      'compliance_bundles',      'site_id',       NULL),
+            ('trg_change_version_client_orgs',             'client_orgs',             'id',            NULL),
+            ('trg_change_version_client_notifications',    'client_notifications',    'client_org_id', NULL),
+            ('trg_change_version_l1_rules',                'l1_rules',                '*',             NULL),
+            ('trg_change_version_app_profile_rules',       'app_profile_rules',       '*',             NULL)
+        ) AS v(trigger_name, table_name, scope_column, update_columns)
+    LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = t.trigger_name
+              AND tgrelid = t.table_name::regclass
+        ) THEN
+            IF t.update_columns IS NULL THEN
+                EXECUTE format(
+                    'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I '
+                    'FOR EACH ROW EXECUTE FUNCTION bump_change_version(%L, %L)',
+                    t.trigger_name, t.table_name, t.table_name, t.scope_column
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TRIGGER %I AFTER INSERT OR DELETE ON %I '
+                    'FOR EACH ROW EXECUTE FUNCTION bump_change_version(%L, %L)',
+                    t.trigger_name, t.table_name, t.table_name, t.scope_column
+                );
+                EXECUTE format(
+                    'CREATE TRIGGER %I AFTER UPDATE OF %s ON %I '
+                    'FOR EACH ROW WHEN (%s) '
+                    'EXECUTE FUNCTION bump_change_version(%L, %L)',
+                    t.trigger_name || '_upd',
+                    (SELECT string_agg(quote_ident(c), ', ') FROM unnest(t.update_columns) AS c),
+                    t.table_name,
+                    (SELECT string_agg(format('OLD.%1$I IS DISTINCT FROM NEW.%1$I', c), ' OR ')
+                       FROM unnest(t.update_columns) AS c),
+                    t.table_name, t.scope_column
+                );
+            END IF;
+        END IF;
+    END LOOP;
+END $$;
+
+COMMIT;
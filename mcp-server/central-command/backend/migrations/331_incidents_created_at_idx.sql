@@ -0,0 +1,15 @@
+-- Migration 331: Index on incidents (created_at) for the incremental
+-- cross-incident correlator (incident_correlator.py).
+--
+-- NOTE: CONCURRENTLY cannot run inside a transaction; this file deliberately
+-- omits BEGIN/COMMIT and COMMENT (single-statement pattern, see mig 309).
+--
+-- cross_incident_correlation_loop now reads only incidents created or
+-- resolved since its watermark every 2 minutes:
+--   WHERE (created_at > $1 AND created_at <= $2)
+--      OR (resolved_at > $1 AND resolved_at <= $2 AND status = 'resolved')
+-- Existing incidents indexes all lead with site_id/appliance_id, so each
+-- tick would otherwise seq-scan the table. This index serves the first
+-- OR arm; mig 332 serves the second (BitmapOr).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_incidents_created_at
+    ON incidents (created_at);
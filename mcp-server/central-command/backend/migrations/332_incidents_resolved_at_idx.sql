@@ -0,0 +1,8 @@
+-- Migration 332: Partial index on incidents (resolved_at) WHERE
+-- status = 'resolved' — second arm of the incident_correlator watermark
+-- scan (see mig 331).
+--
+-- NOTE: CONCURRENTLY cannot run inside a transaction; this file deliberately
+-- omits BEGIN/COMMIT and COMMENT (single-statement pattern, see mig 309).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_incidents_resolved_at_resolved
+    ON incidents (resolved_at) WHERE status = 'resolved';
@@ -0,0 +1,184 @@
+-- Migration 333: incremental heartbeat rollups.
+--
+-- appliance_status_rollup (mig 193) recomputed MAX(observed_at) and 24h
+-- checkin counts per appliance with a LATERAL over raw
+-- appliance_heartbeats on every 60s REFRESH, and the liveness readers
+-- (phantom_detector_loop, mesh_targets.rebalance_expired_assignments)
+-- ran their own MAX/EXISTS over raw rows — phantom_detector with no time
+-- bound at all, so every partition. Cost grew with total fleet history.
+--
+-- This migration adds three derived tables. Raw heartbeats stay the
+-- append-only source of truth. The derived tables are maintained
+-- incrementally:
+--
+--   appliance_last_seen     one row per appliance, upserted by an AFTER
+--                           INSERT trigger on appliance_heartbeats — so
+--                           at checkin, inside the checkin's heartbeat
+--                           savepoint. Still orthogonal to
+--                           site_appliances.last_checkin: it only moves
+--                           when a heartbeat row actually lands.
+--   appliance_heartbeat_1m  per-minute checkin/online counts
+--   appliance_heartbeat_1h  per-hour checkin/online counts
+--                           Both are advanced by heartbeat_rollup_loop
+--                           from a watermark in heartbeat_rollup_state.
+--                           Each tick scans only the raw rows newer than
+--                           the watermark, so only the newest partition.
+--
+-- The MV is rebuilt on top of them: its refresh reads one summary row
+-- plus ~25 hourly/minute buckets per appliance instead of a day of raw
+-- heartbeats.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS appliance_last_seen (
+    appliance_id        TEXT PRIMARY KEY,
+    site_id             TEXT NOT NULL,
+    last_heartbeat_at   TIMESTAMPTZ NOT NULL,
+    agent_version       TEXT,
+    heartbeat_count     BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_appliance_last_seen_site
+    ON appliance_last_seen (site_id, last_heartbeat_at DESC);
+
+COMMENT ON TABLE appliance_last_seen IS
+    'Per-appliance latest heartbeat (mig 333). Upserted by trigger on '
+    'every appliance_heartbeats INSERT; liveness readers use this '
+    'instead of MAX(observed_at) over raw partitions.';
+
+CREATE OR REPLACE FUNCTION appliance_last_seen_upsert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO appliance_last_seen
+        (appliance_id, site_id, last_heartbeat_at, agent_version, heartbeat_count)
+    VALUES (NEW.appliance_id, NEW.site_id, NEW.observed_at, NEW.agent_version, 1)
+    ON CONFLICT (appliance_id) DO UPDATE SET
+        site_id = EXCLUDED.site_id,
+        last_heartbeat_at = GREATEST(appliance_last_seen.last_heartbeat_at,
+                                     EXCLUDED.last_heartbeat_at),
+        agent_version = COALESCE(EXCLUDED.agent_version, appliance_last_seen.agent_version),
+        heartbeat_count = appliance_last_seen.heartbeat_count + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_appliance_last_seen ON appliance_heartbeats;
+CREATE TRIGGER trg_appliance_last_seen
+    AFTER INSERT ON appliance_heartbeats
+    FOR EACH ROW EXECUTE FUNCTION appliance_last_seen_upsert();
+
+CREATE TABLE IF NOT EXISTS appliance_heartbeat_1m (
+    appliance_id        TEXT NOT NULL,
+    bucket              TIMESTAMPTZ NOT NULL,
+    site_id             TEXT NOT NULL,
+    checkin_count       INTEGER NOT NULL,
+    online_count        INTEGER NOT NULL,
+    last_observed_at    TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (appliance_id, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_appliance_heartbeat_1m_bucket
+    ON appliance_heartbeat_1m (bucket);
+
+CREATE TABLE IF NOT EXISTS appliance_heartbeat_1h (
+    appliance_id        TEXT NOT NULL,
+    bucket              TIMESTAMPTZ NOT NULL,
+    site_id             TEXT NOT NULL,
+    checkin_count       INTEGER NOT NULL,
+    online_count        INTEGER NOT NULL,
+    last_observed_at    TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (appliance_id, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_appliance_heartbeat_1h_bucket
+    ON appliance_heartbeat_1h (bucket);
+
+COMMENT ON TABLE appliance_heartbeat_1m IS
+    'Per-minute heartbeat counts (mig 333), kept 48h. Maintained by '
+    'heartbeat_rollup_loop from heartbeat_rollup_state.watermark.';
+COMMENT ON TABLE appliance_heartbeat_1h IS
+    'Per-hour heartbeat counts (mig 333), kept 400 days for uptime/SLA '
+    'reporting after raw partitions are archived.';
+
+CREATE TABLE IF NOT EXISTS heartbeat_rollup_state (
+    name        TEXT PRIMARY KEY,
+    watermark   TIMESTAMPTZ NOT NULL
+);
+
+-- Seed: last_seen from the newest hot data, rollups from 2 days back.
+-- heartbeat_rollup_loop catches up in bounded steps from there.
+INSERT INTO appliance_last_seen (appliance_id, site_id, last_heartbeat_at, agent_version, heartbeat_count)
+SELECT DISTINCT ON (appliance_id)
+       appliance_id, site_id, observed_at, agent_version, 0
+  FROM appliance_heartbeats
+ WHERE observed_at > NOW() - INTERVAL '30 days'
+ ORDER BY appliance_id, observed_at DESC
+ON CONFLICT (appliance_id) DO NOTHING;
+
+INSERT INTO heartbeat_rollup_state (name, watermark)
+VALUES ('appliance_heartbeats', NOW() - INTERVAL '2 days')
+ON CONFLICT (name) DO NOTHING;
+
+-- Rollup MV rebuilt on the summary tables. Same columns as mig 193.
+DROP MATERIALIZED VIEW IF EXISTS appliance_status_rollup CASCADE;
+
+CREATE MATERIALIZED VIEW appliance_status_rollup AS
+SELECT
+    sa.appliance_id,
+    sa.site_id,
+    sa.hostname,
+    sa.display_name,
+    sa.mac_address,
+    sa.ip_addresses,
+    sa.agent_version,
+    -- Live status from heartbeats (Session 206 H5), via the summary.
+    CASE
+        WHEN ls.last_heartbeat_at IS NULL THEN 'offline'
+        WHEN ls.last_heartbeat_at > NOW() - INTERVAL '90 seconds' THEN 'online'
+        WHEN ls.last_heartbeat_at > NOW() - INTERVAL '5 minutes' THEN 'stale'
+        ELSE 'offline'
+    END AS live_status,
+    sa.last_checkin AS cached_last_checkin,
+    ls.last_heartbeat_at,
+    EXTRACT(EPOCH FROM (NOW() - COALESCE(ls.last_heartbeat_at, sa.last_checkin)))::int AS stale_seconds,
+    EXTRACT(EPOCH FROM (sa.last_checkin - COALESCE(ls.last_heartbeat_at, sa.last_checkin)))::int AS liveness_drift_seconds,
+    COALESCE(hb.checkin_count_24h, 0) AS checkin_count_24h,
+    COALESCE(hb.online_count_24h, 0) AS online_count_24h,
+    COALESCE(hb.online_count_24h::float / NULLIF(hb.checkin_count_24h, 0), 1.0)
+        AS uptime_ratio_24h
+FROM site_appliances sa
+LEFT JOIN appliance_last_seen ls ON ls.appliance_id = sa.appliance_id
+LEFT JOIN LATERAL (
+    -- 24h window = whole hours from the 1h table + the partial leading
+    -- hour from the 1m table.
+    SELECT SUM(c) AS checkin_count_24h, SUM(o) AS online_count_24h
+    FROM (
+        SELECT checkin_count AS c, online_count AS o
+          FROM appliance_heartbeat_1h
+         WHERE appliance_id = sa.appliance_id
+           AND bucket >= date_trunc('hour', NOW() - INTERVAL '24 hours') + INTERVAL '1 hour'
+        UNION ALL
+        SELECT checkin_count, online_count
+          FROM appliance_heartbeat_1m
+         WHERE appliance_id = sa.appliance_id
+           AND bucket >= NOW() - INTERVAL '24 hours'
+           AND bucket < date_trunc('hour', NOW() - INTERVAL '24 hours') + INTERVAL '1 hour'
+    ) b
+) hb ON true
+WHERE sa.deleted_at IS NULL;
+
+CREATE UNIQUE INDEX idx_status_rollup_appliance
+    ON appliance_status_rollup(appliance_id);
+CREATE INDEX idx_status_rollup_site
+    ON appliance_status_rollup(site_id);
+CREATE INDEX idx_status_rollup_status
+    ON appliance_status_rollup(live_status, stale_seconds DESC);
+
+COMMENT ON MATERIALIZED VIEW appliance_status_rollup IS
+    'Fleet rollup (Session 206 H5, mig 333): live_status from '
+    'appliance_last_seen, 24h counts from the 1h/1m heartbeat rollups.';
+
+-- Mig 203: the rollup loop REFRESHes as mcp_app, which requires OWNER.
+ALTER MATERIALIZED VIEW appliance_status_rollup OWNER TO mcp_app;
+
+COMMIT;
@@ -0,0 +1,127 @@
+-- Migration 334: precomputed per-appliance health snapshot.
+--
+-- fleet.get_fleet_overview looped sites → appliances and, per appliance,
+-- opened an admin_transaction for three queries (30-day incident stats,
+-- 30-day order stats, latest drift_data), plus two per-site incident
+-- queries. ~2,000 round trips per dashboard load at 250 sites × 2
+-- appliances.
+--
+-- appliance_health_snapshot holds the per-appliance inputs to
+-- calculate_overall_health that are expensive to derive:
+--
+--   total/resolved incidents (30d), total/executed orders (30d),
+--   incidents in the last 24h, latest incident time + drift_data
+--
+-- last_checkin is NOT snapshotted — checkin freshness is read live from
+-- site_appliances at dashboard time, so checkins never dirty a row.
+--
+-- Maintenance is incremental:
+--   - AFTER triggers on incidents / orders bump change_seq for the
+--     affected appliance; a new or restored site_appliances row gets a
+--     dirty snapshot row.
+--   - fleet.health_snapshot_loop recomputes, set-based, only rows where
+--     change_seq > refreshed_seq (plus rows older than the staleness
+--     bound, so the 24h/30d windows keep sliding). The loop writes back
+--     the change_seq it read, so a trigger firing mid-refresh leaves the
+--     row dirty for the next tick instead of being lost.
+--
+-- Keyed by the legacy appliance UUID as text: incidents.appliance_id is
+-- that UUID, orders.appliance_id is VARCHAR — text lets both triggers
+-- address the row without a cast that could fail on an order insert.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS appliance_health_snapshot (
+    appliance_id            TEXT PRIMARY KEY,   -- site_appliances.legacy_uuid::text
+    site_id                 TEXT,
+    total_incidents_30d     INTEGER NOT NULL DEFAULT 0,
+    resolved_incidents_30d  INTEGER NOT NULL DEFAULT 0,
+    total_orders_30d        INTEGER NOT NULL DEFAULT 0,
+    executed_orders_30d     INTEGER NOT NULL DEFAULT 0,
+    incidents_24h           INTEGER NOT NULL DEFAULT 0,
+    last_incident_at        TIMESTAMPTZ,
+    latest_drift_data       JSONB,
+    change_seq              BIGINT NOT NULL DEFAULT 1,
+    refreshed_seq           BIGINT NOT NULL DEFAULT 0,
+    refreshed_at            TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_appliance_health_snapshot_dirty
+    ON appliance_health_snapshot (appliance_id)
+    WHERE change_seq > refreshed_seq;
+
+CREATE INDEX IF NOT EXISTS idx_appliance_health_snapshot_refreshed
+    ON appliance_health_snapshot (refreshed_at);
+
+COMMENT ON TABLE appliance_health_snapshot IS
+    'Per-appliance health inputs for the fleet dashboard (mig 334). '
+    'Dirtied by triggers on incidents/orders/site_appliances, recomputed '
+    'set-based by fleet.health_snapshot_loop. last_checkin is read live.';
+
+CREATE OR REPLACE FUNCTION appliance_health_snapshot_touch(p_appliance_id TEXT, p_site_id TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_appliance_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO appliance_health_snapshot (appliance_id, site_id)
+    VALUES (p_appliance_id, p_site_id)
+    ON CONFLICT (appliance_id) DO UPDATE SET
+        change_seq = appliance_health_snapshot.change_seq + 1,
+        site_id = COALESCE(EXCLUDED.site_id, appliance_health_snapshot.site_id);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION appliance_health_snapshot_incident_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM appliance_health_snapshot_touch(NEW.appliance_id::text, NEW.site_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION appliance_health_snapshot_order_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM appliance_health_snapshot_touch(NEW.appliance_id, NEW.site_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION appliance_health_snapshot_appliance_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.deleted_at IS NULL AND NEW.legacy_uuid IS NOT NULL THEN
+        PERFORM appliance_health_snapshot_touch(NEW.legacy_uuid::text, NEW.site_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_appliance_health_snapshot_incident ON incidents;
+CREATE TRIGGER trg_appliance_health_snapshot_incident
+    AFTER INSERT OR UPDATE OF resolved_at, drift_data, appliance_id ON incidents
+    FOR EACH ROW EXECUTE FUNCTION appliance_health_snapshot_incident_trg();
+
+DROP TRIGGER IF EXISTS trg_appliance_health_snapshot_order ON orders;
+CREATE TRIGGER trg_appliance_health_snapshot_order
+    AFTER INSERT OR UPDATE OF status ON orders
+    FOR EACH ROW EXECUTE FUNCTION appliance_health_snapshot_order_trg();
+
+-- Checkins UPDATE last_checkin constantly; only membership changes
+-- (new appliance, site move, restore from soft-delete) dirty a row.
+DROP TRIGGER IF EXISTS trg_appliance_health_snapshot_appliance ON site_appliances;
+CREATE TRIGGER trg_appliance_health_snapshot_appliance
+    AFTER INSERT OR UPDATE OF deleted_at, site_id, legacy_uuid ON site_appliances
+    FOR EACH ROW EXECUTE FUNCTION appliance_health_snapshot_appliance_trg();
+
+-- Seed one dirty row per live appliance; the first loop tick fills them.
+INSERT INTO appliance_health_snapshot (appliance_id, site_id)
+SELECT legacy_uuid::text, site_id
+  FROM site_appliances
+ WHERE deleted_at IS NULL AND legacy_uuid IS NOT NULL
+ON CONFLICT (appliance_id) DO NOTHING;
+
+ALTER TABLE appliance_health_snapshot OWNER TO mcp_app;
+
+COMMIT;
@@ -0,0 +1,481 @@
+-- Migration 335: search_documents — unified trigram search index
+--
+-- sites.search_site ran four ILIKE '%q%' queries per keystroke — one of
+-- them over incidents.details::text — so every typeahead request was a
+-- set of sequential scans plus JSONB-to-text casts on the largest
+-- site-scoped tables. partner_global_search did the same over 7 days of
+-- incidents across a whole book of business.
+--
+-- search_documents holds one row per searchable entity:
+--
+--   (site_id, kind, entity_id)  identity; kind ∈ incident | device |
+--                               credential | workstation | appliance
+--   title / subtitle            display text
+--   body                        lower-cased concatenation of every
+--                               searchable field — the one column the
+--                               pg_trgm GIN index covers
+--   payload                     the fields search responses return, so
+--                               a hit never joins back to its source
+--   sort_at                     recency for ranking (created_at,
+--                               last_seen, ...)
+--
+-- Maintained by AFTER ROW triggers on the source tables. Column lists
+-- plus IS DISTINCT FROM guards keep hot-path writes out: a checkin or
+-- device sync that changes no searchable field, and incident resolution
+-- timestamps, never touch the index. Devices are
+-- keyed like canonical_devices — (ip_address, COALESCE(mac, '')) — and
+-- the freshest discovered_devices row wins, matching the old
+-- dd_freshest CTE. Credentials index metadata only; encrypted material
+-- never enters body or payload.
+--
+-- Trigger functions are SECURITY DEFINER (same as bump_change_version
+-- in mig 330): the index must be maintained whatever tenant context the
+-- writing request runs under. Reads go through the RLS policies below,
+-- which mirror canonical_devices plus the site-tenant policy.
+--
+-- Query side: search_service.py.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS search_documents (
+    site_id     TEXT        NOT NULL,
+    kind        TEXT        NOT NULL,
+    entity_id   TEXT        NOT NULL,
+    title       TEXT        NOT NULL DEFAULT '',
+    subtitle    TEXT,
+    body        TEXT        NOT NULL,
+    payload     JSONB       NOT NULL DEFAULT '{}'::jsonb,
+    sort_at     TIMESTAMPTZ,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (site_id, kind, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_body_trgm
+    ON search_documents USING gin (body gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_site_kind_recent
+    ON search_documents (site_id, kind, sort_at DESC);
+
+COMMENT ON TABLE search_documents IS
+    'Unified per-site search index (mig 335). Trigger-maintained from '
+    'incidents, discovered_devices, site_credentials, workstations and '
+    'site_appliances; queried by search_service.py.';
+
+-- FORCE: the table is owned by mcp_app (below), and an owner otherwise
+-- bypasses its own policies. Parity with canonical_devices (mig 320).
+-- The trigger functions are owned by the migration superuser, so index
+-- maintenance is unaffected.
+ALTER TABLE search_documents ENABLE ROW LEVEL SECURITY;
+ALTER TABLE search_documents FORCE ROW LEVEL SECURITY;
+
+CREATE POLICY search_documents_admin_all
+    ON search_documents
+    USING (current_setting('app.is_admin', true) = 'true')
+    WITH CHECK (current_setting('app.is_admin', true) = 'true');
+
+CREATE POLICY search_documents_tenant_isolation
+    ON search_documents FOR ALL
+    USING (site_id = current_setting('app.current_tenant', true));
+
+CREATE POLICY tenant_org_isolation
+    ON search_documents FOR ALL
+    USING (
+        current_setting('app.current_org', true) IS NOT NULL
+        AND current_setting('app.current_org', true) <> ''
+        AND rls_site_belongs_to_current_org(site_id)
+    );
+
+CREATE POLICY search_documents_partner_isolation
+    ON search_documents FOR ALL
+    USING (
+        current_setting('app.current_partner_id', true) IS NOT NULL
+        AND current_setting('app.current_partner_id', true) <> ''
+        AND rls_site_belongs_to_current_partner(site_id)
+    );
+
+-- ---------------------------------------------------------------------------
+-- Shared upsert / delete
+-- ---------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION search_documents_put(
+    p_site_id TEXT, p_kind TEXT, p_entity_id TEXT,
+    p_title TEXT, p_subtitle TEXT, p_body TEXT,
+    p_payload JSONB, p_sort_at TIMESTAMPTZ
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF p_site_id IS NULL OR p_entity_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO search_documents
+        (site_id, kind, entity_id, title, subtitle, body, payload, sort_at, updated_at)
+    VALUES
+        (p_site_id, p_kind, p_entity_id, COALESCE(p_title, ''), p_subtitle,
+         -- Cap body so one huge incident payload can't bloat the GIN index.
+         left(lower(p_body), 4000), p_payload, p_sort_at, NOW())
+    ON CONFLICT (site_id, kind, entity_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        subtitle = EXCLUDED.subtitle,
+        body = EXCLUDED.body,
+        payload = EXCLUDED.payload,
+        sort_at = EXCLUDED.sort_at,
+        updated_at = NOW();
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_drop(p_site_id TEXT, p_kind TEXT, p_entity_id TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DELETE FROM search_documents
+     WHERE site_id = p_site_id AND kind = p_kind AND entity_id = p_entity_id;
+END;
+$$;
+
+-- ---------------------------------------------------------------------------
+-- Per-source document builders. Each takes a source row, so the
+-- triggers and the backfill below share one definition per shape.
+-- ---------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION search_documents_index_incident(r incidents)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_title TEXT := COALESCE(NULLIF(r.details->>'title', ''), r.incident_type, 'incident');
+BEGIN
+    PERFORM search_documents_put(
+        r.site_id::text, 'incident', r.id::text,
+        v_title,
+        concat_ws(' · ', r.severity, r.status),
+        concat_ws(' ', v_title, r.incident_type, r.severity, r.details::text),
+        jsonb_build_object(
+            'id', r.id::text,
+            'incident_type', r.incident_type,
+            'title', v_title,
+            'severity', r.severity,
+            'status', r.status
+        ),
+        r.created_at
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_index_device(r discovered_devices)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_key TEXT := r.ip_address || '|' || COALESCE(r.mac_address, '');
+BEGIN
+    -- Freshest observation wins (mirrors the old dd_freshest CTE).
+    IF EXISTS (
+        SELECT 1 FROM search_documents
+         WHERE site_id = r.site_id::text AND kind = 'device' AND entity_id = v_key
+           AND sort_at > r.last_seen_at
+    ) THEN
+        RETURN;
+    END IF;
+    PERFORM search_documents_put(
+        r.site_id::text, 'device', v_key,
+        COALESCE(NULLIF(r.hostname, ''), r.ip_address),
+        concat_ws(' · ', r.ip_address, r.mac_address, r.device_type),
+        concat_ws(' ', r.hostname, r.ip_address, r.mac_address),
+        jsonb_build_object(
+            'id', r.id::text,
+            'hostname', r.hostname,
+            'ip_address', r.ip_address,
+            'mac_address', r.mac_address,
+            'device_type', r.device_type
+        ),
+        r.last_seen_at
+    );
+END;
+$$;
+
+-- Metadata only — encrypted credential material never enters the index.
+CREATE OR REPLACE FUNCTION search_documents_index_credential(r site_credentials)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM search_documents_put(
+        r.site_id::text, 'credential', r.id::text,
+        r.credential_name,
+        r.credential_type,
+        concat_ws(' ', r.credential_name, r.credential_type),
+        jsonb_build_object(
+            'id', r.id::text,
+            'credential_type', r.credential_type,
+            'credential_name', r.credential_name
+        ),
+        r.updated_at
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_index_workstation(r workstations)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_os TEXT := NULLIF(trim(concat_ws(' ', NULLIF(r.os_name, ''), NULLIF(r.os_version, ''))), '');
+BEGIN
+    PERFORM search_documents_put(
+        r.site_id::text, 'workstation', r.id::text,
+        r.hostname,
+        concat_ws(' · ', v_os, r.compliance_status),
+        concat_ws(' ', r.hostname, r.os_name, r.compliance_status),
+        jsonb_build_object(
+            'id', r.id::text,
+            'hostname', r.hostname,
+            'os', v_os,
+            'compliance_status', r.compliance_status
+        ),
+        r.last_seen
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_index_appliance(r site_appliances)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM search_documents_put(
+        r.site_id::text, 'appliance', r.appliance_id,
+        COALESCE(NULLIF(r.hostname, ''), r.appliance_id),
+        concat_ws(' · ', r.ip_addresses->>0, r.agent_version),
+        concat_ws(' ', r.hostname, r.appliance_id, r.mac_address,
+                  r.ip_addresses::text, r.agent_version),
+        jsonb_build_object(
+            'appliance_id', r.appliance_id,
+            'hostname', r.hostname,
+            'ip_address', r.ip_addresses->>0,
+            'mac_address', r.mac_address,
+            'agent_version', r.agent_version
+        ),
+        r.first_checkin
+    );
+END;
+$$;
+
+-- ---------------------------------------------------------------------------
+-- Trigger functions: route INSERT/UPDATE to the builder, DELETE to drop.
+-- ---------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION search_documents_incident_trg()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM search_documents_drop(OLD.site_id::text, 'incident', OLD.id::text);
+    ELSE
+        PERFORM search_documents_index_incident(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_device_trg()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        -- Another appliance may still report this device; only drop the
+        -- document when no source row remains.
+        IF NOT EXISTS (
+            SELECT 1 FROM discovered_devices
+             WHERE site_id = OLD.site_id AND ip_address = OLD.ip_address
+               AND COALESCE(mac_address, '') = COALESCE(OLD.mac_address, '')
+        ) THEN
+            PERFORM search_documents_drop(
+                OLD.site_id::text, 'device',
+                OLD.ip_address || '|' || COALESCE(OLD.mac_address, ''));
+        END IF;
+    ELSE
+        PERFORM search_documents_index_device(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_credential_trg()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM search_documents_drop(OLD.site_id::text, 'credential', OLD.id::text);
+    ELSE
+        PERFORM search_documents_index_credential(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_workstation_trg()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_OP = 'DELETE' OR OLD.site_id IS DISTINCT FROM NEW.site_id THEN
+            PERFORM search_documents_drop(OLD.site_id::text, 'workstation', OLD.id::text);
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM search_documents_index_workstation(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_documents_appliance_trg()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF TG_OP = 'DELETE' OR OLD.site_id IS DISTINCT FROM NEW.site_id
+           OR NEW.deleted_at IS NOT NULL THEN
+            PERFORM search_documents_drop(OLD.site_id::text, 'appliance', OLD.appliance_id);
+        END IF;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.deleted_at IS NULL THEN
+        PERFORM search_documents_index_appliance(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- ---------------------------------------------------------------------------
+-- Triggers. UPDATE OF fires whenever a listed column is SET, changed or
+-- not — and the checkin upsert re-SETs hostname / mac / ip / version on
+-- every cycle, device_sync re-SETs every device field on every sync — so
+-- each UPDATE trigger also carries a WHEN that requires an actual change.
+-- WHEN cannot reference OLD on INSERT/DELETE, hence the split pairs.
+-- discovered_devices.last_seen_at is deliberately absent: it moves on
+-- every sync. A device document's sort_at is the last_seen_at of its
+-- last searchable-field change.
+-- ---------------------------------------------------------------------------
+
+DROP TRIGGER IF EXISTS trg_search_documents_incidents ON incidents;
+CREATE TRIGGER trg_search_documents_incidents
+    AFTER INSERT OR DELETE ON incidents
+    FOR EACH ROW EXECUTE FUNCTION search_documents_incident_trg();
+DROP TRIGGER IF EXISTS trg_search_documents_incidents_upd ON incidents;
+CREATE TRIGGER trg_search_documents_incidents_upd
+    AFTER UPDATE OF incident_type, severity, status, details ON incidents
+    FOR EACH ROW
+    WHEN (OLD.incident_type IS DISTINCT FROM NEW.incident_type
+          OR OLD.severity IS DISTINCT FROM NEW.severity
+          OR OLD.status IS DISTINCT FROM NEW.status
+          OR OLD.details IS DISTINCT FROM NEW.details)
+    EXECUTE FUNCTION search_documents_incident_trg();
+
+DROP TRIGGER IF EXISTS trg_search_documents_devices ON discovered_devices;
+CREATE TRIGGER trg_search_documents_devices
+    AFTER INSERT OR DELETE ON discovered_devices
+    FOR EACH ROW EXECUTE FUNCTION search_documents_device_trg();
+DROP TRIGGER IF EXISTS trg_search_documents_devices_upd ON discovered_devices;
+CREATE TRIGGER trg_search_documents_devices_upd
+    AFTER UPDATE OF hostname, ip_address, mac_address, device_type ON discovered_devices
+    FOR EACH ROW
+    WHEN (OLD.hostname IS DISTINCT FROM NEW.hostname
+          OR OLD.ip_address IS DISTINCT FROM NEW.ip_address
+          OR OLD.mac_address IS DISTINCT FROM NEW.mac_address
+          OR OLD.device_type IS DISTINCT FROM NEW.device_type)
+    EXECUTE FUNCTION search_documents_device_trg();
+
+DROP TRIGGER IF EXISTS trg_search_documents_credentials ON site_credentials;
+CREATE TRIGGER trg_search_documents_credentials
+    AFTER INSERT OR DELETE ON site_credentials
+    FOR EACH ROW EXECUTE FUNCTION search_documents_credential_trg();
+DROP TRIGGER IF EXISTS trg_search_documents_credentials_upd ON site_credentials;
+CREATE TRIGGER trg_search_documents_credentials_upd
+    AFTER UPDATE OF credential_name, credential_type ON site_credentials
+    FOR EACH ROW
+    WHEN (OLD.credential_name IS DISTINCT FROM NEW.credential_name
+          OR OLD.credential_type IS DISTINCT FROM NEW.credential_type)
+    EXECUTE FUNCTION search_documents_credential_trg();
+
+DROP TRIGGER IF EXISTS trg_search_documents_workstations ON workstations;
+CREATE TRIGGER trg_search_documents_workstations
+    AFTER INSERT OR DELETE ON workstations
+    FOR EACH ROW EXECUTE FUNCTION search_documents_workstation_trg();
+DROP TRIGGER IF EXISTS trg_search_documents_workstations_upd ON workstations;
+CREATE TRIGGER trg_search_documents_workstations_upd
+    AFTER UPDATE OF hostname, os_name, os_version, compliance_status, site_id ON workstations
+    FOR EACH ROW
+    WHEN (OLD.hostname IS DISTINCT FROM NEW.hostname
+          OR OLD.os_name IS DISTINCT FROM NEW.os_name
+          OR OLD.os_version IS DISTINCT FROM NEW.os_version
+          OR OLD.compliance_status IS DISTINCT FROM NEW.compliance_status
+          OR OLD.site_id IS DISTINCT FROM NEW.site_id)
+    EXECUTE FUNCTION search_documents_workstation_trg();
+
+DROP TRIGGER IF EXISTS trg_search_documents_appliances ON site_appliances;
+CREATE TRIGGER trg_search_documents_appliances
+    AFTER INSERT OR DELETE ON site_appliances
+    FOR EACH ROW EXECUTE FUNCTION search_documents_appliance_trg();
+DROP TRIGGER IF EXISTS trg_search_documents_appliances_upd ON site_appliances;
+CREATE TRIGGER trg_search_documents_appliances_upd
+    AFTER UPDATE OF hostname, ip_addresses, mac_address, agent_version, deleted_at, site_id
+    ON site_appliances
+    FOR EACH ROW
+    WHEN (OLD.hostname IS DISTINCT FROM NEW.hostname
+          OR OLD.ip_addresses IS DISTINCT FROM NEW.ip_addresses
+          OR OLD.mac_address IS DISTINCT FROM NEW.mac_address
+          OR OLD.agent_version IS DISTINCT FROM NEW.agent_version
+          OR OLD.deleted_at IS DISTINCT FROM NEW.deleted_at
+          OR OLD.site_id IS DISTINCT FROM NEW.site_id)
+    EXECUTE FUNCTION search_documents_appliance_trg();
+
+-- ---------------------------------------------------------------------------
+-- Backfill through the same builders the triggers use. Devices oldest
+-- first so the freshest observation per (ip, mac) is the one kept.
+-- ---------------------------------------------------------------------------
+
+SELECT search_documents_index_incident(i) FROM incidents i;
+SELECT search_documents_index_device(d) FROM discovered_devices d
+ ORDER BY d.last_seen_at NULLS FIRST;
+SELECT search_documents_index_credential(c) FROM site_credentials c;
+SELECT search_documents_index_workstation(w) FROM workstations w;
+SELECT search_documents_index_appliance(a) FROM site_appliances a
+ WHERE a.deleted_at IS NULL;
+
+ALTER TABLE search_documents OWNER TO mcp_app;
+
+COMMIT;
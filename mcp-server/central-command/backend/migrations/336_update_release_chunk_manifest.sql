@@ -0,0 +1,32 @@
+-- Migration 336: signed chunk manifests for delta ISO updates.
+--
+-- UpdateAgent.download_iso fetched the whole ISO for every release (byte-
+-- range resume only) and verify_checksum re-read the entire file after.
+-- Most of an image is unchanged between releases, and appliances already
+-- hold the previous release byte-for-byte on their active A/B partition.
+--
+-- update_manifest.py streams a release's ISO once, splits it into
+-- fixed-size chunks and records the SHA-256 of each, plus the whole-image
+-- size and SHA-256. The manifest is signed with the server Ed25519 key
+-- over its canonical JSON. Appliances copy every chunk whose hash they
+-- already have on disk and Range-fetch only the missing ones, hashing as
+-- they write.
+--
+-- Columns are nullable: releases without a manifest (generation pending,
+-- failed, or pre-336) keep the full-download path.
+
+BEGIN;
+
+ALTER TABLE update_releases ADD COLUMN IF NOT EXISTS chunk_manifest JSONB;
+ALTER TABLE update_releases ADD COLUMN IF NOT EXISTS chunk_manifest_signature TEXT;
+ALTER TABLE update_releases ADD COLUMN IF NOT EXISTS chunk_manifest_generated_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN update_releases.chunk_manifest IS
+    'Chunk manifest (mig 336): {format, version, size_bytes, sha256, '
+    'chunk_size, chunks[]}. Generated by update_manifest.py; NULL = '
+    'full-download only.';
+COMMENT ON COLUMN update_releases.chunk_manifest_signature IS
+    'Hex Ed25519 signature over the canonical (sorted, compact) JSON of '
+    'chunk_manifest.';
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- Migration 337: acknowledged section hashes for delta checkins.
+--
+-- appliance_checkin re-ran the go_agents / workstations sync and the
+-- signing-key lookups on every checkin even when the daemon's state had
+-- not changed since the previous cycle. Daemons now send a hash per
+-- checkin section and leave out sections whose hash the server has
+-- already acknowledged (checkin/delta.py); the server skips the steps
+-- for those sections.
+--
+-- The acknowledged hashes live on the appliance row, with the agent_ids
+-- the connected_agents hash covered (the liveness touch is scoped to
+-- them). Written only when they change; NULL = nothing acknowledged, the
+-- daemon sends everything.
+
+BEGIN;
+
+ALTER TABLE site_appliances ADD COLUMN IF NOT EXISTS checkin_section_hashes JSONB;
+
+COMMENT ON COLUMN site_appliances.checkin_section_hashes IS
+    'Delta checkin (mig 337): {section: hash} last processed for this '
+    'appliance, returned to the daemon as checkin_delta.ack, plus '
+    'connected_agent_ids: the go_agents that connected_agents hash covered.';
+
+COMMIT;
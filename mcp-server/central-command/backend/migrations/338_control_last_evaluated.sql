@@ -0,0 +1,78 @@
+-- Migration 338: control_last_evaluated — per-control evaluation clock
+--
+-- map_evidence_to_frameworks only writes evidence_framework_mappings
+-- rows for controls whose aggregated status changed, or whose latest
+-- row is older than CONTROL_MAPPING_REASSERT_SECONDS (6h). Statuses
+-- and scores are unaffected by the skip, but v_control_status (mig
+-- 326) took last_checked from the latest MAPPED bundle, so
+-- frameworks.get_control_status reported controls as last checked up
+-- to 6h ago while fresh bundles kept arriving.
+--
+-- control_last_evaluated holds one row per (site, framework, control),
+-- upserted by every mapped bundle in one statement. Rows are updated
+-- in place — the table does not grow with bundle volume the way the
+-- mappings did. v_control_status reads last_checked from it, falling
+-- back to the bundle time for controls not evaluated since this
+-- migration.
+--
+-- No RLS: rows carry control ids and timestamps only, and are read
+-- through v_control_status (same as change_versions, mig 330).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS control_last_evaluated (
+    site_id           TEXT        NOT NULL,
+    framework         TEXT        NOT NULL,
+    control_id        TEXT        NOT NULL,
+    last_evaluated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (site_id, framework, control_id)
+);
+
+COMMENT ON TABLE control_last_evaluated IS
+    'Latest bundle evaluation per (site, framework, control), written by '
+    'evidence_chain.map_evidence_to_frameworks for every mapped bundle '
+    '(mig 338). Feeds v_control_status.last_checked.';
+
+CREATE OR REPLACE VIEW v_control_status AS
+WITH latest_evidence AS (
+    SELECT
+        sa.appliance_id,
+        cb.site_id,
+        efm.framework,
+        efm.control_id,
+        cb.check_result AS status,
+        cb.created_at,
+        ROW_NUMBER() OVER (
+            PARTITION BY sa.appliance_id, efm.framework, efm.control_id
+            ORDER BY cb.created_at DESC
+        ) AS rn
+    FROM compliance_bundles cb
+    JOIN site_appliances sa
+      ON sa.site_id = cb.site_id
+     AND sa.deleted_at IS NULL
+    JOIN evidence_framework_mappings efm
+      ON cb.bundle_id = efm.bundle_id
+    WHERE cb.created_at >= NOW() - INTERVAL '30 days'
+)
+SELECT
+    le.appliance_id,
+    le.framework,
+    le.control_id,
+    le.status,
+    GREATEST(le.created_at, cle.last_evaluated_at) AS last_checked
+FROM latest_evidence le
+LEFT JOIN control_last_evaluated cle
+  ON cle.site_id = le.site_id
+ AND cle.framework = le.framework
+ AND cle.control_id = le.control_id
+WHERE le.rn = 1;
+
+COMMENT ON VIEW v_control_status IS
+    'Per-appliance latest-evidence-per-control over 30d (mig 326, '
+    'site_appliances JOIN + cb.check_result). last_checked comes from '
+    'control_last_evaluated (mig 338): unchanged controls are not '
+    're-mapped for every bundle, but are still evaluated by it.';
+
+ALTER TABLE control_last_evaluated OWNER TO mcp_app;
+
+COMMIT;
@@ -135,26 +135,22 @@ async def _gather_aggregate_facts(
             partner_id,
         ) or 0
 
-        # Bundle count + anchored count for the period.
-        bundle_count = await conn.fetchval(
+        # Bundle count + anchored count for the period, one scan.
+        # The columnar compliance_analytics path isn't used here: this
+        # artifact counts bundles only, never check results.
+        counts = await conn.fetchrow(
             """
-            SELECT COUNT(*) FROM compliance_bundles cb
-              JOIN sites s ON s.site_id = cb.site_id
-             WHERE s.partner_id = $1
-               AND cb.checked_at >= $2 AND cb.checked_at < $3
-            """,
-            partner_id, period_start, period_end,
-        ) or 0
-        anchored = await conn.fetchval(
-            """
-            SELECT COUNT(*) FROM compliance_bundles cb
+            SELECT COUNT(*) AS bundles,
+                   COUNT(*) FILTER (WHERE cb.ots_status = 'anchored') AS anchored
+              FROM compliance_bundles cb
               JOIN sites s ON s.site_id = cb.site_id
              WHERE s.partner_id = $1
                AND cb.checked_at >= $2 AND cb.checked_at < $3
-               AND cb.ots_status = 'anchored'
             """,
             partner_id, period_start, period_end,
-        ) or 0
+        )
+        bundle_count = (counts["bundles"] if counts else 0) or 0
+        anchored = (counts["anchored"] if counts else 0) or 0
 
         # Chain heads — latest bundle hash per site, sorted by
         # site_id for deterministic chain_root_hex.
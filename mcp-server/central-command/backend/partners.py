@@ -29,6 +29,8 @@ from .fleet import get_pool
 from .auth import require_admin
 from .tenant_middleware import tenant_connection, admin_connection, admin_transaction
 from .partner_auth import hash_session_token
+from .conditional_get import PARTNER_MY_SITES, check_not_modified
+from .search_service import search_documents
 from .db_utils import _uid
 from .partner_activity_logger import (
     log_partner_activity,
@@ -1215,11 +1217,41 @@ async def get_my_fleet_appliances(
 
 
 @router.get("/me/sites")
-async def get_my_sites(request: Request, partner: dict = require_partner_role("admin", "tech", "billing")):
-    """Get sites belonging to this partner."""
+async def get_my_sites(
+    request: Request,
+    response: Response,
+    partner: dict = require_partner_role("admin", "tech", "billing"),
+):
+    """Get sites belonging to this partner.
+
+    Conditional: answers 304 from change_versions before running the
+    rollup. A 304 is still an access and is logged as SITES_LISTED
+    (with not_modified instead of a site count).
+    """
     pool = await get_pool()
 
+    async def _log_listed(event_data: dict) -> None:
+        await log_partner_activity(
+            partner_id=str(partner['id']),
+            event_type=PartnerEventType.SITES_LISTED,
+            target_type="partner",
+            target_id=str(partner['id']),
+            event_data=event_data,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent", "")[:500],
+            request_path=str(request.url.path),
+            request_method=request.method,
+        )
+
     async with admin_connection(pool) as conn:
+        try:
+            await check_not_modified(
+                request, response, conn, PARTNER_MY_SITES, str(partner['id']),
+            )
+        except HTTPException as e:
+            if e.status_code == 304:
+                await _log_listed({"not_modified": True})
+            raise
         rows = await conn.fetch("""
             SELECT s.site_id, s.clinic_name, s.status, s.tier,
                    s.onboarding_stage, s.created_at,
@@ -1255,17 +1287,7 @@ async def get_my_sites(request: Request, partner: dict = require_partner_role("a
                 'agent_last_event': row['agent_last_event'].isoformat() if row['agent_last_event'] else None,
             })
 
-        await log_partner_activity(
-            partner_id=str(partner['id']),
-            event_type=PartnerEventType.SITES_LISTED,
-            target_type="partner",
-            target_id=str(partner['id']),
-            event_data={"site_count": len(sites)},
-            ip_address=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent", "")[:500],
-            request_path=str(request.url.path),
-            request_method=request.method,
-        )
+        await _log_listed({"site_count": len(sites)})
 
         return {'sites': sites, 'count': len(sites)}
 
@@ -1497,7 +1519,7 @@ async def partner_global_search(
 
     Searches:
       * sites (site_id, clinic_name)
-      * incidents (incident_type, severity) — limited to last 7d for speed
+      * incidents — search_documents index, last 7d
       * promoted_rules (rule_id) — partner's sites only
 
     Returns a flat list of hits, each with `kind`, `title`, `subtitle`,
@@ -1511,8 +1533,8 @@ async def partner_global_search(
     partner_id = partner["id"]
 
     pool = await get_pool()
-    # admin_transaction (wave-16): partner_global_search issues 3
-    # admin reads (sites, devices, incidents).
+    # admin_transaction (wave-16): partner_global_search issues 4
+    # admin reads (sites, partner site ids, incident index, rules).
     async with admin_transaction(pool) as conn:
         site_rows = await conn.fetch(
             """
@@ -1526,19 +1548,21 @@ async def partner_global_search(
             """,
             partner_id, pattern, limit,
         )
-        incident_rows = await conn.fetch(
-            """
-            SELECT i.id, i.incident_type, i.severity, i.status,
-                   i.site_id, s.clinic_name, i.created_at
-            FROM incidents i
-            JOIN sites s ON s.site_id = i.site_id
-            WHERE s.partner_id = $1
-              AND i.created_at > NOW() - INTERVAL '7 days'
-              AND (LOWER(i.incident_type) LIKE $2 OR LOWER(COALESCE(i.severity, '')) LIKE $2)
-            ORDER BY i.created_at DESC
-            LIMIT $3
-            """,
-            partner_id, pattern, limit,
+        # Incidents come from the trigram search index (Migration 335,
+        # search_service.py) rather than a LIKE scan over a week of
+        # incidents across every partner site.
+        partner_sites = {
+            r["site_id"]: r["clinic_name"]
+            for r in await conn.fetch(
+                "SELECT site_id, clinic_name FROM sites WHERE partner_id = $1",
+                partner_id,
+            )
+        }
+        incident_hits = await search_documents(
+            conn, partner_sites.keys(), q, limit=limit, kinds=("incident",),
+            # Hour-aligned so the typeahead prefix cache keys stay stable.
+            since=datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            - timedelta(days=7),
         )
         rule_rows = await conn.fetch(
             """
@@ -1561,15 +1585,18 @@ async def partner_global_search(
             "subtitle": r["site_id"],
             "href": f"/partner/site/{r['site_id']}",
         })
-    for r in incident_rows:
+    for doc in incident_hits["incident"]:
+        p = doc["payload"]
+        site_id = doc["site_id"]
+        created_at = doc["sort_at"]
         hits.append({
             "kind": "incident",
-            "title": r["incident_type"] or "incident",
+            "title": p.get("incident_type") or "incident",
             "subtitle": (
-                f"{r['clinic_name'] or r['site_id']} · {r['severity'] or 'n/a'} · "
-                f"{r['status']} · {r['created_at'].strftime('%Y-%m-%d %H:%M') if r['created_at'] else ''}"
+                f"{partner_sites.get(site_id) or site_id} · {p.get('severity') or 'n/a'} · "
+                f"{p.get('status')} · {created_at.strftime('%Y-%m-%d %H:%M') if created_at else ''}"
             ),
-            "href": f"/partner/site/{r['site_id']}?incident={r['id']}",
+            "href": f"/partner/site/{site_id}?incident={p.get('id')}",
         })
     for r in rule_rows:
         hits.append({
@@ -1589,7 +1616,7 @@ async def get_partner_weekly_rollup(
     """Session 206 round-table P2 — precomputed weekly rollup per site.
 
     Reads from the `partner_site_weekly_rollup` materialized view
-    (migration 185, refreshed every 30 min by weekly_rollup_refresh_loop).
+    (migration 185, refreshed every 30 min by weekly_rollup_refresh_tick).
     Filters server-side by partner_id. Single indexed read vs. 7
     aggregate queries in /me/dashboard.
 
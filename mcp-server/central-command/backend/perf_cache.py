@@ -9,8 +9,9 @@ perceived latency from 2.4s × 3 = 7.2s to ~2.5s on cold path and ~150ms on
 warm path.
 
 Design choices:
-  - Process-local. Single VPS deploy today; one process holds one cache.
-    Swap for Redis when Central Command scales out (interface preserved).
+  - Two tiers. L1 is this process-local LRU; L2 is Redis, shared by every
+    mcp-server replica (see "Shared tier" below). Callers that only use
+    cache_get/cache_set/cached_call stay process-local.
   - Async-safe. The wrapper accepts coroutine functions and stores the
     awaited result keyed by the call args.
   - TTL-only invalidation. Score precision is ±60s; that's acceptable for
@@ -24,10 +25,17 @@ Design choices:
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import hashlib
+import json
 import logging
+import secrets
 import time
 from collections import OrderedDict
-from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple, TypeVar
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Hashable,
+    Iterable, Optional, Tuple, TypeVar,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -90,6 +98,7 @@ def cache_set(key: Hashable, value: Any, ttl_seconds: float) -> None:
 
 def cache_invalidate(key: Hashable) -> None:
     _STORE.pop(key, None)
+    _KEY_SITES.pop(key, None)
     # Drop matching lock — release-time pruning to bound _LOCKS even
     # when callers explicitly invalidate.
     _LOCKS.pop(key, None)
@@ -100,6 +109,9 @@ def cache_clear() -> None:
     call this; rely on TTL expiry + LRU eviction."""
     _STORE.clear()
     _LOCKS.clear()
+    _KEY_SITES.clear()
+    for k in _METRICS:
+        _METRICS[k] = 0
 
 
 async def cached_call(
@@ -140,3 +152,327 @@ def cache_stats() -> dict[str, int]:
         "live_locks": sum(1 for ll in _LOCKS.values() if ll.locked()),
         "max_entries": _MAX_ENTRIES,
     }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Shared tier (L2 Redis) — multi-replica Central Command.
+#
+# With N mcp-server replicas each replica used to recompute the 2.4s
+# compliance score independently, and a new evidence bundle stayed
+# invisible for up to the 60s TTL. The shared tier adds:
+#
+#   - L2 values in Redis under `perfcache:v1:<sha256(key)>`. The key
+#     is the SAME tenant-scoped tuple the L1 uses — no new key rules.
+#   - Cross-replica stampede lock: `SET perfcache:lock:<h> NX PX`. The
+#     replica that wins computes; the others poll L2 for the result
+#     with a short backoff (bounded by _SHARED_LOCK_WAIT_SECONDS, then
+#     compute locally so a slow or crashed lock holder never stalls a
+#     dashboard for longer than computing the score itself would).
+#   - Site tags: every L2 key is SADD'ed to `perfcache:site:<site_id>`
+#     so `invalidate_sites()` can drop exactly the entries whose
+#     tenant scope includes a site that just got new evidence.
+#   - Cross-replica L1 invalidation via PUBLISH on
+#     _INVALIDATION_CHANNEL; each replica's
+#     `perf_cache_invalidation_loop` purges its own L1.
+#
+# Redis is best-effort everywhere: any Redis error degrades to the
+# L1-only behavior above and bumps the `redis_errors` counter. A
+# cache layer must never turn a Redis blip into a 500.
+# ─────────────────────────────────────────────────────────────────────
+
+_SHARED_PREFIX = "perfcache:v1:"
+_SITE_TAG_PREFIX = "perfcache:site:"
+_LOCK_PREFIX = "perfcache:lock:"
+_INVALIDATION_CHANNEL = "perfcache:invalidate"
+
+# Lock lease must outlive the slowest expected compute (2.4s p50 on
+# the 155K-bundle org; 5s p99 on prod). Waiters only wait about as
+# long as one compute takes: past that, computing locally is faster
+# than waiting on a holder that is stuck or gone. Polls back off from
+# 50ms to 500ms so a fast fill is picked up quickly without hammering
+# Redis through a slow one.
+_SHARED_LOCK_TTL_MS = 15_000
+_SHARED_LOCK_WAIT_SECONDS = 6.0
+_SHARED_LOCK_POLL_MIN_SECONDS = 0.05
+_SHARED_LOCK_POLL_MAX_SECONDS = 0.5
+
+# key -> frozenset(site_ids) for L1 entries written through the shared
+# tier. Used by invalidate_sites() to find L1 entries to drop. Bounded
+# by the same LRU cap as _STORE.
+_KEY_SITES: OrderedDict[Hashable, FrozenSet[str]] = OrderedDict()
+
+# Process-local counters exported by prometheus_metrics. Counter
+# semantics (monotonic since process start) so rate() works.
+_METRICS: Dict[str, int] = {
+    "l1_hit": 0,
+    "l2_hit": 0,
+    "miss": 0,
+    "stampede_wait": 0,
+    "stampede_timeout": 0,
+    "invalidations": 0,
+    "redis_errors": 0,
+}
+
+
+async def _get_redis():
+    """Get Redis client if available (same resolution as db_queries)."""
+    try:
+        from main import redis_client
+        return redis_client
+    except (ImportError, AttributeError):
+        return None
+
+
+def _shared_key(key: Hashable) -> str:
+    """Stable Redis key for a tenant-scoped cache tuple. The tuple is
+    hashed (not embedded) so site_id lists of any length stay within
+    sane key sizes; `default=str` covers datetimes / bools."""
+    digest = hashlib.sha256(
+        json.dumps(key, default=str, separators=(",", ":")).encode()
+    ).hexdigest()
+    return digest
+
+
+def _tag_local(key: Hashable, site_ids: Iterable[str]) -> None:
+    _KEY_SITES[key] = frozenset(site_ids)
+    _KEY_SITES.move_to_end(key)
+    _evict_if_over_cap(_KEY_SITES)
+
+
+def _invalidate_local(site_ids: Iterable[str]) -> int:
+    """Drop every L1 entry whose tenant scope intersects site_ids.
+    O(len(_KEY_SITES)) — bounded by _MAX_ENTRIES."""
+    wanted = set(site_ids)
+    stale = [k for k, sites in _KEY_SITES.items() if sites & wanted]
+    for k in stale:
+        _STORE.pop(k, None)
+        _KEY_SITES.pop(k, None)
+    return len(stale)
+
+
+class SharedFill:
+    """Lease handed out by `shared_fill()`.
+
+    `value` is set when L1 or L2 already held a fresh value (caller
+    returns it). Otherwise the caller computes and calls `publish()`,
+    which writes L1 + L2 + site tags and releases the cross-replica
+    lock.
+    """
+
+    __slots__ = ("key", "value", "_lock_token")
+
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+        self.value: Optional[Any] = None
+        self._lock_token: Optional[str] = None
+
+    async def publish(
+        self,
+        value: Any,
+        ttl_seconds: float,
+        *,
+        site_ids: Iterable[str],
+        encode: Callable[[Any], Any],
+    ) -> None:
+        site_ids = list(site_ids)
+        cache_set(self.key, value, ttl_seconds)
+        _tag_local(self.key, site_ids)
+        r = await _get_redis()
+        if not r:
+            return
+        h = _shared_key(self.key)
+        try:
+            pipe = r.pipeline(transaction=False)
+            pipe.set(
+                _SHARED_PREFIX + h,
+                json.dumps(encode(value), default=str),
+                ex=max(1, int(ttl_seconds)),
+            )
+            for sid in site_ids:
+                pipe.sadd(_SITE_TAG_PREFIX + sid, h)
+                # Tag sets only need to outlive the entries they index.
+                pipe.expire(_SITE_TAG_PREFIX + sid, max(1, int(ttl_seconds)) * 2)
+            await pipe.execute()
+        except Exception as e:
+            _METRICS["redis_errors"] += 1
+            logger.debug(f"perf_cache shared SET failed: {e}")
+
+
+# Compare-and-delete so a holder whose lease already expired cannot
+# release a lock some other replica has since acquired.
+_RELEASE_LOCK_LUA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
+async def _shared_get(r, h: str, decode: Callable[[Any], Any]) -> Optional[Any]:
+    raw = await r.get(_SHARED_PREFIX + h)
+    if raw is None:
+        return None
+    return decode(json.loads(raw))
+
+
+@contextlib.asynccontextmanager
+async def shared_fill(
+    key: Hashable,
+    ttl_seconds: float,
+    *,
+    site_ids: Iterable[str],
+    decode: Callable[[Any], Any],
+) -> AsyncIterator[SharedFill]:
+    """Two-tier read-through with cross-replica coalescing.
+
+    Usage::
+
+        async with shared_fill(key, ttl, site_ids=sites, decode=_decode) as lease:
+            if lease.value is not None:
+                return lease.value
+            result = await compute()
+            await lease.publish(result, ttl, site_ids=sites, encode=_encode)
+
+    Lookup order: L1 → (per-key asyncio.Lock) → L1 again → L2 →
+    Redis lock → L2 poll while another replica computes. L2 hits are
+    promoted into L1 with the caller's TTL and tagged with `site_ids`,
+    so pub/sub invalidation reaches them like locally computed entries.
+    """
+    site_ids = list(site_ids)
+    lease = SharedFill(key)
+    cached = cache_get(key)
+    if cached is not None:
+        _METRICS["l1_hit"] += 1
+        lease.value = cached
+        yield lease
+        return
+
+    lock = _LOCKS.setdefault(key, asyncio.Lock())
+    _LOCKS.move_to_end(key)
+    _evict_if_over_cap(_LOCKS)
+    async with lock:
+        cached = cache_get(key)
+        if cached is not None:
+            _METRICS["l1_hit"] += 1
+            lease.value = cached
+            yield lease
+            return
+
+        r = await _get_redis()
+        h = _shared_key(key)
+        if r:
+            try:
+                lease.value = await _shared_get(r, h, decode)
+                if lease.value is None:
+                    token = secrets.token_hex(8)
+                    if await r.set(
+                        _LOCK_PREFIX + h, token, nx=True, px=_SHARED_LOCK_TTL_MS,
+                    ):
+                        lease._lock_token = token
+                    else:
+                        # Another replica is computing — wait for it.
+                        _METRICS["stampede_wait"] += 1
+                        deadline = _now() + _SHARED_LOCK_WAIT_SECONDS
+                        delay = _SHARED_LOCK_POLL_MIN_SECONDS
+                        while lease.value is None and _now() < deadline:
+                            await asyncio.sleep(
+                                min(delay, max(0.0, deadline - _now()))
+                            )
+                            lease.value = await _shared_get(r, h, decode)
+                            delay = min(delay * 2, _SHARED_LOCK_POLL_MAX_SECONDS)
+                        if lease.value is None:
+                            _METRICS["stampede_timeout"] += 1
+                else:
+                    _METRICS["l2_hit"] += 1
+                if lease.value is not None:
+                    cache_set(key, lease.value, ttl_seconds)
+                    _tag_local(key, site_ids)
+            except Exception as e:
+                _METRICS["redis_errors"] += 1
+                logger.debug(f"perf_cache shared lookup failed: {e}")
+                lease.value = None
+        if lease.value is None:
+            _METRICS["miss"] += 1
+        try:
+            yield lease
+        finally:
+            if lease._lock_token is not None and r:
+                try:
+                    await r.eval(
+                        _RELEASE_LOCK_LUA, 1, _LOCK_PREFIX + h, lease._lock_token,
+                    )
+                except Exception as e:
+                    _METRICS["redis_errors"] += 1
+                    logger.debug(f"perf_cache lock release failed: {e}")
+
+
+async def invalidate_sites(site_ids: Iterable[str]) -> None:
+    """Event-driven invalidation: drop every cached entry (L1 on this
+    replica, L2 in Redis, L1 on other replicas via pub/sub) whose
+    tenant scope includes any of ``site_ids``.
+
+    Called post-commit by `evidence_chain.submit_evidence`. Never
+    raises — a failed invalidation degrades to TTL expiry.
+    """
+    site_ids = [s for s in site_ids if s]
+    if not site_ids:
+        return
+    _METRICS["invalidations"] += 1
+    _invalidate_local(site_ids)
+    r = await _get_redis()
+    if not r:
+        return
+    try:
+        hashes: set = set()
+        for sid in site_ids:
+            members = await r.smembers(_SITE_TAG_PREFIX + sid)
+            hashes.update(
+                m.decode() if isinstance(m, bytes) else m for m in members
+            )
+        keys = [_SHARED_PREFIX + h for h in hashes]
+        keys.extend(_SITE_TAG_PREFIX + sid for sid in site_ids)
+        await r.delete(*keys)
+        await r.publish(_INVALIDATION_CHANNEL, json.dumps(site_ids))
+    except Exception as e:
+        _METRICS["redis_errors"] += 1
+        logger.debug(f"perf_cache invalidate_sites failed: {e}")
+
+
+async def perf_cache_invalidation_loop() -> None:
+    """Subscribe to _INVALIDATION_CHANNEL and purge this replica's L1.
+
+    Work-driven (registered in bg_heartbeat.DRAIN_LOOPS): it blocks on
+    pub/sub and heartbeats per message. Without Redis it idles — the
+    L1 TTL is then the only staleness bound, same as pre-shared-tier.
+    """
+    from .bg_heartbeat import record_heartbeat
+
+    while True:
+        record_heartbeat("perf_cache_invalidation")
+        r = await _get_redis()
+        if not r:
+            await asyncio.sleep(300)
+            continue
+        try:
+            pubsub = r.pubsub()
+            await pubsub.subscribe(_INVALIDATION_CHANNEL)
+            try:
+                async for msg in pubsub.listen():
+                    if msg.get("type") != "message":
+                        continue
+                    try:
+                        _invalidate_local(json.loads(msg["data"]))
+                    except (TypeError, ValueError):
+                        logger.warning("perf_cache: malformed invalidation message")
+                    record_heartbeat("perf_cache_invalidation")
+            finally:
+                await pubsub.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _METRICS["redis_errors"] += 1
+            logger.warning(f"perf_cache invalidation subscriber error: {e}")
+        await asyncio.sleep(5)
+
+
+def cache_metrics() -> Dict[str, int]:
+    """Snapshot of hit/miss/stampede counters for prometheus_metrics."""
+    return dict(_METRICS)
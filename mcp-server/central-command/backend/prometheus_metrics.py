@@ -4,13 +4,20 @@ Exposes platform health metrics in Prometheus text exposition format.
 Accepts the Prometheus scraper bearer (PROMETHEUS_SCRAPE_TOKEN env) OR
 admin authentication (cookie / user Bearer). Generates text format
 manually — no prometheus_client dependency needed.
+
+DB-backed metric families are collected by a background loop and served
+from an in-process snapshot (see `metrics_collector_loop`); scrapes only
+render text.
 """
 
+import asyncio
 import hmac
 import logging
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import PlainTextResponse
@@ -77,48 +84,34 @@ def _counter(name: str, help_text: str, values: list[tuple[dict[str, str], float
 
 
 # =============================================================================
-# Endpoint
+# Slow (DB-backed) metric families
 # =============================================================================
-
-
-@router.get("/metrics", response_class=PlainTextResponse)
-async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
-    """Return platform metrics in Prometheus text exposition format.
-
-    Queries are executed fresh on each scrape — no background loop.
-    Each metric section is wrapped in its own try/except so a single
-    table being absent does not break the entire response.
-    """
-    from dashboard_api.fleet import get_pool
-    from dashboard_api.tenant_middleware import admin_connection
+#
+# user-027: the endpoint used to run ~48 aggregate queries per scrape, so
+# DB load scaled with (scrapers × scrape frequency). The DB sections are
+# now grouped into families, each refreshed by `metrics_collector_loop`
+# on its own cadence and served from `_SNAPSHOTS`. A scrape only renders
+# text; DB load is independent of how many Prometheus/Grafana scrapers
+# poll us.
+#
+# P0-2 fix (round-table 2026-05-09) still applies INSIDE every collector:
+# one admin_transaction per section, NOT a single outer admin_transaction
+# with nested savepoints. The 5cdcf90f attempt to wrap each query in a
+# SAVEPOINT (asyncpg `conn` transaction-context manager) inside one
+# outer admin_transaction still emitted 1500+ InFailedSQLTransactionError
+# per 4 hours: when asyncpg's prepared-statement-cache marks the outer
+# transaction aborted, the SAVEPOINT SQL itself runs against an aborted
+# transaction. Per-section admin_transaction gives each section a fresh
+# PgBouncer backend assignment + fresh transaction; a failure in section
+# A cannot poison section B.
+
+
+async def _collect_fleet(pool, now: datetime) -> list[str]:
+    """Appliance liveness, incidents, healing executions, orders, discovery, mesh."""
+    from .tenant_middleware import admin_transaction
 
     sections: list[str] = []
 
-    try:
-        pool = await get_pool()
-    except Exception:
-        logger.exception("Failed to get database pool for metrics")
-        return PlainTextResponse(
-            "# Failed to connect to database\n",
-            media_type=PROM_CONTENT_TYPE,
-            status_code=503,
-        )
-
-    # P0-2 fix (round-table 2026-05-09): one admin_transaction per
-    # section, NOT a single outer admin_transaction with nested
-    # savepoints. The 5cdcf90f attempt to wrap each query in a
-    # SAVEPOINT (asyncpg `conn` transaction-context manager) inside
-    # one outer admin_transaction still emitted 1500+
-    # InFailedSQLTransactionError per 4 hours: when asyncpg's
-    # prepared-statement-cache marks the outer transaction aborted,
-    # the SAVEPOINT SQL itself runs against an aborted transaction.
-    # Per-section admin_transaction gives each section a fresh
-    # PgBouncer backend assignment + fresh transaction; a failure
-    # in section A cannot poison section B. Cost: ~30 extra
-    # round-trips per scrape (one per section, not per query) — small.
-    from .tenant_middleware import admin_transaction
-    now = datetime.now(timezone.utc)
-
     # --- Appliance status (gauge) ---
     try:
         async with admin_transaction(pool) as conn:
@@ -180,238 +173,6 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: per-appliance offline gauge query failed")
 
-    # --- Flywheel Spine: lifecycle_state distribution ---
-    # Session 206 redesign: single source of truth for flywheel
-    # health. Every alert fires off this metric family.
-    try:
-        async with admin_transaction(pool) as conn:
-            lifecycle_rows = await conn.fetch("""
-                SELECT lifecycle_state, COUNT(*) AS n
-                FROM promoted_rules
-                GROUP BY lifecycle_state
-            """)
-        # Always emit all known states so dashboards don't render
-        # as "no data" when there are zero rules in a state.
-        all_states = [
-            "proposed", "shadow", "approved", "rolling_out",
-            "active", "regime_warning", "auto_disabled",
-            "graduated", "retired",
-        ]
-        counts = {r["lifecycle_state"]: int(r["n"]) for r in lifecycle_rows}
-        sections.append(_gauge(
-            "osiriscare_flywheel_rules_by_state",
-            "Promoted rules per lifecycle_state (Session 206 Spine)",
-            [
-                ({"state": s}, float(counts.get(s, 0)))
-                for s in all_states
-            ],
-        ))
-    except Exception:
-        logger.exception("metrics: flywheel lifecycle gauge query failed")
-
-    # --- Flywheel Spine: event volume by type, last 1h ---
-    try:
-        async with admin_transaction(pool) as conn:
-            evt_rows = await conn.fetch("""
-                SELECT event_type,
-                       COUNT(*) FILTER (WHERE outcome = 'success') AS ok,
-                       COUNT(*) FILTER (WHERE outcome = 'failed') AS failed
-                FROM promoted_rule_events
-                WHERE created_at > NOW() - INTERVAL '1 hour'
-                GROUP BY event_type
-            """)
-        all_types = [
-            "pattern_detected", "shadow_evaluated", "promotion_approved",
-            "rollout_issued", "rollout_acked", "first_execution",
-            "regime_warning", "regime_critical", "regime_absolute_low",
-            "auto_disabled", "manually_disabled", "graduated",
-            "retired_site_dead", "retired_manual",
-            "operator_acknowledged", "operator_re_enabled",
-        ]
-        ok_by = {r["event_type"]: int(r["ok"]) for r in evt_rows}
-        fail_by = {r["event_type"]: int(r["failed"]) for r in evt_rows}
-        sections.append(_gauge(
-            "osiriscare_flywheel_events_1h",
-            "Flywheel state-transition events in last 1h by type + outcome",
-            [
-                ({"event_type": t, "outcome": "success"},
-                 float(ok_by.get(t, 0)))
-                for t in all_types
-            ] + [
-                ({"event_type": t, "outcome": "failed"},
-                 float(fail_by.get(t, 0)))
-                for t in all_types
-            ],
-        ))
-    except Exception:
-        logger.exception("metrics: flywheel events gauge query failed")
-
-    # --- Migration 184 Phase 4 consent metrics ---
-    # Grants, revokes, executed-with-consent events, and expired
-    # request tokens — all labeled by class_id so the SRE
-    # dashboard can spot per-class trends.
-    try:
-        async with admin_transaction(pool) as conn:
-            consent_events = await conn.fetch("""
-                SELECT
-                    COALESCE(SUBSTR(rule_id, 9, POSITION('@' IN rule_id) - 9), '?') AS class_id,
-                    event_type,
-                    COUNT(*) AS n
-                FROM promoted_rule_events
-                WHERE event_type LIKE 'runbook.%'
-                  AND created_at > NOW() - INTERVAL '7 days'
-                GROUP BY 1, 2
-            """)
-        if consent_events:
-            grants = [
-                ({"class_id": r["class_id"]}, float(r["n"]))
-                for r in consent_events if r["event_type"] == "runbook.consented"
-            ]
-            revokes = [
-                ({"class_id": r["class_id"]}, float(r["n"]))
-                for r in consent_events if r["event_type"] == "runbook.revoked"
-            ]
-            executed_with = [
-                ({"class_id": r["class_id"], "outcome": "with_consent"},
-                 float(r["n"]))
-                for r in consent_events
-                if r["event_type"] == "runbook.executed_with_consent"
-            ]
-            if grants:
-                sections.append(_gauge(
-                    "osiriscare_consent_grants_7d",
-                    "Class-level consent grants in last 7d by class_id",
-                    grants,
-                ))
-            if revokes:
-                sections.append(_gauge(
-                    "osiriscare_consent_revokes_7d",
-                    "Class-level consent revokes in last 7d by class_id",
-                    revokes,
-                ))
-            if executed_with:
-                sections.append(_gauge(
-                    "osiriscare_consent_executed_7d",
-                    "runbook.executed_with_consent events in last 7d",
-                    executed_with,
-                ))
-    except Exception:
-        logger.exception("metrics: consent events query failed")
-
-    try:
-        async with admin_transaction(pool) as conn:
-            # Tokens that expired unconsumed — delivery health signal
-            expired_tokens = await conn.fetchval("""
-                SELECT COUNT(*) FROM consent_request_tokens
-                WHERE consumed_at IS NULL AND expires_at < NOW()
-                  AND expires_at > NOW() - INTERVAL '7 days'
-            """)
-            pending_tokens = await conn.fetchval("""
-                SELECT COUNT(*) FROM consent_request_tokens
-                WHERE consumed_at IS NULL AND expires_at > NOW()
-            """)
-        sections.append(_gauge(
-            "osiriscare_consent_token_expired_7d",
-            "Consent request tokens that expired unconsumed in last 7d",
-            [({}, float(expired_tokens or 0))],
-        ))
-        sections.append(_gauge(
-            "osiriscare_consent_token_pending",
-            "Consent request tokens currently pending approval",
-            [({}, float(pending_tokens or 0))],
-        ))
-    except Exception:
-        # Table missing pre-189 → silent skip
-        pass
-
-    # --- Substrate Integrity Engine: active violations (alert surface) ---
-    # Session 209 wired this gauge so Prometheus/alertmanager can
-    # page on sev1 invariants (`evidence_chain_stalled`,
-    # `flywheel_ledger_stalled`, `provisioning_stalled`, …) without
-    # a human having to refresh /admin/substrate-health. Emits one
-    # sample per active violation, or a single zero-value sentinel
-    # if the fleet is clean — dashboards don't render as "no data".
-    try:
-        async with admin_transaction(pool) as conn:
-            sv_rows = await conn.fetch("""
-                SELECT invariant_name,
-                       severity,
-                       COALESCE(site_id, '') AS site_id,
-                       minutes_open::float  AS minutes_open
-                  FROM v_substrate_violations_active
-            """)
-        if sv_rows:
-            sections.append(_gauge(
-                "osiriscare_substrate_violations_active",
-                "Active substrate invariant violations "
-                "(1 sample per open violation; labels: invariant_name, severity, site_id)",
-                [
-                    (
-                        {
-                            "invariant_name": r["invariant_name"][:80],
-                            "severity": r["severity"][:20],
-                            "site_id": (r["site_id"] or "")[:80],
-                        },
-                        1.0,
-                    )
-                    for r in sv_rows
-                ],
-            ))
-            sections.append(_gauge(
-                "osiriscare_substrate_violation_minutes_open",
-                "Minutes since each active substrate violation opened",
-                [
-                    (
-                        {
-                            "invariant_name": r["invariant_name"][:80],
-                            "severity": r["severity"][:20],
-                            "site_id": (r["site_id"] or "")[:80],
-                        },
-                        float(r["minutes_open"] or 0.0),
-                    )
-                    for r in sv_rows
-                ],
-            ))
-        else:
-            # Zero-rows sentinel so alertmanager can detect "all clear"
-            # and a dashboard query (sum by invariant_name) returns 0
-            # instead of no-data.
-            sections.append(_gauge(
-                "osiriscare_substrate_violations_active",
-                "Active substrate invariant violations "
-                "(1 sample per open violation; labels: invariant_name, severity, site_id)",
-                [({"invariant_name": "_none", "severity": "_none", "site_id": ""}, 0.0)],
-            ))
-    except Exception:
-        logger.exception("metrics: substrate_violations gauge query failed")
-
-    # --- Flywheel Spine: stuck rules + operator_ack_required ---
-    try:
-        async with admin_transaction(pool) as conn:
-            stuck = await conn.fetchval("""
-                SELECT COUNT(*) FROM promoted_rules
-                WHERE lifecycle_state IN
-                      ('proposed', 'shadow', 'approved', 'rolling_out')
-                  AND lifecycle_state_updated_at < NOW() - INTERVAL '3 days'
-            """)
-            ack_pending = await conn.fetchval("""
-                SELECT COUNT(*) FROM promoted_rules
-                WHERE operator_ack_required = TRUE
-                  AND operator_ack_at IS NULL
-            """)
-        sections.append(_gauge(
-            "osiriscare_flywheel_stuck_rules",
-            "Rules stuck in non-terminal state > 3 days",
-            [({}, float(stuck or 0))],
-        ))
-        sections.append(_gauge(
-            "osiriscare_flywheel_operator_ack_pending",
-            "Auto-disabled rules awaiting operator acknowledgement",
-            [({}, float(ack_pending or 0))],
-        ))
-    except Exception:
-        logger.exception("metrics: flywheel stuck/ack gauge query failed")
-
     # --- Open incidents by severity (gauge) ---
     try:
         async with admin_transaction(pool) as conn:
@@ -470,25 +231,11 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: execution telemetry query failed")
 
-    # --- Evidence bundles (counter) ---
+    # --- Fleet orders pending (gauge) ---
     try:
         async with admin_transaction(pool) as conn:
             row = await conn.fetchrow(
-                "SELECT COUNT(*) AS cnt FROM evidence_bundles"
-            )
-        sections.append(_counter(
-            "osiriscare_evidence_bundles_total",
-            "Total evidence bundles collected",
-            [({}, float(row["cnt"]))],
-        ))
-    except Exception:
-        logger.exception("metrics: evidence bundles query failed")
-
-    # --- Fleet orders pending (gauge) ---
-    try:
-        async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow(
-                "SELECT COUNT(*) AS cnt FROM fleet_orders WHERE status = 'active'"
+                "SELECT COUNT(*) AS cnt FROM fleet_orders WHERE status = 'active'"
             )
         sections.append(_gauge(
             "osiriscare_fleet_orders_pending",
@@ -515,91 +262,6 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: checkin rate query failed")
 
-    # --- Log entries total (counter) ---
-    # Use planner statistics instead of COUNT(*). log_entries is
-    # partitioned (~4.2M rows in 2026-05) and a full count was timing
-    # out 50+ times/hr at /api/metrics, masking every other gauge.
-    # pg_class.reltuples is updated on each ANALYZE — for a Prometheus
-    # counter this approximation is sufficient (and the metric is
-    # documented as approximate via the help text).
-    try:
-        async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow(
-                """
-                SELECT COALESCE(SUM(reltuples), 0)::bigint AS cnt
-                  FROM pg_class
-                 WHERE relname LIKE 'log_entries%'
-                   AND relkind IN ('r', 'p')
-                """
-            )
-        sections.append(_counter(
-            "osiriscare_log_entries_total",
-            "Total log entries ingested (approx, planner reltuples)",
-            [({}, float(row["cnt"]))],
-        ))
-    except Exception:
-        logger.exception("metrics: log entries query failed")
-
-    # --- Learning system metrics (gauge) ---
-    try:
-        async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
-                SELECT
-                    (SELECT COUNT(*) FROM aggregated_pattern_stats
-                     WHERE promotion_eligible = true) as eligible_patterns,
-                    (SELECT COUNT(*) FROM learning_promotion_candidates
-                     WHERE approval_status = 'pending') as pending_promotions,
-                    (SELECT COUNT(*) FROM learning_promotion_candidates
-                     WHERE approval_status = 'approved'
-                       AND approved_at > NOW() - INTERVAL '30 days') as recent_promotions
-            """)
-        sections.append(_gauge(
-            "osiriscare_learning_eligible_patterns",
-            "Patterns eligible for L2-to-L1 promotion",
-            [({}, float(row["eligible_patterns"]))],
-        ))
-        sections.append(_gauge(
-            "osiriscare_learning_pending_promotions",
-            "Promotion candidates awaiting approval",
-            [({}, float(row["pending_promotions"]))],
-        ))
-        sections.append(_gauge(
-            "osiriscare_learning_recent_promotions",
-            "Promotions approved in last 30 days",
-            [({}, float(row["recent_promotions"]))],
-        ))
-    except Exception:
-        logger.exception("metrics: learning system query failed")
-
-    # --- Escalation queue metrics (gauge) ---
-    try:
-        async with admin_transaction(pool) as conn:
-            rows = await conn.fetch("""
-                SELECT status, COUNT(*) as cnt,
-                       EXTRACT(EPOCH FROM AVG(NOW() - created_at)) as avg_age_secs
-                FROM escalation_tickets
-                WHERE status NOT IN ('resolved', 'closed')
-                GROUP BY status
-            """)
-        ticket_values = []
-        age_values = []
-        for row in rows:
-            ticket_values.append(({"status": row["status"]}, float(row["cnt"])))
-            age_values.append(({"status": row["status"]}, float(row["avg_age_secs"] or 0)))
-        if ticket_values:
-            sections.append(_gauge(
-                "osiriscare_escalation_tickets_open",
-                "Open escalation tickets by status",
-                ticket_values,
-            ))
-            sections.append(_gauge(
-                "osiriscare_escalation_ticket_age_seconds",
-                "Average age of open escalation tickets in seconds",
-                age_values,
-            ))
-    except Exception:
-        logger.exception("metrics: escalation queue query failed")
-
     # --- Device discovery metrics (gauge) ---
     try:
         async with admin_transaction(pool) as conn:
@@ -628,129 +290,256 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: device discovery query failed")
 
-    # --- CVE watch metrics (gauge) ---
+    # --- Mesh health (gauge) ---
     try:
+        # Per-site mesh state: ring size, peers, assignment coverage
         async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
+            rows = await conn.fetch("""
                 SELECT
-                    COUNT(*) as total_cves,
-                    COUNT(*) FILTER (WHERE severity = 'critical') as critical_cves,
-                    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') as new_7d
-                FROM cve_entries
+                    site_id,
+                    COUNT(*) as appliance_count,
+                    COUNT(*) FILTER (WHERE last_checkin > NOW() - INTERVAL '5 minutes') as online_count,
+                    AVG(
+                        CASE WHEN daemon_health IS NOT NULL
+                            THEN (daemon_health->>'mesh_ring_size')::int
+                            ELSE NULL END
+                    ) as avg_ring_size,
+                    AVG(
+                        CASE WHEN daemon_health IS NOT NULL
+                            THEN (daemon_health->>'mesh_peer_count')::int
+                            ELSE NULL END
+                    ) as avg_peer_count
+                FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-health gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
+                WHERE last_checkin > NOW() - INTERVAL '10 minutes'
+                GROUP BY site_id
+                HAVING COUNT(*) > 1
+            """)
+        if rows:
+            sections.append(_gauge(
+                "osiriscare_mesh_appliance_count",
+                "Number of appliances per mesh site",
+                [({"site": r["site_id"][:40]}, float(r["appliance_count"])) for r in rows],
+            ))
+            sections.append(_gauge(
+                "osiriscare_mesh_online_count",
+                "Online appliances per mesh site",
+                [({"site": r["site_id"][:40]}, float(r["online_count"])) for r in rows],
+            ))
+            sections.append(_gauge(
+                "osiriscare_mesh_avg_ring_size",
+                "Average ring size reported by appliances (should equal online_count)",
+                [({"site": r["site_id"][:40]}, float(r["avg_ring_size"] or 0)) for r in rows],
+            ))
+            sections.append(_gauge(
+                "osiriscare_mesh_avg_peer_count",
+                "Average peer count per appliance (should equal ring_size - 1)",
+                [({"site": r["site_id"][:40]}, float(r["avg_peer_count"] or 0)) for r in rows],
+            ))
+
+        # Assignment drift: ring_size vs online_count mismatch
+        async with admin_transaction(pool) as conn:
+            drift_row = await conn.fetchrow("""
+                SELECT COUNT(DISTINCT site_id) as drift_sites
+                FROM (
+                    SELECT site_id,
+                           COUNT(*) FILTER (WHERE last_checkin > NOW() - INTERVAL '5 minutes') as online,
+                           AVG((daemon_health->>'mesh_ring_size')::int) as ring
+                    FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-drift gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
+                    WHERE last_checkin > NOW() - INTERVAL '10 minutes'
+                      AND daemon_health IS NOT NULL
+                    GROUP BY site_id
+                    HAVING COUNT(*) > 1
+                ) s
+                WHERE s.online != s.ring
             """)
         sections.append(_gauge(
-            "osiriscare_cve_total",
-            "Total tracked CVEs",
-            [({}, float(row["total_cves"]))],
+            "osiriscare_mesh_drift_sites",
+            "Sites where ring size disagrees with online appliance count (alert if >0)",
+            [({}, float(drift_row["drift_sites"] or 0))],
         ))
+
+        # Coverage gaps: targets with wrong number of assignments
+        # (should be exactly 1 owner per target in a healthy mesh)
+        try:
+            async with admin_transaction(pool) as conn:
+                gap_row = await conn.fetchrow("""
+                    WITH all_targets AS (
+                        SELECT site_id,
+                               jsonb_array_elements_text(assigned_targets) as target
+                        FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-coverage gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
+                        WHERE assigned_targets IS NOT NULL
+                          AND last_checkin > NOW() - INTERVAL '10 minutes'
+                    )
+                    SELECT
+                        COUNT(*) FILTER (WHERE assignment_count > 1) as overlaps,
+                        COUNT(*) FILTER (WHERE assignment_count = 0) as orphans
+                    FROM (
+                        SELECT site_id, target, COUNT(*) as assignment_count
+                        FROM all_targets
+                        GROUP BY site_id, target
+                    ) t
+                """)
+            sections.append(_gauge(
+                "osiriscare_mesh_target_overlaps",
+                "Targets assigned to multiple appliances (duplicate scans, alert if >0)",
+                [({}, float(gap_row["overlaps"] or 0))],
+            ))
+            sections.append(_gauge(
+                "osiriscare_mesh_target_orphans",
+                "Targets with no owner (coverage hole, alert if >0)",
+                [({}, float(gap_row["orphans"] or 0))],
+            ))
+        except Exception:
+            pass
+
+        # Audit log rate (assignments changing per hour)
+        async with admin_transaction(pool) as conn:
+            audit_row = await conn.fetchrow("""
+                SELECT COUNT(*) as changes_1h
+                FROM mesh_assignment_audit
+                WHERE created_at > NOW() - INTERVAL '1 hour'
+            """)
         sections.append(_gauge(
-            "osiriscare_cve_critical",
-            "Critical severity CVEs",
-            [({}, float(row["critical_cves"]))],
+            "osiriscare_mesh_assignment_changes_1h",
+            "Mesh assignment changes in last hour (high rate = instability)",
+            [({}, float(audit_row["changes_1h"] or 0))],
         ))
+    except Exception:
+        logger.exception("metrics: mesh query failed")
+
+    return sections
+
+
+
+async def _collect_flywheel(pool, now: datetime) -> list[str]:
+    """Flywheel spine, learning pipeline, promotion + regime-change health."""
+    from .tenant_middleware import admin_transaction
+
+    sections: list[str] = []
+
+    # --- Flywheel Spine: lifecycle_state distribution ---
+    # Session 206 redesign: single source of truth for flywheel
+    # health. Every alert fires off this metric family.
+    try:
+        async with admin_transaction(pool) as conn:
+            lifecycle_rows = await conn.fetch("""
+                SELECT lifecycle_state, COUNT(*) AS n
+                FROM promoted_rules
+                GROUP BY lifecycle_state
+            """)
+        # Always emit all known states so dashboards don't render
+        # as "no data" when there are zero rules in a state.
+        all_states = [
+            "proposed", "shadow", "approved", "rolling_out",
+            "active", "regime_warning", "auto_disabled",
+            "graduated", "retired",
+        ]
+        counts = {r["lifecycle_state"]: int(r["n"]) for r in lifecycle_rows}
         sections.append(_gauge(
-            "osiriscare_cve_new_7d",
-            "CVEs discovered in last 7 days",
-            [({}, float(row["new_7d"]))],
+            "osiriscare_flywheel_rules_by_state",
+            "Promoted rules per lifecycle_state (Session 206 Spine)",
+            [
+                ({"state": s}, float(counts.get(s, 0)))
+                for s in all_states
+            ],
         ))
     except Exception:
-        logger.exception("metrics: CVE watch query failed")
+        logger.exception("metrics: flywheel lifecycle gauge query failed")
 
-    # --- Organization health (gauge) ---
+    # --- Flywheel Spine: event volume by type, last 1h ---
     try:
-        # Per-org counts
         async with admin_transaction(pool) as conn:
-            org_stats = await conn.fetch("""
-                SELECT
-                    co.id::text as org_id,
-                    co.name,
-                    co.status,
-                    co.max_sites,
-                    co.max_users,
-                    (SELECT COUNT(*) FROM sites WHERE client_org_id = co.id) as site_count,
-                    (SELECT COUNT(*) FROM client_users WHERE client_org_id = co.id) as user_count,
-                    (SELECT COUNT(*) FROM incidents i
-                     JOIN sites s ON s.site_id = i.site_id
-                     WHERE s.client_org_id = co.id
-                       AND i.reported_at > NOW() - INTERVAL '24 hours') as incidents_24h,
-                    co.baa_expiration_date,
-                    co.deprovisioned_at
-                FROM client_orgs co
-                WHERE co.deprovisioned_at IS NULL
+            evt_rows = await conn.fetch("""
+                SELECT event_type,
+                       COUNT(*) FILTER (WHERE outcome = 'success') AS ok,
+                       COUNT(*) FILTER (WHERE outcome = 'failed') AS failed
+                FROM promoted_rule_events
+                WHERE created_at > NOW() - INTERVAL '1 hour'
+                GROUP BY event_type
             """)
+        all_types = [
+            "pattern_detected", "shadow_evaluated", "promotion_approved",
+            "rollout_issued", "rollout_acked", "first_execution",
+            "regime_warning", "regime_critical", "regime_absolute_low",
+            "auto_disabled", "manually_disabled", "graduated",
+            "retired_site_dead", "retired_manual",
+            "operator_acknowledged", "operator_re_enabled",
+        ]
+        ok_by = {r["event_type"]: int(r["ok"]) for r in evt_rows}
+        fail_by = {r["event_type"]: int(r["failed"]) for r in evt_rows}
+        sections.append(_gauge(
+            "osiriscare_flywheel_events_1h",
+            "Flywheel state-transition events in last 1h by type + outcome",
+            [
+                ({"event_type": t, "outcome": "success"},
+                 float(ok_by.get(t, 0)))
+                for t in all_types
+            ] + [
+                ({"event_type": t, "outcome": "failed"},
+                 float(fail_by.get(t, 0)))
+                for t in all_types
+            ],
+        ))
+    except Exception:
+        logger.exception("metrics: flywheel events gauge query failed")
 
-        if org_stats:
-            sections.append(_gauge(
-                "osiriscare_orgs_total",
-                "Total active organizations",
-                [({}, float(len(org_stats)))],
-            ))
-            sections.append(_gauge(
-                "osiriscare_org_sites",
-                "Number of sites per organization",
-                [({"org": o["name"][:40]}, float(o["site_count"])) for o in org_stats],
-            ))
-            sections.append(_gauge(
-                "osiriscare_org_users",
-                "Number of client_users per organization",
-                [({"org": o["name"][:40]}, float(o["user_count"])) for o in org_stats],
-            ))
-            sections.append(_gauge(
-                "osiriscare_org_incidents_24h",
-                "Incidents per organization in last 24h",
-                [({"org": o["name"][:40]}, float(o["incidents_24h"])) for o in org_stats],
-            ))
-            # Quota usage as percentage
-            site_quota = [
-                ({"org": o["name"][:40]},
-                 float(o["site_count"]) / max(o["max_sites"] or 1, 1) * 100)
-                for o in org_stats if o["max_sites"]
-            ]
-            if site_quota:
-                sections.append(_gauge(
-                    "osiriscare_org_site_quota_pct",
-                    "Site quota usage percentage per org (alert if >90)",
-                    site_quota,
-                ))
-
-        # BAA expiration alerts
+    # --- Flywheel Spine: stuck rules + operator_ack_required ---
+    try:
         async with admin_transaction(pool) as conn:
-            baa_expiring = await conn.fetchval("""
-                SELECT COUNT(*) FROM client_orgs
-                WHERE baa_expiration_date IS NOT NULL
-                  AND baa_expiration_date <= CURRENT_DATE + INTERVAL '30 days'
-                  AND baa_expiration_date > CURRENT_DATE
-                  AND deprovisioned_at IS NULL
+            stuck = await conn.fetchval("""
+                SELECT COUNT(*) FROM promoted_rules
+                WHERE lifecycle_state IN
+                      ('proposed', 'shadow', 'approved', 'rolling_out')
+                  AND lifecycle_state_updated_at < NOW() - INTERVAL '3 days'
             """)
-            baa_expired = await conn.fetchval("""
-                SELECT COUNT(*) FROM client_orgs
-                WHERE baa_expiration_date IS NOT NULL
-                  AND baa_expiration_date <= CURRENT_DATE
-                  AND deprovisioned_at IS NULL
+            ack_pending = await conn.fetchval("""
+                SELECT COUNT(*) FROM promoted_rules
+                WHERE operator_ack_required = TRUE
+                  AND operator_ack_at IS NULL
             """)
         sections.append(_gauge(
-            "osiriscare_org_baa_expiring_30d",
-            "Orgs with BAA expiring in next 30 days",
-            [({}, float(baa_expiring or 0))],
+            "osiriscare_flywheel_stuck_rules",
+            "Rules stuck in non-terminal state > 3 days",
+            [({}, float(stuck or 0))],
         ))
         sections.append(_gauge(
-            "osiriscare_org_baa_expired",
-            "Orgs with expired BAA (CRITICAL — blocks operations)",
-            [({}, float(baa_expired or 0))],
+            "osiriscare_flywheel_operator_ack_pending",
+            "Auto-disabled rules awaiting operator acknowledgement",
+            [({}, float(ack_pending or 0))],
         ))
+    except Exception:
+        logger.exception("metrics: flywheel stuck/ack gauge query failed")
 
-        # Deprovisioned orgs (audit trail)
+    # --- Learning system metrics (gauge) ---
+    try:
         async with admin_transaction(pool) as conn:
-            deprov = await conn.fetchval("""
-                SELECT COUNT(*) FROM client_orgs WHERE deprovisioned_at IS NOT NULL
+            row = await conn.fetchrow("""
+                SELECT
+                    (SELECT COUNT(*) FROM aggregated_pattern_stats
+                     WHERE promotion_eligible = true) as eligible_patterns,
+                    (SELECT COUNT(*) FROM learning_promotion_candidates
+                     WHERE approval_status = 'pending') as pending_promotions,
+                    (SELECT COUNT(*) FROM learning_promotion_candidates
+                     WHERE approval_status = 'approved'
+                       AND approved_at > NOW() - INTERVAL '30 days') as recent_promotions
             """)
         sections.append(_gauge(
-            "osiriscare_orgs_deprovisioned",
-            "Orgs in deprovisioning/retention state",
-            [({}, float(deprov or 0))],
+            "osiriscare_learning_eligible_patterns",
+            "Patterns eligible for L2-to-L1 promotion",
+            [({}, float(row["eligible_patterns"]))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_learning_pending_promotions",
+            "Promotion candidates awaiting approval",
+            [({}, float(row["pending_promotions"]))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_learning_recent_promotions",
+            "Promotions approved in last 30 days",
+            [({}, float(row["recent_promotions"]))],
         ))
     except Exception:
-        logger.exception("metrics: org query failed")
+        logger.exception("metrics: learning system query failed")
 
     # --- Flywheel promotion pipeline health (gauge) ---
     try:
@@ -865,122 +654,168 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: flywheel query failed")
 
-    # --- Mesh health (gauge) ---
+    # --- Pattern sync health (gauge) ---
     try:
-        # Per-site mesh state: ring size, peers, assignment coverage
         async with admin_transaction(pool) as conn:
-            rows = await conn.fetch("""
+            row = await conn.fetchrow("""
                 SELECT
-                    site_id,
-                    COUNT(*) as appliance_count,
-                    COUNT(*) FILTER (WHERE last_checkin > NOW() - INTERVAL '5 minutes') as online_count,
-                    AVG(
-                        CASE WHEN daemon_health IS NOT NULL
-                            THEN (daemon_health->>'mesh_ring_size')::int
-                            ELSE NULL END
-                    ) as avg_ring_size,
-                    AVG(
-                        CASE WHEN daemon_health IS NOT NULL
-                            THEN (daemon_health->>'mesh_peer_count')::int
-                            ELSE NULL END
-                    ) as avg_peer_count
-                FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-health gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
-                WHERE last_checkin > NOW() - INTERVAL '10 minutes'
-                GROUP BY site_id
-                HAVING COUNT(*) > 1
+                    COUNT(*) FILTER (WHERE sync_status = 'success') as success,
+                    COUNT(*) FILTER (WHERE sync_status = 'partial') as partial,
+                    COUNT(*) FILTER (WHERE sync_status = 'failed') as failed
+                FROM appliance_pattern_sync
+                WHERE synced_at > NOW() - INTERVAL '24 hours'
             """)
-        if rows:
-            sections.append(_gauge(
-                "osiriscare_mesh_appliance_count",
-                "Number of appliances per mesh site",
-                [({"site": r["site_id"][:40]}, float(r["appliance_count"])) for r in rows],
-            ))
-            sections.append(_gauge(
-                "osiriscare_mesh_online_count",
-                "Online appliances per mesh site",
-                [({"site": r["site_id"][:40]}, float(r["online_count"])) for r in rows],
-            ))
-            sections.append(_gauge(
-                "osiriscare_mesh_avg_ring_size",
-                "Average ring size reported by appliances (should equal online_count)",
-                [({"site": r["site_id"][:40]}, float(r["avg_ring_size"] or 0)) for r in rows],
-            ))
-            sections.append(_gauge(
-                "osiriscare_mesh_avg_peer_count",
-                "Average peer count per appliance (should equal ring_size - 1)",
-                [({"site": r["site_id"][:40]}, float(r["avg_peer_count"] or 0)) for r in rows],
-            ))
+        sections.append(_gauge(
+            "osiriscare_pattern_sync_24h",
+            "Pattern sync results in last 24 hours",
+            [
+                ({"status": "success"}, float(row["success"])),
+                ({"status": "partial"}, float(row["partial"])),
+                ({"status": "failed"}, float(row["failed"])),
+            ],
+        ))
+    except Exception:
+        logger.exception("metrics: pattern sync query failed")
 
-        # Assignment drift: ring_size vs online_count mismatch
+    # --- Flywheel health (3 gauges from Session 205 audit) ---
+    # Why these three: each one would have caught the broken flywheel
+    # weeks before the manual audit did.
+    #
+    # 1) L2 success ratio < 50% over 24h means LLM is producing useless
+    #    output that incurs cost without resolving incidents.
+    # 2) promotions_deployed_7d == 0 means the data-flywheel loop is
+    #    not closed: rules may promote but never reach an appliance.
+    # 3) orphan_runbooks > 0 means promoted L1 rules reference a
+    #    runbook_id that doesn't exist — they will fail on execution.
+    try:
         async with admin_transaction(pool) as conn:
-            drift_row = await conn.fetchrow("""
-                SELECT COUNT(DISTINCT site_id) as drift_sites
-                FROM (
-                    SELECT site_id,
-                           COUNT(*) FILTER (WHERE last_checkin > NOW() - INTERVAL '5 minutes') as online,
-                           AVG((daemon_health->>'mesh_ring_size')::int) as ring
-                    FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-drift gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
-                    WHERE last_checkin > NOW() - INTERVAL '10 minutes'
-                      AND daemon_health IS NOT NULL
-                    GROUP BY site_id
-                    HAVING COUNT(*) > 1
-                ) s
-                WHERE s.online != s.ring
+            l2_row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE success) as successes,
+                    COUNT(*) as total
+                FROM execution_telemetry
+                WHERE resolution_level = 'L2'
+                  AND created_at > NOW() - INTERVAL '24 hours'
             """)
+        total = float(l2_row["total"] or 0)
+        successes = float(l2_row["successes"] or 0)
+        ratio = (successes / total) if total > 0 else 1.0
         sections.append(_gauge(
-            "osiriscare_mesh_drift_sites",
-            "Sites where ring size disagrees with online appliance count (alert if >0)",
-            [({}, float(drift_row["drift_sites"] or 0))],
+            "osiriscare_flywheel_l2_success_ratio_24h",
+            "L2 LLM success ratio over last 24 hours (1.0 = all succeeded)",
+            [({}, ratio)],
+        ))
+        sections.append(_gauge(
+            "osiriscare_flywheel_l2_calls_24h",
+            "L2 LLM call count over last 24 hours",
+            [({}, total)],
         ))
+    except Exception:
+        logger.exception("metrics: L2 success ratio query failed")
 
-        # Coverage gaps: targets with wrong number of assignments
-        # (should be exactly 1 owner per target in a healthy mesh)
-        try:
-            async with admin_transaction(pool) as conn:
-                gap_row = await conn.fetchrow("""
-                    WITH all_targets AS (
-                        SELECT site_id,
-                               jsonb_array_elements_text(assigned_targets) as target
-                        FROM site_appliances  -- noqa: site-appliances-deleted-include — operator-only mesh-coverage gauge; 10-minute last_checkin filter implicitly excludes soft-deleted rows
-                        WHERE assigned_targets IS NOT NULL
-                          AND last_checkin > NOW() - INTERVAL '10 minutes'
-                    )
-                    SELECT
-                        COUNT(*) FILTER (WHERE assignment_count > 1) as overlaps,
-                        COUNT(*) FILTER (WHERE assignment_count = 0) as orphans
-                    FROM (
-                        SELECT site_id, target, COUNT(*) as assignment_count
-                        FROM all_targets
-                        GROUP BY site_id, target
-                    ) t
-                """)
-            sections.append(_gauge(
-                "osiriscare_mesh_target_overlaps",
-                "Targets assigned to multiple appliances (duplicate scans, alert if >0)",
-                [({}, float(gap_row["overlaps"] or 0))],
-            ))
-            sections.append(_gauge(
-                "osiriscare_mesh_target_orphans",
-                "Targets with no owner (coverage hole, alert if >0)",
-                [({}, float(gap_row["orphans"] or 0))],
-            ))
-        except Exception:
-            pass
+    try:
+        async with admin_transaction(pool) as conn:
+            row = await conn.fetchrow("""
+                SELECT COALESCE(SUM(deployment_count), 0) as deployments
+                FROM promoted_rules
+                WHERE last_deployed_at > NOW() - INTERVAL '7 days'
+            """)
+        sections.append(_gauge(
+            "osiriscare_flywheel_promotions_deployed_7d",
+            "Total promoted-rule deployments to appliances in last 7 days",
+            [({}, float(row["deployments"] or 0))],
+        ))
+    except Exception:
+        logger.exception("metrics: promotion deployment query failed")
 
-        # Audit log rate (assignments changing per hour)
+    try:
         async with admin_transaction(pool) as conn:
-            audit_row = await conn.fetchrow("""
-                SELECT COUNT(*) as changes_1h
-                FROM mesh_assignment_audit
-                WHERE created_at > NOW() - INTERVAL '1 hour'
+            row = await conn.fetchrow("""
+                SELECT COUNT(*) as orphans
+                FROM l1_rules l
+                LEFT JOIN runbooks r ON r.runbook_id = l.runbook_id
+                WHERE l.promoted_from_l2 = true
+                  AND l.enabled = true
+                  AND r.runbook_id IS NULL
+            """)
+        sections.append(_gauge(
+            "osiriscare_flywheel_orphan_runbooks",
+            "Promoted L1 rules referencing a runbook_id missing from runbooks library",
+            [({}, float(row["orphans"] or 0))],
+        ))
+    except Exception:
+        logger.exception("metrics: orphan runbooks query failed")
+
+    # Phase 6: regime change events in the last 7 days (unacknowledged)
+    try:
+        async with admin_transaction(pool) as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE severity = 'warning')  AS warnings,
+                    COUNT(*) FILTER (WHERE severity = 'critical') AS criticals
+                FROM l1_rule_regime_events
+                WHERE detected_at > NOW() - INTERVAL '7 days'
+                  AND acknowledged_at IS NULL
             """)
         sections.append(_gauge(
-            "osiriscare_mesh_assignment_changes_1h",
-            "Mesh assignment changes in last hour (high rate = instability)",
-            [({}, float(audit_row["changes_1h"] or 0))],
+            "osiriscare_flywheel_regime_changes_7d",
+            "L1 rule regime-change events (7d, unacknowledged) by severity",
+            [
+                ({"severity": "warning"},  float(row["warnings"] or 0)),
+                ({"severity": "critical"}, float(row["criticals"] or 0)),
+            ],
         ))
     except Exception:
-        logger.exception("metrics: mesh query failed")
+        logger.exception("metrics: regime change query failed")
+
+    return sections
+
+
+
+async def _collect_evidence(pool, now: datetime) -> list[str]:
+    """Evidence bundle, log ingest and OTS pipeline volumes."""
+    from .tenant_middleware import admin_transaction
+
+    sections: list[str] = []
+
+    # --- Evidence bundles (counter) ---
+    try:
+        async with admin_transaction(pool) as conn:
+            row = await conn.fetchrow(
+                "SELECT COUNT(*) AS cnt FROM evidence_bundles"
+            )
+        sections.append(_counter(
+            "osiriscare_evidence_bundles_total",
+            "Total evidence bundles collected",
+            [({}, float(row["cnt"]))],
+        ))
+    except Exception:
+        logger.exception("metrics: evidence bundles query failed")
+
+    # --- Log entries total (counter) ---
+    # Use planner statistics instead of COUNT(*). log_entries is
+    # partitioned (~4.2M rows in 2026-05) and a full count was timing
+    # out 50+ times/hr at /api/metrics, masking every other gauge.
+    # pg_class.reltuples is updated on each ANALYZE — for a Prometheus
+    # counter this approximation is sufficient (and the metric is
+    # documented as approximate via the help text).
+    try:
+        async with admin_transaction(pool) as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT COALESCE(SUM(reltuples), 0)::bigint AS cnt
+                  FROM pg_class
+                 WHERE relname LIKE 'log_entries%'
+                   AND relkind IN ('r', 'p')
+                """
+            )
+        sections.append(_counter(
+            "osiriscare_log_entries_total",
+            "Total log entries ingested (approx, planner reltuples)",
+            [({}, float(row["cnt"]))],
+        ))
+    except Exception:
+        logger.exception("metrics: log entries query failed")
 
     # --- OTS proof pipeline health (gauge) ---
     try:
@@ -1056,97 +891,307 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: OTS calendar query failed")
 
-    # --- Pattern sync health (gauge) ---
+    return sections
+
+
+
+async def _collect_governance(pool, now: datetime) -> list[str]:
+    """Consent, substrate violations, escalations, CVE, org/BAA, privileged-access and install-gate surfaces."""
+    from .tenant_middleware import admin_transaction
+
+    sections: list[str] = []
+
+    # --- Migration 184 Phase 4 consent metrics ---
+    # Grants, revokes, executed-with-consent events, and expired
+    # request tokens — all labeled by class_id so the SRE
+    # dashboard can spot per-class trends.
     try:
         async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
+            consent_events = await conn.fetch("""
                 SELECT
-                    COUNT(*) FILTER (WHERE sync_status = 'success') as success,
-                    COUNT(*) FILTER (WHERE sync_status = 'partial') as partial,
-                    COUNT(*) FILTER (WHERE sync_status = 'failed') as failed
-                FROM appliance_pattern_sync
-                WHERE synced_at > NOW() - INTERVAL '24 hours'
+                    COALESCE(SUBSTR(rule_id, 9, POSITION('@' IN rule_id) - 9), '?') AS class_id,
+                    event_type,
+                    COUNT(*) AS n
+                FROM promoted_rule_events
+                WHERE event_type LIKE 'runbook.%'
+                  AND created_at > NOW() - INTERVAL '7 days'
+                GROUP BY 1, 2
+            """)
+        if consent_events:
+            grants = [
+                ({"class_id": r["class_id"]}, float(r["n"]))
+                for r in consent_events if r["event_type"] == "runbook.consented"
+            ]
+            revokes = [
+                ({"class_id": r["class_id"]}, float(r["n"]))
+                for r in consent_events if r["event_type"] == "runbook.revoked"
+            ]
+            executed_with = [
+                ({"class_id": r["class_id"], "outcome": "with_consent"},
+                 float(r["n"]))
+                for r in consent_events
+                if r["event_type"] == "runbook.executed_with_consent"
+            ]
+            if grants:
+                sections.append(_gauge(
+                    "osiriscare_consent_grants_7d",
+                    "Class-level consent grants in last 7d by class_id",
+                    grants,
+                ))
+            if revokes:
+                sections.append(_gauge(
+                    "osiriscare_consent_revokes_7d",
+                    "Class-level consent revokes in last 7d by class_id",
+                    revokes,
+                ))
+            if executed_with:
+                sections.append(_gauge(
+                    "osiriscare_consent_executed_7d",
+                    "runbook.executed_with_consent events in last 7d",
+                    executed_with,
+                ))
+    except Exception:
+        logger.exception("metrics: consent events query failed")
+
+    try:
+        async with admin_transaction(pool) as conn:
+            # Tokens that expired unconsumed — delivery health signal
+            expired_tokens = await conn.fetchval("""
+                SELECT COUNT(*) FROM consent_request_tokens
+                WHERE consumed_at IS NULL AND expires_at < NOW()
+                  AND expires_at > NOW() - INTERVAL '7 days'
+            """)
+            pending_tokens = await conn.fetchval("""
+                SELECT COUNT(*) FROM consent_request_tokens
+                WHERE consumed_at IS NULL AND expires_at > NOW()
             """)
         sections.append(_gauge(
-            "osiriscare_pattern_sync_24h",
-            "Pattern sync results in last 24 hours",
-            [
-                ({"status": "success"}, float(row["success"])),
-                ({"status": "partial"}, float(row["partial"])),
-                ({"status": "failed"}, float(row["failed"])),
-            ],
+            "osiriscare_consent_token_expired_7d",
+            "Consent request tokens that expired unconsumed in last 7d",
+            [({}, float(expired_tokens or 0))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_consent_token_pending",
+            "Consent request tokens currently pending approval",
+            [({}, float(pending_tokens or 0))],
         ))
     except Exception:
-        logger.exception("metrics: pattern sync query failed")
+        # Table missing pre-189 → silent skip
+        pass
 
-    # --- Flywheel health (3 gauges from Session 205 audit) ---
-    # Why these three: each one would have caught the broken flywheel
-    # weeks before the manual audit did.
-    #
-    # 1) L2 success ratio < 50% over 24h means LLM is producing useless
-    #    output that incurs cost without resolving incidents.
-    # 2) promotions_deployed_7d == 0 means the data-flywheel loop is
-    #    not closed: rules may promote but never reach an appliance.
-    # 3) orphan_runbooks > 0 means promoted L1 rules reference a
-    #    runbook_id that doesn't exist — they will fail on execution.
+    # --- Substrate Integrity Engine: active violations (alert surface) ---
+    # Session 209 wired this gauge so Prometheus/alertmanager can
+    # page on sev1 invariants (`evidence_chain_stalled`,
+    # `flywheel_ledger_stalled`, `provisioning_stalled`, …) without
+    # a human having to refresh /admin/substrate-health. Emits one
+    # sample per active violation, or a single zero-value sentinel
+    # if the fleet is clean — dashboards don't render as "no data".
+    try:
+        async with admin_transaction(pool) as conn:
+            sv_rows = await conn.fetch("""
+                SELECT invariant_name,
+                       severity,
+                       COALESCE(site_id, '') AS site_id,
+                       minutes_open::float  AS minutes_open
+                  FROM v_substrate_violations_active
+            """)
+        if sv_rows:
+            sections.append(_gauge(
+                "osiriscare_substrate_violations_active",
+                "Active substrate invariant violations "
+                "(1 sample per open violation; labels: invariant_name, severity, site_id)",
+                [
+                    (
+                        {
+                            "invariant_name": r["invariant_name"][:80],
+                            "severity": r["severity"][:20],
+                            "site_id": (r["site_id"] or "")[:80],
+                        },
+                        1.0,
+                    )
+                    for r in sv_rows
+                ],
+            ))
+            sections.append(_gauge(
+                "osiriscare_substrate_violation_minutes_open",
+                "Minutes since each active substrate violation opened",
+                [
+                    (
+                        {
+                            "invariant_name": r["invariant_name"][:80],
+                            "severity": r["severity"][:20],
+                            "site_id": (r["site_id"] or "")[:80],
+                        },
+                        float(r["minutes_open"] or 0.0),
+                    )
+                    for r in sv_rows
+                ],
+            ))
+        else:
+            # Zero-rows sentinel so alertmanager can detect "all clear"
+            # and a dashboard query (sum by invariant_name) returns 0
+            # instead of no-data.
+            sections.append(_gauge(
+                "osiriscare_substrate_violations_active",
+                "Active substrate invariant violations "
+                "(1 sample per open violation; labels: invariant_name, severity, site_id)",
+                [({"invariant_name": "_none", "severity": "_none", "site_id": ""}, 0.0)],
+            ))
+    except Exception:
+        logger.exception("metrics: substrate_violations gauge query failed")
+
+    # --- Escalation queue metrics (gauge) ---
+    try:
+        async with admin_transaction(pool) as conn:
+            rows = await conn.fetch("""
+                SELECT status, COUNT(*) as cnt,
+                       EXTRACT(EPOCH FROM AVG(NOW() - created_at)) as avg_age_secs
+                FROM escalation_tickets
+                WHERE status NOT IN ('resolved', 'closed')
+                GROUP BY status
+            """)
+        ticket_values = []
+        age_values = []
+        for row in rows:
+            ticket_values.append(({"status": row["status"]}, float(row["cnt"])))
+            age_values.append(({"status": row["status"]}, float(row["avg_age_secs"] or 0)))
+        if ticket_values:
+            sections.append(_gauge(
+                "osiriscare_escalation_tickets_open",
+                "Open escalation tickets by status",
+                ticket_values,
+            ))
+            sections.append(_gauge(
+                "osiriscare_escalation_ticket_age_seconds",
+                "Average age of open escalation tickets in seconds",
+                age_values,
+            ))
+    except Exception:
+        logger.exception("metrics: escalation queue query failed")
+
+    # --- CVE watch metrics (gauge) ---
     try:
         async with admin_transaction(pool) as conn:
-            l2_row = await conn.fetchrow("""
+            row = await conn.fetchrow("""
                 SELECT
-                    COUNT(*) FILTER (WHERE success) as successes,
-                    COUNT(*) as total
-                FROM execution_telemetry
-                WHERE resolution_level = 'L2'
-                  AND created_at > NOW() - INTERVAL '24 hours'
+                    COUNT(*) as total_cves,
+                    COUNT(*) FILTER (WHERE severity = 'critical') as critical_cves,
+                    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') as new_7d
+                FROM cve_entries
             """)
-        total = float(l2_row["total"] or 0)
-        successes = float(l2_row["successes"] or 0)
-        ratio = (successes / total) if total > 0 else 1.0
         sections.append(_gauge(
-            "osiriscare_flywheel_l2_success_ratio_24h",
-            "L2 LLM success ratio over last 24 hours (1.0 = all succeeded)",
-            [({}, ratio)],
+            "osiriscare_cve_total",
+            "Total tracked CVEs",
+            [({}, float(row["total_cves"]))],
         ))
         sections.append(_gauge(
-            "osiriscare_flywheel_l2_calls_24h",
-            "L2 LLM call count over last 24 hours",
-            [({}, total)],
+            "osiriscare_cve_critical",
+            "Critical severity CVEs",
+            [({}, float(row["critical_cves"]))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_cve_new_7d",
+            "CVEs discovered in last 7 days",
+            [({}, float(row["new_7d"]))],
         ))
     except Exception:
-        logger.exception("metrics: L2 success ratio query failed")
+        logger.exception("metrics: CVE watch query failed")
 
+    # --- Organization health (gauge) ---
     try:
+        # Per-org counts
         async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
-                SELECT COALESCE(SUM(deployment_count), 0) as deployments
-                FROM promoted_rules
-                WHERE last_deployed_at > NOW() - INTERVAL '7 days'
+            org_stats = await conn.fetch("""
+                SELECT
+                    co.id::text as org_id,
+                    co.name,
+                    co.status,
+                    co.max_sites,
+                    co.max_users,
+                    (SELECT COUNT(*) FROM sites WHERE client_org_id = co.id) as site_count,
+                    (SELECT COUNT(*) FROM client_users WHERE client_org_id = co.id) as user_count,
+                    (SELECT COUNT(*) FROM incidents i
+                     JOIN sites s ON s.site_id = i.site_id
+                     WHERE s.client_org_id = co.id
+                       AND i.reported_at > NOW() - INTERVAL '24 hours') as incidents_24h,
+                    co.baa_expiration_date,
+                    co.deprovisioned_at
+                FROM client_orgs co
+                WHERE co.deprovisioned_at IS NULL
+            """)
+
+        if org_stats:
+            sections.append(_gauge(
+                "osiriscare_orgs_total",
+                "Total active organizations",
+                [({}, float(len(org_stats)))],
+            ))
+            sections.append(_gauge(
+                "osiriscare_org_sites",
+                "Number of sites per organization",
+                [({"org": o["name"][:40]}, float(o["site_count"])) for o in org_stats],
+            ))
+            sections.append(_gauge(
+                "osiriscare_org_users",
+                "Number of client_users per organization",
+                [({"org": o["name"][:40]}, float(o["user_count"])) for o in org_stats],
+            ))
+            sections.append(_gauge(
+                "osiriscare_org_incidents_24h",
+                "Incidents per organization in last 24h",
+                [({"org": o["name"][:40]}, float(o["incidents_24h"])) for o in org_stats],
+            ))
+            # Quota usage as percentage
+            site_quota = [
+                ({"org": o["name"][:40]},
+                 float(o["site_count"]) / max(o["max_sites"] or 1, 1) * 100)
+                for o in org_stats if o["max_sites"]
+            ]
+            if site_quota:
+                sections.append(_gauge(
+                    "osiriscare_org_site_quota_pct",
+                    "Site quota usage percentage per org (alert if >90)",
+                    site_quota,
+                ))
+
+        # BAA expiration alerts
+        async with admin_transaction(pool) as conn:
+            baa_expiring = await conn.fetchval("""
+                SELECT COUNT(*) FROM client_orgs
+                WHERE baa_expiration_date IS NOT NULL
+                  AND baa_expiration_date <= CURRENT_DATE + INTERVAL '30 days'
+                  AND baa_expiration_date > CURRENT_DATE
+                  AND deprovisioned_at IS NULL
+            """)
+            baa_expired = await conn.fetchval("""
+                SELECT COUNT(*) FROM client_orgs
+                WHERE baa_expiration_date IS NOT NULL
+                  AND baa_expiration_date <= CURRENT_DATE
+                  AND deprovisioned_at IS NULL
             """)
         sections.append(_gauge(
-            "osiriscare_flywheel_promotions_deployed_7d",
-            "Total promoted-rule deployments to appliances in last 7 days",
-            [({}, float(row["deployments"] or 0))],
+            "osiriscare_org_baa_expiring_30d",
+            "Orgs with BAA expiring in next 30 days",
+            [({}, float(baa_expiring or 0))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_org_baa_expired",
+            "Orgs with expired BAA (CRITICAL — blocks operations)",
+            [({}, float(baa_expired or 0))],
         ))
-    except Exception:
-        logger.exception("metrics: promotion deployment query failed")
 
-    try:
+        # Deprovisioned orgs (audit trail)
         async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
-                SELECT COUNT(*) as orphans
-                FROM l1_rules l
-                LEFT JOIN runbooks r ON r.runbook_id = l.runbook_id
-                WHERE l.promoted_from_l2 = true
-                  AND l.enabled = true
-                  AND r.runbook_id IS NULL
+            deprov = await conn.fetchval("""
+                SELECT COUNT(*) FROM client_orgs WHERE deprovisioned_at IS NOT NULL
             """)
         sections.append(_gauge(
-            "osiriscare_flywheel_orphan_runbooks",
-            "Promoted L1 rules referencing a runbook_id missing from runbooks library",
-            [({}, float(row["orphans"] or 0))],
+            "osiriscare_orgs_deprovisioned",
+            "Orgs in deprovisioning/retention state",
+            [({}, float(deprov or 0))],
         ))
     except Exception:
-        logger.exception("metrics: orphan runbooks query failed")
+        logger.exception("metrics: org query failed")
 
     # Phase 14 T2: notifier queue depth. > 0 for more than a few
     # minutes means email delivery is stuck — investigate SMTP.
@@ -1322,32 +1367,132 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: install_gate_failing query failed")
 
-    # Phase 6: regime change events in the last 7 days (unacknowledged)
-    try:
-        async with admin_transaction(pool) as conn:
-            row = await conn.fetchrow("""
-                SELECT
-                    COUNT(*) FILTER (WHERE severity = 'warning')  AS warnings,
-                    COUNT(*) FILTER (WHERE severity = 'critical') AS criticals
-                FROM l1_rule_regime_events
-                WHERE detected_at > NOW() - INTERVAL '7 days'
-                  AND acknowledged_at IS NULL
-            """)
-        sections.append(_gauge(
-            "osiriscare_flywheel_regime_changes_7d",
-            "L1 rule regime-change events (7d, unacknowledged) by severity",
-            [
-                ({"severity": "warning"},  float(row["warnings"] or 0)),
-                ({"severity": "critical"}, float(row["criticals"] or 0)),
-            ],
-        ))
-    except Exception:
-        logger.exception("metrics: regime change query failed")
+    return sections
+
+
+
+# Family -> (collector, refresh interval seconds). Intervals are chosen
+# per alerting need: `fleet` + `governance` back paging rules (offline
+# appliance, sev1 substrate violation, missing chain triggers) so they
+# refresh every minute or faster; flywheel/evidence feed trend panels.
+_FAMILIES: dict[str, tuple[Callable[..., Awaitable[list[str]]], int]] = {
+    "fleet": (_collect_fleet, 30),
+    "governance": (_collect_governance, 60),
+    "evidence": (_collect_evidence, 120),
+    "flywheel": (_collect_flywheel, 300),
+}
+
+# Collector tick — each tick refreshes only the families whose interval
+# has elapsed. Shortest family interval bounds staleness, not this.
+METRICS_COLLECTOR_TICK_SECONDS = 15
+
+
+@dataclass
+class _FamilySnapshot:
+    body: str
+    collected_at: float      # unix seconds of the last successful collect
+    duration_s: float        # wall time of the last collect attempt
+    ok: bool                 # last attempt raised? (body is then the previous one)
+
+
+_SNAPSHOTS: dict[str, _FamilySnapshot] = {}
+_COLLECT_LOCKS: dict[str, asyncio.Lock] = {}
+
+
+async def _collect_family(name: str, pool) -> None:
+    """Run one family collector and swap its snapshot in. Single-flight
+    per family so a cold-start scrape and the loop never double-query."""
+    collector, _ = _FAMILIES[name]
+    lock = _COLLECT_LOCKS.setdefault(name, asyncio.Lock())
+    async with lock:
+        started = time.monotonic()
+        try:
+            sections = await collector(pool, datetime.now(timezone.utc))
+        except Exception:
+            logger.exception(f"metrics: family {name} collection failed")
+            prev = _SNAPSHOTS.get(name)
+            _SNAPSHOTS[name] = _FamilySnapshot(
+                body=prev.body if prev else "",
+                collected_at=prev.collected_at if prev else 0.0,
+                duration_s=time.monotonic() - started,
+                ok=False,
+            )
+            return
+        _SNAPSHOTS[name] = _FamilySnapshot(
+            body="\n\n".join(sections),
+            collected_at=time.time(),
+            duration_s=time.monotonic() - started,
+            ok=True,
+        )
 
 
+async def refresh_due_families(pool, *, missing_only: bool = False) -> None:
+    """Collect every family whose interval has elapsed (or, with
+    ``missing_only``, only families that have never been collected)."""
+    now = time.time()
+    for name, (_, interval) in _FAMILIES.items():
+        snap = _SNAPSHOTS.get(name)
+        if snap is None or (not missing_only and now - snap.collected_at >= interval):
+            await _collect_family(name, pool)
+
+
+async def metrics_collector_loop():
+    """Background refresher for the slow metric families.
+
+    Families are collected sequentially so the collector holds at most
+    one pool connection at a time, whatever the scrape rate.
+    """
+    from .bg_heartbeat import record_heartbeat
+    from .fleet import get_pool
+
+    while True:
+        try:
+            pool = await get_pool()
+            await refresh_due_families(pool)
+            record_heartbeat("metrics_collector")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("metrics_collector_loop iteration failed")
+            record_heartbeat("metrics_collector", ok=False)
+        await asyncio.sleep(METRICS_COLLECTOR_TICK_SECONDS)
+
+
+def _render_snapshot_freshness() -> list[str]:
+    """Per-family freshness + collection-cost gauges."""
+    now = time.time()
+    snaps = sorted(_SNAPSHOTS.items())
+    return [
+        _gauge(
+            "osiriscare_metrics_family_last_collected_timestamp",
+            "Unix time the metric family snapshot was last collected successfully",
+            [({"family": n}, float(s.collected_at)) for n, s in snaps],
+        ),
+        _gauge(
+            "osiriscare_metrics_family_age_seconds",
+            "Seconds since the metric family snapshot was collected (served values are this old)",
+            [({"family": n}, round(now - s.collected_at, 3)) for n, s in snaps],
+        ),
+        _gauge(
+            "osiriscare_metrics_family_collection_seconds",
+            "Wall time of the last collection attempt per metric family (DB cost)",
+            [({"family": n}, round(s.duration_s, 6)) for n, s in snaps],
+        ),
+        _gauge(
+            "osiriscare_metrics_family_up",
+            "1 if the last collection of the metric family succeeded, 0 if it raised",
+            [({"family": n}, 1.0 if s.ok else 0.0) for n, s in snaps],
+        ),
+    ]
+
+
+def _render_process_local() -> list[str]:
+    """Fast in-process counters — rendered on every scrape, no DB."""
+    sections: list[str] = []
+
     # ── Phase 15: bg_heartbeat + startup_invariants metrics ────────
     # These come from process-local state (not DB) so we produce them
-    # outside the admin_connection block and they never 503 the
+    # outside the snapshot families and they never 503 the
     # scrape even if DB is down. That is intentional — if DB is down,
     # these metrics are exactly what you want visible.
     try:
@@ -1404,6 +1549,43 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
                 err_values,
             ))
 
+        # Job scheduler (job_scheduler.py): run duration for tick jobs,
+        # skipped-overlap count, and which loops this process leads.
+        dur_values = [
+            ({"loop_name": n}, float(e["last_duration_s"]))
+            for n, e in hb_snapshot.items()
+            if e.get("last_duration_s") is not None
+        ]
+        if dur_values:
+            sections.append(_gauge(
+                "osiriscare_bg_loop_run_duration_seconds",
+                "Wall time of the most recent run of a scheduled background job",
+                dur_values,
+            ))
+        overlap_values = [
+            ({"loop_name": n}, float(e.get("overlaps", 0)))
+            for n, e in hb_snapshot.items()
+        ]
+        if overlap_values:
+            sections.append(_counter(
+                "osiriscare_bg_loop_overlaps_total",
+                "Scheduled runs skipped because the previous run was still in flight",
+                overlap_values,
+            ))
+        from .job_scheduler import get_scheduler
+        scheduler = get_scheduler()
+        if scheduler is not None:
+            role_values = [
+                ({"loop_name": n, "role": role}, 1.0)
+                for n, role in scheduler.roles().items()
+            ]
+            if role_values:
+                sections.append(_gauge(
+                    "osiriscare_bg_job_role",
+                    "Scheduler role of each background job in this process (leader|standby|local)",
+                    role_values,
+                ))
+
         # Expected-interval declarative table so PromQL rules can
         # derive the alert threshold per loop.
         exp_values = [
@@ -1418,5 +1600,139 @@ async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
     except Exception:
         logger.exception("metrics: bg_heartbeat export failed")
 
+    # ── Shared compliance-score cache (perf_cache L1/L2) ──────────
+    # Process-local counters, like bg_heartbeat above — aggregate
+    # across replicas with sum() in PromQL.
+    try:
+        from .perf_cache import cache_metrics, cache_stats
+        pc = cache_metrics()
+        sections.append(_counter(
+            "osiriscare_perf_cache_lookups_total",
+            "perf_cache lookups by outcome (l1_hit, l2_hit, miss); process-local",
+            [({"result": k}, float(pc[k])) for k in ("l1_hit", "l2_hit", "miss")],
+        ))
+        sections.append(_counter(
+            "osiriscare_perf_cache_stampede_total",
+            "Misses that waited on another replica's Redis fill lock (wait) and waits that gave up and computed locally (timeout)",
+            [
+                ({"outcome": "wait"}, float(pc["stampede_wait"])),
+                ({"outcome": "timeout"}, float(pc["stampede_timeout"])),
+            ],
+        ))
+        sections.append(_counter(
+            "osiriscare_perf_cache_invalidations_total",
+            "Site-scoped invalidations issued by this replica (evidence commits)",
+            [({}, float(pc["invalidations"]))],
+        ))
+        sections.append(_counter(
+            "osiriscare_perf_cache_redis_errors_total",
+            "Redis errors swallowed by the shared cache tier (degraded to L1-only)",
+            [({}, float(pc["redis_errors"]))],
+        ))
+        sections.append(_gauge(
+            "osiriscare_perf_cache_entries",
+            "Entries in this replica's L1 cache",
+            [({}, float(cache_stats()["entries"]))],
+        ))
+    except Exception:
+        logger.exception("metrics: perf_cache export failed")
+
+    # ── Conditional GET (version-vector ETags) ─────────────────────
+    try:
+        from .conditional_get import conditional_get_metrics
+        cg = conditional_get_metrics()
+        sections.append(_counter(
+            "osiriscare_conditional_get_total",
+            "Conditional endpoints by outcome (not_modified = 304 before the handler ran, modified = full response, errors = version read failed, served unconditionally)",
+            [({"result": k}, float(cg[k])) for k in ("not_modified", "modified", "errors")],
+        ))
+    except Exception:
+        logger.exception("metrics: conditional_get export failed")
+
+    # ── RLS context setup round trips (tenant_middleware) ──────────
+    try:
+        from .tenant_middleware import rls_metrics
+        rm = rls_metrics()
+        req = rm.pop("_requests")
+        sections.append(_counter(
+            "osiriscare_rls_contexts_total",
+            "RLS contexts opened by helper (tenant, org, partner, admin, ...)",
+            [({"helper": h}, float(v["contexts"])) for h, v in sorted(rm.items())],
+        ))
+        sections.append(_counter(
+            "osiriscare_rls_round_trips_total",
+            "Round trips spent on RLS context setup/teardown (BEGIN, set_config/SET, COMMIT/RESET) by helper",
+            [({"helper": h}, float(v["round_trips"])) for h, v in sorted(rm.items())],
+        ))
+        sections.append(_counter(
+            "osiriscare_request_rls_round_trips_total",
+            "RLS context round trips summed over HTTP requests; divide by osiriscare_requests_with_rls_total for per-request",
+            [({}, float(req["round_trips"]))],
+        ))
+        sections.append(_counter(
+            "osiriscare_requests_with_rls_total",
+            "HTTP requests that opened at least one RLS context",
+            [({}, float(req["requests"]))],
+        ))
+    except Exception:
+        logger.exception("metrics: rls round-trip export failed")
+
+    # ── Startup phases (startup_profile) ───────────────────────────
+    # Fixed for the life of the process; the release label lets
+    # dashboards compare time-to-first-request across deploys.
+    try:
+        from .startup_profile import release, startup_phases
+        phases = startup_phases()
+        if phases:
+            rel = release()
+            sections.append(_gauge(
+                "osiriscare_startup_phase_seconds",
+                "Seconds after process start each startup phase was reached (imports, lifespan, first_request)",
+                [({"phase": p, "release": rel}, v) for p, v in phases.items()],
+            ))
+    except Exception:
+        logger.exception("metrics: startup phase export failed")
+
+    return sections
+
+
+# =============================================================================
+# Endpoint
+# =============================================================================
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(auth: dict = Depends(require_scrape_or_admin)):
+    """Return platform metrics in Prometheus text exposition format.
+
+    Slow DB-backed families are served from the snapshot kept by
+    `metrics_collector_loop`; a family that has never been collected
+    (cold process, loop not started yet) is collected inline once.
+    Process-local counters are rendered fresh.
+    """
+    if any(name not in _SNAPSHOTS for name in _FAMILIES):
+        from dashboard_api.fleet import get_pool
+
+        try:
+            pool = await get_pool()
+        except Exception:
+            logger.exception("Failed to get database pool for metrics")
+            if not _SNAPSHOTS:
+                return PlainTextResponse(
+                    "# Failed to connect to database\n",
+                    media_type=PROM_CONTENT_TYPE,
+                    status_code=503,
+                )
+        else:
+            await refresh_due_families(pool, missing_only=True)
+
+    sections: list[str] = [
+        _SNAPSHOTS[name].body
+        for name in _FAMILIES
+        if name in _SNAPSHOTS and _SNAPSHOTS[name].body
+    ]
+    sections.extend(_render_snapshot_freshness())
+    sections.extend(_render_process_local())
+
     body = "\n\n".join(sections) + "\n"
     return PlainTextResponse(body, media_type=PROM_CONTENT_TYPE)
@@ -12,12 +12,15 @@ from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
-# Try to import WeasyPrint - graceful fallback if not installed
+# WeasyPrint is imported by the PDF functions themselves (it costs
+# hundreds of ms at import); only probe for it here.
 try:
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
+    from .lazy_imports import module_available
 except ImportError:
-    WEASYPRINT_AVAILABLE = False
+    from lazy_imports import module_available
+
+WEASYPRINT_AVAILABLE = module_available("weasyprint")
+if not WEASYPRINT_AVAILABLE:
     logger.warning("WeasyPrint not installed - PDF generation will be disabled")
 
 
@@ -533,6 +536,8 @@ def generate_pdf_report(
         )
 
         # Generate PDF from HTML
+        from weasyprint import HTML
+
         html = HTML(string=html_content)
         pdf_bytes = html.write_pdf()
 
@@ -749,6 +754,8 @@ def generate_qbr_pdf(
             incidents_summary=incidents_summary,
             value_summary=value_summary,
         )
+        from weasyprint import HTML
+
         pdf_bytes = HTML(string=html_content).write_pdf()
         logger.info(f"Generated QBR PDF for {site_id} ({quarter_label}): {len(pdf_bytes)} bytes")
         return pdf_bytes
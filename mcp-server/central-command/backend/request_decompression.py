@@ -0,0 +1,93 @@
+"""
+Gzip request-body decompression.
+
+Appliances gzip JSON bodies over 1 KiB (compliance_agent/http_transport.py):
+checkins, evidence batches and portal snapshots shrink 5-10x on the
+uplink. This middleware inflates `Content-Encoding: gzip` bodies before
+routing, so handlers and pydantic models see plain JSON and need no
+per-endpoint gzip handling. The existing manual checks in sites.py /
+log_ingest.py become no-ops (the header is removed).
+
+Pure ASGI rather than BaseHTTPMiddleware: the body has to be replaced
+before the app reads it, which BaseHTTPMiddleware can't do cleanly.
+Decompressed size is capped to keep a small gzip bomb from expanding
+into memory.
+"""
+
+import json
+import zlib
+
+# Largest accepted body after decompression.
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+
+class GzipRequestMiddleware:
+    def __init__(self, app, max_decompressed_bytes: int = MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.max_decompressed_bytes = max_decompressed_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope.get("headers") or []
+        encoding = next(
+            (v for k, v in headers if k.lower() == b"content-encoding"), b""
+        ).strip().lower()
+        if encoding != b"gzip":
+            await self.app(scope, receive, send)
+            return
+
+        compressed = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            compressed += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(compressed) > self.max_decompressed_bytes:
+                await _reply(send, 413, "Request body too large")
+                return
+
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = inflater.decompress(bytes(compressed), self.max_decompressed_bytes + 1)
+        except zlib.error:
+            await _reply(send, 400, "Invalid gzip payload")
+            return
+        if len(body) > self.max_decompressed_bytes or inflater.unconsumed_tail:
+            await _reply(send, 413, "Request body too large")
+            return
+
+        new_headers = [
+            (k, v) for k, v in headers
+            if k.lower() not in (b"content-encoding", b"content-length")
+        ]
+        new_headers.append((b"content-length", str(len(body)).encode()))
+        scope = dict(scope, headers=new_headers)
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+
+async def _reply(send, status: int, detail: str) -> None:
+    payload = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,326 @@
+"""Benchmark month-end report generation: per-site row walks vs columnar analytics.
+
+Synthesizes one client org (--sites sites, --bundles bundles per site
+over a 30-day month, --checks check results per bundle across 3 hosts)
+and produces, for every site, the check-result parts of the monthly
+packet and the portal monthly report:
+
+  category scores + overall + trend       (db_queries monthly report)
+  compliance score + control posture      (CompliancePacket)
+
+Paths:
+  legacy    the pre-change generators, per site: the monthly report
+            fetched every bundle's checks JSONB and walked it twice in
+            Python; the packet ran two GROUP BY check_type queries.
+            3 statements per site.
+  columnar  compliance_analytics: 3 statements for the whole org, then
+            per-site views of the shared NumPy columns.
+
+The in-memory "database" pre-computes every result set before timing
+starts and charges --rtt-ms per statement, so the numbers isolate
+round trips plus Python-side work (JSON decode included for the legacy
+path, as the driver would do it). Server-side scan cost is NOT modelled;
+the columnar path's three reads replace 3 x sites per-site reads over
+the same bundles.
+
+Usage (from backend/):
+    python3 scripts/bench_compliance_analytics.py [--sites 100] [--bundles 300] [--rtt-ms 1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+HERE = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(HERE))
+
+from compliance_analytics import PeriodAnalytics, load_period_analytics  # noqa: E402
+
+PERIOD_START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+PERIOD_END = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+CHECK_TYPES = [
+    "firewall_status", "windows_defender", "windows_update", "audit_logging",
+    "rogue_admin_users", "bitlocker_status", "smb_signing", "screen_lock_policy",
+    "password_policy", "rdp_nla", "guest_account", "backup_status",
+    "linux_firewall", "linux_ssh_config", "ntp_sync", "agent_status",
+    "service_dns", "linux_patching", "defender_exclusions", "dns_config",
+]
+STATUSES = ["pass"] * 6 + ["fail", "warning", "compliant", "non_compliant", "unknown", "PASS"]
+CATEGORIES = {
+    "firewall": ["firewall_status", "linux_firewall"],
+    "antivirus": ["windows_defender", "defender_exclusions"],
+    "patching": ["windows_update", "linux_patching"],
+    "logging": ["audit_logging"],
+    "encryption": ["bitlocker_status", "smb_signing"],
+    "access_control": ["rogue_admin_users", "password_policy", "rdp_nla", "guest_account",
+                       "screen_lock_policy", "linux_ssh_config"],
+    "backup": ["backup_status"],
+    "services": ["service_dns", "agent_status"],
+}
+CHECK_TO_CATEGORY = {ct: cat for cat, cts in CATEGORIES.items() for ct in cts}
+
+
+def synth_org(sites: int, bundles: int, checks: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """compliance_bundles rows: site_id, bundle_id, checked_at, checks."""
+    rng = random.Random(seed)
+    span = (PERIOD_END - PERIOD_START).total_seconds()
+    out = []
+    for s in range(sites):
+        site_id = f"site-{s:03d}"
+        for b in range(bundles):
+            at = PERIOD_START + timedelta(seconds=rng.random() * span)
+            out.append({
+                "site_id": site_id,
+                "bundle_id": f"{site_id}-b{b:05d}",
+                "checked_at": at,
+                "checks": [
+                    {
+                        "check": rng.choice(CHECK_TYPES),
+                        "status": rng.choice(STATUSES),
+                        "hostname": f"host-{rng.randrange(3)}",
+                    }
+                    for _ in range(checks)
+                ],
+            })
+    out.sort(key=lambda r: r["checked_at"])
+    return out
+
+
+# ── reference evaluation of the compliance_analytics reads ──
+
+
+def _us(dt: datetime) -> int:
+    return (dt - datetime(1970, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1)
+
+
+def analytics_result_sets(bundles: List[Dict[str, Any]], start: datetime = PERIOD_START):
+    """(check_rows, bundle_rows, latest_rows) exactly as the three
+    compliance_analytics statements return them."""
+    counts: Dict[Tuple, List] = {}
+    latest: Dict[Tuple, Tuple] = {}
+    bundle_rows = []
+    for b in sorted(bundles, key=lambda r: (r["site_id"], r["checked_at"])):
+        at = b["checked_at"]
+        day = int((at - start).total_seconds() // 86400)
+        tallies = [0, 0, 0]
+        for c in b["checks"]:
+            status = c.get("status")
+            key = (b["site_id"], day, c.get("check"), status)
+            agg = counts.setdefault(key, [0, at])
+            agg[0] += 1
+            agg[1] = max(agg[1], at)
+            lk = (b["site_id"], c.get("check"), c.get("hostname") or c.get("host") or "")
+            if lk not in latest or at > latest[lk][3]:
+                latest[lk] = (b["site_id"], c.get("check"), status, at, b["bundle_id"])
+            low = (status or "").lower()
+            if low in ("pass", "compliant"):
+                tallies[0] += 1
+            elif low == "warning":
+                tallies[1] += 1
+            elif low in ("fail", "non_compliant"):
+                tallies[2] += 1
+        bundle_rows.append((b["site_id"], _us(at), *tallies))
+    check_rows = [(*k, v[0], _us(v[1])) for k, v in counts.items()]
+    latest_rows = [(s, ct, st, _us(at), bid) for s, ct, st, at, bid in latest.values()]
+    return check_rows, bundle_rows, latest_rows
+
+
+class AnalyticsConn:
+    """asyncpg-shaped conn answering the three analytics statements."""
+
+    def __init__(self, result_sets, rtt: float = 0.0):
+        self.check_rows, self.bundle_rows, self.latest_rows = result_sets
+        self.rtt = rtt
+        self.statements = 0
+        self.sites = {r[0] for r in self.bundle_rows}
+
+    async def fetch(self, sql, *args):
+        self.statements += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+        site_ids = set(args[0])
+        if "DISTINCT ON" in sql:
+            rows = self.latest_rows
+        elif "LEFT JOIN LATERAL" in sql:
+            rows = self.bundle_rows
+        else:
+            rows = self.check_rows
+        if site_ids >= self.sites:
+            return rows
+        return [r for r in rows if r[0] in site_ids]
+
+
+# ── the pre-change generators (frozen copy of the Python-side work) ──
+
+
+def _legacy_monthly(rows):
+    category_scores: Dict[str, List[int]] = {cat: [] for cat in CATEGORIES}
+    for checks in rows:
+        for check in checks:
+            status = check.get("status", "").lower()
+            if status in ("compliant", "pass"):
+                score = 100
+            elif status == "warning":
+                score = 50
+            elif status in ("non_compliant", "fail"):
+                score = 0
+            else:
+                continue
+            category = CHECK_TO_CATEGORY.get(check.get("check", ""))
+            if category:
+                category_scores[category].append(score)
+    monthly, total, count = {}, 0, 0
+    for category, scores in category_scores.items():
+        if scores:
+            avg = sum(scores) / len(scores)
+            monthly[category] = round(avg, 1)
+            total += avg
+            count += 1
+        else:
+            monthly[category] = None
+    overall = round(total / count, 1) if count else None
+
+    mid = len(rows) // 2
+    first, second = [], []
+    for i, checks in enumerate(rows):
+        score = n = 0
+        for check in checks:
+            status = check.get("status", "").lower()
+            if status in ("compliant", "pass"):
+                score += 100
+                n += 1
+            elif status == "warning":
+                score += 50
+                n += 1
+            elif status in ("non_compliant", "fail"):
+                n += 1
+        if n:
+            (first if i < mid else second).append(score / n)
+    if mid:
+        fa = sum(first) / len(first) if first else 0
+        sa = sum(second) / len(second) if second else 0
+        trend = "improving" if sa > fa + 5 else "declining" if sa < fa - 5 else "stable"
+    else:
+        trend = "insufficient_data"
+    return monthly, overall, trend
+
+
+def _legacy_packet_rows(site_bundles):
+    """What the packet's two GROUP BY check_type statements returned."""
+    stats = defaultdict(lambda: {"total": 0, "scored": 0, "pass_any": 0, "pass": 0, "last": None, "bundle": None})
+    for b in site_bundles:
+        for c in b["checks"]:
+            ct = c.get("check")
+            if ct is None:
+                continue
+            s = stats[ct]
+            st = c.get("status")
+            s["total"] += 1
+            s["scored"] += st in ("pass", "compliant", "fail", "non_compliant", "warning")
+            s["pass_any"] += st in ("pass", "compliant")
+            s["pass"] += st == "pass"
+            if s["last"] is None or b["checked_at"] >= s["last"]:
+                s["last"], s["bundle"] = b["checked_at"], b["bundle_id"]
+    return dict(stats)
+
+
+def _legacy_packet(stats):
+    rates = [s["pass_any"] * 100.0 / s["scored"] if s["scored"] else 0.0 for s in stats.values()]
+    posture = {
+        ct: (s["total"], s["pass"], s["last"], s["bundle"]) for ct, s in stats.items()
+    }
+    return (round(sum(rates) / len(rates), 1) if rates else 0.0), posture
+
+
+async def run_legacy(bundles, rtt: float) -> Tuple[float, int]:
+    by_site = defaultdict(list)
+    for b in bundles:
+        by_site[b["site_id"]].append(b)
+    # Result sets as the driver would hand them over (untimed).
+    encoded = {sid: [json.dumps(b["checks"]) for b in bs] for sid, bs in by_site.items()}
+    packet_rows = {sid: _legacy_packet_rows(bs) for sid, bs in by_site.items()}
+
+    statements = 0
+    start = time.perf_counter()
+    for sid in sorted(by_site):
+        await asyncio.sleep(rtt)  # monthly report: bundles + checks JSONB
+        rows = [json.loads(raw) for raw in encoded[sid]]
+        _legacy_monthly(rows)
+        await asyncio.sleep(rtt)  # packet: score GROUP BY
+        await asyncio.sleep(rtt)  # packet: posture GROUP BY
+        _legacy_packet(packet_rows[sid])
+        statements += 3
+    return time.perf_counter() - start, statements
+
+
+def columnar_site_report(analytics: PeriodAnalytics, site_id: str):
+    """Everything run_legacy computes per site, from the shared columns."""
+    cats = analytics.category_scores(list(CATEGORIES), CHECK_TO_CATEGORY)[site_id]
+    scored = [v for v in cats.values() if v is not None]
+    overall = round(sum(scored) / len(scored), 1) if scored else None
+    counts = analytics.check_status_counts(site_id)
+    last_seen = analytics.check_last_seen(site_id)
+    rates = []
+    posture = {}
+    for ct, by_status in counts.items():
+        scored_n = sum(n for st, n in by_status.items()
+                       if st in ("pass", "compliant", "fail", "non_compliant", "warning"))
+        passed = by_status.get("pass", 0) + by_status.get("compliant", 0)
+        rates.append(passed * 100.0 / scored_n if scored_n else 0.0)
+        posture[ct] = (sum(by_status.values()), by_status.get("pass", 0), *last_seen[ct])
+    score = round(sum(rates) / len(rates), 1) if rates else 0.0
+    return (
+        {c: (round(v, 1) if v is not None else None) for c, v in cats.items()},
+        overall,
+        analytics.trend(site_id),
+        score,
+        posture,
+    )
+
+
+async def run_columnar(bundles, rtt: float) -> Tuple[float, int]:
+    conn = AnalyticsConn(analytics_result_sets(bundles), rtt)
+    site_ids = sorted({b["site_id"] for b in bundles})
+    start = time.perf_counter()
+    analytics = await load_period_analytics(conn, site_ids, PERIOD_START, PERIOD_END)
+    for sid in site_ids:
+        columnar_site_report(analytics, sid)
+    return time.perf_counter() - start, conn.statements
+
+
+def run(sites: int = 100, bundles: int = 300, checks: int = 20, rtt_ms: float = 1.0) -> List[Dict]:
+    data = synth_org(sites, bundles, checks)
+    rows = []
+    for name, fn in (("legacy", run_legacy), ("columnar", run_columnar)):
+        elapsed, statements = asyncio.run(fn(data, rtt_ms / 1000))
+        rows.append({"path": name, "statements": statements, "ms": elapsed * 1000})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sites", type=int, default=100)
+    parser.add_argument("--bundles", type=int, default=300)
+    parser.add_argument("--checks", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rows = run(args.sites, args.bundles, args.checks, args.rtt_ms)
+    print(f"{'path':>9} {'statements':>11} {'ms':>10}")
+    for r in rows:
+        print(f"{r['path']:>9} {r['statements']:>11} {r['ms']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Benchmark mesh target assignment schemes: move count and balance.
+
+Compares, for one appliance leaving and one joining a site:
+
+  modulo    the old mesh_targets._consistent_hash —
+            sorted(live)[sha256(target) % len(live)]
+  ring      hash_ring.HashRing.owner (64 vnodes per appliance)
+  hrw       mesh_assignment.assign_targets — sticky for live owners,
+            weighted rendezvous + bounded load for orphans
+
+Columns:
+  moved     targets whose owner changed
+  minimum   targets that HAD to move (owned by the departed appliance);
+            0 for a join
+  spread    max/mean targets per live appliance afterwards (1.00 = even)
+  ms        wall time to compute the whole assignment
+
+Usage (from backend/):
+    python3 scripts/bench_mesh_assignment.py [--targets 2000] [--nodes 3 5 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# scripts/ sits under backend/; add backend/ to sys.path so the pure
+# assignment modules import cleanly regardless of invoker cwd.
+HERE = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(HERE))
+
+from hash_ring import HashRing  # noqa: E402
+from mesh_assignment import assign_targets, load_spread, move_count  # noqa: E402
+
+Assignment = Dict[str, Optional[str]]
+
+
+def _node(i: int) -> str:
+    return f"AABBCCDD{i:04X}"
+
+
+def modulo(targets: List[str], nodes: List[str], before: Assignment) -> Assignment:
+    ordered = sorted(nodes)
+    return {
+        t: ordered[int(hashlib.sha256(t.encode()).hexdigest()[:16], 16) % len(ordered)]
+        for t in targets
+    }
+
+
+def ring(targets: List[str], nodes: List[str], before: Assignment) -> Assignment:
+    r = HashRing(nodes)
+    return {t: r.owner(t) for t in targets}
+
+
+def hrw(targets: List[str], nodes: List[str], before: Assignment) -> Assignment:
+    return assign_targets({t: before.get(t) for t in targets}, {n: 0 for n in nodes})
+
+
+SCHEMES: Dict[str, Callable[[List[str], List[str], Assignment], Assignment]] = {
+    "modulo": modulo,
+    "ring": ring,
+    "hrw": hrw,
+}
+
+
+def run(n_targets: int, node_counts: List[int]) -> List[dict]:
+    # hash_ring logs every ring build at INFO; keep the table readable.
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    targets = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(n_targets)]
+    rows = []
+    for n in node_counts:
+        nodes = [_node(i) for i in range(n)]
+        for name, scheme in SCHEMES.items():
+            base = scheme(targets, nodes, {})
+            departed = nodes[n // 2]
+            scenarios = {
+                "leave": ([x for x in nodes if x != departed],
+                          sum(1 for o in base.values() if o == departed)),
+                "join": (nodes + [_node(n)], 0),
+            }
+            for event, (after_nodes, minimum) in scenarios.items():
+                start = time.perf_counter()
+                after = scheme(targets, after_nodes, base)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                rows.append({
+                    "nodes": n,
+                    "event": event,
+                    "scheme": name,
+                    "moved": move_count(base, after),
+                    "minimum": minimum,
+                    "spread": load_spread(after, after_nodes),
+                    "ms": elapsed_ms,
+                })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--targets", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[3, 5, 10])
+    args = parser.parse_args()
+
+    rows = run(args.targets, args.nodes)
+    print(f"{args.targets} targets")
+    print(f"{'nodes':>5} {'event':>6} {'scheme':>7} {'moved':>6} {'minimum':>8} {'spread':>7} {'ms':>8}")
+    for r in rows:
+        print(
+            f"{r['nodes']:>5} {r['event']:>6} {r['scheme']:>7} {r['moved']:>6} "
+            f"{r['minimum']:>8} {r['spread']:>7.2f} {r['ms']:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
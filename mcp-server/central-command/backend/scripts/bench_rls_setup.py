@@ -0,0 +1,144 @@
+"""Benchmark RLS context setup: per-SET LOCAL vs single set_config.
+
+Simulates one appliance checkin's DB shape against a fake connection
+that charges a fixed network round trip per statement (BEGIN, SET,
+query, COMMIT), so the numbers isolate context-setup overhead from
+query cost:
+
+  2 x tenant_connection(site_id, actor_appliance_id)   (sites.py checkin)
+  3 x admin_connection                                 (sigauth, orders, ...)
+  --queries statements per context
+
+Schemes:
+  legacy    the pre-change helpers: one SET LOCAL per setting
+            (tenant: current_tenant, is_admin, actor_appliance_id)
+  set_config  tenant_middleware as shipped: one
+            SELECT set_config(..., true), ... per context
+
+Columns: round trips per checkin, and mean ms per checkin at each RTT.
+
+Usage (from backend/):
+    python3 scripts/bench_rls_setup.py [--rtt-ms 1 3 5] [--checkins 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+HERE = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(HERE))
+
+import tenant_middleware  # noqa: E402
+
+SITE_ID = "site-bench-01"
+APPLIANCE_ID = "site-bench-01-AA:BB:CC:DD:EE:FF"
+
+
+class _RttConn:
+    """Every statement costs one round trip of `rtt` seconds."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+
+    async def _trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    async def execute(self, sql, *args):
+        await self._trip()
+
+    async def fetch(self, sql, *args):
+        await self._trip()
+        return []
+
+    @asynccontextmanager
+    async def transaction(self):
+        await self._trip()  # BEGIN
+        yield
+        await self._trip()  # COMMIT
+
+
+class _Pool:
+    def __init__(self, conn: _RttConn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@asynccontextmanager
+async def _legacy_tenant_connection(pool, site_id, actor_appliance_id):
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL app.current_tenant = '{site_id}'")
+            await conn.execute("SET LOCAL app.is_admin = 'false'")
+            await conn.execute(f"SET LOCAL app.actor_appliance_id = '{actor_appliance_id}'")
+            yield conn
+
+
+async def _checkin(pool, tenant_cm, queries: int) -> None:
+    for _ in range(2):
+        async with tenant_cm(pool, site_id=SITE_ID, actor_appliance_id=APPLIANCE_ID) as conn:
+            for _ in range(queries):
+                await conn.fetch("SELECT 1")
+    for _ in range(3):
+        async with tenant_middleware.admin_connection(pool) as conn:
+            await conn.fetch("SELECT 1")
+
+
+SCHEMES = {
+    "legacy": _legacy_tenant_connection,
+    "set_config": tenant_middleware.tenant_connection,
+}
+
+
+def run(rtts_ms: List[float], checkins: int = 50, queries: int = 4) -> List[Dict]:
+    rows = []
+    for name, cm in SCHEMES.items():
+        for rtt_ms in rtts_ms:
+            conn = _RttConn(rtt_ms / 1000)
+            pool = _Pool(conn)
+
+            async def _go():
+                start = time.perf_counter()
+                for _ in range(checkins):
+                    await _checkin(pool, cm, queries)
+                return time.perf_counter() - start
+
+            elapsed = asyncio.run(_go())
+            rows.append({
+                "scheme": name,
+                "rtt_ms": rtt_ms,
+                "round_trips": conn.round_trips / checkins,
+                "ms_per_checkin": elapsed * 1000 / checkins,
+            })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[1.0, 3.0, 5.0])
+    parser.add_argument("--checkins", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = run(args.rtt_ms, args.checkins, args.queries)
+    print(f"{'scheme':>10} {'rtt_ms':>7} {'trips':>6} {'ms/checkin':>11}")
+    for r in rows:
+        print(
+            f"{r['scheme']:>10} {r['rtt_ms']:>7.1f} {r['round_trips']:>6.0f} "
+            f"{r['ms_per_checkin']:>11.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
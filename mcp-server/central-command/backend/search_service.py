@@ -0,0 +1,224 @@
+"""Unified entity search over the search_documents index (Migration 335).
+
+One query per search, whatever the number of entity kinds: a trigram
+GIN lookup on search_documents.body, scoped to the caller's site set,
+ranked and capped per kind with a window function. Used by the site
+detail search bar (sites.search_site) and the partner Cmd-K omnibox
+(partners.partner_global_search); the client portal can call
+search_documents() the same way with its org's site ids.
+
+Ranking is deterministic and cheap to reproduce in Python:
+
+    0  title starts with the query
+    1  the query starts a word in the body
+    2  the query appears anywhere in the body
+    then most recent sort_at first.
+
+Typeahead prefix cache: every keystroke extends the previous query, and
+a result list that came back *short* (fewer than `limit` hits for a
+kind) is the complete match set for that prefix. Any extension of the
+prefix matches a subset of it, so "dc01" is answered from the cached
+"dc0" results in memory without a round trip. Entries expire after
+PREFIX_CACHE_TTL_S so newly indexed entities show up promptly.
+
+Callers are responsible for passing only site ids the caller may see;
+reads also run under the caller's RLS context.
+"""
+
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ("incident", "device", "credential", "workstation", "appliance")
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 200
+
+PREFIX_CACHE_TTL_S = 30.0
+PREFIX_CACHE_MAX_ENTRIES = 2048
+
+_WS = re.compile(r"\s+")
+
+_SEARCH_SQL = """
+    WITH hits AS (
+        SELECT kind, entity_id, site_id, title, subtitle, body, payload, sort_at,
+               CASE
+                   WHEN lower(title) LIKE $3 ESCAPE '\\' THEN 0
+                   WHEN body LIKE $3 ESCAPE '\\' OR body LIKE $4 ESCAPE '\\' THEN 1
+                   ELSE 2
+               END AS rank
+          FROM search_documents
+         WHERE site_id = ANY($1::text[])
+           AND kind = ANY($5::text[])
+           AND body LIKE $2 ESCAPE '\\'
+           AND ($7::timestamptz IS NULL OR sort_at >= $7)
+    ), ranked AS (
+        SELECT *, ROW_NUMBER() OVER (
+                   PARTITION BY kind
+                   ORDER BY rank, sort_at DESC NULLS LAST, entity_id
+               ) AS rn
+          FROM hits
+    )
+    SELECT kind, entity_id, site_id, title, subtitle, body, payload, sort_at, rank
+      FROM ranked
+     WHERE rn <= $6
+     ORDER BY kind, rn
+"""
+
+
+def normalize_query(q: Optional[str]) -> str:
+    """Lower-case, trim and collapse whitespace (matches how body is stored)."""
+    return _WS.sub(" ", (q or "").strip().lower())[:MAX_QUERY_LENGTH]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _rank(doc: Dict[str, Any], term: str) -> int:
+    if (doc["title"] or "").lower().startswith(term):
+        return 0
+    body = doc["body"]
+    if body.startswith(term) or f" {term}" in body:
+        return 1
+    return 2
+
+
+def _sort_key(doc: Dict[str, Any]) -> Tuple:
+    sort_at = doc["sort_at"]
+    # rank asc, sort_at desc (NULLS LAST), entity_id asc — same as _SEARCH_SQL
+    return (doc["rank"], sort_at is None, -(sort_at.timestamp()) if sort_at else 0.0, doc["entity_id"])
+
+
+# ---------------------------------------------------------------------------
+# Prefix cache
+# ---------------------------------------------------------------------------
+
+_ScopeKey = Tuple[Tuple[str, ...], Tuple[str, ...], int, Optional[datetime]]
+
+# (scope, term) -> (stored_at, {kind: [doc, ...]})
+_prefix_cache: "OrderedDict[Tuple[_ScopeKey, str], Tuple[float, Dict[str, List[Dict[str, Any]]]]]" = OrderedDict()
+_cache_stats = {"hits": 0, "prefix_hits": 0, "misses": 0}
+
+
+def _cache_get(scope: _ScopeKey, term: str, limit: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    now = time.monotonic()
+    entry = _prefix_cache.get((scope, term))
+    if entry and now - entry[0] < PREFIX_CACHE_TTL_S:
+        _prefix_cache.move_to_end((scope, term))
+        _cache_stats["hits"] += 1
+        return entry[1]
+
+    # Longest cached prefix whose every kind came back short (= complete).
+    for cut in range(len(term) - 1, MIN_QUERY_LENGTH - 1, -1):
+        prefix = term[:cut]
+        entry = _prefix_cache.get((scope, prefix))
+        if not entry or now - entry[0] >= PREFIX_CACHE_TTL_S:
+            continue
+        if any(len(docs) >= limit for docs in entry[1].values()):
+            return None  # truncated somewhere; a longer term may match rows not cached
+        narrowed: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, docs in entry[1].items():
+            matches = []
+            for doc in docs:
+                if term in doc["body"]:
+                    doc = dict(doc, rank=_rank(doc, term))
+                    matches.append(doc)
+            matches.sort(key=_sort_key)
+            narrowed[kind] = matches
+        _cache_stats["prefix_hits"] += 1
+        _cache_put(scope, term, narrowed)
+        return narrowed
+    return None
+
+
+def _cache_put(scope: _ScopeKey, term: str, by_kind: Dict[str, List[Dict[str, Any]]]) -> None:
+    _prefix_cache[(scope, term)] = (time.monotonic(), by_kind)
+    _prefix_cache.move_to_end((scope, term))
+    while len(_prefix_cache) > PREFIX_CACHE_MAX_ENTRIES:
+        _prefix_cache.popitem(last=False)
+
+
+def clear_prefix_cache() -> None:
+    _prefix_cache.clear()
+
+
+def cache_stats() -> Dict[str, int]:
+    return dict(_cache_stats, entries=len(_prefix_cache))
+
+
+# ---------------------------------------------------------------------------
+# Query API
+# ---------------------------------------------------------------------------
+
+async def search_documents(
+    conn,
+    site_ids: Iterable[str],
+    q: str,
+    limit: int = 25,
+    kinds: Sequence[str] = SEARCH_KINDS,
+    since: Optional[datetime] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Ranked matches per kind for `q` across `site_ids`.
+
+    Args:
+        conn: connection already in the caller's tenant/admin context
+        site_ids: sites the caller may see
+        q: raw user input (normalized here)
+        limit: max hits per kind
+        kinds: subset of SEARCH_KINDS to search
+        since: only documents whose sort_at is at or after this time
+
+    Returns:
+        {kind: [{"entity_id", "site_id", "title", "subtitle", "payload",
+                 "sort_at", "rank"}, ...]} with every requested kind
+        present. Empty when the query is shorter than MIN_QUERY_LENGTH.
+    """
+    term = normalize_query(q)
+    kinds = tuple(k for k in kinds if k in SEARCH_KINDS)
+    sites = tuple(sorted(set(site_ids)))
+    if len(term) < MIN_QUERY_LENGTH or not kinds or not sites:
+        return {k: [] for k in kinds}
+
+    scope: _ScopeKey = (sites, kinds, limit, since)
+    by_kind = _cache_get(scope, term, limit)
+    if by_kind is None:
+        _cache_stats["misses"] += 1
+        esc = _escape_like(term)
+        rows = await conn.fetch(
+            _SEARCH_SQL,
+            list(sites),
+            f"%{esc}%",
+            f"{esc}%",
+            f"% {esc}%",
+            list(kinds),
+            limit,
+            since,
+        )
+        by_kind = {k: [] for k in kinds}
+        for r in rows:
+            payload = r["payload"]
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            by_kind[r["kind"]].append({
+                "entity_id": r["entity_id"],
+                "site_id": r["site_id"],
+                "title": r["title"],
+                "subtitle": r["subtitle"],
+                "body": r["body"],
+                "payload": payload or {},
+                "sort_at": r["sort_at"],
+                "rank": r["rank"],
+            })
+        _cache_put(scope, term, by_kind)
+
+    # body stays internal (cache filtering only).
+    return {
+        kind: [{k: v for k, v in doc.items() if k != "body"} for doc in docs]
+        for kind, docs in by_kind.items()
+    }
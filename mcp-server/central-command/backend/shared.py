@@ -21,17 +21,19 @@ import re
 import secrets
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 import structlog
 import yaml
 from nacl.signing import SigningKey, VerifyKey
 from nacl.encoding import HexEncoder
-from minio import Minio
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from fastapi import HTTPException, Request
 
+if TYPE_CHECKING:
+    from minio import Minio
+
 logger = structlog.get_logger()
 
 # ============================================================================
@@ -381,11 +383,14 @@ def get_all_public_keys_hex() -> list:
 # MinIO
 # ============================================================================
 
-minio_client: Optional[Minio] = None
+minio_client: Optional["Minio"] = None
 
 
 def setup_minio():
     global minio_client
+    # Imported here rather than at module load: only the API lifespan
+    # needs the client, not every importer of shared.
+    from minio import Minio
 
     MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "localhost:9000")
     MINIO_SECURE = os.getenv("MINIO_SECURE", "false").lower() == "true"
@@ -412,7 +417,7 @@ def setup_minio():
     logger.info("MinIO client initialized", endpoint=MINIO_ENDPOINT, bucket=MINIO_BUCKET)
 
 
-def get_minio_client() -> Optional[Minio]:
+def get_minio_client() -> Optional["Minio"]:
     return minio_client
 
 
@@ -55,10 +55,14 @@ from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 from cryptography.exceptions import InvalidSignature
 from fastapi import Request
 
+try:
+    from .ed25519_verifier import NonceRing, verifier_for
+except ImportError:
+    from ed25519_verifier import NonceRing, verifier_for  # type: ignore[no-redef]
+
 logger = logging.getLogger("signature_auth")
 
 # The canonical signing input separator. Frozen at 0x0A (LF).
@@ -75,6 +79,10 @@ MAX_CLOCK_SKEW = timedelta(seconds=60)
 # daemon's order processor (processor.go).
 NONCE_TTL = timedelta(hours=2)
 
+# Nonces accepted by this process, checked before the `nonces` table.
+# A hit is a replay; a miss still asks the table (other workers).
+_nonce_ring = NonceRing(NONCE_TTL.total_seconds())
+
 # Header names. Case-insensitive per HTTP spec, but we normalize.
 HDR_SIG = "x-appliance-signature"
 HDR_TS = "x-appliance-timestamp"
@@ -229,6 +237,8 @@ async def _nonce_seen(conn, fingerprint: str, nonce_hex: str) -> bool:
     with a distinct key prefix so the two populations don't mingle.
     """
     key = f"sigauth:{fingerprint}:{nonce_hex}"
+    if _nonce_ring.seen(key):
+        return True
     # Bind asyncpg's Python timedelta directly (NOT an "<n> seconds"
     # string — that raised 'str' object has no attribute 'days' inside
     # asyncpg.pgproto.pgproto.interval_encode). Keep the explicit
@@ -249,6 +259,7 @@ async def _record_nonce(conn, fingerprint: str, nonce_hex: str) -> None:
     failure to record doesn't reject the current request — that's on
     the nonce replay check next time around."""
     key = f"sigauth:{fingerprint}:{nonce_hex}"
+    _nonce_ring.add(key)
     try:
         await conn.execute(
             "INSERT INTO nonces (nonce, created_at) VALUES ($1, NOW()) "
@@ -406,13 +417,13 @@ async def verify_appliance_signature(
         ts_iso,
         nonce_hex,
     )
-    try:
-        pub = Ed25519PublicKey.from_public_bytes(bytes.fromhex(pubkey_hex))
-    except (ValueError, TypeError) as e:
+    # Parsed key objects are cached by fingerprint (ed25519_verifier).
+    pub = verifier_for(pubkey_hex)
+    if pub is None:
         return SignatureVerifyResult(
             present=True, valid=False, reason="unknown_pubkey",
             pubkey_fingerprint=fingerprint,
-            detail=f"pubkey decode failed: {e}",
+            detail="pubkey decode failed: not a 32-byte hex Ed25519 key",
         )
     try:
         pub.verify(sig_raw, canonical)
@@ -542,14 +553,15 @@ def _verify_heartbeat_one_key(
     """Verify a single Ed25519 signature attempt against one pubkey.
 
     The daemon signs SHA-256(payload), not the raw payload — match that.
-    Uses the same Ed25519PublicKey shape as the existing sigauth verifier
-    (line 410+) for sibling parity. Returns True on success; False on any
-    verification failure or parse error.
+    Uses the same cached key objects as the sigauth verifier above —
+    path B calls this up to 121 times per heartbeat. Returns True on
+    success; False on any verification failure or parse error.
     """
+    pub = verifier_for(pubkey_hex)
+    if pub is None:
+        return False
     try:
-        pubkey_raw = bytes.fromhex(pubkey_hex)
         sig_raw = bytes.fromhex(signature_hex)
-        pub = Ed25519PublicKey.from_public_bytes(pubkey_raw)
         pub.verify(sig_raw, canonical_payload_hashed)
         return True
     except (InvalidSignature, ValueError, TypeError, binascii.Error):
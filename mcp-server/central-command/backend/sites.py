@@ -33,6 +33,9 @@ from .signing_backend import current_signing_method
 # then fail RLS because the inline path runs under the checkin's
 # tenant_connection context, which scopes differently.
 from .tenant_middleware import tenant_connection, admin_connection, admin_transaction
+from .search_service import search_documents
+from .checkin.delta import load_section_hashes, plan_sections, store_section_hashes
+from .ed25519_verifier import forget_key
 from .credential_crypto import encrypt_credential, decrypt_credential
 from .websocket_manager import broadcast_event
 from .fleet_updates import get_fleet_orders_for_appliance, record_fleet_order_completion
@@ -3312,6 +3315,12 @@ class ApplianceCheckin(BaseModel):
     # v0.5.0+; absent on v0.4.x (verifier falls back to path-B ±60s
     # reconstruction). See signature_auth.verify_heartbeat_signature.
     heartbeat_timestamp: Optional[int] = None
+    # Delta checkin (checkin/delta.py, Migration 337): per-section hashes
+    # plus the sections left out because their hash matches the one the
+    # server acknowledged last cycle. Absent on daemons without delta
+    # support — every section is then processed as before.
+    section_hashes: Optional[Dict[str, str]] = None
+    omitted_sections: Optional[List[str]] = None
 
 
 def normalize_mac(mac: str) -> str:
@@ -4609,6 +4618,26 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
                     f"Checkin {checkin.site_id}: time-travel state persist failed: {e}"
                 )
 
+        # === STEP 3.5c: Delta checkin plan (Migration 337) ===
+        # Sections the daemon left out as unchanged skip their steps
+        # below. A failed lookup just means nothing is acknowledged:
+        # omitted sections come back as unknown and the daemon resyncs.
+        _stored_hashes: Dict[str, str] = {}
+        if checkin.section_hashes:
+            try:
+                async with conn.transaction():
+                    _stored_hashes = await load_section_hashes(conn, canonical_id)
+            except Exception as e:
+                logger.error(f"Checkin {checkin.site_id}: section hash lookup failed: {e}")
+        delta_plan = plan_sections(
+            checkin.section_hashes, checkin.omitted_sections, _stored_hashes,
+        )
+        if delta_plan.resync:
+            logger.info(
+                f"Checkin {checkin.site_id}: delta resync requested for "
+                f"{sorted(delta_plan.unknown)} (appliance={canonical_id})"
+            )
+
         # === STEP 3.6: Register/update agent signing key ===
         # Per-appliance signing keys (Session 196): write to
         # site_appliances.agent_public_key scoped by (site_id, mac),
@@ -4645,6 +4674,7 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
                             mac_normalized,
                         )
                         if existing_key:
+                            forget_key(existing_key)
                             logger.warning(
                                 f"Agent signing key ROTATED for site={checkin.site_id} "
                                 f"mac={mac_normalized} "
@@ -4662,6 +4692,7 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
                     f"site={checkin.site_id} mac={mac_normalized}: {e}",
                     exc_info=True,
                 )
+                delta_plan.mark_failed("signing_keys")
 
         # === STEP 3.6c: Register/update agent IDENTITY signing key (#179) ===
         # The daemon has TWO Ed25519 keypairs by design (key separation):
@@ -4703,6 +4734,7 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
                             mac_normalized,
                         )
                         if existing_id_key:
+                            forget_key(existing_id_key)
                             logger.warning(
                                 f"Agent IDENTITY key ROTATED for "
                                 f"site={checkin.site_id} mac={mac_normalized} "
@@ -4721,6 +4753,7 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
                     f"site={checkin.site_id} mac={mac_normalized}: {e}",
                     exc_info=True,
                 )
+                delta_plan.mark_failed("signing_keys")
 
         # === STEP 3.6b: Update WireGuard VPN status ===
         if checkin.wg_connected and checkin.wg_ip:
@@ -4735,6 +4768,8 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
 
         # === STEP 3.7: Sync connected Go agents to go_agents table ===
         # Use a savepoint so failures here don't poison the outer transaction
+        if not delta_plan.skip("connected_agents"):
+            delta_plan.agent_ids = [a.agent_id for a in checkin.connected_agents or []]
         if checkin.connected_agents:
             try:
                 async with admin_connection(pool) as admin_conn:
@@ -4810,6 +4845,21 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
             except Exception as e:
                 import logging
                 logging.warning(f"Failed to sync go_agents: {e}")
+                delta_plan.mark_failed("connected_agents")
+        elif "connected_agents" in delta_plan.unchanged and delta_plan.agent_ids:
+            # Same agent set as last cycle: the per-agent upserts would
+            # only restamp liveness, so do that in one statement — for
+            # this appliance's acknowledged agents only, never site-wide.
+            try:
+                async with admin_connection(pool) as admin_conn:
+                    await admin_conn.execute("""
+                        UPDATE go_agents SET last_heartbeat = NOW(), updated_at = NOW()
+                        WHERE site_id = $1 AND status = 'connected'
+                        AND agent_id = ANY($2)
+                    """, checkin.site_id, delta_plan.agent_ids)
+            except Exception as e:
+                logger.error(f"Checkin {checkin.site_id}: go_agents liveness touch failed: {e}")
+                delta_plan.mark_failed("connected_agents")
 
         # === STEP 3.7b: Link discovered devices → workstations table ===
         try:
@@ -4905,6 +4955,45 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
             except Exception as e:
                 import logging
                 logging.warning(f"Failed to sync go_agent→workstations: {e}")
+                delta_plan.mark_failed("connected_agents")
+        elif "connected_agents" in delta_plan.unchanged and delta_plan.agent_ids:
+            # Unchanged agent set: restamp this appliance's agents'
+            # workstation rows and run the time-based expiry; the
+            # dedupe/infra cleanup above only matters after new rows
+            # are upserted.
+            try:
+                async with conn.transaction():
+                    await conn.execute("""
+                        UPDATE workstations w
+                        SET online = true,
+                            last_compliance_check = CASE
+                                WHEN g.checks_total > 0 THEN NOW()
+                                ELSE w.last_compliance_check END,
+                            last_seen = NOW(),
+                            updated_at = NOW()
+                        FROM go_agents g
+                        WHERE w.site_id = $1 AND g.site_id = $1
+                        AND g.status = 'connected' AND w.hostname = g.hostname
+                        AND g.agent_id = ANY($2)
+                    """, checkin.site_id, delta_plan.agent_ids)
+                    await conn.execute("""
+                        UPDATE workstations SET online = false
+                        WHERE site_id = $1 AND online = true
+                        AND last_seen < NOW() - INTERVAL '7 days'
+                    """, checkin.site_id)
+                    await conn.execute(r"""
+                        DELETE FROM workstations
+                        WHERE site_id = $1
+                        AND (
+                            (hostname ~ '^\d+\.\d+\.\d+\.\d+$'
+                             AND last_seen < NOW() - INTERVAL '7 days')
+                            OR (last_seen < NOW() - INTERVAL '30 days'
+                                AND compliance_status = 'unknown')
+                        )
+                    """, checkin.site_id)
+            except Exception as e:
+                logger.error(f"Checkin {checkin.site_id}: workstation liveness touch failed: {e}")
+                delta_plan.mark_failed("connected_agents")
 
         # === STEP 3.8: Handle app protection discovery results ===
         if checkin.discovery_results and checkin.discovery_results.get("profile_id"):
@@ -5631,6 +5720,15 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
         except Exception as e:
             logger.warning(f"Checkin {checkin.site_id}: trigger flags lookup failed: {e}")
 
+        # === STEP 7a: Acknowledge delta checkin sections (Migration 337) ===
+        # No write in steady state (ack equals what's stored).
+        try:
+            async with conn.transaction():
+                await store_section_hashes(conn, canonical_id, delta_plan)
+        except Exception as e:
+            logger.error(f"Checkin {checkin.site_id}: section hash store failed: {e}")
+            delta_plan.ack.clear()
+
     # === STEP 7b: Check billing status ===
     billing_hold = False
     billing_status = "none"
@@ -5939,6 +6037,9 @@ async def appliance_checkin(checkin: ApplianceCheckin, request: Request, auth_si
         # Time-travel reconciliation plan (Session 205 Phase 2). Null unless
         # daemon reported ≥2 detection signals AND validation accepted them.
         "reconcile_plan": reconcile_plan_payload,
+        # Delta checkin negotiation + acknowledged section hashes
+        # (checkin/delta.py). Older daemons ignore it.
+        "checkin_delta": delta_plan.response(),
     }
 
 
@@ -7289,8 +7390,10 @@ async def search_site(
     """Search across incidents, devices, credentials, and workstations for a site.
 
     Used by the Site Detail page search bar. Each category is capped at
-    ``limit`` rows (default 25, max 100). Search is case-insensitive via
-    ILIKE on the relevant columns.
+    ``limit`` rows (default 25, max 100). Search is case-insensitive and
+    served from the trigram-indexed search_documents table (Migration
+    335) in one query — see search_service.py for ranking and the
+    typeahead prefix cache.
 
     Returns 400 for queries shorter than 2 characters to prevent
     accidentally dumping the entire site's data.
@@ -7299,9 +7402,6 @@ async def search_site(
     if len(term) < 2:
         raise HTTPException(status_code=400, detail="query must be at least 2 characters")
 
-    # Parameterized ILIKE pattern — never f-string the user input
-    pattern = f"%{term}%"
-
     pool = await get_pool()
     results: Dict[str, List[Dict[str, Any]]] = {
         "incidents": [],
@@ -7311,147 +7411,35 @@ async def search_site(
     }
 
     async with tenant_connection(pool, site_id=site_id) as conn:
-        # 1) Incidents — title, incident_type, details::text
         try:
-            incident_rows = await conn.fetch(
-                """
-                SELECT id::text AS id, incident_type, COALESCE(details->>'title','') AS title,
-                       severity, status, created_at
-                FROM incidents
-                WHERE site_id = $1
-                  AND (
-                    COALESCE(details->>'title','') ILIKE $2
-                    OR incident_type ILIKE $2
-                    OR details::text ILIKE $2
-                  )
-                ORDER BY created_at DESC
-                LIMIT $3
-                """,
-                site_id,
-                pattern,
-                limit,
+            hits = await search_documents(
+                conn, [site_id], term, limit=limit,
+                kinds=("incident", "device", "credential", "workstation"),
             )
-            for r in incident_rows:
-                results["incidents"].append({
-                    "id": r["id"],
-                    "incident_type": r["incident_type"],
-                    "title": r["title"] or r["incident_type"],
-                    "severity": r["severity"],
-                    "status": r["status"],
-                    "created_at": r["created_at"].isoformat() if r["created_at"] else None,
-                })
         except Exception as e:
-            logger.warning(f"search_site: incidents query failed for {site_id}: {e}")
-
-        # 2) Discovered devices — hostname, ip_address, mac_address
-        # NOTE: incidents.title lives in details JSONB — there's no title column.
-        try:
-            # canonical-migration: device_count_per_site — Phase 2 Batch 2 (Task #74)
-            # Search-by-hostname/ip/mac. CTE-JOIN-back; id stays from
-            # discovered_devices (incident-correlation lookup; not a
-            # write-path).
-            device_rows = await conn.fetch(
-                """
-                WITH dd_freshest AS (
-                    SELECT DISTINCT ON (cd.canonical_id) cd.canonical_id, dd.*
-                      FROM canonical_devices cd
-                      JOIN discovered_devices dd
-                        ON dd.site_id = cd.site_id
-                       AND dd.ip_address = cd.ip_address
-                       AND COALESCE(dd.mac_address, '') = cd.mac_dedup_key
-                     WHERE cd.site_id = $1
-                     ORDER BY cd.canonical_id, dd.last_seen_at DESC
-                )
-                SELECT id::text AS id, hostname, ip_address, mac_address, device_type
-                FROM dd_freshest
-                WHERE (
-                    COALESCE(hostname,'') ILIKE $2
-                    OR COALESCE(ip_address,'') ILIKE $2
-                    OR COALESCE(mac_address,'') ILIKE $2
-                  )
-                ORDER BY last_seen_at DESC NULLS LAST
-                LIMIT $3
-                """,
-                site_id,
-                pattern,
-                limit,
-            )
-            for r in device_rows:
-                results["devices"].append({
-                    "id": r["id"],
-                    "hostname": r["hostname"],
-                    "ip_address": r["ip_address"],
-                    "mac_address": r["mac_address"],
-                    "device_type": r["device_type"],
-                })
-        except Exception as e:
-            logger.warning(f"search_site: devices query failed for {site_id}: {e}")
-
-        # 3) Site credentials — credential_name, credential_type
-        # Never return encrypted_data — only metadata.
-        try:
-            cred_rows = await conn.fetch(
-                """
-                SELECT id::text AS id, credential_type, credential_name
-                FROM site_credentials
-                WHERE site_id = $1
-                  AND (
-                    credential_name ILIKE $2
-                    OR credential_type ILIKE $2
-                  )
-                ORDER BY updated_at DESC
-                LIMIT $3
-                """,
-                site_id,
-                pattern,
-                limit,
-            )
-            for r in cred_rows:
-                results["credentials"].append({
-                    "id": r["id"],
-                    "credential_type": r["credential_type"],
-                    "credential_name": r["credential_name"],
-                })
-        except Exception as e:
-            logger.warning(f"search_site: credentials query failed for {site_id}: {e}")
-
-        # 4) Workstations — hostname, os_name, compliance_status
-        # Table has os_name (not "os"); we expose it under "os" in the response
-        # to match the documented shape. Skip gracefully if table is missing.
-        try:
-            ws_rows = await conn.fetch(
-                """
-                SELECT id::text AS id, hostname,
-                       COALESCE(os_name,'') AS os_name,
-                       COALESCE(os_version,'') AS os_version,
-                       compliance_status
-                FROM workstations
-                WHERE site_id = $1
-                  AND (
-                    hostname ILIKE $2
-                    OR COALESCE(os_name,'') ILIKE $2
-                    OR COALESCE(compliance_status,'') ILIKE $2
-                  )
-                ORDER BY last_seen DESC NULLS LAST
-                LIMIT $3
-                """,
-                site_id,
-                pattern,
-                limit,
-            )
-            for r in ws_rows:
-                os_label = r["os_name"]
-                if r["os_version"]:
-                    os_label = f"{os_label} {r['os_version']}".strip()
-                results["workstations"].append({
-                    "id": r["id"],
-                    "hostname": r["hostname"],
-                    "os": os_label or None,
-                    "compliance_status": r["compliance_status"],
-                })
-        except Exception as e:
-            # workstations table may not exist in all deployments — skip category
-            logger.warning(f"search_site: workstations query skipped for {site_id}: {e}")
+            logger.warning(f"search_site: search_documents query failed for {site_id}: {e}")
+            hits = {}
+
+    for doc in hits.get("incident", []):
+        p = doc["payload"]
+        results["incidents"].append({
+            "id": p.get("id"),
+            "incident_type": p.get("incident_type"),
+            "title": p.get("title") or p.get("incident_type"),
+            "severity": p.get("severity"),
+            "status": p.get("status"),
+            "created_at": doc["sort_at"].isoformat() if doc["sort_at"] else None,
+        })
+    # Devices are one document per canonical (ip, mac); payload carries
+    # the freshest discovered_devices row's id for incident correlation.
+    # Credentials carry metadata only — never encrypted_data.
+    for kind, key, fields in (
+        ("device", "devices", ("id", "hostname", "ip_address", "mac_address", "device_type")),
+        ("credential", "credentials", ("id", "credential_type", "credential_name")),
+        ("workstation", "workstations", ("id", "hostname", "os", "compliance_status")),
+    ):
+        for doc in hits.get(kind, []):
+            results[key].append({f: doc["payload"].get(f) for f in fields})
 
     total = sum(len(v) for v in results.values())
     return {
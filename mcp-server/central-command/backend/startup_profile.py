@@ -0,0 +1,224 @@
+"""
+Startup profiling for the Central Command API.
+
+Cold start is mostly import time: ~1.7k FastAPI routes are built while
+main.py and the router modules load (pydantic schema generation per
+parameter, and include_router builds every route a second time), and
+worker recycling and rolling deploys pay that on every start.
+
+Two tools:
+
+  * Phase marks — main.py calls mark() when imports finish (lifespan
+    entry), when lifespan startup completes, and when the first request
+    is answered. prometheus_metrics renders them as
+    osiriscare_startup_phase_seconds{phase,release} (seconds since the
+    process started), so time-to-first-request can be compared release
+    over release.
+  * Import profiler — `python -m dashboard_api.startup_profile` runs
+    `python -X importtime -c "import main"` in a fresh interpreter and
+    prints the slowest modules. --budget-modules, --budget-ms and
+    --forbid turn it into a gate; tests/test_import_budget.py runs it in
+    CI with IMPORT_MODULE_BUDGET and DEFERRED_MODULES (the wall-clock
+    IMPORT_BUDGET_MS check is opt-in, it depends on the runner).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Modules loaded by `import main`: 919 today (1036 before the deferred
+# imports below). Deterministic for a given lockfile, so this is the
+# default CI gate for import growth.
+IMPORT_MODULE_BUDGET = 1000
+
+# Wall-clock budget for `import main` (warm bytecode). ~5s on a dev box
+# today. Noisy on shared runners, so CI only checks it when the
+# IMPORT_BUDGET_MS env var is set.
+IMPORT_BUDGET_MS = 12000
+
+# Heavy packages that must not load at `import main`. Each is imported
+# by the code path that needs it (lazy_imports.LazyModule for stripe,
+# function-local imports for the rest).
+DEFERRED_MODULES = (
+    "stripe",
+    "weasyprint",
+    "minio",
+    "opentimestamps",
+    "aiohttp",
+    "compliance_agent",
+    "dashboard_api.integrations.aws",
+    "dashboard_api.integrations.oauth",
+)
+
+# mcp-server/ — where `import main` resolves.
+SERVER_DIR = Path(__file__).resolve().parents[2]
+
+
+# =============================================================================
+# Phase marks
+# =============================================================================
+
+
+def _process_start_monotonic() -> float:
+    """time.monotonic() value at process start.
+
+    Read from /proc so interpreter start-up and the imports that run
+    before this module loads are counted; falls back to now.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (starttime, clock ticks after boot); split after
+            # the parenthesised command name, which may contain spaces.
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        return time.monotonic() - max(age, 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.monotonic()
+
+
+_PROCESS_START = _process_start_monotonic()
+_phases: Dict[str, float] = {}
+_phases_lock = threading.Lock()
+_release = "unknown"
+
+
+def mark(phase: str) -> None:
+    """Record that `phase` was reached. Only the first mark counts."""
+    if phase in _phases:
+        return
+    with _phases_lock:
+        _phases.setdefault(phase, round(time.monotonic() - _PROCESS_START, 3))
+
+
+def set_release(release: str) -> None:
+    global _release
+    _release = release or "unknown"
+
+
+def startup_phases() -> Dict[str, float]:
+    """phase -> seconds after process start, in the order reached."""
+    with _phases_lock:
+        return dict(_phases)
+
+
+def release() -> str:
+    return _release
+
+
+# =============================================================================
+# Import profiler
+# =============================================================================
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse `-X importtime` stderr; other lines (logging) are skipped."""
+    records = []
+    for line in output.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            records.append(ImportRecord(
+                module=m.group(4),
+                self_us=int(m.group(1)),
+                cumulative_us=int(m.group(2)),
+                depth=(len(m.group(3)) - 1) // 2,
+            ))
+    return records
+
+
+def profile_import(
+    target: str = "main",
+    cwd: Optional[Path] = None,
+    python: str = sys.executable,
+) -> List[ImportRecord]:
+    """Import `target` in a fresh interpreter and return its import tree."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=str(cwd or SERVER_DIR),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.splitlines()[-20:])
+        raise RuntimeError(f"import {target} failed (exit {proc.returncode}):\n{tail}")
+    return parse_importtime(proc.stderr)
+
+
+def total_ms(records: Iterable[ImportRecord]) -> float:
+    """Wall time of all top-level imports, in ms."""
+    return sum(r.cumulative_us for r in records if r.depth == 0) / 1000.0
+
+
+def forbidden_imports(records: Iterable[ImportRecord], forbidden: Sequence[str]) -> List[str]:
+    """Forbidden names that `records` imported (directly or a submodule)."""
+    modules = {r.module for r in records}
+    return sorted(
+        f for f in forbidden
+        if any(m == f or m.startswith(f + ".") for m in modules)
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m dashboard_api.startup_profile",
+        description="Profile the import time of the API entry point.",
+    )
+    parser.add_argument("target", nargs="?", default="main")
+    parser.add_argument("--cwd", type=Path, default=SERVER_DIR)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("self", "cumulative"), default="self")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="exit 1 if the total import time exceeds this")
+    parser.add_argument("--budget-modules", type=int, default=None,
+                        help="exit 1 if more modules than this are imported")
+    parser.add_argument("--forbid", action="append", default=[],
+                        help="exit 1 if this module (or a submodule) is imported; repeatable")
+    parser.add_argument("--deferred", action="store_true",
+                        help="forbid every module in DEFERRED_MODULES")
+    args = parser.parse_args(argv)
+
+    records = profile_import(args.target, cwd=args.cwd)
+    key = (lambda r: r.self_us) if args.sort == "self" else (lambda r: r.cumulative_us)
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for r in sorted(records, key=key, reverse=True)[: args.top]:
+        print(f"{r.self_us / 1000:9.1f} {r.cumulative_us / 1000:9.1f}  {r.module}")
+    total = total_ms(records)
+    print(f"\nimport {args.target}: {total:.0f} ms, {len(records)} modules")
+
+    failed = False
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"over budget: {total:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if args.budget_modules is not None and len(records) > args.budget_modules:
+        print(f"over budget: {len(records)} modules > {args.budget_modules}")
+        failed = True
+    forbidden = list(args.forbid) + (list(DEFERRED_MODULES) if args.deferred else [])
+    hits = forbidden_imports(records, forbidden)
+    if hits:
+        print("deferred modules imported at startup: " + ", ".join(hits))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,14 +50,12 @@ from pydantic import BaseModel
 from .fleet import get_pool
 from .tenant_middleware import admin_connection, admin_transaction
 from .partners import require_partner
+from .lazy_imports import module_available, stripe
 
 logger = logging.getLogger(__name__)
 
-try:
-    import stripe
-    HAS_STRIPE = True
-except ImportError:
-    HAS_STRIPE = False
+HAS_STRIPE = module_available("stripe")
+if not HAS_STRIPE:
     logger.warning("stripe library not installed - Connect endpoints disabled")
 
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
@@ -81,10 +79,6 @@ _MONTHLY_AMOUNT_CENTS = {
     "enterprise":  129900,
 }
 
-if HAS_STRIPE and STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
-
-
 router = APIRouter(prefix="/api/partners/me/payouts", tags=["partner-payouts"])
 
 
@@ -10,12 +10,24 @@ Architecture:
         tenant isolation (is_admin='false', current_tenant=site_id).
 
 Works with PgBouncer transaction pooling mode.
+
+Round trips: the transactional helpers apply their whole RLS context in
+ONE statement — `SELECT set_config('app.x', '...', true), ...` (the
+`true` makes each setting transaction-local, identical to SET LOCAL) —
+instead of 2-4 separate SET LOCALs. A context costs BEGIN + 1 + COMMIT.
+Per-helper and per-request round-trip counters are exported through
+prometheus_metrics (`rls_metrics`). Contexts are NOT cached across
+borrowers on the session: PgBouncer's DISCARD ALL and transaction-pool
+backend routing make a session-level cache unsound; only the statement
+text is cached.
 """
 
+import functools
 import logging
 import re
-from contextlib import asynccontextmanager
-from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import asyncpg
 
@@ -29,6 +41,82 @@ _SAFE_APPLIANCE_ID = re.compile(r"^[a-zA-Z0-9.:_-]{1,160}$")
 _SAFE_UUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
 
 
+# GUCs the helpers may set, and the value charset set_config accepts
+# (union of the validators above, plus '' for "unset").
+_RLS_SETTINGS = frozenset({
+    "current_tenant", "is_admin", "actor_appliance_id",
+    "current_org", "current_partner_id",
+})
+_SAFE_SETTING_VALUE = re.compile(r"^[a-zA-Z0-9.:_-]{0,160}$")
+
+# helper -> {"contexts": n, "round_trips": n}; process-local.
+_RLS_METRICS: Dict[str, Dict[str, int]] = {}
+_REQUEST_METRICS: Dict[str, int] = {"requests": 0, "round_trips": 0}
+_request_round_trips: ContextVar[Optional[List[int]]] = ContextVar(
+    "rls_request_round_trips", default=None,
+)
+
+
+def _record_round_trips(helper: str, round_trips: int) -> None:
+    m = _RLS_METRICS.setdefault(helper, {"contexts": 0, "round_trips": 0})
+    m["contexts"] += 1
+    m["round_trips"] += round_trips
+    acc = _request_round_trips.get()
+    if acc is not None:
+        acc[0] += round_trips
+
+
+@contextmanager
+def track_request_round_trips() -> Iterator[List[int]]:
+    """Accumulate RLS context round trips for one HTTP request.
+
+    main.py's request middleware wraps call_next in this; every helper
+    below adds its BEGIN/SET/COMMIT count to the request's tally.
+    """
+    acc = [0]
+    token = _request_round_trips.set(acc)
+    try:
+        yield acc
+    finally:
+        _request_round_trips.reset(token)
+        if acc[0]:
+            _REQUEST_METRICS["requests"] += 1
+            _REQUEST_METRICS["round_trips"] += acc[0]
+
+
+def rls_metrics() -> Dict[str, Dict[str, int]]:
+    """Process-local round-trip counters (Prometheus export)."""
+    out = {k: dict(v) for k, v in _RLS_METRICS.items()}
+    out["_requests"] = dict(_REQUEST_METRICS)
+    return out
+
+
+@functools.lru_cache(maxsize=2048)
+def _set_config_sql(settings: Tuple[Tuple[str, str], ...]) -> str:
+    """One simple-query statement applying every setting txn-locally.
+
+    Values are interpolated (not $n-bound) on purpose: a bound statement
+    costs a Parse/Describe round trip of its own with
+    statement_cache_size=0, which would undo the saving. Every name and
+    value is re-checked here so a caller that skipped validation still
+    can't inject.
+    """
+    parts = []
+    for name, value in settings:
+        if name not in _RLS_SETTINGS:
+            raise ValueError(f"Unknown RLS setting: {name!r}")
+        if not _SAFE_SETTING_VALUE.match(value):
+            raise ValueError(f"Invalid value for RLS setting {name}: {value!r}")
+        parts.append(f"set_config('app.{name}', '{value}', true)")
+    return "SELECT " + ", ".join(parts)
+
+
+async def _set_local_context(conn: asyncpg.Connection, **settings: str) -> None:
+    """SET LOCAL every `app.<name> = value` in a single round trip.
+    Must run inside a transaction, exactly like SET LOCAL."""
+    await conn.execute(_set_config_sql(tuple(settings.items())))
+
+
 def _validated_site_id(site_id: str) -> str:
     """Validate site_id is safe for SET LOCAL interpolation."""
     if not _SAFE_SITE_ID.match(site_id):
@@ -90,6 +178,7 @@ async def tenant_connection(
             # PgBouncer's server_reset_query = DISCARD ALL clears this
             # before the next borrower acquires the connection.
             await conn.execute("SET app.is_admin TO 'true'")
+            _record_round_trips("tenant_admin", 2)  # SET + RESET
             try:
                 yield conn
             finally:
@@ -98,25 +187,24 @@ async def tenant_connection(
                 except Exception:
                     logger.warning("tenant_connection(is_admin=True) RESET failed")
         elif site_id:
-            # Tenant-scoped: wrap in transaction for SET LOCAL scoping
-            async with conn.transaction():
-                safe_id = _validated_site_id(site_id)
-                await conn.execute(
-                    f"SET LOCAL app.current_tenant = '{safe_id}'"
+            # Tenant-scoped: wrap in transaction for SET LOCAL scoping.
+            # Validate before BEGIN so a bad id costs no round trip.
+            safe_id = _validated_site_id(site_id)
+            settings = {"current_tenant": safe_id, "is_admin": "false"}
+            if actor_appliance_id:
+                settings["actor_appliance_id"] = _validated_appliance_id(
+                    actor_appliance_id
                 )
-                await conn.execute("SET LOCAL app.is_admin = 'false'")
-                if actor_appliance_id:
-                    safe_aid = _validated_appliance_id(actor_appliance_id)
-                    await conn.execute(
-                        f"SET LOCAL app.actor_appliance_id = '{safe_aid}'"
-                    )
+            async with conn.transaction():
+                await _set_local_context(conn, **settings)
+                _record_round_trips("tenant", 3)  # BEGIN + set_config + COMMIT
                 yield conn
         else:
             # No tenant context — RLS will return empty results
             async with conn.transaction():
                 logger.warning("tenant_connection called without site_id or is_admin")
-                await conn.execute("SET LOCAL app.is_admin = 'false'")
-                await conn.execute("SET LOCAL app.current_tenant = ''")
+                await _set_local_context(conn, is_admin="false", current_tenant="")
+                _record_round_trips("tenant", 3)
                 yield conn
 
 
@@ -163,6 +251,7 @@ async def admin_connection(pool: asyncpg.Pool):
     async with pool.acquire() as conn:
         # Explicit admin opt-in. No transaction wrapper — intentional.
         await conn.execute("SET app.is_admin TO 'true'")
+        _record_round_trips("admin", 2)  # SET + RESET
         try:
             yield conn
         finally:
@@ -215,6 +304,7 @@ async def admin_transaction(pool: asyncpg.Pool):
     async with pool.acquire() as conn:
         async with conn.transaction():
             await conn.execute("SET LOCAL app.is_admin TO 'true'")
+            _record_round_trips("admin_transaction", 3)
             yield conn
 
 
@@ -244,12 +334,13 @@ async def org_connection(
             rows = await conn.fetch("SELECT * FROM incidents")
             # RLS filters to sites owned by this org
     """
+    safe_org = _validated_org_id(org_id)
     async with pool.acquire() as conn:
         async with conn.transaction():
-            safe_org = _validated_org_id(org_id)
-            await conn.execute(f"SET LOCAL app.current_org = '{safe_org}'")
-            await conn.execute("SET LOCAL app.is_admin = 'false'")
-            await conn.execute("SET LOCAL app.current_tenant = ''")
+            await _set_local_context(
+                conn, current_org=safe_org, is_admin="false", current_tenant="",
+            )
+            _record_round_trips("org", 3)
             yield conn
 
 
@@ -291,15 +382,17 @@ async def partner_connection(
             )
             # RLS filters to appliances under sites with partner_id=X
     """
+    safe_partner = _validated_org_id(partner_id)
     async with pool.acquire() as conn:
         async with conn.transaction():
-            safe_partner = _validated_org_id(partner_id)
-            await conn.execute(
-                f"SET LOCAL app.current_partner_id = '{safe_partner}'"
+            await _set_local_context(
+                conn,
+                current_partner_id=safe_partner,
+                is_admin="false",
+                current_tenant="",
+                current_org="",
             )
-            await conn.execute("SET LOCAL app.is_admin = 'false'")
-            await conn.execute("SET LOCAL app.current_tenant = ''")
-            await conn.execute("SET LOCAL app.current_org = ''")
+            _record_round_trips("partner", 3)
             yield conn
 
 
@@ -315,13 +408,8 @@ async def set_tenant_context(
 
     IMPORTANT: Must be called within an active transaction for SET LOCAL to work.
     """
-    if is_admin:
-        await conn.execute("SET LOCAL app.is_admin = 'true'")
-    else:
-        await conn.execute("SET LOCAL app.is_admin = 'false'")
-
-    if site_id:
-        safe_id = _validated_site_id(site_id)
-        await conn.execute(f"SET LOCAL app.current_tenant = '{safe_id}'")
-    else:
-        await conn.execute("SET LOCAL app.current_tenant = ''")
+    safe_id = _validated_site_id(site_id) if site_id else ""
+    await _set_local_context(
+        conn, is_admin="true" if is_admin else "false", current_tenant=safe_id,
+    )
+    _record_round_trips("set_tenant_context", 1)
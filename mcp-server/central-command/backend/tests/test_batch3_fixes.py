@@ -68,7 +68,9 @@ class TestTenantMiddleware:
         next_func = self.source.find("\nasync def ", start + 10)
         body = self.source[start:next_func]
         assert "conn.transaction()" in body
-        assert "SET LOCAL app.current_tenant" in body
+        # Single-round-trip set_config(..., true) == SET LOCAL.
+        assert "_set_local_context(conn" in body
+        assert '"current_tenant"' in body
 
     def test_org_connection_uses_transaction(self):
         """org_connection must use transaction for SET LOCAL."""
@@ -78,7 +80,8 @@ class TestTenantMiddleware:
             next_func = len(self.source)
         body = self.source[start:next_func]
         assert "conn.transaction()" in body
-        assert "SET LOCAL app.current_org" in body
+        assert "_set_local_context(" in body
+        assert "current_org=safe_org" in body
 
     def test_docstring_documents_explicit_set_post_234(self):
         """admin_connection docstring must explain the post-migration-234 explicit SET.
@@ -0,0 +1,84 @@
+"""Tests for delta checkins (checkin/delta.py) and their wiring in sites.py."""
+import asyncio
+import pathlib
+
+from checkin.delta import (
+    AGENT_IDS_KEY,
+    DELTA_PROTOCOL_VERSION,
+    plan_sections,
+    store_section_hashes,
+)
+
+_SITES = (pathlib.Path(__file__).resolve().parent.parent / "sites.py").read_text()
+
+
+def test_legacy_daemon_processes_everything():
+    plan = plan_sections(None, None, {"connected_agents": "a1"})
+    assert not plan.skip("connected_agents") and not plan.skip("signing_keys")
+    assert plan.response() == {"version": DELTA_PROTOCOL_VERSION, "ack": {}, "resync": False}
+
+
+def test_omitted_section_with_matching_hash_is_skipped():
+    plan = plan_sections(
+        {"connected_agents": "a1", "signing_keys": "k2"},
+        ["connected_agents"],
+        {"connected_agents": "a1", "signing_keys": "k1", AGENT_IDS_KEY: ["g1", "g2"]},
+    )
+    assert plan.skip("connected_agents") and "connected_agents" in plan.unchanged
+    assert not plan.skip("signing_keys")
+    assert plan.response()["ack"] == {"connected_agents": "a1", "signing_keys": "k2"}
+    assert plan.response()["resync"] is False
+    assert plan.agent_ids == ["g1", "g2"]
+
+
+def test_agents_ack_without_agent_ids_requests_resync():
+    # Pre-agent_ids ack: the liveness touch would have no scope.
+    plan = plan_sections({"connected_agents": "a1"}, ["connected_agents"], {"connected_agents": "a1"})
+    assert "connected_agents" not in plan.unchanged
+    assert plan.agent_ids == [] and plan.resync
+
+
+def test_omitted_section_with_unknown_hash_requests_resync():
+    plan = plan_sections({"connected_agents": "a2"}, ["connected_agents"], {"connected_agents": "a1"})
+    assert plan.skip("connected_agents") and "connected_agents" not in plan.unchanged
+    assert plan.response() == {"version": DELTA_PROTOCOL_VERSION, "ack": {}, "resync": True}
+
+
+def test_failed_section_is_not_acknowledged():
+    plan = plan_sections({"connected_agents": "a2", "bogus": "x"}, [], {})
+    plan.mark_failed("connected_agents")
+    assert plan.response()["ack"] == {}
+
+
+class _Conn:
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, sql, *args):
+        self.executed.append(args)
+
+
+def test_store_writes_only_on_change():
+    conn = _Conn()
+    stored = {"connected_agents": "a1", AGENT_IDS_KEY: ["g1"]}
+    steady = plan_sections({"connected_agents": "a1"}, ["connected_agents"], stored)
+    asyncio.run(store_section_hashes(conn, "site-AA", steady))
+    assert conn.executed == []
+
+    changed = plan_sections({"connected_agents": "a2"}, [], stored)
+    changed.agent_ids = ["g2", "g1"]
+    asyncio.run(store_section_hashes(conn, "site-AA", changed))
+    assert conn.executed == [
+        ('{"connected_agent_ids": ["g1", "g2"], "connected_agents": "a2"}', "site-AA")
+    ]
+
+
+def test_checkin_handler_wiring():
+    assert "delta_plan = plan_sections(" in _SITES
+    assert _SITES.count(
+        'elif "connected_agents" in delta_plan.unchanged and delta_plan.agent_ids:'
+    ) == 2
+    # Both liveness touches are scoped to the acknowledged agents.
+    assert _SITES.count("agent_id = ANY($2)") >= 2
+    assert "await store_section_hashes(conn, canonical_id, delta_plan)" in _SITES
+    assert '"checkin_delta": delta_plan.response(),' in _SITES
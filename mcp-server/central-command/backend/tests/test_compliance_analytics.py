@@ -0,0 +1,186 @@
+"""Gate for the columnar compliance analytics (compliance_analytics.py).
+
+Pins:
+  - per-site views reproduce the pre-change generators exactly
+    (monthly report category scores / overall / trend, packet score
+    and control posture) on a synthetic org
+  - latest-result tallies match a brute-force DISTINCT ON
+  - closed periods are cached and a single-site request is served from
+    a cached org load; open periods always re-read
+  - named binds translate to asyncpg $n without touching ::casts
+  - the month-end packet loop loads once per org and month
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+for p in (str(_BACKEND), str(_BACKEND / "scripts")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+import bench_compliance_analytics as bench  # noqa: E402
+import compliance_analytics  # noqa: E402
+from compliance_analytics import (  # noqa: E402
+    get_period_analytics,
+    load_period_analytics,
+)
+
+
+def _org(sites=6, bundles=40, checks=12, seed=3):
+    data = bench.synth_org(sites, bundles, checks, seed=seed)
+    # Edge cases: a bundle with no checks, a NULL check_type, a NULL status.
+    data.append({
+        "site_id": "site-000", "bundle_id": "empty",
+        "checked_at": bench.PERIOD_START + timedelta(days=3), "checks": [],
+    })
+    data[0]["checks"].append({"check": None, "status": "pass", "hostname": "h"})
+    data[1]["checks"].append({"check": "firewall_status", "status": None, "hostname": "h"})
+    return data
+
+
+def _load(data, site_ids=None):
+    conn = bench.AnalyticsConn(bench.analytics_result_sets(data))
+    site_ids = site_ids or sorted({b["site_id"] for b in data})
+    return asyncio.run(load_period_analytics(conn, site_ids, bench.PERIOD_START, bench.PERIOD_END))
+
+
+def test_site_views_match_legacy_generators():
+    data = _org()
+    analytics = _load(data)
+    by_site = {}
+    for b in data:
+        by_site.setdefault(b["site_id"], []).append(b)
+
+    for site_id, bundles in by_site.items():
+        bundles.sort(key=lambda b: b["checked_at"])
+        rows = [
+            [dict(c, status=c["status"] or "") for c in b["checks"]] for b in bundles
+        ]
+        monthly, overall, trend = bench._legacy_monthly(rows)
+        score, posture = bench._legacy_packet(bench._legacy_packet_rows(bundles))
+
+        got_monthly, got_overall, got_trend, got_score, got_posture = (
+            bench.columnar_site_report(analytics, site_id)
+        )
+        assert got_monthly == monthly, site_id
+        assert got_overall == overall, site_id
+        assert got_trend == trend, site_id
+        assert got_score == score, site_id
+        assert got_posture == posture, site_id
+        assert analytics.bundle_count(site_id) == len(bundles)
+
+
+def test_latest_status_counts_match_distinct_on():
+    data = _org(seed=9)
+    analytics = _load(data)
+    # A bundle can repeat (check, host); DISTINCT ON keeps one of them —
+    # the reference DB keeps the first, so do the same here.
+    latest = {}
+    for b in sorted(data, key=lambda b: b["checked_at"]):
+        seen = set()
+        for c in b["checks"]:
+            key = (b["site_id"], c["check"], c.get("hostname") or "")
+            if key not in seen:
+                seen.add(key)
+                latest[key] = c["status"]
+    want = Counter((s.lower() if s is not None else None) for s in latest.values())
+    assert analytics.latest_status_counts() == dict(want)
+
+    one = analytics.latest_status_counts(["site-001"])
+    want_one = Counter(
+        (s.lower() if s is not None else None)
+        for (site, _, _), s in latest.items() if site == "site-001"
+    )
+    assert one == dict(want_one)
+
+
+def test_daily_scores_cover_every_day_of_the_period():
+    analytics = _load(_org())
+    days = analytics.daily_scores("site-002")
+    assert len(days) == 30
+    assert days[0][0] == bench.PERIOD_START.date()
+    assert all(s is None or 0.0 <= s <= 100.0 for _, s in days)
+    assert analytics.daily_scores("unknown-site") == []
+
+
+def test_closed_period_cached_and_shared_with_single_site(monkeypatch):
+    monkeypatch.setattr(compliance_analytics, "_CACHE", type(compliance_analytics._CACHE)())
+    data = _org()
+    conn = bench.AnalyticsConn(bench.analytics_result_sets(data))
+    sites = sorted({b["site_id"] for b in data})
+
+    async def go():
+        org = await get_period_analytics(conn, sites, bench.PERIOD_START, bench.PERIOD_END)
+        one = await get_period_analytics(conn, ["site-003"], bench.PERIOD_START, bench.PERIOD_END)
+        return org, one
+
+    org, one = asyncio.run(go())
+    assert one is org
+    assert conn.statements == 3
+
+    # An open period (ends inside the grace window) is never cached.
+    now = datetime.now(timezone.utc)
+    start, end = now - timedelta(days=30), now + timedelta(days=1)
+
+    async def open_twice():
+        await get_period_analytics(conn, sites, start, end)
+        await get_period_analytics(conn, sites, start, end)
+
+    asyncio.run(open_twice())
+    assert conn.statements == 9
+
+
+def test_closed_period_cache_expires(monkeypatch):
+    # Late uploads can still land in a closed period: entries are only
+    # trusted for CACHE_TTL_SECONDS.
+    monkeypatch.setattr(compliance_analytics, "_CACHE", type(compliance_analytics._CACHE)())
+    data = _org()
+    conn = bench.AnalyticsConn(bench.analytics_result_sets(data))
+    sites = sorted({b["site_id"] for b in data})
+    clock = [1000.0]
+    monkeypatch.setattr(compliance_analytics.time, "monotonic", lambda: clock[0])
+
+    async def load():
+        return await get_period_analytics(conn, sites, bench.PERIOD_START, bench.PERIOD_END)
+
+    first = asyncio.run(load())
+    clock[0] += compliance_analytics.CACHE_TTL_SECONDS - 1
+    assert asyncio.run(load()) is first
+    assert conn.statements == 3
+
+    clock[0] += 2
+    assert asyncio.run(load()) is not first
+    assert conn.statements == 6
+
+
+def test_named_binds_translate_to_positional():
+    sql = compliance_analytics._positional(compliance_analytics._BUNDLES_SQL)
+    assert "ANY($1)" in sql
+    assert "cb.checked_at >= $2 AND cb.checked_at < $3" in sql
+    # Partition prune from below only: late-ingested bundles still count.
+    assert "cb.created_at >= $4\n" in sql and "cb.created_at <" not in sql
+    assert "'[]'::jsonb" in sql
+    assert ":start" not in sql and ":p_start" not in sql
+
+
+def test_packet_loop_loads_analytics_once_per_org_month():
+    src = (_BACKEND.parent.parent / "main.py").read_text()
+    body = src[src.index("async def _compliance_packet_loop"):]
+    body = body[:body.index("\n    async def ", 10)]
+    assert "client_org_id" in body
+    assert body.count("get_period_analytics(") == 1
+    assert "analytics=analytics" in body
+    # Engine created once per pass, not per site.
+    assert body.count("create_async_engine(") == 1
+    assert "_pkt_engine.dispose()" in body
+
+
+def test_benchmark_columnar_path_is_three_statements_per_org():
+    rows = {r["path"]: r for r in bench.run(sites=4, bundles=6, checks=5, rtt_ms=0.0)}
+    assert rows["columnar"]["statements"] == 3
+    assert rows["legacy"]["statements"] == 3 * 4
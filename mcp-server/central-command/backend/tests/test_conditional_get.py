@@ -0,0 +1,288 @@
+"""Gate for semantic conditional GET (conditional_get.py + mig 330).
+
+Pins:
+  - WATCHED_TABLES lockstep with the bump_change_version() triggers
+    created by migrations/330_change_versions.sql.
+  - ETag derivation: stable for unchanged versions, rotates on any
+    version bump / principal / salt / time bucket.
+  - If-None-Match weak comparison (list, `*`, W/ prefix).
+  - check_not_modified raises 304 BEFORE the handler's own queries on
+    the three migrated routes (source-shape).
+  - ETagMiddleware passes route-stamped ETags through untouched and
+    now actually emits its body-hash ETag on 200.
+
+No DB dep — version reads go through a fake connection.
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import re
+import sys
+
+import pytest
+from fastapi import FastAPI, Response
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+_MIG = _BACKEND / "migrations" / "330_change_versions.sql"
+_MAIN = _BACKEND.parent.parent / "main.py"
+
+
+class _FakeConn:
+    def __init__(self, rows=None, fail=False):
+        self.rows = rows or []
+        self.fail = fail
+        self.calls = []
+
+    def transaction(self):
+        conn = self
+
+        class _Tx:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Tx()
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        if self.fail:
+            raise RuntimeError('relation "change_versions" does not exist')
+        return list(self.rows)
+
+
+def _row(table, scope, version):
+    return {"table_name": table, "scope_key": scope, "version": version}
+
+
+class _Req:
+    def __init__(self, inm=None):
+        self.headers = {"if-none-match": inm} if inm else {}
+
+
+class _Resp:
+    def __init__(self):
+        self.headers = {}
+
+
+# ------------------------------------------------------------ lockstep
+
+def test_watched_tables_match_migration_triggers():
+    from conditional_get import WATCHED_TABLES
+    src = _MIG.read_text()
+    triggers = dict(
+        (m.group(1), m.group(2))
+        for m in re.finditer(
+            r"\('trg_change_version_\w+',\s*'(\w+)',\s*'([\w*]+)',", src,
+        )
+    )
+    assert triggers == WATCHED_TABLES
+
+
+def test_site_appliances_bumps_only_on_rendered_columns():
+    # A checkin UPDATE (last_checkin, ip_addresses, ...) must not bump.
+    src = _MIG.read_text()
+    row = re.search(r"\('trg_change_version_site_appliances',[^\n]*\)", src).group(0)
+    assert "ARRAY['site_id', 'deleted_at']" in row
+    assert "'FOR EACH ROW WHEN (%s) '" in src
+    assert "OLD.%1$I IS DISTINCT FROM NEW.%1$I" in src
+
+
+@pytest.mark.parametrize("table, per_checkin", [
+    ("sites", ("wg_connected_at", "wg_ip")),
+    ("site_go_agent_summaries", ("last_event", "updated_at")),
+])
+def test_checkin_written_tables_bump_only_on_rendered_columns(table, per_checkin):
+    # sites.py STEP 3.6b and the mig 019 summary trigger (STEP 3.7) write
+    # these on every checkin; the views' ETags must not rotate for it.
+    src = _MIG.read_text()
+    row = re.search(rf"\('trg_change_version_{table}',[^\n]*\)", src).group(0)
+    columns = re.search(r"ARRAY\[([^\]]*)\]", row).group(1)
+    assert "'site_id'" in columns
+    for col in per_checkin:
+        assert f"'{col}'" not in columns
+
+
+def test_view_rejects_unwatched_or_misgrouped_tables():
+    from conditional_get import VersionedView
+    with pytest.raises(ValueError):
+        VersionedView(name="x", scope="site", site_tables=("incidents",))
+    with pytest.raises(ValueError):
+        VersionedView(name="x", scope="site", site_tables=("l1_rules",))
+    with pytest.raises(ValueError):
+        VersionedView(name="x", scope="tenant")
+
+
+# ------------------------------------------------------------ ETag
+
+def test_etag_stable_and_rotates_on_bump_principal_salt():
+    from conditional_get import PARTNER_MY_SITES, compute_etag
+    rows = [_row("sites", "s1", 3), _row("~members", "s1", 0)]
+
+    async def go():
+        a = await compute_etag(_FakeConn(rows), PARTNER_MY_SITES, "p1")
+        b = await compute_etag(_FakeConn(rows), PARTNER_MY_SITES, "p1")
+        bumped = await compute_etag(
+            _FakeConn([_row("sites", "s1", 4), _row("~members", "s1", 0)]),
+            PARTNER_MY_SITES, "p1",
+        )
+        other = await compute_etag(_FakeConn(rows), PARTNER_MY_SITES, "p2")
+        salted = await compute_etag(
+            _FakeConn(rows), PARTNER_MY_SITES, "p1", salt="sha2",
+        )
+        return a, b, bumped, other, salted
+
+    a, b, bumped, other, salted = asyncio.run(go())
+    assert a.startswith('W/"') and a == b
+    assert len({a, bumped, other, salted}) == 4
+
+
+def test_etag_rotates_per_time_bucket(monkeypatch):
+    import conditional_get
+    from conditional_get import CLIENT_DASHBOARD, compute_etag
+    monkeypatch.setattr(conditional_get.time, "time", lambda: 1000.0)
+    first = asyncio.run(compute_etag(_FakeConn(), CLIENT_DASHBOARD, "o1"))
+    monkeypatch.setattr(conditional_get.time, "time", lambda: 1019.0)
+    same = asyncio.run(compute_etag(_FakeConn(), CLIENT_DASHBOARD, "o1"))
+    monkeypatch.setattr(conditional_get.time, "time", lambda: 1020.0)
+    rotated = asyncio.run(compute_etag(_FakeConn(), CLIENT_DASHBOARD, "o1"))
+    assert first == same != rotated
+
+
+def test_version_read_passes_declared_tables():
+    from conditional_get import AGENT_SYNC_RULES, compute_etag
+    conn = _FakeConn()
+    asyncio.run(compute_etag(conn, AGENT_SYNC_RULES, "site-a"))
+    sql, args = conn.calls[0]
+    assert "FROM change_versions" in sql
+    assert args == ("site-a", ["sites"], [], ["l1_rules", "app_profile_rules"])
+
+
+def test_version_read_failure_fails_open():
+    from conditional_get import (
+        PARTNER_MY_SITES, check_not_modified, conditional_get_metrics,
+    )
+    before = conditional_get_metrics()["errors"]
+    resp = _Resp()
+    etag = asyncio.run(check_not_modified(
+        _Req('W/"anything"'), resp, _FakeConn(fail=True),
+        PARTNER_MY_SITES, "p1",
+    ))
+    assert etag is None
+    assert "ETag" not in resp.headers
+    assert conditional_get_metrics()["errors"] == before + 1
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('W/"zzz", W/"abc"', True),
+    ("*", True),
+    ('W/"abcd"', False),
+])
+def test_etag_matches(header, expected):
+    from conditional_get import etag_matches
+    assert etag_matches(header, 'W/"abc"') is expected
+
+
+def test_check_not_modified_304_and_miss():
+    from fastapi import HTTPException
+    from conditional_get import PARTNER_MY_SITES, check_not_modified
+
+    resp = _Resp()
+    etag = asyncio.run(check_not_modified(
+        _Req(), resp, _FakeConn(), PARTNER_MY_SITES, "p1",
+    ))
+    assert resp.headers["ETag"] == etag
+
+    with pytest.raises(HTTPException) as ei:
+        asyncio.run(check_not_modified(
+            _Req(etag), _Resp(), _FakeConn(), PARTNER_MY_SITES, "p1",
+        ))
+    assert ei.value.status_code == 304
+    assert ei.value.headers["ETag"] == etag
+
+
+# ------------------------------------------------------------ routes
+
+def _body_after(src: str, signature: str) -> str:
+    start = src.index(signature)
+    nxt = re.search(r"\n@\w+", src[start:])
+    return src[start:start + nxt.start()] if nxt else src[start:]
+
+
+@pytest.mark.parametrize("path,signature,view,first_work", [
+    ("partners.py", "async def get_my_sites(", "PARTNER_MY_SITES",
+     "await conn.fetch("),
+    ("client_portal.py", "async def get_dashboard(", "CLIENT_DASHBOARD",
+     "await conn.fetchrow("),
+])
+def test_routes_check_before_querying(path, signature, view, first_work):
+    body = _body_after((_BACKEND / path).read_text(), signature)
+    assert f"check_not_modified(" in body and view in body
+    assert body.index("check_not_modified(") < body.index(first_work)
+
+
+def test_partner_sites_304_is_still_audited():
+    body = _body_after((_BACKEND / "partners.py").read_text(), "async def get_my_sites(")
+    handler = body[body.index("except HTTPException as e:"):body.index("await conn.fetch(")]
+    assert "e.status_code == 304" in handler
+    assert '_log_listed({"not_modified": True})' in handler
+    assert "\n            raise\n" in handler
+
+
+def test_agent_sync_checks_before_building_rules():
+    body = _body_after(_MAIN.read_text(), "async def agent_sync_rules(")
+    assert "AGENT_SYNC_RULES" in body
+    assert body.index("check_not_modified(") < body.index("get_rule_bundle(")
+    assert "_read_runtime_git_sha()" in body
+
+
+def test_main_http_exception_handler_keeps_304_bodyless():
+    body = _body_after(
+        _MAIN.read_text(), "async def http_exception_handler(",
+    )
+    assert "exc.status_code == 304" in body
+    assert body.index("exc.status_code == 304") < body.index("JSONResponse(")
+
+
+# ------------------------------------------------------------ middleware
+
+def _app_with_middleware():
+    from fastapi.testclient import TestClient
+    from etag_middleware import ETagMiddleware
+
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+
+    @app.get("/plain")
+    async def plain():
+        return {"ok": True}
+
+    @app.get("/stamped")
+    async def stamped(response: Response):
+        response.headers["ETag"] = 'W/"route"'
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_middleware_emits_body_hash_etag_and_304():
+    client = _app_with_middleware()
+    r = client.get("/plain")
+    assert r.status_code == 200 and r.headers["etag"].startswith('W/"')
+    r2 = client.get("/plain", headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304
+
+
+def test_middleware_passes_route_etag_through():
+    client = _app_with_middleware()
+    r = client.get("/stamped")
+    assert r.status_code == 200
+    assert r.headers["etag"] == 'W/"route"'
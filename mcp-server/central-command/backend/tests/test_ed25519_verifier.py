@@ -0,0 +1,99 @@
+"""Tests for the cached Ed25519 verifier and sigauth nonce ring."""
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from ed25519_verifier import (
+    NonceRing,
+    VerifierCache,
+    key_fingerprint,
+    verify,
+    verify_many,
+)
+
+
+def _keypair():
+    priv = Ed25519PrivateKey.generate()
+    pub = priv.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw).hex()
+    return priv, pub
+
+
+def test_repeat_lookup_hits_cache():
+    cache = VerifierCache()
+    _, pub = _keypair()
+    first = cache.get(pub)
+    assert first is not None
+    assert cache.get(pub.upper()) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_forget_drops_rotated_key():
+    cache = VerifierCache()
+    _, pub = _keypair()
+    cache.get(pub)
+    cache.forget(pub)
+    assert len(cache) == 0
+    cache.get(pub)
+    assert cache.misses == 2
+
+
+def test_fingerprint_collision_never_returns_other_key():
+    cache = VerifierCache()
+    _, pub_a = _keypair()
+    _, pub_b = _keypair()
+    key_a = cache.get(pub_a)
+    # Simulate a fingerprint collision: slot B's fingerprint holds key A.
+    cache._entries[key_fingerprint(pub_b)] = (pub_a, key_a)
+    assert cache.get(pub_b) is not key_a
+
+
+def test_lru_bound():
+    cache = VerifierCache(maxsize=2)
+    pubs = [_keypair()[1] for _ in range(3)]
+    for pub in pubs:
+        cache.get(pub)
+    assert len(cache) == 2
+    assert key_fingerprint(pubs[0]) not in cache._entries
+
+
+def test_malformed_keys_rejected():
+    cache = VerifierCache()
+    assert cache.get("") is None
+    assert cache.get("zz" * 32) is None
+    assert cache.get("ab" * 16) is None
+
+
+def test_verify_and_verify_many_preserve_order():
+    priv_a, pub_a = _keypair()
+    priv_b, pub_b = _keypair()
+    good_a = priv_a.sign(b"a")
+    good_b = priv_b.sign(b"b")
+    assert verify(pub_a, good_a, b"a")
+    assert not verify(pub_a, good_a, b"tampered")
+    assert verify_many([
+        (pub_a, good_a, b"a"),
+        (pub_b, good_a, b"a"),
+        (pub_b, good_b, b"b"),
+        (pub_a, b"short", b"a"),
+        ("not-hex", good_a, b"a"),
+    ]) == [True, False, True, False, False]
+
+
+def test_nonce_ring_ttl(monkeypatch):
+    import ed25519_verifier
+
+    now = [1000.0]
+    monkeypatch.setattr(ed25519_verifier.time, "monotonic", lambda: now[0])
+    ring = NonceRing(ttl_seconds=60)
+    ring.add("site:n1")
+    assert ring.seen("site:n1")
+    assert not ring.seen("site:n2")
+    now[0] += 61
+    assert not ring.seen("site:n1")
+
+
+def test_nonce_ring_bounded():
+    ring = NonceRing(ttl_seconds=3600, maxsize=3)
+    for i in range(5):
+        ring.add(f"n{i}")
+    assert len(ring) == 3
+    assert not ring.seen("n0") and ring.seen("n4")
@@ -21,6 +21,10 @@ by importing the module.
 When a new loop is added: register it in `_LOOP_LOCATIONS` AND
 `bg_heartbeat.EXPECTED_INTERVAL_S` in the same PR. The test fails if
 either side is missing — that's the lockstep guarantee.
+
+Scheduler tick jobs (background_tasks.maintenance_tick_jobs) have no
+sleep of their own: the JobSpec's interval_s is the cadence, and that
+is what EXPECTED_INTERVAL_S is checked against.
 """
 from __future__ import annotations
 
@@ -67,16 +71,13 @@ _LOOP_LOCATIONS: dict[str, Tuple[str, str]] = {
     "framework_sync": ("framework_sync", "framework_sync_loop"),
     "companion_alerts": ("companion", "companion_alert_check_loop"),
     "flywheel_orchestrator": ("background_tasks", "flywheel_orchestrator_loop"),
-    "partition_maintainer": ("background_tasks", "partition_maintainer_loop"),
-    "weekly_rollup_refresh": ("background_tasks", "weekly_rollup_refresh_loop"),
     "partner_weekly_digest": ("background_tasks", "partner_weekly_digest_loop"),
-    "expire_consent_request_tokens": ("background_tasks", "expire_consent_request_tokens_loop"),
-    "heartbeat_partition_maintainer": ("background_tasks", "heartbeat_partition_maintainer_loop"),
     "mesh_reassignment": ("background_tasks", "mesh_reassignment_loop"),
     "sigauth_auto_promotion": ("sigauth_enforcement", "sigauth_auto_promotion_loop"),
-    "client_telemetry_retention": ("background_tasks", "client_telemetry_retention_loop"),
     "data_hygiene_gc": ("background_tasks", "data_hygiene_gc_loop"),
     "relocation_finalize": ("background_tasks", "relocation_finalize_loop"),
+    "metrics_collector": ("prometheus_metrics", "metrics_collector_loop"),
+    "health_snapshot": ("fleet", "health_snapshot_loop"),
 }
 
 # Loops registered in EXPECTED_INTERVAL_S but whose definitions live
@@ -117,6 +118,9 @@ _LIFESPAN_INLINE_LOOPS = {
 
 _BACKEND_DIR = pathlib.Path(__file__).resolve().parent.parent
 
+# Scheduler tick jobs: (module_basename, function returning the JobSpecs).
+_TICK_JOB_SOURCES = [("background_tasks", "maintenance_tick_jobs")]
+
 
 def _load_module_constants(module_basename: str) -> dict[str, Any]:
     """Return module-level integer constants for arg resolution.
@@ -242,6 +246,29 @@ def _parse_function(module_basename: str, function_name: str):
     )
 
 
+def _tick_job_intervals() -> dict[str, Optional[int]]:
+    """name → interval_s of every JobSpec(...) built by the
+    _TICK_JOB_SOURCES functions, resolved from the AST."""
+    out: dict[str, Optional[int]] = {}
+    for module_basename, function_name in _TICK_JOB_SOURCES:
+        tree = ast.parse((_BACKEND_DIR / f"{module_basename}.py").read_text())
+        constants = _load_module_constants(module_basename)
+        func = next(
+            n for n in ast.walk(tree)
+            if isinstance(n, ast.FunctionDef) and n.name == function_name
+        )
+        for call in ast.walk(func):
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+                    and call.func.id == "JobSpec"):
+                continue
+            kw = {k.arg: k.value for k in call.keywords}
+            out[kw["name"].value] = _resolve_sleep_arg(kw["interval_s"], constants)
+    return out
+
+
+_TICK_JOBS = _tick_job_intervals()
+
+
 @pytest.mark.parametrize(
     "loop_name",
     [name for name in EXPECTED_INTERVAL_S if name in _LOOP_LOCATIONS],
@@ -270,13 +297,27 @@ def test_expected_interval_matches_loop_sleep(loop_name: str):
     )
 
 
+@pytest.mark.parametrize("job_name", sorted(_TICK_JOBS))
+def test_expected_interval_matches_tick_interval(job_name: str):
+    """Tick jobs: EXPECTED_INTERVAL_S[name] must equal the JobSpec's
+    interval_s — the scheduler records the heartbeat once per run."""
+    assert job_name in EXPECTED_INTERVAL_S, (
+        f"Tick job {job_name!r} has no bg_heartbeat.EXPECTED_INTERVAL_S entry."
+    )
+    assert _TICK_JOBS[job_name] == EXPECTED_INTERVAL_S[job_name], (
+        f"Calibration drift for {job_name}: EXPECTED_INTERVAL_S says "
+        f"{EXPECTED_INTERVAL_S[job_name]}s but its JobSpec interval_s is "
+        f"{_TICK_JOBS[job_name]}s."
+    )
+
+
 def test_every_expected_interval_entry_is_locatable_or_inline():
     """Lockstep: every loop in EXPECTED_INTERVAL_S must be either in
     _LOOP_LOCATIONS (parseable from a separate file) or in
     _LIFESPAN_INLINE_LOOPS (manually verified inline). Adding a new
     loop to EXPECTED_INTERVAL_S without registering its location here
     fails CI."""
-    locatable = set(_LOOP_LOCATIONS) | _LIFESPAN_INLINE_LOOPS | DRAIN_LOOPS
+    locatable = set(_LOOP_LOCATIONS) | set(_TICK_JOBS) | _LIFESPAN_INLINE_LOOPS | DRAIN_LOOPS
     expected = set(EXPECTED_INTERVAL_S)
     missing = expected - locatable
     assert not missing, (
@@ -0,0 +1,116 @@
+"""Gate for the set-based fleet overview (Migration 334).
+
+Pins:
+  - incidents / orders / site_appliances membership changes dirty the
+    snapshot via triggers; checkins (last_checkin updates) do not
+  - the refresh writes back the change_seq it read, so a concurrent
+    trigger keeps the row dirty
+  - get_fleet_overview is one query regardless of fleet size, and
+    per-appliance health uses the same calculate_overall_health math
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import pathlib
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+_MCP_SERVER = _BACKEND.parent.parent
+for p in (str(_BACKEND), str(_MCP_SERVER)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+_MIG = (_BACKEND / "migrations" / "334_appliance_health_snapshot.sql").read_text()
+
+
+def test_triggers_dirty_snapshot_on_incidents_orders_membership():
+    assert re.search(
+        r"AFTER INSERT OR UPDATE OF resolved_at, drift_data, appliance_id ON incidents", _MIG
+    )
+    assert re.search(r"AFTER INSERT OR UPDATE OF status ON orders", _MIG)
+    appliance_trg = re.search(r"AFTER INSERT OR UPDATE OF ([\w, ]+) ON site_appliances", _MIG)
+    assert appliance_trg and "last_checkin" not in appliance_trg.group(1)
+    assert "change_seq = appliance_health_snapshot.change_seq + 1" in _MIG
+
+
+def test_refresh_sql_is_set_based_and_race_safe():
+    from dashboard_api.fleet import _REFRESH_HEALTH_SNAPSHOT_SQL as sql
+
+    assert "h.change_seq > h.refreshed_seq" in sql
+    assert "refreshed_seq = EXCLUDED.refreshed_seq" in sql
+    # change_seq is never overwritten by the refresh.
+    assert "change_seq = EXCLUDED" not in sql
+    assert "LIMIT $2" in sql
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, sql, *args):
+        self.calls.append(sql)
+        return self.rows
+
+
+# One clock for every row, so "latest" comparisons across rows are exact.
+_NOW = datetime.now(timezone.utc)
+
+
+def _row(site_id, hostname, now=_NOW, **kw):
+    row = {
+        "id": f"{site_id}-{hostname}", "site_id": site_id, "hostname": hostname,
+        "ip_address": None, "agent_version": "1.0", "tier": "standard",
+        "is_online": True, "last_checkin": now - timedelta(minutes=2),
+        "created_at": now - timedelta(days=10),
+        "total_incidents_30d": 10, "resolved_incidents_30d": 8,
+        "total_orders_30d": 4, "executed_orders_30d": 4,
+        "incidents_24h": 1, "last_incident_at": now - timedelta(hours=1),
+        "latest_drift_data": {"patching_compliant": True, "av_compliant": True},
+    }
+    row.update(kw)
+    return row
+
+
+def test_fleet_overview_single_query(monkeypatch):
+    from dashboard_api import fleet
+    from dashboard_api.metrics import calculate_health_from_raw
+
+    rows = [
+        _row("site-a", "a1"),
+        _row("site-a", "a2", is_online=False, incidents_24h=2),
+        _row("site-b", "b1", total_incidents_30d=None, resolved_incidents_30d=None,
+             total_orders_30d=None, executed_orders_30d=None, incidents_24h=None,
+             last_incident_at=None, latest_drift_data=None),
+    ]
+    conn = _Conn(rows)
+
+    @contextlib.asynccontextmanager
+    async def _txn(pool):
+        yield conn
+
+    async def _pool():
+        return object()
+
+    monkeypatch.setattr(fleet, "admin_transaction", _txn)
+    monkeypatch.setattr(fleet, "get_pool", _pool)
+
+    overview = asyncio.run(fleet.get_fleet_overview())
+
+    assert len(conn.calls) == 1
+    assert "appliance_health_snapshot" in conn.calls[0]
+    a, b = overview
+    assert (a.site_id, a.appliance_count, a.online_count, a.incidents_24h) == ("site-a", 2, 1, 3)
+    assert a.last_incident == rows[0]["last_incident_at"]
+    assert (b.appliance_count, b.incidents_24h, b.last_incident) == (1, 0, None)
+
+    expected = calculate_health_from_raw(
+        last_checkin=rows[0]["last_checkin"],
+        successful_heals=8, total_incidents=10,
+        executed_orders=4, total_orders=4,
+        patching=True, antivirus=True,
+    )
+    assert fleet._health_from_snapshot(rows[0]).overall == expected.overall
@@ -0,0 +1,110 @@
+"""Gate for incremental heartbeat rollups (Migration 333).
+
+Pins:
+  - appliance_last_seen is trigger-maintained from appliance_heartbeats
+    INSERTs (so it stays orthogonal to site_appliances.last_checkin)
+  - appliance_status_rollup no longer scans raw heartbeats
+  - liveness readers (phantom_detector, mesh rebalance) use the summary
+  - the rollup advance reads only (watermark, upper], feeds 1m AND 1h
+    from one scan, and moves the watermark in the same transaction
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+_MCP_SERVER = _BACKEND.parent.parent
+for p in (str(_BACKEND), str(_MCP_SERVER)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+_MIG = (_BACKEND / "migrations" / "333_heartbeat_rollups.sql").read_text()
+
+
+def _body(src: str, name: str) -> str:
+    start = src.index(f"async def {name}")
+    end = src.find("\nasync def ", start + 10)
+    return src[start:end if end != -1 else len(src)]
+
+
+def test_last_seen_maintained_by_heartbeat_insert_trigger():
+    assert re.search(
+        r"CREATE TRIGGER trg_appliance_last_seen\s+AFTER INSERT ON appliance_heartbeats",
+        _MIG,
+    )
+    assert "GREATEST(appliance_last_seen.last_heartbeat_at" in _MIG
+
+
+def test_rollup_mv_reads_summary_not_raw():
+    mv = _MIG[_MIG.index("CREATE MATERIALIZED VIEW appliance_status_rollup"):]
+    mv = mv[:mv.index("CREATE UNIQUE INDEX")]
+    assert "appliance_heartbeats" not in mv.replace("appliance_heartbeat_1", "")
+    assert "appliance_last_seen" in mv
+    assert "OWNER TO mcp_app" in _MIG
+    # Columns the fleet endpoint reads must survive the rebuild.
+    for col in ("live_status", "last_heartbeat_at", "stale_seconds",
+                "liveness_drift_seconds", "uptime_ratio_24h", "checkin_count_24h"):
+        assert col in mv
+
+
+def test_liveness_readers_use_summary():
+    bg = (_BACKEND / "background_tasks.py").read_text()
+    phantom = _body(bg, "phantom_detector_loop")
+    assert "appliance_last_seen" in phantom
+    assert "FROM appliance_heartbeats" not in phantom
+
+    mesh = _body((_BACKEND / "mesh_targets.py").read_text(), "rebalance_expired_assignments")
+    assert "appliance_last_seen" in mesh
+    assert "appliance_heartbeats" not in mesh
+
+
+class _Conn:
+    def __init__(self, watermark, upper):
+        self.row = None if watermark is None else {"watermark": watermark, "upper": upper}
+        self.calls = []
+
+    async def fetchrow(self, sql, *args):
+        self.calls.append(("fetchrow", sql, args))
+        assert "FOR UPDATE" in sql
+        return self.row
+
+    async def fetchval(self, sql, *args):
+        self.calls.append(("fetchval", sql, args))
+        return 42
+
+    async def execute(self, sql, *args):
+        self.calls.append(("execute", sql, args))
+
+
+def test_advance_consumes_window_and_moves_watermark():
+    from dashboard_api.background_tasks import _advance_heartbeat_rollups
+
+    lo = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    hi = lo + timedelta(minutes=1)
+    conn = _Conn(lo, hi)
+    assert asyncio.run(_advance_heartbeat_rollups(conn)) == 42
+
+    kinds = [c[0] for c in conn.calls]
+    assert kinds == ["fetchrow", "fetchval", "execute"]
+    _, rollup_sql, args = conn.calls[1]
+    assert args == (lo, hi)
+    assert "observed_at > $1 AND observed_at <= $2" in rollup_sql
+    assert "appliance_heartbeat_1m" in rollup_sql and "appliance_heartbeat_1h" in rollup_sql
+    assert rollup_sql.count("FROM appliance_heartbeats") == 1
+    assert conn.calls[2][2] == (hi,)
+
+
+def test_advance_noop_when_caught_up_or_unseeded():
+    from dashboard_api.background_tasks import _advance_heartbeat_rollups
+
+    lo = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    caught_up = _Conn(lo, lo)
+    assert asyncio.run(_advance_heartbeat_rollups(caught_up)) == 0
+    assert [c[0] for c in caught_up.calls] == ["fetchrow"]
+
+    unseeded = _Conn(None, None)
+    assert asyncio.run(_advance_heartbeat_rollups(unseeded)) == 0
@@ -0,0 +1,138 @@
+"""Gate for API cold start (startup_profile.py + lazy_imports.py).
+
+Pins:
+  - `import main` never loads a DEFERRED_MODULES package (stripe,
+    weasyprint, minio, ...) and stays inside IMPORT_MODULE_BUDGET. Runs
+    the real import in a subprocess, like
+    `python -m dashboard_api.startup_profile --deferred`. The
+    wall-clock IMPORT_BUDGET_MS check only runs when the IMPORT_BUDGET_MS
+    env var is set (timing is runner-dependent).
+  - The -X importtime parser, totals, and forbidden-module matching.
+  - LazyModule imports on first attribute access only, runs on_load
+    once, forwards attribute writes.
+  - Startup phase marks keep the first value.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import pathlib
+import sys
+
+import pytest
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+import startup_profile  # noqa: E402
+from lazy_imports import LazyModule, module_available  # noqa: E402
+from startup_profile import (  # noqa: E402
+    DEFERRED_MODULES,
+    IMPORT_MODULE_BUDGET,
+    forbidden_imports,
+    parse_importtime,
+    profile_import,
+    total_ms,
+)
+
+_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     _weakrefset
+WeasyPrint not installed - PDF generation will be disabled
+import time:       400 |        500 |   fastapi
+import time:       300 |        300 |     stripe.api_resources
+import time:        50 |        350 |   stripe
+import time:      1000 |       1850 | main
+import time:        20 |         20 | stripe_helpers
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _main_import():
+    return tuple(profile_import("main"))
+
+
+def test_import_main_defers_heavy_packages_within_module_budget():
+    records = _main_import()
+    assert any(r.module == "main" and r.depth == 0 for r in records)
+    assert forbidden_imports(records, DEFERRED_MODULES) == [], (
+        "heavy packages imported at startup — import them where they are used"
+    )
+    assert len(records) <= IMPORT_MODULE_BUDGET, (
+        f"import main loaded {len(records)} modules (budget {IMPORT_MODULE_BUDGET}); "
+        "run `python -m dashboard_api.startup_profile` to see what grew"
+    )
+
+
+@pytest.mark.skipif(
+    not os.getenv("IMPORT_BUDGET_MS"),
+    reason="wall-clock import budget is opt-in: set IMPORT_BUDGET_MS",
+)
+def test_import_main_within_time_budget():
+    budget = float(os.environ["IMPORT_BUDGET_MS"])
+    records = _main_import()
+    assert total_ms(records) <= budget, (
+        f"import main took {total_ms(records):.0f} ms (budget {budget:.0f} ms); "
+        "run `python -m dashboard_api.startup_profile` to see what grew"
+    )
+
+
+def test_parse_importtime_depth_and_totals():
+    records = parse_importtime(_SAMPLE)
+    assert [(r.module, r.depth) for r in records] == [
+        ("_weakrefset", 2),
+        ("fastapi", 1),
+        ("stripe.api_resources", 2),
+        ("stripe", 1),
+        ("main", 0),
+        ("stripe_helpers", 0),
+    ]
+    assert total_ms(records) == 1.87
+
+
+def test_forbidden_matches_package_and_submodules_only():
+    records = parse_importtime(_SAMPLE)
+    assert forbidden_imports(records, ["stripe", "minio"]) == ["stripe"]
+    assert forbidden_imports(records, ["stripe_"]) == []
+
+
+def test_lazy_module_imports_on_first_access(tmp_path, monkeypatch):
+    (tmp_path / "lazy_probe_sdk.py").write_text("api_key = None\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe_sdk", raising=False)
+    loads = []
+
+    def on_load(module):
+        loads.append(module.__name__)
+        module.api_key = "sk_test"
+
+    sdk = LazyModule("lazy_probe_sdk", on_load=on_load)
+    assert module_available("lazy_probe_sdk")
+    assert "lazy_probe_sdk" not in sys.modules and not sdk.loaded
+
+    assert sdk.VALUE == 42
+    assert sdk.api_key == "sk_test"
+    sdk.VALUE = 7
+    assert sys.modules["lazy_probe_sdk"].VALUE == 7
+    assert loads == ["lazy_probe_sdk"]
+
+
+def test_lazy_module_missing_package():
+    assert not module_available("no_such_sdk_for_tests")
+    sdk = LazyModule("no_such_sdk_for_tests")
+    try:
+        sdk.anything
+    except ImportError:
+        pass
+    else:
+        raise AssertionError("expected ImportError on first use")
+
+
+def test_startup_phase_first_mark_wins(monkeypatch):
+    monkeypatch.setattr(startup_profile, "_phases", {})
+    startup_profile.mark("imports")
+    first = startup_profile.startup_phases()["imports"]
+    startup_profile.mark("imports")
+    assert startup_profile.startup_phases() == {"imports": first}
+    assert first >= 0
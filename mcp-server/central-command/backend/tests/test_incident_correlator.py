@@ -0,0 +1,231 @@
+"""Gate for the incremental cross-incident correlator (incident_correlator.py).
+
+Pins:
+  - results match a brute-force evaluation of the original 7-day
+    self-join SQL (distinct-A co-occurrence, avg gap, confidence)
+  - incremental ticks over arbitrary watermark slices == one backfill
+  - contributions and total-A counters expire out of the lookback
+  - monitoring-only types are excluded on both sides
+  - a flush is ONE bulk statement; only moved pairs are re-written
+  - the loop no longer issues a per-pair COUNT/UPSERT (source-shape)
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import random
+import re
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+from incident_correlator import (  # noqa: E402
+    CORRELATION_LOOKBACK,
+    CORRELATION_WINDOW,
+    MIN_CO_OCCURRENCES,
+    IncidentCorrelator,
+)
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+TYPES = ["defender_exclusions", "rogue_scheduled_tasks", "firewall", "bitlocker", "ntp_sync"]
+
+
+def _incidents(n=600, seed=7, span=timedelta(days=9)):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        created = T0 + timedelta(seconds=rng.randrange(int(span.total_seconds())))
+        resolved = None
+        status = "open"
+        if rng.random() < 0.8:
+            resolved = created + timedelta(seconds=rng.randrange(30, 900))
+            status = "resolved"
+        rows.append({
+            "id": i,
+            "site_id": rng.choice(["site-a", "site-b"]),
+            "incident_type": rng.choice(TYPES),
+            "status": status,
+            "created_at": created,
+            "resolved_at": resolved,
+        })
+    # Dense A->B chain so some pairs clear MIN_CO_OCCURRENCES reliably.
+    for k in range(12):
+        base = T0 + timedelta(hours=6 * k + 1)
+        rows.append({
+            "id": 10_000 + 2 * k, "site_id": "site-a",
+            "incident_type": "defender_exclusions", "status": "resolved",
+            "created_at": base, "resolved_at": base + timedelta(minutes=1),
+        })
+        rows.append({
+            "id": 10_001 + 2 * k, "site_id": "site-a",
+            "incident_type": "rogue_scheduled_tasks", "status": "open",
+            "created_at": base + timedelta(minutes=1, seconds=30 + k),
+            "resolved_at": None,
+        })
+    return rows
+
+
+def _brute_force(rows, now, monitoring=frozenset()):
+    """The pre-incremental SQL, evaluated literally in Python."""
+    cutoff = now - CORRELATION_LOOKBACK
+    visible = [r for r in rows if r["created_at"] <= now]
+    groups = defaultdict(lambda: {"a_ids": set(), "gaps": []})
+    for a in visible:
+        if a["status"] != "resolved" or not (cutoff < a["resolved_at"] <= now):
+            continue
+        for b in visible:
+            if (b["site_id"] != a["site_id"]
+                    or b["incident_type"] == a["incident_type"]
+                    or a["incident_type"] in monitoring
+                    or b["incident_type"] in monitoring):
+                continue
+            if a["resolved_at"] < b["created_at"] < a["resolved_at"] + CORRELATION_WINDOW:
+                g = groups[(a["site_id"], a["incident_type"], b["incident_type"])]
+                g["a_ids"].add(a["id"])
+                g["gaps"].append((b["created_at"] - a["resolved_at"]).total_seconds())
+    out = {}
+    for (site, ta, tb), g in groups.items():
+        co = len(g["a_ids"])
+        if co < MIN_CO_OCCURRENCES:
+            continue
+        total_a = sum(
+            1 for r in visible
+            if r["site_id"] == site and r["incident_type"] == ta
+            and r["status"] == "resolved" and cutoff < r["resolved_at"] <= now
+        )
+        out[(site, ta, tb)] = (co, sum(g["gaps"]) / len(g["gaps"]), min(co / max(total_a, 1), 1.0))
+    return out
+
+
+def _published(correlator):
+    """Current qualifying pairs straight from correlator state."""
+    out = {}
+    for site_id, site in correlator.sites.items():
+        for (ta, tb), pair in site.pairs.items():
+            co = pair.co_occurrences
+            if co >= MIN_CO_OCCURRENCES:
+                conf = min(co / max(correlator.total_a(site_id, ta), 1), 1.0)
+                out[(site_id, ta, tb)] = (co, pair.avg_gap_seconds, conf)
+    return out
+
+
+def _assert_same(got, want):
+    assert got.keys() == want.keys()
+    for k in want:
+        assert got[k][0] == want[k][0], k
+        assert abs(got[k][1] - want[k][1]) < 1e-6, k
+        assert abs(got[k][2] - want[k][2]) < 1e-9, k
+
+
+def _backfilled(rows, now, monitoring=frozenset()):
+    c = IncidentCorrelator()
+    lower = now - CORRELATION_LOOKBACK
+    c.ingest(rows, lower, now, set(monitoring))
+    return c
+
+
+def test_backfill_matches_brute_force_sql_semantics():
+    rows = _incidents()
+    now = T0 + timedelta(days=8, hours=3)
+    want = _brute_force(rows, now)
+    assert want, "fixture should produce qualifying pairs"
+    _assert_same(_published(_backfilled(rows, now)), want)
+
+
+def test_incremental_ticks_equal_backfill():
+    rows = _incidents(seed=11)
+    start = T0 + timedelta(days=7, hours=1)
+    c = _backfilled(rows, start)
+    rng = random.Random(3)
+    now = start
+    for _ in range(40):
+        now += timedelta(minutes=rng.choice([1, 2, 7, 30, 95]))
+        c.ingest(rows, c.watermark, now, set())
+        _assert_same(_published(c), _brute_force(rows, now))
+
+
+def test_contributions_and_totals_expire_out_of_lookback():
+    rows = _incidents(n=0)  # only the dense chain, days 0-3
+    c = _backfilled(rows, T0 + timedelta(days=4))
+    assert _published(c)[("site-a", "defender_exclusions", "rogue_scheduled_tasks")][0] == 12
+    c.ingest(rows, c.watermark, T0 + timedelta(days=11), set())
+    assert _published(c) == {}
+    assert c.total_a("site-a", "defender_exclusions") == 0
+    assert not c._expiry
+
+
+def test_monitoring_only_types_excluded_both_sides():
+    rows = _incidents(seed=5)
+    now = T0 + timedelta(days=8)
+    monitoring = {"rogue_scheduled_tasks", "ntp_sync"}
+    got = _published(_backfilled(rows, now, monitoring))
+    _assert_same(got, _brute_force(rows, now, monitoring))
+    assert all(ta not in monitoring and tb not in monitoring for _, ta, tb in got)
+
+
+def test_creation_at_same_instant_as_resolution_does_not_match():
+    rows = []
+    for k in range(3):
+        at = T0 + timedelta(hours=k)
+        rows.append({"id": 2 * k, "site_id": "s", "incident_type": "a", "status": "resolved",
+                     "created_at": at - timedelta(minutes=1), "resolved_at": at})
+        rows.append({"id": 2 * k + 1, "site_id": "s", "incident_type": "b", "status": "open",
+                     "created_at": at, "resolved_at": None})
+    assert _published(_backfilled(rows, T0 + timedelta(days=1))) == {}
+
+
+class _FakeConn:
+    def __init__(self, rows, now):
+        self.rows = rows
+        self.now = now
+        self.executes = []
+
+    async def fetchval(self, sql, *args):
+        assert "NOW()" in sql
+        return self.now - timedelta(seconds=args[0])
+
+    async def fetch(self, sql, *args):
+        if "check_type_registry" in sql:
+            return []
+        lower, upper = args
+        return [
+            r for r in self.rows
+            if lower < r["created_at"] <= upper
+            or (r["resolved_at"] and r["status"] == "resolved" and lower < r["resolved_at"] <= upper)
+        ]
+
+    async def execute(self, sql, *args):
+        self.executes.append((sql, args))
+
+
+def test_flush_is_one_bulk_upsert_of_only_changed_pairs():
+    rows = _incidents(seed=9)
+    conn = _FakeConn(rows, T0 + timedelta(days=8))
+    c = IncidentCorrelator()
+    stats = asyncio.run(c.tick(conn))  # no watermark yet -> backfill
+    assert stats["backfill"] == 1 and stats["written"] > 0
+    assert len(conn.executes) == 1
+    sql, args = conn.executes[0]
+    assert "unnest(" in sql and "ON CONFLICT" in sql
+    assert len(args[0]) == stats["written"]
+
+    # Nothing new in the window -> nothing written.
+    conn.executes.clear()
+    conn.now += timedelta(seconds=1)
+    conn.rows = []
+    assert asyncio.run(c.tick(conn))["written"] == 0
+    assert conn.executes == []
+
+
+def test_loop_has_no_per_pair_queries():
+    src = (_BACKEND / "background_tasks.py").read_text()
+    body = src[src.index("async def cross_incident_correlation_loop"):]
+    body = body[:body.index("\nasync def ", 10)]
+    assert "IncidentCorrelator" in body
+    assert "for pair in" not in body
+    assert not re.search(r"fetchval\(", body)
+    assert "CROSS_INCIDENT_CORRELATION_INTERVAL_SECONDS" in body
@@ -0,0 +1,171 @@
+"""Gate for incremental framework-control mapping.
+
+Pins:
+  - framework_mapper.control_index == the per-check resolver, and is
+    rebuilt when control_mappings.yaml changes on disk
+  - map_evidence_to_frameworks writes ONLY controls whose aggregated
+    status differs from the site's latest, in one bulk statement, and
+    stamps every evaluated control's last-evaluated time (mig 338) so
+    v_control_status.last_checked never lags behind the skip
+  - a burst of bundles from one appliance triggers one score refresh
+    per framework (debounced)
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+from contextlib import asynccontextmanager
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+_MCP_SERVER = _BACKEND.parent.parent
+for p in (str(_BACKEND), str(_MCP_SERVER)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from dashboard_api import evidence_chain, framework_mapper  # noqa: E402
+from dashboard_api.compliance_packet import CHECK_TYPE_HIPAA_MAP  # noqa: E402
+
+FRAMEWORKS = ["soc2", "hipaa", "nist_csf"]
+
+
+def test_control_index_matches_per_check_resolver():
+    index = framework_mapper.control_index(FRAMEWORKS)
+    assert index is framework_mapper.control_index(reversed(FRAMEWORKS))
+    for check_type in list(CHECK_TYPE_HIPAA_MAP) + ["not_a_real_check"]:
+        want = tuple(
+            (c["framework"], c["control_id"])
+            for c in framework_mapper.get_controls_for_check_with_hipaa_map(
+                check_type, sorted(FRAMEWORKS)
+            )
+        )
+        assert index.get(check_type, ()) == want, check_type
+
+
+def test_control_index_rebuilt_when_yaml_changes(monkeypatch):
+    first = framework_mapper.control_index(["hipaa"])
+    monkeypatch.setattr(framework_mapper, "_YAML_CHECKED_AT", float("-inf"))
+    monkeypatch.setattr(framework_mapper, "_YAML_MTIME", -1.0)
+    second = framework_mapper.control_index(["hipaa"])
+    assert second is not first
+    assert second == first
+
+
+class _Conn:
+    def __init__(self, latest):
+        self.latest = latest
+        self.executes = []
+
+    async def fetchrow(self, sql, *args):
+        return {"enabled_frameworks": ["hipaa"]}
+
+    async def fetch(self, sql, *args):
+        assert "DISTINCT ON (efm.framework, efm.control_id)" in sql
+        return self.latest
+
+    async def execute(self, sql, *args):
+        self.executes.append((sql, args))
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+def _patch_db(monkeypatch, conn):
+    from dashboard_api import fleet, tenant_middleware
+
+    @asynccontextmanager
+    async def _txn(pool):
+        yield conn
+
+    async def _pool():
+        return object()
+
+    monkeypatch.setattr(fleet, "get_pool", _pool)
+    monkeypatch.setattr(tenant_middleware, "admin_transaction", _txn)
+    monkeypatch.setattr(evidence_chain, "_enabled_frameworks_cache", {})
+
+
+def _writes(conn, table):
+    return [(sql, args) for sql, args in conn.executes if f"INSERT INTO {table}" in sql]
+
+
+def _evaluated(conn):
+    (sql, args), = _writes(conn, "control_last_evaluated")
+    assert args[0] == "s1"
+    return set(zip(args[1], args[2]))
+
+
+def _two_checks():
+    index = framework_mapper.control_index(["hipaa"])
+    a, b = [ct for ct in index if len(index[ct]) == 1][:2]
+    return a, b, index[a][0], index[b][0]
+
+
+def test_only_changed_controls_written_in_one_statement(monkeypatch):
+    a, b, (fw_a, ctl_a), (fw_b, ctl_b) = _two_checks()
+    # Control A already "pass" at the site; B last seen "pass", now fails.
+    latest = [
+        {"framework": fw_a, "control_id": ctl_a, "check_status": "pass"},
+        {"framework": fw_b, "control_id": ctl_b, "check_status": "pass"},
+    ]
+    conn = _Conn(latest)
+    _patch_db(monkeypatch, conn)
+    scheduled = []
+    monkeypatch.setattr(
+        evidence_chain, "_schedule_score_refresh",
+        lambda *args: scheduled.append(args),
+    )
+    checks = [{"check": a, "status": "pass"}, {"check": b, "status": "fail"}]
+    asyncio.run(evidence_chain.map_evidence_to_frameworks("s1", "bundle-1", checks, "app-1"))
+
+    mappings = _writes(conn, "evidence_framework_mappings")
+    assert len(mappings) == 1
+    sql, args = mappings[0]
+    assert "unnest(" in sql and "ON CONFLICT" in sql
+    assert (args[1], args[2], args[3]) == ([fw_b], [ctl_b], ["fail"])
+    assert scheduled == [("app-1", "s1", ["hipaa"])]
+    assert _evaluated(conn) == {(fw_a, ctl_a), (fw_b, ctl_b)}
+
+    # Nothing changed -> no mapping write and no refresh, but both
+    # controls were still evaluated by this bundle.
+    conn.latest = latest[:1] + [dict(latest[1], check_status="fail")]
+    conn.executes.clear()
+    scheduled.clear()
+    asyncio.run(evidence_chain.map_evidence_to_frameworks("s1", "bundle-2", checks, "app-1"))
+    assert _writes(conn, "evidence_framework_mappings") == []
+    assert scheduled == []
+    assert _evaluated(conn) == {(fw_a, ctl_a), (fw_b, ctl_b)}
+    assert len(conn.executes) == 1
+
+
+def test_v_control_status_reads_last_evaluated():
+    sql = (_BACKEND / "migrations" / "338_control_last_evaluated.sql").read_text()
+    view = sql[sql.index("CREATE OR REPLACE VIEW v_control_status"):]
+    assert "LEFT JOIN control_last_evaluated cle" in view
+    assert "GREATEST(le.created_at, cle.last_evaluated_at) AS last_checked" in view
+
+
+def test_burst_of_bundles_triggers_one_refresh(monkeypatch):
+    conn = _Conn([])
+    _patch_db(monkeypatch, conn)
+    invalidated = []
+
+    async def _invalidate(site_ids):
+        invalidated.append(list(site_ids))
+
+    from dashboard_api import perf_cache
+    monkeypatch.setattr(perf_cache, "invalidate_sites", _invalidate)
+    monkeypatch.setattr(evidence_chain, "SCORE_REFRESH_DEBOUNCE_SECONDS", 0.05)
+
+    async def _burst():
+        for i in range(10):
+            evidence_chain._schedule_score_refresh("app-1", "s1", ["hipaa", "soc2"][: 1 + i % 2])
+        await asyncio.gather(*evidence_chain._score_refresh_tasks.values())
+
+    asyncio.run(_burst())
+    refreshes = [args for sql, args in conn.executes if "refresh_compliance_score" in sql]
+    assert sorted(refreshes) == [("app-1", "hipaa"), ("app-1", "soc2")]
+    assert invalidated == [["s1"]]
+    assert not evidence_chain._pending_score_refresh
+    assert not evidence_chain._score_refresh_tasks
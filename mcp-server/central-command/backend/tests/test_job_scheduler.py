@@ -0,0 +1,529 @@
+"""Gate for the leader-elected background job scheduler (job_scheduler.py).
+
+Pins:
+  - cron parsing / next-fire computation.
+  - JobSpec validation.
+  - BG_JOBS_MODE selection (all / api / worker).
+  - Per-job leader election: each singleton runs in exactly one
+    scheduler; losing the lease session cancels every led job and
+    another scheduler takes over; a runner that gave up hands its lock
+    back instead of re-taking it in the same pass.
+  - Every lease round trip carries the lease timeout; a hung connect
+    fails the election pass instead of stalling it.
+  - Tick jobs: duration + overlap metrics reach bg_heartbeat, timeouts
+    are counted, the connection budget bounds concurrent runs, the
+    first run waits start_delay_s rather than a full interval.
+  - Standby jobs never read as 'stale' to bg_loop_silent.
+  - main.py wires task_defs and the maintenance ticks through the
+    scheduler.
+
+No DB dep — advisory locks go through a fake lease connection.
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+_MAIN = _BACKEND.parent.parent / "main.py"
+
+
+class _LockServer:
+    """Session advisory locks shared by every fake lease."""
+
+    def __init__(self):
+        self.held = {}
+
+
+class _FakeLease:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+        self.fail = False
+        self.timeouts = []
+
+    def is_closed(self):
+        return self.closed
+
+    async def fetch(self, sql, lock_class, names, timeout=None):
+        assert "pg_try_advisory_lock" in sql
+        self.timeouts.append(timeout)
+        if self.fail:
+            raise ConnectionError("connection lost")
+        rows = []
+        for name in names:
+            got = self.server.held.get(name) in (None, self)
+            if got:
+                self.server.held[name] = self
+            rows.append({"name": name, "got": got})
+        return rows
+
+    async def fetchval(self, sql, *args, timeout=None):
+        self.timeouts.append(timeout)
+        if self.fail:
+            raise ConnectionError("connection lost")
+        return 1
+
+    async def execute(self, sql, lock_class, name, timeout=None):
+        assert "pg_advisory_unlock" in sql
+        self.timeouts.append(timeout)
+        if self.server.held.get(name) is self:
+            del self.server.held[name]
+
+    def die(self):
+        """Backend session gone: Postgres drops its locks."""
+        self.fail = True
+        for name in [n for n, o in self.server.held.items() if o is self]:
+            del self.server.held[name]
+
+    async def close(self):
+        self.closed = True
+
+
+def _forever_spec(name, started, **kwargs):
+    from job_scheduler import JobSpec
+
+    async def fn():
+        started.append(name)
+        await asyncio.Event().wait()
+
+    return JobSpec(name=name, fn=fn, **kwargs)
+
+
+def _scheduler(specs, server=None, leases=None, **kwargs):
+    from job_scheduler import JobScheduler
+
+    connect = None
+    if server is not None:
+        async def connect():
+            lease = _FakeLease(server)
+            if leases is not None:
+                leases.append(lease)
+            return lease
+    kwargs.setdefault("mode", "all")
+    return JobScheduler(specs, connect=connect, election_interval_s=3600, **kwargs)
+
+
+# ------------------------------------------------------------ cron
+
+@pytest.mark.parametrize("expr,after,expected", [
+    ("*/15 * * * *", (2026, 5, 1, 10, 7), (2026, 5, 1, 10, 15)),
+    ("0 3 * * *", (2026, 5, 1, 3, 0), (2026, 5, 2, 3, 0)),
+    ("30 2 1 * *", (2026, 5, 1, 3, 0), (2026, 6, 1, 2, 30)),
+    ("0 0 * * 7", (2026, 5, 1, 0, 0), (2026, 5, 3, 0, 0)),  # Sunday
+    ("0 9 1 * 1", (2026, 5, 1, 10, 0), (2026, 5, 4, 9, 0)),  # dom OR dow
+    ("0 0 29 2 *", (2026, 3, 1, 0, 0), (2028, 2, 29, 0, 0)),
+])
+def test_cron_next_after(expr, after, expected):
+    from job_scheduler import CronSchedule
+    got = CronSchedule.parse(expr).next_after(
+        datetime(*after, tzinfo=timezone.utc),
+    )
+    assert got == datetime(*expected, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_cron_rejects_bad_expressions(expr):
+    from job_scheduler import CronSchedule
+    with pytest.raises(ValueError):
+        CronSchedule.parse(expr)
+
+
+def test_jobspec_validation():
+    from job_scheduler import JobSpec
+
+    async def fn():
+        pass
+
+    with pytest.raises(ValueError):
+        JobSpec(name="x", fn=fn, kind="tick")
+    with pytest.raises(ValueError):
+        JobSpec(name="x", fn=fn, kind="tick", interval_s=60, cron="* * * * *")
+    with pytest.raises(ValueError):
+        JobSpec(name="x", fn=fn, kind="tick", cron="bad")
+    with pytest.raises(ValueError):
+        JobSpec(name="x", fn=fn, kind="tick", interval_s=60, max_concurrency=0)
+    with pytest.raises(ValueError):
+        JobSpec(name="x", fn=fn, kind="tick", interval_s=60, start_delay_s=-1)
+    spec = JobSpec(name="x", fn=fn, kind="tick", interval_s=60, jitter_s=5)
+    assert 60 <= spec.next_delay() <= 65
+    assert 60 <= spec.first_delay() <= 65
+    spec = JobSpec(name="x", fn=fn, kind="tick", interval_s=86400, start_delay_s=10, jitter_s=5)
+    assert 10 <= spec.first_delay() <= 15
+
+
+# ------------------------------------------------------------ modes
+
+@pytest.mark.parametrize("mode,expected", [
+    ("all", {"single", "local"}),
+    ("api", {"local"}),
+    ("worker", {"single"}),
+])
+def test_mode_selects_jobs(mode, expected):
+    from job_scheduler import loop_jobs
+
+    async def fn():
+        pass
+
+    specs = loop_jobs([("single", fn), ("local", fn)], local=frozenset({"local"}))
+    assert set(_scheduler(specs, mode=mode).specs) == expected
+
+
+def test_invalid_mode_env_falls_back_to_all(monkeypatch):
+    from job_scheduler import jobs_mode
+    monkeypatch.setenv("BG_JOBS_MODE", "wroker")
+    assert jobs_mode() == "all"
+
+
+def test_without_election_runs_everything_locally():
+    started = []
+
+    async def go():
+        sched = _scheduler([
+            _forever_spec("a", started),
+            _forever_spec("b", started, singleton=False),
+        ])
+        await sched.start()
+        await asyncio.sleep(0)
+        roles = sched.roles()
+        tasks = dict(sched.tasks)
+        await sched.stop()
+        return roles, tasks
+
+    roles, tasks = asyncio.run(go())
+    assert sorted(started) == ["a", "b"]
+    assert roles == {"a": "leader", "b": "local"}
+    assert all(t.done() for t in tasks.values())
+
+
+# ------------------------------------------------------------ election
+
+def test_each_singleton_runs_in_exactly_one_scheduler():
+    import bg_heartbeat
+    server = _LockServer()
+    started = []
+
+    async def go():
+        names = ["j1", "j2", "j3"]
+        a = _scheduler([_forever_spec(n, started) for n in names], server)
+        b = _scheduler([_forever_spec(n, started) for n in names], server)
+        await a.elect_once()
+        await b.elect_once()
+        await asyncio.sleep(0)
+        result = (a.roles(), b.roles(), len(a.tasks), len(b.tasks))
+        await a.stop()
+        await b.stop()
+        return result
+
+    roles_a, roles_b, tasks_a, tasks_b = asyncio.run(go())
+    assert set(roles_a.values()) == {"leader"}
+    assert set(roles_b.values()) == {"standby"}
+    assert (tasks_a, tasks_b) == (3, 0)
+    assert sorted(started) == ["j1", "j2", "j3"]
+    assert bg_heartbeat._standby >= {"j1", "j2", "j3"}
+
+
+def test_lost_lease_cancels_led_jobs_and_standby_takes_over():
+    import bg_heartbeat
+    server = _LockServer()
+    leases = []
+    started = []
+
+    async def go():
+        a = _scheduler([_forever_spec("job", started)], server, leases)
+        b = _scheduler([_forever_spec("job", started)], server, leases)
+        await a.elect_once()
+        await b.elect_once()
+        await asyncio.sleep(0)
+        task_a = a.tasks["job"]
+
+        leases[0].die()
+        with pytest.raises(ConnectionError):
+            await a.elect_once()
+        a._demote_all()
+        await asyncio.sleep(0)
+        cancelled = task_a.cancelled()
+        role_a = a.roles()["job"]
+
+        await b.elect_once()
+        await asyncio.sleep(0)
+        role_b = b.roles()["job"]
+        standby_now = "job" in bg_heartbeat._standby
+        await a.stop()
+        await b.stop()
+        return cancelled, role_a, role_b, standby_now
+
+    cancelled, role_a, role_b, standby_now = asyncio.run(go())
+    assert cancelled
+    assert role_a == "standby"
+    assert role_b == "leader"
+    assert not standby_now
+    assert started == ["job", "job"]
+
+
+def test_election_loop_demotes_on_lease_failure():
+    server = _LockServer()
+    leases = []
+    started = []
+
+    async def go():
+        sched = _scheduler([_forever_spec("job", started)], server, leases)
+        sched.election_interval_s = 0.01
+        await sched.start()
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if sched.roles()["job"] == "leader":
+                break
+        leases[0].die()
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if len(leases) > 1 and sched.roles()["job"] == "leader":
+                break
+        result = (sched.roles()["job"], len(leases), leases[0].closed)
+        await sched.stop()
+        return result
+
+    role, lease_count, first_closed = asyncio.run(go())
+    # Demoted, first lease closed, reconnected and re-elected.
+    assert first_closed and lease_count >= 2
+    assert role == "leader"
+
+
+def test_runner_that_gave_up_releases_lock():
+    from job_scheduler import JobSpec
+    server = _LockServer()
+
+    async def gives_up():
+        return None
+
+    async def go():
+        a = _scheduler([JobSpec(name="job", fn=gives_up)], server)
+        b = _scheduler([JobSpec(name="job", fn=gives_up)], server)
+        await a.elect_once()
+        await asyncio.sleep(0)
+        await a.elect_once()  # runner done -> unlock, don't re-take
+        released = (a.roles()["job"], "job" in server.held)
+        await b.elect_once()
+        taken = b.roles()["job"]
+        await a.stop()
+        await b.stop()
+        return released, taken
+
+    released, taken = asyncio.run(go())
+    assert released == ("standby", False)
+    assert taken == "leader"
+
+
+def test_lease_round_trips_are_bounded():
+    from job_scheduler import JobSpec
+    server = _LockServer()
+    leases = []
+
+    async def gives_up():
+        return None
+
+    async def go():
+        sched = _scheduler(
+            [JobSpec(name="job", fn=gives_up)], server, leases, lease_timeout_s=2.5,
+        )
+        await sched.elect_once()  # lock
+        await asyncio.sleep(0)
+        await sched.elect_once()  # unlock + keepalive
+        await sched.stop()
+
+    asyncio.run(go())
+    assert len(leases[0].timeouts) >= 3
+    assert set(leases[0].timeouts) == {2.5}
+
+
+def test_hung_lease_connect_times_out():
+    from job_scheduler import JobScheduler
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def go():
+        sched = JobScheduler(
+            [_forever_spec("job", [])], connect=hang, mode="all",
+            election_interval_s=3600, lease_timeout_s=0.01,
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await sched.elect_once()
+        return sched.roles()["job"]
+
+    assert asyncio.run(go()) == "standby"
+
+
+# ------------------------------------------------------------ tick jobs
+
+def test_first_tick_waits_start_delay_not_interval():
+    import bg_heartbeat
+    from job_scheduler import JobSpec
+    bg_heartbeat._heartbeats.clear()
+    ran = []
+
+    async def work():
+        ran.append(1)
+
+    async def go():
+        sched = _scheduler([JobSpec(
+            name="daily", fn=work, kind="tick", interval_s=86400, start_delay_s=0,
+        )])
+        await sched.start()
+        await asyncio.sleep(0)
+        registered = bg_heartbeat.get_heartbeat("daily") is not None
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if ran:
+                break
+        await sched.stop()
+        return registered
+
+    # Heartbeat registered at start (as _supervised does for loops),
+    # and the daily job ran without waiting a day.
+    assert asyncio.run(go())
+    assert ran == [1]
+
+
+def test_tick_run_records_duration_and_failures():
+    import bg_heartbeat
+    from job_scheduler import JobSpec
+    bg_heartbeat._heartbeats.clear()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+
+    async def go():
+        sched = _scheduler([JobSpec(name="tick_job", fn=work, kind="tick", interval_s=60)])
+        await sched.run_now("tick_job")
+        await sched.run_now("tick_job")
+        return sched.metrics()["jobs"]["tick_job"]
+
+    m = asyncio.run(go())
+    assert (m["runs"], m["failures"]) == (2, 1)
+    assert m["last_duration_s"] >= 0.01
+    hb = bg_heartbeat.get_heartbeat("tick_job")
+    assert hb["iterations"] == 2 and hb["errors"] == 1
+    assert hb["max_duration_s"] >= 0.01
+
+
+def test_tick_timeout_counted():
+    from job_scheduler import JobSpec
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def go():
+        sched = _scheduler([JobSpec(
+            name="slow", fn=slow, kind="tick", interval_s=60, timeout_s=0.01,
+        )])
+        ok = await sched.run_now("slow")
+        return ok, sched.metrics()["jobs"]["slow"]
+
+    ok, m = asyncio.run(go())
+    assert not ok
+    assert (m["timeouts"], m["failures"]) == (1, 1)
+
+
+def test_overlapping_ticks_are_skipped_and_counted():
+    import bg_heartbeat
+    from job_scheduler import JobSpec
+    bg_heartbeat._heartbeats.clear()
+    release = None
+
+    async def stuck():
+        await release.wait()
+
+    async def go():
+        nonlocal release
+        release = asyncio.Event()
+        sched = _scheduler([JobSpec(
+            name="overlap", fn=stuck, kind="tick", interval_s=0.01,
+        )])
+        await sched.start()
+        await asyncio.sleep(0.1)
+        m = sched.metrics()["jobs"]["overlap"]
+        release.set()
+        await sched.stop()
+        return m
+
+    m = asyncio.run(go())
+    assert m["in_flight"] == 1
+    assert m["overlaps"] >= 2
+    assert bg_heartbeat.get_heartbeat("overlap")["overlaps"] == m["overlaps"]
+
+
+def test_connection_budget_bounds_concurrent_runs():
+    from job_scheduler import JobSpec
+    peak = 0
+    running = 0
+
+    async def work():
+        nonlocal peak, running
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def go():
+        specs = [
+            JobSpec(name=f"t{i}", fn=work, kind="tick", interval_s=60, conn_budget=2)
+            for i in range(4)
+        ]
+        sched = _scheduler(specs, conn_budget=4)
+        await asyncio.gather(*(sched.run_now(s.name) for s in specs))
+
+    asyncio.run(go())
+    assert peak == 2
+
+
+# ------------------------------------------------------------ heartbeat
+
+def test_standby_loop_never_reads_stale():
+    import bg_heartbeat
+    bg_heartbeat._heartbeats.clear()
+    bg_heartbeat.record_heartbeat("privileged_notifier")
+    bg_heartbeat._heartbeats["privileged_notifier"]["last_seen"] -= 10_000
+    bg_heartbeat.set_standby("privileged_notifier", True)
+    try:
+        snap = bg_heartbeat.get_all_heartbeats()["privileged_notifier"]
+        assert bg_heartbeat.assess_staleness(snap) == "standby"
+    finally:
+        bg_heartbeat.set_standby("privileged_notifier", False)
+    snap = bg_heartbeat.get_all_heartbeats()["privileged_notifier"]
+    assert bg_heartbeat.assess_staleness(snap) == "stale"
+
+
+# ------------------------------------------------------------ main.py wiring
+
+def test_main_runs_task_defs_through_scheduler():
+    src = _MAIN.read_text()
+    start = src.index("task_defs = [")
+    block = src[start:src.index("yield", start)]
+    assert "JobScheduler(" in block and "loop_jobs(task_defs" in block
+    assert "+ maintenance_tick_jobs()" in block
+    assert '"statement_timeout"' in block
+    assert "supervise=_supervised" in block
+    assert "asyncio.create_task(_supervised(" not in block
+    per_process = block[block.index("_PER_PROCESS_LOOPS = "):]
+    per_process = per_process[:per_process.index("\n")]
+    for name in ("perf_cache_invalidation", "metrics_collector"):
+        assert f'"{name}"' in per_process
+        assert f'("{name}",' in block
+
+
+def test_worker_entry_point_forces_worker_mode():
+    src = (_MAIN.parent / "worker.py").read_text()
+    assert src.index('os.environ["BG_JOBS_MODE"] = "worker"') < src.index("import main")
+    assert "main.lifespan(main.app)" in src
@@ -0,0 +1,157 @@
+"""Gate for the precompiled, versioned /agent/sync rule bundle.
+
+Pins:
+  - Built-in rules live in l1_rule_bundle (not re-declared per call in
+    main.agent_sync_rules).
+  - Bundle version is a content hash: same rules -> same version.
+  - get_rule_bundle caches per (tier, change_versions source version)
+    and recompiles when the l1_rules counter moves.
+  - sync_payload: 304 for the held version, delta against a bundle in
+    history, full set otherwise.
+  - protection_profile rule_json comes from the LATERAL join (one query).
+
+No DB dep — a fake asyncpg-shaped connection.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import pathlib
+import sys
+
+import pytest
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+_MAIN = _BACKEND.parent.parent / "main.py"
+
+
+def _sign(s: str) -> str:
+    return "sig-" + str(len(s))
+
+
+class _FakeConn:
+    def __init__(self, l1_version=1, db_rows=None):
+        self.l1_version = l1_version
+        self.db_rows = db_rows or []
+        self.rule_queries = 0
+
+    async def fetch(self, sql, *args):
+        if "FROM change_versions" in sql:
+            return [
+                {"table_name": "app_profile_rules", "version": 1},
+                {"table_name": "l1_rules", "version": self.l1_version},
+            ]
+        if "FROM l1_rules" in sql:
+            self.rule_queries += 1
+            return list(self.db_rows)
+        raise AssertionError(sql)
+
+
+def _db_row(rule_id, confidence=0.9, source="promoted", rule_json=None):
+    return {
+        "rule_id": rule_id,
+        "incident_pattern": json.dumps({"incident_type": "firewall"}),
+        "runbook_id": "RB-WIN-FIREWALL-001",
+        "confidence": confidence,
+        "source": source,
+        "rule_json": rule_json,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear():
+    from l1_rule_bundle import bundle_cache_clear
+    bundle_cache_clear()
+    yield
+    bundle_cache_clear()
+
+
+def test_main_no_longer_declares_builtin_rules_inline():
+    src = _MAIN.read_text()
+    start = src.index("async def agent_sync_rules(")
+    body = src[start:src.index("\n@app.", start)]
+    assert "standard_rules = [" not in body
+    assert '"L1-NTP-001"' not in body
+    assert "get_rule_bundle(" in body and "sync_payload(" in body
+
+
+def test_builtin_tiers():
+    from l1_rule_bundle import (
+        FULL_COVERAGE_EXTRA_RULES, STANDARD_RULES, compile_bundle,
+    )
+    std = compile_bundle("standard", [], _sign)
+    full = compile_bundle("full_coverage", [], _sign)
+    assert std.count == len(STANDARD_RULES)
+    assert full.count == len(STANDARD_RULES) + len(FULL_COVERAGE_EXTRA_RULES)
+    assert std.version != full.version
+
+
+def test_version_is_content_hash():
+    from l1_rule_bundle import compile_bundle
+    a = compile_bundle("standard", [{"id": "X", "actions": []}], _sign)
+    b = compile_bundle("standard", [{"id": "X", "actions": []}], _sign)
+    c = compile_bundle("standard", [{"id": "X", "actions": ["a"]}], _sign)
+    assert a.version == b.version != c.version
+
+
+def test_cached_until_source_version_moves():
+    from l1_rule_bundle import get_rule_bundle
+    conn = _FakeConn(db_rows=[_db_row("P-1")])
+
+    first = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+    again = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+    assert again is first
+    assert conn.rule_queries == 1
+
+    conn.l1_version = 2
+    conn.db_rows = [_db_row("P-1"), _db_row("P-2", confidence=0.8)]
+    moved = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+    assert conn.rule_queries == 2
+    assert moved.version != first.version
+    assert [r["id"] for r in moved.rules][-2:] == ["P-1", "P-2"]
+
+
+def test_unknown_tier_falls_back_to_standard():
+    from l1_rule_bundle import get_rule_bundle
+    b = asyncio.run(get_rule_bundle(_FakeConn(), "bogus", _sign))
+    assert b.healing_tier == "standard"
+
+
+def test_protection_profile_rule_json_used():
+    from l1_rule_bundle import get_rule_bundle
+    profile_rule = {"id": "PP-1", "conditions": [], "actions": ["x"]}
+    conn = _FakeConn(db_rows=[
+        _db_row("PP-1", source="protection_profile",
+                rule_json=json.dumps(profile_rule)),
+    ])
+    b = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+    assert b.rules[-1] == profile_rule
+
+
+def test_sync_payload_304_delta_full():
+    from l1_rule_bundle import get_rule_bundle, sync_payload
+    conn = _FakeConn(db_rows=[_db_row("P-1"), _db_row("P-2", confidence=0.5)])
+    v1 = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+
+    assert sync_payload(v1, v1.version, "pk") is None
+
+    conn.l1_version = 2
+    conn.db_rows = [_db_row("P-1"), _db_row("P-3", confidence=0.4)]
+    v2 = asyncio.run(get_rule_bundle(conn, "standard", _sign))
+
+    delta = sync_payload(v2, v1.version, "pk")
+    assert delta["base_version"] == v1.version
+    assert delta["bundle_version"] == v2.version
+    assert "rules" not in delta
+    assert [r["id"] for r in delta["delta"]["upsert"]] == ["P-3"]
+    assert delta["delta"]["remove"] == ["P-2"]
+    assert delta["delta"]["order"] == [r["id"] for r in v2.rules]
+    assert delta["signature"] == v2.signature
+
+    full = sync_payload(v2, "unknown-version", "pk")
+    assert full["rules"] == list(v2.rules) and "delta" not in full
+    legacy = sync_payload(v2, None, "pk")
+    assert legacy["version"] == "1.0.0" and legacy["count"] == v2.count
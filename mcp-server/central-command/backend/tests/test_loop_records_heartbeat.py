@@ -77,16 +77,13 @@ _LOOP_LOCATIONS: dict[str, Tuple[str, str]] = {
     "framework_sync": ("framework_sync", "framework_sync_loop"),
     "companion_alerts": ("companion", "companion_alert_check_loop"),
     "flywheel_orchestrator": ("background_tasks", "flywheel_orchestrator_loop"),
-    "partition_maintainer": ("background_tasks", "partition_maintainer_loop"),
-    "weekly_rollup_refresh": ("background_tasks", "weekly_rollup_refresh_loop"),
     "partner_weekly_digest": ("background_tasks", "partner_weekly_digest_loop"),
-    "expire_consent_request_tokens": ("background_tasks", "expire_consent_request_tokens_loop"),
-    "heartbeat_partition_maintainer": ("background_tasks", "heartbeat_partition_maintainer_loop"),
     "mesh_reassignment": ("background_tasks", "mesh_reassignment_loop"),
     "sigauth_auto_promotion": ("sigauth_enforcement", "sigauth_auto_promotion_loop"),
-    "client_telemetry_retention": ("background_tasks", "client_telemetry_retention_loop"),
     "data_hygiene_gc": ("background_tasks", "data_hygiene_gc_loop"),
     "relocation_finalize": ("background_tasks", "relocation_finalize_loop"),
+    "metrics_collector": ("prometheus_metrics", "metrics_collector_loop"),
+    "health_snapshot": ("fleet", "health_snapshot_loop"),
 }
 
 # Loops nested inside main.py's lifespan() — manually verified to call
@@ -131,6 +128,28 @@ _LIFESPAN_INLINE_LOOPS = {
 _BACKEND_DIR = pathlib.Path(__file__).resolve().parent.parent
 
 
+def _tick_job_names() -> set[str]:
+    """Names of the JobSpec(kind="tick") entries built by
+    background_tasks.maintenance_tick_jobs. JobScheduler._run_once
+    records their heartbeat after every run, so there is no loop body
+    to check."""
+    tree = ast.parse((_BACKEND_DIR / "background_tasks.py").read_text())
+    func = next(
+        n for n in ast.walk(tree)
+        if isinstance(n, ast.FunctionDef) and n.name == "maintenance_tick_jobs"
+    )
+    return {
+        kw.value.value
+        for call in ast.walk(func)
+        if isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+        and call.func.id == "JobSpec"
+        for kw in call.keywords if kw.arg == "name"
+    }
+
+
+_SCHEDULER_TICK_JOBS = _tick_job_names()
+
+
 def _parse_function(module_basename: str, function_name: str) -> ast.AsyncFunctionDef:
     file_path = _BACKEND_DIR / f"{module_basename}.py"
     tree = ast.parse(file_path.read_text())
@@ -212,7 +231,7 @@ def test_every_expected_interval_entry_is_locatable_or_inline():
     in _LOOP_LOCATIONS (auto-verified) or _LIFESPAN_INLINE_LOOPS
     (manually verified). Mirrors the calibration gate's contract so
     the two stay in sync."""
-    locatable = set(_LOOP_LOCATIONS) | _LIFESPAN_INLINE_LOOPS | DRAIN_LOOPS
+    locatable = set(_LOOP_LOCATIONS) | _SCHEDULER_TICK_JOBS | _LIFESPAN_INLINE_LOOPS | DRAIN_LOOPS
     expected = set(EXPECTED_INTERVAL_S)
     missing = expected - locatable
     assert not missing, (
@@ -0,0 +1,144 @@
+"""Gate for minimal-movement mesh target assignment (mesh_assignment.py).
+
+Pins:
+  - live owners keep their targets; only departed owners' targets move
+  - orphans spread under the bounded-load cap, proportional to weights
+  - weights come from reported CPU counts (clamped, missing = mean) and
+    rebalance_expired_assignments passes them in
+  - deterministic, input-order independent
+  - rebalance_expired_assignments applies everything in ONE set-based
+    UPDATE (source-shape) and no longer uses modulo hashing
+  - benchmark: hrw moves exactly the minimum where modulo moves most
+"""
+from __future__ import annotations
+
+import math
+import pathlib
+import re
+import sys
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+from mesh_assignment import (  # noqa: E402
+    MESH_LOAD_SLACK,
+    MESH_WEIGHT_MAX,
+    assign_targets,
+    capacity_weights,
+    hrw_owner,
+    load_spread,
+    move_count,
+)
+
+TARGETS = [f"device:10.0.{i // 256}.{i % 256}" for i in range(1200)]
+NODES = [f"site-a-appl-{i}" for i in range(5)]
+
+
+def _fresh(nodes=NODES, weights=None):
+    return assign_targets({t: None for t in TARGETS}, {n: 0 for n in nodes}, weights)
+
+
+def test_fresh_assignment_is_balanced():
+    owners = _fresh()
+    assert set(owners.values()) == set(NODES)
+    assert load_spread(owners, NODES) <= 1 + MESH_LOAD_SLACK + 0.01
+
+
+def test_live_owners_keep_targets_only_departed_move():
+    before = _fresh()
+    departed = NODES[2]
+    live = [n for n in NODES if n != departed]
+    after = assign_targets(dict(before), {n: 0 for n in live})
+
+    must_move = [t for t, o in before.items() if o == departed]
+    assert move_count(before, after) == len(must_move)
+    assert all(after[t] != departed for t in must_move)
+    assert all(after[t] == before[t] for t in TARGETS if before[t] != departed)
+    # Departed load spreads out rather than landing on one neighbour.
+    assert load_spread(after, live) <= 1 + MESH_LOAD_SLACK + 0.01
+
+
+def test_join_moves_nothing():
+    before = _fresh()
+    after = assign_targets(dict(before), {n: 0 for n in NODES + ["site-a-appl-new"]})
+    assert move_count(before, after) == 0
+
+
+def test_orphans_favour_lightly_loaded_appliances():
+    orphans = {t: "gone" for t in TARGETS[:300]}
+    loads = {"busy": 400, "idle": 0}
+    after = assign_targets(orphans, loads)
+    busy = sum(1 for o in after.values() if o == "busy")
+    # Fair share is (400 + 300) / 2 = 350; busy may only grow to its cap
+    # of ceil(350 * (1 + slack)), the rest must go to idle.
+    assert 400 + busy <= math.ceil(350 * (1 + MESH_LOAD_SLACK))
+
+
+def test_weights_are_proportional():
+    weights = {"big": 3.0, "small": 1.0}
+    owners = assign_targets({t: None for t in TARGETS}, {"big": 0, "small": 0}, weights)
+    big = sum(1 for o in owners.values() if o == "big")
+    assert 0.68 < big / len(TARGETS) < 0.82
+
+
+def test_deterministic_and_order_independent():
+    a = assign_targets({t: None for t in TARGETS}, {n: 0 for n in NODES})
+    b = assign_targets({t: None for t in reversed(TARGETS)}, {n: 0 for n in reversed(NODES)})
+    assert a == b
+    assert hrw_owner(TARGETS[0], {n: 1.0 for n in NODES}) == hrw_owner(
+        TARGETS[0], {n: 1.0 for n in reversed(NODES)}
+    )
+
+
+def test_no_live_appliance_leaves_everything_unowned():
+    assert assign_targets({"t1": "a", "t2": None}, {}) == {"t1": None, "t2": None}
+
+
+# ------------------------------------------------------------ mesh_targets
+
+def test_capacity_weights_from_cpu_counts():
+    weights = capacity_weights({"a": 2, "b": "4", "c": None, "d": 64, "e": "junk"})
+    assert (weights["a"], weights["b"], weights["d"]) == (2.0, 4.0, MESH_WEIGHT_MAX)
+    mean = (2.0 + 4.0 + MESH_WEIGHT_MAX) / 3
+    assert weights["c"] == weights["e"] == mean
+    assert capacity_weights({"a": None, "b": 0}) == {"a": 1.0, "b": 1.0}
+
+    owners = _fresh(["small", "big"], capacity_weights({"small": 2, "big": 4}))
+    small = sum(1 for o in owners.values() if o == "small")
+    assert 0.5 < small / (len(TARGETS) - small) < 0.75
+
+
+def _rebalance_body() -> str:
+    src = (_BACKEND / "mesh_targets.py").read_text()
+    start = src.index("async def rebalance_expired_assignments(")
+    return src[start:]
+
+
+def test_rebalance_is_set_based():
+    body = _rebalance_body()
+    assert "assign_targets(" in body
+    assert "capacity_weights(" in body and "loads, weights," in body
+    assert "daemon_health->>'num_cpu'" in body
+    assert len(re.findall(r"UPDATE mesh_target_assignments", body)) == 1
+    assert "unnest($1::uuid[], $2::text[])" in body
+    assert not re.search(r"for row in expired:[\s\S]*?await conn\.execute", body)
+
+
+def test_modulo_hash_removed():
+    src = (_BACKEND / "mesh_targets.py").read_text()
+    assert "_consistent_hash" not in src
+    assert "% len(appliance_ids)" not in src
+
+
+# ------------------------------------------------------------ benchmark
+
+def test_benchmark_hrw_moves_minimum():
+    sys.path.insert(0, str(_BACKEND / "scripts"))
+    import bench_mesh_assignment
+
+    rows = bench_mesh_assignment.run(600, [4])
+    by = {(r["event"], r["scheme"]): r for r in rows}
+    assert by[("leave", "hrw")]["moved"] == by[("leave", "hrw")]["minimum"]
+    assert by[("join", "hrw")]["moved"] == 0
+    assert by[("leave", "modulo")]["moved"] > 2 * by[("leave", "modulo")]["minimum"]
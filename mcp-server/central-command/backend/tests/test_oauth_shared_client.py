@@ -0,0 +1,92 @@
+"""Gate for the pooled OAuth connector HTTP client (base_connector.py).
+
+Pins:
+  - every connector on an event loop shares one httpx.AsyncClient, so
+    token exchange / refresh / API calls reuse keep-alive connections
+    instead of opening a client (and a TLS handshake) per call
+  - a new event loop gets its own client; connector.close() leaves the
+    shared pool open
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+
+import httpx
+
+_MCP_SERVER = pathlib.Path(__file__).resolve().parents[3]
+if str(_MCP_SERVER) not in sys.path:
+    sys.path.insert(0, str(_MCP_SERVER))
+
+from dashboard_api.integrations.oauth import base_connector  # noqa: E402
+from dashboard_api.integrations.oauth.base_connector import (  # noqa: E402
+    BaseOAuthConnector,
+    OAuthConfig,
+)
+from dashboard_api.integrations.secure_credentials import SecureCredentials  # noqa: E402
+
+
+class _Audit:
+    async def log_token_refreshed(self, **kwargs):
+        pass
+
+
+class _Connector(BaseOAuthConnector):
+    PROVIDER = "test"
+    TOKEN_URL = "https://idp.test/token"
+
+    async def collect_resources(self):
+        return []
+
+    async def test_connection(self):
+        return {}
+
+
+def _connector(n: int) -> _Connector:
+    return _Connector(
+        integration_id=f"int-{n}",
+        site_id="site-1",
+        config=OAuthConfig(
+            client_id="cid",
+            client_secret=SecureCredentials(client_secret="secret"),
+            redirect_uri="",
+        ),
+        credential_vault=None,
+        state_manager=None,
+        audit_logger=_Audit(),
+        tokens=SecureCredentials(access_token="old", refresh_token="r1"),
+    )
+
+
+def test_connectors_share_one_pooled_client(monkeypatch):
+    clients = []
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs):
+        client = real_client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json={"access_token": "new"})
+            ),
+            **kwargs,
+        )
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(base_connector, "_shared_client", None)
+    monkeypatch.setattr(base_connector.httpx, "AsyncClient", _client)
+
+    async def refresh_both():
+        a, b = _connector(1), _connector(2)
+        tokens = [await a.refresh_tokens(), await b.refresh_tokens()]
+        await a.close()
+        assert not clients[0].is_closed
+        assert await b._get_http_client() is clients[0]
+        return tokens
+
+    tokens = asyncio.run(refresh_both())
+    assert [t.access_token for t in tokens] == ["new", "new"]
+    assert len(clients) == 1
+
+    asyncio.run(_connector(3).refresh_tokens())
+    assert len(clients) == 2  # new event loop, new pool
@@ -92,6 +92,7 @@ SITE_RLS_TABLES = {
     "orders",
     # partner_notifications uses partner_id, not site_id — exempt
     "reconcile_events",
+    "search_documents",
     "security_events",
     "sensor_registry",
     "site_appliances",
@@ -64,7 +64,7 @@ def _mock_now():
 def test_partition_maintainer_dry_clean_all_5_have_next_month():
     """All 5 critical partitioned tables have next-month coverage.
     Returns 0 violations — steady-state for a healthy
-    partition_maintainer_loop."""
+    partition_maintainer_tick."""
     rows = [
         {"parent_table": "compliance_bundles",
          "children": ["compliance_bundles_2026_05", "compliance_bundles_2026_04",
@@ -155,8 +155,12 @@ def test_compute_compliance_score_source_shape():
         "remain so the cache gate exists."
     )
     assert "cache_get(_cache_key)" in src
-    # Write-back at the final return.
-    assert "cache_set(_cache_key, _result, _SCORE_CACHE_TTL_SECONDS)" in src
+    # Write-back at the final return, through the shared-tier lease
+    # (publish() writes L1 too — no separate cache_set).
+    assert re.search(
+        r"_lease\.publish\(\s*_result, _SCORE_CACHE_TTL_SECONDS", src
+    )
+    assert "cache_set(_cache_key" not in src
     # Auditor-export bypass — `_should_cache_score` returns False
     # for window_days=None; verified above. Source comment also
     # cites this for future readers.
@@ -294,3 +298,265 @@ def test_invalidate_drops_matching_lock():
         "cache_invalidate must pop the matching lock — without this, "
         "explicit invalidation leaks _LOCKS entries."
     )
+
+
+# user-026 — shared (Redis L2) tier + site-scoped invalidation.
+
+
+class _FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio calls the shared
+    tier makes. TTLs are ignored — tests exercise invalidation, not
+    expiry (L1 expiry is covered above)."""
+
+    def __init__(self):
+        self.kv: dict = {}
+        self.sets: dict = {}
+        self.published: list = []
+
+    async def get(self, k):
+        return self.kv.get(k)
+
+    async def set(self, k, v, nx=False, px=None, ex=None):
+        if nx and k in self.kv:
+            return None
+        self.kv[k] = v
+        return True
+
+    async def smembers(self, k):
+        return set(self.sets.get(k, set()))
+
+    async def delete(self, *keys):
+        for k in keys:
+            self.kv.pop(k, None)
+            self.sets.pop(k, None)
+
+    async def publish(self, ch, msg):
+        self.published.append((ch, msg))
+
+    async def eval(self, script, n, key, token):
+        if self.kv.get(key) == token:
+            del self.kv[key]
+            return 1
+        return 0
+
+    def pipeline(self, transaction=False):
+        fake = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, k, v, ex=None):
+                self.ops.append(lambda: fake.kv.__setitem__(k, v))
+
+            def sadd(self, k, v):
+                self.ops.append(lambda: fake.sets.setdefault(k, set()).add(v))
+
+            def expire(self, k, ttl):
+                pass
+
+            async def execute(self):
+                for op in self.ops:
+                    op()
+
+        return _Pipe()
+
+
+def _install_fake_redis(monkeypatch):
+    import perf_cache
+    fake = _FakeRedis()
+
+    async def _get():
+        return fake
+
+    monkeypatch.setattr(perf_cache, "_get_redis", _get)
+    return fake
+
+
+def test_shared_fill_second_replica_hits_l2(monkeypatch):
+    """A value published by one replica is served from L2 to another
+    replica whose L1 is empty — the underlying compute runs once."""
+    import perf_cache
+    perf_cache.cache_clear()
+    _install_fake_redis(monkeypatch)
+    calls = 0
+
+    async def _read(key):
+        nonlocal calls
+        async with perf_cache.shared_fill(
+            key, 60, site_ids=["site-a"], decode=lambda d: d,
+        ) as lease:
+            if lease.value is not None:
+                return lease.value
+            calls += 1
+            await lease.publish(
+                {"score": 91.0}, 60, site_ids=["site-a"], encode=lambda v: v,
+            )
+            return {"score": 91.0}
+
+    async def _run():
+        key = ("compute_compliance_score", ("site-a",), False, 30, None, None)
+        assert await _read(key) == {"score": 91.0}
+        # Simulate a different replica: empty L1, same Redis.
+        perf_cache._STORE.clear()
+        perf_cache._KEY_SITES.clear()
+        assert await _read(key) == {"score": 91.0}
+        # The L2 hit promoted into L1 is site-tagged, so a pub/sub
+        # purge from another replica drops it.
+        assert perf_cache._invalidate_local(["site-a"]) == 1
+        assert perf_cache.cache_get(key) is None
+
+    asyncio.run(_run())
+    assert calls == 1
+    m = perf_cache.cache_metrics()
+    assert m["miss"] == 1 and m["l2_hit"] == 1
+    perf_cache.cache_clear()
+
+
+def test_shared_fill_waits_for_other_replica_lock(monkeypatch):
+    """When another replica holds the fill lock, the miss waits for
+    that replica's L2 write instead of computing (stampede coalescing)."""
+    import perf_cache
+    perf_cache.cache_clear()
+    fake = _install_fake_redis(monkeypatch)
+    monkeypatch.setattr(perf_cache, "_SHARED_LOCK_POLL_MIN_SECONDS", 0.01)
+    key = ("k-locked",)
+    h = perf_cache._shared_key(key)
+    fake.kv[perf_cache._LOCK_PREFIX + h] = "other-replica"
+
+    async def _other_replica_finishes():
+        await asyncio.sleep(0.05)
+        fake.kv[perf_cache._SHARED_PREFIX + h] = '"from-other"'
+
+    async def _run():
+        asyncio.get_running_loop().create_task(_other_replica_finishes())
+        async with perf_cache.shared_fill(
+            key, 60, site_ids=["site-a"], decode=lambda d: d,
+        ) as lease:
+            return lease.value
+
+    assert asyncio.run(_run()) == "from-other"
+    assert perf_cache._KEY_SITES[key] == frozenset({"site-a"})
+    assert perf_cache.cache_metrics()["stampede_wait"] == 1
+    perf_cache.cache_clear()
+
+
+def test_shared_fill_wait_is_capped_near_compute_time(monkeypatch):
+    """A lock holder that never publishes only stalls waiters for
+    _SHARED_LOCK_WAIT_SECONDS (about one compute), not the lock lease;
+    the waiter then computes itself."""
+    import perf_cache
+    perf_cache.cache_clear()
+    fake = _install_fake_redis(monkeypatch)
+    monkeypatch.setattr(perf_cache, "_SHARED_LOCK_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(perf_cache, "_SHARED_LOCK_POLL_MIN_SECONDS", 0.01)
+    key = ("k-stuck",)
+    h = perf_cache._shared_key(key)
+    fake.kv[perf_cache._LOCK_PREFIX + h] = "stuck-replica"
+    polls = 0
+    real_get = fake.get
+
+    async def _counting_get(k):
+        nonlocal polls
+        polls += 1
+        return await real_get(k)
+
+    fake.get = _counting_get
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with perf_cache.shared_fill(
+            key, 60, site_ids=["site-a"], decode=lambda d: d,
+        ) as lease:
+            return lease.value, loop.time() - started
+
+    value, waited = asyncio.run(_run())
+    assert value is None
+    assert 0.2 <= waited < 1.0
+    # Backoff: 10ms doubling to the cap is ~5 polls in 200ms, not 20.
+    assert polls <= 8
+    m = perf_cache.cache_metrics()
+    assert m["stampede_timeout"] == 1 and m["miss"] == 1
+    perf_cache.cache_clear()
+
+
+def test_shared_lock_wait_close_to_compute_time():
+    """Waiting much longer than the ~5s p99 compute is worse than
+    computing locally."""
+    import perf_cache
+    assert perf_cache._SHARED_LOCK_WAIT_SECONDS <= 10.0
+    assert (
+        perf_cache._SHARED_LOCK_POLL_MIN_SECONDS
+        < perf_cache._SHARED_LOCK_POLL_MAX_SECONDS
+        < perf_cache._SHARED_LOCK_WAIT_SECONDS
+    )
+
+
+def test_invalidate_sites_drops_only_matching_scope(monkeypatch):
+    """Evidence for site-a must drop every entry whose tenant scope
+    includes site-a (L1 + L2) and leave site-b's entries alone."""
+    import perf_cache
+    perf_cache.cache_clear()
+    fake = _install_fake_redis(monkeypatch)
+
+    async def _run():
+        for key, sites in (
+            (("a",), ["site-a"]),
+            (("ab",), ["site-a", "site-b"]),
+            (("b",), ["site-b"]),
+        ):
+            lease = perf_cache.SharedFill(key)
+            await lease.publish("v", 60, site_ids=sites, encode=lambda v: v)
+        await perf_cache.invalidate_sites(["site-a"])
+
+    asyncio.run(_run())
+    assert perf_cache.cache_get(("a",)) is None
+    assert perf_cache.cache_get(("ab",)) is None
+    assert perf_cache.cache_get(("b",)) == "v"
+    assert perf_cache._SHARED_PREFIX + perf_cache._shared_key(("b",)) in fake.kv
+    assert perf_cache._SHARED_PREFIX + perf_cache._shared_key(("a",)) not in fake.kv
+    assert fake.published, "other replicas must be told to purge their L1"
+    perf_cache.cache_clear()
+
+
+def test_shared_tier_degrades_without_redis(monkeypatch):
+    """No Redis → shared_fill behaves as the L1-only cache."""
+    import perf_cache
+    perf_cache.cache_clear()
+
+    async def _none():
+        return None
+
+    monkeypatch.setattr(perf_cache, "_get_redis", _none)
+
+    async def _run():
+        async with perf_cache.shared_fill(("solo",), 60, site_ids=["s"], decode=lambda d: d) as lease:
+            assert lease.value is None
+            await lease.publish("v", 60, site_ids=["s"], encode=lambda v: v)
+        await perf_cache.invalidate_sites(["s"])
+
+    asyncio.run(_run())
+    assert perf_cache.cache_get(("solo",)) is None
+    perf_cache.cache_clear()
+
+
+def test_score_encode_decode_roundtrip():
+    """Shared-tier hits must be indistinguishable from a fresh compute."""
+    from datetime import datetime, timezone
+    from compliance_score import ComplianceScore, _decode_score, _encode_score
+    ts = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+    score = ComplianceScore(
+        overall_score=87.5,
+        status="healthy",
+        counts={"passed": 7, "failed": 1, "warnings": 0, "total": 8},
+        last_check_at=ts,
+        by_site=[{"site_id": "s1", "score": 87.5, "last_check_at": ts}],
+    )
+    assert _decode_score(_encode_score(score)) == score
+
+
+def test_submit_evidence_invalidates_site_scope():
+    """Source gate: submit_evidence schedules the site invalidation."""
+    src = (_BACKEND / "evidence_chain.py").read_text()
+    assert "background_tasks.add_task(invalidate_sites, [site_id])" in src
@@ -0,0 +1,108 @@
+"""user-027: /metrics serves DB-backed families from a snapshot.
+
+Pre-change every scrape ran ~48 aggregate queries, so DB load scaled
+with scrapers × scrape frequency. These tests lock the snapshot shape:
+
+  1. A family is only re-collected once its interval has elapsed —
+     repeated scrapes/ticks inside the interval do not hit the DB.
+  2. A cold process (no snapshot yet) collects inline once, then serves
+     the snapshot.
+  3. A failing collector keeps serving the previous body and flips
+     `osiriscare_metrics_family_up` to 0.
+  4. Every exposition carries per-family freshness + collection-cost
+     gauges.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import pathlib
+import sys
+
+os.environ.setdefault("SESSION_TOKEN_SECRET", "test-secret")
+os.environ.setdefault("ENVIRONMENT", "development")
+
+_backend = pathlib.Path(__file__).resolve().parent.parent
+_mcp_server = _backend.parent.parent
+for _p in (str(_backend), str(_mcp_server)):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+
+def _load_prom():
+    try:
+        from dashboard_api import prometheus_metrics as _pm
+    except Exception:
+        import prometheus_metrics as _pm  # type: ignore
+    return _pm
+
+
+def _fake_families(pm, monkeypatch, calls, fail=None):
+    def _mk(name):
+        async def _collector(pool, now):
+            calls[name] = calls.get(name, 0) + 1
+            if fail is not None and name in fail:
+                raise RuntimeError("synthetic")
+            return [pm._gauge(f"t_{name}", "test", [({}, float(calls[name]))])]
+        return _collector
+
+    monkeypatch.setattr(pm, "_FAMILIES", {
+        "fast": (_mk("fast"), 0),
+        "slow": (_mk("slow"), 3600),
+    })
+    monkeypatch.setattr(pm, "_SNAPSHOTS", {})
+
+
+def test_refresh_respects_family_interval(monkeypatch):
+    pm = _load_prom()
+    calls: dict = {}
+    _fake_families(pm, monkeypatch, calls)
+
+    async def _run():
+        for _ in range(3):
+            await pm.refresh_due_families(object())
+
+    asyncio.run(_run())
+    assert calls == {"fast": 3, "slow": 1}
+
+
+def test_cold_scrape_collects_missing_then_serves_snapshot(monkeypatch):
+    pm = _load_prom()
+    calls: dict = {}
+    _fake_families(pm, monkeypatch, calls)
+
+    async def _pool():
+        return object()
+
+    import dashboard_api.fleet as fleet  # noqa: E402
+    monkeypatch.setattr(fleet, "get_pool", _pool)
+
+    async def _run():
+        first = await pm.prometheus_metrics(auth={})
+        second = await pm.prometheus_metrics(auth={})
+        return first.body.decode(), second.body.decode()
+
+    first, second = asyncio.run(_run())
+    assert calls == {"fast": 1, "slow": 1}
+    assert "t_slow 1.0" in first and "t_slow 1.0" in second
+    for metric in (
+        "osiriscare_metrics_family_age_seconds",
+        "osiriscare_metrics_family_collection_seconds",
+        "osiriscare_metrics_family_last_collected_timestamp",
+    ):
+        assert f'{metric}{{family="slow"}}' in second
+
+
+def test_failed_collect_keeps_previous_body(monkeypatch):
+    pm = _load_prom()
+    calls: dict = {}
+    _fake_families(pm, monkeypatch, calls, fail={"fast"})
+    pm._SNAPSHOTS["fast"] = pm._FamilySnapshot("t_fast 7.0", 1.0, 0.0, True)
+
+    asyncio.run(pm._collect_family("fast", object()))
+
+    snap = pm._SNAPSHOTS["fast"]
+    assert snap.body == "t_fast 7.0" and snap.ok is False
+    assert snap.collected_at == 1.0, "freshness must keep reporting the old age"
+    freshness = "\n".join(pm._render_snapshot_freshness())
+    assert 'osiriscare_metrics_family_up{family="fast"} 0.0' in freshness
@@ -25,6 +25,11 @@ shapes both leaked transaction-poisoning errors at runtime:
    `admin_transaction(pool) as conn` block. Fresh PgBouncer backend,
    fresh transaction; section A's failure cannot poison section B.
 
+user-027: the sections moved out of the endpoint into per-family
+collectors (`_collect_fleet`, `_collect_flywheel`, ...) run by
+`metrics_collector_loop`. The gate applies to the union of those
+collectors; the endpoint itself must not touch the DB per-section.
+
 Hard rule
 ---------
 - The OUTER `admin_transaction(pool) as conn` IS REMOVED. There is no
@@ -74,15 +79,38 @@ def _is_conn_transaction_with(node: ast.AsyncWith) -> bool:
     return False
 
 
-def _load_metrics_function() -> ast.AsyncFunctionDef:
+def _load_metrics_function() -> ast.Module:
+    """Return a synthetic module holding every family collector
+    (`_collect_<family>`) so the per-section gates below count across
+    all of them, exactly as they did across the single pre-user-027
+    endpoint body."""
     src = _TARGET.read_text(encoding="utf-8")
     tree = ast.parse(src, filename=str(_TARGET))
+    collectors = [
+        node for node in tree.body
+        if isinstance(node, ast.AsyncFunctionDef)
+        and node.name.startswith("_collect_")
+        and node.name != "_collect_family"
+    ]
+    assert collectors, (
+        "no `_collect_<family>` collectors found in prometheus_metrics.py"
+    )
+    return ast.Module(body=collectors, type_ignores=[])
+
+
+def test_endpoint_serves_snapshot_not_db_sections() -> None:
+    """user-027: the scrape handler renders snapshots; it must not open
+    per-section admin_transactions itself (DB load would again scale
+    with scrape frequency)."""
+    tree = ast.parse(_TARGET.read_text(encoding="utf-8"))
     for node in ast.walk(tree):
         if isinstance(node, ast.AsyncFunctionDef) and node.name == "prometheus_metrics":
-            return node
-    raise AssertionError(
-        "prometheus_metrics async function not found in prometheus_metrics.py"
-    )
+            assert not any(
+                isinstance(n, ast.AsyncWith) and _is_admin_transaction_with(n)
+                for n in ast.walk(node)
+            )
+            return
+    raise AssertionError("prometheus_metrics endpoint not found")
 
 
 def _is_section_try(node: ast.Try) -> bool:
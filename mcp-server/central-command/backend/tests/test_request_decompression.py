@@ -0,0 +1,83 @@
+"""Gate for gzip request-body decompression (request_decompression.py).
+
+Pins:
+  - gzip bodies reach the app inflated, with Content-Encoding dropped and
+    Content-Length corrected (handlers that re-check the header no-op)
+  - plain bodies pass through untouched
+  - corrupt gzip -> 400, oversized inflation -> 413, both with a
+    {"detail": ...} envelope
+  - main.py registers the middleware
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import pathlib
+import sys
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+from request_decompression import GzipRequestMiddleware  # noqa: E402
+
+_MAIN = (_BACKEND.parent.parent / "main.py").read_text()
+
+
+def _run(body: bytes, headers, max_bytes: int = 1024 * 1024):
+    seen = {}
+    sent = []
+
+    async def app(scope, receive, send):
+        message = await receive()
+        seen["headers"] = dict(scope["headers"])
+        seen["body"] = message["body"]
+
+    chunks = [body[:5], body[5:]]
+
+    async def receive():
+        part = chunks.pop(0)
+        return {"type": "http.request", "body": part, "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": headers}
+    asyncio.run(GzipRequestMiddleware(app, max_bytes)(scope, receive, send))
+    return seen, sent
+
+
+def test_gzip_body_is_inflated_for_the_app():
+    payload = json.dumps({"site_id": "s1", "bundles": list(range(100))}).encode()
+    seen, sent = _run(gzip.compress(payload), [
+        (b"content-type", b"application/json"),
+        (b"content-encoding", b"gzip"),
+        (b"content-length", b"999"),
+    ])
+    assert sent == []
+    assert seen["body"] == payload
+    assert b"content-encoding" not in seen["headers"]
+    assert seen["headers"][b"content-length"] == str(len(payload)).encode()
+
+
+def test_plain_body_passes_through():
+    seen, _ = _run(b'{"a": 1}', [(b"content-type", b"application/json")])
+    assert seen["body"] == b'{"a":'  # the app's own first receive(): not buffered
+    assert b"content-type" in seen["headers"]
+
+
+def test_bad_and_oversized_gzip_rejected_with_detail():
+    _, sent = _run(b"not gzip at all", [(b"content-encoding", b"gzip")])
+    assert sent[0]["status"] == 400
+    assert json.loads(sent[1]["body"]) == {"detail": "Invalid gzip payload"}
+
+    bomb = gzip.compress(b"\0" * 10_000)
+    _, sent = _run(bomb, [(b"content-encoding", b"gzip")], max_bytes=1000)
+    assert sent[0]["status"] == 413
+    assert "detail" in json.loads(sent[1]["body"])
+
+
+def test_registered_in_main():
+    assert "from dashboard_api.request_decompression import GzipRequestMiddleware" in _MAIN
+    assert "app.add_middleware(GzipRequestMiddleware)" in _MAIN
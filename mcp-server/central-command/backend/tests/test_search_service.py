@@ -0,0 +1,111 @@
+"""Gate for the unified search service (Migration 335, search_service.py).
+
+Pins:
+  - one query per search, every requested kind present in the result
+  - user input is LIKE-escaped and bound, never interpolated
+  - typeahead: an extension of a complete (short) cached result is
+    answered in memory with the same ranking the SQL uses; a truncated
+    result always goes back to the database
+  - search_documents FORCEs row-level security (mcp_app owns it)
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+import search_service  # noqa: E402
+
+_MIGRATION = _BACKEND / "migrations" / "335_search_documents.sql"
+
+_NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _doc(kind, entity_id, title, body, age_h=0, rank=2):
+    return {
+        "kind": kind, "entity_id": entity_id, "site_id": "site-a",
+        "title": title, "subtitle": None, "body": body,
+        "payload": {"id": entity_id}, "sort_at": _NOW - timedelta(hours=age_h),
+        "rank": rank,
+    }
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, sql, *args):
+        self.calls.append((sql, args))
+        return self.rows
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    search_service.clear_prefix_cache()
+    yield
+    search_service.clear_prefix_cache()
+
+
+def _search(conn, q, **kw):
+    return asyncio.run(search_service.search_documents(conn, ["site-a"], q, **kw))
+
+
+def test_single_query_and_escaped_binding():
+    conn = _Conn([_doc("device", "d1", "dc01", "dc01 10.0.0.5", rank=0)])
+    out = _search(conn, "  DC_0%  ", kinds=("device", "incident"))
+
+    assert len(conn.calls) == 1
+    sql, args = conn.calls[0]
+    assert args[1] == "%dc\\_0\\%%"
+    assert args[2] == "dc\\_0\\%%"
+    assert "dc_0" not in sql
+    assert set(out) == {"device", "incident"}
+    assert out["device"][0]["entity_id"] == "d1"
+    assert "body" not in out["device"][0]
+
+
+def test_short_query_skips_database():
+    conn = _Conn([])
+    assert _search(conn, "d") == {k: [] for k in search_service.SEARCH_KINDS}
+    assert conn.calls == []
+
+
+def test_prefix_extension_served_from_cache_with_sql_ranking():
+    rows = [
+        _doc("workstation", "w1", "dc01", "dc01 windows 11", age_h=5, rank=0),
+        _doc("workstation", "w2", "fs01", "fs01 member of dc02 ou", age_h=1, rank=1),
+        _doc("workstation", "w3", "ws9", "ws9 xdc0y", age_h=0, rank=2),
+    ]
+    conn = _Conn(rows)
+    _search(conn, "dc0", limit=10, kinds=("workstation",))
+    assert len(conn.calls) == 1
+
+    out = _search(conn, "dc02", limit=10, kinds=("workstation",))
+    assert len(conn.calls) == 1  # no second round trip
+    assert [d["entity_id"] for d in out["workstation"]] == ["w2"]
+    assert out["workstation"][0]["rank"] == 1
+    assert search_service.cache_stats()["prefix_hits"] == 1
+
+
+def test_truncated_prefix_result_is_not_narrowed():
+    rows = [_doc("incident", f"i{n}", "disk full", "disk full", age_h=n) for n in range(3)]
+    conn = _Conn(rows)
+    _search(conn, "di", limit=3, kinds=("incident",))
+    _search(conn, "dis", limit=3, kinds=("incident",))
+    assert len(conn.calls) == 2
+
+
+def test_search_documents_forces_rls():
+    """mcp_app owns search_documents; without FORCE the owner skips RLS."""
+    sql = _MIGRATION.read_text()
+    assert "ALTER TABLE search_documents OWNER TO mcp_app" in sql
+    assert "ALTER TABLE search_documents ENABLE ROW LEVEL SECURITY" in sql
+    assert "ALTER TABLE search_documents FORCE ROW LEVEL SECURITY" in sql
@@ -26,6 +26,8 @@ import os
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SITES_PY = os.path.join(BACKEND_DIR, "sites.py")
 PORTAL_PY = os.path.join(BACKEND_DIR, "portal.py")
+SEARCH_SERVICE_PY = os.path.join(BACKEND_DIR, "search_service.py")
+MIG_335 = os.path.join(BACKEND_DIR, "migrations", "335_search_documents.sql")
 
 
 def _load(path: str) -> str:
@@ -166,37 +168,26 @@ class TestSearchEndpoint:
     def test_searches_all_four_categories(self):
         """Incidents, devices, credentials, workstations must all be queried.
 
-        Post Task #73 Phase 2 Batch 2 (2026-05-13): the devices search
-        was migrated from raw `discovered_devices` to canonical_devices
-        via CTE-JOIN (`WITH dd_freshest AS (... FROM canonical_devices cd
-        JOIN discovered_devices dd ...) SELECT ... FROM dd_freshest`).
-        Accept either shape — the test's intent is semantic ("the
-        function searches devices") not structural.
+        Since Migration 335 all four come from one search_documents
+        query; the index itself is trigger-fed from each source table.
         """
         tree = ast.parse(_load(SITES_PY))
         fn = _get_func(tree, "search_site")
         body_src = ast.get_source_segment(_load(SITES_PY), fn) or ""
-        assert "FROM incidents" in body_src
-        assert (
-            "FROM discovered_devices" in body_src
-            or "FROM canonical_devices" in body_src
-            or "FROM dd_freshest" in body_src
-        ), "search_site must query the devices table (raw or canonical via CTE)"
-        assert "FROM site_credentials" in body_src
-        assert "FROM workstations" in body_src
-
-    def test_uses_ilike_parameterized(self):
-        """ILIKE patterns must be parameterized, not f-stringed into SQL."""
-        tree = ast.parse(_load(SITES_PY))
-        fn = _get_func(tree, "search_site")
-        body_src = ast.get_source_segment(_load(SITES_PY), fn) or ""
-        assert "ILIKE $2" in body_src
-        # The pattern variable must exist — term-based f-string goes into the
-        # BINDING, never into the query text itself.
-        assert 'pattern = f"%{term}%"' in body_src
-        # And we must never see ILIKE with a curly-braced interpolation
-        assert "ILIKE '%{" not in body_src
-        assert 'ILIKE "%{' not in body_src
+        assert "search_documents(" in body_src
+        assert '("incident", "device", "credential", "workstation")' in body_src
+        mig = _load(MIG_335)
+        for table in ("incidents", "discovered_devices", "site_credentials", "workstations"):
+            assert f"ON {table}" in mig, f"search_documents must be maintained from {table}"
+
+    def test_uses_like_parameterized(self):
+        """LIKE patterns must be parameterized, not f-stringed into SQL."""
+        src = _load(SEARCH_SERVICE_PY)
+        assert "body LIKE $2 ESCAPE" in src
+        # User input is escaped and goes into the BINDING, never the query text.
+        assert "_escape_like(term)" in src
+        assert "LIKE '%{" not in src
+        assert 'LIKE "%{' not in src
 
     def test_echoes_site_id_and_query(self):
         """Response echoes site_id + query so the frontend can assert scope."""
@@ -213,36 +204,30 @@ class TestSearchEndpoint:
         body_src = ast.get_source_segment(_load(SITES_PY), fn) or ""
         assert "tenant_connection(pool, site_id=site_id)" in body_src
 
-    def test_skips_missing_tables_gracefully(self):
-        """If workstations table is missing, search must not 500."""
+    def test_search_failure_does_not_500(self):
+        """A failing search query must return empty results, not 500."""
         tree = ast.parse(_load(SITES_PY))
         fn = _get_func(tree, "search_site")
         body_src = ast.get_source_segment(_load(SITES_PY), fn) or ""
-        # Per-category try/except so one missing table doesn't kill the whole request
         assert "except Exception" in body_src
-        assert "workstations query" in body_src
+        assert "search_documents query failed" in body_src
 
     def test_credentials_exclude_encrypted_data(self):
         """Search response must never expose encrypted credential blobs.
 
-        The credentials SELECT list must contain only id / credential_type /
-        credential_name. We allow the string ``encrypted_data`` to appear in
-        a comment (it's a security intent doc), but NOT in the SQL SELECT.
+        The credential document builder may only index / return
+        id / credential_type / credential_name.
         """
+        mig = _load(MIG_335)
+        start = mig.index("FUNCTION search_documents_index_credential")
+        builder = mig[start:mig.index("$$;", start)]
+        assert "encrypted" not in builder.split("BEGIN", 1)[1]
+        assert "credential_type" in builder
+        assert "credential_name" in builder
         tree = ast.parse(_load(SITES_PY))
         fn = _get_func(tree, "search_site")
         body_src = ast.get_source_segment(_load(SITES_PY), fn) or ""
-        # Find the site_credentials SELECT and slice just that query
-        marker = "FROM site_credentials"
-        assert marker in body_src
-        select_start = body_src.rfind("SELECT", 0, body_src.index(marker))
-        select_stmt = body_src[select_start:body_src.index(marker)]
-        assert "encrypted_data" not in select_stmt, (
-            "credentials SELECT must not include encrypted_data column"
-        )
-        # Sanity: the safe columns we DO select
-        assert "credential_type" in select_stmt
-        assert "credential_name" in select_stmt
+        assert '("id", "credential_type", "credential_name")' in body_src
 
 
 # =============================================================================
@@ -0,0 +1,161 @@
+"""Gate for single-round-trip RLS context setup (tenant_middleware).
+
+Pins:
+  - tenant/org/partner/set_tenant_context apply the full context in ONE
+    statement, txn-local (set_config(..., true)), inside the transaction
+  - the settings applied are exactly the ones the SET LOCAL chain set
+  - invalid ids still raise ValueError and never reach the DB
+  - round trips are counted per helper and per request
+  - the checkin benchmark shows fewer round trips than the legacy chain
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import re
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+_BACKEND = pathlib.Path(__file__).resolve().parent.parent
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+import tenant_middleware as tm  # noqa: E402
+
+_ORG = "3f2b8a1c-4d5e-4f60-8a7b-9c0d1e2f3a4b"
+
+
+class _Conn:
+    def __init__(self):
+        self.log = []
+        self.in_txn = False
+
+    async def execute(self, sql, *args):
+        self.log.append(("execute", sql, self.in_txn))
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.log.append(("BEGIN", None, False))
+        self.in_txn = True
+        yield
+        self.in_txn = False
+        self.log.append(("COMMIT", None, False))
+
+
+class _Pool:
+    def __init__(self):
+        self.conn = _Conn()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _settings(sql):
+    return dict(re.findall(r"set_config\('app\.(\w+)', '([^']*)', true\)", sql))
+
+
+def _run(cm_factory):
+    pool = _Pool()
+
+    async def go():
+        async with cm_factory(pool):
+            pass
+
+    asyncio.run(go())
+    return pool.conn.log
+
+
+def _only_statement(log):
+    stmts = [e for e in log if e[0] == "execute"]
+    assert len(stmts) == 1, stmts
+    kind, sql, in_txn = stmts[0]
+    assert in_txn and sql.startswith("SELECT set_config(")
+    return _settings(sql)
+
+
+def test_tenant_connection_one_statement():
+    log = _run(lambda p: tm.tenant_connection(p, site_id="site-abc", actor_appliance_id="site-abc-AA:BB:CC:00:11:22"))
+    assert _only_statement(log) == {
+        "current_tenant": "site-abc",
+        "is_admin": "false",
+        "actor_appliance_id": "site-abc-AA:BB:CC:00:11:22",
+    }
+    assert [e[0] for e in log] == ["BEGIN", "execute", "COMMIT"]
+
+
+def test_tenant_connection_without_context_fails_closed():
+    log = _run(lambda p: tm.tenant_connection(p))
+    assert _only_statement(log) == {"is_admin": "false", "current_tenant": ""}
+
+
+def test_org_and_partner_one_statement():
+    assert _only_statement(_run(lambda p: tm.org_connection(p, _ORG))) == {
+        "current_org": _ORG, "is_admin": "false", "current_tenant": "",
+    }
+    assert _only_statement(_run(lambda p: tm.partner_connection(p, _ORG))) == {
+        "current_partner_id": _ORG, "is_admin": "false",
+        "current_tenant": "", "current_org": "",
+    }
+
+
+def test_set_tenant_context_one_statement():
+    conn = _Conn()
+    conn.in_txn = True
+    asyncio.run(tm.set_tenant_context(conn, site_id="site-x"))
+    assert _only_statement(conn.log) == {"is_admin": "false", "current_tenant": "site-x"}
+
+
+@pytest.mark.parametrize("factory", [
+    lambda p: tm.tenant_connection(p, site_id="x'; SET app.is_admin='true"),
+    lambda p: tm.tenant_connection(p, site_id="site", actor_appliance_id="a' OR 1=1"),
+    lambda p: tm.org_connection(p, "not-a-uuid"),
+    lambda p: tm.partner_connection(p, "'; DROP"),
+])
+def test_invalid_ids_rejected_before_any_round_trip(factory):
+    pool = _Pool()
+
+    async def go():
+        async with factory(pool):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(go())
+    assert pool.conn.log == []
+
+
+def test_sql_builder_rejects_unknown_setting_and_bad_value():
+    with pytest.raises(ValueError):
+        tm._set_config_sql((("role", "postgres"),))
+    with pytest.raises(ValueError):
+        tm._set_config_sql((("current_tenant", "a'b"),))
+
+
+def test_round_trips_counted_per_helper_and_request():
+    before = tm.rls_metrics()
+
+    async def go():
+        pool = _Pool()
+        with tm.track_request_round_trips() as acc:
+            async with tm.tenant_connection(pool, site_id="s1"):
+                pass
+            async with tm.admin_connection(pool):
+                pass
+        return acc[0]
+
+    assert asyncio.run(go()) == 5
+    after = tm.rls_metrics()
+    assert after["tenant"]["contexts"] - before.get("tenant", {}).get("contexts", 0) == 1
+    assert after["_requests"]["requests"] - before["_requests"]["requests"] == 1
+    assert after["_requests"]["round_trips"] - before["_requests"]["round_trips"] == 5
+
+
+def test_benchmark_fewer_round_trips_than_legacy():
+    sys.path.insert(0, str(_BACKEND / "scripts"))
+    import bench_rls_setup
+
+    rows = {r["scheme"]: r for r in bench_rls_setup.run([0.0], checkins=2, queries=1)}
+    assert rows["set_config"]["round_trips"] < rows["legacy"]["round_trips"]
+    assert rows["legacy"]["round_trips"] - rows["set_config"]["round_trips"] == 4
@@ -0,0 +1,187 @@
+"""Chunk manifests for content-addressed delta updates (Migration 336).
+
+A release ISO is split into fixed-size chunks and each chunk is named
+by its SHA-256. The manifest lists those hashes in order, plus the
+whole-image size and SHA-256, and is signed with the server's Ed25519
+key over its canonical JSON (sort_keys, compact separators).
+
+Appliances hold the previous release byte-for-byte on their active A/B
+partition (apply_update dd's the ISO onto it), so most chunks of a new
+release are already on disk. The agent indexes the active partition by
+chunk hash, copies every chunk it already has, and fetches only the
+missing ones from iso_url with HTTP Range requests. Chunk offsets are
+implicit: chunk i covers [i * chunk_size, (i + 1) * chunk_size).
+
+Manifests are generated here, server-side, by streaming the ISO once
+from iso_url when a release is created (or on demand via
+POST /api/fleet/releases/{version}/manifest). The whole-image SHA-256
+must match the release's sha256 or the manifest is rejected.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = "osiris-chunks/v1"
+# 1 MiB: small enough that a changed file inside the image only dirties
+# its own neighbourhood, large enough that a 2 GiB image is ~2k hashes.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_FETCH_TIMEOUT_S = 3600.0
+
+
+class ManifestError(Exception):
+    """The image could not be chunked or did not match the release."""
+
+
+class ManifestBuilder:
+    """Incremental chunker: feed() bytes in any sizes, then finish()."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self._whole = hashlib.sha256()
+        self._chunk = hashlib.sha256()
+        self._chunk_fill = 0
+        self._size = 0
+        self._chunks: List[str] = []
+
+    def feed(self, data: bytes) -> None:
+        self._whole.update(data)
+        self._size += len(data)
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.chunk_size - self._chunk_fill)
+            self._chunk.update(view[:take])
+            self._chunk_fill += take
+            view = view[take:]
+            if self._chunk_fill == self.chunk_size:
+                self._chunks.append(self._chunk.hexdigest())
+                self._chunk = hashlib.sha256()
+                self._chunk_fill = 0
+
+    def finish(self, version: str) -> Dict[str, Any]:
+        if self._chunk_fill:
+            self._chunks.append(self._chunk.hexdigest())
+            self._chunk_fill = 0
+        return {
+            "format": MANIFEST_FORMAT,
+            "version": version,
+            "size_bytes": self._size,
+            "sha256": self._whole.hexdigest(),
+            "chunk_size": self.chunk_size,
+            "chunks": list(self._chunks),
+        }
+
+
+def canonical_manifest_json(manifest: Dict[str, Any]) -> str:
+    """The exact string that is signed (and that appliances re-derive)."""
+    return json.dumps(manifest, sort_keys=True, separators=(",", ":"))
+
+
+def sign_manifest(manifest: Dict[str, Any], sign: Callable[[str], str]) -> str:
+    """Hex Ed25519 signature over the canonical manifest JSON."""
+    return sign(canonical_manifest_json(manifest))
+
+
+def build_manifest(
+    data: bytes,
+    version: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Manifest for an in-memory image (tests, small agent packages)."""
+    builder = ManifestBuilder(chunk_size)
+    builder.feed(data)
+    return builder.finish(version)
+
+
+async def build_manifest_from_url(
+    iso_url: str,
+    version: str,
+    expected_sha256: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Stream the image once and chunk it; raises ManifestError on mismatch."""
+    builder = ManifestBuilder(chunk_size)
+    try:
+        async with httpx.AsyncClient(timeout=_FETCH_TIMEOUT_S, follow_redirects=True) as client:
+            async with client.stream("GET", iso_url) as resp:
+                if resp.status_code != 200:
+                    raise ManifestError(f"fetch {iso_url}: HTTP {resp.status_code}")
+                async for block in resp.aiter_bytes(chunk_size):
+                    builder.feed(block)
+    except httpx.HTTPError as e:
+        raise ManifestError(f"fetch {iso_url}: {e}") from e
+
+    manifest = builder.finish(version)
+    if manifest["sha256"].lower() != expected_sha256.lower():
+        raise ManifestError(
+            f"image sha256 {manifest['sha256']} does not match release sha256 {expected_sha256}"
+        )
+    return manifest
+
+
+def manifest_url(version: str) -> str:
+    """Path (relative to the API base) appliances fetch the manifest from."""
+    return f"/api/fleet/releases/{version}/manifest"
+
+
+async def generate_release_manifest(
+    pool,
+    version: str,
+    sign: Optional[Callable[[str], str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Optional[Dict[str, Any]]:
+    """Build, sign and store the manifest for `version`. None on failure.
+
+    Runs as a background task after create_release; the download can
+    take minutes, so no connection is held while streaming.
+    """
+    from .tenant_middleware import admin_connection
+
+    if sign is None:
+        from main import sign_data as sign  # Lazy import to avoid circular dependency
+
+    async with admin_connection(pool) as conn:
+        release = await conn.fetchrow(
+            "SELECT iso_url, sha256 FROM update_releases WHERE version = $1",
+            version,
+        )
+    if not release:
+        logger.warning(f"Manifest requested for unknown release {version}")
+        return None
+
+    try:
+        manifest = await build_manifest_from_url(
+            release["iso_url"], version, release["sha256"], chunk_size
+        )
+    except ManifestError as e:
+        logger.error(f"Manifest generation failed for {version}: {e}")
+        return None
+
+    signature = sign_manifest(manifest, sign)
+    async with admin_connection(pool) as conn:
+        await conn.execute(
+            """
+            UPDATE update_releases
+               SET chunk_manifest = $2::jsonb,
+                   chunk_manifest_signature = $3,
+                   chunk_manifest_generated_at = NOW()
+             WHERE version = $1 AND sha256 = $4
+            """,
+            version,
+            json.dumps(manifest),
+            signature,
+            release["sha256"],
+        )
+    logger.info(
+        f"Chunk manifest stored for {version}: {len(manifest['chunks'])} chunks "
+        f"of {manifest['chunk_size']} bytes"
+    )
+    return manifest
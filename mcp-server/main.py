@@ -17,14 +17,14 @@ import hashlib
 import re
 import secrets
 from datetime import date, datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
 from pathlib import Path
 from contextlib import asynccontextmanager
 import uuid
 
 from fastapi import FastAPI, File, UploadFile, Form, Header, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi import HTTPException, status, Request, Depends
+from fastapi import HTTPException, status, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, field_validator
@@ -34,11 +34,12 @@ from sqlalchemy import text, select
 import structlog
 from nacl.signing import SigningKey, VerifyKey
 from nacl.encoding import HexEncoder
-from minio import Minio
-from minio.retention import Retention, COMPLIANCE
 import yaml
 import httpx
 
+if TYPE_CHECKING:
+    from minio import Minio
+
 # Dashboard API routes
 from dashboard_api.routes import router as dashboard_router, auth_router
 from dashboard_api.sites import router as sites_router, orders_router, appliances_router, alerts_router
@@ -131,6 +132,7 @@ from dashboard_api.websocket_manager import ws_manager
 from dashboard_api.agent_api import agent_l2_plan as agent_l2_plan_handler
 from dashboard_api.healing_sla import healing_sla_loop
 from dashboard_api.check_catalog import router as check_catalog_router
+from dashboard_api import startup_profile
 
 # ============================================================================
 # Configuration
@@ -334,10 +336,12 @@ def get_all_public_keys_hex() -> list[str]:
 # MinIO Setup
 # ============================================================================
 
-minio_client: Optional[Minio] = None
+minio_client: Optional["Minio"] = None
 
 def setup_minio():
     global minio_client
+    from minio import Minio
+
     minio_client = Minio(
         MINIO_ENDPOINT,
         access_key=MINIO_ACCESS_KEY,
@@ -1545,6 +1549,8 @@ async def lifespan(app: FastAPI):
     global redis_client
     
     # Startup
+    startup_profile.mark("imports")
+    startup_profile.set_release(_read_runtime_git_sha())
     logger.info("Starting MCP Server...")
     
     # Connect to Redis with timeout and retry
@@ -1760,8 +1766,7 @@ async def lifespan(app: FastAPI):
                 rate_limit=f"{RATE_LIMIT_REQUESTS}/{RATE_LIMIT_WINDOW}s",
                 order_ttl=ORDER_TTL_SECONDS)
 
-    # Supervised background task registry — auto-restarts on crash
-    _bg_tasks: dict = {}
+    # Supervised background tasks — auto-restart on crash
     _bg_shutdown = asyncio.Event()
 
     async def _supervised(name: str, coro_fn, *args, restart=True, max_restarts=20):
@@ -1970,7 +1975,7 @@ async def lifespan(app: FastAPI):
 
                 async with pool.acquire() as conn:
                     sites = await conn.fetch(
-                        "SELECT site_id FROM sites WHERE status != 'decommissioned'"
+                        "SELECT site_id, client_org_id FROM sites WHERE status != 'decommissioned'"
                     )
                     if not sites:
                         await asyncio.sleep(3600)
@@ -1980,11 +1985,14 @@ async def lifespan(app: FastAPI):
                     skipped = 0
                     errors = 0
 
+                    # (org, year, month) -> site_ids missing that month.
+                    # Sites without an org are their own group.
+                    pending = {}
                     for site_row in sites:
                         sid = site_row["site_id"]
 
                         # For each site, walk backwards through recent ended
-                        # months and generate the first one that's missing.
+                        # months and queue the first one that's missing.
                         # Generating more than one per site per loop iteration
                         # risks overloading the generator on startup after a
                         # long outage — we prefer steady progress.
@@ -1996,83 +2004,114 @@ async def lifespan(app: FastAPI):
                             if existing:
                                 skipped += 1
                                 continue
+                            group = str(site_row["client_org_id"] or sid)
+                            pending.setdefault((group, year, month), []).append(sid)
+                            # Only generate one missing month per site
+                            # per iteration to keep load steady.
+                            break
+
+                    if pending:
+                        from dashboard_api.compliance_packet import CompliancePacket
+                        from dashboard_api.compliance_analytics import get_period_analytics
+                        # One engine per pass (was one per site).
+                        _pkt_engine = create_async_engine(os.getenv("DATABASE_URL", ""), echo=False)
+                        _pkt_session = async_sessionmaker(_pkt_engine, class_=AsyncSession)
+                        try:
+                            for (group, year, month), group_sites in pending.items():
+                                # Check-result columns for the whole org and
+                                # month in one load; every packet in the
+                                # group derives its score + posture from it.
+                                period_start = datetime(year, month, 1, tzinfo=timezone.utc)
+                                period_end = (
+                                    datetime(year + 1, 1, 1, tzinfo=timezone.utc) if month == 12
+                                    else datetime(year, month + 1, 1, tzinfo=timezone.utc)
+                                )
+                                analytics = None
+                                try:
+                                    async with _pkt_session() as session:
+                                        await session.execute(text("SET LOCAL statement_timeout = '120s'"))
+                                        analytics = await get_period_analytics(
+                                            session, group_sites, period_start, period_end,
+                                        )
+                                except Exception as e:
+                                    # Packets fall back to a per-site load.
+                                    logger.warning(
+                                        "compliance_analytics_group_load_failed",
+                                        group=group, year=year, month=month,
+                                        sites=len(group_sites), error=str(e),
+                                    )
 
-                            try:
-                                from dashboard_api.compliance_packet import CompliancePacket
-                                from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-                                _pkt_engine = create_async_engine(os.getenv("DATABASE_URL", ""), echo=False)
-                                _pkt_session = async_sessionmaker(_pkt_engine, class_=AsyncSession)
-                                async with _pkt_session() as session:
-                                    pkt = CompliancePacket(sid, month, year, session)
-                                    result = await pkt.generate_packet()
-                                    data = result.get("data", {})
-
-                                    # Persist to compliance_packets for the
-                                    # HIPAA §164.316(b)(2)(i) 6-year retention.
-                                    markdown = None
-                                    if result.get("markdown_path"):
-                                        try:
-                                            with open(result["markdown_path"]) as _mf:
-                                                markdown = _mf.read()
-                                        except Exception as _read_err:
-                                            logger.warning(
-                                                f"Could not read generated markdown for {sid}/{year}-{month:02d}: {_read_err}"
+                                for sid in group_sites:
+                                    try:
+                                        async with _pkt_session() as session:
+                                            pkt = CompliancePacket(sid, month, year, session, analytics=analytics)
+                                            result = await pkt.generate_packet()
+                                            data = result.get("data", {})
+
+                                            # Persist to compliance_packets for the
+                                            # HIPAA §164.316(b)(2)(i) 6-year retention.
+                                            markdown = None
+                                            if result.get("markdown_path"):
+                                                try:
+                                                    with open(result["markdown_path"]) as _mf:
+                                                        markdown = _mf.read()
+                                                except Exception as _read_err:
+                                                    logger.warning(
+                                                        f"Could not read generated markdown for {sid}/{year}-{month:02d}: {_read_err}"
+                                                    )
+
+                                            await conn.execute("""
+                                                INSERT INTO compliance_packets (
+                                                    site_id, month, year, packet_id,
+                                                    compliance_score, critical_issues, auto_fixes,
+                                                    mttr_hours, framework, controls_summary,
+                                                    markdown_content, generated_by
+                                                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::jsonb, $11, 'system')
+                                                ON CONFLICT (site_id, month, year, framework) DO UPDATE SET
+                                                    compliance_score = EXCLUDED.compliance_score,
+                                                    critical_issues = EXCLUDED.critical_issues,
+                                                    markdown_content = EXCLUDED.markdown_content,
+                                                    generated_at = NOW()
+                                            """,
+                                                sid, month, year, result["packet_id"],
+                                                data.get("compliance_pct"),
+                                                data.get("critical_issue_count", 0),
+                                                data.get("auto_fixed_count", 0),
+                                                data.get("mttr_hours"),
+                                                "hipaa",
+                                                json.dumps(data.get("controls", {})),
+                                                markdown,
                                             )
-
-                                    await conn.execute("""
-                                        INSERT INTO compliance_packets (
-                                            site_id, month, year, packet_id,
-                                            compliance_score, critical_issues, auto_fixes,
-                                            mttr_hours, framework, controls_summary,
-                                            markdown_content, generated_by
-                                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::jsonb, $11, 'system')
-                                        ON CONFLICT (site_id, month, year, framework) DO UPDATE SET
-                                            compliance_score = EXCLUDED.compliance_score,
-                                            critical_issues = EXCLUDED.critical_issues,
-                                            markdown_content = EXCLUDED.markdown_content,
-                                            generated_at = NOW()
-                                    """,
-                                        sid, month, year, result["packet_id"],
-                                        data.get("compliance_pct"),
-                                        data.get("critical_issue_count", 0),
-                                        data.get("auto_fixed_count", 0),
-                                        data.get("mttr_hours"),
-                                        "hipaa",
-                                        json.dumps(data.get("controls", {})),
-                                        markdown,
-                                    )
-                                    logger.info(
-                                        "Compliance packet generated and persisted",
-                                        packet_id=result["packet_id"],
-                                        site_id=sid,
-                                        year=year,
-                                        month=month,
-                                        compliance_pct=data.get("compliance_pct"),
-                                    )
-                                    generated += 1
-                                    # Only generate one missing month per site
-                                    # per iteration to keep load steady.
-                                    break
-                            except Exception as e:
-                                errors += 1
-                                # Per CLAUDE.md "no silent write failures":
-                                # compliance packets are HIPAA monthly
-                                # attestations (mig 141, 6-yr retention).
-                                # A silent miss = silent compliance gap;
-                                # MUST surface at ERROR for log-shipper
-                                # alerting + the new compliance_packets_
-                                # stalled invariant (Block 4).
-                                logger.error(
-                                    "compliance_packet_autogen_failed",
-                                    exc_info=True,
-                                    extra={
-                                        "site_id": sid,
-                                        "year": year,
-                                        "month": month,
-                                        "exception_class": type(e).__name__,
-                                    },
-                                )
-                                break  # Move on to the next site
+                                            logger.info(
+                                                "Compliance packet generated and persisted",
+                                                packet_id=result["packet_id"],
+                                                site_id=sid,
+                                                year=year,
+                                                month=month,
+                                                compliance_pct=data.get("compliance_pct"),
+                                            )
+                                            generated += 1
+                                    except Exception as e:
+                                        errors += 1
+                                        # Per CLAUDE.md "no silent write failures":
+                                        # compliance packets are HIPAA monthly
+                                        # attestations (mig 141, 6-yr retention).
+                                        # A silent miss = silent compliance gap;
+                                        # MUST surface at ERROR for log-shipper
+                                        # alerting + the new compliance_packets_
+                                        # stalled invariant (Block 4).
+                                        logger.error(
+                                            "compliance_packet_autogen_failed",
+                                            exc_info=True,
+                                            extra={
+                                                "site_id": sid,
+                                                "year": year,
+                                                "month": month,
+                                                "exception_class": type(e).__name__,
+                                            },
+                                        )
+                        finally:
+                            await _pkt_engine.dispose()
 
                     if generated or errors:
                         logger.info(
@@ -2236,18 +2275,17 @@ async def lifespan(app: FastAPI):
         exemplar_miner_loop,
         mark_stale_appliances_loop,
         flywheel_orchestrator_loop,
-        partition_maintainer_loop,
-        weekly_rollup_refresh_loop,
         partner_weekly_digest_loop,
-        expire_consent_request_tokens_loop,
         heartbeat_rollup_loop,
-        heartbeat_partition_maintainer_loop,
         phantom_detector_loop,
         mesh_reassignment_loop,
-        client_telemetry_retention_loop,  # Session 210 round-table #5
         data_hygiene_gc_loop,             # Session 210-B hardening #3
         relocation_finalize_loop,         # Session 210-B RT-4
+        maintenance_tick_jobs,            # scheduler ticks (partition/rollup/retention)
     )
+    from dashboard_api.perf_cache import perf_cache_invalidation_loop
+    from dashboard_api.prometheus_metrics import metrics_collector_loop
+    from dashboard_api.fleet import health_snapshot_loop
     from dashboard_api.privileged_access_notifier import privileged_notifier_loop
     from dashboard_api.chain_tamper_detector import chain_tamper_detector_loop
     from dashboard_api.retention_verifier import retention_verifier_loop
@@ -2298,17 +2336,12 @@ async def lifespan(app: FastAPI):
         ("audit_log_retention", _audit_log_retention_loop),
         ("mark_stale_appliances", mark_stale_appliances_loop),
         ("flywheel_orchestrator", flywheel_orchestrator_loop),
-        ("partition_maintainer", partition_maintainer_loop),
-        ("weekly_rollup_refresh", weekly_rollup_refresh_loop),
         ("partner_weekly_digest", partner_weekly_digest_loop),
-        ("expire_consent_request_tokens", expire_consent_request_tokens_loop),
         ("heartbeat_rollup", heartbeat_rollup_loop),
-        ("heartbeat_partition_maintainer", heartbeat_partition_maintainer_loop),
         ("phantom_detector", phantom_detector_loop),
         ("mesh_reassignment", mesh_reassignment_loop),
         ("substrate_assertions", assertions_loop),
         ("sigauth_auto_promotion", sigauth_auto_promotion_loop),
-        ("client_telemetry_retention", client_telemetry_retention_loop),
         ("data_hygiene_gc", data_hygiene_gc_loop),
         ("relocation_finalize", relocation_finalize_loop),
         ("flywheel_federation_snapshot", _flywheel_federation_snapshot_loop),  # F6 foundation
@@ -2316,26 +2349,61 @@ async def lifespan(app: FastAPI):
         ("owner_transfer_sweep", _owner_transfer_sweep_loop),  # Punch-list #8 closure 2026-05-04
         ("partner_admin_transfer_sweep", _partner_admin_transfer_sweep_loop),  # Maya parity 2026-05-04
         ("mfa_revocation_expiry_sweep", _mfa_revocation_expiry_sweep_loop),  # Task #19 2026-05-05
+        ("perf_cache_invalidation", perf_cache_invalidation_loop),  # shared score cache L1 purge
+        ("metrics_collector", metrics_collector_loop),  # /metrics snapshot families
+        ("health_snapshot", health_snapshot_loop),  # mig 334 fleet dashboard health inputs
     ]
 
-    for name, fn in task_defs:
-        _bg_tasks[name] = asyncio.create_task(_supervised(name, fn))
+    # Leader-elected scheduling (dashboard_api/job_scheduler.py). Each
+    # singleton loop runs in exactly one process fleet-wide, elected via
+    # a session advisory lock on a dedicated direct connection (NOT
+    # pgbouncer — transaction pooling drops session locks). The perf_cache
+    # L1 purge listener and the /metrics snapshot serve the process they
+    # run in, so every API replica keeps its own copy. BG_JOBS_MODE=api
+    # plus a `python worker.py` process moves the singletons out of the
+    # API process entirely; BG_JOBS_ELECTION=false (single replica / dev)
+    # runs everything locally without a lease connection. The periodic
+    # maintenance jobs (maintenance_tick_jobs) are scheduler ticks: the
+    # scheduler owns their cadence, per-run timeout and failure counts.
+    from dashboard_api.job_scheduler import JobScheduler, loop_jobs, set_scheduler
+
+    _PER_PROCESS_LOOPS = frozenset({"perf_cache_invalidation", "metrics_collector"})
+
+    async def _job_lease_connect():
+        import asyncpg as _pg
+        _raw = os.getenv("DATABASE_URL", "").replace("postgresql+asyncpg://", "postgresql://")
+        # statement_timeout bounds the lock SQL server-side as well;
+        # JobScheduler also caps each lease round trip client-side.
+        return await _pg.connect(
+            os.getenv("MIGRATION_DATABASE_URL", _raw),
+            timeout=10,
+            server_settings={"statement_timeout": "5000"},
+        )
+
+    _elect = os.getenv("BG_JOBS_ELECTION", "true").lower() != "false"
+    _scheduler = JobScheduler(
+        loop_jobs(task_defs, local=_PER_PROCESS_LOOPS) + maintenance_tick_jobs(),
+        supervise=_supervised,
+        connect=_job_lease_connect if _elect else None,
+    )
+    await _scheduler.start()
+    set_scheduler(_scheduler)
+
+    # Store task registry on app for health endpoint. Live view: jobs
+    # appear and disappear here as leadership moves between replicas.
+    app.state.job_scheduler = _scheduler
+    app.state.bg_tasks = _scheduler.tasks
 
-    # Store task registry on app for health endpoint
-    app.state.bg_tasks = _bg_tasks
+    startup_profile.mark("lifespan")
+    logger.info("startup_complete", phases=startup_profile.startup_phases())
 
     yield
 
     # Shutdown
     logger.info("Shutting down MCP Server...")
     _bg_shutdown.set()
-    for name, task in _bg_tasks.items():
-        task.cancel()
-    for name, task in _bg_tasks.items():
-        try:
-            await asyncio.wait_for(asyncio.shield(task), timeout=10)
-        except (asyncio.CancelledError, asyncio.TimeoutError):
-            pass
+    await _scheduler.stop(timeout_s=10)
+    set_scheduler(None)
     if redis_client:
         await redis_client.close()
     await engine.dispose()
@@ -2399,13 +2467,25 @@ try:
 except ImportError:
     logger.warning("CSRF middleware not available - continuing without CSRF protection")
 
+# Gzip request bodies from appliances - added last so every inner
+# middleware and handler sees the decompressed body
+try:
+    from dashboard_api.request_decompression import GzipRequestMiddleware
+    app.add_middleware(GzipRequestMiddleware)
+    logger.info("Gzip request decompression enabled")
+except ImportError:
+    logger.warning("Gzip request decompression not available")
+
 # Structured request logging middleware
 @app.middleware("http")
 async def structured_request_logging(request: Request, call_next):
     """Log all requests with structured fields for observability."""
     import time as _time
+    from dashboard_api.tenant_middleware import track_request_round_trips
     start = _time.monotonic()
-    response = await call_next(request)
+    with track_request_round_trips() as rls_round_trips:
+        response = await call_next(request)
+    startup_profile.mark("first_request")
     duration_ms = round((_time.monotonic() - start) * 1000, 1)
     path = request.url.path
     # Extract site_id from path or skip noisy endpoints
@@ -2423,6 +2503,7 @@ async def structured_request_logging(request: Request, call_next):
         status_code=response.status_code,
         duration_ms=duration_ms,
         site_id=site_id,
+        rls_round_trips=rls_round_trips[0],
         client=request.client.host if request.client else None,
     )
     return response
@@ -3695,8 +3776,9 @@ async def admin_health_loops(user: dict = Depends(require_auth)):
 
     Response includes per-loop:
       iterations, errors, age_s (since last heartbeat),
-      expected_interval_s, status (fresh|stale|unknown),
-      task_state (running|crashed|completed) from the asyncio supervisor.
+      expected_interval_s, status (fresh|stale|unknown|standby),
+      task_state (running|crashed|completed|standby) from the asyncio
+      supervisor, role (leader|standby|local) from the job scheduler.
 
     HTTP 200 always — staleness is reported, not enforced — so an
     operator can see partial state. Wire alerts to the per-loop
@@ -3708,17 +3790,24 @@ async def admin_health_loops(user: dict = Depends(require_auth)):
 
     heartbeats = get_all_heartbeats()
     bg_tasks = getattr(app.state, 'bg_tasks', {})
+    scheduler = getattr(app.state, 'job_scheduler', None)
+    sched_metrics = scheduler.metrics() if scheduler else None
+    jobs = sched_metrics["jobs"] if sched_metrics else {}
 
     loops = []
-    # Cover every loop that's either instrumented OR registered as bg task,
-    # so an uninstrumented loop shows up with status='unknown' rather than
+    # Cover every loop that's either instrumented OR registered as bg task
+    # OR scheduled here (standby jobs have no local task), so an
+    # uninstrumented loop shows up with status='unknown' rather than
     # being silently absent.
-    all_names = set(heartbeats.keys()) | set(bg_tasks.keys())
+    all_names = set(heartbeats.keys()) | set(bg_tasks.keys()) | set(jobs.keys())
     for name in sorted(all_names):
         hb = heartbeats.get(name)
         task = bg_tasks.get(name)
+        job = jobs.get(name)
         task_state = "absent"
-        if task is not None:
+        if task is None and job and job["role"] == "standby":
+            task_state = "standby"
+        elif task is not None:
             if task.done():
                 exc = task.exception() if not task.cancelled() else None
                 task_state = f"crashed: {exc}" if exc else "completed"
@@ -3730,6 +3819,7 @@ async def admin_health_loops(user: dict = Depends(require_auth)):
             "task_state": task_state,
             "expected_interval_s": EXPECTED_INTERVAL_S.get(name),
             "instrumented": hb is not None,
+            "role": job["role"] if job else None,
         }
         if hb:
             entry.update({
@@ -3744,6 +3834,8 @@ async def admin_health_loops(user: dict = Depends(require_auth)):
                 ).isoformat(),
                 "status": assess_staleness(hb),
             })
+        elif task_state == "standby":
+            entry["status"] = "standby"
         else:
             entry["status"] = "uninstrumented"
         loops.append(entry)
@@ -3753,6 +3845,9 @@ async def admin_health_loops(user: dict = Depends(require_auth)):
         "total": len(loops),
         "stale_count": sum(1 for l in loops if l.get("status") == "stale"),
         "uninstrumented_count": sum(1 for l in loops if l.get("status") == "uninstrumented"),
+        "scheduler": {
+            k: v for k, v in sched_metrics.items() if k != "jobs"
+        } if sched_metrics else None,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
@@ -5182,6 +5277,8 @@ async def submit_evidence(evidence: EvidenceSubmission, db: AsyncSession = Depen
 
         # Set Object Lock retention (COMPLIANCE mode) for WORM protection
         try:
+            from minio.retention import Retention, COMPLIANCE
+
             retention_until = now + timedelta(days=WORM_RETENTION_DAYS)
             retention = Retention(COMPLIANCE, retention_until)
             minio_client.set_object_retention(MINIO_BUCKET, object_name, retention)
@@ -5999,6 +6096,8 @@ async def upload_evidence_worm(
 
         # Set Object Lock retention (COMPLIANCE mode - cannot be shortened/deleted)
         try:
+            from minio.retention import Retention, COMPLIANCE
+
             retention = Retention(COMPLIANCE, retention_until)
             minio_client.set_object_retention(MINIO_BUCKET, bundle_key, retention)
             logger.info("Set WORM retention on bundle",
@@ -6208,6 +6307,9 @@ async def get_stats(db: AsyncSession = Depends(get_db), user: dict = Depends(req
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
+    if exc.status_code == 304:
+        # conditional_get short-circuit — bodyless, keep the ETag.
+        return Response(status_code=304, headers=exc.headers)
     logger.warning("HTTP exception", 
                    status_code=exc.status_code,
                    detail=exc.detail,
@@ -6242,579 +6344,66 @@ if __name__ == "__main__":
 # =============================================================================
 
 @app.get("/agent/sync")
-async def agent_sync_rules(site_id: Optional[str] = None, db: AsyncSession = Depends(get_db), auth_site_id: str = Depends(require_appliance_bearer)):
+async def agent_sync_rules(request: Request, response: Response, site_id: Optional[str] = None, have: Optional[str] = None, auth_site_id: str = Depends(require_appliance_bearer)):
     """
     Return L1 rules for agents to sync.
 
     Returns rules based on site's healing_tier:
-    - standard: 4 core rules (firewall, defender, bitlocker, ntp)
-    - full_coverage: All 21 L1 rules for comprehensive auto-healing
+    - standard: core rules (NTP, services, disk, firewall, generation)
+    - full_coverage: standard + the Windows/Linux full-coverage set
 
     Plus any custom/promoted rules from database.
-    """
-    # Determine healing tier from site configuration
-    healing_tier = "standard"  # default
-    if site_id:
-        try:
-            result = await db.execute(
-                text("SELECT healing_tier FROM sites WHERE site_id = :site_id"),
-                {"site_id": site_id}
-            )
-            row = result.fetchone()
-            if row and row[0]:
-                healing_tier = row[0]
-        except Exception as e:
-            logger.warning(f"Failed to fetch healing tier for {site_id}: {e}")
 
-    # Built-in L1 rules for NixOS appliances
-    # Note: status values from SimpleDriftChecker are: "pass", "warning", "fail", "error"
-    # Use "in" operator to match non-passing statuses
+    Rules come from a precompiled bundle cached per (healing_tier,
+    DB-rule version) — see dashboard_api/l1_rule_bundle.py. Appliances
+    that pass `have=<bundle_version>` get a 304 when current, or a
+    delta against that version while it is still in bundle history.
 
-    # Standard rules (4 core rules) - always included
-    standard_rules = [
-        {
-            "id": "L1-NTP-001",
-            "name": "NTP Drift Remediation",
-            "description": "Restart chronyd when NTP sync drifts",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "ntp_sync"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["restart_service:chronyd"],
-            "severity": "medium",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-SERVICE-001",
-            "name": "Critical Service Recovery",
-            "description": "Restart failed critical services",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "critical_services"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["restart_service:sshd", "restart_service:chronyd"],
-            "severity": "high",
-            "cooldown_seconds": 600,
-            "max_retries": 3,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-DISK-001",
-            "name": "Disk Space Alert",
-            "description": "Alert when disk usage exceeds threshold",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "disk_space"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["alert:disk_space_critical"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 1,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-FIREWALL-001",
-            "name": "Windows Firewall Recovery",
-            "description": "Re-enable Windows Firewall when disabled",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "firewall"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]},
-                {"field": "platform", "operator": "ne", "value": "nixos"}
-            ],
-            "actions": ["restore_firewall_baseline"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-FIREWALL-002",
-            "name": "Windows Firewall Status Recovery",
-            "description": "Re-enable Windows Firewall when status check fails",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "firewall_status"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]},
-                {"field": "platform", "operator": "ne", "value": "nixos"}
-            ],
-            "actions": ["restore_firewall_baseline"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-DEFENDER-001",
-            "name": "Windows Defender Recovery",
-            "description": "Re-enable Windows Defender when disabled",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "windows_defender"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["restore_defender"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-GENERATION-001",
-            "name": "NixOS Generation Drift",
-            "description": "Alert when NixOS generation is invalid or unknown",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "nixos_generation"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["alert:generation_drift"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 1,
-            "source": "builtin"
-        }
-    ]
-
-    # Additional rules for full_coverage mode (14 more rules)
-    full_coverage_extra_rules = [
-        {
-            "id": "L1-PASSWORD-001",
-            "name": "Password Policy Enforcement",
-            "description": "Enforce minimum password requirements",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "password_policy"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["set_password_policy"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-AUDIT-001",
-            "name": "Audit Policy Enforcement",
-            "description": "Enable required audit policies",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "audit_policy"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["set_audit_policy"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-BITLOCKER-001",
-            "name": "BitLocker Encryption",
-            "description": "Enable drive encryption",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "bitlocker_status"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-005"],
-            "severity": "critical",
-            "cooldown_seconds": 3600,
-            "max_retries": 1,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-SMB1-001",
-            "name": "SMBv1 Protocol Disabled",
-            "description": "Disable insecure SMBv1 protocol",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "smb1_protocol"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-020"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-AUTOPLAY-001",
-            "name": "AutoPlay Disabled",
-            "description": "Disable AutoPlay to prevent malware spread",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "autoplay_disabled"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["disable_autoplay"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-LOCKOUT-001",
-            "name": "Account Lockout Policy",
-            "description": "Configure account lockout after failed attempts",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "lockout_policy"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["set_lockout_policy"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-SCREENSAVER-001",
-            "name": "Screensaver Timeout",
-            "description": "Configure screensaver with password protection",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "screensaver_timeout"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["set_screensaver_policy"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-RDP-001",
-            "name": "RDP Security",
-            "description": "Secure RDP with NLA requirement",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "rdp_security"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["configure_rdp_security"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-UAC-001",
-            "name": "UAC Enabled",
-            "description": "Ensure User Account Control is enabled",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "uac_enabled"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["enable_uac"],
-            "severity": "high",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-EVENTLOG-001",
-            "name": "Event Log Size",
-            "description": "Configure adequate event log retention",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "event_log_size"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["set_event_log_size"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-DEFENDERUPDATES-001",
-            "name": "Windows Defender Definitions",
-            "description": "Update malware definitions",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "defender_definitions"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["update_defender_definitions"],
-            "severity": "high",
-            "cooldown_seconds": 14400,
-            "max_retries": 3,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-GUESTACCOUNT-001",
-            "name": "Guest Account Disabled",
-            "description": "Disable built-in Guest account",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "guest_account_disabled"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["disable_guest_account"],
-            "severity": "medium",
-            "cooldown_seconds": 3600,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-WUPDATES-001",
-            "name": "Windows Updates",
-            "description": "Check and trigger pending security updates",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "windows_updates"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["trigger_windows_update"],
-            "severity": "high",
-            "cooldown_seconds": 86400,
-            "max_retries": 1,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-BACKUP-001",
-            "name": "Backup Status",
-            "description": "Alert when backup fails or is stale",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "backup"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["alert:backup_failed"],
-            "severity": "high",
-            "cooldown_seconds": 7200,
-            "max_retries": 1,
-            "source": "builtin"
-        },
-        # Go Agent check_types (mapped from grpc_server.py)
-        {
-            "id": "L1-SCREENLOCK-001",
-            "name": "Screen Lock Policy",
-            "description": "Enforce screen lock timeout and password requirement",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "screen_lock_policy"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-016"],
-            "severity": "high",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-PATCHING-001",
-            "name": "Windows Update Service",
-            "description": "Ensure Windows Update service is running and updates are applied",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "patching"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["trigger_windows_update"],
-            "severity": "critical",
-            "cooldown_seconds": 86400,
-            "max_retries": 1,
-            "source": "builtin"
-        },
-        # --- Linux L1 Rules ---
-        {
-            "id": "L1-LIN-SSH-001",
-            "name": "SSH Configuration Drift",
-            "description": "Fix SSH config drift (PermitRootLogin, PasswordAuthentication, etc.)",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "ssh_config"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_linux_runbook"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-LIN-KERN-001",
-            "name": "Kernel Parameter Hardening",
-            "description": "Fix unsafe kernel parameters (ip_forward, ASLR, etc.)",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "kernel"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["run_linux_runbook:LIN-KERN-001"],
-            "severity": "high",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-LIN-CRON-001",
-            "name": "Cron Permission Hardening",
-            "description": "Fix insecure cron file permissions",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "cron"},
-                {"field": "status", "operator": "in", "value": ["warning", "fail", "error"]}
-            ],
-            "actions": ["run_linux_runbook:LIN-CRON-001"],
-            "severity": "high",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-LIN-SUID-001",
-            "name": "SUID Binary Cleanup",
-            "description": "Remove unauthorized SUID binaries from temp directories",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "permissions"},
-                {"field": "drift_detected", "operator": "eq", "value": True},
-                {"field": "distro", "operator": "ne", "value": None}
-            ],
-            "actions": ["run_linux_runbook"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        # --- Windows Persistence Detection ---
-        {
-            "id": "L1-PERSIST-TASK-001",
-            "name": "Scheduled Task Persistence Detected",
-            "description": "Remove suspicious scheduled tasks from root namespace",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "scheduled_task_persistence"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-018"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-PERSIST-REG-001",
-            "name": "Registry Run Key Persistence Detected",
-            "description": "Remove suspicious registry Run key entries",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "registry_run_persistence"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-019"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-PERSIST-WMI-001",
-            "name": "WMI Event Subscription Persistence Detected",
-            "description": "Remove suspicious WMI event subscriptions used for persistence",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "wmi_event_persistence"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-021"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-SMB-SIGNING-001",
-            "name": "SMB Signing Not Required",
-            "description": "Enforce SMB signing to prevent relay attacks",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "smb_signing"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SEC-007"],
-            "severity": "high",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        },
-        {
-            "id": "L1-SVC-NETLOGON-001",
-            "name": "NetLogon Service Down",
-            "description": "Restore NetLogon service for domain authentication",
-            "conditions": [
-                {"field": "check_type", "operator": "eq", "value": "service_netlogon"},
-                {"field": "drift_detected", "operator": "eq", "value": True}
-            ],
-            "actions": ["run_windows_runbook:RB-WIN-SVC-001"],
-            "severity": "critical",
-            "cooldown_seconds": 300,
-            "max_retries": 2,
-            "source": "builtin"
-        }
-    ]
-
-    # Select rules based on healing tier
-    if healing_tier == "full_coverage":
-        builtin_rules = standard_rules + full_coverage_extra_rules
-    else:
-        builtin_rules = standard_rules
+    Conditional: the ETag covers sites/l1_rules/app_profile_rules
+    versions plus the build SHA and signing key (built-in rules live
+    in code), so an unchanged poll gets a 304 before any rule is built
+    or signed.
+    """
+    from dashboard_api.conditional_get import AGENT_SYNC_RULES, check_not_modified
+    from dashboard_api.l1_rule_bundle import compile_bundle, get_rule_bundle, sync_payload
+    from dashboard_api.fleet import get_pool as _get_pool
+    from dashboard_api.tenant_middleware import admin_connection as _admin_connection
 
-    # Fetch custom/promoted/protection_profile rules from database
+    etag = None
     try:
-        result = await db.execute(
-            text("""
-                SELECT rule_id, incident_pattern, runbook_id, confidence,
-                       COALESCE(source, 'promoted') as source
-                FROM l1_rules
-                WHERE enabled = true AND COALESCE(source, 'promoted') != 'builtin'
-                ORDER BY confidence DESC
-            """)
-        )
-        db_rules = []
-        for row in result.fetchall():
-            rule_source = row[4]
+        async with _admin_connection(await _get_pool()) as conn:
+            etag = await check_not_modified(
+                request, response, conn, AGENT_SYNC_RULES, site_id,
+                salt=f"{_read_runtime_git_sha()}:{get_public_key_hex()}",
+            )
 
-            # For protection_profile rules, try to get the full rule_json
-            if rule_source == "protection_profile":
+            # Determine healing tier from site configuration
+            healing_tier = "standard"  # default
+            if site_id:
                 try:
-                    ppr = await db.execute(
-                        text("SELECT rule_json FROM app_profile_rules WHERE l1_rule_id = :rid LIMIT 1"),
-                        {"rid": row[0]}
+                    tier = await conn.fetchval(
+                        "SELECT healing_tier FROM sites WHERE site_id = $1",
+                        site_id,
                     )
-                    ppr_row = ppr.fetchone()
-                    if ppr_row and ppr_row[0]:
-                        rule_json = ppr_row[0] if isinstance(ppr_row[0], dict) else json.loads(ppr_row[0])
-                        db_rules.append(rule_json)
-                        continue
+                    if tier:
+                        healing_tier = tier
                 except Exception as e:
-                    # Protection profile rule_json lookup failed — fall through to generic format
-                    logger.debug("Failed to load protection_profile rule_json", rule_id=str(row[0]), error=str(e))
-
-            # Convert incident_pattern dict to conditions list
-            # Database stores: {"incident_type": "firewall"} or {"check_type": "screen_lock"}
-            # Conditions format: [{"field": "incident_type", "operator": "eq", "value": "firewall"}]
-            pattern = row[1]
-            if isinstance(pattern, list):
-                conditions = pattern
-            elif isinstance(pattern, dict):
-                conditions = []
-                for k, v in pattern.items():
-                    # Map incident_type to check_type (auto_healer uses check_type)
-                    field = "check_type" if k == "incident_type" else k
-                    conditions.append({"field": field, "operator": "eq", "value": v})
-                # Add status condition for fail/warning/error
-                conditions.append({"field": "status", "operator": "in", "value": ["warning", "fail", "error"]})
-            else:
-                conditions = []
-
-            db_rules.append({
-                "id": row[0],
-                "name": f"Promoted: {row[0]}",
-                "description": f"Auto-promoted rule with {row[3]:.0%} confidence",
-                "conditions": conditions,
-                "actions": [f"run_runbook:{row[2]}"],
-                "severity": "critical" if rule_source == "protection_profile" else "medium",
-                "cooldown_seconds": 300,
-                "max_retries": 3 if rule_source == "protection_profile" else 2,
-                "source": rule_source
-            })
-    except Exception as e:
-        logger.warning(f"Failed to fetch DB rules: {e}")
-        db_rules = []
-
-    all_rules = builtin_rules + db_rules
+                    logger.warning(f"Failed to fetch healing tier for {site_id}: {e}")
 
-    # Sign the rules bundle for appliance-side integrity verification
-    rules_json = json.dumps(all_rules, sort_keys=True)
-    rules_signature = sign_data(rules_json)
-
-    return {
-        "rules": all_rules,
-        "healing_tier": healing_tier,
-        "version": "1.0.0",
-        "count": len(all_rules),
-        "signature": rules_signature,
-        "server_public_key": get_public_key_hex(),
-    }
+            bundle = await get_rule_bundle(conn, healing_tier, sign_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        # DB unreachable — built-in standard rules only, like the
+        # pre-bundle code did when every query soft-failed.
+        logger.warning(f"agent_sync falling back to built-in rules: {e}")
+        bundle = compile_bundle("standard", [], sign_data)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+    payload = sync_payload(bundle, have, get_public_key_hex())
+    if payload is None:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
 
 
 # ============================================================================
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Dedicated background-job worker for the MCP Server.
+
+Runs main.py's lifespan (Redis, signing key, migrations, pools) and its
+leader-elected singleton jobs, but serves no HTTP. Pair it with API
+replicas started with BG_JOBS_MODE=api so request handling no longer
+shares its event loop and connection pool with OTS, flywheel, partition
+maintenance and the rest of task_defs.
+
+Several workers may run at once: each job is still leader-elected
+through its advisory lock, so a second worker is a hot standby.
+
+Usage:
+    python3 worker.py    # BG_JOBS_MODE is forced to "worker"
+"""
+
+import asyncio
+import os
+import signal
+
+os.environ["BG_JOBS_MODE"] = "worker"
+
+import main  # noqa: E402  — must import after BG_JOBS_MODE is set
+
+
+async def run() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    async with main.lifespan(main.app):
+        main.logger.info("Background worker running", mode="worker")
+        await stop.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
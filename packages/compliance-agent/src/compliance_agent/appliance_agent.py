@@ -25,6 +25,7 @@ import signal
 import subprocess
 import sys
 import uuid
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -46,6 +47,14 @@ from .runbooks.windows.executor import WindowsTarget, WindowsExecutor
 from .runbooks.linux.executor import LinuxTarget, LinuxExecutor
 from .linux_drift import LinuxDriftDetector
 from .network_posture import NetworkPostureDetector
+from .scheduler import (
+    AgentScheduler,
+    TargetCadence,
+    PRIORITY_CRITICAL,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_BACKGROUND,
+)
 
 # Three-tier healing imports
 from .incident_db import IncidentDatabase, Incident
@@ -94,6 +103,17 @@ from .sensor_linux import (
     set_sensor_scripts_dir,
 )
 
+# Shared outbound HTTP transport (pooled session, retry, metrics)
+from .http_transport import get_transport
+
+# LAN peer artifact cache (update chunks)
+from .peer_cache import (
+    ArtifactStore,
+    PeerCache,
+    router as peer_cache_router,
+    configure_peer_cache,
+)
+
 # gRPC server for Go agent communication
 from .grpc_server import (
     AgentRegistry,
@@ -122,6 +142,10 @@ logger = logging.getLogger(__name__)
 
 VERSION = "1.0.68"
 
+# Queued evidence bundles sent per /submit-batch request when draining
+# the offline queue (server cap: EVIDENCE_BATCH_MAX = 200).
+EVIDENCE_DRAIN_BATCH_SIZE = 100
+
 
 async def run_command(cmd: str, timeout: int = 30) -> tuple[int, str, str]:
     """Run a shell command and return (returncode, stdout, stderr)."""
@@ -306,18 +330,20 @@ DEFAULT_WORKSTATION_DISCOVERY_INTERVAL = 3600  # AD workstation discovery (1 hou
 DEFAULT_ENUMERATION_INTERVAL = 3600      # AD enumeration refresh (1 hour)
 DEFAULT_DEVICE_DB_SYNC_INTERVAL = 600    # Sync targets from network-scanner device DB (10 min)
 DEFAULT_EVIDENCE_HEARTBEAT_INTERVAL = 3600  # Evidence heartbeat even if no change (1 hour)
-DEFAULT_CYCLE_TIMEOUT = 600              # Main loop cycle timeout (10 min) — accommodates parallel scans
+DEFAULT_CYCLE_TIMEOUT = 600              # Deadline for a scan / order task (10 min)
+DEFAULT_CHECKIN_TIMEOUT = 120            # Deadline for one checkin task run
+DEFAULT_ADAPTIVE_SCAN_TICK = 30          # How often per-host scan cadences are checked
 
 
 class ApplianceAgent:
     """
     Appliance-mode compliance agent.
 
-    Runs in a loop performing:
-    1. Phone-home checkin
-    2. Drift detection
-    3. Evidence generation
-    4. L1 rules sync (periodic)
+    Work runs as independent tasks on an AgentScheduler (see
+    _build_scheduler): phone-home checkin, order processing, drift
+    detection and evidence, L1 rules sync, per-host adaptive scans,
+    syncs and maintenance. Each has its own cadence, priority and
+    deadline, so a slow scan no longer delays checkin or orders.
     """
 
     def __init__(self, config: ApplianceConfig):
@@ -342,6 +368,22 @@ class ApplianceAgent:
         self._network_posture_interval = DEFAULT_NETWORK_POSTURE_INTERVAL
         self._windows_scan_interval = DEFAULT_WINDOWS_SCAN_INTERVAL
 
+        # Main-loop scheduler and per-host adaptive scan cadence
+        self.scheduler = AgentScheduler(
+            max_concurrent=getattr(config, 'scheduler_max_concurrent', 4),
+            cpu_budget=getattr(config, 'scheduler_cpu_budget', 0.8),
+        )
+        scan_min = getattr(config, 'adaptive_scan_min_interval', 60)
+        scan_max = getattr(config, 'adaptive_scan_max_interval', 1800)
+        self._windows_cadence = TargetCadence(self._windows_scan_interval, scan_min, scan_max)
+        self._linux_cadence = TargetCadence(self._linux_scan_interval, scan_min, scan_max)
+        # Orders delivered in the last checkin response, handed to the orders task
+        self._checkin_orders: Optional[List[Dict[str, Any]]] = None
+        self._recent_order_ids: deque = deque(maxlen=256)
+        # Server Ed25519 keys (current + previous) from the last checkin;
+        # trust anchors for signed update manifests
+        self._server_public_keys: List[str] = []
+
         # Workstation discovery and compliance
         self.workstation_discovery: Optional[WorkstationDiscovery] = None
         self.workstation_checker: Optional[WorkstationComplianceChecker] = None
@@ -362,6 +404,7 @@ class ApplianceAgent:
         self.workstation_targets: List[Dict] = []  # Workstations for Go agent deployment
         self._last_enumeration = datetime.min.replace(tzinfo=timezone.utc)
         self._enumeration_interval = DEFAULT_ENUMERATION_INTERVAL
+        self._enumeration_requested = False  # Set by checkin trigger_enumeration
 
         # Device DB sync (network-scanner → compliance-agent bridge)
         self._last_device_db_sync = datetime.min.replace(tzinfo=timezone.utc)
@@ -403,6 +446,20 @@ class ApplianceAgent:
         self._sensor_server: Optional[uvicorn.Server] = None
         self._sensor_server_task: Optional[asyncio.Task] = None
 
+        # LAN peer artifact cache; served on the sensor API port
+        self.peer_cache: Optional[PeerCache] = None
+        if getattr(config, 'peer_cache_enabled', False):
+            self.peer_cache = PeerCache(
+                ArtifactStore(
+                    config.state_dir / "peer-cache",
+                    max_bytes=getattr(config, 'peer_cache_max_bytes', 1024 * 1024 * 1024),
+                ),
+                self_mac=get_mac_address(),
+                port=self._sensor_port,
+                wait_seconds=getattr(config, 'peer_cache_wait_seconds', 120),
+            )
+            configure_peer_cache(self.peer_cache)
+
         # gRPC server for Go agents (workstation-scale monitoring)
         self._grpc_enabled = getattr(config, 'grpc_enabled', GRPC_AVAILABLE)
         self._grpc_port = getattr(config, 'grpc_port', 50051)
@@ -580,18 +637,12 @@ class ApplianceAgent:
         if not self._domain_discovery_complete:
             await self._discover_domain_on_boot()
 
-        # Main loop
-        while self.running:
-            try:
-                await asyncio.wait_for(self._run_cycle(), timeout=DEFAULT_CYCLE_TIMEOUT)
-            except asyncio.TimeoutError:
-                logger.error(f"Main loop cycle timed out after {DEFAULT_CYCLE_TIMEOUT}s — possible deadlock or network hang")
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in main loop: {e}")
-
-            await asyncio.sleep(self.config.poll_interval)
+        # Main loop: independent tasks until stop()
+        self._build_scheduler()
+        try:
+            await self.scheduler.run()
+        except asyncio.CancelledError:
+            pass
 
         await self.client.close()
         logger.info("Agent stopped")
@@ -600,6 +651,7 @@ class ApplianceAgent:
         """Stop the agent gracefully."""
         logger.info("Stopping agent...")
         self.running = False
+        await self.scheduler.stop()
 
         # Stop sensor web server
         if self._sensor_server:
@@ -751,10 +803,32 @@ class ApplianceAgent:
             # Include Linux sensor router (prefix: /sensor)
             sensor_app.include_router(linux_sensor_router)
 
+            # Peer artifact cache (prefix: /peer); 404s unless enabled
+            sensor_app.include_router(peer_cache_router)
+
             # Health check endpoint
             @sensor_app.get("/health")
             async def health():
-                return {"status": "ok", "version": VERSION}
+                return {
+                    "status": "ok",
+                    "version": VERSION,
+                    "scheduler": self.scheduler.stats(),
+                }
+
+            # Per-task lag / budget metrics and per-host scan cadence
+            @sensor_app.get("/health/scheduler")
+            async def scheduler_health():
+                stats = self.scheduler.stats()
+                stats["scan_cadence"] = {
+                    "windows": self._windows_cadence.stats(),
+                    "linux": self._linux_cadence.stats(),
+                }
+                return stats
+
+            # Per-endpoint latency / bytes / retries of outbound HTTP
+            @sensor_app.get("/health/http")
+            async def http_health():
+                return get_transport().stats()
 
             # Configure uvicorn
             config = uvicorn.Config(
@@ -846,11 +920,59 @@ class ApplianceAgent:
             logger.warning(f"Failed to start gRPC server: {e}")
             self._grpc_enabled = False
 
-    async def _run_cycle(self):
-        """Run one cycle of the agent loop."""
+    def _build_scheduler(self):
+        """
+        Register the main-loop tasks on self.scheduler.
+
+        Checkin and orders are critical (never queued behind scans). The
+        _maybe_* tasks keep their own interval gates; the scheduler just
+        ticks them every poll_interval. Windows/Linux scans tick every
+        DEFAULT_ADAPTIVE_SCAN_TICK and scan only hosts whose adaptive
+        cadence is due.
+        """
+        poll = self.config.poll_interval
+        sched = self.scheduler
+        sched.add("checkin", self._run_checkin, poll,
+                  priority=PRIORITY_CRITICAL, deadline=DEFAULT_CHECKIN_TIMEOUT)
+        sched.add("orders", self._process_orders_task, poll,
+                  priority=PRIORITY_CRITICAL, deadline=DEFAULT_CYCLE_TIMEOUT)
+        sched.add("drift_detection", self._run_drift_detection, poll,
+                  priority=PRIORITY_HIGH, deadline=DEFAULT_CHECKIN_TIMEOUT,
+                  when=lambda: bool(self.drift_checker and self.config.enable_drift_detection))
+        sched.add("linux_scan", self._maybe_scan_linux, DEFAULT_ADAPTIVE_SCAN_TICK,
+                  priority=PRIORITY_HIGH, deadline=DEFAULT_CYCLE_TIMEOUT,
+                  when=lambda: bool(self.linux_targets))
+        sched.add("windows_scan", self._maybe_scan_windows, DEFAULT_ADAPTIVE_SCAN_TICK,
+                  priority=PRIORITY_HIGH, deadline=DEFAULT_CYCLE_TIMEOUT,
+                  when=lambda: bool(self.windows_targets))
+        sched.add("network_posture", self._maybe_scan_network_posture, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CYCLE_TIMEOUT)
+        sched.add("workstation_scan", self._maybe_scan_workstations, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CYCLE_TIMEOUT,
+                  when=lambda: bool(self._workstation_enabled and self._domain_controller))
+        sched.add("rules_sync", self._maybe_sync_rules, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CHECKIN_TIMEOUT,
+                  when=lambda: bool(self.config.enable_l1_sync))
+        sched.add("device_db_sync", self._maybe_sync_device_db, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CHECKIN_TIMEOUT)
+        sched.add("ad_reenumeration", self._maybe_reenumerate_ad, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CYCLE_TIMEOUT)
+        sched.add("go_agent_deploy", self._maybe_deploy_go_agents, poll,
+                  priority=PRIORITY_NORMAL, deadline=DEFAULT_CYCLE_TIMEOUT,
+                  when=lambda: bool(self.workstation_targets and self.discovered_domain))
+        sched.add("promotions", self._maybe_check_promotions, poll,
+                  priority=PRIORITY_BACKGROUND, deadline=DEFAULT_CHECKIN_TIMEOUT,
+                  when=lambda: self.learning_system is not None)
+        sched.add("learning_sync", self._maybe_sync_learning, poll,
+                  priority=PRIORITY_BACKGROUND, deadline=DEFAULT_CYCLE_TIMEOUT,
+                  when=lambda: self.learning_sync is not None)
+        sched.add("prune_database", self._maybe_prune_database, poll,
+                  priority=PRIORITY_BACKGROUND, deadline=DEFAULT_CYCLE_TIMEOUT)
+
+    async def _run_checkin(self):
+        """Phone-home checkin; orders in the response are processed right away."""
         timestamp = datetime.now(timezone.utc).isoformat()
 
-        # 1. Phone-home checkin
         compliance_summary = None
         if self.drift_checker and self.config.enable_drift_detection:
             compliance_summary = await self._get_compliance_summary()
@@ -875,76 +997,45 @@ class ApplianceAgent:
             agent_public_key=self._public_key_hex
         )
 
-        if checkin_response is not None:
-            logger.debug(f"[{timestamp}] Checkin OK")
-            # Verify pending rebuild if one is in progress
-            self._verify_rebuild_if_pending()
-            # Complete rebuild order that was interrupted by agent restart
-            await self._complete_pending_rebuild_order()
-            # Drain offline evidence queue (connectivity confirmed)
-            await self._drain_evidence_queue()
-            # Update Windows targets from server response (credential pull)
-            await self._update_windows_targets_from_response(checkin_response)
-            # Update Linux targets from server response (credential pull)
-            await self._update_linux_targets_from_response(checkin_response)
-            # Update enabled runbooks from server response (runbook config pull)
-            self._update_enabled_runbooks_from_response(checkin_response)
-            
-            # Check if enumeration triggered (zero-friction deployment)
-            if checkin_response.get('trigger_enumeration'):
-                logger.info("Enumeration triggered from Central Command")
-                await self._enumerate_ad_targets()
-        else:
+        if checkin_response is None:
             logger.warning(f"[{timestamp}] Checkin failed")
+            return
 
-        # 2. Run drift detection and upload evidence
-        if self.drift_checker and self.config.enable_drift_detection:
-            await self._run_drift_detection()
-
-        # 3. Sync L1 rules (periodically)
-        if self.config.enable_l1_sync:
-            await self._maybe_sync_rules()
-
-        # 4. Sync targets from network-scanner device DB (periodically)
-        await self._maybe_sync_device_db()
-
-        # 5. Periodic AD re-enumeration (hourly, catches new domain devices)
-        await self._maybe_reenumerate_ad()
-
-        # 6-9. Run all scans in parallel (Linux ~1min, Windows ~6min, network, workstations)
-        # Each _maybe_scan_* method checks its own interval internally.
-        scan_tasks = []
-        if self.linux_targets:
-            scan_tasks.append(self._maybe_scan_linux())
-        if self.windows_targets:
-            scan_tasks.append(self._maybe_scan_windows())
-        scan_tasks.append(self._maybe_scan_network_posture())
-        if self._workstation_enabled and self._domain_controller:
-            scan_tasks.append(self._maybe_scan_workstations())
-
-        if scan_tasks:
-            results = await asyncio.gather(*scan_tasks, return_exceptions=True)
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Scan task {i} failed: {result}")
-
-        # 10. Deploy Go agents to workstations (if enumeration completed)
-        if self.workstation_targets and self.discovered_domain:
-            await self._maybe_deploy_go_agents()
-
-        # 11. Check for L2->L1 promotion candidates (periodically)
-        if self.learning_system:
-            await self._maybe_check_promotions()
-
-        # 12. Learning system sync (pattern stats + promoted rules)
-        if self.learning_sync:
-            await self._maybe_sync_learning()
-
-        # 13. Database maintenance (pruning old incidents)
-        await self._maybe_prune_database()
-
-        # 14. Process pending orders (remote commands/updates)
-        await self._process_pending_orders()
+        logger.debug(f"[{timestamp}] Checkin OK")
+
+        # Hand delivered orders to the orders task before anything slow
+        pending_orders = checkin_response.get('pending_orders')
+        if pending_orders:
+            self._checkin_orders = list(pending_orders)
+            self.scheduler.trigger("orders")
+
+        server_keys = checkin_response.get('server_public_keys') or []
+        if not server_keys and checkin_response.get('server_public_key'):
+            server_keys = [checkin_response['server_public_key']]
+        if server_keys:
+            self._server_public_keys = list(server_keys)
+        if self.peer_cache:
+            self.peer_cache.update_peers(checkin_response.get('mesh_peers') or [])
+
+        # Verify pending rebuild if one is in progress
+        self._verify_rebuild_if_pending()
+        # Complete rebuild order that was interrupted by agent restart
+        await self._complete_pending_rebuild_order()
+        # Drain offline evidence queue (connectivity confirmed)
+        await self._drain_evidence_queue()
+        # Update Windows targets from server response (credential pull)
+        await self._update_windows_targets_from_response(checkin_response)
+        # Update Linux targets from server response (credential pull)
+        await self._update_linux_targets_from_response(checkin_response)
+        # Update enabled runbooks from server response (runbook config pull)
+        self._update_enabled_runbooks_from_response(checkin_response)
+
+        # Check if enumeration triggered (zero-friction deployment);
+        # runs as its own task so it can't hold up the next checkin
+        if checkin_response.get('trigger_enumeration'):
+            logger.info("Enumeration triggered from Central Command")
+            self._enumeration_requested = True
+            self.scheduler.trigger("ad_reenumeration")
 
     async def _get_compliance_summary(self) -> dict:
         """Get summary of compliance status for checkin."""
@@ -1109,17 +1200,30 @@ class ApplianceAgent:
             logger.warning(f"Failed to store local evidence: {e}")
 
     async def _drain_evidence_queue(self):
-        """Retry queued evidence submissions after connectivity is confirmed."""
+        """Retry queued evidence submissions after connectivity is confirmed.
+
+        Pending bundles go up in one /submit-batch request (one signature
+        pass and one chain-lock acquisition server-side). Falls back to
+        per-bundle submission if the batch request fails, e.g. against a
+        server that predates the batch endpoint.
+        """
         if not hasattr(self, '_evidence_queue'):
             return
 
         try:
-            pending = await self._evidence_queue.list_pending(limit=20, ready_only=True)
+            pending = await self._evidence_queue.list_pending(
+                limit=EVIDENCE_DRAIN_BATCH_SIZE, ready_only=True
+            )
             if not pending:
                 return
 
             logger.info(f"Draining offline evidence queue: {len(pending)} items")
+            batch = []     # (queue item, submit_evidence kwargs)
+            payloads = []  # signed payload per batch entry
             for item in pending:
+                # Each bundle is read and signed on its own: a corrupt or
+                # unbuildable bundle is marked failed (backed off, like a
+                # rejected one) without holding back the rest of the drain.
                 try:
                     # Re-read the stored evidence bundle
                     bundle_path = Path(item.bundle_path)
@@ -1131,32 +1235,64 @@ class ApplianceAgent:
                         evidence_data = json.load(f)
 
                     evidence_json = json.dumps(evidence_data, sort_keys=True)
-                    bundle_hash = hashlib.sha256(evidence_json.encode()).hexdigest()
-                    check_type = evidence_data.get("check_name", evidence_data.get("check_type", "unknown"))
-                    check_result = evidence_data.get("status", "unknown")
+                    kwargs = {
+                        "bundle_hash": hashlib.sha256(evidence_json.encode()).hexdigest(),
+                        "check_type": evidence_data.get("check_name", evidence_data.get("check_type", "unknown")),
+                        "check_result": evidence_data.get("status", "unknown"),
+                        "evidence_data": evidence_data,
+                        "signer": self.signer,
+                    }
+                    payload = self.client.build_evidence_payload(**kwargs)
+                except Exception as e:
+                    logger.warning(f"Skipping queued evidence {item.bundle_id}: {e}")
+                    await self._evidence_queue.mark_failed(item.id, str(e))
+                    continue
+                batch.append((item, kwargs))
+                payloads.append(payload)
 
-                    bundle_id = await self.client.submit_evidence(
-                        bundle_hash=bundle_hash,
-                        check_type=check_type,
-                        check_result=check_result,
-                        evidence_data=evidence_data,
-                        signer=self.signer,
-                    )
+            results = None
+            if batch:
+                results = await self.client.submit_evidence_batch(payloads)
 
-                    if bundle_id:
-                        await self._evidence_queue.mark_uploaded(item.id)
-                        logger.info(f"Queued evidence submitted: {item.bundle_id} → {bundle_id}")
+            if results is None:
+                await self._drain_evidence_individually(batch)
+            else:
+                by_index = {r.get("index"): r for r in results}
+                for index, (item, _) in enumerate(batch):
+                    result = by_index.get(index)
+                    if result is None:
+                        await self._evidence_queue.mark_failed(item.id, "missing from batch response")
+                    elif result.get("status") == "rejected":
+                        await self._evidence_queue.mark_failed(
+                            item.id, result.get("error") or "rejected by server"
+                        )
                     else:
-                        await self._evidence_queue.mark_failed(item.id, "submission returned None")
-                except Exception as e:
-                    await self._evidence_queue.mark_failed(item.id, str(e))
+                        # accepted / deduplicated / skipped: server has it
+                        await self._evidence_queue.mark_uploaded(item.id)
+                        logger.info(
+                            f"Queued evidence submitted: {item.bundle_id} → "
+                            f"{result.get('bundle_id')} ({result.get('status')})"
+                        )
 
             # Prune old uploaded entries and permanently failed entries
             await self._evidence_queue.prune_uploaded(older_than_days=7)
             await self._evidence_queue.prune_failed(older_than_days=30)
 
         except Exception as e:
-            logger.debug(f"Evidence queue drain skipped: {e}")
+            logger.warning(f"Evidence queue drain failed: {e}")
+
+    async def _drain_evidence_individually(self, batch: List[tuple]):
+        """Per-bundle fallback for _drain_evidence_queue."""
+        for item, kwargs in batch:
+            try:
+                bundle_id = await self.client.submit_evidence(**kwargs)
+                if bundle_id:
+                    await self._evidence_queue.mark_uploaded(item.id)
+                    logger.info(f"Queued evidence submitted: {item.bundle_id} → {bundle_id}")
+                else:
+                    await self._evidence_queue.mark_failed(item.id, "submission returned None")
+            except Exception as e:
+                await self._evidence_queue.mark_failed(item.id, str(e))
 
     # =========================================================================
     # Three-Tier Healing System
@@ -1682,7 +1818,7 @@ class ApplianceAgent:
             await self.client._request(
                 "POST",
                 "/api/escalations",
-                json=escalation_data
+                json_data=escalation_data
             )
 
             logger.info(f"Escalated to L3: {reason}")
@@ -1842,19 +1978,62 @@ class ApplianceAgent:
             return
 
         try:
-            rules = await self.client.sync_rules()
-            if rules is not None:
-                # Store rules locally
-                rules_file = self.config.rules_dir / "l1_rules.json"
-                with open(rules_file, 'w') as f:
-                    json.dump(rules, f, indent=2)
-
+            count = await self._sync_rule_bundle()
+            if count is not None:
                 self._last_rules_sync = now
-                logger.info(f"L1 rules synced: {len(rules)} rules")
 
         except Exception as e:
             logger.warning(f"Rules sync failed: {e}")
 
+    async def _sync_rule_bundle(self) -> Optional[int]:
+        """
+        Pull the L1 rule bundle into l1_rules.json and the L1 engine.
+
+        Sends the bundle_version the engine holds, so an unchanged set
+        costs a 304 and a changed one usually just a delta that the
+        engine merges in place. Returns the synced rule count, or None
+        on failure.
+        """
+        rules_file = self.config.rules_dir / "l1_rules.json"
+        level1 = self.auto_healer.level1 if self.auto_healer else None
+        have = level1.synced_bundle_versions.get(str(rules_file)) if level1 else None
+
+        payload = await self.client.sync_rule_bundle(have)
+        if payload is None:
+            return None
+        if payload.get("not_modified"):
+            logger.debug(f"L1 rules unchanged ({have})")
+            return level1.synced_rule_count(rules_file)
+
+        if "delta" in payload and level1:
+            try:
+                level1.load_synced_rules(rules_file, delta=payload)
+                return level1.synced_rule_count(rules_file)
+            except Exception as e:
+                logger.warning(f"L1 rule delta rejected ({e}), fetching full set")
+                payload = await self.client.sync_rule_bundle(None)
+                if payload is None or "rules" not in payload:
+                    return None
+
+        if "rules" not in payload:
+            return None
+        rules = payload["rules"]
+        # Store rules locally (wrapped format keeps bundle_version for
+        # the next conditional sync)
+        tmp = rules_file.with_suffix(".json.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({
+                "bundle_version": payload.get("bundle_version"),
+                "healing_tier": payload.get("healing_tier"),
+                "rules": rules,
+            }, f, indent=2)
+        tmp.replace(rules_file)
+        if level1:
+            level1.load_synced_rules(rules_file)
+
+        logger.info(f"L1 rules synced: {len(rules)} rules")
+        return len(rules)
+
     async def _update_windows_targets_from_response(self, response: Dict):
         """
         Update Windows targets from server check-in response.
@@ -1958,7 +2137,8 @@ class ApplianceAgent:
             self.linux_executor = LinuxExecutor(self.linux_targets)
             self.linux_drift_detector = LinuxDriftDetector(
                 targets=self.linux_targets,
-                executor=self.linux_executor
+                executor=self.linux_executor,
+                max_concurrent_hosts=getattr(self.config, 'linux_scan_concurrency', 8)
             )
 
             logger.info(f"Updated {len(new_targets)} Linux targets from Central Command")
@@ -2032,39 +2212,42 @@ class ApplianceAgent:
 
     async def _maybe_scan_windows(self):
         """
-        Scan Windows targets if enough time has passed.
+        Scan Windows targets whose adaptive interval is due.
 
         Uses dual-mode logic: skips hosts with active sensors,
-        only polls hosts without sensors.
+        only polls hosts without sensors. Each polled host has its own
+        cadence (self._windows_cadence): a host that just drifted is
+        rescanned after adaptive_scan_min_interval, stable hosts back
+        off toward adaptive_scan_max_interval.
         """
         now = datetime.now(timezone.utc)
-        elapsed = (now - self._last_windows_scan).total_seconds()
-
-        if elapsed < self._windows_scan_interval:
-            return
 
         # Dual-mode: only poll targets without active sensors
         targets_to_poll = self._get_targets_needing_poll()
         sensor_count = len(self.windows_targets) - len(targets_to_poll)
 
-        if self._sensor_enabled and sensor_count > 0:
-            logger.info(
-                f"Dual-mode: {sensor_count} sensors active, "
-                f"polling {len(targets_to_poll)} hosts via WinRM"
-            )
+        self._windows_cadence.forget(t.hostname for t in self.windows_targets)
+        due = set(self._windows_cadence.due(t.hostname for t in targets_to_poll))
+        targets_to_poll = [t for t in targets_to_poll if t.hostname in due]
 
         if targets_to_poll:
+            if self._sensor_enabled and sensor_count > 0:
+                logger.info(
+                    f"Dual-mode: {sensor_count} sensors active, "
+                    f"polling {len(targets_to_poll)} due hosts via WinRM"
+                )
             logger.info(f"Scanning {len(targets_to_poll)} Windows targets in parallel...")
             scan_tasks = [self._scan_windows_target(target) for target in targets_to_poll]
             results = await asyncio.gather(*scan_tasks, return_exceptions=True)
-            for i, result in enumerate(results):
+            for target, result in zip(targets_to_poll, results):
                 if isinstance(result, Exception):
-                    logger.error(f"Windows scan failed for {targets_to_poll[i].hostname}: {result}")
-        elif self.windows_targets:
+                    logger.error(f"Windows scan failed for {target.hostname}: {result}")
+                drifted = result if isinstance(result, bool) else None
+                self._windows_cadence.record(target.hostname, drifted)
+            self._last_windows_scan = now
+        elif self.windows_targets and sensor_count == len(self.windows_targets):
             logger.debug("All Windows hosts have active sensors - skipping WinRM poll")
 
-        self._last_windows_scan = now
-
     def _scan_windows_target_sync(self, target: WindowsTarget):
         """Synchronous WinRM scan — runs in thread pool to avoid blocking event loop."""
         import winrm
@@ -2169,8 +2352,14 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
         return computer_name, all_results
 
-    async def _scan_windows_target(self, target: WindowsTarget):
-        """Run compliance checks on a single Windows target."""
+    async def _scan_windows_target(self, target: WindowsTarget) -> Optional[bool]:
+        """
+        Run compliance checks on a single Windows target.
+
+        Returns True if any check failed (drift), False if all passed,
+        None if the host returned no results.
+        """
+        drifted = None
         try:
             # Run blocking WinRM calls in a thread to avoid starving
             # the asyncio event loop (which Linux asyncssh scans need).
@@ -2180,7 +2369,8 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
             if not all_results:
                 logger.warning(f"No scan results from {target.hostname}")
-                return
+                return None
+            drifted = False
 
             # Process each check from the batched results
             check_names = [
@@ -2434,6 +2624,9 @@ $x|ConvertTo-Json -Depth 3 -Compress
                         )
                         self._track_evidence_result(bid, windows_check_type)
 
+                    if status == "fail":
+                        drifted = True
+
                     # If check failed and healing is enabled, attempt remediation
                     # Note: AutoHealer respects dry_run mode internally
                     if status == "fail" and self.auto_healer:
@@ -2485,23 +2678,28 @@ $x|ConvertTo-Json -Depth 3 -Compress
         except Exception as e:
             logger.error(f"Failed to scan Windows target {target.hostname}: {e}")
 
+        return drifted
+
     # =========================================================================
     # Linux Scanning (SSH-based)
     # =========================================================================
 
     async def _maybe_scan_linux(self):
         """
-        Scan Linux targets if enough time has passed.
+        Scan Linux targets whose adaptive interval is due.
 
         Uses LinuxDriftDetector with SSH via asyncssh for Linux/Unix servers.
+        Per-host cadence works as for Windows (self._linux_cadence).
         """
         now = datetime.now(timezone.utc)
-        elapsed = (now - self._last_linux_scan).total_seconds()
 
-        if elapsed < self._linux_scan_interval:
+        if not self.linux_targets:
             return
 
-        if not self.linux_targets:
+        self._linux_cadence.forget(t.hostname for t in self.linux_targets)
+        due = set(self._linux_cadence.due(t.hostname for t in self.linux_targets))
+        due_targets = [t for t in self.linux_targets if t.hostname in due]
+        if not due_targets:
             return
 
         if not self.linux_drift_detector:
@@ -2509,10 +2707,12 @@ $x|ConvertTo-Json -Depth 3 -Compress
             self.linux_executor = LinuxExecutor(self.linux_targets)
             self.linux_drift_detector = LinuxDriftDetector(
                 targets=self.linux_targets,
-                executor=self.linux_executor
+                executor=self.linux_executor,
+                max_concurrent_hosts=getattr(self.config, 'linux_scan_concurrency', 8)
             )
 
-        logger.info(f"Scanning {len(self.linux_targets)} Linux targets...")
+        logger.info(f"Scanning {len(due_targets)} of {len(self.linux_targets)} Linux targets...")
+        drifted_hosts: Dict[str, bool] = {}
 
         try:
             # Incremental healing callback — fires as each drift is detected,
@@ -2534,8 +2734,12 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
             # Run drift detection — healing fires incrementally via callback
             drift_results = await self.linux_drift_detector.detect_all(
-                on_result=_on_drift_detected
+                on_result=_on_drift_detected, targets=due_targets
             )
+            for drift in drift_results:
+                if drift.runbook_id == "DETECT-ERROR":
+                    continue  # unreachable host: keep its current cadence
+                drifted_hosts[drift.target] = drifted_hosts.get(drift.target, False) or not drift.compliant
 
             # Phase 2: Submit evidence (can be interrupted by cycle timeout — OK)
             for drift in drift_results:
@@ -2573,6 +2777,8 @@ $x|ConvertTo-Json -Depth 3 -Compress
         except Exception as e:
             logger.error(f"Linux drift detection failed: {e}")
 
+        for target in due_targets:
+            self._linux_cadence.record(target.hostname, drifted_hosts.get(target.hostname))
         self._last_linux_scan = now
 
     async def _heal_linux_drift(self, drift, evidence_data: dict):
@@ -3104,8 +3310,14 @@ $x|ConvertTo-Json -Depth 3 -Compress
         """
         Periodically re-enumerate AD to discover new domain devices.
 
-        Runs hourly to catch new servers/workstations joining the domain.
+        Runs hourly to catch new servers/workstations joining the domain,
+        or immediately when a checkin response sets trigger_enumeration.
         """
+        if getattr(self, '_enumeration_requested', False):
+            self._enumeration_requested = False
+            await self._enumerate_ad_targets()
+            return
+
         if not self.discovered_domain:
             return
 
@@ -3677,14 +3889,19 @@ $x|ConvertTo-Json -Depth 3 -Compress
     # Order Processing (remote commands and updates)
     # =========================================================================
 
-    async def _process_pending_orders(self):
-        """Fetch and process pending orders from Central Command."""
-        try:
-            # Build appliance ID (site_id-MAC)
-            mac = get_mac_address()
-            appliance_id = f"{self.config.site_id}-{mac}"
+    async def _process_orders_task(self):
+        """Scheduler task: orders from the last checkin response, else poll."""
+        orders, self._checkin_orders = self._checkin_orders, None
+        await self._process_pending_orders(orders)
 
-            orders = await self.client.fetch_pending_orders(appliance_id)
+    async def _process_pending_orders(self, orders: Optional[List[Dict[str, Any]]] = None):
+        """Process pending orders (fetched from Central Command if not given)."""
+        try:
+            if orders is None:
+                # Build appliance ID (site_id-MAC)
+                mac = get_mac_address()
+                appliance_id = f"{self.config.site_id}-{mac}"
+                orders = await self.client.fetch_pending_orders(appliance_id)
 
             for order in orders:
                 order_id = order.get('order_id')
@@ -3692,11 +3909,15 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
                 if not order_id or not order_type:
                     continue
+                # A checkin snapshot can still list an order we just ran
+                if order_id in self._recent_order_ids:
+                    continue
 
                 logger.info(f"Processing order {order_id}: {order_type}")
 
                 # Acknowledge order
                 await self.client.acknowledge_order(order_id)
+                self._recent_order_ids.append(order_id)
 
                 # Execute order
                 try:
@@ -3832,12 +4053,9 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
     async def _handle_sync_rules(self, params: Dict) -> Dict:
         """Force L1 rules sync."""
-        rules = await self.client.sync_rules()
-        if rules is not None:
-            rules_file = self.config.rules_dir / "l1_rules.json"
-            with open(rules_file, 'w') as f:
-                json.dump(rules, f, indent=2)
-            return {"rules_synced": len(rules)}
+        count = await self._sync_rule_bundle()
+        if count is not None:
+            return {"rules_synced": count}
         return {"error": "rules_sync_failed"}
 
     async def _handle_restart_agent(self, params: Dict) -> Dict:
@@ -4419,6 +4637,7 @@ $x|ConvertTo-Json -Depth 3 -Compress
             sha256: Expected checksum
             size_bytes: Optional file size
             maintenance_window: Dict with days, start, end times
+            manifest_url: Optional signed chunk manifest (delta download)
         """
         from .update_agent import UpdateAgent, UpdateInfo
 
@@ -4433,6 +4652,8 @@ $x|ConvertTo-Json -Depth 3 -Compress
             api_base_url=self.config.mcp_url,
             api_key=api_key,
             appliance_id=self.config.host_id,
+            trusted_keys=self._server_public_keys,
+            peer_cache=self.peer_cache,
         )
 
         # Create UpdateInfo from params
@@ -4445,6 +4666,7 @@ $x|ConvertTo-Json -Depth 3 -Compress
             size_bytes=params.get('size_bytes'),
             maintenance_window=params.get('maintenance_window', {}),
             current_status='notified',
+            manifest_url=params.get('manifest_url'),
         )
 
         if not update.iso_url or not update.sha256:
@@ -4452,8 +4674,8 @@ $x|ConvertTo-Json -Depth 3 -Compress
 
         logger.info(f"ISO update requested: {update.version}")
 
-        # Download ISO
-        iso_path = await update_agent.download_iso(update)
+        # Download ISO (delta from the signed chunk manifest when available)
+        iso_path = await update_agent.fetch_image(update)
         if not iso_path:
             return {"error": "Download failed", "status": "failed"}
 
@@ -4485,6 +4707,7 @@ $x|ConvertTo-Json -Depth 3 -Compress
         return {
             "status": "rebooting",
             "version": update.version,
+            "transfer": update_agent.last_transfer,
             "message": "Update applied, rebooting in 5 seconds",
         }
 
@@ -20,6 +20,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
 from .appliance_config import ApplianceConfig
+from .http_transport import close_transport, get_transport
 from .phi_scrubber import PHIScrubber
 
 logger = logging.getLogger(__name__)
@@ -67,8 +68,13 @@ class CentralCommandClient:
         """
         self.config = config
         self.max_retries = max_retries
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
-        self._session: Optional[aiohttp.ClientSession] = None
+        self.timeout = timeout
+        self._ssl_context = create_secure_ssl_context()
+        self._headers = {
+            'User-Agent': f'osiriscare-appliance/{VERSION}',
+            'Authorization': f'Bearer {self.config.api_key}',
+            'X-Site-ID': self.config.site_id,
+        }
         # PHI scrubber for outbound data - excludes IP addresses since those are
         # infrastructure data intentionally shared with the partner dashboard
         self._outbound_scrubber = PHIScrubber(
@@ -77,34 +83,12 @@ class CentralCommandClient:
         )
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session with TLS 1.2+ enforcement."""
-        if self._session is None or self._session.closed:
-            # Close stale session if it exists but is closed
-            if self._session is not None and self._session.closed:
-                try:
-                    await self._session.close()
-                except Exception:
-                    pass
-            # Create hardened SSL connector
-            ssl_context = create_secure_ssl_context()
-            connector = aiohttp.TCPConnector(ssl=ssl_context, limit=100, limit_per_host=10)
-
-            self._session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=self.timeout,
-                headers={
-                    'User-Agent': f'osiriscare-appliance/{VERSION}',
-                    'Authorization': f'Bearer {self.config.api_key}',
-                    'Content-Type': 'application/json',
-                    'X-Site-ID': self.config.site_id,
-                }
-            )
-        return self._session
+        """The process-wide pooled session (see http_transport)."""
+        return await get_transport().session()
 
     async def close(self):
-        """Close the client session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Flush nothing: the pooled session is closed at process exit."""
+        await close_transport()
 
     def _scrub_outbound(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -146,27 +130,29 @@ class CentralCommandClient:
             json_data = self._scrub_outbound(json_data)
 
         url = f"{self.config.api_endpoint}{endpoint}"
-        session = await self._get_session()
-        last_error = None
 
-        for attempt in range(self.max_retries):
-            try:
-                async with session.request(method, url, json=json_data, **kwargs) as response:
-                    try:
-                        data = await response.json()
-                    except Exception:
-                        data = {"error": await response.text()}
-
-                    return response.status, data
+        try:
+            response = await get_transport().request(
+                method,
+                url,
+                json=json_data,
+                headers=self._headers,
+                compress=True,
+                timeout=self.timeout,
+                max_retries=self.max_retries - 1,
+                ssl=self._ssl_context,
+                **kwargs
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"All retries failed: {e}")
+            return 0, {"error": str(e)}
 
-            except aiohttp.ClientError as e:
-                last_error = e
-                logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"error": response.text()}
 
-        logger.error(f"All retries failed: {last_error}")
-        return 0, {"error": str(last_error)}
+        return response.status, data
 
     # =========================================================================
     # Phone-Home
@@ -269,7 +255,7 @@ class CentralCommandClient:
     # Evidence Upload
     # =========================================================================
 
-    async def submit_evidence(
+    def build_evidence_payload(
         self,
         bundle_hash: str,
         check_type: str,
@@ -279,27 +265,9 @@ class CentralCommandClient:
         host: Optional[str] = None,
         hipaa_control: Optional[str] = None,
         agent_signature: Optional[str] = None,
-        signer: Optional[Any] = None  # Ed25519Signer instance
-    ) -> Optional[str]:
-        """
-        Submit evidence bundle to Central Command.
-
-        The agent signs the bundle locally with Ed25519, then the server
-        also signs it and adds to the hash chain.
-
-        Args:
-            bundle_hash: SHA256 hash of evidence data (for local verification)
-            check_type: Type of check (e.g., "ntp_sync", "disk_usage")
-            check_result: Result status ("compliant", "non_compliant", "error")
-            evidence_data: Detailed check data
-            timestamp: When check was performed (defaults to now)
-            host: Hostname that was checked
-            hipaa_control: HIPAA control reference (e.g., "164.312(b)")
-            agent_signature: Hex-encoded Ed25519 signature from agent (optional)
-
-        Returns:
-            Bundle ID if successful, None otherwise
-        """
+        signer: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Build the scrubbed, signed payload for one evidence bundle."""
         if timestamp is None:
             timestamp = datetime.now(timezone.utc)
 
@@ -331,8 +299,9 @@ class CentralCommandClient:
             "summary": summary
         }
 
-        # Scrub PHI BEFORE signing. We pass pre_scrubbed=True to _request()
-        # to prevent a second scrub from corrupting the signed_data string.
+        # Scrub PHI BEFORE signing. Callers pass pre_scrubbed=True to
+        # _request() to prevent a second scrub from corrupting the
+        # signed_data string.
         payload = self._scrub_outbound(payload)
 
         # Sign the scrubbed payload (matches server-side verification)
@@ -356,11 +325,56 @@ class CentralCommandClient:
             if signed_data_str:
                 payload["signed_data"] = signed_data_str
 
+        return payload
+
+    async def submit_evidence(
+        self,
+        bundle_hash: str,
+        check_type: str,
+        check_result: str,
+        evidence_data: Dict[str, Any],
+        timestamp: Optional[datetime] = None,
+        host: Optional[str] = None,
+        hipaa_control: Optional[str] = None,
+        agent_signature: Optional[str] = None,
+        signer: Optional[Any] = None  # Ed25519Signer instance
+    ) -> Optional[str]:
+        """
+        Submit evidence bundle to Central Command.
+
+        The agent signs the bundle locally with Ed25519, then the server
+        also signs it and adds to the hash chain.
+
+        Args:
+            bundle_hash: SHA256 hash of evidence data (for local verification)
+            check_type: Type of check (e.g., "ntp_sync", "disk_usage")
+            check_result: Result status ("compliant", "non_compliant", "error")
+            evidence_data: Detailed check data
+            timestamp: When check was performed (defaults to now)
+            host: Hostname that was checked
+            hipaa_control: HIPAA control reference (e.g., "164.312(b)")
+            agent_signature: Hex-encoded Ed25519 signature from agent (optional)
+
+        Returns:
+            Bundle ID if successful, None otherwise
+        """
+        payload = self.build_evidence_payload(
+            bundle_hash=bundle_hash,
+            check_type=check_type,
+            check_result=check_result,
+            evidence_data=evidence_data,
+            timestamp=timestamp,
+            host=host,
+            hipaa_control=hipaa_control,
+            agent_signature=agent_signature,
+            signer=signer,
+        )
+
         status, response = await self._request(
             'POST',
             f'/api/evidence/sites/{self.config.site_id}/submit',
             json_data=payload,
-            pre_scrubbed=True  # Already scrubbed at line 334 before signing
+            pre_scrubbed=True  # Already scrubbed in build_evidence_payload before signing
         )
 
         if status in (200, 201):
@@ -371,6 +385,48 @@ class CentralCommandClient:
             logger.error(f"Evidence submission failed: {status} - {response}")
             return None
 
+    async def submit_evidence_batch(
+        self,
+        payloads: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Submit several evidence bundles in one request.
+
+        The server verifies every signature, takes the site chain lock
+        once and appends the accepted bundles at consecutive chain
+        positions.
+
+        Args:
+            payloads: Bundles from build_evidence_payload(), in queue order
+
+        Returns:
+            Per-bundle results in request order (each has "index",
+            "status" — accepted/deduplicated/skipped/rejected — and
+            "bundle_id"/"error"), or None if the batch request failed
+            (including servers without the batch endpoint)
+        """
+        if not payloads:
+            return []
+
+        status, response = await self._request(
+            'POST',
+            f'/api/evidence/sites/{self.config.site_id}/submit-batch',
+            json_data={"bundles": payloads},
+            pre_scrubbed=True  # Each payload was scrubbed before signing
+        )
+
+        if status in (200, 201):
+            results = response.get('results', [])
+            logger.info(
+                f"Evidence batch submitted: {response.get('accepted', 0)} accepted, "
+                f"{response.get('deduplicated', 0)} deduplicated, "
+                f"{response.get('rejected', 0)} rejected"
+            )
+            return results
+        else:
+            logger.warning(f"Evidence batch submission failed: {status} - {response}")
+            return None
+
     # =========================================================================
     # L1 Rules Sync
     # =========================================================================
@@ -402,6 +458,30 @@ class CentralCommandClient:
             logger.warning(f"Rules sync failed: {status} - {response}")
             return None
 
+    async def sync_rule_bundle(self, have: Optional[str] = None) -> Optional[Dict]:
+        """
+        Fetch the versioned L1 rule bundle, conditional on `have`.
+
+        Args:
+            have: bundle_version currently held locally (None = full)
+
+        Returns:
+            {"not_modified": True} if `have` is current, the response
+            payload (full "rules" or a "delta" against `have`), or None
+            on error
+        """
+        endpoint = f'/agent/sync?site_id={self.config.site_id}'
+        if have:
+            endpoint += f'&have={have}'
+        status, response = await self._request('GET', endpoint)
+
+        if status == 304:
+            return {"not_modified": True}
+        if status == 200:
+            return response
+        logger.warning(f"Rules sync failed: {status} - {response}")
+        return None
+
     # =========================================================================
     # Learning Loop Feedback
     # =========================================================================
@@ -627,7 +707,7 @@ class CentralCommandClient:
         """
         try:
             session = await self._get_session()
-            async with session.get(url) as response:
+            async with session.get(url, headers=self._headers, ssl=self._ssl_context) as response:
                 if response.status == 200:
                     from pathlib import Path
                     Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
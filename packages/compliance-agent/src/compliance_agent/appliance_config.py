@@ -108,6 +108,60 @@ class ApplianceConfig(BaseModel):
         description="Windows servers to manage via WinRM"
     )
 
+    # Linux drift scanning
+    linux_scan_concurrency: int = Field(
+        default=8,
+        ge=1,
+        le=64,
+        description="Linux hosts scanned in parallel per drift cycle"
+    )
+
+    # Main-loop scheduler (see scheduler.py)
+    scheduler_max_concurrent: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="Non-critical agent tasks (scans, syncs) allowed to run at once"
+    )
+
+    scheduler_cpu_budget: float = Field(
+        default=0.8,
+        ge=0.0,
+        le=16.0,
+        description="Process CPU (fraction of one core) above which background tasks are deferred; 0 disables"
+    )
+
+    adaptive_scan_min_interval: int = Field(
+        default=60,
+        ge=10,
+        description="Rescan interval (seconds) for a host that just drifted"
+    )
+
+    adaptive_scan_max_interval: int = Field(
+        default=1800,
+        ge=60,
+        description="Longest rescan interval (seconds) a stable host backs off to"
+    )
+
+    # LAN peer artifact cache (see peer_cache.py)
+    peer_cache_enabled: bool = Field(
+        default=False,
+        description="Share update chunks with sibling appliances at the site"
+    )
+
+    peer_cache_max_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        ge=0,
+        description="Disk budget for cached artifact blobs (update chunks are served in place)"
+    )
+
+    peer_cache_wait_seconds: int = Field(
+        default=120,
+        ge=0,
+        le=3600,
+        description="How long to wait for the owning peer before falling back to the cloud"
+    )
+
     # Workstation Discovery (Active Directory)
     workstation_enabled: bool = Field(
         default=True,
@@ -0,0 +1,265 @@
+"""Content-addressed delta downloads for ISO updates.
+
+Central Command publishes a signed chunk manifest per release
+(backend update_manifest.py): the image split into fixed-size chunks,
+each named by its SHA-256, plus the whole-image size and SHA-256.
+
+The active A/B partition holds the previous release byte-for-byte, so
+most chunks of the new image are already on local disk. An update then
+costs:
+
+    1. index local sources (partial download, previous ISOs, active
+       partition) by chunk hash — local reads only
+    2. copy every chunk found locally into the new image
+    3. Range-fetch the rest, coalesced into runs, a few runs in parallel
+
+Every chunk is hashed as it is written and checked against the signed
+manifest, so the assembled image never needs a second full read to
+verify it. This module holds the manifest model and the local (disk)
+side; UpdateAgent.download_delta does the HTTP side.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = "osiris-chunks/v1"
+
+# Longest run of missing chunks fetched with one Range request.
+MAX_RANGE_CHUNKS = 16
+
+
+class ManifestError(Exception):
+    """Manifest is malformed, unsigned by a trusted key, or doesn't match."""
+
+
+def canonical_manifest_json(manifest: Dict[str, Any]) -> str:
+    """Must stay byte-identical to the backend's update_manifest version."""
+    return json.dumps(manifest, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass(frozen=True)
+class ChunkManifest:
+    """Verified chunk manifest for one release image."""
+
+    version: str
+    size_bytes: int
+    sha256: str
+    chunk_size: int
+    chunks: Tuple[str, ...]
+
+    @classmethod
+    def from_dict(cls, manifest: Dict[str, Any]) -> "ChunkManifest":
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ManifestError(f"Unsupported manifest format: {manifest.get('format')}")
+        try:
+            m = cls(
+                version=str(manifest["version"]),
+                size_bytes=int(manifest["size_bytes"]),
+                sha256=str(manifest["sha256"]).lower(),
+                chunk_size=int(manifest["chunk_size"]),
+                chunks=tuple(str(h).lower() for h in manifest["chunks"]),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ManifestError(f"Malformed manifest: {e}")
+        if m.chunk_size <= 0 or m.size_bytes < 0:
+            raise ManifestError("Malformed manifest: bad sizes")
+        expected_chunks = -(-m.size_bytes // m.chunk_size)
+        if len(m.chunks) != expected_chunks:
+            raise ManifestError(
+                f"Manifest lists {len(m.chunks)} chunks, size implies {expected_chunks}"
+            )
+        return m
+
+    @classmethod
+    def from_signed(
+        cls,
+        payload: Dict[str, Any],
+        trusted_keys: Sequence[str],
+    ) -> "ChunkManifest":
+        """Verify `payload["signature"]` against a pinned server key.
+
+        Keys embedded in the payload itself are ignored — trust comes only
+        from `trusted_keys` (delivered with checkin).
+        """
+        manifest = payload.get("manifest")
+        signature = payload.get("signature")
+        if not isinstance(manifest, dict) or not signature:
+            raise ManifestError("Manifest payload missing manifest or signature")
+        if not trusted_keys:
+            raise ManifestError("No trusted server keys to verify manifest")
+
+        from .crypto import Ed25519Verifier
+
+        try:
+            sig = bytes.fromhex(signature)
+        except ValueError:
+            raise ManifestError("Manifest signature is not hex")
+        data = canonical_manifest_json(manifest).encode()
+        for key_hex in trusted_keys:
+            try:
+                verifier = Ed25519Verifier(bytes.fromhex(key_hex))
+            except ValueError:
+                continue
+            if verifier.verify(data, sig):
+                return cls.from_dict(manifest)
+        raise ManifestError("Manifest signature does not verify against any trusted key")
+
+    def chunk_bounds(self, index: int) -> Tuple[int, int]:
+        """[start, end) byte offsets of chunk `index`."""
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.size_bytes)
+
+
+@dataclass
+class DeltaPlan:
+    """Where each chunk of the new image comes from."""
+
+    in_place: Set[int] = field(default_factory=set)          # already correct in the output
+    local: Dict[int, Tuple[Path, int]] = field(default_factory=dict)  # index -> (source, offset)
+    missing: List[int] = field(default_factory=list)
+
+    def fetch_ranges(self, max_run: int = MAX_RANGE_CHUNKS) -> List[Tuple[int, int]]:
+        """Missing chunks coalesced into (first_index, last_index) runs."""
+        runs: List[Tuple[int, int]] = []
+        for i in sorted(self.missing):
+            if runs and runs[-1][1] == i - 1 and i - runs[-1][0] < max_run:
+                runs[-1] = (runs[-1][0], i)
+            else:
+                runs.append((i, i))
+        return runs
+
+    def stats(self, manifest: ChunkManifest) -> Dict[str, int]:
+        def _bytes(indices: Iterable[int]) -> int:
+            return sum(e - s for s, e in map(manifest.chunk_bounds, indices))
+        return {
+            "chunks": len(manifest.chunks),
+            "reused_chunks": len(self.in_place) + len(self.local),
+            "fetched_chunks": len(self.missing),
+            "reused_bytes": _bytes(self.in_place) + _bytes(self.local),
+            "fetched_bytes": _bytes(self.missing),
+        }
+
+
+def _read_at(f, offset: int, length: int) -> bytes:
+    f.seek(offset)
+    return f.read(length)
+
+
+def index_source(
+    path: Path,
+    manifest: ChunkManifest,
+    wanted: Set[str],
+    limit_bytes: Optional[int] = None,
+) -> Dict[str, int]:
+    """Hash `path` in chunk_size blocks; {hash: offset} for wanted hashes.
+
+    Stops early once every wanted hash has been found. Unreadable
+    sources (missing device, permissions) index as empty.
+    """
+    found: Dict[str, int] = {}
+    if not wanted:
+        return found
+    cs = manifest.chunk_size
+    limit = limit_bytes if limit_bytes is not None else float("inf")
+    try:
+        with open(path, "rb") as f:
+            offset = 0
+            while offset < limit:
+                block = f.read(cs)
+                if not block:
+                    break
+                digest = hashlib.sha256(block).hexdigest()
+                if digest in wanted and digest not in found:
+                    found[digest] = offset
+                    if len(found) == len(wanted):
+                        break
+                offset += len(block)
+                # The final chunk of an image is short; try it at the
+                # same offset in case the source is the same image.
+                if len(block) < cs:
+                    break
+    except OSError as e:
+        logger.debug(f"Delta source {path} not indexed: {e}")
+    return found
+
+
+def plan_delta(
+    manifest: ChunkManifest,
+    output: Path,
+    sources: Sequence[Path],
+    source_limit_bytes: Optional[int] = None,
+) -> DeltaPlan:
+    """Decide, per chunk, whether it is in place, copyable, or missing."""
+    plan = DeltaPlan()
+
+    # A partial output from an interrupted attempt: keep chunks already
+    # correct at their own offset.
+    if output.exists():
+        try:
+            with open(output, "rb") as f:
+                for i, expected in enumerate(manifest.chunks):
+                    start, end = manifest.chunk_bounds(i)
+                    block = _read_at(f, start, end - start)
+                    if len(block) == end - start and hashlib.sha256(block).hexdigest() == expected:
+                        plan.in_place.add(i)
+        except OSError as e:
+            logger.debug(f"Partial delta output {output} unreadable: {e}")
+
+    wanted = {h for i, h in enumerate(manifest.chunks) if i not in plan.in_place}
+    located: Dict[str, Tuple[Path, int]] = {}
+    for source in sources:
+        remaining = wanted - located.keys()
+        if not remaining:
+            break
+        for digest, offset in index_source(source, manifest, remaining, source_limit_bytes).items():
+            located[digest] = (source, offset)
+
+    for i, digest in enumerate(manifest.chunks):
+        if i in plan.in_place:
+            continue
+        if digest in located:
+            plan.local[i] = located[digest]
+        else:
+            plan.missing.append(i)
+    return plan
+
+
+def copy_local_chunks(manifest: ChunkManifest, plan: DeltaPlan, output: Path) -> List[int]:
+    """Copy plan.local chunks into `output`, verifying each as written.
+
+    Returns the indices whose source changed since indexing; the caller
+    moves them to the fetch list.
+    """
+    failed: List[int] = []
+    handles: Dict[Path, Any] = {}
+    try:
+        with open(output, "r+b") as out:
+            for i, (source, offset) in sorted(plan.local.items()):
+                start, end = manifest.chunk_bounds(i)
+                if source not in handles:
+                    handles[source] = open(source, "rb")
+                block = _read_at(handles[source], offset, end - start)
+                if hashlib.sha256(block).hexdigest() != manifest.chunks[i]:
+                    failed.append(i)
+                    continue
+                out.seek(start)
+                out.write(block)
+    finally:
+        for h in handles.values():
+            h.close()
+    return failed
+
+
+def prepare_output(manifest: ChunkManifest, output: Path) -> None:
+    """Create/resize the output file to the image size (sparse)."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "ab"):
+        pass
+    os.truncate(output, manifest.size_bytes)
@@ -0,0 +1,241 @@
+"""
+Bounded, per-host coalescing work queue between Go-agent drift ingest
+and the healing engine.
+
+ReportDrift used to call the healing engine inline on the gRPC worker
+thread before yielding the ack, so one slow heal stalled that agent's
+whole stream (and, with a 10-thread pool, everyone else's). Ingest now
+acks first and hands failing checks to this queue; a fixed pool of
+asyncio workers on the agent's event loop drains it.
+
+Semantics:
+  - Keyed by (hostname, check_type). A newer event for a key that is
+    still pending replaces the older one ("coalesced") — a workstation
+    re-reporting the same failure every cycle heals once, with the
+    freshest payload. A passing event cancels a pending heal for its key.
+  - A key that is currently being healed is not started twice; a new
+    event for it waits in pending until the running heal finishes.
+  - Bounded by distinct pending keys. When full, NEW keys are dropped
+    and counted; existing keys still coalesce, so a flood of repeats
+    never drops anything.
+  - submit_threadsafe() can be called from gRPC worker threads; it hops
+    onto the queue's loop with call_soon_threadsafe.
+
+Metrics (stats()): ingest throughput, queue depth / in-flight, coalesced
+and dropped counts, heal outcomes and event-to-heal latency
+(enqueue -> heal finished) percentiles over the last 1024 heals.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_WORKERS = 8
+_LATENCY_SAMPLES = 1024
+_RATE_WINDOW_S = 60
+
+QueueKey = Tuple[str, str]
+
+
+class DriftHealingQueue:
+    """Coalescing async queue feeding drift events to a heal handler."""
+
+    def __init__(
+        self,
+        handler: Callable[[Any, float], Awaitable[bool]],
+        max_pending: int = DEFAULT_MAX_PENDING,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        """
+        Args:
+            handler: async (payload, enqueued_at_monotonic) -> success
+            max_pending: cap on distinct pending (host, check) keys
+            workers: concurrent heals
+        """
+        self.handler = handler
+        self.max_pending = max_pending
+        self.workers = workers
+
+        self._pending: "OrderedDict[QueueKey, Tuple[Any, float]]" = OrderedDict()
+        self._in_flight: Set[QueueKey] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list = []
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._counters: Dict[str, int] = {
+            "events_received": 0,
+            "enqueued": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+            "dropped": 0,
+            "healed": 0,
+            "heal_failed": 0,
+        }
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        # [second, events] buckets over the last _RATE_WINDOW_S seconds
+        self._rate: Deque[list] = deque()
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Bind to the running loop and start the worker pool."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"drift-heal-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            f"Drift healing queue started ({self.workers} workers, "
+            f"max {self.max_pending} pending)"
+        )
+
+    async def stop(self) -> None:
+        """Cancel workers. Pending events are discarded."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    # ------------------------------------------------------------------
+    # ingest
+    # ------------------------------------------------------------------
+
+    def submit_threadsafe(self, key: QueueKey, payload: Any, passed: bool = False) -> None:
+        """Submit from any thread. Never blocks on healing."""
+        enqueued_at = time.monotonic()
+        with self._stats_lock:
+            self._counters["events_received"] += 1
+            second = int(enqueued_at)
+            if self._rate and self._rate[-1][0] == second:
+                self._rate[-1][1] += 1
+            else:
+                self._rate.append([second, 1])
+                while self._rate[0][0] <= second - _RATE_WINDOW_S:
+                    self._rate.popleft()
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._submit(key, payload, passed, enqueued_at)
+        else:
+            loop.call_soon_threadsafe(self._submit, key, payload, passed, enqueued_at)
+
+    def _submit(self, key: QueueKey, payload: Any, passed: bool, enqueued_at: float) -> None:
+        """Loop-thread side of submit."""
+        if passed:
+            if self._pending.pop(key, None) is not None:
+                self._count("cancelled")
+            return
+
+        existing = self._pending.get(key)
+        if existing is not None:
+            # Keep the original enqueue time so latency reflects how long
+            # the drift has actually been waiting.
+            self._pending[key] = (payload, existing[1])
+            self._count("coalesced")
+            return
+
+        if len(self._pending) >= self.max_pending:
+            self._count("dropped")
+            logger.warning(
+                f"Drift healing queue full ({self.max_pending}), "
+                f"dropping {key[0]}/{key[1]}"
+            )
+            return
+
+        self._pending[key] = (payload, enqueued_at)
+        self._count("enqueued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # workers
+    # ------------------------------------------------------------------
+
+    def _take(self) -> Optional[Tuple[QueueKey, Any, float]]:
+        for key in self._pending:
+            if key not in self._in_flight:
+                payload, enqueued_at = self._pending.pop(key)
+                self._in_flight.add(key)
+                return key, payload, enqueued_at
+        return None
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            item = self._take()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, payload, enqueued_at = item
+            ok = False
+            try:
+                ok = bool(await self.handler(payload, enqueued_at))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Drift heal worker {index} error for {key[0]}/{key[1]}: {e}")
+            finally:
+                self._in_flight.discard(key)
+                with self._stats_lock:
+                    self._counters["healed" if ok else "heal_failed"] += 1
+                    self._latencies.append(time.monotonic() - enqueued_at)
+                # A newer event for this key may have arrived meanwhile.
+                if key in self._pending:
+                    self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # metrics
+    # ------------------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._counters[name] += 1
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._stats_lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+            recent = sum(n for sec, n in self._rate if sec > int(now) - _RATE_WINDOW_S)
+        window = min(_RATE_WINDOW_S, max(now - self._started_at, 1.0))
+
+        def pct(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        return {
+            **counters,
+            "queue_depth": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "max_pending": self.max_pending,
+            "workers": self.workers,
+            "events_per_second": round(recent / window, 2),
+            "heal_latency_p50_s": pct(0.50),
+            "heal_latency_p95_s": pct(0.95),
+            "heal_latency_max_s": round(latencies[-1], 4) if latencies else None,
+        }
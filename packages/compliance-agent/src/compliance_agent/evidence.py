@@ -457,6 +457,13 @@ class EvidenceGenerator:
             f"Stored evidence bundle {bundle.bundle_id} at {bundle_dir}"
         )
 
+        # Journal for WORM upload (sync_pending picks it up if not uploaded now)
+        if self._worm_uploader:
+            try:
+                self._worm_uploader.enqueue_bundle(bundle_path, signature_path)
+            except Exception as e:
+                logger.error(f"WORM journal error: {e}")
+
         # Upload to WORM storage if enabled
         worm_uri = None
         if upload_to_worm and self._worm_uploader and self.config.worm_auto_upload:
@@ -742,7 +749,7 @@ class EvidenceGenerator:
 
         Args:
             max_concurrency: Maximum parallel uploads (default: from config)
-            batch_size: Number of bundles per batch (default: from config)
+            batch_size: Maximum concurrent uploads (default: from config)
 
         Returns:
             Dict with sync results (uploaded, failed, pending)
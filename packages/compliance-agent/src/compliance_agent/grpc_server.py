@@ -13,11 +13,15 @@ The server provides:
 
 import asyncio
 import logging
+import threading
+import time
 import uuid
 from concurrent import futures
 from datetime import datetime, timezone
 from typing import Dict, Optional, Any
 
+from .drift_queue import DriftHealingQueue
+
 logger = logging.getLogger(__name__)
 
 # Try to import grpc - it's optional
@@ -48,65 +52,98 @@ class AgentState:
 
 
 class AgentRegistry:
-    """Registry of connected Go agents with command queue support."""
+    """Registry of connected Go agents with command queue support.
+
+    Thread-safe: gRPC handlers run on worker threads (sync server) or the
+    event loop (aio streaming), while heal commands are queued from the
+    appliance agent loop. Every read-modify-write goes through one lock.
+    """
 
     def __init__(self):
         self.agents: Dict[str, AgentState] = {}
         self._hostname_index: Dict[str, str] = {}  # hostname_lower -> agent_id
         self._config_version = 1
+        self._lock = threading.RLock()
+        # Set by serve()/serve_sync() so stats can report ingest metrics.
+        self.drift_queue: Optional[DriftHealingQueue] = None
 
     def register(self, state: AgentState):
         """Register an agent."""
-        self.agents[state.agent_id] = state
-        self._hostname_index[state.hostname_lower] = state.agent_id
+        with self._lock:
+            self.agents[state.agent_id] = state
+            self._hostname_index[state.hostname_lower] = state.agent_id
         logger.info(f"Registered Go agent {state.agent_id} ({state.hostname})")
 
     def unregister(self, agent_id: str):
         """Unregister an agent."""
-        if agent_id in self.agents:
-            hostname = self.agents[agent_id].hostname
-            hostname_lower = self.agents[agent_id].hostname_lower
-            if hostname_lower in self._hostname_index:
-                del self._hostname_index[hostname_lower]
-            del self.agents[agent_id]
-            logger.info(f"Unregistered Go agent {agent_id} ({hostname})")
+        with self._lock:
+            agent = self.agents.pop(agent_id, None)
+            if agent is None:
+                return
+            if self._hostname_index.get(agent.hostname_lower) == agent_id:
+                del self._hostname_index[agent.hostname_lower]
+        logger.info(f"Unregistered Go agent {agent_id} ({agent.hostname})")
 
     def get_connected_count(self) -> int:
         """Get count of connected agents."""
-        return len(self.agents)
+        with self._lock:
+            return len(self.agents)
 
     def get_agent(self, agent_id: str) -> Optional[AgentState]:
         """Get agent state by ID."""
-        return self.agents.get(agent_id)
+        with self._lock:
+            return self.agents.get(agent_id)
 
     def get_agent_by_hostname(self, hostname: str) -> Optional[AgentState]:
         """Get agent state by hostname (case-insensitive)."""
-        agent_id = self._hostname_index.get(hostname.lower())
-        if agent_id:
-            return self.agents.get(agent_id)
-        return None
+        with self._lock:
+            agent_id = self._hostname_index.get(hostname.lower())
+            if agent_id:
+                return self.agents.get(agent_id)
+            return None
 
     def has_agent_for_host(self, hostname: str) -> bool:
         """Check if a Go agent is connected for the given hostname."""
-        return hostname.lower() in self._hostname_index
+        with self._lock:
+            return hostname.lower() in self._hostname_index
+
+    def touch(self, agent_id: str, drift_events: int = 0) -> Optional[AgentState]:
+        """Update last_heartbeat (and drift_count) atomically."""
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent:
+                agent.drift_count += drift_events
+                agent.last_heartbeat = datetime.now(timezone.utc)
+            return agent
+
+    def set_rmm_agents(self, agent_id: str, rmm_agents: list) -> None:
+        """Record RMM detection results for an agent."""
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent:
+                agent.rmm_agents = rmm_agents
+                agent.last_heartbeat = datetime.now(timezone.utc)
 
     def queue_heal_command(self, hostname: str, command: Any) -> bool:
         """Queue a heal command for an agent. Returns True if agent found."""
-        agent = self.get_agent_by_hostname(hostname)
+        with self._lock:
+            agent = self.get_agent_by_hostname(hostname)
+            if agent:
+                agent.pending_commands.append(command)
         if agent:
-            agent.pending_commands.append(command)
             logger.info(f"Queued heal command {command.command_id} for {hostname}")
             return True
         return False
 
     def pop_pending_commands(self, agent_id: str) -> list:
         """Get and clear pending commands for an agent."""
-        agent = self.agents.get(agent_id)
-        if agent and agent.pending_commands:
-            commands = agent.pending_commands
-            agent.pending_commands = []
-            return commands
-        return []
+        with self._lock:
+            agent = self.agents.get(agent_id)
+            if agent and agent.pending_commands:
+                commands = agent.pending_commands
+                agent.pending_commands = []
+                return commands
+            return []
 
     def config_version_changed(self, agent_id: str) -> bool:
         """Check if config version changed since agent registered."""
@@ -115,7 +152,8 @@ class AgentRegistry:
 
     def get_all_agents(self) -> list:
         """Get list of all agent states."""
-        return list(self.agents.values())
+        with self._lock:
+            return list(self.agents.values())
 
 
 if GRPC_AVAILABLE:
@@ -134,12 +172,16 @@ if GRPC_AVAILABLE:
             healing_engine=None,
             config=None,
             agent_ca=None,
+            drift_queue: Optional[DriftHealingQueue] = None,
         ):
             self.registry = agent_registry
             self.mcp_client = mcp_client
             self.healing_engine = healing_engine
             self.config = config
             self.agent_ca = agent_ca
+            # Async healing queue (see drift_queue.py). None = legacy
+            # inline healing, only used when no event loop is available.
+            self.drift_queue = drift_queue
 
         def Register(self, request, context):
             """Handle agent registration and optional certificate enrollment."""
@@ -215,46 +257,60 @@ if GRPC_AVAILABLE:
         }
 
         def ReportDrift(self, request_iterator, context):
-            """Handle streaming drift events from agent."""
+            """Handle streaming drift events from agent (ack-first)."""
             for event in request_iterator:
-                logger.info(
-                    f"Go agent drift: {event.hostname}/{event.check_type} "
-                    f"passed={event.passed}"
-                )
-
-                # Update agent stats
-                agent = self.registry.get_agent(event.agent_id)
-                if agent:
-                    agent.drift_count += 1
-                    agent.last_heartbeat = datetime.now(timezone.utc)
-
-                # Build heal command for immediate execution (if applicable)
-                heal_command = None
-                if not event.passed and event.check_type in self.GO_AGENT_HEAL_MAP:
-                    heal_spec = self.GO_AGENT_HEAL_MAP[event.check_type]
-                    command_id = f"drift-heal-{uuid.uuid4().hex[:12]}"
-                    heal_command = compliance_pb2.HealCommand(
-                        command_id=command_id,
-                        check_type=event.check_type,
-                        action=heal_spec["action"],
-                        params={},
-                        timeout_seconds=heal_spec["timeout"],
-                    )
-                    logger.info(
-                        f"Immediate heal command for {event.hostname}: "
-                        f"{event.check_type}/{heal_spec['action']} (id={command_id})"
-                    )
+                yield self._ingest_drift(event)
+
+        def _ingest_drift(self, event):
+            """
+            Ingest one drift event and build its ack.
+
+            Only cheap work happens here: registry touch, the optional
+            immediate heal command, and a non-blocking hand-off of failing
+            checks to the healing queue. Healing never delays the ack.
+            """
+            logger.debug(
+                f"Go agent drift: {event.hostname}/{event.check_type} "
+                f"passed={event.passed}"
+            )
 
-                # Also route failed checks to healing engine for tracking/evidence
-                if not event.passed:
-                    self._route_drift_to_healing_sync(event)
+            # Update agent stats
+            self.registry.touch(event.agent_id, drift_events=1)
+
+            # Build heal command for immediate execution (if applicable)
+            heal_command = None
+            if not event.passed and event.check_type in self.GO_AGENT_HEAL_MAP:
+                heal_spec = self.GO_AGENT_HEAL_MAP[event.check_type]
+                command_id = f"drift-heal-{uuid.uuid4().hex[:12]}"
+                heal_command = compliance_pb2.HealCommand(
+                    command_id=command_id,
+                    check_type=event.check_type,
+                    action=heal_spec["action"],
+                    params={},
+                    timeout_seconds=heal_spec["timeout"],
+                )
+                logger.debug(
+                    f"Immediate heal command for {event.hostname}: "
+                    f"{event.check_type}/{heal_spec['action']} (id={command_id})"
+                )
 
-                # Acknowledge receipt with optional immediate heal command
-                yield compliance_pb2.DriftAck(
-                    event_id=f"{event.agent_id}-{event.timestamp}",
-                    received=True,
-                    heal_command=heal_command,  # Go agent executes immediately if set
+            # Also route failed checks to healing engine for tracking/evidence.
+            # Passing checks cancel a still-pending heal for the same key.
+            if self.drift_queue is not None:
+                self.drift_queue.submit_threadsafe(
+                    (event.hostname.lower(), event.check_type),
+                    event,
+                    passed=event.passed,
                 )
+            elif not event.passed:
+                self._route_drift_to_healing_sync(event)
+
+            # Acknowledge receipt with optional immediate heal command
+            return compliance_pb2.DriftAck(
+                event_id=f"{event.agent_id}-{event.timestamp}",
+                received=True,
+                heal_command=heal_command,  # Go agent executes immediately if set
+            )
 
         def ReportHealing(self, request, context):
             """Handle healing results from SELF_HEAL tier agents."""
@@ -274,9 +330,7 @@ if GRPC_AVAILABLE:
 
         def Heartbeat(self, request, context):
             """Handle agent heartbeats and deliver pending commands."""
-            agent = self.registry.get_agent(request.agent_id)
-            if agent:
-                agent.last_heartbeat = datetime.now(timezone.utc)
+            if self.registry.touch(request.agent_id):
                 logger.debug(f"Heartbeat from {request.agent_id}")
 
             # Check if config changed (triggers re-registration)
@@ -310,15 +364,67 @@ if GRPC_AVAILABLE:
                 )
 
             # Update agent state
-            agent = self.registry.get_agent(request.agent_id)
-            if agent:
-                agent.rmm_agents = list(request.detected_agents)
-                agent.last_heartbeat = datetime.now(timezone.utc)
+            self.registry.set_rmm_agents(
+                request.agent_id, list(request.detected_agents)
+            )
 
             return compliance_pb2.RMMAck(received=True)
 
+        def _build_incident(self, event):
+            """Map a Go agent drift event to a healing Incident."""
+            from .incident_db import Incident
+
+            # Map Go agent check types to L1 rule check types
+            check_type_map = {
+                "defender": "windows_defender",  # Go sends 'defender', L1 expects 'windows_defender'
+                "firewall": "firewall_status",   # L1-FIREWALL-002 uses 'firewall_status'
+                "screenlock": "screen_lock",     # Go sends 'screenlock', L1 expects 'screen_lock'
+                "patches": "patching",           # Go sends 'patches', L1 expects 'patching'
+            }
+            mapped_check_type = check_type_map.get(event.check_type, event.check_type)
+
+            return Incident(
+                id=f"GO-{uuid.uuid4().hex[:12]}",
+                site_id=self.config.site_id if self.config else "unknown",
+                host_id=event.hostname,
+                incident_type=mapped_check_type,
+                severity="high" if event.hipaa_control else "medium",
+                raw_data={
+                    "check_type": mapped_check_type,
+                    "original_check_type": event.check_type,  # Keep original for debugging
+                    "status": "fail",  # L1 rules require status field
+                    "drift_detected": True,
+                    "go_agent": True,
+                    "platform": "windows",  # CRITICAL: L1 rules use platform for Windows vs NixOS
+                    "expected": event.expected,
+                    "actual": event.actual,
+                    **dict(event.metadata),
+                },
+                created_at=datetime.now(timezone.utc).isoformat(),
+                pattern_signature=f"go_agent:{event.check_type}:{event.hostname}",
+            )
+
+        async def heal_queued_drift(self, event, enqueued_at: float) -> bool:
+            """DriftHealingQueue handler: heal one (coalesced) drift event."""
+            if not self.healing_engine:
+                logger.warning(
+                    f"Healing not configured - Go agent drift from "
+                    f"{event.hostname} not processed"
+                )
+                return False
+            ok = await self._async_heal(self._build_incident(event))
+            logger.debug(
+                f"Go agent drift {event.hostname}/{event.check_type} healed "
+                f"{time.monotonic() - enqueued_at:.2f}s after ingest"
+            )
+            return ok
+
         def _route_drift_to_healing_sync(self, event) -> None:
-            """Route drift event through existing healing pipeline (sync wrapper)."""
+            """Route drift event through existing healing pipeline (sync wrapper).
+
+            Legacy inline path, used only when the servicer has no drift
+            queue (no event loop to run one on).
+            """
             if not self.healing_engine:
                 logger.warning(
                     f"Healing not configured - Go agent drift from "
@@ -327,37 +433,7 @@ if GRPC_AVAILABLE:
                 return
 
             try:
-                from .incident_db import Incident
-
-                # Map Go agent check types to L1 rule check types
-                check_type_map = {
-                    "defender": "windows_defender",  # Go sends 'defender', L1 expects 'windows_defender'
-                    "firewall": "firewall_status",   # L1-FIREWALL-002 uses 'firewall_status'
-                    "screenlock": "screen_lock",     # Go sends 'screenlock', L1 expects 'screen_lock'
-                    "patches": "patching",           # Go sends 'patches', L1 expects 'patching'
-                }
-                mapped_check_type = check_type_map.get(event.check_type, event.check_type)
-
-                incident = Incident(
-                    id=f"GO-{uuid.uuid4().hex[:12]}",
-                    site_id=self.config.site_id if self.config else "unknown",
-                    host_id=event.hostname,
-                    incident_type=mapped_check_type,
-                    severity="high" if event.hipaa_control else "medium",
-                    raw_data={
-                        "check_type": mapped_check_type,
-                        "original_check_type": event.check_type,  # Keep original for debugging
-                        "status": "fail",  # L1 rules require status field
-                        "drift_detected": True,
-                        "go_agent": True,
-                        "platform": "windows",  # CRITICAL: L1 rules use platform for Windows vs NixOS
-                        "expected": event.expected,
-                        "actual": event.actual,
-                        **dict(event.metadata),
-                    },
-                    created_at=datetime.now(timezone.utc).isoformat(),
-                    pattern_signature=f"go_agent:{event.check_type}:{event.hostname}",
-                )
+                incident = self._build_incident(event)
 
                 # Run healing in a new event loop (gRPC runs in thread pool)
                 try:
@@ -374,8 +450,8 @@ if GRPC_AVAILABLE:
             except Exception as e:
                 logger.error(f"Error routing Go agent drift to healing: {e}")
 
-        async def _async_heal(self, incident) -> None:
-            """Run healing asynchronously."""
+        async def _async_heal(self, incident) -> bool:
+            """Run healing asynchronously. Returns True on success."""
             try:
                 result = await self.healing_engine.heal(
                     site_id=incident.site_id,
@@ -389,17 +465,18 @@ if GRPC_AVAILABLE:
                         f"Healed Go agent drift: {incident.host_id}/{incident.incident_type} "
                         f"via {getattr(result, 'runbook_id', 'unknown')}"
                     )
-                else:
-                    reason = (
-                        getattr(result, 'reason', 'Unknown error')
-                        if result else 'No result'
-                    )
-                    logger.warning(
-                        f"Healing failed for Go agent drift: "
-                        f"{incident.host_id}/{incident.incident_type} - {reason}"
-                    )
+                    return True
+                reason = (
+                    getattr(result, 'reason', 'Unknown error')
+                    if result else 'No result'
+                )
+                logger.warning(
+                    f"Healing failed for Go agent drift: "
+                    f"{incident.host_id}/{incident.incident_type} - {reason}"
+                )
             except Exception as e:
                 logger.error(f"Async healing error: {e}")
+            return False
 
         def _handle_artifacts_sync(self, result) -> None:
             """Handle artifacts like BitLocker recovery keys."""
@@ -409,6 +486,20 @@ if GRPC_AVAILABLE:
                 )
                 # TODO: Store via existing BitLocker key backup infrastructure
 
+    class AsyncComplianceAgentServicer(ComplianceAgentServicer):
+        """Servicer for the grpc.aio server.
+
+        ReportDrift is an async generator, so each open agent stream is a
+        coroutine on the event loop instead of a pinned executor thread —
+        thousands of workstations can stream concurrently. Unary methods
+        stay sync and run on the server's executor.
+        """
+
+        async def ReportDrift(self, request_iterator, context):
+            """Handle streaming drift events from agent (ack-first)."""
+            async for event in request_iterator:
+                yield self._ingest_drift(event)
+
 else:
     # Stub when gRPC is not available
     class ComplianceAgentServicer:
@@ -416,6 +507,8 @@ else:
         def __init__(self, *args, **kwargs):
             pass
 
+    AsyncComplianceAgentServicer = ComplianceAgentServicer
+
 
 def _load_tls_credentials(
     tls_cert_file: Optional[str] = None,
@@ -481,6 +574,15 @@ def serve_sync(
         agent_ca=agent_ca,
     )
 
+    # Healing runs on its own loop thread so stream threads only ack.
+    heal_loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=heal_loop.run_forever, name="drift-heal-loop", daemon=True,
+    ).start()
+    servicer.drift_queue = DriftHealingQueue(servicer.heal_queued_drift)
+    asyncio.run_coroutine_threadsafe(servicer.drift_queue.start(), heal_loop).result()
+    agent_registry.drift_queue = servicer.drift_queue
+
     # Register the servicer with the server
     compliance_pb2_grpc.add_ComplianceAgentServicer_to_server(servicer, server)
 
@@ -519,13 +621,16 @@ async def serve(
 
     server = aio.server(futures.ThreadPoolExecutor(max_workers=10))
 
-    servicer = ComplianceAgentServicer(
+    servicer = AsyncComplianceAgentServicer(
         agent_registry,
         mcp_client,
         healing_engine,
         config,
         agent_ca=agent_ca,
     )
+    servicer.drift_queue = DriftHealingQueue(servicer.heal_queued_drift)
+    await servicer.drift_queue.start()
+    agent_registry.drift_queue = servicer.drift_queue
 
     # Register the servicer with the server
     compliance_pb2_grpc.add_ComplianceAgentServicer_to_server(servicer, server)
@@ -544,7 +649,10 @@ async def serve(
         logger.warning("gRPC server starting without agent_ca — certificate enrollment disabled")
 
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await servicer.drift_queue.stop()
 
 
 def get_grpc_stats(registry: AgentRegistry) -> Dict[str, Any]:
@@ -565,8 +673,11 @@ def get_grpc_stats(registry: AgentRegistry) -> Dict[str, Any]:
             "rmm_agents": len(agent.rmm_agents),
         })
 
-    return {
+    stats = {
         "grpc_available": GRPC_AVAILABLE,
         "connected_agents": len(agents),
         "agents": agents,
     }
+    if registry.drift_queue is not None:
+        stats["drift_ingest"] = registry.drift_queue.stats()
+    return stats
@@ -18,6 +18,7 @@ from typing import Dict, Any, Optional, Tuple
 
 import aiohttp
 
+from .http_transport import close_transport, shared_session
 logger = logging.getLogger(__name__)
 
 # Configuration constants
@@ -174,7 +175,7 @@ def mark_current_as_good():
 async def check_network(api_base_url: str) -> Dict[str, Any]:
     """Check network connectivity to Central Command."""
     try:
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.get(
                 f"{api_base_url}/health",
                 timeout=aiohttp.ClientTimeout(total=10),
@@ -277,7 +278,7 @@ async def report_status(
         payload["health_check_result"] = health_check_result
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.post(
                 url,
                 headers={
@@ -410,6 +411,14 @@ async def run_health_gate() -> int:
             return 1
 
 
+async def _closing_transport(coro):
+    """Run `coro`, then close the pooled HTTP session before the loop ends."""
+    try:
+        return await coro
+    finally:
+        await close_transport()
+
+
 def main() -> int:
     """CLI entry point for health gate."""
     import argparse
@@ -470,10 +479,10 @@ def main() -> int:
                 print(f"  {name}: {status}{extra}")
             return 0 if passed else 1
 
-        return asyncio.run(run_checks())
+        return asyncio.run(_closing_transport(run_checks()))
 
     # Default: run health gate
-    return asyncio.run(run_health_gate())
+    return asyncio.run(_closing_transport(run_health_gate()))
 
 
 if __name__ == "__main__":
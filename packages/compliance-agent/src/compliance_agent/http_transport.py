@@ -0,0 +1,436 @@
+"""
+Shared HTTP transport for outbound agent traffic.
+
+Every client in the agent used to open its own aiohttp.ClientSession per
+call or per cycle, paying DNS + TCP + TLS again on each checkin, evidence
+submission and sync. This module keeps one pooled session per process:
+
+- keep-alive connections (per-request `ssl=` contexts get their own pool
+  slots, so mTLS and API-key traffic share the session safely)
+- identical in-flight GETs are coalesced into one request
+- one retry policy: exponential backoff with full jitter, honoring
+  Retry-After on 429/503; a non-idempotent request that may have reached
+  the server is never resent (no duplicate incidents / escalations)
+- optional gzip request bodies (Central Command decompresses them in
+  request_decompression.py)
+- per-endpoint latency / byte / error counters (stats())
+
+aiohttp speaks HTTP/1.1 only; with long-lived keep-alive connections the
+handshake savings HTTP/2 would add are already realised.
+
+Usage:
+    transport = get_transport()
+    resp = await transport.request("POST", url, json=payload, compress=True)
+
+    async with shared_session() as session:   # streaming / custom handling
+        async with session.get(url) as resp:
+            ...
+"""
+
+import asyncio
+import gzip
+import json as jsonlib
+import logging
+import random
+import re
+import ssl as ssllib
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this aren't worth compressing.
+GZIP_MIN_BYTES = 1024
+
+# Statuses where the server refused without processing: safe to retry
+# any method. The rest are only retried for idempotent methods.
+RETRY_ANY_METHOD = {429, 503}
+RETRY_IDEMPOTENT = {500, 502, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[A-Za-z0-9_.:-]{8,}$")
+
+
+@dataclass
+class TransportResponse:
+    """A fully-read response (safe to share between coalesced callers)."""
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    url: str = ""
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body)
+
+
+@dataclass
+class EndpointMetrics:
+    """Counters for one `METHOD host/path` endpoint."""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    coalesced: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_status: Optional[int] = None
+    recent_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
+
+    def record(self, elapsed_ms: float, sent: int, received: int, status: Optional[int]) -> None:
+        self.requests += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_status = status
+        self.recent_ms.append(elapsed_ms)
+        if status is None or status >= 500:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_ms)
+
+        def _pct(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "p50_ms": _pct(0.50),
+            "p95_ms": _pct(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "last_status": self.last_status,
+        }
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """`METHOD host/path` with id-like path segments collapsed to :id."""
+    parts = urlsplit(url)
+    path = "/".join(
+        ":id" if _ID_SEGMENT.match(seg) else seg
+        for seg in parts.path.split("/")
+    )
+    return f"{method.upper()} {parts.netloc}{path}"
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def encode_body(
+    json: Any = None,
+    data: Union[bytes, str, None] = None,
+    compress: bool = False,
+) -> Tuple[Optional[bytes], Dict[str, str]]:
+    """Serialise a request body; gzip it when asked and worthwhile."""
+    headers: Dict[str, str] = {}
+    if json is not None:
+        body: Optional[bytes] = jsonlib.dumps(json).encode()
+        headers["Content-Type"] = "application/json"
+    elif isinstance(data, str):
+        body = data.encode()
+    else:
+        body = data
+    if compress and body is not None and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class HttpTransport:
+    """
+    Pooled aiohttp session plus retry, coalescing and metrics.
+
+    One instance per process (get_transport()); safe to share across
+    tasks on the same event loop.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 60.0,
+        dns_ttl: int = 300,
+        user_agent: Optional[str] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.user_agent = user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._default_ssl = _secure_ssl_context()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The pooled session (created on first use, re-created if closed)."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                ssl=self._default_ssl,
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            headers = {"User-Agent": self.user_agent} if self.user_agent else None
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                # No total cap at session level: streaming users (ISO
+                # downloads) run for minutes. request() applies self.timeout.
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120),
+                headers=headers,
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff; Retry-After is a floor."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _metrics_for(self, label: str) -> EndpointMetrics:
+        metrics = self._metrics.get(label)
+        if metrics is None:
+            metrics = self._metrics[label] = EndpointMetrics()
+        return metrics
+
+    def record(self, label: str, elapsed_ms: float, sent: int, received: int,
+               status: Optional[int]) -> None:
+        """Record a request made outside request() (streaming downloads)."""
+        self._metrics_for(label).record(elapsed_ms, sent, received, status)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {label: m.to_dict() for label, m in sorted(self._metrics.items())}
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        data: Union[bytes, str, None] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Mapping[str, str]] = None,
+        compress: bool = False,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        ssl: Optional[ssllib.SSLContext] = None,
+        endpoint: Optional[str] = None,
+    ) -> TransportResponse:
+        """
+        Send a request with the shared retry policy and return the read response.
+
+        Failures to connect are retried for every method; timeouts and
+        mid-request disconnects only for idempotent methods, since a
+        POST may already have been processed. 429/503 are retried for
+        every method (Retry-After honored); 500/502/504 only for
+        idempotent methods. After the last attempt a retryable status is
+        returned to the caller, a connection error is raised.
+
+        Raises:
+            aiohttp.ClientError / asyncio.TimeoutError when every attempt
+            failed without a response.
+        """
+        method = method.upper()
+        label = endpoint or endpoint_label(method, url)
+
+        if method == "GET" and json is None and data is None:
+            key = (url, tuple(sorted((params or {}).items())),
+                   tuple(sorted((headers or {}).items())), id(ssl))
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self._metrics_for(label).coalesced += 1
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise
+                    # The leading caller was cancelled, not us: go ourselves
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                resp = await self._send(method, url, None, {}, headers, params,
+                                        timeout, max_retries, ssl, label)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # mark retrieved if nobody else waits
+                raise
+            else:
+                future.set_result(resp)
+                return resp
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        body, body_headers = encode_body(json, data, compress)
+        return await self._send(method, url, body, body_headers, headers, params,
+                                timeout, max_retries, ssl, label)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        body_headers: Dict[str, str],
+        headers: Optional[Mapping[str, str]],
+        params: Optional[Mapping[str, str]],
+        timeout: Optional[float],
+        max_retries: Optional[int],
+        ssl: Optional[ssllib.SSLContext],
+        label: str,
+    ) -> TransportResponse:
+        session = await self.session()
+        retries = self.max_retries if max_retries is None else max_retries
+        merged = dict(headers or {})
+        merged.update(body_headers)
+        kwargs: Dict[str, Any] = {"headers": merged, "params": params, "data": body}
+        kwargs["timeout"] = aiohttp.ClientTimeout(
+            total=self.timeout if timeout is None else timeout
+        )
+        if ssl is not None:
+            kwargs["ssl"] = ssl
+        metrics = self._metrics_for(label)
+        sent = len(body) if body else 0
+
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                async with session.request(method, url, **kwargs) as resp:
+                    payload = await resp.read()
+                    result = TransportResponse(
+                        status=resp.status,
+                        headers=dict(resp.headers),
+                        body=payload,
+                        url=str(resp.url),
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.record((time.monotonic() - start) * 1000, sent, 0, None)
+                # Only a failed connect proves the request never left.
+                resendable = (
+                    method in IDEMPOTENT_METHODS
+                    or isinstance(e, aiohttp.ClientConnectorError)
+                )
+                if not resendable or attempt >= retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(
+                    f"{label} failed (attempt {attempt + 1}/{retries + 1}): {e!r}; "
+                    f"retrying in {delay:.1f}s"
+                )
+            else:
+                metrics.record((time.monotonic() - start) * 1000, sent, len(payload), result.status)
+                retryable = result.status in RETRY_ANY_METHOD or (
+                    result.status in RETRY_IDEMPOTENT and method in IDEMPOTENT_METHODS
+                )
+                if not retryable or attempt >= retries:
+                    return result
+                retry_after = retry_after_seconds(result.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.backoff_max:
+                    # Server wants us gone longer than we'd block a caller
+                    return result
+                delay = self.backoff_delay(attempt, retry_after)
+                logger.warning(
+                    f"{label} returned {result.status} (attempt {attempt + 1}/{retries + 1}); "
+                    f"retrying in {delay:.1f}s"
+                )
+            metrics.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+def _secure_ssl_context() -> ssllib.SSLContext:
+    """TLS 1.2+ with verification (same policy as appliance_client)."""
+    ctx = ssllib.create_default_context()
+    ctx.minimum_version = ssllib.TLSVersion.TLSv1_2
+    ctx.check_hostname = True
+    ctx.verify_mode = ssllib.CERT_REQUIRED
+    return ctx
+
+
+# Process-wide transport
+_transport: Optional[HttpTransport] = None
+
+
+def get_transport() -> HttpTransport:
+    """The process-wide transport (created on first use)."""
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport()
+    return _transport
+
+
+def configure_transport(transport: Optional[HttpTransport]) -> None:
+    """Install a transport with non-default settings (None resets)."""
+    global _transport
+    _transport = transport
+
+
+async def close_transport() -> None:
+    """Close the pooled session (agent shutdown)."""
+    if _transport is not None:
+        await _transport.close()
+
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Drop-in for `async with aiohttp.ClientSession() as session:`.
+
+    Yields the pooled session; it stays open on exit.
+    """
+    yield await get_transport().session()
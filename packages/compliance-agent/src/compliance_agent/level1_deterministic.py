@@ -258,12 +258,18 @@ class DeterministicEngine:
         self.action_executor = action_executor
         self.rules: List[Rule] = []
         self.cooldowns: Dict[str, datetime] = {}  # rule_id:host_id -> last_execution
+        # Synced JSON file -> rules it contributed, and the server
+        # bundle_version it holds (for delta sync).
+        self._synced_rules: Dict[str, List[Rule]] = {}
+        self.synced_bundle_versions: Dict[str, str] = {}
 
         self._load_rules()
 
     def _load_rules(self):
         """Load all rules from built-in defaults, bundled rules, and custom directory."""
         self.rules = []
+        self._synced_rules = {}
+        self.synced_bundle_versions = {}
 
         # Load built-in rules
         self._load_builtin_rules()
@@ -344,7 +350,7 @@ class DeterministicEngine:
             # Single rule
             self.rules.append(Rule.from_yaml(data, source="custom"))
 
-    def _load_synced_json_rules(self, path: Path):
+    def _load_synced_json_rules(self, path: Path, delta: Optional[Dict[str, Any]] = None):
         """
         Load rules from a synced JSON file (from Central Command).
 
@@ -353,29 +359,112 @@ class DeterministicEngine:
         - Different field names
 
         Synced rules get priority 5 to override built-in rules (priority 10).
+
+        Re-loading a file replaces the rules it contributed before. With
+        `delta` (an /agent/sync delta payload) the delta is merged into
+        the rules already loaded from `path` instead: only upserted rules
+        are parsed, removed ones are dropped, the merged set is written
+        back to `path`, and nothing else in the engine is reloaded. The
+        delta's base_version must match the version loaded from `path`;
+        otherwise ValueError is raised and the caller should fetch the
+        full set.
         """
+        key = str(path)
+        if delta is not None:
+            self._apply_synced_delta(path, delta)
+            return
+
         with open(path) as f:
             data = json.load(f)
 
         if isinstance(data, list):
             # Array of rules (standard sync format)
-            for rule_data in data:
-                try:
-                    rule = Rule.from_synced_json(rule_data)
-                    self.rules.append(rule)
-                    logger.debug(f"Loaded synced rule: {rule.id} -> {rule.action}")
-                except Exception as e:
-                    logger.warning(f"Failed to parse synced rule {rule_data.get('id', 'unknown')}: {e}")
+            rule_list = data
         elif isinstance(data, dict) and "rules" in data:
             # Wrapped format with 'rules' key
-            for rule_data in data["rules"]:
-                try:
-                    rule = Rule.from_synced_json(rule_data)
-                    self.rules.append(rule)
-                except Exception as e:
-                    logger.warning(f"Failed to parse synced rule: {e}")
+            rule_list = data["rules"]
+        else:
+            rule_list = []
 
-        logger.info(f"Loaded {len(data) if isinstance(data, list) else 0} synced rules from {path.name}")
+        loaded: List[Rule] = []
+        for rule_data in rule_list:
+            try:
+                rule = Rule.from_synced_json(rule_data)
+                loaded.append(rule)
+                logger.debug(f"Loaded synced rule: {rule.id} -> {rule.action}")
+            except Exception as e:
+                logger.warning(f"Failed to parse synced rule {rule_data.get('id', 'unknown')}: {e}")
+
+        self._replace_synced_rules(key, loaded)
+        if isinstance(data, dict) and data.get("bundle_version"):
+            self.synced_bundle_versions[key] = data["bundle_version"]
+        else:
+            self.synced_bundle_versions.pop(key, None)
+
+        logger.info(f"Loaded {len(loaded)} synced rules from {path.name}")
+
+    def _apply_synced_delta(self, path: Path, delta: Dict[str, Any]):
+        """Merge an /agent/sync delta into `path` and the loaded rules."""
+        key = str(path)
+        base_version = delta.get("base_version")
+        if not base_version or self.synced_bundle_versions.get(key) != base_version:
+            raise ValueError(
+                f"delta base {base_version} does not match held "
+                f"{self.synced_bundle_versions.get(key)} for {path.name}"
+            )
+
+        with open(path) as f:
+            data = json.load(f)
+        raw = {r["id"]: r for r in data.get("rules", [])}
+        loaded = {r.id: r for r in self._synced_rules.get(key, [])}
+
+        changes = delta.get("delta", {})
+        for rule_id in changes.get("remove", []):
+            raw.pop(rule_id, None)
+            loaded.pop(rule_id, None)
+        for rule_data in changes.get("upsert", []):
+            raw[rule_data["id"]] = rule_data
+            try:
+                loaded[rule_data["id"]] = Rule.from_synced_json(rule_data)
+            except Exception as e:
+                loaded.pop(rule_data["id"], None)
+                logger.warning(f"Failed to parse synced rule {rule_data.get('id', 'unknown')}: {e}")
+
+        order = changes.get("order") or list(raw)
+        if set(order) != set(raw):
+            raise ValueError(f"delta order does not cover merged rules for {path.name}")
+
+        merged = {
+            "bundle_version": delta["bundle_version"],
+            "healing_tier": delta.get("healing_tier"),
+            "rules": [raw[rule_id] for rule_id in order],
+        }
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(merged, f, indent=2)
+        tmp.replace(path)
+
+        self._replace_synced_rules(key, [loaded[r] for r in order if r in loaded])
+        self.synced_bundle_versions[key] = delta["bundle_version"]
+        logger.info(
+            f"Applied synced rule delta to {path.name}: "
+            f"+{len(changes.get('upsert', []))} -{len(changes.get('remove', []))} "
+            f"-> {delta['bundle_version']}"
+        )
+
+    def _replace_synced_rules(self, key: str, new_rules: List[Rule]):
+        """Swap the rules a synced file contributed, keeping their slot."""
+        old = {id(r) for r in self._synced_rules.get(key, [])}
+        insert_at = next(
+            (i for i, r in enumerate(self.rules) if id(r) in old), len(self.rules)
+        )
+        self.rules = [r for r in self.rules if id(r) not in old]
+        insert_at = min(insert_at, len(self.rules))
+        self.rules[insert_at:insert_at] = new_rules
+        # Stable sort: equal-priority order is unchanged, so this is
+        # harmless mid-_load_rules and keeps delta applies ordered.
+        self.rules.sort(key=lambda r: r.priority)
+        self._synced_rules[key] = new_rules
 
     def _load_builtin_rules(self):
         """Load built-in default rules."""
@@ -1023,6 +1112,14 @@ class DeterministicEngine:
         """Reload rules from disk."""
         self._load_rules()
 
+    def load_synced_rules(self, path: Path, delta: Optional[Dict[str, Any]] = None):
+        """(Re)load one synced JSON file, or merge a delta into it."""
+        self._load_synced_json_rules(path, delta=delta)
+
+    def synced_rule_count(self, path: Path) -> int:
+        """Number of rules currently loaded from a synced JSON file."""
+        return len(self._synced_rules.get(str(path), []))
+
     def add_promoted_rule(self, rule: Rule):
         """Add a rule promoted from Level 2."""
         rule.source = "promoted"
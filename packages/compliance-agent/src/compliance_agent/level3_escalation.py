@@ -18,6 +18,7 @@ from enum import Enum
 
 import aiohttp
 
+from .http_transport import shared_session
 from .incident_db import (
     IncidentDatabase, Incident,
     ResolutionLevel, IncidentOutcome
@@ -270,7 +271,7 @@ class EscalationHandler:
             headers["X-API-Key"] = self.config.api_key
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(url, json=payload, headers=headers, timeout=30) as resp:
                     if resp.status in (200, 201):
                         result = await resp.json()
@@ -489,7 +490,7 @@ This incident may affect the following HIPAA controls:
             })
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(
                     self.config.slack_webhook_url,
                     json=message
@@ -536,7 +537,7 @@ This incident may affect the following HIPAA controls:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(
                     "https://events.pagerduty.com/v2/enqueue",
                     json=payload
@@ -573,7 +574,7 @@ This incident may affect the following HIPAA controls:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(
                     self.config.teams_webhook_url,
                     json=card
@@ -609,7 +610,7 @@ This incident may affect the following HIPAA controls:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(
                     self.config.webhook_url,
                     json=payload
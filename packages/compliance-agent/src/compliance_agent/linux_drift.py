@@ -17,6 +17,7 @@ import logging
 import hashlib
 import json
 import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
@@ -29,6 +30,9 @@ from .runbooks.linux.runbooks import RUNBOOKS, get_runbook, get_l1_runbooks, get
 
 logger = logging.getLogger(__name__)
 
+# Hosts scanned concurrently by detect_all()
+DEFAULT_MAX_CONCURRENT_HOSTS = 8
+
 
 @dataclass
 class DriftResult:
@@ -100,7 +104,8 @@ class LinuxDriftDetector:
         self,
         targets: Optional[List[LinuxTarget]] = None,
         baseline_path: Optional[str] = None,
-        executor: Optional[LinuxExecutor] = None
+        executor: Optional[LinuxExecutor] = None,
+        max_concurrent_hosts: int = DEFAULT_MAX_CONCURRENT_HOSTS
     ):
         """
         Initialize detector.
@@ -109,14 +114,20 @@ class LinuxDriftDetector:
             targets: List of Linux targets to monitor
             baseline_path: Path to linux_baseline.yaml
             executor: Optional pre-configured executor
+            max_concurrent_hosts: Hosts scanned in parallel by detect_all()
         """
         self.targets = targets or []
         self.executor = executor or LinuxExecutor(targets)
         self.baseline = self._load_baseline(baseline_path)
+        self.max_concurrent_hosts = max(1, max_concurrent_hosts)
 
         # Track detection history for evidence
         self._detection_history: List[DriftResult] = []
 
+        # Per-host timing of the last detect_all() (surfaced in get_drift_summary)
+        self._host_timings: Dict[str, Dict[str, Any]] = {}
+        self._last_scan_seconds: Optional[float] = None
+
     def _load_baseline(self, path: Optional[str] = None) -> Dict[str, Any]:
         """Load baseline configuration from YAML."""
         if path is None:
@@ -152,39 +163,69 @@ class LinuxDriftDetector:
         self.targets = [t for t in self.targets if t.hostname != hostname]
         self.executor.remove_target(hostname)
 
-    async def detect_all(self, on_result=None) -> List[DriftResult]:
+    async def detect_all(
+        self, on_result=None, targets: Optional[List[LinuxTarget]] = None
+    ) -> List[DriftResult]:
         """
-        Run all detection checks on all targets.
+        Run all detection checks on all targets (or the given subset).
+
+        Hosts are scanned concurrently, up to max_concurrent_hosts at a
+        time; results are returned in target order.
 
         Args:
             on_result: Optional callback invoked with each DriftResult as
                        soon as it's available (enables incremental healing).
+            targets: Hosts to scan this pass (default: every target). The
+                     agent passes only hosts whose adaptive interval is due.
 
         Returns:
             List of DriftResult for each check on each target
         """
-        all_results = []
-
-        for target in self.targets:
-            try:
-                results = await self.detect_host(target, on_result=on_result)
-                all_results.extend(results)
-            except Exception as e:
-                logger.error(f"Detection failed for {target.hostname}: {e}")
-                # Add a failure result
-                err_result = DriftResult(
-                    target=target.hostname,
-                    runbook_id="DETECT-ERROR",
-                    check_type="connectivity",
-                    severity="critical",
-                    compliant=False,
-                    drift_description=f"Detection failed: {e}",
-                    raw_output="",
-                    hipaa_controls=[],
-                )
-                all_results.append(err_result)
-                if on_result:
-                    on_result(err_result)
+        semaphore = asyncio.Semaphore(self.max_concurrent_hosts)
+        scan_start = time.monotonic()
+        timings: Dict[str, Dict[str, Any]] = {}
+
+        async def _scan(target: LinuxTarget) -> List[DriftResult]:
+            async with semaphore:
+                host_start = time.monotonic()
+                try:
+                    results = await self.detect_host(target, on_result=on_result)
+                except Exception as e:
+                    logger.error(f"Detection failed for {target.hostname}: {e}")
+                    # Add a failure result
+                    err_result = DriftResult(
+                        target=target.hostname,
+                        runbook_id="DETECT-ERROR",
+                        check_type="connectivity",
+                        severity="critical",
+                        compliant=False,
+                        drift_description=f"Detection failed: {e}",
+                        raw_output="",
+                        hipaa_controls=[],
+                    )
+                    results = [err_result]
+                    if on_result:
+                        on_result(err_result)
+                timings[target.hostname] = {
+                    "duration_seconds": round(time.monotonic() - host_start, 3),
+                    "checks": len(results),
+                    "drifted": sum(1 for r in results if not r.compliant),
+                }
+                return results
+
+        scan_targets = list(self.targets if targets is None else targets)
+        per_host = await asyncio.gather(*(_scan(t) for t in scan_targets))
+        all_results = [r for results in per_host for r in results]
+
+        if targets is None:
+            self._host_timings = timings
+        else:
+            self._host_timings.update(timings)
+        self._last_scan_seconds = round(time.monotonic() - scan_start, 3)
+        logger.info(
+            f"Linux drift scan: {len(timings)} hosts, {len(all_results)} checks "
+            f"in {self._last_scan_seconds}s (concurrency {self.max_concurrent_hosts})"
+        )
 
         # Store for evidence
         self._detection_history.extend(all_results)
@@ -195,6 +236,9 @@ class LinuxDriftDetector:
         """
         Run all detection checks on a single host.
 
+        All enabled detect scripts go to the host in one batched exec
+        (LinuxExecutor.run_detect_batch).
+
         Args:
             target: Linux target to check
             on_result: Optional callback invoked with each DriftResult immediately
@@ -224,72 +268,79 @@ class LinuxDriftDetector:
 
         # Get runbooks filtered by baseline
         enabled_checks = self._get_enabled_checks()
+        runbook_ids = [
+            runbook_id for runbook_id, runbook in RUNBOOKS.items()
+            if runbook.check_type in enabled_checks
+        ]
 
-        for runbook_id, runbook in RUNBOOKS.items():
-            # Skip if check type is disabled in baseline
-            if runbook.check_type not in enabled_checks:
-                continue
-
-            try:
-                exec_results = await self.executor.run_runbook(
-                    target,
-                    runbook_id,
-                    phases=["detect"]
-                )
-
-                if not exec_results:
+        try:
+            exec_map = await self.executor.run_detect_batch(target, runbook_ids)
+        except Exception as e:
+            logger.error(f"Batched detection failed on {target.hostname}: {e}")
+            exec_map = {}
+            batch_error = e
+        else:
+            batch_error = None
+
+        for runbook_id in runbook_ids:
+            runbook = RUNBOOKS[runbook_id]
+            exec_result = exec_map.get(runbook_id)
+            if exec_result is None:
+                if batch_error is None:
                     continue
-
-                exec_result = exec_results[0]
-
-                # Parse result
-                stdout = exec_result.output.get("stdout", "")
-                compliant = "COMPLIANT" in stdout or exec_result.success
-
-                drift_desc = ""
-                if not compliant:
-                    # Extract drift description from output
-                    if "DRIFT:" in stdout:
-                        drift_desc = stdout.split("DRIFT:")[1].strip().split("\n")[0]
-                    else:
-                        drift_desc = stdout.strip()[:200] or "Non-compliant state detected"
-
                 result = DriftResult(
-                    target=target.hostname,
-                    runbook_id=runbook_id,
-                    check_type=runbook.check_type,
-                    severity=runbook.severity,
-                    compliant=compliant,
-                    drift_description=drift_desc,
-                    raw_output=stdout,
-                    hipaa_controls=runbook.hipaa_controls,
-                    distro=distro,
-                    l1_eligible=runbook.l1_auto_heal,
-                    l2_eligible=runbook.l2_llm_eligible and not runbook.l1_auto_heal,
-                )
-                results.append(result)
-                if on_result:
-                    on_result(result)
-
-            except Exception as e:
-                logger.error(f"Check {runbook_id} failed on {target.hostname}: {e}")
-                err_result = DriftResult(
                     target=target.hostname,
                     runbook_id=runbook_id,
                     check_type=runbook.check_type,
                     severity=runbook.severity,
                     compliant=False,
-                    drift_description=f"Check failed: {e}",
+                    drift_description=f"Check failed: {batch_error}",
                     raw_output="",
                     hipaa_controls=runbook.hipaa_controls,
                     distro=distro,
                 )
-                results.append(err_result)
-                if on_result:
-                    on_result(err_result)
+            else:
+                result = self._to_drift_result(target, runbook_id, runbook, exec_result, distro)
+            results.append(result)
+            if on_result:
+                on_result(result)
 
         return results
 
+    @staticmethod
+    def _to_drift_result(
+        target: LinuxTarget,
+        runbook_id: str,
+        runbook: Any,
+        exec_result: LinuxExecutionResult,
+        distro: str,
+    ) -> DriftResult:
+        """Turn a detect-phase execution result into a DriftResult."""
+        stdout = exec_result.output.get("stdout", "")
+        compliant = "COMPLIANT" in stdout or exec_result.success
+
+        drift_desc = ""
+        if not compliant:
+            # Extract drift description from output
+            if "DRIFT:" in stdout:
+                drift_desc = stdout.split("DRIFT:")[1].strip().split("\n")[0]
+            else:
+                drift_desc = stdout.strip()[:200] or "Non-compliant state detected"
+
+        return DriftResult(
+            target=target.hostname,
+            runbook_id=runbook_id,
+            check_type=runbook.check_type,
+            severity=runbook.severity,
+            compliant=compliant,
+            drift_description=drift_desc,
+            raw_output=stdout,
+            hipaa_controls=runbook.hipaa_controls,
+            distro=distro,
+            l1_eligible=runbook.l1_auto_heal,
+            l2_eligible=runbook.l2_llm_eligible and not runbook.l1_auto_heal,
+        )
+
     def _get_enabled_checks(self) -> set:
         """Get set of enabled check types from baseline."""
         enabled = set()
@@ -320,37 +371,37 @@ class LinuxDriftDetector:
         results = []
         distro = await self.executor.detect_distro(target)
 
-        for runbook_id, runbook in RUNBOOKS.items():
-            if runbook.check_type != category:
-                continue
-
-            try:
-                exec_results = await self.executor.run_runbook(
-                    target,
-                    runbook_id,
-                    phases=["detect"]
-                )
+        runbook_ids = [
+            runbook_id for runbook_id, runbook in RUNBOOKS.items()
+            if runbook.check_type == category
+        ]
+        try:
+            exec_map = await self.executor.run_detect_batch(target, runbook_ids)
+        except Exception as e:
+            logger.error(f"Category {category} detection failed: {e}")
+            return results
 
-                if exec_results:
-                    exec_result = exec_results[0]
-                    stdout = exec_result.output.get("stdout", "")
-                    compliant = "COMPLIANT" in stdout or exec_result.success
+        for runbook_id in runbook_ids:
+            exec_result = exec_map.get(runbook_id)
+            if exec_result is None:
+                continue
+            runbook = RUNBOOKS[runbook_id]
+            stdout = exec_result.output.get("stdout", "")
+            compliant = "COMPLIANT" in stdout or exec_result.success
 
-                    results.append(DriftResult(
-                        target=target.hostname,
-                        runbook_id=runbook_id,
-                        check_type=runbook.check_type,
-                        severity=runbook.severity,
-                        compliant=compliant,
-                        drift_description="" if compliant else stdout.strip()[:200],
-                        raw_output=stdout,
-                        hipaa_controls=runbook.hipaa_controls,
-                        distro=distro,
-                        l1_eligible=runbook.l1_auto_heal,
-                        l2_eligible=runbook.l2_llm_eligible,
-                    ))
-            except Exception as e:
-                logger.error(f"Check {runbook_id} failed: {e}")
+            results.append(DriftResult(
+                target=target.hostname,
+                runbook_id=runbook_id,
+                check_type=runbook.check_type,
+                severity=runbook.severity,
+                compliant=compliant,
+                drift_description="" if compliant else stdout.strip()[:200],
+                raw_output=stdout,
+                hipaa_controls=runbook.hipaa_controls,
+                distro=distro,
+                l1_eligible=runbook.l1_auto_heal,
+                l2_eligible=runbook.l2_llm_eligible,
+            ))
 
         return results
 
@@ -551,6 +602,8 @@ class LinuxDriftDetector:
                 "low": sum(1 for r in results if not r.compliant and r.severity == "low"),
             },
             "by_category": self._group_by_category(results),
+            "scan_duration_seconds": self._last_scan_seconds,
+            "hosts": dict(self._host_timings),
         }
 
     def _group_by_category(self, results: List[DriftResult]) -> Dict[str, Dict[str, int]]:
@@ -38,6 +38,8 @@ try:
 except ImportError:
     NACL_AVAILABLE = False
 
+from .http_transport import shared_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -290,7 +292,7 @@ class LocalRunbookCache:
             Sync result with counts
         """
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 # Fetch runbook manifest for this site
                 headers = {"X-API-Key": api_key}
                 url = f"{api_url}/api/sites/{site_id}/runbooks?tier={tier}"
@@ -441,7 +443,7 @@ class LocalFrameworkCache:
             frameworks: List of framework IDs to sync
         """
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key}
                 synced = []
                 failed = []
@@ -618,7 +620,7 @@ class EvidenceQueue:
         failed = 0
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {
                     "X-API-Key": api_key,
                     "Content-Type": "application/json",
@@ -802,7 +804,7 @@ class DelegatedSigningKey:
             return False
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
                 url = f"{api_url}/api/appliances/{appliance_id}/delegate-key"
 
@@ -1143,7 +1145,7 @@ class UrgentCloudRetry:
     ) -> bool:
         """Try to escalate a single incident to cloud."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
 
                 # Determine endpoint based on priority
@@ -1384,7 +1386,7 @@ class OfflineAuditTrail:
         failed = 0
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
 
                 # Batch upload
@@ -1574,7 +1576,7 @@ class SMSAlerter:
             message = message[:1597] + "..."
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 url = f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json"
                 auth = aiohttp.BasicAuth(self.account_sid, self.auth_token)
 
@@ -1985,7 +1987,7 @@ class PredictiveRunbookCache:
         failed = 0
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key}
 
                 for pred in predictions[:10]:  # Cache top 10
@@ -2315,7 +2317,7 @@ class LocalMetricsAggregator:
         summary = self.get_summary(24)  # Last 24 hours
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
                 url = f"{api_url}/api/sites/{site_id}/metrics"
 
@@ -2608,7 +2610,7 @@ class SiteConfigManager:
     async def sync_from_cloud(self, api_url: str, site_id: str, api_key: str) -> bool:
         """Sync site configuration from Central Command."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {"X-API-Key": api_key}
                 url = f"{api_url}/api/sites/{site_id}/compliance-config"
 
@@ -35,6 +35,8 @@ import json
 
 import aiohttp
 
+from .http_transport import get_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -168,14 +170,16 @@ class OTSClient:
             self.config.proof_dir.mkdir(parents=True, exist_ok=True)
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.config.timeout_seconds)
-            self._session = aiohttp.ClientSession(timeout=timeout)
-        return self._session
+        """An injected session if set, else the process-wide pooled one."""
+        if self._session is not None and not self._session.closed:
+            return self._session
+        return await get_transport().session()
+
+    def _timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.config.timeout_seconds)
 
     async def close(self):
-        """Close HTTP session."""
+        """Close an injected HTTP session (the pooled one is process-wide)."""
         if self._session and not self._session.closed:
             await self._session.close()
 
@@ -312,7 +316,9 @@ class OTSClient:
             "User-Agent": "OsirisCare-Compliance-Agent/1.0",
         }
 
-        async with session.post(url, data=hash_bytes, headers=headers) as resp:
+        async with session.post(
+            url, data=hash_bytes, headers=headers, timeout=self._timeout()
+        ) as resp:
             if resp.status == 200:
                 proof_bytes = await resp.read()
 
@@ -386,7 +392,7 @@ class OTSClient:
         upgrade_url = f"{proof.calendar_url}/timestamp/{proof.bundle_hash}"
 
         try:
-            async with session.get(upgrade_url) as resp:
+            async with session.get(upgrade_url, timeout=self._timeout()) as resp:
                 if resp.status == 200:
                     upgraded_bytes = await resp.read()
 
@@ -497,7 +503,8 @@ class OTSClient:
             try:
                 session = await self._get_session()
                 async with session.get(
-                    f"https://blockstream.info/api/block-height/{proof.bitcoin_block}"
+                    f"https://blockstream.info/api/block-height/{proof.bitcoin_block}",
+                    timeout=self._timeout(),
                 ) as resp:
                     if resp.status == 200:
                         block_hash = await resp.text()
@@ -0,0 +1,352 @@
+"""
+LAN peer artifact cache - share update chunks across a site.
+
+On multi-appliance sites every appliance used to pull the same ISO
+from Central Command. With the peer cache enabled
+(peer_cache_enabled), artifacts are addressed by SHA-256 and assigned to
+an owner appliance on the same consistent-hash ring the Go daemon uses
+for scan targets (appliance/internal/daemon/mesh.go):
+
+- the owner of a digest fetches it from the cloud and keeps it
+- every other appliance asks the owner over the LAN first, and only
+  falls back to the cloud when the owner doesn't have it in time
+
+So cloud egress and uplink use scale per site instead of per appliance.
+
+Nothing fetched from a peer is trusted: callers pass the digest from a
+manifest they obtained from Central Command (the signed ISO chunk
+manifest), and bytes that don't hash to it are
+discarded. Peers serve from GET /peer/artifacts/{sha256} on the sensor
+API port.
+
+Peer membership comes from the `mesh_peers` list in the checkin
+response (sibling appliances seen online in the last 5 minutes).
+
+Runbooks stay on the direct path: the server's runbook manifest carries
+no content hash a peer's bytes could be verified against.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from fastapi import APIRouter, HTTPException, Response
+
+from .http_transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+RING_REPLICAS = 64  # virtual nodes per appliance, same as mesh.go
+PEER_REQUEST_TIMEOUT = 15  # seconds, per artifact
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def normalize_mac(mac: str) -> str:
+    """Ring node id: upper-case MAC without separators (mesh.go normalizeMACForRing)."""
+    return mac.replace(":", "").replace("-", "").upper()
+
+
+def _hash_key(key: str) -> int:
+    return struct.unpack(">I", hashlib.sha256(key.encode()).digest()[:4])[0]
+
+
+class ArtifactRing:
+    """Consistent-hash ring over appliance MACs, compatible with mesh.go HashRing."""
+
+    def __init__(self, macs: Iterable[str] = ()):
+        self._nodes = sorted({normalize_mac(m) for m in macs if m})
+        entries = sorted(
+            (_hash_key(f"{mac}:{i}"), mac)
+            for mac in self._nodes
+            for i in range(RING_REPLICAS)
+        )
+        self._hashes = [h for h, _ in entries]
+        self._macs = [m for _, m in entries]
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        idx = bisect.bisect_left(self._hashes, _hash_key(key))
+        if idx >= len(self._hashes):
+            idx = 0  # wrap around
+        return self._macs[idx]
+
+
+class ArtifactStore:
+    """Content-addressed blobs on disk plus extents inside larger files.
+
+    Blobs (whole artifacts) live at <dir>/<aa>/<sha256> and are evicted
+    least-recently-used past `max_bytes`. Extents point into files the
+    agent keeps anyway (an ISO being assembled, the standby partition)
+    so update chunks are shareable without a second copy on disk. Every
+    read is re-hashed; a stale extent or corrupt blob is dropped.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._extents: Dict[str, Tuple[Path, int, int]] = {}
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Verified bytes for `digest`, or None."""
+        digest = digest.lower()
+        path = self._blob_path(digest)
+        if path.exists():
+            try:
+                data = path.read_bytes()
+            except OSError:
+                data = b""
+            if hashlib.sha256(data).hexdigest() == digest:
+                os.utime(path)  # LRU
+                return data
+            path.unlink(missing_ok=True)
+
+        extent = self._extents.get(digest)
+        if extent:
+            src, offset, length = extent
+            try:
+                with open(src, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(length)
+            except OSError:
+                data = b""
+            if hashlib.sha256(data).hexdigest() == digest:
+                return data
+            del self._extents[digest]
+        return None
+
+    def has(self, digest: str) -> bool:
+        digest = digest.lower()
+        return digest in self._extents or self._blob_path(digest).exists()
+
+    def put(self, digest: str, data: bytes) -> bool:
+        """Store `data` if it hashes to `digest`."""
+        digest = digest.lower()
+        if hashlib.sha256(data).hexdigest() != digest:
+            return False
+        path = self._blob_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        self._evict()
+        return True
+
+    def add_extent(self, digest: str, path: Path, offset: int, length: int) -> None:
+        self._extents[digest.lower()] = (path, offset, length)
+
+    def move_extents(self, old: Path, new: Path) -> None:
+        """Re-point extents after a rename or a dd to another device."""
+        for digest, (src, offset, length) in list(self._extents.items()):
+            if src == old:
+                self._extents[digest] = (new, offset, length)
+
+    def drop_extents(self, path: Path) -> None:
+        self._extents = {d: e for d, e in self._extents.items() if e[0] != path}
+
+    def _evict(self) -> None:
+        blobs = []
+        total = 0
+        for path in self.cache_dir.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            blobs.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(blobs):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class PeerCache:
+    """Ring membership, the local store, and peer/cloud fetch policy."""
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        self_mac: str,
+        port: int,
+        wait_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+    ):
+        self.store = store
+        self.self_mac = normalize_mac(self_mac)
+        self.port = port
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self._peer_ips: Dict[str, str] = {}
+        self.ring = ArtifactRing([self.self_mac])
+        self._stats = {
+            "local_hits": 0,
+            "peer_hits": 0,
+            "peer_misses": 0,
+            "cloud_fetches": 0,
+            "bytes_from_peers": 0,
+            "bytes_from_cloud": 0,
+            "served": 0,
+            "bytes_served": 0,
+        }
+
+    def update_peers(self, mesh_peers: List[Dict]) -> None:
+        """Apply the checkin's mesh_peers ([{"mac", "ips"}, ...])."""
+        peers = {}
+        for peer in mesh_peers or []:
+            mac = normalize_mac(peer.get("mac") or "")
+            ips = peer.get("ips") or []
+            if mac and ips and mac != self.self_mac:
+                peers[mac] = ips[0]
+        if peers != self._peer_ips:
+            self._peer_ips = peers
+            self.ring = ArtifactRing([self.self_mac, *peers])
+            logger.info(f"Peer cache ring: {len(self.ring.nodes)} appliance(s)")
+
+    def owner_ip(self, digest: str) -> Optional[str]:
+        """LAN address of the digest's owner, or None if we own it."""
+        owner = self.ring.owner(digest.lower())
+        if owner is None or owner == self.self_mac:
+            return None
+        return self._peer_ips.get(owner)
+
+    def owns(self, digest: str) -> bool:
+        return self.owner_ip(digest) is None
+
+    async def fetch_from_owner(
+        self,
+        session: aiohttp.ClientSession,
+        digest: str,
+    ) -> Optional[bytes]:
+        """One attempt at the owner; verified bytes or None."""
+        ip = self.owner_ip(digest)
+        if ip is None:
+            return None
+        url = f"http://{ip}:{self.port}/peer/artifacts/{digest.lower()}"
+        try:
+            async with session.get(
+                url, timeout=aiohttp.ClientTimeout(total=PEER_REQUEST_TIMEOUT)
+            ) as resp:
+                if resp.status != 200:
+                    return None
+                data = await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Peer {ip} fetch {digest[:12]} failed: {e}")
+            return None
+        if hashlib.sha256(data).hexdigest() != digest.lower():
+            logger.warning(f"Peer {ip} served bad content for {digest[:12]}")
+            return None
+        return data
+
+    async def fetch(
+        self,
+        digest: str,
+        cloud_fetch: Callable[[], Awaitable[Optional[bytes]]],
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Optional[bytes]:
+        """Local store, then the owner peer (waiting up to wait_seconds), then cloud.
+
+        Whatever source answers, the bytes must hash to `digest`; they
+        are kept in the local store so this appliance can serve them too.
+        """
+        digest = digest.lower()
+        data = self.store.get(digest)
+        if data is not None:
+            self._stats["local_hits"] += 1
+            return data
+
+        if not self.owns(digest):
+            if session is None:
+                session = await get_transport().session()
+            deadline = time.monotonic() + self.wait_seconds
+            while True:
+                data = await self.fetch_from_owner(session, digest)
+                if data is not None or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(self.poll_interval)
+            if data is not None:
+                self._stats["peer_hits"] += 1
+                self._stats["bytes_from_peers"] += len(data)
+                self.store.put(digest, data)
+                return data
+            self._stats["peer_misses"] += 1
+
+        data = await cloud_fetch()
+        if data is None or hashlib.sha256(data).hexdigest() != digest:
+            return None
+        self._stats["cloud_fetches"] += 1
+        self._stats["bytes_from_cloud"] += len(data)
+        self.store.put(digest, data)
+        return data
+
+    def record_peer_hit(self, nbytes: int) -> None:
+        self._stats["peer_hits"] += 1
+        self._stats["bytes_from_peers"] += nbytes
+
+    def record_cloud_fetch(self, nbytes: int) -> None:
+        self._stats["cloud_fetches"] += 1
+        self._stats["bytes_from_cloud"] += nbytes
+
+    def record_served(self, nbytes: int) -> None:
+        self._stats["served"] += 1
+        self._stats["bytes_served"] += nbytes
+
+    def stats(self) -> Dict:
+        return dict(self._stats, ring_size=len(self.ring.nodes), peers=len(self._peer_ips))
+
+
+# =============================================================================
+# API Router (mounted on the sensor API server)
+# =============================================================================
+
+router = APIRouter(prefix="/peer", tags=["peer-cache"])
+
+# Set by the appliance agent when peer_cache_enabled
+_peer_cache: Optional[PeerCache] = None
+
+
+def configure_peer_cache(cache: Optional[PeerCache]) -> None:
+    """Install the cache served to LAN peers (None disables serving)."""
+    global _peer_cache
+    _peer_cache = cache
+
+
+@router.get("/artifacts/{digest}")
+async def get_artifact(digest: str):
+    """Serve a cached artifact by SHA-256 to a sibling appliance."""
+    if _peer_cache is None:
+        raise HTTPException(status_code=404, detail="Peer cache disabled")
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest.lower()):
+        raise HTTPException(status_code=400, detail="Invalid digest")
+    data = await asyncio.to_thread(_peer_cache.store.get, digest)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Not cached")
+    _peer_cache.record_served(len(data))
+    return Response(content=data, media_type="application/octet-stream")
+
+
+@router.get("/stats")
+async def get_peer_cache_stats():
+    """Hit/miss and byte counters by source (local, peers, cloud)."""
+    if _peer_cache is None:
+        return {"enabled": False}
+    return dict(_peer_cache.stats(), enabled=True)
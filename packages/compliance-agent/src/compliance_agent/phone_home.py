@@ -15,6 +15,7 @@ from typing import Dict, Any, List, Optional
 import aiohttp
 
 from .config import AgentConfig
+from .http_transport import get_transport
 from .portal_controls import PortalControlChecker, ControlResult
 from .drift import DriftDetector
 
@@ -198,26 +199,24 @@ class PhoneHome:
             True if successful, False otherwise
         """
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.portal_url,
-                    json=snapshot,
-                    headers={
-                        "Content-Type": "application/json",
-                        "User-Agent": f"compliance-agent/{self.config.site_id}"
-                    }
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.debug(f"Portal response: {result}")
-                        return True
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Portal returned {response.status}: {error_text}")
-                        self.stats["last_error"] = f"HTTP {response.status}: {error_text[:100]}"
-                        return False
+            response = await get_transport().request(
+                "POST",
+                self.portal_url,
+                json=snapshot,
+                headers={
+                    "User-Agent": f"compliance-agent/{self.config.site_id}"
+                },
+                compress=True,
+                timeout=30,
+            )
+            if response.status == 200:
+                logger.debug(f"Portal response: {response.json()}")
+                return True
+            else:
+                error_text = response.text()
+                logger.error(f"Portal returned {response.status}: {error_text}")
+                self.stats["last_error"] = f"HTTP {response.status}: {error_text[:100]}"
+                return False
 
         except aiohttp.ClientError as e:
             logger.error(f"Portal connection error: {e}")
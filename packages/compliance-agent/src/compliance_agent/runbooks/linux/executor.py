@@ -11,11 +11,14 @@ Features:
 - Evidence collection for compliance
 - Retry with exponential backoff
 - Timeout handling
+- Batched detection: every detect script for a host in one remote exec
 
 Version: 1.0
 """
 
 import asyncio
+import base64
+import binascii
 import logging
 import hashlib
 import json
@@ -31,6 +34,34 @@ logger = logging.getLogger(__name__)
 # Initialize PHI scrubber for output sanitization
 _phi_scrubber = PHIScrubber(hash_redacted=True)
 
+# Marker that starts each per-check record in batched detect output
+DETECT_RECORD_MARKER = "__MSP_DETECT__"
+
+# Remote driver for run_detect_batch(). Runs each detect script under
+# `timeout`, then prints one line per check:
+#   MARKER <runbook_id> <exit_code> <duration_ms> <b64 stdout> <b64 stderr>
+# Empty output is sent as "-" so the fields never shift.
+_DETECT_BATCH_PRELUDE = f"""
+set +e
+_msp_err=$(mktemp 2>/dev/null || echo /tmp/.msp_detect_err.$$)
+_msp_b64() {{ _v=$(base64 | tr -d '\\n'); echo "${{_v:--}}"; }}
+_msp_run() {{
+    _s=$(date +%s%N 2>/dev/null)
+    if command -v timeout >/dev/null 2>&1; then
+        _out=$(timeout "$2" bash -c "$(echo "$3" | base64 -d)" 2>"$_msp_err" </dev/null)
+    else
+        _out=$(bash -c "$(echo "$3" | base64 -d)" 2>"$_msp_err" </dev/null)
+    fi
+    _rc=$?
+    _e=$(date +%s%N 2>/dev/null)
+    case "$_s$_e" in
+        *[!0-9]*|"") _ms=0 ;;
+        *) _ms=$(( (_e - _s) / 1000000 )) ;;
+    esac
+    echo "{DETECT_RECORD_MARKER} $1 $_rc $_ms $(printf '%s' "$_out" | _msp_b64) $(_msp_b64 < "$_msp_err")"
+}}
+"""
+
 
 @dataclass
 class LinuxTarget:
@@ -102,6 +133,35 @@ class LinuxExecutionResult:
         }
 
 
+def _scrubbed_output(stdout: str, stderr: str, exit_code: int) -> Dict[str, Any]:
+    """PHI-scrub command output and build the standard output dict."""
+    stdout_scrubbed, stdout_result = _phi_scrubber.scrub(stdout)
+    stderr_scrubbed, stderr_result = _phi_scrubber.scrub(stderr)
+
+    if stdout_result.phi_scrubbed or stderr_result.phi_scrubbed:
+        logger.info(
+            f"PHI scrubbed from output: stdout={stdout_result.patterns_matched}, "
+            f"stderr={stderr_result.patterns_matched}"
+        )
+
+    output = {
+        "stdout": stdout_scrubbed,
+        "stderr": stderr_scrubbed,
+        "exit_code": exit_code,
+        "success": exit_code == 0,
+        "phi_scrubbed": stdout_result.phi_scrubbed or stderr_result.phi_scrubbed,
+    }
+
+    # Try to parse JSON from stdout (after scrubbing)
+    if output["stdout"]:
+        try:
+            output["parsed"] = json.loads(output["stdout"])
+        except json.JSONDecodeError:
+            output["parsed"] = None
+
+    return output
+
+
 class LinuxExecutor:
     """
     Execute Linux Bash runbooks via SSH.
@@ -121,7 +181,8 @@ class LinuxExecutor:
         self,
         targets: Optional[List[LinuxTarget]] = None,
         default_retries: int = 2,
-        retry_backoff: float = 1.5
+        retry_backoff: float = 1.5,
+        max_channels_per_host: int = 4
     ):
         """
         Initialize executor.
@@ -130,6 +191,8 @@ class LinuxExecutor:
             targets: List of Linux targets to manage
             default_retries: Default number of retry attempts
             retry_backoff: Multiplier for retry delay (exponential backoff)
+            max_channels_per_host: Concurrent SSH channels multiplexed on one
+                cached connection (keep under sshd MaxSessions, default 10)
         """
         self.targets: Dict[str, LinuxTarget] = {}
         if targets:
@@ -142,6 +205,8 @@ class LinuxExecutor:
         self._default_retries = default_retries
         self._retry_backoff = retry_backoff
         self._connection_max_age_seconds = 300  # Refresh after 5 minutes
+        self._connection_locks: Dict[str, asyncio.Lock] = {}
+        self._max_channels_per_host = max(1, max_channels_per_host)
 
     def add_target(self, target: LinuxTarget):
         """Add a Linux target."""
@@ -157,6 +222,9 @@ class LinuxExecutor:
         """
         Get or create SSH connection for target.
 
+        Serialized per host so concurrent callers share one connection and
+        multiplex their sessions over it instead of each dialing a new one.
+
         Args:
             target: Linux target configuration
             force_new: Force creation of new connection
@@ -164,6 +232,12 @@ class LinuxExecutor:
         Returns:
             asyncssh.SSHClientConnection object
         """
+        lock = self._connection_locks.setdefault(target.hostname, asyncio.Lock())
+        async with lock:
+            return await self._get_connection_locked(target, force_new)
+
+    async def _get_connection_locked(self, target: LinuxTarget, force_new: bool = False):
+        """_get_connection body; caller holds the per-host lock."""
         try:
             import asyncssh
         except ImportError:
@@ -300,7 +374,8 @@ class LinuxExecutor:
         timeout: int = 60,
         retries: int = 0,
         retry_delay: float = 5.0,
-        use_sudo: bool = False
+        use_sudo: bool = False,
+        scrub_output: bool = True
     ) -> LinuxExecutionResult:
         """
         Execute Bash script on target with retry support.
@@ -312,6 +387,8 @@ class LinuxExecutor:
             retries: Number of retry attempts on failure
             retry_delay: Initial delay between retries
             use_sudo: Wrap command with sudo
+            scrub_output: PHI-scrub stdout/stderr. Only False for callers
+                that decode and scrub the output themselves (batched detect)
 
         Returns:
             LinuxExecutionResult with script output
@@ -331,7 +408,6 @@ class LinuxExecutor:
 
                 # Wrap with sudo if needed and execute
                 # Use base64 encoding to avoid shell quoting issues
-                import base64
                 encoded_script = base64.b64encode(script.encode()).decode()
 
                 if use_sudo and target.username != "root":
@@ -360,30 +436,16 @@ class LinuxExecutor:
 
                 duration = (datetime.now(timezone.utc) - start_time).total_seconds()
 
-                # Scrub PHI/PII from output before processing
-                stdout_scrubbed, stdout_result = _phi_scrubber.scrub(result.stdout or "")
-                stderr_scrubbed, stderr_result = _phi_scrubber.scrub(result.stderr or "")
-
-                if stdout_result.phi_scrubbed or stderr_result.phi_scrubbed:
-                    logger.info(
-                        f"PHI scrubbed from output: stdout={stdout_result.patterns_matched}, "
-                        f"stderr={stderr_result.patterns_matched}"
-                    )
-
-                output = {
-                    "stdout": stdout_scrubbed,
-                    "stderr": stderr_scrubbed,
-                    "exit_code": result.exit_status,
-                    "success": result.exit_status == 0,
-                    "phi_scrubbed": stdout_result.phi_scrubbed or stderr_result.phi_scrubbed,
-                }
-
-                # Try to parse JSON from stdout (after scrubbing)
-                if output["stdout"]:
-                    try:
-                        output["parsed"] = json.loads(output["stdout"])
-                    except json.JSONDecodeError:
-                        output["parsed"] = None
+                if scrub_output:
+                    output = _scrubbed_output(result.stdout or "", result.stderr or "", result.exit_status)
+                else:
+                    output = {
+                        "stdout": result.stdout or "",
+                        "stderr": result.stderr or "",
+                        "exit_code": result.exit_status,
+                        "success": result.exit_status == 0,
+                        "phi_scrubbed": False,
+                    }
 
                 return LinuxExecutionResult(
                     success=result.exit_status == 0,
@@ -564,6 +626,146 @@ class LinuxExecutor:
 
         return results
 
+    async def run_detect_batch(
+        self,
+        target: LinuxTarget,
+        runbook_ids: List[str]
+    ) -> Dict[str, LinuxExecutionResult]:
+        """
+        Run the detect phase of many runbooks in one remote exec.
+
+        The detect scripts are shipped to the host together and run in
+        sequence, each under its own `timeout`. Each check gets its own
+        output record (see _DETECT_BATCH_PRELUDE), so a 20-check scan
+        costs one SSH exec instead of 20. This is the same approach the
+        Windows scanner takes with its batched PowerShell calls. Runbooks
+        that need sudo go in a second exec when the user is not root.
+
+        Any check whose record is missing (the batch failed, timed out or
+        was truncated) is re-run through run_runbook(). Those re-runs go
+        out concurrently as separate channels on the cached connection,
+        bounded by max_channels_per_host.
+
+        Args:
+            target: Linux target
+            runbook_ids: Runbooks whose detect phase to run
+
+        Returns:
+            Dict mapping runbook_id to its detect-phase result
+        """
+        from .runbooks import get_runbook
+
+        distro = await self.detect_distro(target)
+
+        results: Dict[str, LinuxExecutionResult] = {}
+        missing: List[str] = []
+
+        groups: Dict[bool, List[Tuple[str, Any]]] = {}
+        for runbook_id in runbook_ids:
+            runbook = get_runbook(runbook_id)
+            if not runbook:
+                # Same result run_runbook() gives an unknown id.
+                results[runbook_id] = LinuxExecutionResult(
+                    success=False,
+                    runbook_id=runbook_id,
+                    target=target.hostname,
+                    phase="init",
+                    output={},
+                    duration_seconds=0,
+                    error=f"Runbook not found: {runbook_id}"
+                )
+                continue
+            if not runbook.detect_script:
+                continue
+            use_sudo = runbook.requires_sudo and target.username != "root"
+            groups.setdefault(use_sudo, []).append((runbook_id, runbook))
+
+        for use_sudo, members in groups.items():
+            script = _DETECT_BATCH_PRELUDE + "\n".join(
+                f"_msp_run {runbook_id} {max(1, runbook.timeout_seconds)} "
+                f"{base64.b64encode(runbook.detect_script.encode()).decode()}"
+                for runbook_id, runbook in members
+            ) + '\nrm -f "$_msp_err"\n'
+            timeout = sum(max(1, runbook.timeout_seconds) for _, runbook in members) + 30
+
+            logger.info(
+                f"Executing {len(members)} detect checks on {target.hostname} "
+                f"({distro}) in one exec{' (sudo)' if use_sudo else ''}"
+            )
+            batch = await self.execute_script(
+                target,
+                script,
+                timeout=timeout,
+                retries=1,
+                use_sudo=use_sudo,
+                scrub_output=False
+            )
+            records = self._parse_detect_batch(batch.output.get("stdout", "")) if batch.output else {}
+            if not batch.success and not records:
+                logger.warning(
+                    f"Batched detect failed on {target.hostname}: {batch.error or batch.exit_code}, "
+                    f"falling back to per-check execution"
+                )
+
+            for runbook_id, runbook in members:
+                record = records.get(runbook_id)
+                if record is None:
+                    missing.append(runbook_id)
+                    continue
+                exit_code, duration_ms, stdout, stderr = record
+                results[runbook_id] = LinuxExecutionResult(
+                    success=exit_code == 0,
+                    runbook_id=runbook_id,
+                    target=target.hostname,
+                    phase="detect",
+                    output=_scrubbed_output(stdout, stderr, exit_code),
+                    duration_seconds=duration_ms / 1000.0,
+                    error=(
+                        f"Execution timed out after {runbook.timeout_seconds}s"
+                        if exit_code == 124 else None
+                    ),
+                    hipaa_controls=runbook.hipaa_controls,
+                    distro=distro,
+                    exit_code=exit_code
+                )
+
+        if missing:
+            semaphore = asyncio.Semaphore(self._max_channels_per_host)
+
+            async def _run_one(runbook_id: str):
+                async with semaphore:
+                    return runbook_id, await self.run_runbook(
+                        target, runbook_id, phases=["detect"]
+                    )
+
+            for runbook_id, exec_results in await asyncio.gather(
+                *(_run_one(runbook_id) for runbook_id in missing)
+            ):
+                if exec_results:
+                    results[runbook_id] = exec_results[0]
+
+        return results
+
+    @staticmethod
+    def _parse_detect_batch(stdout: str) -> Dict[str, Tuple[int, int, str, str]]:
+        """Parse batched detect output into {runbook_id: (exit, ms, stdout, stderr)}."""
+        records: Dict[str, Tuple[int, int, str, str]] = {}
+        for line in stdout.splitlines():
+            parts = line.strip().split(" ")
+            if len(parts) != 6 or parts[0] != DETECT_RECORD_MARKER:
+                continue
+            _, runbook_id, exit_code, duration_ms, out_b64, err_b64 = parts
+            try:
+                records[runbook_id] = (
+                    int(exit_code),
+                    int(duration_ms),
+                    "" if out_b64 == "-" else base64.b64decode(out_b64).decode("utf-8", "replace"),
+                    "" if err_b64 == "-" else base64.b64decode(err_b64).decode("utf-8", "replace"),
+                )
+            except (ValueError, binascii.Error) as e:
+                logger.warning(f"Malformed detect record for {runbook_id}: {e}")
+        return records
+
     def _get_phase_script(self, runbook, phase: str, distro: str) -> Optional[str]:
         """Get script for runbook phase, with distro-specific handling."""
         if phase == "detect":
@@ -0,0 +1,399 @@
+"""
+Event-driven task scheduler for the appliance agent main loop.
+
+The agent used to run checkin, drift detection, syncs, every scan, Go
+agent deploy, promotions, pruning and order processing as one fixed
+sequential cycle under a single 10-minute timeout. Orders waited for
+the whole cycle and a slow Windows scan held up everything behind it.
+
+Each unit of work is now an independent ScheduledTask:
+  - cadence: re-run `interval` seconds after its previous due time
+    (missed ticks collapse into one; a task never overlaps itself)
+  - priority: lower runs first when several tasks are due at once
+  - deadline: per-run timeout; a run that exceeds it is cancelled and
+    counted, without affecting any other task
+  - when: optional predicate evaluated at dispatch (e.g. "has Linux
+    targets"); a false predicate just pushes the task to its next tick
+
+trigger(name) makes a task due immediately (used to process orders as
+soon as a checkin response carries them).
+
+Budgets:
+  - concurrency: at most `max_concurrent` non-critical tasks run at once
+  - CPU: process CPU time over the last CPU_WINDOW_S seconds, as a
+    fraction of one core. While above `cpu_budget`, background-priority
+    tasks are deferred by CPU_DEFER_S.
+  Critical tasks (checkin, orders) are exempt from both budgets.
+
+TargetCadence gives per-host adaptive scan intervals: a host that
+drifted is rescanned at `min_interval`, each clean scan backs its
+interval off by `backoff` up to `max_interval`.
+
+Metrics (stats()): per task run/failure/timeout/deferral counts, dispatch
+lag (actual start - due time: last, max, EWMA), durations, and how
+overdue a waiting task currently is.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = 0     # checkin, orders — exempt from budgets
+PRIORITY_HIGH = 10        # drift detection, scans
+PRIORITY_NORMAL = 20      # syncs, enumeration, deploys
+PRIORITY_BACKGROUND = 30  # promotions, learning sync, pruning — shed under CPU pressure
+
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_CPU_BUDGET = 0.8  # fraction of one core
+CPU_WINDOW_S = 30.0
+CPU_DEFER_S = 15.0
+_LAG_EWMA_ALPHA = 0.2
+_MAX_SLEEP_S = 5.0
+
+
+@dataclass
+class ScheduledTask:
+    """One independently scheduled unit of agent work."""
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: float
+    priority: int = PRIORITY_NORMAL
+    deadline: Optional[float] = None
+    when: Optional[Callable[[], bool]] = None
+
+    next_due: float = 0.0
+    running: bool = False
+    rerun: bool = False
+    stats: Dict[str, Any] = field(default_factory=lambda: {
+        "runs": 0,
+        "failures": 0,
+        "timeouts": 0,
+        "skipped": 0,
+        "deferred_cpu": 0,
+        "last_lag_s": None,
+        "max_lag_s": 0.0,
+        "avg_lag_s": None,
+        "last_duration_s": None,
+        "max_duration_s": 0.0,
+        "last_started_at": None,
+        "last_error": None,
+    })
+
+    @property
+    def critical(self) -> bool:
+        return self.priority <= PRIORITY_CRITICAL
+
+
+class AgentScheduler:
+    """Dispatches ScheduledTasks on the agent's event loop."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        cpu_budget: float = DEFAULT_CPU_BUDGET,
+        cpu_clock: Callable[[], float] = time.process_time,
+    ):
+        """
+        Args:
+            max_concurrent: non-critical tasks allowed to run at once
+            cpu_budget: CPU fraction of one core above which background
+                        tasks are deferred (<= 0 disables the check)
+            cpu_clock: process CPU-seconds source (injectable for tests)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.cpu_budget = cpu_budget
+        self._cpu_clock = cpu_clock
+
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        self._slots_in_use = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._started_at = time.monotonic()
+        self._cpu_samples: Deque[Tuple[float, float]] = deque()
+
+    # ------------------------------------------------------------------
+    # registration / control
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        when: Optional[Callable[[], bool]] = None,
+        initial_delay: float = 0.0,
+    ) -> ScheduledTask:
+        """Register a task. It first becomes due after `initial_delay`."""
+        task = ScheduledTask(
+            name=name,
+            func=func,
+            interval=max(0.01, float(interval)),
+            priority=priority,
+            deadline=deadline,
+            when=when,
+            next_due=time.monotonic() + initial_delay,
+        )
+        self.tasks[name] = task
+        self._wake()
+        return task
+
+    def trigger(self, name: str) -> None:
+        """Make a task due now; if it is running, run it again right after."""
+        task = self.tasks.get(name)
+        if task is None:
+            return
+        if task.running:
+            task.rerun = True
+        else:
+            task.next_due = min(task.next_due, time.monotonic())
+        self._wake()
+
+    def set_interval(self, name: str, interval: float) -> None:
+        """Change a task's cadence; applies from its next tick."""
+        task = self.tasks.get(name)
+        if task is not None:
+            task.interval = max(0.01, float(interval))
+
+    async def stop(self) -> None:
+        """Stop dispatching and cancel running tasks."""
+        self._stopping = True
+        self._wake()
+        running = list(self._running_tasks.values())
+        for t in running:
+            t.cancel()
+        for t in running:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    # ------------------------------------------------------------------
+    # dispatch loop
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        """Dispatch tasks until stop() is called."""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        logger.info(
+            f"Scheduler started ({len(self.tasks)} tasks, "
+            f"max {self.max_concurrent} concurrent, CPU budget {self.cpu_budget:.0%})"
+        )
+        while not self._stopping:
+            self._wakeup.clear()
+            self.dispatch_due()
+            await self._sleep_until_next()
+
+    def dispatch_due(self) -> List[str]:
+        """Start every due task the budgets allow. Returns names started."""
+        now = time.monotonic()
+        self._sample_cpu(now)
+        over_cpu = self._over_cpu_budget()
+        started = []
+
+        due = sorted(
+            (t for t in self.tasks.values() if not t.running and t.next_due <= now),
+            key=lambda t: (t.priority, t.next_due),
+        )
+        for task in due:
+            if task.when is not None:
+                try:
+                    enabled = task.when()
+                except Exception as e:
+                    logger.warning(f"Scheduler: predicate for {task.name} failed: {e}")
+                    enabled = False
+                if not enabled:
+                    task.stats["skipped"] += 1
+                    task.next_due = now + task.interval
+                    continue
+            if not task.critical:
+                if over_cpu and task.priority >= PRIORITY_BACKGROUND:
+                    task.stats["deferred_cpu"] += 1
+                    task.next_due = now + CPU_DEFER_S
+                    continue
+                if self._slots_in_use >= self.max_concurrent:
+                    continue  # stays due; picked up when a slot frees
+                self._slots_in_use += 1
+            self._start(task, now)
+            started.append(task.name)
+        return started
+
+    def _start(self, task: ScheduledTask, now: float) -> None:
+        lag = max(0.0, now - task.next_due)
+        s = task.stats
+        s["last_lag_s"] = round(lag, 3)
+        s["max_lag_s"] = round(max(s["max_lag_s"], lag), 3)
+        s["avg_lag_s"] = round(
+            lag if s["avg_lag_s"] is None
+            else s["avg_lag_s"] + _LAG_EWMA_ALPHA * (lag - s["avg_lag_s"]),
+            3,
+        )
+        s["last_started_at"] = datetime.now(timezone.utc).isoformat()
+        task.running = True
+        due = task.next_due
+        self._running_tasks[task.name] = asyncio.create_task(
+            self._run_task(task, due, now), name=f"sched-{task.name}"
+        )
+
+    async def _run_task(self, task: ScheduledTask, due: float, started: float) -> None:
+        try:
+            if task.deadline:
+                await asyncio.wait_for(task.func(), timeout=task.deadline)
+            else:
+                await task.func()
+        except asyncio.TimeoutError:
+            task.stats["timeouts"] += 1
+            task.stats["last_error"] = f"deadline {task.deadline}s exceeded"
+            logger.error(f"Scheduled task {task.name} exceeded its {task.deadline}s deadline")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            task.stats["failures"] += 1
+            task.stats["last_error"] = str(e)[:200]
+            logger.error(f"Scheduled task {task.name} failed: {e}")
+        finally:
+            finished = time.monotonic()
+            duration = finished - started
+            task.stats["runs"] += 1
+            task.stats["last_duration_s"] = round(duration, 3)
+            task.stats["max_duration_s"] = round(max(task.stats["max_duration_s"], duration), 3)
+            # Fixed-rate from the due time; ticks missed while running collapse into one.
+            task.next_due = max(due + task.interval, finished)
+            if task.rerun:
+                task.rerun = False
+                task.next_due = finished
+            task.running = False
+            if not task.critical:
+                self._slots_in_use -= 1
+            self._running_tasks.pop(task.name, None)
+            self._wake()
+
+    async def _sleep_until_next(self) -> None:
+        now = time.monotonic()
+        waiting = [t.next_due for t in self.tasks.values() if not t.running]
+        timeout = min([d - now for d in waiting] + [_MAX_SLEEP_S])
+        if timeout <= 0:
+            # Due but blocked on a budget: wait for a slot or the next sample.
+            timeout = 1.0 if self._slots_in_use >= self.max_concurrent else 0.0
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            pass
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # CPU budget
+    # ------------------------------------------------------------------
+
+    def _sample_cpu(self, now: float) -> None:
+        self._cpu_samples.append((now, self._cpu_clock()))
+        while len(self._cpu_samples) > 2 and now - self._cpu_samples[1][0] >= CPU_WINDOW_S:
+            self._cpu_samples.popleft()
+
+    def cpu_usage(self) -> Optional[float]:
+        """Process CPU use over the sample window, as a fraction of one core."""
+        if len(self._cpu_samples) < 2:
+            return None
+        (t0, c0), (t1, c1) = self._cpu_samples[0], self._cpu_samples[-1]
+        if t1 - t0 <= 0:
+            return None
+        return max(0.0, (c1 - c0) / (t1 - t0))
+
+    def _over_cpu_budget(self) -> bool:
+        if self.cpu_budget <= 0:
+            return False
+        usage = self.cpu_usage()
+        return usage is not None and usage > self.cpu_budget
+
+    # ------------------------------------------------------------------
+    # metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot for the health API."""
+        now = time.monotonic()
+        tasks = {}
+        for name, t in sorted(self.tasks.items(), key=lambda kv: (kv[1].priority, kv[0])):
+            entry = dict(t.stats)
+            entry.update({
+                "interval_s": t.interval,
+                "priority": t.priority,
+                "deadline_s": t.deadline,
+                "running": t.running,
+                "overdue_s": round(now - t.next_due, 3) if not t.running and now > t.next_due else 0.0,
+                "next_due_in_s": round(max(0.0, t.next_due - now), 3) if not t.running else None,
+            })
+            tasks[name] = entry
+        usage = self.cpu_usage()
+        return {
+            "uptime_seconds": int(now - self._started_at),
+            "max_concurrent": self.max_concurrent,
+            "running": self._slots_in_use,
+            "cpu_budget": self.cpu_budget,
+            "cpu_usage": round(usage, 3) if usage is not None else None,
+            "tasks": tasks,
+        }
+
+
+class TargetCadence:
+    """Per-host adaptive scan intervals driven by recent drift."""
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        backoff: float = 1.5,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff = max(1.0, backoff)
+        # host -> (current interval, next due monotonic)
+        self._hosts: Dict[str, Tuple[float, float]] = {}
+
+    def due(self, hosts: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Hosts whose next scan is due (never-seen hosts are due at once)."""
+        now = time.monotonic() if now is None else now
+        return [h for h in hosts if h not in self._hosts or self._hosts[h][1] <= now]
+
+    def record(self, host: str, drifted: Optional[bool], now: Optional[float] = None) -> float:
+        """
+        Record a scan outcome and return the host's new interval.
+
+        drifted=None (scan error / no results) keeps the current interval.
+        """
+        now = time.monotonic() if now is None else now
+        interval = self._hosts.get(host, (self.base_interval, now))[0]
+        if drifted:
+            interval = self.min_interval
+        elif drifted is not None:
+            interval = min(self.max_interval, interval * self.backoff)
+        self._hosts[host] = (interval, now + interval)
+        return interval
+
+    def forget(self, keep: Iterable[str]) -> None:
+        """Drop state for hosts no longer targeted."""
+        keep = set(keep)
+        for host in [h for h in self._hosts if h not in keep]:
+            del self._hosts[host]
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic() if now is None else now
+        return {
+            h: {"interval_s": round(i, 1), "next_scan_in_s": round(max(0.0, d - now), 1)}
+            for h, (i, d) in sorted(self._hosts.items())
+        }
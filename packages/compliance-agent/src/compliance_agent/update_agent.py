@@ -13,10 +13,22 @@ import subprocess
 from dataclasses import dataclass
 from datetime import datetime, timezone, time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+from urllib.parse import urljoin
 
 import aiohttp
 
+from .http_transport import close_transport, shared_session
+from .peer_cache import PeerCache
+from .delta_update import (
+    ChunkManifest,
+    DeltaPlan,
+    ManifestError,
+    copy_local_chunks,
+    plan_delta,
+    prepare_output,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +43,7 @@ class UpdateInfo:
     size_bytes: Optional[int]
     maintenance_window: Dict[str, Any]
     current_status: str
+    manifest_url: Optional[str] = None  # signed chunk manifest (delta download)
 
 
 @dataclass
@@ -50,6 +63,7 @@ class UpdateAgent:
     - Staged rollout participation
     - Maintenance window enforcement
     - SHA256 checksum verification
+    - Delta downloads from a signed chunk manifest (see delta_update.py)
     - Automatic rollback on health check failure
     """
 
@@ -68,17 +82,35 @@ class UpdateAgent:
     MAX_BOOT_ATTEMPTS = 3
     HEALTH_CHECK_TIMEOUT = 60  # seconds
 
+    # Delta download settings
+    DELTA_PARALLEL_RANGES = 4
+    DELTA_RANGE_ATTEMPTS = 3
+    # Local sources are indexed up to this multiple of the new image size
+    # (the active partition is larger than the image written to it).
+    DELTA_SOURCE_SCAN_FACTOR = 1.25
+
     def __init__(
         self,
         api_base_url: str,
         api_key: str,
         appliance_id: str,
         download_dir: Path = Path("/var/lib/msp/update/downloads"),
+        trusted_keys: Optional[Sequence[str]] = None,
+        peer_cache: Optional[PeerCache] = None,
     ):
         self.api_base_url = api_base_url.rstrip("/")
         self.api_key = api_key
         self.appliance_id = appliance_id
         self.download_dir = download_dir
+        # Server Ed25519 public keys (hex) from checkin; manifests signed
+        # by anything else are rejected and the full download is used.
+        self.trusted_keys: List[str] = list(trusted_keys or [])
+        # LAN peer cache: chunks owned by a sibling appliance come from it
+        # first, and chunks we hold are shared back (peer_cache.py)
+        self.peer_cache = peer_cache
+        # path -> (size, mtime_ns, sha256) hashed while it was written
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+        self.last_transfer: Dict[str, Any] = {}
 
         # Ensure directories exist
         self.download_dir.mkdir(parents=True, exist_ok=True)
@@ -213,7 +245,7 @@ class UpdateAgent:
         url = f"{self.api_base_url}/api/fleet/appliances/{self.appliance_id}/pending-update"
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(
                     url,
                     headers={"Authorization": f"Bearer {self.api_key}"},
@@ -238,6 +270,7 @@ class UpdateAgent:
                         size_bytes=update.get("size_bytes"),
                         maintenance_window=update.get("maintenance_window", {}),
                         current_status=update.get("current_status", "notified"),
+                        manifest_url=update.get("manifest_url"),
                     )
         except Exception as e:
             logger.error(f"Error checking for updates: {e}")
@@ -265,7 +298,7 @@ class UpdateAgent:
             payload["health_check_result"] = health_check_result
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.post(
                     url,
                     headers={
@@ -313,7 +346,7 @@ class UpdateAgent:
         try:
             await self.report_status("downloading")
 
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 headers = {}
                 if existing_size > 0:
                     headers["Range"] = f"bytes={existing_size}-"
@@ -328,6 +361,18 @@ class UpdateAgent:
                         await self.report_status("failed", error_message=f"Download failed: {resp.status}")
                         return None
 
+                    # Server ignored the Range header: start over
+                    if resp.status == 200:
+                        existing_size = 0
+
+                    # Hash while writing so verify_checksum needn't re-read
+                    # the image; a resumed prefix is hashed from disk once.
+                    sha256 = hashlib.sha256()
+                    if existing_size > 0:
+                        with open(iso_path, "rb") as f:
+                            for block in iter(lambda: f.read(1024 * 1024), b""):
+                                sha256.update(block)
+
                     total = int(resp.headers.get("Content-Length", 0)) + existing_size
                     downloaded = existing_size
 
@@ -335,10 +380,13 @@ class UpdateAgent:
                     with open(iso_path, mode) as f:
                         async for chunk in resp.content.iter_chunked(1024 * 1024):  # 1MB chunks
                             f.write(chunk)
+                            sha256.update(chunk)
                             downloaded += len(chunk)
                             if progress_callback:
                                 progress_callback(downloaded, total)
 
+            self._record_digest(iso_path, sha256.hexdigest())
+            self.last_transfer = {"mode": "full", "fetched_bytes": downloaded - existing_size}
             logger.info(f"Downloaded ISO to {iso_path}")
             return iso_path
 
@@ -347,15 +395,37 @@ class UpdateAgent:
             await self.report_status("failed", error_message=str(e), error_code="DOWNLOAD_ERROR")
             return None
 
+    def _record_digest(self, path: Path, sha256_hex: str):
+        st = path.stat()
+        self._digests[str(path)] = (st.st_size, st.st_mtime_ns, sha256_hex)
+
+    def _recorded_digest(self, path: Path) -> Optional[str]:
+        """Digest computed during download, if the file is unchanged since."""
+        entry = self._digests.get(str(path))
+        if entry is None:
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != entry[:2]:
+            return None
+        return entry[2]
+
     def verify_checksum(self, iso_path: Path, expected_sha256: str) -> bool:
-        """Verify ISO checksum."""
-        sha256 = hashlib.sha256()
+        """Verify ISO checksum.
 
-        with open(iso_path, "rb") as f:
-            for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                sha256.update(chunk)
+        Uses the digest computed while downloading when the file hasn't
+        changed since; otherwise hashes the file.
+        """
+        actual = self._recorded_digest(iso_path)
+        if actual is None:
+            sha256 = hashlib.sha256()
+            with open(iso_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+            actual = sha256.hexdigest()
 
-        actual = sha256.hexdigest()
         if actual.lower() != expected_sha256.lower():
             logger.error(f"Checksum mismatch: expected {expected_sha256}, got {actual}")
             return False
@@ -363,6 +433,266 @@ class UpdateAgent:
         logger.info("Checksum verified")
         return True
 
+    # =========================================================================
+    # Delta Download
+    # =========================================================================
+
+    async def fetch_image(self, update: UpdateInfo, progress_callback=None) -> Optional[Path]:
+        """Delta download when a trusted manifest is available, else full."""
+        if update.manifest_url and self.trusted_keys:
+            try:
+                iso_path = await self.download_delta(update, progress_callback)
+                if iso_path:
+                    return iso_path
+            except Exception as e:
+                logger.warning(f"Delta download error: {e}")
+            logger.info("Delta download unavailable, falling back to full download")
+        return await self.download_iso(update, progress_callback)
+
+    async def fetch_manifest(self, update: UpdateInfo) -> Optional[ChunkManifest]:
+        """Fetch and verify the signed chunk manifest for `update`."""
+        url = urljoin(self.api_base_url + "/", update.manifest_url)
+        try:
+            async with shared_session() as session:
+                async with session.get(
+                    url,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    timeout=aiohttp.ClientTimeout(total=60),
+                ) as resp:
+                    if resp.status != 200:
+                        logger.warning(f"Manifest fetch failed: {resp.status}")
+                        return None
+                    payload = await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Manifest fetch error: {e}")
+            return None
+
+        try:
+            manifest = ChunkManifest.from_signed(payload, self.trusted_keys)
+        except ManifestError as e:
+            logger.error(f"Rejected chunk manifest for {update.version}: {e}")
+            return None
+        # The order (itself signed) pins the image hash; the manifest must
+        # describe that exact image.
+        if manifest.sha256 != update.sha256.lower() or manifest.version != update.version:
+            logger.error(f"Chunk manifest does not match update {update.version}")
+            return None
+        return manifest
+
+    async def download_delta(self, update: UpdateInfo, progress_callback=None) -> Optional[Path]:
+        """Assemble the new image from local chunks plus Range-fetched ones.
+
+        Every chunk is verified against the signed manifest as it is
+        written, so the result is recorded as verified without a re-read.
+        A failed attempt leaves `<version>.iso.part` for the next one.
+
+        Returns:
+            Path to the assembled ISO, or None (caller falls back)
+        """
+        manifest = await self.fetch_manifest(update)
+        if manifest is None:
+            return None
+
+        iso_path = self.download_dir / f"{update.version}.iso"
+        part_path = self.download_dir / f"{update.version}.iso.part"
+        for stale in self.download_dir.glob("*.iso.part"):
+            if stale != part_path:
+                stale.unlink(missing_ok=True)
+
+        sources = sorted(self.download_dir.glob("*.iso"))
+        sources.append(Path(self.get_partition_info().active_device))
+        limit = int(manifest.size_bytes * self.DELTA_SOURCE_SCAN_FACTOR)
+
+        plan = await asyncio.to_thread(plan_delta, manifest, part_path, sources, limit)
+        await asyncio.to_thread(prepare_output, manifest, part_path)
+        for i in await asyncio.to_thread(copy_local_chunks, manifest, plan, part_path):
+            del plan.local[i]
+            plan.missing.append(i)
+
+        stats = plan.stats(manifest)
+        logger.info(
+            f"Delta update {update.version}: reusing {stats['reused_chunks']}/{stats['chunks']} "
+            f"chunks, fetching {stats['fetched_bytes']} of {manifest.size_bytes} bytes"
+        )
+        for i in [*plan.in_place, *plan.local]:
+            self._share_chunk(manifest, i, part_path)
+
+        total = stats["fetched_bytes"]
+        progress = {"bytes": 0, "peer_bytes": 0}
+
+        def _on_chunk(index: int, nbytes: int, from_peer: bool = False):
+            self._share_chunk(manifest, index, part_path)
+            progress["bytes"] += nbytes
+            if from_peer:
+                progress["peer_bytes"] += nbytes
+            elif self.peer_cache:
+                self.peer_cache.record_cloud_fetch(nbytes)
+            if progress_callback:
+                progress_callback(progress["bytes"], total)
+
+        await self.report_status("downloading")
+        if self.peer_cache:
+            # Fetch the chunks we own from the cloud while pulling the
+            # rest from their owners; whatever peers can't supply in
+            # time comes from the cloud afterwards.
+            owned = [i for i in plan.missing if self.peer_cache.owns(manifest.chunks[i])]
+            others = sorted(set(plan.missing) - set(owned))
+            ok, leftover = await asyncio.gather(
+                self._fetch_missing_chunks(update.iso_url, manifest, owned, part_path, _on_chunk),
+                self._fetch_chunks_from_peers(manifest, others, part_path, _on_chunk),
+            )
+            if ok and leftover:
+                ok = await self._fetch_missing_chunks(
+                    update.iso_url, manifest, leftover, part_path, _on_chunk
+                )
+        else:
+            ok = await self._fetch_missing_chunks(
+                update.iso_url, manifest, plan.missing, part_path, _on_chunk
+            )
+        if not ok:
+            logger.error("Delta download incomplete")
+            return None
+
+        part_path.replace(iso_path)
+        if self.peer_cache:
+            self.peer_cache.store.move_extents(part_path, iso_path)
+        self._record_digest(iso_path, manifest.sha256)
+        self.last_transfer = dict(stats, mode="delta", peer_bytes=progress["peer_bytes"])
+        return iso_path
+
+    def _share_chunk(self, manifest: ChunkManifest, index: int, path: Path):
+        """Make a verified chunk of `path` servable to LAN peers."""
+        if self.peer_cache:
+            start, end = manifest.chunk_bounds(index)
+            self.peer_cache.store.add_extent(manifest.chunks[index], path, start, end - start)
+
+    async def _fetch_missing_chunks(
+        self,
+        iso_url: str,
+        manifest: ChunkManifest,
+        indices: List[int],
+        part_path: Path,
+        on_chunk,
+    ) -> bool:
+        """Range-fetch `indices`, a few coalesced runs in parallel."""
+        if not indices:
+            return True
+        sem = asyncio.Semaphore(self.DELTA_PARALLEL_RANGES)
+        async with shared_session() as session:
+            results = await asyncio.gather(*(
+                self._fetch_run(session, sem, iso_url, manifest, first, last, part_path, on_chunk)
+                for first, last in DeltaPlan(missing=list(indices)).fetch_ranges()
+            ))
+        return all(results)
+
+    async def _fetch_chunks_from_peers(
+        self,
+        manifest: ChunkManifest,
+        indices: List[int],
+        part_path: Path,
+        on_chunk,
+    ) -> List[int]:
+        """Pull chunks from their LAN owners; returns indices still missing.
+
+        Owners fetch their share concurrently, so chunks not there yet are
+        retried every poll_interval until the peer cache's wait_seconds.
+        A round never outlives that deadline: an unreachable owner holds
+        each request for PEER_REQUEST_TIMEOUT behind the semaphore, so
+        requests still in flight at the deadline are cancelled and their
+        chunks left to the cloud.
+        """
+        pending = list(indices)
+        if not pending:
+            return pending
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.peer_cache.wait_seconds
+        sem = asyncio.Semaphore(self.DELTA_PARALLEL_RANGES)
+
+        async with shared_session() as session:
+            async def _one(i: int):
+                async with sem:
+                    return i, await self.peer_cache.fetch_from_owner(session, manifest.chunks[i])
+
+            while pending:
+                tasks = [asyncio.ensure_future(_one(i)) for i in pending]
+                done, late = await asyncio.wait(
+                    tasks, timeout=max(0.0, deadline - loop.time())
+                )
+                for task in late:
+                    task.cancel()
+                await asyncio.gather(*late, return_exceptions=True)
+                still = [i for i, task in zip(pending, tasks) if task in late]
+                with open(part_path, "r+b") as f:
+                    for i, data in (task.result() for task in tasks if task in done):
+                        if data is None:
+                            still.append(i)
+                            continue
+                        # fetch_from_owner verified data against the manifest hash
+                        f.seek(manifest.chunk_bounds(i)[0])
+                        f.write(data)
+                        self.peer_cache.record_peer_hit(len(data))
+                        on_chunk(i, len(data), True)
+                pending = sorted(still)
+                if not pending or loop.time() >= deadline:
+                    break
+                await asyncio.sleep(self.peer_cache.poll_interval)
+        if pending:
+            logger.info(f"{len(pending)} chunk(s) not available from peers, using cloud")
+        return pending
+
+    async def _fetch_run(
+        self,
+        session: aiohttp.ClientSession,
+        sem: asyncio.Semaphore,
+        iso_url: str,
+        manifest: ChunkManifest,
+        first: int,
+        last: int,
+        part_path: Path,
+        on_chunk,
+    ) -> bool:
+        """Fetch chunks [first, last] with one Range request, verifying each."""
+        index = first
+        async with sem:
+            for attempt in range(1, self.DELTA_RANGE_ATTEMPTS + 1):
+                start, _ = manifest.chunk_bounds(index)
+                _, end = manifest.chunk_bounds(last)
+                try:
+                    async with session.get(
+                        iso_url,
+                        headers={"Range": f"bytes={start}-{end - 1}"},
+                        timeout=aiohttp.ClientTimeout(total=600),
+                    ) as resp:
+                        if resp.status != 206:
+                            # 200 = Range unsupported: delta is impossible here.
+                            logger.warning(f"Range request returned {resp.status}")
+                            return False
+                        buf = bytearray()
+                        with open(part_path, "r+b") as f:
+                            async for block in resp.content.iter_chunked(256 * 1024):
+                                buf += block
+                                while index <= last:
+                                    cstart, cend = manifest.chunk_bounds(index)
+                                    if len(buf) < cend - cstart:
+                                        break
+                                    chunk = bytes(buf[:cend - cstart])
+                                    del buf[:cend - cstart]
+                                    if hashlib.sha256(chunk).hexdigest() != manifest.chunks[index]:
+                                        raise ManifestError(f"chunk {index} hash mismatch")
+                                    f.seek(cstart)
+                                    f.write(chunk)
+                                    on_chunk(index, len(chunk))
+                                    index += 1
+                        if index > last:
+                            return True
+                        raise ManifestError(f"short range response at chunk {index}")
+                except (aiohttp.ClientError, asyncio.TimeoutError, ManifestError) as e:
+                    # Verified chunks stay written; the retry resumes at `index`.
+                    logger.warning(
+                        f"Chunk run {first}-{last} attempt {attempt}/{self.DELTA_RANGE_ATTEMPTS}: {e}"
+                    )
+        return False
+
     # =========================================================================
     # Update Application
     # =========================================================================
@@ -398,6 +728,11 @@ class UpdateAgent:
             # Sync to ensure writes are flushed
             subprocess.run(["sync"], check=True)
 
+            # The image now lives on the standby partition at the same
+            # offsets; keep serving its chunks to peers from there.
+            if self.peer_cache:
+                self.peer_cache.store.move_extents(iso_path, Path(info.standby_device))
+
             # Set next boot to standby partition
             if not self.set_next_boot(info.standby):
                 await self.report_status("failed", error_message="Failed to set boot partition")
@@ -511,7 +846,7 @@ class UpdateAgent:
 
         # Check 1: Network connectivity
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(
                     f"{self.api_base_url}/health",
                     timeout=aiohttp.ClientTimeout(total=10),
@@ -656,8 +991,8 @@ class UpdateAgent:
             logger.info(f"Update already in progress: {update.current_status}")
             return
 
-        # Download ISO
-        iso_path = await self.download_iso(update)
+        # Download ISO (delta from the signed chunk manifest when available)
+        iso_path = await self.fetch_image(update)
         if not iso_path:
             return
 
@@ -690,6 +1025,14 @@ class UpdateAgent:
 
 
 # CLI for manual operations
+async def _closing(coro):
+    """Run a CLI coroutine, then close the pooled HTTP session."""
+    try:
+        return await coro
+    finally:
+        await close_transport()
+
+
 def main():
     """CLI entry point for update agent."""
     import argparse
@@ -746,7 +1089,7 @@ def main():
                 print(f"  {name}: {status}")
             return 0 if passed else 1
 
-        return asyncio.run(run_health())
+        return asyncio.run(_closing(run_health()))
 
     if args.check:
         async def run_check():
@@ -759,10 +1102,10 @@ def main():
                 print("No updates available")
             return 0
 
-        return asyncio.run(run_check())
+        return asyncio.run(_closing(run_check()))
 
     # Default: run update cycle
-    asyncio.run(agent.run_update_cycle())
+    asyncio.run(_closing(agent.run_update_cycle()))
     return 0
 
 
@@ -17,18 +17,30 @@ Architecture:
   [Proxy: MCP Server → S3]
            ↓
   WORM Storage (90+ day retention)
+
+Upload state lives in an SQLite journal (.upload_journal.db in the
+evidence directory): one row per bundle plus an append-only event log,
+so recording an upload is a single-row write no matter how many years
+of evidence the appliance holds. EvidenceGenerator enqueues each bundle
+as it is stored; the evidence tree is only walked once, the first time
+a journal is opened, and after that just the day directories created
+since the last walk.
 """
 
 import asyncio
 import hashlib
 import json
 import logging
-from datetime import datetime, timedelta, timezone
+import sqlite3
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from dataclasses import dataclass, asdict
 import aiohttp
 
+from .http_transport import shared_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,10 +76,306 @@ class WormConfig:
     retention_days: int = 90
     max_retries: int = 3
     retry_delay_seconds: int = 5
-    upload_batch_size: int = 10
+    upload_batch_size: int = 10  # Ceiling of the adaptive upload window
     auto_upload: bool = True  # Upload immediately on evidence creation
 
 
+# Journal states. A bundle is pending until uploaded; failed bundles are
+# retried on the next sync; missing ones were pruned before they got out.
+STATE_PENDING = "pending"
+STATE_UPLOADED = "uploaded"
+STATE_FAILED = "failed"
+STATE_MISSING = "missing"
+
+
+class UploadJournal:
+    """
+    SQLite journal of WORM upload state.
+
+    `uploads` holds the current state per bundle (indexed on state, so
+    listing pending work never touches uploaded history); `upload_events`
+    is the append-only log of every transition. Each transition is one
+    small transaction in WAL mode.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS uploads (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                bundle_id TEXT NOT NULL UNIQUE,
+                bundle_path TEXT,
+                signature_path TEXT,
+                state TEXT NOT NULL,
+                s3_uri TEXT,
+                signature_uri TEXT,
+                upload_timestamp TEXT,
+                retention_days INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_uploads_state ON uploads(state, seq);
+
+            CREATE TABLE IF NOT EXISTS upload_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                bundle_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                detail TEXT,
+                at TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS journal_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _log(self, bundle_id: str, state: str, detail: Optional[str], now: str) -> None:
+        self._conn.execute(
+            'INSERT INTO upload_events (bundle_id, state, detail, at) VALUES (?, ?, ?, ?)',
+            (bundle_id, state, detail, now),
+        )
+
+    def enqueue(
+        self,
+        bundle_id: str,
+        bundle_path: Path,
+        signature_path: Optional[Path] = None
+    ) -> bool:
+        """Record a new bundle as pending. Returns False if already journaled."""
+        return self.enqueue_many([(bundle_id, bundle_path, signature_path)]) == 1
+
+    def enqueue_many(self, bundles: List[Tuple[str, Path, Optional[Path]]]) -> int:
+        """Record bundles as pending in one transaction; returns how many were new."""
+        now = datetime.now(timezone.utc).isoformat()
+        added = 0
+        with self._conn:
+            for bundle_id, bundle_path, signature_path in bundles:
+                cur = self._conn.execute('''
+                    INSERT OR IGNORE INTO uploads
+                    (bundle_id, bundle_path, signature_path, state, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (
+                    bundle_id,
+                    str(bundle_path),
+                    str(signature_path) if signature_path else None,
+                    STATE_PENDING,
+                    now,
+                ))
+                if cur.rowcount:
+                    self._log(bundle_id, STATE_PENDING, str(bundle_path), now)
+                    added += 1
+        return added
+
+    def mark_uploaded(
+        self,
+        bundle_id: str,
+        s3_uri: Optional[str] = None,
+        signature_uri: Optional[str] = None,
+        upload_timestamp: Optional[str] = None,
+        retention_days: Optional[int] = None
+    ) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._conn:
+            self._conn.execute('''
+                INSERT INTO uploads
+                (bundle_id, state, s3_uri, signature_uri, upload_timestamp,
+                 retention_days, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(bundle_id) DO UPDATE SET
+                    state = excluded.state,
+                    s3_uri = excluded.s3_uri,
+                    signature_uri = excluded.signature_uri,
+                    upload_timestamp = excluded.upload_timestamp,
+                    retention_days = excluded.retention_days,
+                    attempts = uploads.attempts + 1,
+                    last_error = NULL,
+                    updated_at = excluded.updated_at
+            ''', (
+                bundle_id, STATE_UPLOADED, s3_uri, signature_uri,
+                upload_timestamp, retention_days, now,
+            ))
+            self._log(bundle_id, STATE_UPLOADED, s3_uri, now)
+
+    def mark_failed(self, bundle_id: str, error: Optional[str], state: str = STATE_FAILED) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._conn:
+            self._conn.execute('''
+                INSERT INTO uploads (bundle_id, state, attempts, last_error, updated_at)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(bundle_id) DO UPDATE SET
+                    state = excluded.state,
+                    attempts = uploads.attempts + 1,
+                    last_error = excluded.last_error,
+                    updated_at = excluded.updated_at
+            ''', (bundle_id, state, error, now))
+            self._log(bundle_id, state, error, now)
+
+    def get(self, bundle_id: str) -> Optional[Dict[str, Any]]:
+        """Upload status in the shape of the old JSON registry entries."""
+        row = self._conn.execute(
+            'SELECT * FROM uploads WHERE bundle_id = ?', (bundle_id,)
+        ).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = {
+            "success": row["state"] == STATE_UPLOADED,
+            "state": row["state"],
+            "attempts": row["attempts"],
+        }
+        if row["state"] == STATE_UPLOADED:
+            entry.update(
+                s3_uri=row["s3_uri"],
+                signature_uri=row["signature_uri"],
+                upload_timestamp=row["upload_timestamp"],
+                retention_days=row["retention_days"],
+            )
+        elif row["last_error"]:
+            entry["error"] = row["last_error"]
+        return entry
+
+    def bundle_ids(self) -> Iterator[str]:
+        for (bundle_id,) in self._conn.execute('SELECT bundle_id FROM uploads ORDER BY seq'):
+            yield bundle_id
+
+    def pending(self, limit: Optional[int] = None) -> List[Tuple[str, Path, Optional[Path]]]:
+        """(bundle_id, bundle_path, signature_path) awaiting upload, oldest first."""
+        query = '''
+            SELECT bundle_id, bundle_path, signature_path FROM uploads
+            WHERE state IN (?, ?) AND bundle_path IS NOT NULL
+            ORDER BY seq
+        '''
+        params: Tuple = (STATE_PENDING, STATE_FAILED)
+        if limit:
+            query += ' LIMIT ?'
+            params += (limit,)
+        return [
+            (r["bundle_id"], Path(r["bundle_path"]),
+             Path(r["signature_path"]) if r["signature_path"] else None)
+            for r in self._conn.execute(query, params)
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            state: n for state, n in self._conn.execute(
+                'SELECT state, COUNT(*) FROM uploads GROUP BY state'
+            )
+        }
+
+    def last_upload(self) -> Optional[str]:
+        row = self._conn.execute(
+            'SELECT MAX(upload_timestamp) FROM uploads WHERE state = ?', (STATE_UPLOADED,)
+        ).fetchone()
+        return row[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute('SELECT value FROM journal_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO journal_meta (key, value) VALUES (?, ?)', (key, value)
+            )
+
+
+class _RegistryView(Mapping):
+    """Dict-style access to the journal, as the old `_upload_registry` offered.
+
+    Assigning an entry journals it (uploaded if entry["success"], else failed).
+    """
+
+    def __init__(self, journal: UploadJournal):
+        self._journal = journal
+
+    def __getitem__(self, bundle_id: str) -> Dict[str, Any]:
+        entry = self._journal.get(bundle_id)
+        if entry is None:
+            raise KeyError(bundle_id)
+        return entry
+
+    def __setitem__(self, bundle_id: str, entry: Dict[str, Any]) -> None:
+        if entry.get("success"):
+            self._journal.mark_uploaded(
+                bundle_id,
+                s3_uri=entry.get("s3_uri"),
+                signature_uri=entry.get("signature_uri"),
+                upload_timestamp=entry.get("upload_timestamp"),
+                retention_days=entry.get("retention_days"),
+            )
+        else:
+            self._journal.mark_failed(bundle_id, entry.get("error"))
+
+    def __contains__(self, bundle_id: object) -> bool:
+        return isinstance(bundle_id, str) and self._journal.get(bundle_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return self._journal.bundle_ids()
+
+    def __len__(self) -> int:
+        return sum(self._journal.counts().values())
+
+
+class _UploadWindow:
+    """
+    AIMD concurrency window for sync uploads.
+
+    After every `size` completions the window compares the round's
+    throughput (bytes/s) with the previous round: not worse -> one more
+    concurrent upload (up to `ceiling`), noticeably worse -> one fewer.
+    Any failure halves it, since that usually means the uplink or the
+    server is saturated.
+    """
+
+    def __init__(self, ceiling: int, initial: int = 2):
+        self.ceiling = max(1, ceiling)
+        self.size = min(initial, self.ceiling)
+        self._round_bytes = 0
+        self._round_done = 0
+        self._round_start: Optional[float] = None
+        self._last_rate: Optional[float] = None
+
+    def on_start(self, now: float) -> None:
+        if self._round_start is None:
+            self._round_start = now
+
+    def on_done(self, success: bool, nbytes: int, now: float) -> None:
+        if not success:
+            self.size = max(1, self.size // 2)
+            self._reset()
+            return
+        self._round_bytes += nbytes
+        self._round_done += 1
+        if self._round_done < self.size:
+            return
+        start = now if self._round_start is None else self._round_start
+        elapsed = max(now - start, 1e-6)
+        rate = self._round_bytes / elapsed
+        if self._last_rate is None or rate >= self._last_rate * 0.9:
+            self.size = min(self.ceiling, self.size + 1)
+        elif rate < self._last_rate * 0.7:
+            self.size = max(1, self.size - 1)
+        self._last_rate = rate
+        self._reset()
+
+    def _reset(self) -> None:
+        self._round_bytes = 0
+        self._round_done = 0
+        self._round_start = None
+
+
 class WormUploader:
     """
     Uploads evidence bundles to WORM storage.
@@ -109,34 +417,58 @@ class WormUploader:
         self.client_key = client_key
 
         # Track upload state
-        self._upload_registry_path = self.evidence_dir / ".upload_registry.json"
-        self._upload_registry: Dict[str, Dict] = self._load_registry()
+        self._journal = UploadJournal(self.evidence_dir / ".upload_journal.db")
+        self._upload_registry = _RegistryView(self._journal)
+        self._migrate_legacy_registry()
+        self._scanned = False
 
         # S3 client for direct mode (lazy init)
         self._s3_client = None
 
+        # Proxy-mode TLS context (lazy init). Built once: pooled
+        # connections are keyed by SSL context, so a fresh context per
+        # upload would never reuse one.
+        self._ssl_context = None
+
         logger.info(
             f"WormUploader initialized: mode={config.mode}, "
             f"enabled={config.enabled}, retention={config.retention_days}d"
         )
 
-    def _load_registry(self) -> Dict[str, Dict]:
-        """Load upload registry from disk."""
-        if self._upload_registry_path.exists():
-            try:
-                with open(self._upload_registry_path) as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load upload registry: {e}")
-        return {}
-
-    def _save_registry(self) -> None:
-        """Save upload registry to disk."""
+    def _migrate_legacy_registry(self) -> None:
+        """Import the pre-journal .upload_registry.json once, then retire it."""
+        legacy_path = self.evidence_dir / ".upload_registry.json"
+        if not legacy_path.exists():
+            return
         try:
-            with open(self._upload_registry_path, 'w') as f:
-                json.dump(self._upload_registry, f, indent=2)
+            with open(legacy_path) as f:
+                legacy = json.load(f)
+            for bundle_id, entry in legacy.items():
+                if entry.get("success"):
+                    self._upload_registry[bundle_id] = entry
+            legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+            logger.info(f"Migrated {len(legacy)} upload registry entries to journal")
         except Exception as e:
-            logger.error(f"Failed to save upload registry: {e}")
+            logger.warning(f"Failed to migrate upload registry: {e}")
+
+    def enqueue_bundle(
+        self,
+        bundle_path: Path,
+        signature_path: Optional[Path] = None
+    ) -> str:
+        """
+        Journal a newly stored bundle as pending upload.
+
+        Called by EvidenceGenerator as bundles are written, so sync_pending
+        never has to search the evidence tree for new work.
+
+        Returns:
+            The bundle ID
+        """
+        bundle_path = Path(bundle_path)
+        bundle_id = self._extract_bundle_id(bundle_path)
+        self._journal.enqueue(bundle_id, bundle_path, signature_path)
+        return bundle_id
 
     async def upload_bundle(
         self,
@@ -166,12 +498,12 @@ class WormUploader:
         if signature_path is None:
             signature_path = bundle_path.parent / "bundle.sig"
 
-        # Extract bundle ID
-        bundle_id = self._extract_bundle_id(bundle_path)
+        # Journal before uploading so an interrupted upload is retried
+        bundle_id = self.enqueue_bundle(bundle_path, signature_path)
 
         # Check if already uploaded
-        if bundle_id in self._upload_registry:
-            existing = self._upload_registry[bundle_id]
+        existing = self._journal.get(bundle_id)
+        if existing is not None:
             if existing.get("success"):
                 logger.debug(f"Bundle {bundle_id} already uploaded")
                 return UploadResult(
@@ -188,18 +520,18 @@ class WormUploader:
         else:
             result = await self._upload_direct(bundle_path, signature_path, bundle_id)
 
-        # Update registry
+        # Update journal
         if result.success:
-            self._upload_registry[bundle_id] = {
-                "success": True,
-                "s3_uri": result.s3_uri,
-                "signature_uri": result.signature_uri,
-                "upload_timestamp": result.upload_timestamp,
-                "retention_days": result.retention_days
-            }
-            self._save_registry()
+            self._journal.mark_uploaded(
+                bundle_id,
+                s3_uri=result.s3_uri,
+                signature_uri=result.signature_uri,
+                upload_timestamp=result.upload_timestamp,
+                retention_days=result.retention_days
+            )
             logger.info(f"Uploaded evidence bundle {bundle_id} to WORM storage")
         else:
+            self._journal.mark_failed(bundle_id, result.error)
             logger.error(f"Failed to upload {bundle_id}: {result.error}")
 
         return result
@@ -243,20 +575,23 @@ class WormUploader:
             headers["X-Signature-Hash"] = f"sha256:{sig_hash}"
 
         # Setup hardened SSL context (TLS 1.2+ required)
-        import ssl
-        ssl_context = ssl.create_default_context()
-        ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
-        ssl_context.check_hostname = True
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-
-        # Add client certificate for mTLS if configured
-        if self.client_cert and self.client_key:
-            ssl_context.load_cert_chain(self.client_cert, self.client_key)
+        if self._ssl_context is None:
+            import ssl
+            ssl_context = ssl.create_default_context()
+            ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+            ssl_context.check_hostname = True
+            ssl_context.verify_mode = ssl.CERT_REQUIRED
+
+            # Add client certificate for mTLS if configured
+            if self.client_cert and self.client_key:
+                ssl_context.load_cert_chain(self.client_cert, self.client_key)
+            self._ssl_context = ssl_context
+        ssl_context = self._ssl_context
 
         # Upload with retry
         for attempt in range(1, self.config.max_retries + 1):
             try:
-                async with aiohttp.ClientSession() as session:
+                async with shared_session() as session:
                     form = aiohttp.FormData()
                     form.add_field(
                         "bundle",
@@ -350,7 +685,9 @@ class WormUploader:
             # Upload bundle with Object Lock
             for attempt in range(1, self.config.max_retries + 1):
                 try:
-                    self._s3_client.put_object(
+                    # Off the event loop so sync uploads really run in parallel
+                    await asyncio.to_thread(
+                        self._s3_client.put_object,
                         Bucket=self.config.s3_bucket,
                         Key=bundle_key,
                         Body=bundle_path.read_bytes(),
@@ -366,7 +703,8 @@ class WormUploader:
 
                     # Upload signature if exists
                     if sig_key and signature_path.exists():
-                        self._s3_client.put_object(
+                        await asyncio.to_thread(
+                            self._s3_client.put_object,
                             Bucket=self.config.s3_bucket,
                             Key=sig_key,
                             Body=signature_path.read_bytes(),
@@ -416,11 +754,11 @@ class WormUploader:
         """
         Sync all pending (not yet uploaded) evidence bundles.
 
-        Scans local evidence directory and uploads any bundles
-        not in the upload registry.
+        Pending work comes from the journal. Uploads run in an adaptive
+        window (see _UploadWindow) capped at config.upload_batch_size.
 
         Returns:
-            List of UploadResult for each attempted upload
+            List of UploadResult for each attempted upload, in completion order
         """
         if not self.config.enabled:
             return []
@@ -430,58 +768,125 @@ class WormUploader:
 
         logger.info(f"Found {len(pending)} pending bundles to upload")
 
-        # Process in batches
-        for i in range(0, len(pending), self.config.upload_batch_size):
-            batch = pending[i:i + self.config.upload_batch_size]
-
-            # Upload batch concurrently
-            tasks = [
-                self.upload_bundle(bundle_path, sig_path)
-                for bundle_path, sig_path in batch
-            ]
-
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    results.append(UploadResult(
+        loop = asyncio.get_running_loop()
+        window = _UploadWindow(self.config.upload_batch_size)
+        queue = iter(pending)
+        in_flight: Dict[asyncio.Task, int] = {}
+        exhausted = False
+
+        while True:
+            while not exhausted and len(in_flight) < window.size:
+                item = next(queue, None)
+                if item is None:
+                    exhausted = True
+                    break
+                bundle_path, sig_path = item
+                window.on_start(loop.time())
+                task = asyncio.ensure_future(self.upload_bundle(bundle_path, sig_path))
+                in_flight[task] = self._bundle_size(bundle_path, sig_path)
+
+            if not in_flight:
+                break
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                nbytes = in_flight.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    result = UploadResult(
                         bundle_id="unknown",
                         success=False,
-                        error=str(result)
-                    ))
-                else:
-                    results.append(result)
+                        error=str(e)
+                    )
+                window.on_done(result.success, nbytes, loop.time())
+                results.append(result)
 
         # Summary
         success_count = sum(1 for r in results if r.success)
-        logger.info(f"WORM sync complete: {success_count}/{len(results)} successful")
+        logger.info(
+            f"WORM sync complete: {success_count}/{len(results)} successful "
+            f"(window={window.size})"
+        )
 
         return results
 
-    def _find_pending_bundles(self) -> List[Tuple[Path, Optional[Path]]]:
-        """Find bundles not yet uploaded to WORM storage."""
-        pending = []
-
-        # Walk evidence directory
-        for bundle_json in self.evidence_dir.rglob("bundle.json"):
-            bundle_id = self._extract_bundle_id(bundle_json)
+    @staticmethod
+    def _bundle_size(bundle_path: Path, sig_path: Optional[Path]) -> int:
+        size = 0
+        for path in (bundle_path, sig_path):
+            try:
+                size += path.stat().st_size if path else 0
+            except OSError:
+                pass
+        return size
 
-            # Skip if already uploaded
-            if bundle_id in self._upload_registry:
-                if self._upload_registry[bundle_id].get("success"):
-                    continue
+    def _find_pending_bundles(self) -> List[Tuple[Path, Optional[Path]]]:
+        """Bundles not yet uploaded to WORM storage, oldest first."""
+        self._scan_once()
 
-            # Find signature file
-            sig_path = bundle_json.parent / "bundle.sig"
-            if not sig_path.exists():
-                sig_path = None
+        pending = []
+        for bundle_id, bundle_path, sig_path in self._journal.pending():
+            if not bundle_path.exists():
+                # Pruned locally before it was ever uploaded
+                self._journal.mark_failed(bundle_id, "bundle file missing", state=STATE_MISSING)
+                continue
+            pending.append((bundle_path, sig_path))
+        return pending
 
-            pending.append((bundle_json, sig_path))
+    def _scan_once(self) -> None:
+        """Catch up on bundles stored without enqueue_bundle, once per process.
 
-        # Sort by date (oldest first)
-        pending.sort(key=lambda x: x[0].parent.name)
+        A new journal walks the whole evidence tree; afterwards only the
+        YYYY/MM/DD directories from the day before the last walk onward
+        are searched (covers bundles written while WORM was disabled or
+        the agent was on an older version).
+        """
+        if self._scanned:
+            return
+        self._scanned = True
 
-        return pending
+        mark = self._journal.get_meta("scanned_through")
+        if mark is None:
+            roots = [self.evidence_dir]
+        else:
+            roots = self._day_dirs_since(date.fromisoformat(mark) - timedelta(days=1))
+
+        found = []
+        for root in roots:
+            for bundle_json in root.rglob("bundle.json"):
+                sig_path = bundle_json.parent / "bundle.sig"
+                found.append((
+                    self._extract_bundle_id(bundle_json),
+                    bundle_json,
+                    sig_path if sig_path.exists() else None,
+                ))
+
+        added = self._journal.enqueue_many(found)
+        self._journal.set_meta("scanned_through", datetime.now(timezone.utc).date().isoformat())
+        if added:
+            logger.info(f"Journaled {added} evidence bundles found on disk")
+
+    def _day_dirs_since(self, since: date) -> List[Path]:
+        """Evidence day directories (YYYY/MM/DD) on or after `since`."""
+        days = []
+        for year_dir in self.evidence_dir.iterdir():
+            if not (year_dir.is_dir() and year_dir.name.isdigit()
+                    and int(year_dir.name) >= since.year):
+                continue
+            for month_dir in year_dir.iterdir():
+                if not (month_dir.is_dir() and month_dir.name.isdigit()):
+                    continue
+                for day_dir in month_dir.iterdir():
+                    if not (day_dir.is_dir() and day_dir.name.isdigit()):
+                        continue
+                    try:
+                        day = date(int(year_dir.name), int(month_dir.name), int(day_dir.name))
+                    except ValueError:
+                        continue
+                    if day >= since:
+                        days.append(day_dir)
+        return days
 
     def _extract_bundle_id(self, bundle_path: Path) -> str:
         """Extract bundle ID from path or content."""
@@ -504,22 +909,23 @@ class WormUploader:
 
     def get_pending_count(self) -> int:
         """Get count of bundles pending upload."""
-        return len(self._find_pending_bundles())
+        self._scan_once()
+        counts = self._journal.counts()
+        return counts.get(STATE_PENDING, 0) + counts.get(STATE_FAILED, 0)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get upload statistics."""
-        uploaded = [r for r in self._upload_registry.values() if r.get("success")]
+        counts = self._journal.counts()
 
         return {
             "enabled": self.config.enabled,
             "mode": self.config.mode,
-            "total_uploaded": len(uploaded),
+            "total_uploaded": counts.get(STATE_UPLOADED, 0),
             "pending_count": self.get_pending_count(),
+            "failed_count": counts.get(STATE_FAILED, 0),
+            "missing_count": counts.get(STATE_MISSING, 0),
             "retention_days": self.config.retention_days,
-            "last_upload": max(
-                (r.get("upload_timestamp") for r in uploaded),
-                default=None
-            )
+            "last_upload": self._journal.last_upload()
         }
 
 
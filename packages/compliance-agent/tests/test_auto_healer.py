@@ -532,6 +532,105 @@ rules:
         assert cond_not.matches({"details": {}}) is True
 
 
+# ==================== Synced Rule Delta Tests ====================
+
+def _synced_rule(rule_id, check_type, action="run_runbook:RB-1"):
+    return {
+        "id": rule_id,
+        "name": rule_id,
+        "conditions": [
+            {"field": "check_type", "operator": "eq", "value": check_type},
+        ],
+        "actions": [action],
+    }
+
+
+class TestSyncedRuleDelta:
+    """Delta sync of /agent/sync rule bundles into l1_rules.json."""
+
+    def _engine_with_bundle(self, temp_db, temp_rules_dir, rules, version="v1"):
+        import json
+        (temp_rules_dir / "l1_rules.json").write_text(json.dumps({
+            "bundle_version": version,
+            "healing_tier": "standard",
+            "rules": rules,
+        }))
+        return DeterministicEngine(
+            rules_dir=temp_rules_dir, incident_db=temp_db, action_executor=None
+        )
+
+    def test_wrapped_file_records_bundle_version(self, temp_db, temp_rules_dir):
+        engine = self._engine_with_bundle(
+            temp_db, temp_rules_dir, [_synced_rule("R-A", "a")]
+        )
+        path = temp_rules_dir / "l1_rules.json"
+        assert engine.synced_bundle_versions[str(path)] == "v1"
+        assert engine.synced_rule_count(path) == 1
+
+    def test_delta_merges_without_reload(self, temp_db, temp_rules_dir):
+        import json
+        engine = self._engine_with_bundle(
+            temp_db, temp_rules_dir,
+            [_synced_rule("R-A", "a"), _synced_rule("R-B", "b")],
+        )
+        path = temp_rules_dir / "l1_rules.json"
+        untouched = next(r for r in engine.rules if r.id == "R-A")
+        total_before = len(engine.rules)
+
+        with patch.object(engine, "_load_rules") as full_reload:
+            engine.load_synced_rules(path, delta={
+                "bundle_version": "v2",
+                "base_version": "v1",
+                "healing_tier": "standard",
+                "delta": {
+                    "upsert": [
+                        _synced_rule("R-A2", "a2"),
+                        _synced_rule("R-B", "b", action="run_runbook:RB-2"),
+                    ],
+                    "remove": ["R-A"],
+                    "order": ["R-B", "R-A2"],
+                },
+            })
+            full_reload.assert_not_called()
+
+        ids = [r.id for r in engine.rules]
+        assert "R-A" not in ids and "R-A2" in ids
+        assert untouched not in engine.rules
+        assert len(engine.rules) == total_before
+        assert next(r for r in engine.rules if r.id == "R-B").action == "run_runbook:RB-2"
+        assert engine.synced_bundle_versions[str(path)] == "v2"
+
+        on_disk = json.loads(path.read_text())
+        assert on_disk["bundle_version"] == "v2"
+        assert [r["id"] for r in on_disk["rules"]] == ["R-B", "R-A2"]
+
+    def test_delta_base_mismatch_rejected(self, temp_db, temp_rules_dir):
+        engine = self._engine_with_bundle(
+            temp_db, temp_rules_dir, [_synced_rule("R-A", "a")]
+        )
+        path = temp_rules_dir / "l1_rules.json"
+        with pytest.raises(ValueError):
+            engine.load_synced_rules(path, delta={
+                "bundle_version": "v3",
+                "base_version": "v2",
+                "delta": {"upsert": [], "remove": [], "order": ["R-A"]},
+            })
+        assert engine.synced_bundle_versions[str(path)] == "v1"
+
+    def test_full_resync_replaces_previous_rules(self, temp_db, temp_rules_dir):
+        import json
+        engine = self._engine_with_bundle(
+            temp_db, temp_rules_dir, [_synced_rule("R-A", "a")]
+        )
+        path = temp_rules_dir / "l1_rules.json"
+        path.write_text(json.dumps([_synced_rule("R-Z", "z")]))
+        engine.load_synced_rules(path)
+        ids = [r.id for r in engine.rules]
+        assert "R-A" not in ids and ids.count("R-Z") == 1
+        # Legacy bare-list file carries no version -> next sync is full
+        assert str(path) not in engine.synced_bundle_versions
+
+
 # ==================== Level 3 Escalation Tests ====================
 
 class TestLevel3Escalation:
@@ -99,27 +99,36 @@ def _setup_billing_module():
     # Also ensure stripe is available as a mock
     sys.modules["stripe"] = stripe_mock
 
+    # lazy_imports has no sibling imports, so the real module is loaded
+    # rather than stubbed; its shared `stripe` proxy resolves to the mock.
+    _load_backend_module("lazy_imports")
+    billing_mod = _load_backend_module("billing")
+
+    return billing_mod, stripe_mock
+
+
+def _load_backend_module(name):
+    """Load backend/<name>.py from disk as backend.<name>."""
     import importlib.util
     import os
-    billing_path = os.path.join(
+    path = os.path.join(
         os.path.dirname(__file__),
         "..", "..", "..",
-        "mcp-server", "central-command", "backend", "billing.py"
+        "mcp-server", "central-command", "backend", f"{name}.py"
     )
-    billing_path = os.path.normpath(billing_path)
+    path = os.path.normpath(path)
 
     spec = importlib.util.spec_from_file_location(
-        f"{_BACKEND_PKG}.billing", billing_path,
+        f"{_BACKEND_PKG}.{name}", path,
         submodule_search_locations=[]
     )
-    billing_mod = importlib.util.module_from_spec(spec)
+    mod = importlib.util.module_from_spec(spec)
     # Critical: set __package__ so relative imports (from .fleet, etc.)
     # resolve through sys.modules stubs instead of the filesystem
-    billing_mod.__package__ = _BACKEND_PKG
-    sys.modules[f"{_BACKEND_PKG}.billing"] = billing_mod
-    spec.loader.exec_module(billing_mod)
-
-    return billing_mod, stripe_mock
+    mod.__package__ = _BACKEND_PKG
+    sys.modules[f"{_BACKEND_PKG}.{name}"] = mod
+    spec.loader.exec_module(mod)
+    return mod
 
 
 billing, mock_stripe_module = _setup_billing_module()
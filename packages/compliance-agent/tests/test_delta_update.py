@@ -0,0 +1,187 @@
+"""
+Tests for content-addressed delta updates (delta_update.py): manifest
+validation and signature pinning, local chunk reuse from the previous
+image (including shifted chunks and a partial earlier attempt), Range
+coalescing, that a copied chunk is re-verified as it is written, and
+that LAN peer rounds stay within the peer cache's wait deadline.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+
+import pytest
+
+from compliance_agent import update_agent
+from compliance_agent.delta_update import (
+    MANIFEST_FORMAT,
+    ChunkManifest,
+    ManifestError,
+    canonical_manifest_json,
+    copy_local_chunks,
+    plan_delta,
+    prepare_output,
+)
+from compliance_agent.update_agent import UpdateAgent
+
+CS = 16
+
+
+def _manifest_dict(data: bytes, version: str = "2.0.0", chunk_size: int = CS) -> dict:
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "size_bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "chunk_size": chunk_size,
+        "chunks": [
+            hashlib.sha256(data[i:i + chunk_size]).hexdigest()
+            for i in range(0, len(data), chunk_size)
+        ],
+    }
+
+
+def _blocks(*tags: bytes) -> bytes:
+    return b"".join(t * CS for t in tags)
+
+
+def test_from_dict_rejects_inconsistent_chunk_count():
+    m = _manifest_dict(_blocks(b"a", b"b"))
+    m["chunks"] = m["chunks"][:1]
+    with pytest.raises(ManifestError):
+        ChunkManifest.from_dict(m)
+    with pytest.raises(ManifestError):
+        ChunkManifest.from_dict(dict(_manifest_dict(b"x"), format="other/v0"))
+
+
+def test_plan_reuses_shifted_chunks_from_previous_image(tmp_path):
+    old = tmp_path / "active.img"
+    # Previous image plus trailing partition garbage
+    old.write_bytes(_blocks(b"a", b"b", b"c", b"d") + b"\0" * 64)
+    new = _blocks(b"b", b"a", b"x", b"d") + b"tail"
+    manifest = ChunkManifest.from_dict(_manifest_dict(new))
+
+    out = tmp_path / "2.0.0.iso.part"
+    plan = plan_delta(manifest, out, [tmp_path / "missing.iso", old])
+
+    assert plan.local == {0: (old, CS), 1: (old, 0), 3: (old, 3 * CS)}
+    assert plan.missing == [2, 4]
+    stats = plan.stats(manifest)
+    assert stats["reused_bytes"] == 3 * CS
+    assert stats["fetched_bytes"] == CS + 4
+
+    prepare_output(manifest, out)
+    assert copy_local_chunks(manifest, plan, out) == []
+    body = out.read_bytes()
+    assert len(body) == len(new)
+    assert body[:2 * CS] == new[:2 * CS]
+    assert body[3 * CS:4 * CS] == new[3 * CS:4 * CS]
+
+
+def test_partial_output_chunks_stay_in_place(tmp_path):
+    new = _blocks(b"a", b"b", b"c")
+    manifest = ChunkManifest.from_dict(_manifest_dict(new))
+    out = tmp_path / "2.0.0.iso.part"
+    out.write_bytes(new[:CS] + b"\0" * (2 * CS))
+
+    plan = plan_delta(manifest, out, [])
+    assert plan.in_place == {0}
+    assert plan.missing == [1, 2]
+
+
+def test_fetch_ranges_coalesce_and_cap():
+    from compliance_agent.delta_update import DeltaPlan
+
+    plan = DeltaPlan(missing=[7, 1, 2, 3, 5, 6])
+    assert plan.fetch_ranges() == [(1, 3), (5, 7)]
+    assert plan.fetch_ranges(max_run=2) == [(1, 2), (3, 3), (5, 6), (7, 7)]
+
+
+def test_copy_detects_source_changed_after_indexing(tmp_path):
+    old = tmp_path / "active.img"
+    old.write_bytes(_blocks(b"a", b"b"))
+    manifest = ChunkManifest.from_dict(_manifest_dict(_blocks(b"a", b"b")))
+    out = tmp_path / "out.part"
+    plan = plan_delta(manifest, out, [old])
+    assert sorted(plan.local) == [0, 1]
+
+    with open(old, "r+b") as f:
+        f.seek(CS)
+        f.write(b"z" * CS)
+    prepare_output(manifest, out)
+    assert copy_local_chunks(manifest, plan, out) == [1]
+
+
+def test_signed_manifest_requires_pinned_key():
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+    def _pub_hex(key):
+        return key.public_key().public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        ).hex()
+
+    server, attacker = Ed25519PrivateKey.generate(), Ed25519PrivateKey.generate()
+    manifest = _manifest_dict(os.urandom(40))
+    data = canonical_manifest_json(manifest).encode()
+    payload = {
+        "manifest": manifest,
+        "signature": server.sign(data).hex(),
+        "server_public_keys": [_pub_hex(attacker)],  # never trusted
+    }
+
+    parsed = ChunkManifest.from_signed(payload, [_pub_hex(attacker), _pub_hex(server)])
+    assert parsed.chunks == tuple(manifest["chunks"])
+
+    with pytest.raises(ManifestError):
+        ChunkManifest.from_signed(payload, [_pub_hex(attacker)])
+    with pytest.raises(ManifestError):
+        ChunkManifest.from_signed(payload, [])
+
+    tampered = dict(payload, manifest=dict(manifest, sha256="0" * 64))
+    with pytest.raises(ManifestError):
+        ChunkManifest.from_signed(tampered, [_pub_hex(server)])
+
+
+def test_peer_round_is_bounded_by_wait_deadline(tmp_path, monkeypatch):
+    """An unreachable owner must not hold the download past wait_seconds."""
+    data = _blocks(b"a", b"b")
+    manifest = ChunkManifest.from_dict(_manifest_dict(data))
+    part = tmp_path / "image.part"
+    part.write_bytes(b"\0" * len(data))
+
+    class _Peers:
+        wait_seconds = 0.2
+        poll_interval = 0
+
+        def __init__(self):
+            self.hits = 0
+
+        async def fetch_from_owner(self, session, digest):
+            if digest == manifest.chunks[0]:
+                return data[:CS]
+            await asyncio.sleep(15)  # PEER_REQUEST_TIMEOUT on a dead owner
+
+        def record_peer_hit(self, n):
+            self.hits += 1
+
+    @contextlib.asynccontextmanager
+    async def _session():
+        yield object()
+
+    monkeypatch.setattr(update_agent, "shared_session", _session)
+    monkeypatch.setattr(UpdateAgent, "STATE_DIR", tmp_path / "state")
+    agent = UpdateAgent("https://api.test", "key", "site-1-AA", download_dir=tmp_path,
+                        peer_cache=_Peers())
+    got = []
+
+    started = time.monotonic()
+    left = asyncio.run(agent._fetch_chunks_from_peers(
+        manifest, [0, 1], part, lambda i, n, peer=False: got.append(i),
+    ))
+    assert time.monotonic() - started < 2
+    assert left == [1] and got == [0]
+    assert part.read_bytes()[:CS] == data[:CS]
@@ -537,7 +537,7 @@ def test_worm_uploader_stats(worm_uploader):
 
 
 def test_worm_upload_registry(temp_evidence_dir):
-    """Test upload registry persistence."""
+    """Test upload registry persistence (writes go through to the journal)."""
     config = WormConfig(enabled=False)
     uploader = WormUploader(
         config=config,
@@ -545,13 +545,12 @@ def test_worm_upload_registry(temp_evidence_dir):
         client_id="test-client"
     )
 
-    # Manually add to registry
+    # Manually add to registry; no explicit save step
     uploader._upload_registry["EB-test-0001"] = {
         "success": True,
         "s3_uri": "s3://bucket/key",
         "upload_timestamp": "2025-11-06T00:00:00"
     }
-    uploader._save_registry()
 
     # Create new uploader and verify registry loaded
     uploader2 = WormUploader(
@@ -0,0 +1,153 @@
+"""
+Tests for draining the offline evidence queue through /submit-batch.
+
+The drain sends every ready bundle in one request and settles each
+queue entry from its per-bundle result; if the batch request fails it
+falls back to one submit_evidence call per bundle.
+"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from compliance_agent.offline_queue import EvidenceQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return EvidenceQueue(tmp_path / "queue.db", max_retries=5)
+
+
+@pytest.fixture
+def client():
+    """Real payload builder, mocked transport."""
+    from compliance_agent.appliance_client import CentralCommandClient
+
+    config = MagicMock()
+    config.site_id = "test-site"
+    config.api_endpoint = "https://api.example.test"
+    c = CentralCommandClient(config)
+    c._request = AsyncMock()
+    return c
+
+
+@pytest.fixture
+def agent(queue, client):
+    from compliance_agent.appliance_agent import ApplianceAgent
+
+    a = ApplianceAgent.__new__(ApplianceAgent)
+    a._evidence_queue = queue
+    a.client = client
+    a.signer = MagicMock()
+    a.signer.sign = MagicMock(return_value=b"\x01" * 64)
+    return a
+
+
+async def _enqueue(queue, tmp_path, n):
+    for i in range(n):
+        path = tmp_path / f"bundle-{i}" / "bundle.json"
+        path.parent.mkdir()
+        path.write_text(json.dumps({"check_name": "patching", "status": "compliant", "i": i}))
+        await queue.enqueue(bundle_id=f"EB-{i}", bundle_path=path, signature_path=None)
+
+
+@pytest.mark.asyncio
+async def test_drain_uses_single_batch_request(agent, queue, client, tmp_path):
+    await _enqueue(queue, tmp_path, 3)
+    client._request.return_value = (200, {
+        "accepted": 2, "deduplicated": 0, "rejected": 1,
+        "results": [
+            {"index": 0, "status": "accepted", "bundle_id": "CB-0"},
+            {"index": 1, "status": "rejected", "bundle_id": "CB-1",
+             "error": "Evidence signature verification failed."},
+            {"index": 2, "status": "deduplicated", "bundle_id": "CB-2"},
+        ],
+    })
+
+    await agent._drain_evidence_queue()
+
+    assert client._request.await_count == 1
+    method, endpoint = client._request.await_args.args
+    assert method == "POST"
+    assert endpoint == "/api/evidence/sites/test-site/submit-batch"
+    bundles = client._request.await_args.kwargs["json_data"]["bundles"]
+    assert len(bundles) == 3
+    assert all(b["agent_signature"] == ("01" * 64) and b["signed_data"] for b in bundles)
+    assert client._request.await_args.kwargs["pre_scrubbed"] is True
+
+    stats = await queue.get_stats()
+    assert stats["total_pending"] == 1
+    rejected = await queue.get_by_bundle_id("EB-1")
+    assert rejected.retry_count == 1
+    assert "signature" in rejected.last_error
+
+
+@pytest.mark.asyncio
+async def test_drain_falls_back_to_single_submits(agent, queue, client, tmp_path):
+    await _enqueue(queue, tmp_path, 2)
+    client._request.side_effect = [
+        (404, {"detail": "Not Found"}),
+        (200, {"bundle_id": "CB-0"}),
+        (200, {"bundle_id": "CB-1"}),
+    ]
+
+    await agent._drain_evidence_queue()
+
+    endpoints = [c.args[1] for c in client._request.await_args_list]
+    assert endpoints == [
+        "/api/evidence/sites/test-site/submit-batch",
+        "/api/evidence/sites/test-site/submit",
+        "/api/evidence/sites/test-site/submit",
+    ]
+    assert (await queue.get_stats())["total_pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unbuildable_bundle_does_not_block_drain(agent, queue, client, tmp_path):
+    await _enqueue(queue, tmp_path, 3)
+    (tmp_path / "bundle-1" / "bundle.json").write_text("{not json")
+    build = client.build_evidence_payload
+
+    def flaky_build(**kwargs):
+        if kwargs["evidence_data"]["i"] == 2:
+            raise ValueError("scrubber exploded")
+        return build(**kwargs)
+
+    client.build_evidence_payload = flaky_build
+    client._request.return_value = (200, {
+        "accepted": 1, "deduplicated": 0, "rejected": 0,
+        "results": [{"index": 0, "status": "accepted", "bundle_id": "CB-0"}],
+    })
+
+    await agent._drain_evidence_queue()
+
+    assert client._request.await_count == 1
+    assert len(client._request.await_args.kwargs["json_data"]["bundles"]) == 1
+    assert (await queue.get_stats())["total_pending"] == 2  # EB-0 uploaded
+    for bundle_id, error in (("EB-1", "Expecting"), ("EB-2", "scrubber exploded")):
+        item = await queue.get_by_bundle_id(bundle_id)
+        assert item.retry_count == 1 and error in item.last_error
+
+
+@pytest.mark.asyncio
+async def test_payload_builder_matches_single_submit(client):
+    """Batch and single submits sign the same scrubbed payload shape."""
+    signer = MagicMock()
+    signer.sign = MagicMock(return_value=b"\x02" * 64)
+    client._request.return_value = (200, {"bundle_id": "CB-x"})
+
+    await client.submit_evidence(
+        bundle_hash="h", check_type="ntp_sync", check_result="compliant",
+        evidence_data={"offset_ms": 3}, host="appliance-1", signer=signer,
+    )
+    single = client._request.await_args.kwargs["json_data"]
+    built = client.build_evidence_payload(
+        bundle_hash="h", check_type="ntp_sync", check_result="compliant",
+        evidence_data={"offset_ms": 3}, host="appliance-1", signer=signer,
+        timestamp=None,
+    )
+
+    assert set(single) == set(built)
+    assert single["checks"] == built["checks"]
+    assert json.loads(built["signed_data"])["checks"] == built["checks"]
@@ -304,3 +304,240 @@ class TestTLSCredentials:
                 str(cert_file), str(key_file), str(tmp_path / "nonexistent_ca.crt")
             )
             assert result is not None
+
+
+class TestRegistryThreadSafety:
+    """Registry mutations from many gRPC worker threads."""
+
+    def test_concurrent_touch_counts_every_event(self):
+        import threading
+
+        registry = AgentRegistry()
+        registry.register(AgentState("go-ws01", "WS01", 0))
+
+        def hammer():
+            for _ in range(1000):
+                registry.touch("go-ws01", drift_events=1)
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert registry.get_agent("go-ws01").drift_count == 8000
+
+    def test_queue_and_pop_commands(self):
+        registry = AgentRegistry()
+        registry.register(AgentState("go-ws01", "WS01", 0))
+        cmd = MagicMock(command_id="c1")
+        assert registry.queue_heal_command("ws01", cmd) is True
+        assert registry.pop_pending_commands("go-ws01") == [cmd]
+        assert registry.pop_pending_commands("go-ws01") == []
+
+
+class TestDriftHealingQueue:
+    """Coalescing, bounds and metrics of the async healing queue."""
+
+    def _run(self, coro):
+        import asyncio
+        return asyncio.run(coro)
+
+    def test_coalesces_per_host_check_and_cancels_on_pass(self):
+        import asyncio
+        from compliance_agent.drift_queue import DriftHealingQueue
+
+        healed = []
+
+        async def handler(payload, enqueued_at):
+            healed.append(payload)
+            return True
+
+        async def go():
+            q = DriftHealingQueue(handler, workers=2)
+            await q.start()
+            # Submitted in one loop turn -> workers have not run yet
+            q.submit_threadsafe(("ws01", "firewall"), "fw-1")
+            q.submit_threadsafe(("ws01", "firewall"), "fw-2")
+            q.submit_threadsafe(("ws01", "defender"), "def-1")
+            q.submit_threadsafe(("ws01", "defender"), "def-ok", passed=True)
+            q.submit_threadsafe(("ws02", "firewall"), "fw-ws02")
+            for _ in range(20):
+                await asyncio.sleep(0)
+            stats = q.stats()
+            await q.stop()
+            return stats
+
+        stats = self._run(go())
+        assert sorted(healed) == ["fw-2", "fw-ws02"]
+        assert stats["coalesced"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["healed"] == 2
+        assert stats["events_received"] == 5
+        assert stats["queue_depth"] == 0
+        assert stats["heal_latency_p50_s"] is not None
+
+    def test_bounded_drops_new_keys_only(self):
+        import asyncio
+        from compliance_agent.drift_queue import DriftHealingQueue
+
+        release = None
+
+        async def handler(payload, enqueued_at):
+            await release.wait()
+            return True
+
+        async def go():
+            nonlocal release
+            release = asyncio.Event()
+            q = DriftHealingQueue(handler, max_pending=2, workers=1)
+            await q.start()
+            q.submit_threadsafe(("h1", "c"), 1)
+            await asyncio.sleep(0)  # worker takes h1 -> in flight
+            q.submit_threadsafe(("h2", "c"), 2)
+            q.submit_threadsafe(("h3", "c"), 3)
+            q.submit_threadsafe(("h4", "c"), 4)   # full -> dropped
+            q.submit_threadsafe(("h2", "c"), 22)  # existing key still coalesces
+            stats = q.stats()
+            release.set()
+            await q.stop()
+            return stats
+
+        stats = self._run(go())
+        assert stats["dropped"] == 1
+        assert stats["coalesced"] == 1
+        assert stats["queue_depth"] == 2
+        assert stats["in_flight"] == 1
+
+    def test_in_flight_key_not_healed_twice_concurrently(self):
+        import asyncio
+        from compliance_agent.drift_queue import DriftHealingQueue
+
+        active = {"n": 0, "max": 0}
+
+        async def handler(payload, enqueued_at):
+            active["n"] += 1
+            active["max"] = max(active["max"], active["n"])
+            await asyncio.sleep(0.01)
+            active["n"] -= 1
+            return True
+
+        async def go():
+            q = DriftHealingQueue(handler, workers=4)
+            await q.start()
+            q.submit_threadsafe(("ws01", "firewall"), "a")
+            await asyncio.sleep(0)
+            q.submit_threadsafe(("ws01", "firewall"), "b")
+            await asyncio.sleep(0.05)
+            stats = q.stats()
+            await q.stop()
+            return stats
+
+        stats = self._run(go())
+        assert active["max"] == 1
+        assert stats["healed"] == 2
+
+    def test_submit_from_worker_thread(self):
+        import asyncio
+        import threading
+        from compliance_agent.drift_queue import DriftHealingQueue
+
+        healed = []
+
+        async def handler(payload, enqueued_at):
+            healed.append(payload)
+            return True
+
+        async def go():
+            q = DriftHealingQueue(handler, workers=1)
+            await q.start()
+            t = threading.Thread(
+                target=q.submit_threadsafe, args=(("ws09", "bitlocker"), "bl"),
+            )
+            t.start()
+            t.join()
+            for _ in range(50):
+                if healed:
+                    break
+                await asyncio.sleep(0.01)
+            await q.stop()
+
+        self._run(go())
+        assert healed == ["bl"]
+
+
+@pytest.mark.skipif(not GRPC_AVAILABLE, reason="grpcio not installed")
+class TestAckFirstIngest:
+    """ReportDrift acks without waiting on the healing engine."""
+
+    def _event(self, hostname="WS01", check_type="firewall", passed=False):
+        from compliance_agent import compliance_pb2
+        return compliance_pb2.DriftEvent(
+            agent_id="go-ws01",
+            hostname=hostname,
+            check_type=check_type,
+            passed=passed,
+            timestamp=1,
+        )
+
+    def test_report_drift_enqueues_instead_of_healing(self):
+        from compliance_agent.grpc_server import ComplianceAgentServicer
+
+        registry = AgentRegistry()
+        registry.register(AgentState("go-ws01", "WS01", 0))
+        healing_engine = AsyncMock()
+        queue = MagicMock()
+        servicer = ComplianceAgentServicer(
+            registry, healing_engine=healing_engine, drift_queue=queue,
+        )
+
+        acks = list(servicer.ReportDrift(
+            iter([self._event(), self._event(check_type="defender", passed=True)]),
+            None,
+        ))
+
+        assert [a.received for a in acks] == [True, True]
+        assert acks[0].heal_command.action == "enable"
+        healing_engine.heal.assert_not_called()
+        keys = [c.args[0] for c in queue.submit_threadsafe.call_args_list]
+        assert keys == [("ws01", "firewall"), ("ws01", "defender")]
+        assert queue.submit_threadsafe.call_args_list[1].kwargs["passed"] is True
+        assert registry.get_agent("go-ws01").drift_count == 2
+
+    def test_async_servicer_streams_and_heals_via_queue(self):
+        import asyncio
+        from compliance_agent.drift_queue import DriftHealingQueue
+        from compliance_agent.grpc_server import AsyncComplianceAgentServicer
+
+        registry = AgentRegistry()
+        healing_engine = AsyncMock()
+        healing_engine.heal.return_value = MagicMock(success=True)
+        config = MagicMock(site_id="test-site")
+        servicer = AsyncComplianceAgentServicer(
+            registry, healing_engine=healing_engine, config=config,
+        )
+
+        async def stream():
+            for host in ("WS01", "WS02", "WS01"):
+                yield self._event(hostname=host)
+
+        async def go():
+            servicer.drift_queue = DriftHealingQueue(servicer.heal_queued_drift)
+            await servicer.drift_queue.start()
+            registry.drift_queue = servicer.drift_queue
+            acks = [a async for a in servicer.ReportDrift(stream(), None)]
+            for _ in range(50):
+                if servicer.drift_queue.stats()["healed"] >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            stats = get_grpc_stats(registry)
+            await servicer.drift_queue.stop()
+            return acks, stats
+
+        acks, stats = asyncio.run(go())
+        assert len(acks) == 3
+        ingest = stats["drift_ingest"]
+        assert ingest["events_received"] == 3
+        assert ingest["coalesced"] == 1
+        assert ingest["healed"] == 2
+        assert healing_engine.heal.await_count == 2
@@ -0,0 +1,165 @@
+"""
+Tests for the shared outbound HTTP transport (http_transport.py): one
+pooled session reused across requests, GET coalescing, the retry policy
+(which statuses, which methods, Retry-After), gzip request bodies and
+per-endpoint metrics. Runs against a local aiohttp test server.
+"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from compliance_agent.http_transport import (
+    HttpTransport,
+    encode_body,
+    endpoint_label,
+    retry_after_seconds,
+)
+
+
+@pytest.fixture
+async def server():
+    state = {"hits": {}, "fail": {}, "bodies": [], "peers": set()}
+
+    async def handler(request):
+        path = request.path
+        state["hits"][path] = state["hits"].get(path, 0) + 1
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        raw = await request.read()
+        # aiohttp inflates gzip bodies itself; keep the wire size
+        state["bodies"].append((
+            request.headers.get("Content-Encoding"),
+            int(request.headers.get("Content-Length", 0)),
+            raw,
+        ))
+        remaining = state["fail"].get(path)
+        if remaining:
+            status, headers = remaining.pop(0)
+            return web.Response(status=status, headers=headers, text="busy")
+        if path == "/slow":
+            await asyncio.sleep(0.05)
+        return web.json_response({"path": path})
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["base"] = f"http://127.0.0.1:{port}"
+    yield state
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def transport():
+    t = HttpTransport(backoff_base=0.001, backoff_max=1.0)
+    yield t
+    await t.close()
+
+
+async def test_requests_reuse_pooled_connection(server, transport):
+    for _ in range(5):
+        resp = await transport.request("GET", f"{server['base']}/api/x")
+        assert resp.status == 200 and resp.json() == {"path": "/api/x"}
+    assert len(server["peers"]) == 1
+
+
+async def test_identical_inflight_gets_are_coalesced(server, transport):
+    url = f"{server['base']}/slow"
+    results = await asyncio.gather(*(transport.request("GET", url) for _ in range(4)))
+    assert [r.status for r in results] == [200] * 4
+    assert server["hits"]["/slow"] == 1
+    assert transport.stats()[endpoint_label("GET", url)]["coalesced"] == 3
+
+
+async def test_retries_honor_method_and_status(server, transport):
+    base = server["base"]
+    server["fail"]["/get"] = [(502, {}), (503, {"Retry-After": "0"})]
+    server["fail"]["/post"] = [(502, {})]
+    server["fail"]["/limited"] = [(429, {"Retry-After": "0"})]
+
+    assert (await transport.request("GET", f"{base}/get")).status == 200
+    assert server["hits"]["/get"] == 3
+    # 502 on a POST may have been processed: not retried
+    assert (await transport.request("POST", f"{base}/post", json={})).status == 502
+    assert server["hits"]["/post"] == 1
+    # 429 means not processed: retried for any method
+    assert (await transport.request("POST", f"{base}/limited", json={})).status == 200
+    assert server["hits"]["/limited"] == 2
+
+
+async def test_long_retry_after_is_returned_not_waited(server, transport):
+    server["fail"]["/later"] = [(503, {"Retry-After": "3600"})]
+    resp = await transport.request("GET", f"{server['base']}/later")
+    assert resp.status == 503
+    assert server["hits"]["/later"] == 1
+
+
+async def test_connection_errors_raise_after_retries():
+    import aiohttp
+
+    t = HttpTransport(max_retries=1, backoff_base=0.001)
+    try:
+        with pytest.raises(aiohttp.ClientError):
+            await t.request("GET", "http://127.0.0.1:9/unreachable")
+        stats = t.stats()["GET 127.0.0.1:9/unreachable"]
+        assert stats["requests"] == 2 and stats["retries"] == 1 and stats["errors"] == 2
+    finally:
+        await t.close()
+
+
+async def test_post_is_not_resent_after_timeout(server, transport):
+    import aiohttp
+
+    # /slow may have been processed before the timeout: resending would
+    # duplicate it. A GET is still retried.
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.request("POST", f"{server['base']}/slow", json={}, timeout=0.01)
+    assert server["hits"]["/slow"] == 1
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.request("GET", f"{server['base']}/slow", timeout=0.01, max_retries=1)
+    assert server["hits"]["/slow"] == 3
+
+    # A failed connect never reached a server: POSTs are retried.
+    t = HttpTransport(max_retries=1, backoff_base=0.001)
+    try:
+        with pytest.raises(aiohttp.ClientConnectorError):
+            await t.request("POST", "http://127.0.0.1:9/unreachable", json={})
+        assert t.stats()["POST 127.0.0.1:9/unreachable"]["retries"] == 1
+    finally:
+        await t.close()
+
+
+async def test_gzip_bodies_and_byte_metrics(server, transport):
+    payload = {"bundles": [{"check": "patching", "n": i} for i in range(200)]}
+    await transport.request("POST", f"{server['base']}/api/evidence/batch",
+                            json=payload, compress=True)
+    await transport.request("POST", f"{server['base']}/api/small",
+                            json={"a": 1}, compress=True)
+
+    (enc, wire, raw), (small_enc, small_wire, small_raw) = server["bodies"]
+    assert enc == "gzip" and json.loads(raw) == payload and wire < len(raw) / 4
+    assert small_enc is None and json.loads(small_raw) == {"a": 1} and small_wire == len(small_raw)
+
+    stats = transport.stats()[f"POST {server['base'][7:]}/api/evidence/batch"]
+    assert stats["bytes_sent"] == wire
+    assert stats["bytes_received"] > 0 and stats["p50_ms"] is not None
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("post", "https://api.example.com/api/orders/ORD-20260110-0042/complete") == \
+        "POST api.example.com/api/orders/:id/complete"
+    assert endpoint_label("GET", "https://api.example.com/api/appliances/checkin") == \
+        "GET api.example.com/api/appliances/checkin"
+
+
+def test_retry_after_parsing_and_gzip_threshold():
+    assert retry_after_seconds("7") == 7.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+    body, headers = encode_body(json={"x": "y" * 10}, compress=True)
+    assert "Content-Encoding" not in headers and json.loads(body) == {"x": "y" * 10}
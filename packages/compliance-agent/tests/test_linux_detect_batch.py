@@ -0,0 +1,295 @@
+"""
+Tests for batched Linux drift detection.
+
+Covers the single-exec detect batch (LinuxExecutor.run_detect_batch),
+its record parser, the per-check fallback, and bounded parallel host
+scanning in LinuxDriftDetector.
+"""
+
+import asyncio
+import base64
+import shutil
+import subprocess
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from compliance_agent.linux_drift import LinuxDriftDetector
+from compliance_agent.runbooks.linux.executor import (
+    DETECT_RECORD_MARKER,
+    LinuxExecutionResult,
+    LinuxExecutor,
+    LinuxTarget,
+)
+from compliance_agent.runbooks.linux.runbooks import RUNBOOKS
+
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode()).decode()
+
+
+def _result(runbook_id, target="host", exit_code=0, stdout=""):
+    return LinuxExecutionResult(
+        success=exit_code == 0,
+        runbook_id=runbook_id,
+        target=target,
+        phase="detect",
+        output={"stdout": stdout, "stderr": "", "exit_code": exit_code},
+        duration_seconds=0.01,
+        exit_code=exit_code,
+    )
+
+
+@pytest.fixture
+def root_target():
+    return LinuxTarget(hostname="10.0.0.5", username="root", distro="ubuntu")
+
+
+# =============================================================================
+# RECORD PARSING
+# =============================================================================
+
+class TestParseDetectBatch:
+    """Tests for _parse_detect_batch."""
+
+    def test_parses_records(self):
+        stdout = "\n".join([
+            "noise from a login banner",
+            f"{DETECT_RECORD_MARKER} LIN-SSH-001 0 12 {_b64('COMPLIANT')} -",
+            f"{DETECT_RECORD_MARKER} LIN-FW-001 1 40 - {_b64('ufw: not found')}",
+        ])
+        records = LinuxExecutor._parse_detect_batch(stdout)
+
+        assert records["LIN-SSH-001"] == (0, 12, "COMPLIANT", "")
+        assert records["LIN-FW-001"] == (1, 40, "", "ufw: not found")
+
+    def test_skips_malformed_records(self):
+        stdout = "\n".join([
+            f"{DETECT_RECORD_MARKER} LIN-A 0 12",
+            f"{DETECT_RECORD_MARKER} LIN-B zero 12 - -",
+            f"{DETECT_RECORD_MARKER} LIN-C 0 5 !!notb64 -",
+            f"{DETECT_RECORD_MARKER} LIN-D 0 5 - -",
+        ])
+        records = LinuxExecutor._parse_detect_batch(stdout)
+
+        assert list(records) == ["LIN-D"]
+
+
+# =============================================================================
+# BATCHED EXECUTION
+# =============================================================================
+
+class TestRunDetectBatch:
+    """Tests for LinuxExecutor.run_detect_batch."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+    async def test_one_exec_for_all_checks(self, root_target, monkeypatch):
+        """The shipped prelude runs every check and emits one record each."""
+        executor = LinuxExecutor()
+        scripts = []
+
+        async def local_exec(target, script, timeout=60, retries=0,
+                             use_sudo=False, scrub_output=True, **kwargs):
+            scripts.append(script)
+            proc = subprocess.run(
+                ["bash", "-c", script], capture_output=True, text=True, timeout=timeout
+            )
+            return _result("", stdout=proc.stdout, exit_code=proc.returncode)
+
+        fake_runbooks = {
+            "LIN-T-001": MagicMock(detect_script="echo ok", requires_sudo=False,
+                                   timeout_seconds=5, hipaa_controls=["164.312(b)"]),
+            "LIN-T-002": MagicMock(detect_script="echo bad >&2; exit 3", requires_sudo=False,
+                                   timeout_seconds=5, hipaa_controls=[]),
+        }
+        monkeypatch.setattr(
+            "compliance_agent.runbooks.linux.runbooks.get_runbook", fake_runbooks.get
+        )
+        monkeypatch.setattr(executor, "execute_script", local_exec)
+        executor.run_runbook = AsyncMock()
+
+        results = await executor.run_detect_batch(root_target, list(fake_runbooks))
+
+        assert len(scripts) == 1
+        executor.run_runbook.assert_not_called()
+        assert results["LIN-T-001"].success
+        assert results["LIN-T-001"].output["stdout"] == "ok"
+        assert results["LIN-T-001"].hipaa_controls == ["164.312(b)"]
+        assert not results["LIN-T-002"].success
+        assert results["LIN-T-002"].exit_code == 3
+        assert results["LIN-T-002"].output["stderr"].strip() == "bad"
+
+    @pytest.mark.asyncio
+    async def test_unknown_runbook_reports_not_found(self, root_target, monkeypatch):
+        """Unknown ids get run_runbook's "Runbook not found" result, no exec."""
+        executor = LinuxExecutor()
+        executor.execute_script = AsyncMock()
+        executor.run_runbook = AsyncMock()
+        monkeypatch.setattr(executor, "detect_distro", AsyncMock(return_value="ubuntu"))
+        monkeypatch.setattr(
+            "compliance_agent.runbooks.linux.runbooks.get_runbook", {}.get
+        )
+
+        results = await executor.run_detect_batch(root_target, ["LIN-NOPE-001"])
+
+        result = results["LIN-NOPE-001"]
+        assert not result.success
+        assert result.phase == "init"
+        assert result.error == "Runbook not found: LIN-NOPE-001"
+        executor.execute_script.assert_not_called()
+        executor.run_runbook.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sudo_checks_get_their_own_exec(self, monkeypatch):
+        executor = LinuxExecutor()
+        target = LinuxTarget(hostname="10.0.0.6", username="admin", distro="ubuntu")
+        calls = []
+
+        async def fake_exec(target, script, use_sudo=False, **kwargs):
+            calls.append(use_sudo)
+            return _result("", stdout="")
+
+        fake_runbooks = {
+            "LIN-T-001": MagicMock(detect_script="true", requires_sudo=False, timeout_seconds=5),
+            "LIN-T-002": MagicMock(detect_script="true", requires_sudo=True, timeout_seconds=5),
+            "LIN-T-003": MagicMock(detect_script="true", requires_sudo=True, timeout_seconds=5),
+        }
+        monkeypatch.setattr(
+            "compliance_agent.runbooks.linux.runbooks.get_runbook", fake_runbooks.get
+        )
+        monkeypatch.setattr(executor, "execute_script", fake_exec)
+        executor.run_runbook = AsyncMock(return_value=[])
+
+        await executor.run_detect_batch(target, list(fake_runbooks))
+
+        assert sorted(calls) == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_missing_records_fall_back_per_check(self, root_target, monkeypatch):
+        """Checks without a record are re-run individually, bounded per host."""
+        executor = LinuxExecutor(max_channels_per_host=2)
+        ids = [rid for rid, rb in RUNBOOKS.items() if rb.detect_script][:5]
+        stdout = f"{DETECT_RECORD_MARKER} {ids[0]} 0 3 {_b64('COMPLIANT')} -"
+
+        async def fake_exec(target, script, **kwargs):
+            return _result("", stdout=stdout, exit_code=255)
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_run_runbook(target, runbook_id, phases=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [_result(runbook_id, stdout="fallback")]
+
+        monkeypatch.setattr(executor, "execute_script", fake_exec)
+        monkeypatch.setattr(executor, "run_runbook", fake_run_runbook)
+
+        results = await executor.run_detect_batch(root_target, ids)
+
+        assert set(results) == set(ids)
+        assert results[ids[0]].output["stdout"] == "COMPLIANT"
+        assert all(results[rid].output["stdout"] == "fallback" for rid in ids[1:])
+        assert peak <= 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_record_sets_error(self, root_target, monkeypatch):
+        executor = LinuxExecutor()
+        rid = next(rid for rid, rb in RUNBOOKS.items() if rb.detect_script)
+
+        async def fake_exec(target, script, **kwargs):
+            return _result("", stdout=f"{DETECT_RECORD_MARKER} {rid} 124 5000 - -")
+
+        monkeypatch.setattr(executor, "execute_script", fake_exec)
+
+        results = await executor.run_detect_batch(root_target, [rid])
+
+        assert results[rid].exit_code == 124
+        assert "timed out" in results[rid].error
+
+
+# =============================================================================
+# PARALLEL HOST SCANNING
+# =============================================================================
+
+class TestParallelHostScan:
+    """Tests for bounded concurrent detect_all."""
+
+    def _detector(self, hosts, max_concurrent_hosts):
+        executor = MagicMock(spec=LinuxExecutor)
+        executor._distro_cache = {}
+        state = {"in_flight": 0, "peak": 0, "execs": 0}
+
+        async def fake_batch(target, runbook_ids):
+            state["execs"] += 1
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            return {
+                rid: _result(rid, target=target.hostname, stdout="COMPLIANT")
+                for rid in runbook_ids
+            }
+
+        executor.run_detect_batch = AsyncMock(side_effect=fake_batch)
+        targets = [LinuxTarget(hostname=h, distro="ubuntu") for h in hosts]
+        detector = LinuxDriftDetector(
+            targets=targets,
+            executor=executor,
+            max_concurrent_hosts=max_concurrent_hosts,
+        )
+        return detector, state
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_and_one_batch_per_host(self):
+        hosts = [f"10.0.0.{i}" for i in range(1, 7)]
+        detector, state = self._detector(hosts, max_concurrent_hosts=2)
+
+        results = await detector.detect_all()
+
+        assert state["execs"] == len(hosts)
+        assert 1 < state["peak"] <= 2
+        assert results
+        assert {r.target for r in results} == set(hosts)
+
+    @pytest.mark.asyncio
+    async def test_results_keep_target_order(self):
+        hosts = ["b-host", "a-host", "c-host"]
+        detector, _ = self._detector(hosts, max_concurrent_hosts=3)
+
+        results = await detector.detect_all()
+
+        seen = []
+        for r in results:
+            if r.target not in seen:
+                seen.append(r.target)
+        assert seen == hosts
+
+    @pytest.mark.asyncio
+    async def test_summary_reports_per_host_timing(self):
+        hosts = ["10.0.0.1", "10.0.0.2"]
+        detector, _ = self._detector(hosts, max_concurrent_hosts=2)
+
+        await detector.detect_all()
+        summary = detector.get_drift_summary()
+
+        assert summary["scan_duration_seconds"] is not None
+        assert set(summary["hosts"]) == set(hosts)
+        for timing in summary["hosts"].values():
+            assert timing["duration_seconds"] >= 0
+            assert timing["checks"] > 0
+            assert timing["drifted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_marks_host_checks_failed(self):
+        detector, _ = self._detector(["10.0.0.1"], max_concurrent_hosts=1)
+        detector.executor.run_detect_batch = AsyncMock(side_effect=ConnectionError("refused"))
+
+        results = await detector.detect_all()
+
+        assert results
+        assert all(not r.compliant and "Check failed" in r.drift_description for r in results)
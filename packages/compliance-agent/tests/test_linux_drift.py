@@ -40,6 +40,18 @@ def mock_executor():
     executor.remove_target = MagicMock()
     executor.close_all = AsyncMock()
     executor._distro_cache = {}
+
+    async def _detect_batch(target, runbook_ids):
+        # Route the single-exec batch through run_runbook so tests can
+        # keep stubbing per-runbook detect results.
+        results = {}
+        for runbook_id in runbook_ids:
+            res = await executor.run_runbook(target, runbook_id, phases=["detect"])
+            if res:
+                results[runbook_id] = res[0]
+        return results
+
+    executor.run_detect_batch = AsyncMock(side_effect=_detect_batch)
     return executor
 
 
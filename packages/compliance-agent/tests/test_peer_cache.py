@@ -0,0 +1,144 @@
+"""
+Tests for the LAN peer artifact cache (peer_cache.py): ring ownership
+that matches the Go mesh's MAC normalisation and moves minimally on
+membership change, a content-addressed store that re-verifies every
+read (blobs and in-place extents), and the local -> owner peer -> cloud
+fetch order with nothing unverified accepted from a peer.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from compliance_agent.peer_cache import (
+    ArtifactRing,
+    ArtifactStore,
+    PeerCache,
+    normalize_mac,
+)
+
+MACS = ["aa:bb:cc:00:00:01", "aa:bb:cc:00:00:02", "aa:bb:cc:00:00:03"]
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_ring_normalises_macs_and_spreads_keys():
+    ring = ArtifactRing(MACS)
+    same = ArtifactRing(["AA-BB-CC-00-00-01", "aabbcc000002", "AA:BB:CC:00:00:03"])
+    keys = [_sha(str(i).encode()) for i in range(300)]
+
+    assert ring.nodes == [normalize_mac(m) for m in MACS]
+    assert [ring.owner(k) for k in keys] == [same.owner(k) for k in keys]
+    assert {ring.owner(k) for k in keys} == set(ring.nodes)
+
+
+def test_ring_removal_only_moves_departed_nodes_keys():
+    full = ArtifactRing(MACS)
+    reduced = ArtifactRing(MACS[:2])
+    gone = normalize_mac(MACS[2])
+    for k in (_sha(str(i).encode()) for i in range(300)):
+        if full.owner(k) != gone:
+            assert reduced.owner(k) == full.owner(k)
+    assert ArtifactRing([]).owner("x") is None
+
+
+def test_store_verifies_blobs_and_extents(tmp_path):
+    store = ArtifactStore(tmp_path / "cache")
+    data = b"runbook body"
+    assert not store.put(_sha(b"other"), data)
+    assert store.put(_sha(data), data)
+    assert store.get(_sha(data)) == data
+
+    image = tmp_path / "image.part"
+    image.write_bytes(b"0123456789abcdef")
+    chunk = b"456789"
+    store.add_extent(_sha(chunk), image, 4, 6)
+    assert store.get(_sha(chunk)) == chunk
+
+    moved = tmp_path / "image.iso"
+    image.rename(moved)
+    store.move_extents(image, moved)
+    assert store.get(_sha(chunk)) == chunk
+
+    moved.write_bytes(b"X" * 16)  # overwritten since registration
+    assert store.get(_sha(chunk)) is None
+    assert not store.has(_sha(chunk))
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = ArtifactStore(tmp_path / "cache", max_bytes=25)
+    a, b, c = b"a" * 10, b"b" * 10, b"c" * 10
+    store.put(_sha(a), a)
+    store.put(_sha(b), b)
+    store.get(_sha(a))  # a is now most recent
+    old = time.time() - 100
+    os.utime(store._blob_path(_sha(b)), (old, old))
+    store.put(_sha(c), c)
+    assert store.has(_sha(a)) and store.has(_sha(c))
+    assert not store.has(_sha(b))
+
+
+def _cache(tmp_path, owner_data=None):
+    cache = PeerCache(ArtifactStore(tmp_path / "cache"), MACS[0], port=8080,
+                      wait_seconds=0, poll_interval=0)
+    cache.update_peers([{"mac": m, "ips": [f"192.168.1.{i}"]} for i, m in enumerate(MACS[1:], 2)])
+
+    async def _owner(session, digest):
+        return owner_data
+
+    cache.fetch_from_owner = _owner
+    return cache
+
+
+def _digest_owned_by_peer(cache):
+    for i in range(1000):
+        data = f"artifact-{i}".encode()
+        if not cache.owns(_sha(data)):
+            return data
+    raise AssertionError("no peer-owned digest found")
+
+
+def test_fetch_prefers_owner_peer_then_caches(tmp_path):
+    cache = _cache(tmp_path)
+    data = _digest_owned_by_peer(cache)
+    cache.fetch_from_owner = lambda session, digest: asyncio.sleep(0, result=data)
+    cloud_calls = []
+
+    async def _cloud():
+        cloud_calls.append(1)
+        return data
+
+    out = asyncio.run(cache.fetch(_sha(data), _cloud, session=object()))
+    assert out == data and cloud_calls == []
+    assert asyncio.run(cache.fetch(_sha(data), _cloud, session=object())) == data
+    stats = cache.stats()
+    assert (stats["peer_hits"], stats["local_hits"], stats["cloud_fetches"]) == (1, 1, 0)
+
+
+def test_fetch_falls_back_to_cloud_and_rejects_bad_cloud_bytes(tmp_path):
+    cache = _cache(tmp_path, owner_data=None)
+    data = _digest_owned_by_peer(cache)
+
+    async def _cloud():
+        return data
+
+    async def _bad_cloud():
+        return b"tampered"
+
+    assert asyncio.run(cache.fetch(_sha(data + b"x"), _bad_cloud, session=object())) is None
+    assert asyncio.run(cache.fetch(_sha(data), _cloud, session=object())) == data
+    assert cache.stats()["peer_misses"] == 2
+    assert cache.stats()["cloud_fetches"] == 1
+
+
+@pytest.mark.parametrize("peers", [[], [{"mac": MACS[0], "ips": ["10.0.0.9"]}]])
+def test_single_appliance_owns_everything(tmp_path, peers):
+    cache = PeerCache(ArtifactStore(tmp_path / "c"), MACS[0], port=8080)
+    cache.update_peers(peers)
+    assert cache.owns(_sha(b"anything"))
+    assert cache.stats()["ring_size"] == 1
@@ -0,0 +1,252 @@
+"""
+Tests for the appliance agent's main-loop scheduler (scheduler.py) and
+its wiring in ApplianceAgent: independent task cadence and deadlines,
+priority + concurrency/CPU budgets, trigger(), lag metrics, per-host
+adaptive scan cadence and immediate order processing on checkin.
+"""
+
+import asyncio
+import time
+from collections import deque
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from compliance_agent.scheduler import (
+    AgentScheduler,
+    TargetCadence,
+    PRIORITY_CRITICAL,
+    PRIORITY_HIGH,
+    PRIORITY_BACKGROUND,
+)
+
+
+async def _run_for(sched: AgentScheduler, seconds: float):
+    """Run the scheduler for a while; return stats taken before stopping."""
+    runner = asyncio.create_task(sched.run())
+    await asyncio.sleep(seconds)
+    stats = sched.stats()
+    await sched.stop()
+    runner.cancel()
+    try:
+        await runner
+    except asyncio.CancelledError:
+        pass
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_slow_task_does_not_delay_others():
+    sched = AgentScheduler(max_concurrent=4)
+    ticks = []
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def fast():
+        ticks.append(time.monotonic())
+
+    sched.add("slow_scan", slow, 60, priority=PRIORITY_HIGH)
+    sched.add("checkin", fast, 0.05, priority=PRIORITY_CRITICAL)
+    stats = (await _run_for(sched, 0.4))["tasks"]
+
+    assert len(ticks) >= 5
+    assert stats["slow_scan"]["running"] is True
+    assert stats["checkin"]["runs"] >= 5
+    assert stats["checkin"]["max_lag_s"] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_only_that_task():
+    sched = AgentScheduler()
+    other = []
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def ok():
+        other.append(1)
+
+    sched.add("hung", hang, 60, deadline=0.05)
+    sched.add("ok", ok, 0.05)
+    hung = (await _run_for(sched, 0.3))["tasks"]["hung"]
+    assert hung["timeouts"] == 1
+    assert hung["running"] is False
+    assert "deadline" in hung["last_error"]
+    assert len(other) >= 3
+
+
+def test_concurrency_budget_exempts_critical_tasks():
+    async def go():
+        sched = AgentScheduler(max_concurrent=1)
+        gate = asyncio.Event()
+
+        async def block():
+            await gate.wait()
+
+        sched.add("scan_a", block, 60, priority=PRIORITY_HIGH)
+        sched.add("scan_b", block, 60, priority=PRIORITY_BACKGROUND)
+        sched.add("orders", block, 60, priority=PRIORITY_CRITICAL)
+
+        started = sched.dispatch_due()
+        # Critical first, then the higher-priority scan takes the only slot.
+        assert started == ["orders", "scan_a"]
+        assert sched.dispatch_due() == []
+        assert sched.stats()["tasks"]["scan_b"]["overdue_s"] >= 0
+
+        gate.set()
+        await asyncio.sleep(0.01)
+        sched.tasks["scan_b"].next_due = 0.0
+        assert sched.dispatch_due() == ["scan_b"]
+        await asyncio.sleep(0.01)
+
+    asyncio.run(go())
+
+
+def test_cpu_budget_defers_background_tasks():
+    cpu = [0.0]
+
+    async def go():
+        sched = AgentScheduler(cpu_budget=0.5, cpu_clock=lambda: cpu[0])
+
+        async def noop():
+            pass
+
+        sched.add("prune", noop, 60, priority=PRIORITY_BACKGROUND)
+        sched.add("scan", noop, 60, priority=PRIORITY_HIGH)
+        sched._sample_cpu(time.monotonic() - 10)  # 10s ago at 0 CPU-seconds
+        cpu[0] = 9.0                               # 90% of a core since
+        assert sched.dispatch_due() == ["scan"]
+        stats = sched.stats()
+        assert stats["cpu_usage"] > 0.5
+        assert stats["tasks"]["prune"]["deferred_cpu"] == 1
+        assert stats["tasks"]["prune"]["next_due_in_s"] > 0
+        await asyncio.sleep(0)
+
+    asyncio.run(go())
+
+
+@pytest.mark.asyncio
+async def test_trigger_runs_now_and_reruns_if_running():
+    sched = AgentScheduler()
+    runs = []
+    release = asyncio.Event()
+
+    async def orders():
+        runs.append(time.monotonic())
+        if len(runs) == 1:
+            await release.wait()
+
+    sched.add("orders", orders, 3600, priority=PRIORITY_CRITICAL)
+    runner = asyncio.create_task(sched.run())
+    await asyncio.sleep(0.05)
+    assert len(runs) == 1
+
+    sched.trigger("orders")          # while running -> rerun right after
+    release.set()
+    await asyncio.sleep(0.05)
+    assert len(runs) == 2
+
+    sched.trigger("orders")          # idle -> runs now despite 1h interval
+    await asyncio.sleep(0.05)
+    assert len(runs) == 3
+
+    await sched.stop()
+    runner.cancel()
+
+
+def test_predicate_false_skips_without_counting_a_run():
+    async def go():
+        sched = AgentScheduler()
+        sched.add("linux_scan", AsyncMock(), 30, when=lambda: False)
+        assert sched.dispatch_due() == []
+        t = sched.stats()["tasks"]["linux_scan"]
+        assert t["skipped"] == 1 and t["runs"] == 0
+
+    asyncio.run(go())
+
+
+def test_target_cadence_adapts_to_drift():
+    c = TargetCadence(base_interval=300, min_interval=60, max_interval=1800, backoff=2)
+    assert c.due(["a", "b"], now=0) == ["a", "b"]
+
+    assert c.record("a", drifted=True, now=0) == 60
+    assert c.record("b", drifted=False, now=0) == 600
+    assert c.due(["a", "b"], now=100) == ["a"]
+    assert c.record("b", drifted=None, now=0) == 600     # error: unchanged
+
+    for _ in range(5):
+        interval = c.record("b", drifted=False, now=0)
+    assert interval == 1800
+
+    c.forget(["a"])
+    assert list(c.stats(now=0)) == ["a"]
+
+
+# ----------------------------------------------------------------------
+# ApplianceAgent wiring
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def agent():
+    from compliance_agent.appliance_agent import ApplianceAgent
+
+    a = ApplianceAgent.__new__(ApplianceAgent)
+    a.config = MagicMock()
+    a.config.site_id = "site-1"
+    a.scheduler = AgentScheduler()
+    a._checkin_orders = None
+    a._recent_order_ids = deque(maxlen=256)
+    a.client = MagicMock()
+    a.client.fetch_pending_orders = AsyncMock(return_value=[])
+    a.client.acknowledge_order = AsyncMock()
+    a.client.complete_order = AsyncMock()
+    a._execute_order = AsyncMock(return_value={"ok": True})
+    return a
+
+
+@pytest.mark.asyncio
+async def test_checkin_orders_processed_without_extra_fetch(agent):
+    agent._checkin_orders = [{"order_id": "o1", "order_type": "force_checkin"}]
+    await agent._process_orders_task()
+
+    agent.client.fetch_pending_orders.assert_not_awaited()
+    agent.client.acknowledge_order.assert_awaited_once_with("o1")
+    assert agent._checkin_orders is None
+
+    # A stale checkin snapshot listing the same order does not re-run it.
+    await agent._process_pending_orders([{"order_id": "o1", "order_type": "force_checkin"}])
+    assert agent._execute_order.await_count == 1
+
+    # No checkin orders -> falls back to polling.
+    await agent._process_orders_task()
+    agent.client.fetch_pending_orders.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_windows_scan_only_polls_due_hosts(agent):
+    from compliance_agent.runbooks.windows.executor import WindowsTarget
+
+    agent._sensor_enabled = False
+    agent.windows_targets = [
+        WindowsTarget(hostname=h, username="u", password="p") for h in ("dc1", "ws1")
+    ]
+    agent._windows_cadence = TargetCadence(300, 60, 1800)
+    drift = {"dc1": True, "ws1": False}
+    scanned = []
+
+    async def _scan(target):
+        scanned.append(target.hostname)
+        return drift[target.hostname]
+
+    agent._scan_windows_target = _scan
+
+    await agent._maybe_scan_windows()
+    assert sorted(scanned) == ["dc1", "ws1"]
+    cadence = agent._windows_cadence.stats()
+    assert cadence["dc1"]["interval_s"] == 60
+    assert cadence["ws1"]["interval_s"] == 450
+
+    scanned.clear()
+    await agent._maybe_scan_windows()
+    assert scanned == []  # neither host due yet
@@ -4,10 +4,12 @@ Tests for WORM (Write-Once-Read-Many) upload functionality.
 Tests the evidence upload flow from agent to MCP server to MinIO.
 """
 
+import asyncio
 import pytest
 import json
 import hashlib
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime, timezone
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
@@ -16,6 +18,7 @@ from compliance_agent.worm_uploader import (
     WormUploader,
     WormConfig,
     UploadResult,
+    _UploadWindow,
     load_worm_config_from_env,
 )
 
@@ -155,24 +158,44 @@ class TestWormUploader:
         assert result.success is False
         assert "disabled" in result.error.lower()
 
-    def test_upload_registry_persistence(self, worm_uploader, temp_evidence_dir):
-        """Test that upload registry is persisted to disk."""
+    def test_upload_registry_persistence(self, worm_config, worm_uploader, temp_evidence_dir):
+        """Test that upload state is persisted in the journal."""
         # Manually add to registry
         worm_uploader._upload_registry["test-bundle-001"] = {
             "success": True,
             "s3_uri": "s3://bucket/test.json",
             "upload_timestamp": "2026-01-10T10:00:00Z",
         }
-        worm_uploader._save_registry()
 
-        # Verify file exists
-        registry_path = temp_evidence_dir / ".upload_registry.json"
-        assert registry_path.exists()
+        # Verify journal exists
+        assert (temp_evidence_dir / ".upload_journal.db").exists()
 
-        # Reload and verify
-        loaded = json.loads(registry_path.read_text())
-        assert "test-bundle-001" in loaded
-        assert loaded["test-bundle-001"]["success"] is True
+        # Reopen and verify
+        reopened = WormUploader(
+            config=worm_config,
+            evidence_dir=temp_evidence_dir,
+            client_id="test-site-001",
+        )
+        loaded = reopened.get_upload_status("test-bundle-001")
+        assert loaded["success"] is True
+        assert loaded["s3_uri"] == "s3://bucket/test.json"
+
+    def test_legacy_registry_migrated(self, worm_config, temp_evidence_dir):
+        """Test that a pre-journal .upload_registry.json is imported once."""
+        legacy = temp_evidence_dir / ".upload_registry.json"
+        legacy.write_text(json.dumps({
+            "EB-old-001": {"success": True, "s3_uri": "s3://bucket/old.json"},
+        }))
+
+        uploader = WormUploader(
+            config=worm_config,
+            evidence_dir=temp_evidence_dir,
+            client_id="test-site-001",
+        )
+
+        assert uploader.get_upload_status("EB-old-001")["s3_uri"] == "s3://bucket/old.json"
+        assert not legacy.exists()
+        assert (temp_evidence_dir / ".upload_registry.json.migrated").exists()
 
     def test_skip_already_uploaded(self, worm_uploader, sample_bundle):
         """Test that already-uploaded bundles are skipped."""
@@ -227,15 +250,20 @@ class TestWormUploader:
 
         mock_session = MagicMock()
         mock_session.post = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)))
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock()
 
-        with patch("aiohttp.ClientSession", return_value=mock_session):
+        @asynccontextmanager
+        async def _shared_session():
+            yield mock_session
+
+        with patch("compliance_agent.worm_uploader.shared_session", _shared_session):
             result = await worm_uploader.upload_bundle(sample_bundle)
 
         assert result.success is False
         assert result.retry_count == 2
         assert "failed after" in result.error.lower()
+        # One TLS context for every attempt, so pooled connections are reused.
+        contexts = {c.kwargs["ssl"] for c in mock_session.post.call_args_list}
+        assert len(contexts) == 1
 
     def test_find_pending_bundles(self, worm_uploader, temp_evidence_dir):
         """Test finding bundles pending upload."""
@@ -258,6 +286,84 @@ class TestWormUploader:
         assert "bundle-2" in bundle_ids
         assert "bundle-0" not in bundle_ids
 
+    def test_enqueued_bundles_found_without_rescan(self, worm_uploader, temp_evidence_dir):
+        """Test that bundles fed from the evidence catalog need no tree walk."""
+        assert worm_uploader._find_pending_bundles() == []  # initial walk
+
+        bundle_dir = temp_evidence_dir / "2026" / "01" / "10" / "EB-new-001"
+        bundle_dir.mkdir(parents=True)
+        (bundle_dir / "bundle.json").write_text(json.dumps({"bundle_id": "EB-new-001"}))
+        stray = temp_evidence_dir / "EB-stray-001"  # written behind the journal's back
+        stray.mkdir()
+        (stray / "bundle.json").write_text("{}")
+
+        worm_uploader.enqueue_bundle(bundle_dir / "bundle.json")
+
+        pending = worm_uploader._find_pending_bundles()
+        assert pending == [(bundle_dir / "bundle.json", None)]
+
+    def test_restart_scans_only_recent_day_dirs(self, worm_config, temp_evidence_dir):
+        """Test that later catch-up walks skip day directories already covered."""
+        uploader = WormUploader(
+            config=worm_config,
+            evidence_dir=temp_evidence_dir,
+            client_id="test-site-001",
+        )
+        assert uploader.get_pending_count() == 0
+
+        today = datetime.now(timezone.utc)
+        for day, bundle_id in ((today, "EB-today"), (datetime(2020, 1, 1), "EB-2020")):
+            bundle_dir = (
+                temp_evidence_dir / f"{day.year:04d}" / f"{day.month:02d}" /
+                f"{day.day:02d}" / bundle_id
+            )
+            bundle_dir.mkdir(parents=True)
+            (bundle_dir / "bundle.json").write_text("{}")
+
+        restarted = WormUploader(
+            config=worm_config,
+            evidence_dir=temp_evidence_dir,
+            client_id="test-site-001",
+        )
+        pending = restarted._find_pending_bundles()
+        assert [p[0].parent.name for p in pending] == ["EB-today"]
+
+    def test_pruned_bundle_marked_missing(self, worm_uploader, sample_bundle):
+        """Test that a bundle deleted before upload leaves the pending set."""
+        worm_uploader.enqueue_bundle(sample_bundle)
+        sample_bundle.unlink()
+
+        assert worm_uploader._find_pending_bundles() == []
+        assert worm_uploader.get_upload_status("EB-20260110-001")["state"] == "missing"
+        assert worm_uploader.get_stats()["missing_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_pending_uploads_within_window(self, worm_uploader, temp_evidence_dir):
+        """Test that sync uploads every pending bundle without exceeding the window ceiling."""
+        for i in range(12):
+            bundle_dir = temp_evidence_dir / f"EB-sync-{i:03d}"
+            bundle_dir.mkdir()
+            (bundle_dir / "bundle.json").write_text("{}")
+
+        active = 0
+        peak = 0
+
+        async def fake_upload(bundle_path, signature_path, bundle_id):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+            return UploadResult(bundle_id=bundle_id, success=True, s3_uri=f"s3://b/{bundle_id}")
+
+        with patch.object(worm_uploader, '_upload_via_proxy', side_effect=fake_upload):
+            results = await worm_uploader.sync_pending()
+
+        assert len(results) == 12 and all(r.success for r in results)
+        assert 1 < peak <= worm_uploader.config.upload_batch_size
+        assert worm_uploader.get_pending_count() == 0
+        assert worm_uploader.get_stats()["total_uploaded"] == 12
+
     def test_get_stats(self, worm_uploader, temp_evidence_dir):
         """Test upload statistics."""
         # Create some bundles and mark some uploaded
@@ -282,6 +388,39 @@ class TestWormUploader:
         assert stats["retention_days"] == 90
 
 
+class TestUploadWindow:
+    """Tests for the adaptive upload concurrency window."""
+
+    def test_grows_while_throughput_holds_and_halves_on_failure(self):
+        window = _UploadWindow(ceiling=8, initial=2)
+        now = 0.0
+        for _ in range(6):  # steady 1 KB per 0.1s per upload
+            window.on_start(now)
+            for _ in range(window.size):
+                now += 0.1 / window.size
+                window.on_done(True, 1024, now)
+        assert window.size == 8
+
+        window.on_done(False, 0, now)
+        assert window.size == 4
+        window.on_done(False, 0, now)
+        window.on_done(False, 0, now)
+        window.on_done(False, 0, now)
+        assert window.size == 1
+
+    def test_shrinks_when_throughput_drops(self):
+        window = _UploadWindow(ceiling=8, initial=4)
+        window.on_start(0.0)
+        for i in range(4):
+            window.on_done(True, 1000, 0.1 * (i + 1))
+        assert window.size == 5
+
+        window.on_start(1.0)
+        for i in range(5):
+            window.on_done(True, 100, 1.0 + 0.5 * (i + 1))
+        assert window.size == 4
+
+
 class TestProxyEndpointContract:
     """Tests verifying the proxy endpoint contract matches what MCP expects."""
 